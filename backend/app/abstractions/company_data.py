@@ -10,6 +10,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+_IN_CHUNK = 200  # ids per .in_() filter, keeps the query string well under URL limits
+
 
 class CompanyDataRepo(ABC):
     """Interface for company and portfolio data."""
@@ -33,6 +35,27 @@ class CompanyDataRepo(ABC):
         """Get portfolio companies for a fund. Optionally join company details."""
         pass
 
+    def get_companies(self, company_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get many companies as {id: company}; unknown ids are omitted. Override to batch."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for company_id in company_ids:
+            company = self.get_company(company_id)
+            if company:
+                out[company_id] = company
+        return out
+
+    def get_funding_rounds_bulk(
+        self,
+        company_ids: List[str],
+        companies: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Funding rounds for many companies as {id: rounds}, each ordered by date.
+
+        ``companies`` (as returned by get_companies) lets implementations use
+        the JSONB fallback without re-reading the company rows. Override to batch.
+        """
+        return {company_id: self.get_funding_rounds(company_id) for company_id in company_ids}
+
     def get_portfolio_company(
         self,
         fund_id: str,
@@ -85,6 +108,51 @@ class SupabaseCompanyDataRepo(CompanyDataRepo):
             logger.warning("get_funding_rounds %s: %s", company_id, e)
             return []
 
+    def get_companies(self, company_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        ids = list(dict.fromkeys(cid for cid in company_ids if cid))
+        for i in range(0, len(ids), _IN_CHUNK):
+            r = self._client.from_("companies").select("*").in_("id", ids[i:i + _IN_CHUNK]).execute()
+            for row in r.data or []:
+                out[row["id"]] = row
+        return out
+
+    def get_funding_rounds_bulk(
+        self,
+        company_ids: List[str],
+        companies: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        ids = list(dict.fromkeys(cid for cid in company_ids if cid))
+        out: Dict[str, List[Dict[str, Any]]] = {cid: [] for cid in ids}
+        try:
+            for i in range(0, len(ids), _IN_CHUNK):
+                r = (
+                    self._client.from_("funding_rounds")
+                    .select("*")
+                    .in_("company_id", ids[i:i + _IN_CHUNK])
+                    .order("date", desc=False)
+                    .execute()
+                )
+                for row in r.data or []:
+                    out.setdefault(row.get("company_id"), []).append(row)
+        except Exception as e:
+            logger.warning("get_funding_rounds_bulk: %s", e)
+        # Fallback: funding_rounds JSONB on companies, for ids with no table rows
+        missing = [cid for cid in ids if not out.get(cid)]
+        if missing:
+            known = companies if companies is not None else {}
+            unknown = [cid for cid in missing if cid not in known]
+            if unknown:
+                try:
+                    known = {**known, **self.get_companies(unknown)}
+                except Exception as e:
+                    logger.warning("get_funding_rounds_bulk companies: %s", e)
+            for cid in missing:
+                rounds = (known.get(cid) or {}).get("funding_rounds")
+                if rounds:
+                    out[cid] = list(rounds)
+        return out
+
     def get_portfolio_companies(
         self,
         fund_id: str,
@@ -4,12 +4,20 @@ Cell Actions API Endpoints
 Provides endpoints for:
 1. Querying available cell actions (filtered by mode, category, column)
 2. Executing cell actions with proper output transformation
+3. Executing one action down a whole column (execute-batch, NDJSON stream)
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import asyncio
+import copy
 import logging
+import os
+import time
 
 from app.services.cell_action_registry import (
     get_registry,
@@ -27,6 +35,10 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Rows of one execute-batch request in flight at once
+BATCH_CONCURRENCY = int(os.getenv("CELL_ACTION_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ROWS = int(os.getenv("CELL_ACTION_BATCH_MAX_ROWS", "2000"))
+
 
 def _make_json_safe(obj: Any) -> Any:
     """
@@ -75,6 +87,23 @@ class ActionExecutionRequest(BaseModel):
     trace_id: Optional[str] = None
 
 
+class BatchRowInput(BaseModel):
+    """One row of a column-level execution."""
+    row_id: str
+    company_id: Optional[str] = None
+    inputs: Dict[str, Any] = {}
+
+
+class BatchActionExecutionRequest(BaseModel):
+    """Run one action for every row of a column."""
+    column_id: str
+    rows: List[BatchRowInput]
+    mode: str = "portfolio"
+    fund_id: Optional[str] = None
+    trace_id: Optional[str] = None
+    concurrency: Optional[int] = None
+
+
 class ActionExecutionResponse(BaseModel):
     """
     Response from action execution. Contract for frontend (UnifiedMatrix / cell-action-registry).
@@ -210,30 +239,7 @@ async def execute_action(
         
         # Route to appropriate service based on action definition
         service_output = await _route_to_service(action, request)
-        
-        # Transform output to cell format
-        transformed = registry.transform_output(action_id, service_output)
-        # Ensure JSON-safe response (no Decimal, numpy, or non-serializable types)
-        safe_value = _make_json_safe(transformed.get('value'))
-        safe_metadata = _make_json_safe(transformed.get('metadata', {}))
-        # Ensure columns_to_create[].values are keyed by row id (string) for frontend
-        if isinstance(safe_metadata, dict) and 'columns_to_create' in safe_metadata:
-            cols = safe_metadata['columns_to_create']
-            if isinstance(cols, list):
-                for col in cols:
-                    if isinstance(col, dict) and 'values' in col and isinstance(col['values'], dict):
-                        col['values'] = {str(k): _make_json_safe(v) for k, v in col['values'].items()}
-        # Promote enrichment fields from service output to top-level metadata for frontend
-        if isinstance(service_output, dict) and service_output.get('enrich_mode') and isinstance(safe_metadata, dict):
-            safe_metadata['enrich_mode'] = service_output['enrich_mode']
-            safe_metadata['column_values'] = _make_json_safe(service_output.get('column_values', {}))
-        return ActionExecutionResponse(
-            success=True,
-            action_id=action_id,
-            value=safe_value,
-            display_value=transformed.get('displayValue', '') if isinstance(transformed.get('displayValue'), str) else str(safe_value),
-            metadata=safe_metadata if isinstance(safe_metadata, dict) else {}
-        )
+        return _action_response(registry, action_id, service_output)
         
     except HTTPException:
         raise
@@ -249,6 +255,235 @@ async def execute_action(
         )
 
 
+def _action_response(registry, action_id: str, service_output: Any) -> ActionExecutionResponse:
+    """Transform service output into the cell contract (shared by execute and execute-batch)."""
+    # Transform output to cell format
+    transformed = registry.transform_output(action_id, service_output)
+    # Ensure JSON-safe response (no Decimal, numpy, or non-serializable types)
+    safe_value = _make_json_safe(transformed.get('value'))
+    safe_metadata = _make_json_safe(transformed.get('metadata', {}))
+    # Ensure columns_to_create[].values are keyed by row id (string) for frontend
+    if isinstance(safe_metadata, dict) and 'columns_to_create' in safe_metadata:
+        cols = safe_metadata['columns_to_create']
+        if isinstance(cols, list):
+            for col in cols:
+                if isinstance(col, dict) and 'values' in col and isinstance(col['values'], dict):
+                    col['values'] = {str(k): _make_json_safe(v) for k, v in col['values'].items()}
+    # Promote enrichment fields from service output to top-level metadata for frontend
+    if isinstance(service_output, dict) and service_output.get('enrich_mode') and isinstance(safe_metadata, dict):
+        safe_metadata['enrich_mode'] = service_output['enrich_mode']
+        safe_metadata['column_values'] = _make_json_safe(service_output.get('column_values', {}))
+    return ActionExecutionResponse(
+        success=True,
+        action_id=action_id,
+        value=safe_value,
+        display_value=transformed.get('displayValue', '') if isinstance(transformed.get('displayValue'), str) else str(safe_value),
+        metadata=safe_metadata if isinstance(safe_metadata, dict) else {}
+    )
+
+
+# ---------------------------------------------------------------------------
+# Column-level batch execution
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _ColumnBatch:
+    """Per-request state shared by every row of an execute-batch call."""
+    company_ids: set = field(default_factory=set)
+    companies: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    funding_rounds: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    services: Dict[type, Any] = field(default_factory=dict)
+
+
+# Set inside each row task of an execute-batch call; None for single-cell execution
+_BATCH: ContextVar[Optional[_ColumnBatch]] = ContextVar("cell_action_batch", default=None)
+
+
+def _service_instance(cls):
+    """One instance per batch for stateless services; a fresh one per call otherwise."""
+    batch = _BATCH.get()
+    if batch is None:
+        return cls()
+    instance = batch.services.get(cls)
+    if instance is None:
+        instance = batch.services[cls] = cls()
+    return instance
+
+
+def _prefetch_companies(batch: _ColumnBatch, company_ids: List[str]) -> None:
+    """Load companies and funding rounds for every row with one .in_() query per table."""
+    if not company_ids:
+        return
+    try:
+        from app.core.adapters import get_company_repo
+        repo = get_company_repo()
+        if repo is None:
+            from app.abstractions.company_data import SupabaseCompanyDataRepo
+            client = _get_supabase_client()
+            if not client:
+                return
+            repo = SupabaseCompanyDataRepo(client)
+        companies = repo.get_companies(company_ids)
+        rounds = repo.get_funding_rounds_bulk(company_ids, companies)
+    except Exception as e:
+        # Rows fall back to per-company reads
+        logger.warning("Batch prefetch failed (%d companies): %s", len(company_ids), e)
+        return
+    batch.companies = companies
+    batch.funding_rounds = rounds
+    batch.company_ids = set(company_ids)
+
+
+def _row_key(row: BatchRowInput, request: BatchActionExecutionRequest) -> str:
+    """Rows with the same key produce the same service output."""
+    return json.dumps(
+        {"company_id": row.company_id or (row.inputs or {}).get("company_id"),
+         "inputs": row.inputs or {}, "mode": request.mode, "fund_id": request.fund_id},
+        sort_keys=True, default=str,
+    )
+
+
+def _for_row(response: ActionExecutionResponse, from_row: str, to_row: str) -> Dict[str, Any]:
+    """Re-key a shared result's columns_to_create values onto another row."""
+    payload = response.model_dump()
+    cols = payload["metadata"].get("columns_to_create")
+    if from_row != to_row and isinstance(cols, list):
+        for col in cols:
+            values = col.get("values") if isinstance(col, dict) else None
+            if isinstance(values, dict) and from_row in values:
+                col["values"] = {(to_row if k == from_row else k): v for k, v in values.items()}
+    return payload
+
+
+@router.post("/actions/{action_id}/execute-batch")
+async def execute_action_batch(
+    action_id: str,
+    request: BatchActionExecutionRequest
+):
+    """
+    Execute a cell action for every row of a column.
+
+    Companies and funding rounds are prefetched once for all rows, stateless
+    services are shared, rows with identical inputs run once, and up to
+    ``concurrency`` rows run at a time. PWERM columns are valued in one
+    ValuationEngineService.calculate_pwerm_batch call. Streams NDJSON: a ``start`` event,
+    one ``row`` event per row (the execute response plus ``row_id``) in
+    completion order, then ``done``.
+    """
+    registry = get_registry()
+    action = registry.get_action(action_id)
+    if not action:
+        raise HTTPException(status_code=404, detail=f"Action {action_id} not found")
+    if not action.is_active:
+        raise HTTPException(status_code=400, detail=f"Action {action_id} is not active")
+    if len(request.rows) > BATCH_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ROWS} rows per batch")
+
+    groups: Dict[str, List[BatchRowInput]] = {}
+    for row in request.rows:
+        groups.setdefault(_row_key(row, request), []).append(row)
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    logger.info(
+        "Cell action execute-batch: action_id=%s rows=%d unique=%d trace_id=%s",
+        action_id, len(request.rows), len(groups), request.trace_id,
+    )
+
+    def row_request(rows: List[BatchRowInput]) -> ActionExecutionRequest:
+        first = rows[0]
+        return ActionExecutionRequest(
+            action_id=action_id,
+            row_id=first.row_id,
+            column_id=request.column_id,
+            inputs=first.inputs or {},
+            mode=request.mode,
+            fund_id=request.fund_id,
+            company_id=first.company_id,
+            trace_id=request.trace_id,
+        )
+
+    def failure(rows: List[BatchRowInput], e: BaseException) -> ActionExecutionResponse:
+        logger.error("Error executing action %s for row %s: %s", action_id, rows[0].row_id, e, exc_info=e)
+        return ActionExecutionResponse(
+            success=False, action_id=action_id, value=None, display_value="", metadata={}, error=str(e),
+        )
+
+    async def run_group(batch: _ColumnBatch, gate: asyncio.Semaphore, rows: List[BatchRowInput]):
+        async with gate:
+            _BATCH.set(batch)
+            try:
+                service_output = await _route_to_service(action, row_request(rows))
+                response = _action_response(registry, action_id, service_output)
+            except Exception as e:
+                response = failure(rows, e)
+        return [(rows, response)]
+
+    async def run_pwerm(batch: _ColumnBatch, gate: asyncio.Semaphore, groups_rows: List[List[BatchRowInput]]):
+        """Build each row's ValuationRequest, then value the whole column in one PWERM batch."""
+        from app.services.valuation_engine_service import ValuationEngineService
+
+        async def build(rows: List[BatchRowInput]):
+            async with gate:
+                _BATCH.set(batch)
+                return await _pwerm_request(row_request(rows))
+
+        built = await asyncio.gather(*(build(rows) for rows in groups_rows), return_exceptions=True)
+        out = [(rows, failure(rows, req)) for rows, req in zip(groups_rows, built) if isinstance(req, Exception)]
+        ready = [(rows, req) for rows, req in zip(groups_rows, built) if not isinstance(req, Exception)]
+        if not ready:
+            return out
+        try:
+            results = await ValuationEngineService().calculate_pwerm_batch([req for _, req in ready])
+        except Exception as e:
+            return out + [(rows, failure(rows, e)) for rows, _ in ready]
+        for (rows, _), result in zip(ready, results):
+            try:
+                out.append((rows, _action_response(registry, action_id, _pwerm_output(result))))
+            except Exception as e:
+                out.append((rows, failure(rows, e)))
+        return out
+
+    async def stream():
+        started = time.perf_counter()
+        yield json.dumps({"type": "start", "action_id": action_id, "rows": len(request.rows), "unique": len(groups)}) + "\n"
+        batch = _ColumnBatch()
+        company_ids = list(dict.fromkeys(
+            cid for rows in groups.values()
+            for cid in (rows[0].company_id or (rows[0].inputs or {}).get("company_id"),) if cid
+        ))
+        await asyncio.to_thread(_prefetch_companies, batch, company_ids)
+        gate = asyncio.Semaphore(concurrency)
+        if 'pwerm' in action_id.lower():
+            # One vectorized pass over the shared scenario matrix for the column
+            tasks = [asyncio.create_task(run_pwerm(batch, gate, list(groups.values())))]
+        else:
+            tasks = [asyncio.create_task(run_group(batch, gate, rows)) for rows in groups.values()]
+        succeeded = failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for rows, response in await next_done:
+                    for row in rows:
+                        payload = _for_row(response, rows[0].row_id, row.row_id)
+                        yield json.dumps({"type": "row", "row_id": row.row_id, **payload}, default=str) + "\n"
+                    if response.success:
+                        succeeded += len(rows)
+                    else:
+                        failed += len(rows)
+        finally:
+            # Client went away mid-stream: don't leave rows running
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({
+            "type": "done",
+            "rows": len(request.rows),
+            "succeeded": succeeded,
+            "failed": failed,
+            "unique": len(groups),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 def _map_company_stage(stage_str: Optional[str]):
     """Map company stage string to Stage enum (round stage / time-since-round; lazy-imports valuation_engine_service)."""
     from app.services.valuation_engine_service import Stage
@@ -358,6 +593,9 @@ async def _extract_company_data(company_id: Optional[str]) -> Dict[str, Any]:
     """Fetch company data (backend-agnostic: CompanyDataRepo or Supabase fallback)."""
     if not company_id:
         return {}
+    batch = _BATCH.get()
+    if batch is not None and company_id in batch.company_ids:
+        return dict(batch.companies.get(company_id) or {})
     try:
         try:
             from app.core.adapters import get_company_repo
@@ -382,6 +620,9 @@ async def _extract_funding_rounds(company_id: Optional[str]) -> List[Dict[str, A
     """Fetch funding rounds for a company (backend-agnostic: CompanyDataRepo or Supabase fallback)."""
     if not company_id:
         return []
+    batch = _BATCH.get()
+    if batch is not None and company_id in batch.company_ids:
+        return copy.deepcopy(batch.funding_rounds.get(company_id) or [])
     # Try repo first
     try:
         from app.core.adapters import get_company_repo
@@ -416,6 +657,40 @@ async def _extract_funding_rounds(company_id: Optional[str]) -> List[Dict[str, A
     return []
 
 
+async def _pwerm_request(request: ActionExecutionRequest):
+    """ValuationRequest for a PWERM cell (DB company + row inputs)."""
+    from app.services.valuation_engine_service import ValuationMethod, ValuationRequest
+
+    company_id = request.company_id or request.inputs.get('company_id')
+    company_data = await _extract_company_data(company_id)
+    company_data = _merge_company_and_inputs(company_data, request)
+    if not _has_sufficient_valuation_inputs(company_data):
+        raise ValueError("Provide company_id or row inputs (e.g. name, ARR/revenue, sector) to run PWERM")
+    company_stage, last_round_valuation = _valuation_inputs_from_request(request, company_data)
+    revenue = request.inputs.get('revenue') or request.inputs.get('arr') or company_data.get('current_arr_usd') or company_data.get('revenue')
+    growth_rate = request.inputs.get('growth_rate') or company_data.get('growth_rate')
+    return ValuationRequest(
+        company_name=company_data.get('name', 'Unknown'),
+        stage=company_stage,
+        revenue=revenue,
+        growth_rate=growth_rate,
+        last_round_valuation=last_round_valuation,
+        method=ValuationMethod.PWERM,
+        business_model=company_data.get('business_model'),
+        industry=company_data.get('industry') or company_data.get('sector'),
+        category=company_data.get('category'),
+    )
+
+
+def _pwerm_output(result) -> Dict[str, Any]:
+    return {
+        'fair_value': float(result.fair_value) if isinstance(result.fair_value, (int, float)) else result.fair_value,
+        'method_used': result.method_used,
+        'explanation': result.explanation,
+        'confidence': float(result.confidence) if isinstance(result.confidence, (int, float)) else result.confidence,
+    }
+
+
 async def _route_to_service(
     action,
     request: ActionExecutionRequest
@@ -439,33 +714,10 @@ async def _route_to_service(
             )
             if 'pwerm' in action_id:
                 # PWERM: same path as DCF/Auto - ValuationEngineService + ValuationRequest
-                company_id = request.company_id or request.inputs.get('company_id')
-                company_data = await _extract_company_data(company_id)
-                company_data = _merge_company_and_inputs(company_data, request)
-                if not _has_sufficient_valuation_inputs(company_data):
-                    raise ValueError("Provide company_id or row inputs (e.g. name, ARR/revenue, sector) to run PWERM")
-                company_stage, last_round_valuation = _valuation_inputs_from_request(request, company_data)
-                revenue = request.inputs.get('revenue') or request.inputs.get('arr') or company_data.get('current_arr_usd') or company_data.get('revenue')
-                growth_rate = request.inputs.get('growth_rate') or company_data.get('growth_rate')
-                valuation_request = ValuationRequest(
-                    company_name=company_data.get('name', 'Unknown'),
-                    stage=company_stage,
-                    revenue=revenue,
-                    growth_rate=growth_rate,
-                    last_round_valuation=last_round_valuation,
-                    method=ValuationMethod.PWERM,
-                    business_model=company_data.get('business_model'),
-                    industry=company_data.get('industry') or company_data.get('sector'),
-                    category=company_data.get('category'),
-                )
-                engine = ValuationEngineService()
+                valuation_request = await _pwerm_request(request)
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
-                return {
-                    'fair_value': float(result.fair_value) if isinstance(result.fair_value, (int, float)) else result.fair_value,
-                    'method_used': result.method_used,
-                    'explanation': result.explanation,
-                    'confidence': float(result.confidence) if isinstance(result.confidence, (int, float)) else result.confidence,
-                }
+                return _pwerm_output(result)
 
             elif 'dcf' in action_id:
                 # DCF: DB + inputs
@@ -489,7 +741,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -521,7 +773,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -551,7 +803,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -583,7 +835,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -615,7 +867,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -645,7 +897,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -677,7 +929,7 @@ async def _route_to_service(
                     category=company_data.get('category'),
                 )
                 
-                engine = ValuationEngineService()
+                engine = _service_instance(ValuationEngineService)
                 result = await engine.calculate_valuation(valuation_request)
 
                 return {
@@ -2810,6 +3062,8 @@ async def _route_to_service(
                 return svc.runway_sensitivity(
                     company_id=company_id,
                     months=months,
+                    shocks=request.inputs.get('shocks'),
+                    two_way=request.inputs.get('two_way'),
                 )
 
         # -- Auto-Budget -------------------------------------------------------
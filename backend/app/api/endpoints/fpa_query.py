@@ -4,14 +4,18 @@ Natural Language FP&A query processing
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Form
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field
+import asyncio
+import codecs
+import itertools
 import logging
+import os
 import time
 import io
 import csv
 import re
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 # Heavy NL/FPA services — lazy-loaded so the module always imports
 # even if these optional dependencies are missing. The core PnL/upload
@@ -214,6 +218,9 @@ async def upsert_pnl_cell(req: PnlCellEditRequest):
         logger.error("P&L cell upsert failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(row["company_id"])
+
     return {"success": True, "category": req.category, "period": req.period, "amount": req.amount}
 
 
@@ -245,6 +252,10 @@ async def bulk_upsert_pnl_cells(req: BulkPnlWriteRequest):
         logger.error("Bulk P&L upsert failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    from app.services.company_data_pull import invalidate_company_cache
+    for cid in set(r["company_id"] for r in rows):
+        invalidate_company_cache(cid)
+
     # Build grid_commands so frontend can update without re-fetching
     grid_commands = []
     for row in rows:
@@ -321,6 +332,9 @@ async def upsert_bs_cell(req: PnlCellEditRequest):
         logger.error("BS cell upsert failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(row["company_id"])
+
     return {"success": True, "category": req.category, "period": req.period, "amount": req.amount}
 
 
@@ -739,6 +753,8 @@ class LiquidityModelRequest(BaseModel):
 class LiquiditySensitivityRequest(BaseModel):
     company_id: str
     months: int = 24
+    shocks: Optional[List[float]] = None  # e.g. [-0.5, -0.2, -0.1, -0.05, 0.05, 0.1, 0.2, 0.5]
+    two_way: Optional[Union[int, List[List[str]]]] = None  # top-N or category pairs
 
 
 @router.post("/liquidity/model")
@@ -781,17 +797,26 @@ async def build_liquidity_scenarios(request: LiquidityModelRequest):
 
 @router.post("/liquidity/sensitivity")
 async def liquidity_sensitivity(request: LiquiditySensitivityRequest):
-    """Show how runway changes when individual cost lines change by +/-20%.
+    """Show how runway changes when individual cost lines change (+/-20% by default).
 
-    Returns ranked list of which subcategories have the most impact on runway.
+    Returns ranked list of which subcategories have the most impact on runway,
+    a tornado ranking over the shock grid and optional two-way tables.
     """
+    from app.core.tool_executor import tool_executors
     from app.services.liquidity_management_service import LiquidityManagementService
 
     svc = LiquidityManagementService()
-    result = svc.runway_sensitivity(
-        company_id=request.company_id,
-        months=request.months,
-    )
+    try:
+        result = await tool_executors.run(
+            "cpu",
+            svc.runway_sensitivity,
+            company_id=request.company_id,
+            months=request.months,
+            shocks=request.shocks,
+            two_way=request.two_way,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return result
 
 
@@ -1325,21 +1350,13 @@ def _build_parent_id_tree(
     return row_depth
 
 
-def _build_level_column_map(
-    data_rows: List[List[str]], level_col: int
-) -> Dict[int, int]:
-    """Read depth directly from a level/depth column.
-
-    Returns {row_index: depth}.
-    """
-    row_depth: Dict[int, int] = {}
-    for idx, row in enumerate(data_rows):
-        val = row[level_col].strip() if level_col < len(row) else "0"
-        try:
-            row_depth[idx] = int(val)
-        except ValueError:
-            row_depth[idx] = 0
-    return row_depth
+def _row_level(row: List[str], level_col: int) -> int:
+    """Read depth directly from a level/depth column (0 when blank or non-numeric)."""
+    val = row[level_col].strip() if level_col < len(row) else "0"
+    try:
+        return int(val)
+    except ValueError:
+        return 0
 
 
 def _is_separator_row(row: list) -> bool:
@@ -1372,82 +1389,27 @@ def _should_skip_computed(category: str, present_categories: set) -> bool:
 
 # --- Fuzzy category fallback ---
 
-from difflib import SequenceMatcher
-
-_CATEGORY_SYNONYMS = {
-    "revenue": ["revenue", "sales", "income", "turnover", "top line", "gross revenue"],
-    "cogs": ["cost of goods sold", "cost of sales", "direct costs", "cogs", "cost of revenue"],
-    "opex_rd": ["research and development", "r&d", "engineering", "product development", "technology"],
-    "opex_sm": ["sales and marketing", "s&m", "marketing", "commercial", "advertising"],
-    "opex_ga": ["general and administrative", "g&a", "admin", "overhead", "payroll",
-                "salaries", "wages", "compensation", "personnel", "staff costs",
-                "finance legal", "office", "rent", "occupancy", "establishment costs",
-                "premises", "insurance"],
-    "opex_total": ["operating expenses", "opex", "total expenses", "overheads", "indirect costs"],
-    "ebitda": ["ebitda", "operating income", "operating profit"],
-    "gross_profit": ["gross profit", "gross margin"],
-    "net_income": ["net income", "net profit", "net loss", "profit after tax", "pat",
-                   "earnings after tax", "bottom line"],
-    "depreciation": ["depreciation", "amortization", "d&a", "deprec"],
-    "interest_expense": ["interest expense", "finance costs", "debt service"],
-    "tax": ["tax", "income tax", "corporation tax", "provision for tax"],
-    "other_income": ["other income", "non operating income", "interest income", "sundry income"],
-    "ebt": ["profit before tax", "pbt", "earnings before tax", "ebt"],
-    "cash_balance": ["cash balance", "cash in bank", "bank balance", "cash"],
-    "burn_rate": ["burn rate", "monthly burn", "net burn"],
-    "headcount": ["headcount", "employees", "fte", "head count"],
-    "customers": ["customers", "clients"],
-    "arr": ["arr", "annual recurring revenue"],
-    "mrr": ["mrr", "monthly recurring revenue"],
-    # Balance Sheet fuzzy synonyms
-    "bs_cash": ["cash", "cash and cash equivalents", "bank", "bank accounts", "petty cash"],
-    "bs_receivables": ["accounts receivable", "trade debtors", "debtors", "trade receivables"],
-    "bs_inventory": ["inventory", "stock", "stock on hand", "raw materials", "finished goods"],
-    "bs_ppe": ["property plant and equipment", "fixed assets", "pp&e"],
-    "bs_intangibles": ["intangible assets", "goodwill", "patents", "software"],
-    "bs_payables": ["accounts payable", "trade creditors", "creditors", "trade payables"],
-    "bs_accrued_expenses": ["accrued expenses", "accrued liabilities", "accruals"],
-    "bs_deferred_revenue": ["deferred revenue", "unearned revenue", "contract liabilities"],
-    "bs_lt_debt": ["long term debt", "term loans", "bonds payable", "notes payable"],
-    "bs_convertible_notes": ["convertible notes", "convertible debt", "safe", "safe notes"],
-    "bs_lease_liabilities": ["lease liabilities", "finance lease", "operating lease liability"],
-    "bs_share_capital": ["share capital", "common stock", "ordinary shares", "issued capital"],
-    "bs_apic": ["additional paid in capital", "share premium", "capital surplus"],
-    "bs_retained_earnings": ["retained earnings", "accumulated profits", "retained profits"],
-    "bs_treasury_stock": ["treasury stock", "treasury shares", "own shares"],
-    "bs_minority_interest": ["minority interest", "non controlling interest"],
-}
-
-
 def _fuzzy_match_category(label: str, threshold: float = 0.65) -> Optional[tuple]:
-    """Fuzzy match a row label to a category. Returns (category, score) or None."""
-    label_lower = label.lower().strip()
-    best_score = 0.0
-    best_category = None
-
-    for category, synonyms in _CATEGORY_SYNONYMS.items():
-        for synonym in synonyms:
-            score = SequenceMatcher(None, label_lower, synonym).ratio()
-            # Boost if one contains the other
-            if label_lower in synonym or synonym in label_lower:
-                score = max(score, 0.85)
-            if score > best_score:
-                best_score = score
-                best_category = category
-
-    if best_score >= threshold and best_category:
-        return (best_category, round(best_score, 2))
-    return None
+    """Fuzzy match a row label to a category. Returns (category, score) or None.
+
+    Scored against label_classifier.CATEGORY_SYNONYMS through its trigram index.
+    """
+    from app.services.label_classifier import label_classifier
+    return label_classifier.match_category(label, threshold)
 
 
-def _label_to_subcategory(label: str, business_model: str = "saas") -> str:
+def _label_to_subcategory(label: str, business_model: str = "saas", labels=None) -> str:
     """Map a label to a subcategory using business-model-aware taxonomy.
 
-    Tries the classifier first; falls back to snake_case normalization.
+    Tries the classifier first (``labels``, a CompanyLabelMap, when the
+    upload has one); falls back to snake_case normalization.
     """
     try:
-        from app.services.actuals_ingestion import classify_label_to_subcategory
-        _cat, sub = classify_label_to_subcategory(label, business_model)
+        if labels is not None:
+            _cat, sub = labels.subcategory(label)
+        else:
+            from app.services.actuals_ingestion import classify_label_to_subcategory
+            _cat, sub = classify_label_to_subcategory(label, business_model)
         if sub:
             return sub
     except Exception:
@@ -1497,6 +1459,12 @@ _SECTION_TO_PARENT = {
 }
 
 
+_PLAIN_AMOUNT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_CURRENCY_RE = re.compile(r"[$€£¥₹\s]")
+_EUROPEAN_AMOUNT_RE = re.compile(r"^-?[\d.]+,\d{1,2}$")
+_SUFFIXED_AMOUNT_RE = re.compile(r"^(-?[\d.]+)\s*(bn|mm|[BMKbmk])?$", re.I)
+
+
 def _parse_amount(raw: str) -> Optional[float]:
     """Parse a cell value as a number, handling currency, commas, parens, K/M/B/bn/mm, European notation."""
     if not raw:
@@ -1505,6 +1473,10 @@ def _parse_amount(raw: str) -> Optional[float]:
     if not s:
         return None
 
+    # Fast path — most ERP cells are bare numbers
+    if _PLAIN_AMOUNT_RE.fullmatch(s):
+        return float(s)
+
     # Skip percentage values in P&L context
     if s.endswith("%"):
         return None
@@ -1514,17 +1486,17 @@ def _parse_amount(raw: str) -> Optional[float]:
         s = s[1:-1]
 
     # Strip currency symbols and whitespace
-    s = re.sub(r"[$€£¥₹\s]", "", s)
+    s = _CURRENCY_RE.sub("", s)
 
     # Detect European notation: "1.234.567,89" or "1.234,56"
     # Pattern: dots as thousand separators + comma as decimal
-    if re.match(r"^-?[\d.]+,\d{1,2}$", s):
+    if _EUROPEAN_AMOUNT_RE.match(s):
         s = s.replace(".", "").replace(",", ".")
     else:
         s = s.replace(",", "")
 
     # Match number with optional suffix
-    m = re.match(r"^(-?[\d.]+)\s*(bn|mm|[BMKbmk])?$", s, re.I)
+    m = _SUFFIXED_AMOUNT_RE.match(s)
     if not m:
         return None
     val = float(m.group(1))
@@ -1538,11 +1510,806 @@ def _parse_amount(raw: str) -> Optional[float]:
     return -val if neg else val
 
 
+def _resolve_period_columns(headers: List[str]) -> Tuple[Dict[int, List[tuple]], List[str]]:
+    """Map header index → [(period, divisor), ...] for every period column.
+
+    Bare month names get their year inferred, and annual/quarterly columns
+    are dropped when monthly columns already cover their periods — they
+    would overwrite the precise monthly values with averaged totals in
+    dedup. Returns (period_cols, warnings).
+    """
+    warnings: List[str] = []
+    # Try standard: col headers are periods
+    period_cols: Dict[int, List[tuple]] = {}  # col_index → [(period, divisor), ...]
+    for i, h in enumerate(headers):
+        if i == 0:
+            continue
+        periods = _parse_period_header(h)
+        if periods:
+            period_cols[i] = periods
+
+    # Fallback: if only 0-1 period columns detected, check for bare month names
+    # (e.g. "January", "Feb") and infer year from context
+    period_cols = _infer_year_for_month_headers(headers, period_cols)
+
+    monthly_periods = set()
+    for tuples in period_cols.values():
+        for period, divisor in tuples:
+            if divisor == 1:
+                monthly_periods.add(period)
+
+    if monthly_periods:
+        cols_to_remove = []
+        for col_idx, tuples in period_cols.items():
+            if any(d > 1 for _, d in tuples):
+                # This is an aggregate column — check if its periods overlap with monthly
+                expanded = {p for p, _ in tuples}
+                if expanded & monthly_periods:
+                    cols_to_remove.append(col_idx)
+                    logger.info(
+                        "[upload-actuals] Dropping aggregate column %d (%s) — "
+                        "monthly columns already cover %d of its %d periods",
+                        col_idx, headers[col_idx] if col_idx < len(headers) else f"col{col_idx}",
+                        len(expanded & monthly_periods), len(expanded),
+                    )
+        for col_idx in cols_to_remove:
+            del period_cols[col_idx]
+            warnings.append(f"Skipped aggregate column '{headers[col_idx]}' — monthly data takes priority")
+
+    return period_cols, warnings
+
+
+def _company_business_model(sb, company_id: str) -> str:
+    """companies.category drives the subcategory taxonomy; "saas" when unknown."""
+    try:
+        _co = sb.table("companies").select("category").eq("id", company_id).limit(1).execute()
+        if _co.data and _co.data[0].get("category"):
+            return _co.data[0]["category"]
+    except Exception:
+        pass
+    return "saas"
+
+
+class _ActualsRowClassifier:
+    """Passes 1 and 1.5 of the upload pipeline, one data row at a time.
+
+    Carries the sequential state (current section, hierarchy path stack) so
+    the buffered and streaming uploads classify rows identically. With
+    ``max_notes`` set, label/warning lists are deduped and capped — a
+    streamed GL export would otherwise grow one note per row.
+    """
+
+    def __init__(
+        self,
+        hierarchy_info: Dict[str, Any],
+        period_cols: Dict[int, List[tuple]],
+        business_model: str = "saas",
+        row_depth_map: Optional[Dict[int, int]] = None,
+        acct_parent_map: Optional[Dict[int, int]] = None,
+        warnings: Optional[List[str]] = None,
+        max_notes: Optional[int] = None,
+        labels: Any = None,
+    ):
+        self.hierarchy_info = hierarchy_info
+        self.strategy = hierarchy_info["strategy"]
+        self.period_cols = period_cols
+        self.business_model = business_model
+        self.row_depth_map = row_depth_map or {}
+        self.acct_parent_map = acct_parent_map or {}
+        self.max_notes = max_notes
+        self.labels = labels    # CompanyLabelMap — learned per-company mappings
+        self.warnings = warnings if warnings is not None else []
+        self.mapped_categories: List[Dict[str, Any]] = []
+        self.unmapped_labels: List[str] = []
+        self.subcategories_created: List[str] = []
+        self.skipped_empty = 0
+        self.skipped_separators = 0
+        self.current_section_parent: Optional[str] = None
+        self._path_stack: List[tuple] = []
+        # account_number strategy reads a parent row's category — keep just those
+        self._parent_rows = set(self.acct_parent_map.values())
+        self._parent_categories: Dict[int, Optional[str]] = {}
+        self._subcategories_seen: set = set()
+        self._noted: set = set()
+
+    def classify(self, idx_row: int, row: List[str]) -> Dict[str, Any]:
+        info = self._classify(idx_row, row)
+        if idx_row in self._parent_rows:
+            self._parent_categories[idx_row] = info.get("category")
+        self._assign_hierarchy_path(info)
+        return info
+
+    def note(self, notes: list, value: Any, key: Any = None) -> None:
+        """Append to a response list, deduped and capped when max_notes is set."""
+        if self.max_notes is None:
+            notes.append(value)
+            return
+        marker = (id(notes), value if key is None else key)
+        if len(notes) < self.max_notes and marker not in self._noted:
+            self._noted.add(marker)
+            notes.append(value)
+
+    def _add_subcategory(self, name: str) -> None:
+        if name and name not in self._subcategories_seen:
+            self._subcategories_seen.add(name)
+            self.subcategories_created.append(name)
+
+    def _fuzzy(self, label: str) -> Optional[tuple]:
+        if self.labels is not None:
+            return self.labels.match_category(label)
+        return _fuzzy_match_category(label)
+
+    def _subcategory(self, label: str) -> str:
+        return _label_to_subcategory(label, self.business_model, self.labels)
+
+    def _has_amounts(self, row: List[str]) -> bool:
+        return any(
+            _parse_amount(row[ci]) is not None
+            for ci in self.period_cols
+            if ci < len(row)
+        )
+
+    def _classify(self, idx_row: int, row: List[str]) -> Dict[str, Any]:
+        if not row:
+            self.skipped_empty += 1
+            return {"skip": "empty"}
+
+        if _is_separator_row(row):
+            self.skipped_separators += 1
+            return {"skip": "separator"}
+
+        if self.strategy == "explicit_subcategory":
+            return self._classify_explicit(row)
+
+        # --- Non-explicit strategies (indent, account_number, etc.) ---
+        label_col_idx = self.hierarchy_info.get("label_col", 0) if self.strategy != "indent" else 0
+        raw_label = row[label_col_idx] if label_col_idx < len(row) else (row[0] if row else "")
+        if not raw_label.strip():
+            self.skipped_empty += 1
+            return {"skip": "empty"}
+
+        if self.strategy == "level_column":
+            depth = _row_level(row, self.hierarchy_info["level_col"])
+            cleaned, _, original = _clean_label(raw_label)
+        elif self.strategy != "indent":
+            depth = self.row_depth_map.get(idx_row, 0)
+            cleaned, _, original = _clean_label(raw_label)
+        else:
+            cleaned, depth, original = _clean_label(raw_label)
+
+        has_amounts = self._has_amounts(row)
+
+        info = {
+            "skip": None,
+            "raw_label": raw_label,
+            "cleaned": cleaned,
+            "depth": depth,
+            "original": original,
+            "category": None,
+            "subcategory": None,
+            "match_type": None,
+            "is_section_header": False,
+            "has_amounts": has_amounts,
+        }
+
+        if depth == 0:
+            cat = _match_category(cleaned)
+            if cat:
+                info["category"] = cat
+                info["match_type"] = "regex"
+                self.current_section_parent = _SECTION_TO_PARENT.get(cat)
+                if not has_amounts and cat in _SECTION_TO_PARENT:
+                    info["is_section_header"] = True
+            else:
+                cat = _match_category(original)
+                if cat:
+                    info["category"] = cat
+                    info["match_type"] = "regex"
+                    self.current_section_parent = _SECTION_TO_PARENT.get(cat)
+                    if not has_amounts and cat in _SECTION_TO_PARENT:
+                        info["is_section_header"] = True
+                else:
+                    for pat, sec_cat in _SECTION_HEADER_PATTERNS:
+                        if pat.search(cleaned):
+                            info["is_section_header"] = True
+                            self.current_section_parent = _SECTION_TO_PARENT.get(sec_cat, sec_cat)
+                            break
+
+                    if not info["is_section_header"]:
+                        fuzzy = self._fuzzy(cleaned)
+                        if fuzzy:
+                            info["category"] = fuzzy[0]
+                            info["match_type"] = f"fuzzy ({fuzzy[1]})"
+                            self.note(self.warnings, f"Fuzzy-matched '{original}' → {fuzzy[0]} (score: {fuzzy[1]})")
+                            self.current_section_parent = _SECTION_TO_PARENT.get(fuzzy[0])
+                        else:
+                            info["skip"] = "unmapped"
+                            self.note(self.unmapped_labels, original)
+
+        elif self.strategy == "account_number" and self.acct_parent_map:
+            # --- account_number strategy: use parent_map for category ---
+            parent_idx = self.acct_parent_map.get(idx_row)
+            parent_cat = self._parent_categories.get(parent_idx) if parent_idx is not None else None
+            if not parent_cat:
+                parent_cat = _match_category(cleaned) or self.current_section_parent
+
+            if parent_cat:
+                acct_col = self.hierarchy_info["account_col"]
+                lbl_col = self.hierarchy_info.get("label_col", 0)
+                if lbl_col != acct_col:
+                    # Text label column available — use it
+                    sub_name = self._subcategory(original)
+                else:
+                    # Label IS the account code — use code as-is
+                    sub_name = original.strip()
+                info["category"] = parent_cat
+                info["subcategory"] = sub_name
+                info["match_type"] = "hierarchy"
+                self._add_subcategory(sub_name)
+            else:
+                info["skip"] = "unmapped"
+                self.note(self.unmapped_labels, original)
+
+        else:
+            # --- indent / other strategies ---
+            cat = _match_category(cleaned)
+            if cat and cat != self.current_section_parent:
+                info["category"] = cat
+                info["match_type"] = "regex"
+            elif cat and cat == self.current_section_parent:
+                sub_name = self._subcategory(original)
+                if sub_name:
+                    info["category"] = cat
+                    info["subcategory"] = sub_name
+                    info["match_type"] = "hierarchy"
+                    self._add_subcategory(sub_name)
+                else:
+                    info["category"] = cat
+                    info["match_type"] = "regex"
+            else:
+                fuzzy = self._fuzzy(cleaned)
+                if fuzzy and fuzzy[0] != self.current_section_parent:
+                    info["category"] = fuzzy[0]
+                    info["match_type"] = f"fuzzy ({fuzzy[1]})"
+                    self.note(self.warnings, f"Fuzzy-matched '{original}' → {fuzzy[0]} (score: {fuzzy[1]})")
+                elif self.current_section_parent:
+                    sub_name = self._subcategory(original)
+                    if sub_name:
+                        info["category"] = self.current_section_parent
+                        info["subcategory"] = sub_name
+                        info["match_type"] = "hierarchy"
+                        self._add_subcategory(sub_name)
+                else:
+                    info["skip"] = "unmapped"
+                    self.note(self.unmapped_labels, original)
+
+        return info
+
+    def _classify_explicit(self, row: List[str]) -> Dict[str, Any]:
+        """CSV has named Category + Subcategory columns (e.g. "Revenue", "DOE Grants")."""
+        cat_col_idx = self.hierarchy_info["category_col"]
+        sub_col_idx = self.hierarchy_info["subcategory_col"]
+        raw_cat = row[cat_col_idx].strip() if cat_col_idx < len(row) else ""
+        raw_sub = row[sub_col_idx].strip() if sub_col_idx < len(row) else ""
+
+        if not raw_cat:
+            self.skipped_empty += 1
+            return {"skip": "empty"}
+
+        has_amounts = self._has_amounts(row)
+        cleaned_cat, _, original_cat = _clean_label(raw_cat)
+
+        # Match the category column against known P&L categories
+        # (No unconditional skip — Pass 2 handles computed row dedup
+        # conditionally. Rows like Gross Profit, Net Loss are real metrics.)
+        cat = _match_category(cleaned_cat) or _match_category(original_cat)
+        if not cat:
+            fuzzy = self._fuzzy(cleaned_cat)
+            if fuzzy:
+                cat = fuzzy[0]
+                self.note(self.warnings, f"Fuzzy-matched '{original_cat}' → {cat} (score: {fuzzy[1]})")
+            elif self.current_section_parent:
+                # Category like "Other" doesn't match directly but section
+                # header "Other Income / (Expense)" set current_section_parent
+                cat = self.current_section_parent
+            else:
+                self.note(self.unmapped_labels, f"{raw_cat}: {raw_sub}" if raw_sub else raw_cat)
+                return {"skip": "unmapped", "raw_label": raw_cat}
+
+        # Determine subcategory — use the explicit column value
+        sub_name = raw_sub if raw_sub else None
+        depth = 1 if sub_name else 0
+
+        # Section header: category with no subcategory and no amounts
+        is_section_hdr = (not sub_name and not has_amounts)
+
+        # Track section context for child rows
+        if is_section_hdr:
+            self.current_section_parent = cat
+        elif not sub_name:
+            # Standalone metric row (Gross Profit, Net Loss, etc.) — reset section
+            self.current_section_parent = _SECTION_TO_PARENT.get(cat)
+
+        h_path = f"{cat}/{sub_name}" if sub_name else cat
+
+        if sub_name:
+            self._add_subcategory(sub_name)
+        if not is_section_hdr:
+            entry = {
+                "label": f"{raw_cat} / {raw_sub}" if raw_sub else raw_cat,
+                "category": cat,
+                "match": "explicit_subcategory",
+                **({"subcategory": sub_name} if sub_name else {}),
+            }
+            self.note(self.mapped_categories, entry, key=(entry["label"], cat, sub_name))
+
+        return {
+            "skip": None,
+            "raw_label": raw_cat,
+            "cleaned": cleaned_cat,
+            "depth": depth,
+            "original": f"{original_cat}: {raw_sub}" if raw_sub else original_cat,
+            "category": cat if not is_section_hdr else None,
+            "subcategory": sub_name,
+            "match_type": "explicit_subcategory" if sub_name else "regex",
+            "is_section_header": is_section_hdr,
+            "has_amounts": has_amounts,
+            "hierarchy_path": h_path if not is_section_hdr else "",
+        }
+
+    def _assign_hierarchy_path(self, info: Dict[str, Any]) -> None:
+        """Pass 1.5: build hierarchy_path from the path stack (kept if already set)."""
+        if info.get("hierarchy_path"):
+            return  # already set (e.g. explicit_subcategory strategy)
+        if info.get("skip"):
+            info["hierarchy_path"] = ""
+            return
+        if info.get("is_section_header"):
+            self._path_stack = []
+            info["hierarchy_path"] = ""
+            return
+
+        depth = info.get("depth", 0)
+        segment = info.get("subcategory") or info.get("category") or ""
+
+        while self._path_stack and self._path_stack[-1][0] >= depth:
+            self._path_stack.pop()
+
+        self._path_stack.append((depth, segment))
+        info["hierarchy_path"] = "/".join(p[1] for p in self._path_stack if p[1])
+
+
+# ---------------------------------------------------------------------------
+# Streaming upload — large GL exports
+# ---------------------------------------------------------------------------
+# Files at or above _STREAM_UPLOAD_MIN_BYTES (or any file with stream=true)
+# are parsed straight off the spooled upload in batches of
+# _STREAM_BATCH_ROWS rows, classified with the same _ActualsRowClassifier
+# and COPYed into a staging table by ActualsBulkWriter. Computed-row
+# skipping (pass 2) needs the full category set, so it is applied in the
+# final merge instead of per row.
+
+_STREAM_UPLOAD_MIN_BYTES = int(os.getenv("FPA_UPLOAD_STREAM_MIN_BYTES", str(4 * 1024 * 1024)))
+_STREAM_BATCH_ROWS = int(os.getenv("FPA_UPLOAD_STREAM_BATCH_ROWS", "5000"))
+_STREAM_READ_BYTES = 1 << 20
+_STREAM_MAX_NOTES = 200            # cap on unmapped labels / warnings / mapped entries
+_STREAM_PROGRESS_INTERVAL_S = 1.0
+_HIERARCHY_SNIFF_ROWS = 30         # rows _detect_hierarchy_columns looks at
+_UPLOAD_UPSERT_CHUNK = 1000        # rows per fpa_actuals upsert on the buffered path
+
+
+def _replace_csv_actuals(sb, company_id: str, rows: List[Dict[str, Any]]) -> None:
+    """Replace the company's csv_upload actuals for the periods in ``rows``.
+
+    Buffered-path counterpart of ActualsBulkWriter's REST flush: one delete
+    across all periods, then upserts in _UPLOAD_UPSERT_CHUNK-row chunks.
+    Blocking — run it through tool_executors.
+    """
+    periods = sorted({r["period"] for r in rows})
+    if periods:
+        sb.table("fpa_actuals") \
+            .delete() \
+            .eq("company_id", company_id) \
+            .eq("source", "csv_upload") \
+            .in_("period", periods) \
+            .execute()
+    for i in range(0, len(rows), _UPLOAD_UPSERT_CHUNK):
+        sb.table("fpa_actuals").upsert(
+            rows[i:i + _UPLOAD_UPSERT_CHUNK],
+            on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
+        ).execute()
+
+
+class _UploadRejected(Exception):
+    """A streamed upload failed validation at ``step`` (→ 400, job failed)."""
+
+    def __init__(self, step: str, message: str):
+        super().__init__(message)
+        self.step = step
+
+
+def _iter_csv_rows(fileobj, dialect: Any = "excel") -> Iterator[List[str]]:
+    """Decode and parse a binary upload incrementally, dropping blank rows."""
+    fileobj.seek(0)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def lines() -> Iterator[str]:
+        pending = ""
+        while True:
+            chunk = fileobj.read(_STREAM_READ_BYTES)
+            text = pending + decoder.decode(chunk, final=not chunk)
+            if not chunk:
+                if text:
+                    yield text
+                return
+            parts = text.split("\n")
+            pending = parts.pop()
+            for part in parts:
+                yield part + "\n"
+
+    for row in csv.reader(lines(), dialect):
+        if any(cell.strip() for cell in row):
+            yield row
+
+
+def _sniff_dialect(fileobj) -> Any:
+    """Delimiter auto-detect on the first 4KB — handles ; and tab exports."""
+    fileobj.seek(0)
+    sample = fileobj.read(4096).decode("utf-8-sig", errors="ignore")
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        return "excel"
+
+
+class _StreamingActualsParser:
+    """Incremental version of the upload pipeline over a seekable binary file.
+
+    ``open()`` finds the header and orientation; each ``next_batch()`` call
+    classifies up to ``_STREAM_BATCH_ROWS`` rows and returns writer records
+    ``(period, category, subcategory, hierarchy_path, amount)``. Only
+    per-category tallies are kept between batches. Not thread-safe — run
+    one call at a time.
+    """
+
+    def __init__(self, fileobj, business_model: str = "saas", labels: Any = None):
+        self.fileobj = fileobj
+        self.business_model = business_model
+        self.labels = labels
+        self.step = "validating"
+        self.dialect: Any = "excel"
+        self.headers: List[str] = []
+        self.period_cols: Dict[int, List[tuple]] = {}
+        self.cat_cols: Dict[int, str] = {}
+        self.is_transposed = False
+        self.warnings: List[str] = []
+        self.rows_read = 0
+        self.classifier: Optional[_ActualsRowClassifier] = None
+        self._rows: Iterator[List[str]] = iter(())
+        self._header_offset = 0
+        self._period_dates: Dict[str, date] = {}
+        self._unmapped: List[str] = []          # transposed only
+        self._skipped = {"empty": 0, "separators": 0}   # transposed only
+        # pass 2 inputs, tallied as rows stream past
+        self._present: set = set()
+        self._periods_by_category: Dict[str, set] = {}
+        self._computed_labels: Dict[str, List[str]] = {}
+        self._mapped_rows: List[Dict[str, Any]] = []
+        self._multi_month = False
+
+    # -- setup -------------------------------------------------------------
+
+    def open(self) -> None:
+        self.dialect = _sniff_dialect(self.fileobj)
+        rows = _iter_csv_rows(self.fileobj, self.dialect)
+
+        # Skip ERP metadata rows (company name, report title, date range):
+        # the header is the first row with anything past the first cell.
+        header = None
+        for row in rows:
+            self._header_offset += 1
+            if any(c.strip() for c in row[1:]):
+                header = row
+                break
+        if header is None:
+            raise _UploadRejected("validating", "CSV needs at least a header row and one data row")
+        if self._header_offset > 1:
+            logger.info("[upload-actuals] Skipped %d ERP metadata row(s) before header", self._header_offset - 1)
+
+        self.step = "parsing_headers"
+        self.headers = [h.strip() for h in header]
+        self.period_cols, self.warnings = _resolve_period_columns(self.headers)
+        sample = list(itertools.islice(rows, _HIERARCHY_SNIFF_ROWS))
+        if not sample:
+            raise _UploadRejected("validating", "CSV needs at least a header row and one data row")
+
+        if not self.period_cols:
+            self.cat_cols = {
+                i: cat for i, h in enumerate(self.headers)
+                if i and (cat := _match_category(h))
+            }
+            if not self.cat_cols:
+                raise _UploadRejected("parsing_headers", (
+                    "Could not detect period columns or category columns. "
+                    "Expected either periods as columns (Jan-25, Q1 2026, FY2025...) "
+                    "or categories as columns (Revenue, COGS...)."
+                ))
+            self.is_transposed = True
+            self._rows = itertools.chain(sample, rows)
+            return
+
+        hierarchy_info = _detect_hierarchy_columns(self.headers, sample)
+        strategy = hierarchy_info["strategy"]
+        row_depth_map: Dict[int, int] = {}
+        acct_parent_map: Dict[int, int] = {}
+        if strategy in ("account_number", "parent_id"):
+            # Both trees need every account code up front: one narrow pre-scan
+            # of the code column(s), then rewind to the first data row.
+            acct_col = hierarchy_info["account_col"]
+            if strategy == "account_number":
+                codes = [[_cell(r, acct_col)] for r in itertools.chain(sample, rows)]
+                row_depth_map, acct_parent_map = _build_account_number_tree(codes, 0, 0)
+            else:
+                parent_col = hierarchy_info["parent_col"]
+                codes = [[_cell(r, acct_col), _cell(r, parent_col)] for r in itertools.chain(sample, rows)]
+                row_depth_map = _build_parent_id_tree(codes, 0, 1)
+            del codes
+            rows = _iter_csv_rows(self.fileobj, self.dialect)
+            self._rows = itertools.islice(rows, self._header_offset, None)
+        else:
+            self._rows = itertools.chain(sample, rows)
+
+        if strategy != "indent":
+            self.warnings.append(f"Detected ERP hierarchy format: {strategy}")
+        self.classifier = _ActualsRowClassifier(
+            hierarchy_info, self.period_cols, self.business_model,
+            row_depth_map=row_depth_map, acct_parent_map=acct_parent_map,
+            warnings=self.warnings, max_notes=_STREAM_MAX_NOTES, labels=self.labels,
+        )
+
+    # -- batches -----------------------------------------------------------
+
+    def next_batch(self) -> Tuple[List[tuple], bool]:
+        """Classify the next rows; returns (records, exhausted)."""
+        self.step = "extracting_amounts"
+        records: List[tuple] = []
+        batch = list(itertools.islice(self._rows, _STREAM_BATCH_ROWS))
+        for row in batch:
+            if self.is_transposed:
+                self._transposed_row(row, records)
+            else:
+                self._standard_row(self.rows_read, row, records)
+            self.rows_read += 1
+        return records, len(batch) < _STREAM_BATCH_ROWS
+
+    def _period_date(self, period: str) -> date:
+        d = self._period_dates.get(period)
+        if d is None:
+            d = self._period_dates[period] = date.fromisoformat(f"{period}-01")
+        return d
+
+    def _tally(self, category: str, period: str) -> None:
+        self._periods_by_category.setdefault(category, set()).add(period)
+
+    def _standard_row(self, idx: int, row: List[str], records: List[tuple]) -> None:
+        ri = self.classifier.classify(idx, row)
+        category = ri.get("category")
+        if ri.get("skip") or not category:
+            return
+        self._present.add(category)
+        if ri.get("is_section_header"):
+            return
+        if category in _COMPUTED_DEPENDENCIES:
+            labels = self._computed_labels.setdefault(category, [])
+            if len(labels) < _STREAM_MAX_NOTES:
+                labels.append(ri.get("original", category))
+
+        subcategory = ri.get("subcategory") or ""
+        entry = {"label": ri.get("original", ""), "category": category, "match": ri.get("match_type", "regex")}
+        if subcategory:
+            entry["subcategory"] = subcategory
+        self.classifier.note(self._mapped_rows, entry, key=(entry["label"], category, subcategory))
+
+        hierarchy_path = ri.get("hierarchy_path") or (f"{category}/{subcategory}" if subcategory else category)
+        for col_idx, period_tuples in self.period_cols.items():
+            if col_idx >= len(row):
+                continue
+            amount = _parse_amount(row[col_idx])
+            if amount is None:
+                continue
+            for period, divisor in period_tuples:
+                if divisor > 1:
+                    self._multi_month = True
+                records.append((self._period_date(period), category, subcategory, hierarchy_path, amount / divisor))
+                self._tally(category, period)
+
+    def _transposed_row(self, row: List[str], records: List[tuple]) -> None:
+        if not row[0].strip():
+            self._skipped["empty"] += 1
+            return
+        if _is_separator_row(row):
+            self._skipped["separators"] += 1
+            return
+        periods = _parse_period_header(row[0].strip())
+        if not periods:
+            if len(self._unmapped) < _STREAM_MAX_NOTES and row[0].strip() not in self._unmapped:
+                self._unmapped.append(row[0].strip())
+            return
+        for col_idx, category in self.cat_cols.items():
+            if col_idx >= len(row):
+                continue
+            amount = _parse_amount(row[col_idx])
+            if amount is None:
+                continue
+            for period, divisor in periods:
+                if divisor > 1:
+                    self._multi_month = True
+                records.append((self._period_date(period), category, "", category, amount / divisor))
+                self._tally(category, period)
+
+    # -- summary -----------------------------------------------------------
+
+    def finish(self) -> Dict[str, Any]:
+        """Pass 2 over the tallies: computed categories to drop, plus the response lists."""
+        if self.is_transposed:
+            skip: set = set()
+            mapped = [{"label": self.headers[i], "category": c, "match": "regex"} for i, c in self.cat_cols.items()]
+            unmapped = self._unmapped
+            subcategories: List[str] = []
+            skipped = dict(self._skipped)
+        else:
+            skip = {c for c in self._present if _should_skip_computed(c, self._present)}
+            mapped = self.classifier.mapped_categories + [
+                e for e in self._mapped_rows if e["category"] not in skip
+            ]
+            unmapped = self.classifier.unmapped_labels
+            subcategories = self.classifier.subcategories_created
+            skipped = {"empty": self.classifier.skipped_empty, "separators": self.classifier.skipped_separators}
+        skipped["computed"] = [label for c in sorted(skip) for label in self._computed_labels.get(c, [])]
+
+        kept = {c: ps for c, ps in self._periods_by_category.items() if c not in skip}
+        warnings = list(self.warnings)
+        if self._multi_month:
+            warnings.append("Quarterly/annual amounts divided evenly across constituent months")
+        return {
+            "skip_categories": skip,
+            "periods": sorted({p for ps in kept.values() for p in ps}),
+            "categories": sorted(kept),
+            "mapped_categories": mapped,
+            "unmapped_labels": unmapped,
+            "subcategories_created": subcategories,
+            "skipped_rows": skipped,
+            "warnings": warnings,
+        }
+
+    def period_columns_debug(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "column": col_idx,
+                "header": self.headers[col_idx] if col_idx < len(self.headers) else f"col{col_idx}",
+                "periods": [{"period": p, "divisor": d} for p, d in tuples],
+            }
+            for col_idx, tuples in sorted(self.period_cols.items())
+        ]
+
+
+def _cell(row: List[str], col: int) -> str:
+    return row[col].strip() if col < len(row) else ""
+
+
+async def _stream_upload_actuals(
+    sb,
+    file: UploadFile,
+    company_id: str,
+    fund_id: Optional[str],
+    job_id: Optional[str],
+    update_job: Callable[[dict], None],
+) -> Dict[str, Any]:
+    """Streaming ingestion: constant-memory parse + COPY/merge (see section note)."""
+    from app.core.tool_executor import tool_executors
+    from app.services.actuals_ingestion import ActualsBulkWriter
+    from app.services.label_classifier import CompanyLabelMap
+
+    async def progress(updates: dict) -> None:
+        await tool_executors.run("io", update_job, updates)
+
+    business_model = await tool_executors.run("io", _company_business_model, sb, company_id)
+    labels = await tool_executors.run("io", CompanyLabelMap(company_id, business_model).load)
+    parser = _StreamingActualsParser(file.file, business_model, labels)
+    pending: Optional[asyncio.Future] = None
+    try:
+        await tool_executors.run("io", parser.open)
+        await progress({
+            "step": "detecting_categories",
+            "message": f"Detected {'transposed' if parser.is_transposed else 'standard'} orientation, streaming rows",
+        })
+
+        async with ActualsBulkWriter(company_id, fund_id) as writer:
+            # Parse batch N+1 on the cpu pool while batch N is being COPYed
+            pending = asyncio.ensure_future(tool_executors.run("cpu", parser.next_batch))
+            last_report = time.monotonic()
+            while True:
+                records, exhausted = await pending
+                pending = None if exhausted else asyncio.ensure_future(tool_executors.run("cpu", parser.next_batch))
+                await writer.write(records)
+                if exhausted:
+                    break
+                if time.monotonic() - last_report >= _STREAM_PROGRESS_INTERVAL_S:
+                    last_report = time.monotonic()
+                    await progress({
+                        "step": "extracting_amounts",
+                        "message": f"Read {parser.rows_read:,} rows, staged {writer.staged:,} values",
+                    })
+
+            summary = parser.finish()
+            if not summary["categories"]:
+                unmapped = summary["unmapped_labels"]
+                raise _UploadRejected("extracting_amounts", (
+                    f"No valid data rows found after parsing. Unmapped labels: {unmapped[:10]}"
+                    if unmapped else "No valid data rows found after parsing"
+                ))
+
+            await progress({
+                "step": "upserting",
+                "message": f"Merging {writer.staged:,} staged values into fpa_actuals",
+            })
+            ingested = await writer.merge(summary["skip_categories"])
+            backend = writer.backend
+        await tool_executors.run("io", labels.save)
+    except _UploadRejected as e:
+        update_job({
+            "status": "failed",
+            "step": e.step,
+            "error": str(e),
+            "completed_at": datetime.utcnow().isoformat(),
+        })
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+    logger.info(
+        "[upload-actuals] Streamed %d rows → %d values for %s via %s",
+        parser.rows_read, ingested, company_id, backend,
+    )
+    update_job({
+        "status": "completed",
+        "step": "completed",
+        "message": f"Ingested {ingested} rows across {len(summary['periods'])} periods",
+        "rows_ingested": ingested,
+        "periods_found": summary["periods"],
+        "categories_found": summary["categories"],
+        "mapped_categories": summary["mapped_categories"],
+        "unmapped_labels": summary["unmapped_labels"],
+        "warnings": summary["warnings"],
+        "skipped": summary["skipped_rows"],
+        "completed_at": datetime.utcnow().isoformat(),
+    })
+
+    return {
+        "ingested": ingested,
+        "job_id": job_id,
+        "periods": summary["periods"],
+        "categories": summary["categories"],
+        "subcategories_created": summary["subcategories_created"],
+        "mapped_categories": summary["mapped_categories"],
+        "unmapped_labels": summary["unmapped_labels"],
+        "skipped_rows": summary["skipped_rows"],
+        "warnings": summary["warnings"],
+        # one command per value would defeat the point; the grid refetches
+        "grid_commands": [],
+        "period_columns": parser.period_columns_debug(),
+        "streamed": True,
+        "rows_read": parser.rows_read,
+    }
+
+
 @router.post("/upload-actuals")
 async def upload_actuals_csv(
     company_id: str = Form(...),
     fund_id: Optional[str] = Form(None),
     file: UploadFile = File(...),
+    stream: Optional[bool] = Form(None),
 ):
     """
     Upload a P&L-style CSV and ingest into fpa_actuals.
@@ -1557,9 +2324,15 @@ async def upload_actuals_csv(
 
     State-tracked: creates an fpa_upload_jobs record that transitions through
     pending → processing → completed/failed so failures are never a black box.
+
+    Streaming: files of FPA_UPLOAD_STREAM_MIN_BYTES or more (or stream=true)
+    are parsed in bounded batches and COPY-merged through the asyncpg pool in
+    constant memory; progress is written to the job's step/message as rows
+    stream. The response omits per-value grid_commands in that mode. Smaller
+    files are parsed in memory and written off the event loop with a single
+    delete across the uploaded periods plus chunked upserts.
     """
     from app.core.supabase_client import get_supabase_client
-    from datetime import datetime
 
     sb = get_supabase_client()
     if not sb:
@@ -1597,6 +2370,9 @@ async def upload_actuals_csv(
             "message": "Reading and validating CSV",
         })
 
+        if stream if stream is not None else (file.size or 0) >= _STREAM_UPLOAD_MIN_BYTES:
+            return await _stream_upload_actuals(sb, file, company_id, fund_id, job_id, _update_job)
+
         content = await file.read()
         text = content.decode("utf-8-sig")  # handle BOM
         # Auto-detect delimiter — handles Swedish/European (;) and tab-separated files
@@ -1650,46 +2426,7 @@ async def upload_actuals_csv(
         _update_job({"step": "parsing_headers", "message": f"Parsing {len(headers)} columns, {len(data_rows)} rows"})
 
         # --- Detect orientation & parse period columns ---
-        # Try standard: col headers are periods
-        period_cols: Dict[int, List[tuple]] = {}  # col_index → [(period, divisor), ...]
-        for i, h in enumerate(headers):
-            if i == 0:
-                continue
-            periods = _parse_period_header(h)
-            if periods:
-                period_cols[i] = periods
-
-        # Fallback: if only 0-1 period columns detected, check for bare month names
-        # (e.g. "January", "Feb") and infer year from context
-        period_cols = _infer_year_for_month_headers(headers, period_cols)
-
-        # --- Remove redundant aggregate columns (FY/quarterly) when monthly data exists ---
-        # If we have monthly columns (divisor=1) for specific periods, drop any
-        # annual/quarterly columns (divisor>1) whose periods overlap — they would
-        # overwrite the precise monthly values with averaged totals in dedup.
-        monthly_periods = set()
-        for tuples in period_cols.values():
-            for period, divisor in tuples:
-                if divisor == 1:
-                    monthly_periods.add(period)
-
-        if monthly_periods:
-            cols_to_remove = []
-            for col_idx, tuples in period_cols.items():
-                if any(d > 1 for _, d in tuples):
-                    # This is an aggregate column — check if its periods overlap with monthly
-                    expanded = {p for p, _ in tuples}
-                    if expanded & monthly_periods:
-                        cols_to_remove.append(col_idx)
-                        logger.info(
-                            "[upload-actuals] Dropping aggregate column %d (%s) — "
-                            "monthly columns already cover %d of its %d periods",
-                            col_idx, headers[col_idx] if col_idx < len(headers) else f"col{col_idx}",
-                            len(expanded & monthly_periods), len(expanded),
-                        )
-            for col_idx in cols_to_remove:
-                del period_cols[col_idx]
-                warnings.append(f"Skipped aggregate column '{headers[col_idx]}' — monthly data takes priority")
+        period_cols, warnings = _resolve_period_columns(headers)
 
         is_transposed = False
         cat_cols: Dict[int, str] = {}
@@ -1740,7 +2477,6 @@ async def upload_actuals_csv(
         # --- Tracking for detailed response ---
         mapped_categories = []
         unmapped_labels = []
-        warnings = []
         skipped_separators = 0
         skipped_computed = []
         skipped_empty = 0
@@ -1800,285 +2536,29 @@ async def upload_actuals_csv(
                 row_depth_map = _build_parent_id_tree(
                     data_rows, hierarchy_info["account_col"], hierarchy_info["parent_col"]
                 )
-            elif hierarchy_info["strategy"] == "level_column":
-                row_depth_map = _build_level_column_map(
-                    data_rows, hierarchy_info["level_col"]
-                )
 
             if hierarchy_info["strategy"] != "indent":
                 warnings.append(f"Detected ERP hierarchy format: {hierarchy_info['strategy']}")
 
             # Look up company's business model for taxonomy-aware classification
-            _biz_model = "saas"
-            try:
-                _co = sb.table("companies").select("category").eq("id", company_id).limit(1).execute()
-                if _co.data and _co.data[0].get("category"):
-                    _biz_model = _co.data[0]["category"]
-            except Exception:
-                pass
+            _biz_model = _company_business_model(sb, company_id)
+            from app.services.label_classifier import CompanyLabelMap
+            labels = CompanyLabelMap(company_id, _biz_model).load()
 
             # =============================================
-            # PASS 1: Scan all rows — build category + hierarchy map
+            # PASS 1 + 1.5: Classify rows — category, hierarchy, hierarchy_path
             # =============================================
-            row_info = []
-            current_section_parent = None
-            is_explicit_subcategory = hierarchy_info["strategy"] == "explicit_subcategory"
-
-            for idx_row, row in enumerate(data_rows):
-                if not row:
-                    row_info.append({"skip": "empty"})
-                    skipped_empty += 1
-                    continue
-
-                if _is_separator_row(row):
-                    row_info.append({"skip": "separator"})
-                    skipped_separators += 1
-                    continue
-
-                # --- Explicit Subcategory strategy ---
-                # CSV has named Category + Subcategory columns (e.g. "Revenue", "DOE Grants")
-                if is_explicit_subcategory:
-                    cat_col_idx = hierarchy_info["category_col"]
-                    sub_col_idx = hierarchy_info["subcategory_col"]
-                    raw_cat = row[cat_col_idx].strip() if cat_col_idx < len(row) else ""
-                    raw_sub = row[sub_col_idx].strip() if sub_col_idx < len(row) else ""
-
-                    if not raw_cat:
-                        row_info.append({"skip": "empty"})
-                        skipped_empty += 1
-                        continue
-
-                    has_amounts = any(
-                        _parse_amount(row[ci]) is not None
-                        for ci in period_cols
-                        if ci < len(row)
-                    )
-
-                    cleaned_cat, _, original_cat = _clean_label(raw_cat)
-
-                    # Match the category column against known P&L categories
-                    # (No unconditional skip — Pass 2 handles computed row dedup
-                    # conditionally. Rows like Gross Profit, Net Loss are real metrics.)
-                    cat = _match_category(cleaned_cat) or _match_category(original_cat)
-                    if not cat:
-                        fuzzy = _fuzzy_match_category(cleaned_cat)
-                        if fuzzy:
-                            cat = fuzzy[0]
-                            warnings.append(f"Fuzzy-matched '{original_cat}' → {cat} (score: {fuzzy[1]})")
-                        elif current_section_parent:
-                            # Category like "Other" doesn't match directly but section
-                            # header "Other Income / (Expense)" set current_section_parent
-                            cat = current_section_parent
-                        else:
-                            row_info.append({"skip": "unmapped", "raw_label": raw_cat})
-                            unmapped_labels.append(f"{raw_cat}: {raw_sub}" if raw_sub else raw_cat)
-                            continue
-
-                    # Determine subcategory — use the explicit column value
-                    sub_name = raw_sub if raw_sub else None
-                    depth = 1 if sub_name else 0
-
-                    # Section header: category with no subcategory and no amounts
-                    is_section_hdr = (not sub_name and not has_amounts)
-
-                    # Track section context for child rows
-                    if is_section_hdr:
-                        current_section_parent = cat
-                    elif not sub_name:
-                        # Standalone metric row (Gross Profit, Net Loss, etc.) — reset section
-                        if cat in _SECTION_TO_PARENT:
-                            current_section_parent = _SECTION_TO_PARENT[cat]
-                        else:
-                            current_section_parent = None
-
-                    # Build hierarchy_path directly for explicit subcategory rows
-                    if sub_name:
-                        h_path = f"{cat}/{sub_name}"
-                    else:
-                        h_path = cat
-
-                    info = {
-                        "skip": None,
-                        "raw_label": raw_cat,
-                        "cleaned": cleaned_cat,
-                        "depth": depth,
-                        "original": f"{original_cat}: {raw_sub}" if raw_sub else original_cat,
-                        "category": cat if not is_section_hdr else None,
-                        "subcategory": sub_name,
-                        "match_type": "explicit_subcategory" if sub_name else "regex",
-                        "is_section_header": is_section_hdr,
-                        "has_amounts": has_amounts,
-                        "hierarchy_path": h_path if not is_section_hdr else "",
-                    }
-
-                    if sub_name and sub_name not in subcategories_created:
-                        subcategories_created.append(sub_name)
-                    if not is_section_hdr:
-                        mapped_categories.append({
-                            "label": f"{raw_cat} / {raw_sub}" if raw_sub else raw_cat,
-                            "category": cat,
-                            "match": "explicit_subcategory",
-                            **({"subcategory": sub_name} if sub_name else {}),
-                        })
-
-                    row_info.append(info)
-                    continue
-
-                # --- Non-explicit strategies (indent, account_number, etc.) ---
-                label_col_idx = hierarchy_info.get("label_col", 0) if hierarchy_info["strategy"] != "indent" else 0
-                raw_label = row[label_col_idx] if label_col_idx < len(row) else (row[0] if row else "")
-                if not raw_label.strip():
-                    row_info.append({"skip": "empty"})
-                    skipped_empty += 1
-                    continue
-
-                if hierarchy_info["strategy"] != "indent":
-                    depth = row_depth_map.get(idx_row, 0)
-                    cleaned, _, original = _clean_label(raw_label)
-                else:
-                    cleaned, depth, original = _clean_label(raw_label)
-
-                has_amounts = any(
-                    _parse_amount(row[ci]) is not None
-                    for ci in period_cols
-                    if ci < len(row)
-                )
-
-                info = {
-                    "skip": None,
-                    "raw_label": raw_label,
-                    "cleaned": cleaned,
-                    "depth": depth,
-                    "original": original,
-                    "category": None,
-                    "subcategory": None,
-                    "match_type": None,
-                    "is_section_header": False,
-                    "has_amounts": has_amounts,
-                }
-
-                if depth == 0:
-                    cat = _match_category(cleaned)
-                    if cat:
-                        info["category"] = cat
-                        info["match_type"] = "regex"
-                        current_section_parent = _SECTION_TO_PARENT.get(cat)
-                        if not has_amounts and cat in _SECTION_TO_PARENT:
-                            info["is_section_header"] = True
-                    else:
-                        cat = _match_category(original)
-                        if cat:
-                            info["category"] = cat
-                            info["match_type"] = "regex"
-                            current_section_parent = _SECTION_TO_PARENT.get(cat)
-                            if not has_amounts and cat in _SECTION_TO_PARENT:
-                                info["is_section_header"] = True
-                        else:
-                            for pat, sec_cat in _SECTION_HEADER_PATTERNS:
-                                if pat.search(cleaned):
-                                    info["is_section_header"] = True
-                                    current_section_parent = _SECTION_TO_PARENT.get(sec_cat, sec_cat)
-                                    break
-
-                            if not info["is_section_header"]:
-                                fuzzy = _fuzzy_match_category(cleaned)
-                                if fuzzy:
-                                    info["category"] = fuzzy[0]
-                                    info["match_type"] = f"fuzzy ({fuzzy[1]})"
-                                    warnings.append(f"Fuzzy-matched '{original}' → {fuzzy[0]} (score: {fuzzy[1]})")
-                                    current_section_parent = _SECTION_TO_PARENT.get(fuzzy[0])
-                                else:
-                                    info["skip"] = "unmapped"
-                                    unmapped_labels.append(original)
-
-                else:
-                    # --- account_number strategy: use parent_map for category ---
-                    if hierarchy_info["strategy"] == "account_number" and acct_parent_map:
-                        parent_idx = acct_parent_map.get(idx_row)
-                        parent_cat = None
-                        if parent_idx is not None and parent_idx < len(row_info):
-                            parent_cat = row_info[parent_idx].get("category")
-                        if not parent_cat:
-                            parent_cat = _match_category(cleaned) or current_section_parent
-
-                        if parent_cat:
-                            acct_col = hierarchy_info["account_col"]
-                            lbl_col = hierarchy_info.get("label_col", 0)
-                            if lbl_col != acct_col:
-                                # Text label column available — use it
-                                sub_name = _label_to_subcategory(original, _biz_model)
-                            else:
-                                # Label IS the account code — use code as-is
-                                sub_name = original.strip()
-                            info["category"] = parent_cat
-                            info["subcategory"] = sub_name
-                            info["match_type"] = "hierarchy"
-                            if sub_name and sub_name not in subcategories_created:
-                                subcategories_created.append(sub_name)
-                        else:
-                            info["skip"] = "unmapped"
-                            unmapped_labels.append(original)
-                    else:
-                        # --- indent / other strategies: existing logic ---
-                        cat = _match_category(cleaned)
-                        if cat and cat != current_section_parent:
-                            info["category"] = cat
-                            info["match_type"] = "regex"
-                        elif cat and cat == current_section_parent:
-                            sub_name = _label_to_subcategory(original, _biz_model)
-                            if sub_name:
-                                info["category"] = cat
-                                info["subcategory"] = sub_name
-                                info["match_type"] = "hierarchy"
-                                if sub_name not in subcategories_created:
-                                    subcategories_created.append(sub_name)
-                            else:
-                                info["category"] = cat
-                                info["match_type"] = "regex"
-                        else:
-                            fuzzy = _fuzzy_match_category(cleaned)
-                            if fuzzy and fuzzy[0] != current_section_parent:
-                                info["category"] = fuzzy[0]
-                                info["match_type"] = f"fuzzy ({fuzzy[1]})"
-                                warnings.append(f"Fuzzy-matched '{original}' → {fuzzy[0]} (score: {fuzzy[1]})")
-                            elif current_section_parent:
-                                sub_name = _label_to_subcategory(original, _biz_model)
-                                if sub_name:
-                                    info["category"] = current_section_parent
-                                    info["subcategory"] = sub_name
-                                    info["match_type"] = "hierarchy"
-                                    if sub_name not in subcategories_created:
-                                        subcategories_created.append(sub_name)
-                            else:
-                                info["skip"] = "unmapped"
-                                unmapped_labels.append(original)
-
-                row_info.append(info)
-
-            # =============================================
-            # PASS 1.5: Build hierarchy_path for each row using path stack
-            # (Skipped for rows that already have hierarchy_path set, e.g. explicit_subcategory)
-            # =============================================
-            path_stack: List[tuple] = []
-            for ri in row_info:
-                if ri.get("hierarchy_path"):
-                    continue  # already set (e.g. explicit_subcategory strategy)
-                if ri.get("skip"):
-                    ri["hierarchy_path"] = ""
-                    continue
-                if ri.get("is_section_header"):
-                    path_stack = []
-                    ri["hierarchy_path"] = ""
-                    continue
-
-                depth = ri.get("depth", 0)
-                segment = ri.get("subcategory") or ri.get("category") or ""
-
-                while path_stack and path_stack[-1][0] >= depth:
-                    path_stack.pop()
-
-                path_stack.append((depth, segment))
-                ri["hierarchy_path"] = "/".join(p[1] for p in path_stack if p[1])
+            classifier = _ActualsRowClassifier(
+                hierarchy_info, period_cols, _biz_model,
+                row_depth_map=row_depth_map, acct_parent_map=acct_parent_map, warnings=warnings,
+                labels=labels,
+            )
+            row_info = [classifier.classify(idx_row, row) for idx_row, row in enumerate(data_rows)]
+            mapped_categories = classifier.mapped_categories
+            unmapped_labels = classifier.unmapped_labels
+            subcategories_created = classifier.subcategories_created
+            skipped_empty = classifier.skipped_empty
+            skipped_separators = classifier.skipped_separators
 
             # =============================================
             # PASS 2: Determine which computed rows to skip
@@ -2187,19 +2667,12 @@ async def upload_actuals_csv(
         )
         _update_job({"step": "upserting", "message": f"Upserting {len(actuals_rows)} rows into fpa_actuals"})
 
-        upload_periods = sorted(set(r["period"] for r in actuals_rows))
-        for period_val in upload_periods:
-            sb.table("fpa_actuals") \
-                .delete() \
-                .eq("company_id", company_id) \
-                .eq("period", period_val) \
-                .eq("source", "csv_upload") \
-                .execute()
-
-        sb.table("fpa_actuals").upsert(
-            actuals_rows,
-            on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
-        ).execute()
+        from app.core.tool_executor import tool_executors
+        await tool_executors.run("io", _replace_csv_actuals, sb, company_id, actuals_rows)
+        from app.services.company_data_pull import invalidate_company_cache
+        invalidate_company_cache(company_id)
+        if not is_transposed:
+            await tool_executors.run("io", labels.save)
 
         periods = sorted(set(r["period"][:7] for r in actuals_rows))
         categories = sorted(set(r["category"] for r in actuals_rows))
@@ -2636,6 +3109,8 @@ async def create_scenario_branch(req: ScenarioBranchCreateRequest):
     if not result.data:
         raise HTTPException(status_code=500, detail="Failed to create scenario branch")
 
+    from app.services.scenario_branch_service import invalidate_branch_cache
+    invalidate_branch_cache(req.company_id)
     return result.data[0]
 
 
@@ -2809,7 +3284,7 @@ async def patch_scenario_branch(branch_id: str, req: ScenarioBranchPatchRequest)
     plus resolved driver state.
     """
     from app.core.supabase_client import get_supabase_client
-    from app.services.scenario_branch_service import ScenarioBranchService
+    from app.services.scenario_branch_service import ScenarioBranchService, invalidate_branch_cache
     from app.services.driver_registry import drivers_to_assumptions
     import json as _json
 
@@ -2852,6 +3327,7 @@ async def patch_scenario_branch(branch_id: str, req: ScenarioBranchPatchRequest)
         updates["probability"] = req.probability
 
     sb.table("scenario_branches").update(updates).eq("id", branch_id).execute()
+    invalidate_branch_cache(company_id)
 
     # Re-execute
     svc = ScenarioBranchService()
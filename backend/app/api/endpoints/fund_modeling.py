@@ -52,6 +52,28 @@ async def get_nav_timeseries(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/fund/{fund_id}/return-distribution")
+async def get_return_distribution(
+    fund_id: str,
+    draws: int = 20_000,
+    seed: Optional[int] = None,
+    macro_correlation: float = 0.20,
+    sector_correlation: float = 0.15,
+):
+    """Correlated Monte Carlo of fund MOIC / IRR / DPI over company waterfalls"""
+    try:
+        return await fund_modeling.simulate_fund_returns(
+            fund_id,
+            draws=draws,
+            seed=seed,
+            macro_correlation=macro_correlation,
+            sector_correlation=sector_correlation,
+        )
+    except Exception as e:
+        logger.error(f"Error simulating fund returns: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/fund/{fund_id}/optimize")
 async def optimize_portfolio(
     fund_id: str,
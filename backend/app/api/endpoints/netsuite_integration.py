@@ -11,6 +11,7 @@ Endpoints:
   GET  /integrations/netsuite/subsidiaries/{id}    → List subsidiaries
 """
 
+import asyncio
 import logging
 from datetime import date, timedelta
 from typing import Any, Dict, Optional
@@ -277,26 +278,41 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
     today = date.today()
     from_date = (today - timedelta(days=request.months * 30)).replace(day=1)
 
-    # Fetch P&L via SuiteQL
-    pl_data = await client.get_profit_and_loss(
-        from_date=from_date.isoformat(),
-        to_date=today.isoformat(),
-        subsidiary_id=request.subsidiary_id,
+    # Fetch P&L (concurrent SuiteQL windows) and Balance Sheet together
+    pl_windows, bs_data = await asyncio.gather(
+        client.get_profit_and_loss_windows(
+            from_date=from_date,
+            to_date=today,
+            subsidiary_id=request.subsidiary_id,
+        ),
+        client.get_balance_sheet(
+            as_of_date=today.isoformat(),
+            subsidiary_id=request.subsidiary_id,
+        ),
     )
+
+    pl_data = []
+    missing_windows = []
+    for lo, hi, window_rows in pl_windows:
+        if window_rows is None:
+            missing_windows.append(f"{lo.isoformat()}..{hi.isoformat()}")
+        else:
+            pl_data.extend(window_rows)
     pl_rows = parse_profit_and_loss(pl_data, request.company_id, connection.get("fund_id"))
 
-    # Fetch Balance Sheet
-    bs_data = await client.get_balance_sheet(
-        as_of_date=today.isoformat(),
-        subsidiary_id=request.subsidiary_id,
-    )
     bs_rows = parse_balance_sheet(bs_data, request.company_id, today.isoformat(), connection.get("fund_id"))
 
     all_rows = pl_rows + bs_rows
 
     if not all_rows:
-        update_sync_status(request.connection_id, "idle")
-        return {"success": True, "rows_synced": 0, "periods": []}
+        if missing_windows:
+            update_sync_status(
+                request.connection_id, "error",
+                f"P&L windows not returned by NetSuite: {', '.join(missing_windows)}",
+            )
+        else:
+            update_sync_status(request.connection_id, "idle")
+        return {"success": True, "rows_synced": 0, "periods": [], "missing_windows": missing_windows}
 
     # Compute EBITDA
     ebitda_rows = compute_ebitda_rows(pl_rows, request.company_id, PROVIDER, connection.get("fund_id"))
@@ -314,7 +330,18 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
         on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
     ).execute()
 
-    update_sync_status(request.connection_id, "idle")
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(request.company_id)
+
+    if missing_windows:
+        # Partial backfill — keep what landed, but flag it so the next sync retries
+        logger.warning("NetSuite sync missing P&L windows %s for company %s", missing_windows, request.company_id)
+        update_sync_status(
+            request.connection_id, "error",
+            f"P&L windows not returned by NetSuite: {', '.join(missing_windows)}",
+        )
+    else:
+        update_sync_status(request.connection_id, "idle")
     unique_periods = sorted(set(r.period[:7] for r in all_rows))
 
     logger.info(
@@ -328,6 +355,7 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
         "pl_rows": len(pl_rows),
         "bs_rows": len(bs_rows),
         "periods": unique_periods,
+        "missing_windows": missing_windows,
     }
 
 
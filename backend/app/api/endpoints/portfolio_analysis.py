@@ -1,5 +1,6 @@
 """
 Company full-history analysis: POST company-history (async/sync), GET job status.
+Bulk valuation: POST bulk-valuation (resumable Celery job), GET its progress.
 """
 
 from fastapi import APIRouter, HTTPException, Query
@@ -91,3 +92,34 @@ async def get_analysis_job(fund_id: str, job_id: str):
     except Exception as e:
         logger.warning("Job status failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+class BulkValuationRequest(BaseModel):
+    resume: bool = Field(True, description="Continue the fund's latest unfinished job from its checkpoints")
+    concurrency: Optional[int] = Field(None, ge=1, le=64, description="Valuations in flight on the worker")
+
+
+@router.post("/{fund_id}/analysis/bulk-valuation")
+async def post_bulk_valuation(fund_id: str, body: BulkValuationRequest):
+    """
+    Value every portfolio company as a background job, checkpointed per company.
+    Returns the job-status record; poll GET bulk-valuation/{job_id}.
+    """
+    try:
+        import asyncio
+        from app.services.bulk_valuation_job import start_bulk_valuation
+        return await asyncio.to_thread(start_bulk_valuation, fund_id, body.resume, body.concurrency)
+    except Exception as e:
+        logger.exception("Bulk valuation enqueue failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{fund_id}/analysis/bulk-valuation/{job_id}")
+async def get_bulk_valuation(fund_id: str, job_id: str, include_results: bool = Query(True)):
+    """Progress (completed / succeeded / failed of total) and the results checkpointed so far."""
+    import asyncio
+    from app.services.bulk_valuation_job import get_job_status
+    status = await asyncio.to_thread(get_job_status, job_id, include_results)
+    if not status or status.get("fund_id") != fund_id:
+        raise HTTPException(status_code=404, detail=f"Bulk valuation job {job_id} not found")
+    return status
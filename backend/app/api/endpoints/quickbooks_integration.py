@@ -10,6 +10,7 @@ Endpoints:
   GET  /integrations/quickbooks/accounts/{id}       → Fetch chart of accounts
 """
 
+import asyncio
 import logging
 from datetime import date, timedelta
 from typing import Any, Dict
@@ -192,18 +193,20 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
     today = date.today()
     from_date = (today - timedelta(days=request.months * 30)).replace(day=1)
 
-    # Fetch P&L
-    pl_report = await client.get_profit_and_loss(
-        start_date=from_date.isoformat(),
-        end_date=today.isoformat(),
+    # Fetch P&L (concurrent yearly windows) and Balance Sheet together
+    pl_windows, bs_report = await asyncio.gather(
+        client.get_profit_and_loss_windows(from_date, today),
+        client.get_balance_sheet(as_of_date=today.isoformat()),
     )
 
     pl_rows = []
-    if pl_report:
-        pl_rows = parse_profit_and_loss(pl_report, request.company_id, connection.get("fund_id"))
+    missing_windows = []
+    for lo, hi, pl_report in pl_windows:
+        if pl_report:
+            pl_rows.extend(parse_profit_and_loss(pl_report, request.company_id, connection.get("fund_id")))
+        else:
+            missing_windows.append(f"{lo.isoformat()}..{hi.isoformat()}")
 
-    # Fetch Balance Sheet
-    bs_report = await client.get_balance_sheet(as_of_date=today.isoformat())
     bs_rows = []
     if bs_report:
         bs_rows = parse_balance_sheet(bs_report, request.company_id, connection.get("fund_id"))
@@ -211,8 +214,14 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
     all_rows = pl_rows + bs_rows
 
     if not all_rows:
-        update_sync_status(request.connection_id, "idle")
-        return {"success": True, "rows_synced": 0, "periods": []}
+        if missing_windows:
+            update_sync_status(
+                request.connection_id, "error",
+                f"P&L windows not returned by QuickBooks: {', '.join(missing_windows)}",
+            )
+        else:
+            update_sync_status(request.connection_id, "idle")
+        return {"success": True, "rows_synced": 0, "periods": [], "missing_windows": missing_windows}
 
     # Compute EBITDA
     ebitda_rows = compute_ebitda_rows(pl_rows, request.company_id, PROVIDER, connection.get("fund_id"))
@@ -230,7 +239,18 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
         on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
     ).execute()
 
-    update_sync_status(request.connection_id, "idle")
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(request.company_id)
+
+    if missing_windows:
+        # Partial backfill — keep what landed, but flag it so the next sync retries
+        logger.warning("QBO sync missing P&L windows %s for company %s", missing_windows, request.company_id)
+        update_sync_status(
+            request.connection_id, "error",
+            f"P&L windows not returned by QuickBooks: {', '.join(missing_windows)}",
+        )
+    else:
+        update_sync_status(request.connection_id, "idle")
     unique_periods = sorted(set(r.period[:7] for r in all_rows))
 
     logger.info(
@@ -244,6 +264,7 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
         "pl_rows": len(pl_rows),
         "bs_rows": len(bs_rows),
         "periods": unique_periods,
+        "missing_windows": missing_windows,
     }
 
 
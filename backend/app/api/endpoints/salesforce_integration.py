@@ -227,6 +227,9 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
         on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
     ).execute()
 
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(request.company_id)
+
     update_sync_status(request.connection_id, "idle")
     unique_periods = sorted(set(r.period[:7] for r in all_rows))
 
@@ -10,6 +10,7 @@ Endpoints:
   GET  /integrations/sap/accounts/{id}           → Fetch chart of accounts
 """
 
+import asyncio
 import logging
 from datetime import date, timedelta
 from typing import Any, Dict, Optional
@@ -183,16 +184,22 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
 
     try:
         if provider == "sap_s4":
-            all_rows = await _sync_s4(connection, extra, request)
+            all_rows, missing_windows = await _sync_s4(connection, extra, request)
         else:
-            all_rows = await _sync_b1(connection, extra, request)
+            all_rows, missing_windows = await _sync_b1(connection, extra, request)
     except Exception as e:
         update_sync_status(request.connection_id, "error", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
     if not all_rows:
-        update_sync_status(request.connection_id, "idle")
-        return {"success": True, "rows_synced": 0, "periods": []}
+        if missing_windows:
+            update_sync_status(
+                request.connection_id, "error",
+                f"Periods not returned by SAP: {', '.join(missing_windows)}",
+            )
+        else:
+            update_sync_status(request.connection_id, "idle")
+        return {"success": True, "rows_synced": 0, "periods": [], "missing_windows": missing_windows}
 
     # Compute EBITDA
     ebitda_rows = compute_ebitda_rows(all_rows, request.company_id, provider, connection.get("fund_id"))
@@ -210,15 +217,31 @@ async def trigger_sync(request: SyncRequest) -> Dict[str, Any]:
         on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
     ).execute()
 
-    update_sync_status(request.connection_id, "idle")
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(request.company_id)
+
+    if missing_windows:
+        # Partial backfill — keep what landed, but flag it so the next sync retries
+        logger.warning("SAP sync missing periods %s for company %s", missing_windows, request.company_id)
+        update_sync_status(
+            request.connection_id, "error",
+            f"Periods not returned by SAP: {', '.join(missing_windows)}",
+        )
+    else:
+        update_sync_status(request.connection_id, "idle")
     unique_periods = sorted(set(r.period[:7] for r in all_rows))
 
     logger.info("SAP sync complete: %d rows across %d periods", len(all_rows), len(unique_periods))
-    return {"success": True, "rows_synced": len(all_rows), "periods": unique_periods}
+    return {
+        "success": True,
+        "rows_synced": len(all_rows),
+        "periods": unique_periods,
+        "missing_windows": missing_windows,
+    }
 
 
 async def _sync_s4(connection, extra, request):
-    """Sync from SAP S/4HANA Cloud."""
+    """Sync from SAP S/4HANA Cloud. Returns (rows, missing fiscal periods)."""
     from app.services.integrations.sap.auth import s4_get_token
     from app.services.integrations.sap.client import SAPS4Client
     from app.services.integrations.sap.parser import parse_s4_trial_balance
@@ -240,24 +263,33 @@ async def _sync_s4(connection, extra, request):
 
     today = date.today()
     start_year = today.year - (request.months // 12) - 1
-    all_rows = []
+    periods = [
+        (year, period)
+        for year in range(start_year, today.year + 1)
+        for period in range(1, (12 if year < today.year else today.month) + 1)
+    ]
 
-    for year in range(start_year, today.year + 1):
-        max_period = 12 if year < today.year else today.month
-        for period in range(1, max_period + 1):
-            tb_data = await client.get_trial_balance(company_code, year, period)
-            if tb_data:
-                rows = parse_s4_trial_balance(
-                    tb_data, request.company_id, year,
-                    fund_id=connection.get("fund_id"),
-                )
-                all_rows.extend(rows)
+    # One trial balance per fiscal period, fetched concurrently — the shared
+    # transport keeps the fan-out inside the tenant's rate / concurrency limits
+    tb_results = await client.get_trial_balances(company_code, periods)
 
-    return all_rows
+    all_rows = []
+    missing = []
+    for year, period, tb_data in tb_results:
+        if tb_data is None:
+            missing.append(f"{year}-{period:03d}")
+        elif tb_data:
+            rows = parse_s4_trial_balance(
+                tb_data, request.company_id, year,
+                fund_id=connection.get("fund_id"),
+            )
+            all_rows.extend(rows)
+
+    return all_rows, missing
 
 
 async def _sync_b1(connection, extra, request):
-    """Sync from SAP Business One."""
+    """Sync from SAP Business One. Returns (rows, missing date windows)."""
     from app.services.integrations.sap.auth import b1_login
     from app.services.integrations.sap.client import SAPB1Client
     from app.services.integrations.sap.parser import parse_b1_journal_entries
@@ -281,16 +313,25 @@ async def _sync_b1(connection, extra, request):
     today = date.today()
     from_date = (today - timedelta(days=request.months * 30)).replace(day=1)
 
-    # Fetch COA + journal entries
-    coa = await client.get_chart_of_accounts()
-    entries = await client.get_journal_entries(from_date.isoformat(), today.isoformat())
+    # Fetch COA + journal entries (concurrent windows, each with its own page budget)
+    coa, windows = await asyncio.gather(
+        client.get_chart_of_accounts(),
+        client.get_journal_entries_windows(from_date, today),
+    )
+    entries = []
+    missing = []
+    for lo, hi, chunk in windows:
+        if chunk is None:
+            missing.append(f"{lo.isoformat()}..{hi.isoformat()}")
+        else:
+            entries.extend(chunk)
 
     all_rows = parse_b1_journal_entries(
         entries, coa, request.company_id,
         fund_id=connection.get("fund_id"),
     )
 
-    return all_rows
+    return all_rows, missing
 
 
 # ---------------------------------------------------------------------------
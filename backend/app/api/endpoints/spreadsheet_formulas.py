@@ -7,6 +7,7 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 import logging
 
+from app.services.formula_evaluator import FormulaError
 from app.services.spreadsheet_formula_engine import SpreadsheetFormulaEngine
 
 router = APIRouter()
@@ -25,6 +26,11 @@ class BatchFormulaRequest(BaseModel):
     context: Dict[str, Any] = {}
 
 
+class RecalculateRequest(BaseModel):
+    cells: Dict[str, Any]
+    changes: Dict[str, Any] = {}
+
+
 @router.post("/calculate")
 async def calculate_formula(request: FormulaCalculationRequest):
     """Calculate a single spreadsheet formula"""
@@ -44,6 +50,8 @@ async def calculate_formula(request: FormulaCalculationRequest):
             "data_used": request.data
         }
         
+    except FormulaError as e:
+        raise HTTPException(status_code=400, detail=f"{e.code}: {e}")
     except Exception as e:
         logger.error(f"Formula calculation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -69,6 +77,13 @@ async def calculate_batch_formulas(request: BatchFormulaRequest):
                     "result": result,
                     "cell": formula_item.get("cell", "")
                 })
+            except FormulaError as e:
+                results.append({
+                    "success": False,
+                    "formula": formula_item.get("formula"),
+                    "error": f"{e.code}: {e}",
+                    "cell": formula_item.get("cell", "")
+                })
             except Exception as e:
                 results.append({
                     "success": False,
@@ -89,6 +104,25 @@ async def calculate_batch_formulas(request: BatchFormulaRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/recalculate")
+async def recalculate_model(request: RecalculateRequest):
+    """Evaluate a cell model, apply driver changes, return only the cells that moved"""
+    try:
+        from app.core.tool_executor import tool_executors
+
+        formula_engine = SpreadsheetFormulaEngine()
+        updated = await tool_executors.run("cpu", formula_engine.recalculate, request.cells, request.changes)
+        return {
+            "success": True,
+            "updated": updated,
+            "stats": formula_engine.evaluator.last_recalc,
+        }
+
+    except Exception as e:
+        logger.error(f"Formula recalculation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/functions")
 async def get_supported_functions():
     """Get list of supported spreadsheet functions"""
@@ -116,13 +150,12 @@ async def validate_formula(formula: str):
     try:
         formula_engine = SpreadsheetFormulaEngine()
         
-        # Basic validation (could be enhanced)
-        is_valid = formula.startswith("=") and len(formula) > 1
+        is_valid, error = formula_engine.validate_formula(formula)
         
         return {
             "formula": formula,
             "valid": is_valid,
-            "message": "Valid formula syntax" if is_valid else "Invalid formula syntax"
+            "message": "Valid formula syntax" if is_valid else f"Invalid formula syntax: {error}"
         }
         
     except Exception as e:
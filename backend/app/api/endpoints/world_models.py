@@ -48,6 +48,10 @@ class AddFactorRequest(BaseModel):
     assumptions: Optional[Dict[str, Any]] = None
 
 
+class ExecuteModelRequest(BaseModel):
+    scenarios: Optional[List[Dict[str, Any]]] = None
+
+
 class BuildCompanyModelRequest(BaseModel):
     company_data: Dict[str, Any]
     model_name: Optional[str] = None
@@ -147,11 +151,16 @@ async def get_model(model_id: str):
 
 
 @router.post("/{model_id}/execute")
-async def execute_model(model_id: str):
-    """Execute a world model - calculate all factors"""
+async def execute_model(model_id: str, request: Optional[ExecuteModelRequest] = None):
+    """Execute a world model - calculate all factors, optionally over a batch of scenarios"""
     try:
-        results = await model_builder.execute_model(model_id)
+        results = await model_builder.execute_model(
+            model_id,
+            scenarios=request.scenarios if request else None
+        )
         return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error executing world model: {e}")
         raise HTTPException(status_code=500, detail=str(e))
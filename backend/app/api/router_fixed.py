@@ -116,3 +116,91 @@ async def health_check():
         "status": "healthy",
         "service": "dilla-ai-backend",
     }
+
+
+# Tool executor pools: queue depth + saturation per pool (cpu / io)
+@api_router.get("/health/executors")
+async def executor_health():
+    from app.core.tool_executor import tool_executors
+
+    return {
+        "status": "healthy",
+        "pools": tool_executors.stats(),
+    }
+
+
+# Shared fpa_actuals / companies reads: cache hits, coalesced requests, queries
+@api_router.get("/health/data-access")
+async def data_access_health():
+    from app.core.data_access import fpa_data
+
+    return {
+        "status": "healthy",
+        "data_access": fpa_data.stats(),
+    }
+
+
+# LLM response cache: per-tier hits, single-flight coalescing, cost avoided
+@api_router.get("/health/llm-cache")
+async def llm_cache_health():
+    from app.core.llm_cache import llm_cache
+
+    return {
+        "status": "healthy",
+        "llm_cache": llm_cache.stats(),
+    }
+
+
+# Company / branch caches: hits, misses, evictions, cross-worker invalidation bus
+@api_router.get("/health/cache-bus")
+async def cache_bus_health():
+    from app.core.cache_bus import cache_bus
+
+    return {
+        "status": "healthy",
+        "cache_bus": cache_bus.stats(),
+    }
+
+
+# Company search / comparables index: size, refreshes, aggregate hits
+@api_router.get("/health/company-index")
+async def company_index_health():
+    from app.services.company_index import company_index
+
+    return {
+        "status": "healthy",
+        "company_index": company_index.stats(),
+    }
+
+
+# Compiled world models: cache hits / compiles and each model's last run
+@api_router.get("/health/world-model-engine")
+async def world_model_engine_health():
+    from app.services.world_model_engine import world_model_engine
+
+    return {
+        "status": "healthy",
+        "world_model_engine": world_model_engine.stats(),
+    }
+
+
+# ERP / HR connector transport: per-provider requests, retries and throttling
+@api_router.get("/health/integrations-transport")
+async def integrations_transport_health():
+    from app.services.integrations.transport import connector_transport
+
+    return {
+        "status": "healthy",
+        "integrations_transport": connector_transport.stats(),
+    }
+
+
+# Document text extraction: content-hash cache and per-page OCR pool
+@api_router.get("/health/text-extraction")
+async def text_extraction_health():
+    from app.services import text_extraction
+
+    return {
+        "status": "healthy",
+        "text_extraction": text_extraction.stats(),
+    }
@@ -0,0 +1,368 @@
+"""
+Cross-process invalidation for per-company in-memory caches.
+
+company_data_pull and scenario_branch_service keep expensive per-company
+state in process-local dicts. With several uvicorn workers plus Celery, a
+write in one process left every other process serving the old value until
+a 60s TTL ran out — so the TTL had to stay short and most reads missed.
+This module gives those caches a shared freshness signal:
+
+    from app.core.cache_bus import VersionedCache, cache_bus
+
+    _TREES = VersionedCache("branch_tree", scope="branches")
+
+    token = _TREES.token(company_id)            # before reading the database
+    tree = _TREES.get(company_id)
+    if tree is None:
+        tree = load_tree(company_id)
+        _TREES.set(company_id, tree, token)     # dropped if invalidated meanwhile
+
+    cache_bus.invalidate(company_id, "branches")   # after every write
+
+- Each company has a version counter in Redis (``cachever:<company_id>``).
+  ``invalidate`` evicts locally, INCRs the counter and publishes
+  {company_id, version, scopes} on the ``cache:invalidate`` channel. Called
+  from an event loop thread, the Redis round-trips go to the default
+  executor so a slow Redis can't stall the loop.
+- Every process that reads a VersionedCache runs one daemon listener thread
+  (started lazily, restarted after fork for Celery prefork workers) that
+  evicts matching entries as messages arrive.
+- While the listener is subscribed, entries live for CACHE_BUS_TTL (6h).
+  Without REDIS_URL, or while Redis is unreachable / reconnecting, they fall
+  back to the short local TTL so a missed message can't serve stale data
+  for long.
+- On every (re)subscribe the counters of all cached companies are compared
+  with the last versions this process saw; changed companies are evicted.
+
+Hooks that aren't VersionedCaches (e.g. fpa_data's loader cache) register
+with ``cache_bus.on_invalidate(scope, fn)``.
+
+stats() reports hits / misses / evictions per cache plus listener health.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUS_TTL = float(os.getenv("CACHE_BUS_TTL", str(6 * 3600)))
+LOCAL_TTL = float(os.getenv("CACHE_BUS_LOCAL_TTL", "60"))
+CHANNEL = os.getenv("CACHE_BUS_CHANNEL", "cache:invalidate")
+
+_VERSION_PREFIX = "cachever:"
+_POLL_S = 1.0
+_RECONNECT_MAX_S = 30.0
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class VersionedCache:
+    """Bounded LRU keyed by company_id, evicted by the invalidation bus.
+
+    ``token(key)`` returns a per-key generation that every eviction bumps;
+    passing it to ``set`` drops values loaded before an invalidation landed.
+    Values are shared between callers — treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        scope: str,
+        max_entries: int = 512,
+        ttl: float = CACHE_BUS_TTL,
+        local_ttl: float = LOCAL_TTL,
+    ):
+        self.name = name
+        self.scope = scope
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.stale_stores = 0
+        self.evictions = {"invalidated": 0, "expired": 0, "capacity": 0}
+        cache_bus.register(self)
+
+    def token(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    def get(self, key: str) -> Any:
+        """Cached value or None."""
+        cache_bus.ensure_listening()
+        ttl = self.ttl if cache_bus.live else self.local_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.monotonic() - entry[0] >= ttl:
+                del self._entries[key]
+                self.evictions["expired"] += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, token: Optional[int] = None) -> None:
+        with self._lock:
+            if token is not None and self._generations.get(key, 0) != token:
+                self.stale_stores += 1
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions["capacity"] += 1
+
+    def evict(self, key: Optional[str] = None) -> None:
+        """Drop one key (or everything) and invalidate outstanding tokens."""
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            if key is None:
+                keys.extend(self._generations)
+            for k in set(keys):
+                self._generations[k] = self._generations.get(k, 0) + 1
+                if self._entries.pop(k, None) is not None:
+                    self.evictions["invalidated"] += 1
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Snapshot of (key, value) pairs, without touching hit counters or TTLs."""
+        with self._lock:
+            return [(k, v) for k, (_, v) in self._entries.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "scope": self.scope,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stores": self.stores,
+            "stale_stores_dropped": self.stale_stores,
+            "evictions": dict(self.evictions),
+            "ttl_s": self.ttl if cache_bus.live else self.local_ttl,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Bus
+# ---------------------------------------------------------------------------
+
+class CacheInvalidationBus:
+    """Redis version counters + pub/sub fan-out to every process's caches."""
+
+    def __init__(self):
+        self._caches: List[VersionedCache] = []
+        self._hooks: List[Tuple[str, Callable[[str], None]]] = []
+        self._seen: Dict[str, int] = {}
+        self._instance = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._listener_pid: Optional[int] = None
+        self._live_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self.published = 0
+        self.publish_errors = 0
+        self.received = 0
+        self.applied = 0
+        self.resync_evictions = 0
+        self.reconnects = 0
+
+    @property
+    def origin(self) -> str:
+        # pid-qualified so forked workers don't mistake each other's messages for their own
+        return f"{self._instance}:{os.getpid()}"
+
+    @property
+    def live(self) -> bool:
+        """True while this process is subscribed to the invalidation channel."""
+        return self._live_pid == os.getpid()
+
+    def register(self, cache: VersionedCache) -> None:
+        with self._lock:
+            self._caches.append(cache)
+
+    def on_invalidate(self, scope: str, fn: Callable[[str], None]) -> None:
+        """Call fn(company_id) whenever ``scope`` is invalidated for a company."""
+        with self._lock:
+            self._hooks.append((scope, fn))
+
+    # -- writers -----------------------------------------------------------
+
+    def invalidate(self, company_id: Optional[str], *scopes: str) -> Optional[int]:
+        """Evict company_id here and in every other process.
+
+        No scopes means all of them. Returns the new version, or None when
+        Redis isn't configured or the publish failed (local eviction still
+        happens). On an event loop thread the INCR + PUBLISH run on the
+        default executor and None is returned straight away.
+        """
+        if not company_id:
+            return None
+        self._apply(company_id, scopes)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._publish(company_id, scopes)
+        loop.run_in_executor(None, self._publish, company_id, scopes)
+        return None
+
+    def _publish(self, company_id: str, scopes: Tuple[str, ...]) -> Optional[int]:
+        from app.core.redis_client import get_sync_redis
+
+        try:
+            client = get_sync_redis()
+            if client is None:
+                return None
+            version = int(client.incr(_VERSION_PREFIX + company_id))
+            client.publish(CHANNEL, json.dumps({
+                "company_id": company_id,
+                "version": version,
+                "scopes": list(scopes),
+                "origin": self.origin,
+            }))
+        except Exception as e:
+            self.publish_errors += 1
+            logger.warning("[cache-bus] publish failed for %s: %s", company_id, e)
+            return None
+        with self._lock:
+            self._seen[company_id] = max(version, self._seen.get(company_id, 0))
+            self.published += 1
+        return version
+
+    def _apply(self, company_id: str, scopes: Iterable[str]) -> None:
+        scopes = set(scopes)
+        for cache in list(self._caches):
+            if not scopes or cache.scope in scopes:
+                cache.evict(company_id)
+        for scope, fn in list(self._hooks):
+            if not scopes or scope in scopes:
+                try:
+                    fn(company_id)
+                except Exception as e:
+                    logger.warning("[cache-bus] %s hook failed for %s: %s", scope, company_id, e)
+        self.applied += 1
+
+    # -- listener ----------------------------------------------------------
+
+    def ensure_listening(self) -> None:
+        """Start this process's listener thread once (again after a fork)."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            self._stop = threading.Event()
+            from app.core.redis_client import get_sync_redis
+
+            if get_sync_redis() is None:
+                return
+            threading.Thread(target=self._listen, name="cache-bus", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _listen(self) -> None:
+        from app.core.redis_client import get_sync_redis
+
+        stop = self._stop
+        backoff = 1.0
+        while not stop.is_set():
+            pubsub = None
+            try:
+                client = get_sync_redis()
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Subscribed before resyncing, so nothing published in between is lost
+                self._resync(client)
+                self._live_pid = os.getpid()
+                backoff = 1.0
+                logger.info("[cache-bus] listening on %s", CHANNEL)
+                while not stop.is_set():
+                    message = pubsub.get_message(timeout=_POLL_S)
+                    if message and message.get("type") == "message":
+                        self._on_message(message["data"])
+            except Exception as e:
+                logger.warning("[cache-bus] listener disconnected: %s", e)
+            finally:
+                self._live_pid = None
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            if stop.is_set():
+                break
+            self.reconnects += 1
+            stop.wait(backoff)
+            backoff = min(backoff * 2, _RECONNECT_MAX_S)
+
+    def _on_message(self, data: str) -> None:
+        try:
+            msg = json.loads(data)
+            company_id = msg["company_id"]
+            version = int(msg.get("version") or 0)
+        except (ValueError, TypeError, KeyError):
+            logger.warning("[cache-bus] malformed message: %r", data)
+            return
+        self.received += 1
+        with self._lock:
+            self._seen[company_id] = max(version, self._seen.get(company_id, 0))
+        if msg.get("origin") != self.origin:
+            self._apply(company_id, msg.get("scopes") or ())
+
+    def _resync(self, client) -> None:
+        """Evict companies whose counter moved while we weren't subscribed."""
+        cached = sorted({k for cache in list(self._caches) for k in cache.keys()})
+        if not cached:
+            return
+        versions = client.mget([_VERSION_PREFIX + cid for cid in cached])
+        for cid, raw in zip(cached, versions):
+            version = int(raw or 0)
+            with self._lock:
+                changed = version != self._seen.get(cid, 0)
+                self._seen[cid] = version
+            if changed:
+                self._apply(cid, ())
+                self.resync_evictions += 1
+
+    # -- observability -----------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live": self.live,
+            "channel": CHANNEL,
+            "published": self.published,
+            "publish_errors": self.publish_errors,
+            "received": self.received,
+            "applied": self.applied,
+            "resync_evictions": self.resync_evictions,
+            "reconnects": self.reconnects,
+            "caches": {c.name: c.stats() for c in list(self._caches)},
+        }
+
+
+# Singleton — import this everywhere
+cache_bus = CacheInvalidationBus()
@@ -42,4 +42,5 @@ celery_app.conf.update(
 # Long-running tasks (company history) get their own time limit via annotations.
 celery_app.conf.task_annotations = {
     "app.tasks.analysis.run_company_history": {"time_limit": 60 * 60, "soft_time_limit": 55 * 60},
+    "app.tasks.analysis.run_bulk_valuation": {"time_limit": 60 * 60, "soft_time_limit": 55 * 60},
 }
\ No newline at end of file
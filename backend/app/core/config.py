@@ -22,6 +22,8 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: Optional[str] = Field(None, env="SUPABASE_ANON_KEY")
     NEXT_PUBLIC_SUPABASE_URL: Optional[str] = Field(None, env="NEXT_PUBLIC_SUPABASE_URL")
     NEXT_PUBLIC_SUPABASE_ANON_KEY: Optional[str] = Field(None, env="NEXT_PUBLIC_SUPABASE_ANON_KEY")
+    # Direct Postgres DSN — enables the asyncpg pool (core/database_pool.py)
+    DATABASE_URL: Optional[str] = Field(None, env="DATABASE_URL")
     
     # Security
     SECRET_KEY: str = Field(..., env="SECRET_KEY")  # Required — no default, must be set in .env
@@ -0,0 +1,476 @@
+"""
+Async, request-coalescing reads for fpa_actuals / companies / funds.
+
+One agent turn used to hit fpa_actuals a dozen times for the same company:
+pull_company_data, the liquidity model's subcategory pull, PnlBuilder,
+BalanceSheetBuilder and KPIEngine each issued their own blocking query.
+This layer gives them one shared read path:
+
+    from app.core.data_access import fpa_data
+
+    rows = await fpa_data.actuals(company_id)          # async callers
+    rows = fpa_data.actuals_sync(company_id)           # sync service code
+    await fpa_data.prefetch([cid_a, cid_b, cid_c])     # warm a whole turn
+
+- Single-flight: concurrent requests for the same (table, key) share one
+  in-flight query.
+- Batching: keys requested within a few milliseconds of each other are
+  folded into one ``.in_()`` / ``= ANY($1)`` query.
+- Short TTL cache (60s, same as company_data_pull) so later tools in the
+  same turn don't go back to the database.
+
+Each table has ONE projection — the superset of columns its readers need —
+so every reader shares the same cached rows and filters in Python
+(subcategory-only, bs_* categories, period windows, entity_id).
+
+Backend: the asyncpg pool from database_pool when DATABASE_URL is set,
+otherwise supabase-py on the "io" tool executor pool.
+
+Sync callers on a plain worker thread (asyncio.to_thread, Celery helpers)
+join the coalescer on the event loop. Callers on a tool-executor pool
+thread, on the loop thread, or with no loop at all fetch directly: the
+batched REST fetch itself needs an "io" pool worker, so pool threads
+blocking on it could starve the pool. Returned rows are shared between
+callers — treat them as read-only.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.core.cache_bus import cache_bus
+from app.core.database_pool import db_pool
+from app.core.tool_executor import on_pool_worker
+
+logger = logging.getLogger(__name__)
+
+_CACHE_TTL_SECONDS: float = 60.0
+_BATCH_WINDOW_S: float = 0.005     # gather keys requested in the same few ms
+_MAX_BATCH: int = 50               # keys per .in_() query
+_PAGE_SIZE: int = 1000             # PostgREST max-rows default
+_SYNC_TIMEOUT_S: float = 30.0
+
+_ACTUALS_COLUMNS = (
+    "id", "company_id", "period", "category", "subcategory",
+    "hierarchy_path", "amount", "source", "entity_id",
+)
+_COMPANY_COLUMNS = ("id", "name", "fund_id", "revenue_model", "sector")
+_FUND_COLUMNS = ("id", "fund_type")
+
+_ACTUALS_SQL = """
+    SELECT id::text, company_id::text, period, category, subcategory,
+           hierarchy_path, amount, source, entity_id::text
+    FROM fpa_actuals
+    WHERE company_id = ANY($1::uuid[])
+    ORDER BY company_id, period, id
+"""
+_COMPANIES_SQL = """
+    SELECT id::text, name, fund_id::text, revenue_model, sector
+    FROM companies
+    WHERE id = ANY($1::uuid[])
+"""
+_FUNDS_SQL = """
+    SELECT id::text, fund_type
+    FROM funds
+    WHERE id = ANY($1::uuid[])
+"""
+
+_UUID_RE = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+_MISS = object()
+
+
+def _valid_ids(keys: Iterable[str]) -> List[str]:
+    """Drop non-UUID keys — one bad id would fail the whole batched query."""
+    return [k for k in keys if isinstance(k, str) and _UUID_RE.match(k)]
+
+
+def _on_loop_thread(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def _record_to_row(record: Any) -> Dict[str, Any]:
+    """asyncpg Record → the JSON shape supabase-py returns."""
+    row = dict(record)
+    for key, value in row.items():
+        if hasattr(value, "isoformat"):
+            row[key] = value.isoformat()
+        elif key == "amount" and value is not None:
+            row[key] = float(value)
+    return row
+
+
+# ---------------------------------------------------------------------------
+# Coalescing loader
+# ---------------------------------------------------------------------------
+
+class _CoalescingLoader:
+    """Single-flight, batched key → value loader with a TTL cache.
+
+    fetch_async / fetch_sync take a list of keys and return {key: value};
+    keys missing from the result resolve to default().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_async: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        fetch_sync: Callable[[List[str]], Dict[str, Any]],
+        default: Callable[[], Any],
+    ):
+        self.name = name
+        self._fetch_async = fetch_async
+        self._fetch_sync = fetch_sync
+        self._default = default
+        self._cache: Dict[str, tuple] = {}
+        self._versions: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.queries = 0
+        self.keys_fetched = 0
+
+    # -- cache -------------------------------------------------------------
+
+    def _cached(self, key: str) -> Any:
+        entry = self._cache.get(key)
+        if entry and (time.monotonic() - entry[0]) < _CACHE_TTL_SECONDS:
+            return entry[1]
+        return _MISS
+
+    def _store(self, key: str, value: Any, version: int) -> None:
+        # Skip if invalidated while the query was in flight
+        if self._versions.get(key, 0) == version:
+            self._cache[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                for k in list(self._cache) + list(self._inflight):
+                    self._versions[k] = self._versions.get(k, 0) + 1
+                self._cache.clear()
+            else:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._cache.pop(key, None)
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for attr, delta in deltas.items():
+                setattr(self, attr, getattr(self, attr) + delta)
+
+    # -- async path --------------------------------------------------------
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Futures belong to one loop; a new loop (tests, Celery asyncio.run)
+        # starts with a clean in-flight table but keeps the cache.
+        if self._loop is not loop:
+            self._loop = loop
+            self._inflight = {}
+            self._pending = []
+            self._flush_handle = None
+
+    async def load(self, key: str) -> Any:
+        self._count(requests=1)
+        value = self._cached(key)
+        if value is not _MISS:
+            self._count(cache_hits=1)
+            return value
+
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = loop.create_future()
+            self._inflight[key] = fut
+            self._pending.append(key)
+            if len(self._pending) >= _MAX_BATCH:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(_BATCH_WINDOW_S, self._flush)
+        else:
+            self._count(coalesced=1)
+        # Shield: one caller being cancelled must not cancel everyone's query
+        return await asyncio.shield(fut)
+
+    async def load_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        unique = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(k) for k in unique))
+        return dict(zip(unique, values))
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        keys, self._pending = self._pending, []
+        if keys:
+            versions = {k: self._versions.get(k, 0) for k in keys}
+            self._loop.create_task(self._resolve(keys, versions))
+
+    async def _resolve(self, keys: List[str], versions: Dict[str, int]) -> None:
+        self._count(queries=1, keys_fetched=len(keys))
+        try:
+            values = await self._fetch_async(keys)
+            error = None
+        except Exception as e:
+            logger.warning("[DATA_ACCESS] %s batch of %d failed: %s", self.name, len(keys), e)
+            values, error = {}, e
+
+        for key in keys:
+            fut = self._inflight.pop(key, None)
+            if fut is None or fut.done():
+                continue
+            if error is not None:
+                fut.set_exception(error)
+                continue
+            value = values[key] if key in values else self._default()
+            self._store(key, value, versions[key])
+            fut.set_result(value)
+
+    # -- sync path ---------------------------------------------------------
+
+    def load_sync(self, key: str) -> Any:
+        value = self._cached(key)
+        if value is not _MISS:
+            self._count(requests=1, cache_hits=1)
+            return value
+
+        loop = self._loop
+        if (
+            loop is not None and loop.is_running()
+            and not _on_loop_thread(loop) and not on_pool_worker()
+        ):
+            # Plain worker thread: join the coalescer on the event loop
+            future = asyncio.run_coroutine_threadsafe(self.load(key), loop)
+            return future.result(timeout=_SYNC_TIMEOUT_S)
+
+        # Pool worker, loop thread (blocking already) or no loop: fetch directly
+        self._count(requests=1, queries=1, keys_fetched=1)
+        version = self._versions.get(key, 0)
+        values = self._fetch_sync([key])
+        value = values[key] if key in values else self._default()
+        self._store(key, value, version)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "queries": self.queries,
+                "keys_fetched": self.keys_fetched,
+                "cached_keys": len(self._cache),
+                "in_flight": len(self._inflight),
+            }
+
+
+# ---------------------------------------------------------------------------
+# Repository
+# ---------------------------------------------------------------------------
+
+class FpaDataAccess:
+    """Shared read path for fpa_actuals, companies and funds."""
+
+    def __init__(self):
+        self._actuals = _CoalescingLoader(
+            "fpa_actuals", self._fetch_actuals, self._fetch_actuals_rest, list,
+        )
+        self._companies = _CoalescingLoader(
+            "companies", self._fetch_companies, self._fetch_companies_rest, lambda: None,
+        )
+        self._funds = _CoalescingLoader(
+            "funds", self._fetch_funds, self._fetch_funds_rest, lambda: None,
+        )
+
+    # -- public async API --------------------------------------------------
+
+    async def actuals(self, company_id: str) -> List[Dict[str, Any]]:
+        """All fpa_actuals rows for a company, ordered by period."""
+        return await self._actuals.load(company_id)
+
+    async def actuals_many(self, company_ids: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        return await self._actuals.load_many(company_ids)
+
+    async def company(self, company_id: str) -> Optional[Dict[str, Any]]:
+        """companies row (id, name, fund_id, revenue_model, sector) or None."""
+        return await self._companies.load(company_id)
+
+    async def companies(self, company_ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._companies.load_many(company_ids)
+
+    async def company_profile(self, company_id: str) -> Dict[str, Any]:
+        """Company row merged with its fund's fund_type."""
+        company = await self._companies.load(company_id)
+        fund = None
+        if company and company.get("fund_id"):
+            fund = await self._funds.load(company["fund_id"])
+        return self._profile(company, fund)
+
+    async def prefetch(self, company_ids: Sequence[str]) -> None:
+        """Warm actuals + company rows for a turn in one batched query each."""
+        ids = [cid for cid in dict.fromkeys(company_ids) if cid]
+        if not ids:
+            return
+        await asyncio.gather(
+            self._actuals.load_many(ids),
+            self._companies.load_many(ids),
+            return_exceptions=True,
+        )
+
+    # -- public sync API ---------------------------------------------------
+
+    def actuals_sync(self, company_id: str) -> List[Dict[str, Any]]:
+        return self._actuals.load_sync(company_id)
+
+    def company_sync(self, company_id: str) -> Optional[Dict[str, Any]]:
+        return self._companies.load_sync(company_id)
+
+    def fund_sync(self, fund_id: str) -> Optional[Dict[str, Any]]:
+        """funds row (id, fund_type) or None."""
+        return self._funds.load_sync(fund_id)
+
+    def company_profile_sync(self, company_id: str) -> Dict[str, Any]:
+        company = self._companies.load_sync(company_id)
+        fund = None
+        if company and company.get("fund_id"):
+            fund = self._funds.load_sync(company["fund_id"])
+        return self._profile(company, fund)
+
+    # -- housekeeping ------------------------------------------------------
+
+    def invalidate(self, company_id: Optional[str] = None) -> None:
+        """Drop cached rows after an actuals upload / company edit."""
+        self._actuals.invalidate(company_id)
+        self._companies.invalidate(company_id)
+        if company_id is None:
+            self._funds.invalidate()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "backend": "asyncpg" if db_pool.pool is not None else "supabase",
+            "fpa_actuals": self._actuals.stats(),
+            "companies": self._companies.stats(),
+            "funds": self._funds.stats(),
+        }
+
+    @staticmethod
+    def _profile(company: Optional[Dict[str, Any]], fund: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        company = company or {}
+        return {
+            "name": company.get("name"),
+            "fund_id": company.get("fund_id"),
+            "revenue_model": company.get("revenue_model"),
+            "sector": company.get("sector"),
+            "fund_type": (fund or {}).get("fund_type"),
+        }
+
+    # -- backends ----------------------------------------------------------
+
+    async def _fetch(
+        self,
+        keys: List[str],
+        sql: str,
+        rest_fn: Callable[[List[str]], Dict[str, Any]],
+        group: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        ids = _valid_ids(keys)
+        if not ids:
+            return {}
+        if db_pool.pool is not None:
+            try:
+                records = await db_pool.fetch(sql, ids, timeout=_SYNC_TIMEOUT_S)
+                return group([_record_to_row(r) for r in records])
+            except Exception as e:
+                logger.warning("[DATA_ACCESS] asyncpg query failed, using REST: %s", e)
+        from app.core.tool_executor import tool_executors
+        return await tool_executors.run("io", rest_fn, ids)
+
+    async def _fetch_actuals(self, keys: List[str]) -> Dict[str, Any]:
+        return await self._fetch(keys, _ACTUALS_SQL, self._fetch_actuals_rest, self._group_actuals)
+
+    async def _fetch_companies(self, keys: List[str]) -> Dict[str, Any]:
+        return await self._fetch(keys, _COMPANIES_SQL, self._fetch_companies_rest, self._index_by_id)
+
+    async def _fetch_funds(self, keys: List[str]) -> Dict[str, Any]:
+        return await self._fetch(keys, _FUNDS_SQL, self._fetch_funds_rest, self._index_by_id)
+
+    def _fetch_actuals_rest(self, keys: List[str]) -> Dict[str, Any]:
+        from app.core.supabase_client import get_supabase_client
+
+        ids = _valid_ids(keys)
+        sb = get_supabase_client()
+        if not sb or not ids:
+            return {}
+        # Page on the primary key so large multi-company batches aren't
+        # truncated at PostgREST's max-rows, then sort by period.
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = (
+                sb.table("fpa_actuals")
+                .select(", ".join(_ACTUALS_COLUMNS))
+                .in_("company_id", ids)
+                .order("id")
+                .range(offset, offset + _PAGE_SIZE - 1)
+                .execute()
+                .data
+            ) or []
+            rows.extend(page)
+            if len(page) < _PAGE_SIZE:
+                break
+            offset += _PAGE_SIZE
+        rows.sort(key=lambda r: str(r.get("period") or ""))
+        return self._group_actuals(rows)
+
+    def _fetch_companies_rest(self, keys: List[str]) -> Dict[str, Any]:
+        return self._select_by_id("companies", _COMPANY_COLUMNS, keys)
+
+    def _fetch_funds_rest(self, keys: List[str]) -> Dict[str, Any]:
+        return self._select_by_id("funds", _FUND_COLUMNS, keys)
+
+    def _select_by_id(self, table: str, columns: Sequence[str], keys: List[str]) -> Dict[str, Any]:
+        from app.core.supabase_client import get_supabase_client
+
+        ids = _valid_ids(keys)
+        sb = get_supabase_client()
+        if not sb or not ids:
+            return {}
+        rows = (
+            sb.table(table)
+            .select(", ".join(columns))
+            .in_("id", ids)
+            .execute()
+            .data
+        ) or []
+        return self._index_by_id(rows)
+
+    @staticmethod
+    def _group_actuals(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault(row.get("company_id"), []).append(row)
+        return grouped
+
+    @staticmethod
+    def _index_by_id(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        return {row["id"]: row for row in rows if row.get("id")}
+
+
+# Singleton — import this everywhere
+fpa_data = FpaDataAccess()
+
+# Actuals writes in any worker drop this process's rows too (see core/cache_bus)
+cache_bus.on_invalidate("actuals", fpa_data.invalidate)
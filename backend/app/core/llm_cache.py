@@ -0,0 +1,265 @@
+"""
+Two-tier LLM response cache with single-flight de-duplication.
+
+ModelRouter.get_completion sends identical prompts surprisingly often: the
+same extraction prompt for a document re-run through ParallelDocProcessor,
+micro-skill lookups at temperature 0 for the same company, repeat
+diligence runs. This layer lets those share one provider call:
+
+    from app.core.llm_cache import llm_cache
+
+    key = llm_cache.key(prompt=..., system_prompt=..., max_tokens=..., ...)
+    result, source = await llm_cache.get_or_compute(key, call_provider, ttl=3600)
+
+Tiers:
+  - L1: per-process LRU bounded by entry count and total response bytes
+        (O(1) eviction).
+  - L2: the shared ``core/redis_client.cache`` so uvicorn and Celery workers
+        reuse each other's responses. Skipped when Redis isn't configured
+        (the in-memory fallback would just duplicate L1).
+
+Concurrent misses on the same key within one event loop await one in-flight
+call; a caller on another loop (asyncio.run in a worker thread) can't await
+that future and computes for itself. Failures are never cached; every waiter
+sees the same exception. Callers get their own copy of the response, never
+the cached object.
+
+stats() reports hits per tier, coalesced waiters, misses and the provider
+cost avoided.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+L1_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+L1_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# TTL for deterministic (temperature 0 / opted-in) responses; sampled
+# responses keep ModelRouter's short cache_ttl.
+DETERMINISTIC_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+# Off by default: temperature 0 doesn't make providers deterministic, so a
+# 24h entry can pin one sampled answer. Callers opt in with cache=True;
+# LLM_CACHE_DETERMINISTIC=1 restores blanket caching of temperature-0 calls.
+CACHE_DETERMINISTIC = os.getenv("LLM_CACHE_DETERMINISTIC", "0").lower() in ("1", "true", "yes")
+
+_KEY_PREFIX = "llm:v1:"
+
+
+def _entry_size(value: Dict[str, Any]) -> int:
+    return len(value.get("response") or "") + 256
+
+
+class LLMResponseCache:
+    """In-process LRU in front of the shared Redis cache, with single-flight."""
+
+    def __init__(self, max_entries: int = L1_MAX_ENTRIES, max_bytes: int = L1_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._l1: "OrderedDict[str, Tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self._bytes = 0
+        # (id(loop), key) → future; a future can only be awaited on its own loop
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.l2_errors = 0
+        self.cost_saved = 0.0
+        self.tokens_saved = 0
+
+    # -- keys ----------------------------------------------------------------
+
+    @staticmethod
+    def key(
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool = False,
+        capability: Optional[str] = None,
+        preferred_models: Optional[Sequence[str]] = None,
+    ) -> str:
+        """Stable key over everything that changes the response."""
+        payload = json.dumps(
+            [prompt, system_prompt or "", max_tokens, round(float(temperature), 4),
+             bool(json_mode), capability or "", list(preferred_models or ())],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return _KEY_PREFIX + hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    # -- L1 ------------------------------------------------------------------
+
+    def _l1_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if time.time() >= expires_at:
+                del self._l1[key]
+                self._bytes -= size
+                return None
+            self._l1.move_to_end(key)
+            return value
+
+    def _l1_put(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._l1.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._l1[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+            while self._l1 and (len(self._l1) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted) = self._l1.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    # -- L2 ------------------------------------------------------------------
+
+    @staticmethod
+    def _shared():
+        from app.core.redis_client import cache
+        return cache if cache.is_real_redis else None
+
+    async def _l2_get(self, key: str) -> Optional[Dict[str, Any]]:
+        shared = self._shared()
+        if shared is None:
+            return None
+        try:
+            value = await shared.get(key)
+        except Exception as e:
+            self.l2_errors += 1
+            logger.debug("[LLM_CACHE] shared read failed: %s", e)
+            return None
+        return value if isinstance(value, dict) and "response" in value else None
+
+    async def _l2_put(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        shared = self._shared()
+        if shared is None:
+            return
+        try:
+            await shared.set(key, value, ttl=ttl)
+        except Exception as e:
+            self.l2_errors += 1
+            logger.debug("[LLM_CACHE] shared write failed: %s", e)
+
+    # -- lookup --------------------------------------------------------------
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        value = self._l1_get(key)
+        if value is not None:
+            return copy.deepcopy(value), "l1"
+        value = await self._l2_get(key)
+        if value is not None:
+            return value, "l2"
+        return None, "miss"
+
+    async def put(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        self.stores += 1
+        self._l1_put(key, value, ttl)
+        await self._l2_put(key, value, ttl)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl: int,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return (value, source); source is "l1", "l2", "inflight" or "miss"."""
+        value = self._l1_get(key)
+        if value is not None:
+            self._record_hit("l1", value)
+            return copy.deepcopy(value), "l1"
+
+        loop = asyncio.get_running_loop()
+        flight = (id(loop), key)
+        with self._inflight_lock:
+            pending = self._inflight.get(flight)
+            if pending is None:
+                future: asyncio.Future = loop.create_future()
+                self._inflight[flight] = future
+        if pending is not None:
+            value = await asyncio.shield(pending)
+            self._record_hit("inflight", value)
+            return copy.deepcopy(value), "inflight"
+
+        try:
+            value = await self._l2_get(key)
+            if value is not None:
+                self._l1_put(key, value, ttl)
+                source = "l2"
+                self._record_hit(source, value)
+            else:
+                self.misses += 1
+                value = await compute()
+                source = "miss"
+                await self.put(key, value, ttl)
+            future.set_result(value)
+            return copy.deepcopy(value), source
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting — don't warn about an unretrieved error
+            future.exception()
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(flight, None)
+
+    def _record_hit(self, source: str, value: Dict[str, Any]) -> None:
+        if source == "l1":
+            self.l1_hits += 1
+        elif source == "l2":
+            self.l2_hits += 1
+        else:
+            self.coalesced += 1
+        self.cost_saved += float(value.get("cost") or 0.0)
+        self.tokens_saved += int(value.get("input_tokens") or 0) + int(value.get("output_tokens") or 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._l1.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.l1_hits + self.l2_hits + self.coalesced
+        lookups = hits + self.misses
+        return {
+            "l1_entries": len(self._l1),
+            "l1_bytes": self._bytes,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "in_flight": len(self._inflight),
+            "l2_enabled": self._shared() is not None,
+            "l2_errors": self.l2_errors,
+            "cost_saved": round(self.cost_saved, 4),
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+# Singleton — import this everywhere
+llm_cache = LLMResponseCache()
@@ -16,6 +16,7 @@ process-local dict (fine for single-instance, loses state on restart).
 import asyncio
 import json
 import logging
+import threading
 import time
 from typing import Any, Dict, Optional
 
@@ -166,3 +167,33 @@ def _create_cache():
 
 # Singleton — import this everywhere
 cache = _create_cache()
+
+
+_sync_client = None
+_sync_lock = threading.Lock()
+
+
+def get_sync_redis():
+    """Blocking redis-py client for threads and sync code, or None without REDIS_URL.
+
+    Used where an event loop isn't available (pub/sub listener threads,
+    sync service code). Shares one connection pool per process.
+    """
+    global _sync_client
+    if not cache.is_real_redis:
+        return None
+    if _sync_client is None:
+        with _sync_lock:
+            if _sync_client is None:
+                import redis
+                from app.core.config import settings
+
+                _sync_client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_connect_timeout=5,
+                    socket_timeout=5,
+                    health_check_interval=30,
+                    retry_on_timeout=True,
+                )
+    return _sync_client
@@ -0,0 +1,177 @@
+"""
+Bounded executor pools for blocking work called from async handlers.
+
+Agent tool handlers are async, but most of what they call is synchronous:
+NumPy / pandas model builds (CPU-bound) and supabase-py queries (blocking
+IO). Run inline, one Monte Carlo request freezes the event loop — and with
+it every other user's stream on that worker. Route that work here instead:
+
+    from app.core.tool_executor import tool_executors
+
+    result = await tool_executors.run("cpu", engine.simulate, company_id)
+
+Pools:
+  - "cpu":     threads sized to the core count. Tool handlers are bound to
+               orchestrator state (locks, shared_data), so the calls they
+               offload are closures over live objects that can't be pickled;
+               the heavy kernels are NumPy, which releases the GIL.
+  - "io":      a wider thread pool for blocking network / DB clients.
+
+Calls made from inside a pool worker run inline, so a nested offload can
+never deadlock a saturated pool.
+
+stats() reports in-flight work, queue depth and saturation per pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_CPU_COUNT = os.cpu_count() or 2
+
+POOL_SIZES: Dict[str, int] = {
+    "cpu": int(os.getenv("TOOL_CPU_WORKERS", max(2, _CPU_COUNT))),
+    "io": int(os.getenv("TOOL_IO_WORKERS", min(32, _CPU_COUNT * 4))),
+}
+
+# Set on pool worker threads so nested run() calls execute inline
+_worker_state = threading.local()
+
+
+class _PoolStats:
+    """Thread-safe counters for one pool."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.wall_seconds = 0.0
+
+    def on_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def on_done(self, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.wall_seconds += elapsed
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            running = min(self.in_flight, self.max_workers)
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "running": running,
+                "queue_depth": max(0, self.in_flight - self.max_workers),
+                "saturation": round(running / self.max_workers, 3) if self.max_workers else 0.0,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wall_seconds": round(self.wall_seconds, 3),
+            }
+
+
+def _run_marked(fn: Callable[..., Any]) -> Any:
+    """Thread-pool entry point: flag the worker so nested calls run inline."""
+    _worker_state.active = True
+    try:
+        return fn()
+    finally:
+        _worker_state.active = False
+
+
+def on_pool_worker() -> bool:
+    """True on a cpu / io pool thread, where blocking on pool work could starve it."""
+    return getattr(_worker_state, "active", False)
+
+
+class ToolExecutorPools:
+    """Lazily created cpu / io thread pools with saturation metrics."""
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None):
+        self._sizes = dict(sizes or POOL_SIZES)
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._stats: Dict[str, _PoolStats] = {
+            kind: _PoolStats(size) for kind, size in self._sizes.items()
+        }
+        self._create_lock = threading.Lock()
+
+    def _executor(self, kind: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(kind)
+        if executor is not None:
+            return executor
+        with self._create_lock:
+            executor = self._executors.get(kind)
+            if executor is None:
+                size = self._sizes[kind]
+                executor = ThreadPoolExecutor(
+                    max_workers=size, thread_name_prefix=f"tool-{kind}",
+                )
+                self._executors[kind] = executor
+                logger.info("[EXECUTOR] %s pool started (%d workers)", kind, size)
+        return executor
+
+    async def run(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on the ``kind`` pool and await its result.
+
+        kind: "cpu" | "io". Unknown kinds fall back to "io".
+        """
+        if kind not in self._sizes:
+            kind = "io"
+
+        # Already off the event loop — don't queue behind ourselves
+        if on_pool_worker():
+            return fn(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        stats = self._stats[kind]
+        # Carry contextvars (request ids, tool context) like asyncio.to_thread
+        ctx = contextvars.copy_context()
+        call = functools.partial(
+            _run_marked, functools.partial(ctx.run, fn, *args, **kwargs),
+        )
+
+        stats.on_submit()
+        started = time.monotonic()
+        # Account on the pool future, not in this coroutine: a cancelled
+        # await returns at once while the worker keeps running
+        future = self._executor(kind).submit(call)
+        future.add_done_callback(
+            lambda f: stats.on_done(
+                time.monotonic() - started, not f.cancelled() and f.exception() is None,
+            )
+        )
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-pool in-flight work, queue depth and saturation (0-1)."""
+        return {kind: s.snapshot() for kind, s in self._stats.items()}
+
+    def shutdown(self, wait: bool = False) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        self._executors.clear()
+
+
+# Singleton — import this everywhere
+tool_executors = ToolExecutorPools()
@@ -90,6 +90,21 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to pre-warm unified orchestrator: {e}")
     yield
     logger.info("Shutting down Dilla AI Backend...")
+    try:
+        from app.core.tool_executor import tool_executors
+        tool_executors.shutdown(wait=False)
+    except Exception as e:
+        logger.error(f"Failed to shut down tool executor pools: {e}")
+    try:
+        from app.core.cache_bus import cache_bus
+        cache_bus.stop()
+    except Exception as e:
+        logger.error(f"Failed to stop cache invalidation listener: {e}")
+    try:
+        from app.services.integrations.transport import connector_transport
+        await connector_transport.aclose()
+    except Exception as e:
+        logger.error(f"Failed to close connector HTTP pools: {e}")
 
 
 _is_production = settings.ENVIRONMENT != "development"
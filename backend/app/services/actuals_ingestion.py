@@ -1,8 +1,10 @@
 """Normalize extraction time_series → fpa_actuals rows."""
 
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+import contextlib
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -196,59 +198,51 @@ def get_taxonomy_for_model(business_model: str = "saas") -> Dict[str, list]:
     return merged
 
 
+# Keyword fallback for classify_label_to_subcategory (business-model-agnostic);
+# first (category, subcategory) with a keyword inside the label wins.
+SUBCATEGORY_KEYWORDS = {
+    ("revenue", "subscription"): ["subscription", "recurring", "mrr", "arr", "saas"],
+    ("revenue", "professional_services"): ["professional", "consulting", "advisory", "implementation"],
+    ("revenue", "usage_based"): ["usage", "consumption", "metered", "api_calls"],
+    ("revenue", "take_rate"): ["take_rate", "commission", "marketplace_fee", "gmv"],
+    ("revenue", "product_sales"): ["product_sales", "device_sales", "unit_sales"],
+    ("cogs", "hosting"): ["hosting", "aws", "gcp", "azure", "cloud", "servers"],
+    ("cogs", "support_salaries"): ["support", "customer_success", "cs_team"],
+    ("cogs", "payment_processing"): ["stripe", "payment", "processing_fee", "interchange"],
+    ("cogs", "inventory"): ["inventory", "raw_material", "goods", "stock"],
+    ("cogs", "fulfillment"): ["fulfillment", "warehouse", "picking", "packing", "3pl"],
+    ("cogs", "raw_materials"): ["raw_materials", "feedstock", "components", "supplies"],
+    ("cogs", "manufacturing"): ["manufacturing", "production", "assembly_line", "factory"],
+    ("cogs", "labor"): ["direct_labor", "shop_floor", "production_staff", "hourly_labor"],
+    ("cogs", "logistics"): ["logistics", "freight", "shipping", "distribution", "trucking"],
+    ("opex_rd", "engineering_salaries"): ["engineering", "developer", "software_eng", "tech_team"],
+    ("opex_rd", "infra_cloud"): ["infra", "devops", "platform"],
+    ("opex_rd", "tools_licenses"): ["tools", "license", "software_sub", "jira", "github"],
+    ("opex_rd", "hardware_engineering"): ["hardware_eng", "electrical_eng", "mechanical_eng"],
+    ("opex_sm", "paid_acquisition"): ["paid", "ads", "advertising", "google_ads", "meta_ads", "sem", "ppc"],
+    ("opex_sm", "content_marketing"): ["content", "seo", "blog", "social_media"],
+    ("opex_sm", "sales_salaries"): ["sales_team", "sales_salary", "ae_", "sdr_", "bdr_"],
+    ("opex_ga", "finance_legal"): ["legal", "accounting", "audit", "finance_team", "cfo"],
+    ("opex_ga", "office"): ["office", "rent", "utilities", "coworking"],
+    ("opex_ga", "facility_lease"): ["facility", "warehouse_lease", "factory_rent", "plant_lease"],
+    ("opex_ga", "admin_salaries"): ["admin", "hr", "people_ops", "office_manager"],
+    ("opex_ga", "insurance"): ["insurance", "d&o", "e&o", "liability"],
+    ("opex_ga", "compliance"): ["compliance", "regulatory", "licensing"],
+}
+
+
 def classify_label_to_subcategory(
     label: str, business_model: str = "saas"
 ) -> tuple:
     """Map a P&L line-item label to (category, subcategory).
 
-    Uses keyword matching against the active taxonomy for the business model.
+    Uses keyword matching against the active taxonomy for the business model
+    (first taxonomy entry either way round, then SUBCATEGORY_KEYWORDS).
+    Indexed and memoized by label_classifier.
     Returns ("", "") if no match found.
     """
-    normalized = label.lower().strip().replace("-", "_").replace(" ", "_")
-    taxonomy = get_taxonomy_for_model(business_model)
-
-    # Direct subcategory match
-    for cat, subs in taxonomy.items():
-        for sub in subs:
-            if sub in normalized or normalized in sub:
-                return (cat, sub)
-
-    # Keyword-based fallback patterns (business-model-agnostic)
-    _KEYWORD_MAP = {
-        ("revenue", "subscription"): ["subscription", "recurring", "mrr", "arr", "saas"],
-        ("revenue", "professional_services"): ["professional", "consulting", "advisory", "implementation"],
-        ("revenue", "usage_based"): ["usage", "consumption", "metered", "api_calls"],
-        ("revenue", "take_rate"): ["take_rate", "commission", "marketplace_fee", "gmv"],
-        ("revenue", "product_sales"): ["product_sales", "device_sales", "unit_sales"],
-        ("cogs", "hosting"): ["hosting", "aws", "gcp", "azure", "cloud", "servers"],
-        ("cogs", "support_salaries"): ["support", "customer_success", "cs_team"],
-        ("cogs", "payment_processing"): ["stripe", "payment", "processing_fee", "interchange"],
-        ("cogs", "inventory"): ["inventory", "raw_material", "goods", "stock"],
-        ("cogs", "fulfillment"): ["fulfillment", "warehouse", "picking", "packing", "3pl"],
-        ("cogs", "raw_materials"): ["raw_materials", "feedstock", "components", "supplies"],
-        ("cogs", "manufacturing"): ["manufacturing", "production", "assembly_line", "factory"],
-        ("cogs", "labor"): ["direct_labor", "shop_floor", "production_staff", "hourly_labor"],
-        ("cogs", "logistics"): ["logistics", "freight", "shipping", "distribution", "trucking"],
-        ("opex_rd", "engineering_salaries"): ["engineering", "developer", "software_eng", "tech_team"],
-        ("opex_rd", "infra_cloud"): ["infra", "devops", "platform"],
-        ("opex_rd", "tools_licenses"): ["tools", "license", "software_sub", "jira", "github"],
-        ("opex_rd", "hardware_engineering"): ["hardware_eng", "electrical_eng", "mechanical_eng"],
-        ("opex_sm", "paid_acquisition"): ["paid", "ads", "advertising", "google_ads", "meta_ads", "sem", "ppc"],
-        ("opex_sm", "content_marketing"): ["content", "seo", "blog", "social_media"],
-        ("opex_sm", "sales_salaries"): ["sales_team", "sales_salary", "ae_", "sdr_", "bdr_"],
-        ("opex_ga", "finance_legal"): ["legal", "accounting", "audit", "finance_team", "cfo"],
-        ("opex_ga", "office"): ["office", "rent", "utilities", "coworking"],
-        ("opex_ga", "facility_lease"): ["facility", "warehouse_lease", "factory_rent", "plant_lease"],
-        ("opex_ga", "admin_salaries"): ["admin", "hr", "people_ops", "office_manager"],
-        ("opex_ga", "insurance"): ["insurance", "d&o", "e&o", "liability"],
-        ("opex_ga", "compliance"): ["compliance", "regulatory", "licensing"],
-    }
-
-    for (cat, sub), keywords in _KEYWORD_MAP.items():
-        if any(kw in normalized for kw in keywords):
-            return (cat, sub)
-
-    return ("", "")
+    from app.services.label_classifier import label_classifier
+    return label_classifier.subcategory(label, business_model)
 
 
 def _resolve_account_code(
@@ -423,6 +417,10 @@ def ingest_time_series(
         on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
     ).execute()
 
+    # Drop cached pulls so the next read sees the new rows
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(company_id)
+
     # Bayesian updating — adjust priors on any model specs stored in branches
     _update_model_spec_priors(sb, company_id, rows)
 
@@ -494,10 +492,229 @@ def _update_model_spec_priors(sb, company_id: str, rows: List[Dict]) -> None:
                 branch["id"], period_idx,
             )
 
+        from app.services.scenario_branch_service import invalidate_branch_cache
+        invalidate_branch_cache(company_id)
+
     except Exception as e:
         logger.warning("Model spec prior update failed (non-fatal): %s", e)
 
 
+# ---------------------------------------------------------------------------
+# Bulk writer — streamed CSV uploads
+# ---------------------------------------------------------------------------
+
+_STAGE_TABLE = "_fpa_actuals_stage"
+_STAGE_COLUMNS = ("seq", "period", "category", "subcategory", "hierarchy_path", "amount")
+_MERGE_TIMEOUT_S = float(os.getenv("FPA_BULK_MERGE_TIMEOUT_S", "300"))
+_REST_UPSERT_CHUNK = 1000
+# REST fallback: deduped records held before they are written out
+_REST_FLUSH_ROWS = int(os.getenv("FPA_BULK_REST_FLUSH_ROWS", str(10 * _REST_UPSERT_CHUNK)))
+_CONFLICT_KEY = "company_id,period,category,subcategory,hierarchy_path,source"
+
+_CREATE_STAGE_SQL = f"""
+    CREATE TEMP TABLE {_STAGE_TABLE} (
+        seq bigint NOT NULL,
+        period date NOT NULL,
+        category text NOT NULL,
+        subcategory text NOT NULL,
+        hierarchy_path text NOT NULL,
+        amount double precision NOT NULL
+    ) ON COMMIT DROP
+"""
+
+_DELETE_STALE_SQL = f"""
+    DELETE FROM fpa_actuals
+    WHERE company_id = $1::uuid
+      AND source = $2
+      AND period IN (
+          SELECT DISTINCT period FROM {_STAGE_TABLE}
+          WHERE NOT (category = ANY($3::text[]))
+      )
+"""
+
+# Last staged value wins per conflict key, same as the REST path's dict dedup
+_MERGE_SQL = f"""
+    INSERT INTO fpa_actuals
+        (company_id, fund_id, period, category, subcategory, hierarchy_path, amount, source)
+    SELECT $1::uuid, $2::uuid, period, category, subcategory, hierarchy_path, amount::numeric, $3
+    FROM (
+        SELECT DISTINCT ON (period, category, subcategory, hierarchy_path) *
+        FROM {_STAGE_TABLE}
+        WHERE NOT (category = ANY($4::text[]))
+        ORDER BY period, category, subcategory, hierarchy_path, seq DESC
+    ) latest
+    ON CONFLICT ({_CONFLICT_KEY})
+    DO UPDATE SET amount = EXCLUDED.amount, fund_id = EXCLUDED.fund_id
+"""
+
+
+class ActualsBulkWriter:
+    """Write a streamed upload into fpa_actuals with one set-based merge.
+
+    Records are ``(period, category, subcategory, hierarchy_path, amount)``
+    tuples, ``period`` a first-of-month ``date``:
+
+        async with ActualsBulkWriter(company_id, fund_id) as writer:
+            for batch in batches:
+                await writer.write(batch)
+            ingested = await writer.merge(skip_categories={"gross_profit"})
+
+    With the asyncpg pool, batches are COPYed into a temp staging table and
+    ``merge`` runs one DELETE over the upload's periods plus one
+    INSERT ... SELECT, all in a single transaction — a failed upload leaves
+    fpa_actuals untouched. Without the pool, records are deduped in memory
+    and flushed every _REST_FLUSH_ROWS keys as chunked REST upserts, each
+    period's old rows deleted just before its first flush; ``merge`` then
+    drops the skipped categories. That path isn't transactional — a failed
+    upload can leave its already-flushed periods replaced.
+    """
+
+    def __init__(self, company_id: str, fund_id: Optional[str] = None, source: str = "csv_upload"):
+        self.company_id = company_id
+        self.fund_id = fund_id
+        self.source = source
+        self.staged = 0
+        self._stack: Optional[contextlib.AsyncExitStack] = None
+        self._conn = None
+        self._pending: Dict[tuple, float] = {}   # REST fallback only
+        self._cleared_periods: set = set()          # REST fallback only
+
+    @property
+    def backend(self) -> str:
+        return "asyncpg" if self._conn is not None else "supabase"
+
+    async def __aenter__(self) -> "ActualsBulkWriter":
+        from app.core.database_pool import db_pool
+
+        if db_pool.pool is not None:
+            self._stack = contextlib.AsyncExitStack()
+            try:
+                self._conn = await self._stack.enter_async_context(db_pool.acquire())
+                await self._stack.enter_async_context(self._conn.transaction())
+                await self._conn.execute(_CREATE_STAGE_SQL)
+            except Exception as e:
+                logger.warning("[actuals-bulk] asyncpg staging unavailable, using REST: %s", e)
+                await self._stack.aclose()
+                self._stack, self._conn = None, None
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if self._stack is not None:
+            # exiting the transaction context commits, or rolls back on error
+            await self._stack.__aexit__(exc_type, exc, tb)
+            self._stack, self._conn = None, None
+        self._pending.clear()
+        self._cleared_periods.clear()
+        return False
+
+    async def write(self, records: List[tuple]) -> None:
+        """Stage one batch of records."""
+        if not records:
+            return
+        if self._conn is not None:
+            start = self.staged
+            await self._conn.copy_records_to_table(
+                _STAGE_TABLE,
+                records=[(start + i, *r) for i, r in enumerate(records)],
+                columns=_STAGE_COLUMNS,
+                timeout=_MERGE_TIMEOUT_S,
+            )
+        else:
+            for period, category, subcategory, hierarchy_path, amount in records:
+                self._pending[(period, category, subcategory, hierarchy_path)] = amount
+            if len(self._pending) >= _REST_FLUSH_ROWS:
+                from app.core.tool_executor import tool_executors
+                await tool_executors.run("io", self._flush_rest)
+        self.staged += len(records)
+
+    async def merge(self, skip_categories: Iterable[str] = ()) -> int:
+        """Replace this company's rows for the staged periods; return rows written."""
+        skip = sorted(set(skip_categories))
+        if self._conn is not None:
+            await self._conn.execute(
+                _DELETE_STALE_SQL, self.company_id, self.source, skip, timeout=_MERGE_TIMEOUT_S,
+            )
+            status = await self._conn.execute(
+                _MERGE_SQL, self.company_id, self.fund_id, self.source, skip, timeout=_MERGE_TIMEOUT_S,
+            )
+            written = int(status.rsplit(" ", 1)[-1])
+        else:
+            from app.core.tool_executor import tool_executors
+            written = await tool_executors.run("io", self._merge_rest, set(skip))
+
+        from app.services.company_data_pull import invalidate_company_cache
+        invalidate_company_cache(self.company_id)
+        return written
+
+    @staticmethod
+    def _rest_client():
+        from app.core.supabase_client import get_supabase_client
+
+        sb = get_supabase_client()
+        if not sb:
+            raise RuntimeError("Database unavailable")
+        return sb
+
+    def _flush_rest(self) -> None:
+        """Write the pending records out; last value per key still wins across flushes."""
+        if not self._pending:
+            return
+        sb = self._rest_client()
+        pending, self._pending = self._pending, {}
+        rows = [
+            {
+                "company_id": self.company_id,
+                "fund_id": self.fund_id,
+                "period": period.isoformat(),
+                "category": category,
+                "subcategory": subcategory,
+                "hierarchy_path": hierarchy_path,
+                "amount": amount,
+                "source": self.source,
+            }
+            for (period, category, subcategory, hierarchy_path), amount in pending.items()
+        ]
+        # Replace, don't merge: drop the source's old rows for a period before
+        # its first upsert, never after (that would delete earlier flushes)
+        new_periods = sorted({r["period"] for r in rows} - self._cleared_periods)
+        if new_periods:
+            sb.table("fpa_actuals") \
+                .delete() \
+                .eq("company_id", self.company_id) \
+                .eq("source", self.source) \
+                .in_("period", new_periods) \
+                .execute()
+            self._cleared_periods.update(new_periods)
+        for i in range(0, len(rows), _REST_UPSERT_CHUNK):
+            sb.table("fpa_actuals").upsert(
+                rows[i:i + _REST_UPSERT_CHUNK], on_conflict=_CONFLICT_KEY,
+            ).execute()
+
+    def _merge_rest(self, skip: set) -> int:
+        self._flush_rest()
+        if not self._cleared_periods:
+            return 0
+        sb = self._rest_client()
+        periods = sorted(self._cleared_periods)
+        if skip:
+            sb.table("fpa_actuals") \
+                .delete() \
+                .eq("company_id", self.company_id) \
+                .eq("source", self.source) \
+                .in_("period", periods) \
+                .in_("category", sorted(skip)) \
+                .execute()
+        # Every row left in these periods came from this upload
+        result = sb.table("fpa_actuals") \
+            .select("id", count="exact") \
+            .eq("company_id", self.company_id) \
+            .eq("source", self.source) \
+            .in_("period", periods) \
+            .limit(1) \
+            .execute()
+        return int(result.count or 0)
+
+
 def get_company_financials_snapshot(company_id: str) -> Dict[str, Any]:
     """DEPRECATED — use ``company_data_pull.pull_company_data()`` instead.
 
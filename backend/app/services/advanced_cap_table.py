@@ -15,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 # HARDCODED ASSUMPTION: Industry benchmark shows 70% of options don't get exercised at exit
 DEFAULT_OPTION_EXERCISE_RATE = 0.30  # 30% of options are typically exercised (70% unexercised)
+DEFAULT_ESCROW_PCT = 0.10  # share of exit proceeds held back in escrow
 
 
 class ShareClass(str, Enum):
@@ -403,7 +404,7 @@ class CapTableCalculator:
             return {
                 'distributions': convert_numpy_to_native(df_result.to_dict('records')),
                 'total_distributed': float(df_result['total'].sum()),
-                'escrow': float(exit_value_decimal * Decimal('0.1')),
+                'escrow': float(exit_value_decimal * Decimal(str(DEFAULT_ESCROW_PCT))),
                 'summary': {
                     'founders': float(df_result[df_result['share_class'] == 'common']['total'].sum()),
                     'investors': float(df_result[df_result['share_class'] != 'common']['total'].sum()),
@@ -592,95 +593,98 @@ class CapTableCalculator:
             'preference_stack': liquidation_stack  # Include for transparency
         }
     
+    # Series preferred seniority — later money is paid first (LIFO)
+    _PREFERRED_SENIORITY = {
+        ShareClass.PREFERRED_A: 1,
+        ShareClass.PREFERRED_B: 2,
+        ShareClass.PREFERRED_C: 3,
+        ShareClass.PREFERRED_D: 4,
+        ShareClass.PREFERRED_E: 5,
+        ShareClass.PREFERRED_F: 6,
+    }
+    # No liquidation preference — share in proceeds as common
+    _COMMON_EQUIVALENT = (ShareClass.COMMON, ShareClass.OPTIONS, ShareClass.WARRANTS)
+
+    def compile_exit_waterfall(
+        self,
+        option_exercise_rate: float = DEFAULT_OPTION_EXERCISE_RATE,
+    ):
+        """Compile share entries into exact payout curves (see waterfall_engine).
+
+        Claims follow share_entries order. Preferred classes are paid LIFO by
+        series (SAFEs / notes junior to priced rounds) and may convert to
+        common; options count at ``option_exercise_rate``.
+        """
+        from app.services.waterfall_engine import WaterfallClaim, compile_waterfall
+
+        claims = []
+        seen: Dict[str, int] = {}
+        for entry in self.share_entries:
+            name = entry.shareholder_name
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                name = f"{name} ({seen[name]})"
+
+            shares = float(entry.num_shares)
+            if entry.share_class == ShareClass.OPTIONS:
+                shares *= option_exercise_rate
+            if entry.share_class in self._COMMON_EQUIVALENT:
+                claims.append(WaterfallClaim(name=name, shares=shares))
+                continue
+
+            invested = float(entry.num_shares * entry.price_per_share)
+            cap = entry.rights.participation_cap
+            claims.append(WaterfallClaim(
+                name=name,
+                shares=shares * entry.rights.conversion_ratio,
+                preference=invested * entry.rights.liquidation_preference,
+                seniority=self._PREFERRED_SENIORITY.get(entry.share_class, 0),
+                participating=entry.rights.participation_rights,
+                participation_cap=invested * cap if cap else None,
+            ))
+        return compile_waterfall(claims)
+
     def calculate_exit_waterfall(
         self,
         exit_value: Decimal,
         include_escrow: bool = True,
-        escrow_pct: float = 0.10,
+        escrow_pct: float = DEFAULT_ESCROW_PCT,
         option_exercise_rate: float = DEFAULT_OPTION_EXERCISE_RATE
     ) -> pd.DataFrame:
         """Calculate exit proceeds distribution
-        
-        Note: Assumes only 25% of options are exercised at exit (industry benchmark)
+
+        Note: Assumes only 30% of options are exercised at exit (industry benchmark)
         """
-        
+
         # Deduct escrow if applicable
         if include_escrow:
-            distributable = exit_value * (Decimal('1') - Decimal(str(escrow_pct)))
-            escrow_amount = exit_value * Decimal(str(escrow_pct))
+            distributable = float(exit_value) * (1 - escrow_pct)
         else:
-            distributable = exit_value
-            escrow_amount = Decimal('0')
-            
+            distributable = float(exit_value)
+
+        waterfall = self.compile_exit_waterfall(option_exercise_rate)
+        parts = waterfall.breakdown(distributable)
+
         distributions = []
-        remaining = distributable
-        
-        # Step 1: Pay liquidation preferences
-        for entry in self.share_entries:
-            if entry.share_class != ShareClass.COMMON:
-                liq_pref = entry.num_shares * entry.price_per_share * Decimal(str(entry.rights.liquidation_preference))
-                
-                if remaining >= liq_pref:
-                    distributions.append({
-                        'shareholder': entry.shareholder_name,
-                        'share_class': entry.share_class.value,
-                        'liquidation_preference': float(liq_pref),
-                        'participation': 0,
-                        'common_distribution': 0,
-                        'total': float(liq_pref)
-                    })
-                    remaining -= liq_pref
-                else:
-                    # Pro-rata if not enough to cover all preferences
-                    distributions.append({
-                        'shareholder': entry.shareholder_name,
-                        'share_class': entry.share_class.value,
-                        'liquidation_preference': float(remaining),
-                        'participation': 0,
-                        'common_distribution': 0,
-                        'total': float(remaining)
-                    })
-                    remaining = Decimal('0')
-                    break
-                    
-        # Step 2: Distribute remaining to common (and participating preferred)
-        if remaining > 0:
-            # Calculate participating shares
-            total_participating = Decimal('0')
-            for entry in self.share_entries:
-                if entry.share_class == ShareClass.COMMON or entry.rights.participation_rights:
-                    # Apply option exercise rate - only 25% of options are exercised
-                    if entry.share_class == ShareClass.OPTIONS:
-                        exercised_shares = entry.num_shares * Decimal(str(option_exercise_rate))
-                        total_participating += exercised_shares
-                    else:
-                        total_participating += entry.num_shares
-                    
-            # Distribute pro-rata
-            for i, entry in enumerate(self.share_entries):
-                if entry.share_class == ShareClass.COMMON or entry.rights.participation_rights:
-                    # Apply option exercise rate for options
-                    if entry.share_class == ShareClass.OPTIONS:
-                        effective_shares = entry.num_shares * Decimal(str(option_exercise_rate))
-                    else:
-                        effective_shares = entry.num_shares
-                    share_of_remaining = (effective_shares / total_participating) * remaining
-                    
-                    if i < len(distributions):
-                        distributions[i]['common_distribution'] = float(share_of_remaining)
-                        distributions[i]['total'] += float(share_of_remaining)
-                    else:
-                        distributions.append({
-                            'shareholder': entry.shareholder_name,
-                            'share_class': entry.share_class.value,
-                            'liquidation_preference': 0,
-                            'participation': float(share_of_remaining) if entry.rights.participation_rights else 0,
-                            'common_distribution': float(share_of_remaining) if entry.share_class == ShareClass.COMMON else 0,
-                            'total': float(share_of_remaining)
-                        })
-                        
-        df = pd.DataFrame(distributions)
-        
+        for h, entry in enumerate(self.share_entries):
+            total = float(parts['total'][h, 0])
+            preference = float(parts['preference'][h, 0])
+            upside = total - preference
+            participating = entry.rights.participation_rights and not parts['converted'][h, 0]
+            distributions.append({
+                'shareholder': entry.shareholder_name,
+                'share_class': entry.share_class.value,
+                'liquidation_preference': preference,
+                'participation': upside if participating else 0,
+                'common_distribution': 0 if participating else upside,
+                'total': total
+            })
+
+        df = pd.DataFrame(distributions, columns=[
+            'shareholder', 'share_class', 'liquidation_preference',
+            'participation', 'common_distribution', 'total',
+        ])
+
         # Add summary row
         summary = pd.DataFrame([{
             'shareholder': 'TOTAL',
@@ -690,19 +694,19 @@ class CapTableCalculator:
             'common_distribution': df['common_distribution'].sum(),
             'total': df['total'].sum()
         }])
-        
+
         df = pd.concat([df, summary], ignore_index=True)
-        
+
         # Add metrics
         df['return_multiple'] = df.apply(
-            lambda row: row['total'] / self._get_investment(row['shareholder']) 
-            if row['shareholder'] != 'TOTAL' and self._get_investment(row['shareholder']) > 0 
+            lambda row: row['total'] / self._get_investment(row['shareholder'])
+            if row['shareholder'] != 'TOTAL' and self._get_investment(row['shareholder']) > 0
             else 0,
             axis=1
         )
-        
+
         return df
-        
+
     def _get_investment(self, shareholder_name: str) -> float:
         """Get total investment for a shareholder"""
         total = Decimal('0')
@@ -770,6 +774,11 @@ class CapTableCalculator:
         }
         
         results = {}
+
+        # Compiled once — breakevens are exact inversions of the payout curves.
+        # calculate_exit_waterfall distributes net of the default escrow.
+        waterfall = self.compile_exit_waterfall()
+        gross_up = 1 - DEFAULT_ESCROW_PCT
         
         for scenario_name, exit_value in scenarios.items():
             # Calculate waterfall for this scenario
@@ -779,21 +788,26 @@ class CapTableCalculator:
             total_liquidation_prefs = Decimal('0')
             investor_breakeven_points = {}
             
-            for entry in self.share_entries:
-                if entry.share_class != ShareClass.COMMON:
+            for h, entry in enumerate(self.share_entries):
+                if entry.share_class not in self._COMMON_EQUIVALENT:
                     liq_pref = entry.num_shares * entry.price_per_share * Decimal(str(entry.rights.liquidation_preference))
                     total_liquidation_prefs += liq_pref
                     
-                    # Calculate breakeven point for this investor
+                    # Exact exits (gross of escrow) where this holding returns Nx
                     investment = entry.num_shares * entry.price_per_share
+                    name = waterfall.names[h]
+                    exits = {
+                        m: waterfall.exit_for_payout(name, float(investment) * m) / gross_up
+                        for m in (1, 2, 3, 5, 10)
+                    }
                     investor_breakeven_points[entry.shareholder_name] = {
                         'investment': float(investment),
                         'liquidation_preference': float(liq_pref),
-                        'breakeven_exit': float(investment),  # Minimum exit to return capital
-                        '2x_exit': float(investment * 2),     # Exit needed for 2x return
-                        '3x_exit': float(investment * 3),     # Exit needed for 3x return
-                        '5x_exit': float(investment * 5),     # Exit needed for 5x return
-                        '10x_exit': float(investment * 10)    # Exit needed for 10x return
+                        'breakeven_exit': exits[1],  # Minimum exit to return capital
+                        '2x_exit': exits[2],         # Exit needed for 2x return
+                        '3x_exit': exits[3],         # Exit needed for 3x return
+                        '5x_exit': exits[5],         # Exit needed for 5x return
+                        '10x_exit': exits[10]        # Exit needed for 10x return
                     }
             
             # Identify key transition points
@@ -881,17 +895,11 @@ class CapTableCalculator:
     
     def _calculate_conversion_point(self) -> Decimal:
         """Calculate the exit value where preferred would convert to common"""
-        # Simplified calculation - actual would depend on specific terms
-        total_shares = sum(entry.num_shares for entry in self.share_entries)
-        total_liquidation_prefs = sum(
-            entry.num_shares * entry.price_per_share * Decimal(str(entry.rights.liquidation_preference))
-            for entry in self.share_entries
-            if entry.share_class != ShareClass.COMMON
-        )
-        
-        # Conversion happens when: exit_value / total_shares > liquidation_pref_per_share
-        if total_shares > 0:
-            return total_liquidation_prefs * Decimal('1.5')  # Rough approximation
+        # First exit value (before escrow) at which any preferred converts
+        waterfall = self.compile_exit_waterfall()
+        for bp in waterfall.breakpoints:
+            if bp['event'] == 'converts to common':
+                return Decimal(str(bp['exit_value'] / (1 - DEFAULT_ESCROW_PCT)))
         return Decimal('0')
         
     def anti_dilution_adjustment(
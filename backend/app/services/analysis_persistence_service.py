@@ -363,6 +363,8 @@ class AnalysisPersistenceService:
             }
             result = self._sb.table("scenario_branches").insert(row).execute()
             if result.data:
+                from app.services.scenario_branch_service import invalidate_branch_cache
+                invalidate_branch_cache(company_id)
                 branch_id = result.data[0]["id"]
                 logger.info(
                     "[ANALYSIS_PERSIST] branch created: %s (%s) for %s",
@@ -474,6 +476,8 @@ class AnalysisPersistenceService:
                 on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
             ).execute()
 
+        from app.services.company_data_pull import invalidate_company_cache
+        invalidate_company_cache(company_id)
         logger.info(
             "[ANALYSIS_PERSIST] grid write: %d rows, source=%s", len(rows), source
         )
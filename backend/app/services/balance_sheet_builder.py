@@ -370,15 +370,9 @@ def match_erp_account(account_name: str) -> Optional[str]:
     if normalized in ERP_ACCOUNT_MAP:
         return ERP_ACCOUNT_MAP[normalized]
 
-    # Substring match — find longest matching key
-    best_match = None
-    best_len = 0
-    for key, cat in ERP_ACCOUNT_MAP.items():
-        if key in normalized and len(key) > best_len:
-            best_match = cat
-            best_len = len(key)
-
-    return best_match
+    # Substring match — longest matching key, via the trigram index
+    from app.services.label_classifier import label_classifier
+    return label_classifier.erp_account(normalized)
 
 
 # ---------------------------------------------------------------------------
@@ -448,34 +442,44 @@ class BalanceSheetBuilder:
             actuals_by_key_period: {"bs_cash": {"2025-01": 500000, ...}, ...}
             periods: sorted list of period strings
         """
-        from app.core.supabase_client import get_supabase_client
-
-        sb = get_supabase_client()
-        if not sb:
-            logger.warning("Supabase client unavailable — cannot fetch BS actuals")
-            return {}, []
-
-        query = (
-            sb.table("fpa_actuals")
-            .select("period, category, subcategory, amount")
-        )
         if self.company_id:
-            query = query.eq("company_id", self.company_id)
-        query = query.like("category", "bs_%")
-        if start:
-            query = query.gte("period", f"{start}-01")
-        if end:
-            query = query.lte("period", f"{end}-01")
-
-        result = query.order("period").execute()
+            # Shared (coalesced, cached) company rows — filter bs_* in memory
+            from app.core.data_access import fpa_data
+
+            lo = f"{start}-01" if start else None
+            hi = f"{end}-01" if end else None
+            data = [
+                row for row in fpa_data.actuals_sync(self.company_id)
+                if (row.get("category") or "").startswith("bs_")
+                and (lo is None or row["period"] >= lo)
+                and (hi is None or row["period"] <= hi)
+            ]
+        else:
+            from app.core.supabase_client import get_supabase_client
+
+            sb = get_supabase_client()
+            if not sb:
+                logger.warning("Supabase client unavailable — cannot fetch BS actuals")
+                return {}, []
+
+            query = (
+                sb.table("fpa_actuals")
+                .select("period, category, subcategory, amount")
+                .like("category", "bs_%")
+            )
+            if start:
+                query = query.gte("period", f"{start}-01")
+            if end:
+                query = query.lte("period", f"{end}-01")
+            data = query.order("period").execute().data
 
-        if not result.data:
+        if not data:
             return {}, []
 
         actuals: Dict[str, Dict[str, float]] = {}
         periods_set: set = set()
 
-        for row in result.data:
+        for row in data:
             period = row["period"][:7]
             cat = row["category"]
             sub = row.get("subcategory")
@@ -0,0 +1,351 @@
+"""
+Fund-wide bulk valuation as a resumable Celery job.
+
+Valuing every portfolio company inside an agent request either hit the tool
+timeout on large funds or lost all progress on one failure. The job runs on
+the Celery worker instead:
+
+    from app.services.bulk_valuation_job import start_bulk_valuation, get_job_status
+
+    status = start_bulk_valuation(fund_id)             # enqueue (or resume) → status dict
+    status = get_job_status(status["job_id"])          # poll: progress + partial results
+
+- Each company's result is checkpointed as it completes (Redis hash
+  ``bulkval:<job_id>:results``). A retried, redelivered or re-started run
+  skips companies that already succeeded and only values the rest.
+- Companies are valued in batches of BULK_VALUATION_BATCH through
+  ValuationEngineService.calculate_valuation_batch: the PWERM ones share one
+  vectorized pass, the rest run BULK_VALUATION_CONCURRENCY at a time.
+  Each batch is checkpointed when it finishes.
+- Pending suggestions for every successful company are written at the end
+  with one chunked bulk upsert into ``pending_suggestions``.
+- The job-status record (``bulkval:<job_id>``) carries state, counts and
+  a heartbeat; ``bulkval:fund:<fund_id>`` points at the fund's latest job so
+  start_bulk_valuation can resume it instead of starting over.
+
+Without REDIS_URL the store falls back to a process-local dict (only useful
+with eager Celery / tests — state is lost on restart).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BULK_VALUATION_CONCURRENCY = int(os.getenv("BULK_VALUATION_CONCURRENCY", "8"))
+# Companies per calculate_valuation_batch call (and per checkpoint flush)
+BULK_VALUATION_BATCH = int(os.getenv("BULK_VALUATION_BATCH", "100"))
+JOB_TTL_S = int(os.getenv("BULK_VALUATION_JOB_TTL", str(7 * 24 * 3600)))
+# A running job whose heartbeat is older than this is treated as dead and resumed
+STALE_AFTER_S = float(os.getenv("BULK_VALUATION_STALE_AFTER", "300"))
+
+_PREFIX = "bulkval:"
+_UPSERT_CHUNK = 500
+_SOURCE_SERVICE = "valuation_engine.bulk"
+
+# States a job can be resumed from
+RESUMABLE = ("queued", "running", "failed", "interrupted")
+
+_STAGES = {
+    "pre_seed": "pre_seed", "preseed": "pre_seed", "angel": "pre_seed",
+    "seed": "seed",
+    "series_a": "series_a", "a": "series_a",
+    "series_b": "series_b", "b": "series_b",
+    "series_c": "series_c", "c": "series_c",
+    "series_d": "growth", "series_e": "growth", "growth": "growth",
+    "series_f": "late", "late": "late", "late_stage": "late",
+    "public": "public", "ipo": "public",
+}
+
+
+# ---------------------------------------------------------------------------
+# Job store
+# ---------------------------------------------------------------------------
+
+class _JobStore:
+    """Job-status records and per-company checkpoints (Redis, or a local dict)."""
+
+    def __init__(self):
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._latest: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        from app.core.redis_client import get_sync_redis
+        return get_sync_redis()
+
+    def save_status(self, status: Dict[str, Any]) -> None:
+        status["updated_at"] = time.time()
+        job_id = status["job_id"]
+        client = self._redis()
+        if client is None:
+            with self._lock:
+                self._status[job_id] = dict(status)
+                self._latest[status["fund_id"]] = job_id
+            return
+        pipe = client.pipeline()
+        pipe.set(_PREFIX + job_id, json.dumps(status, default=str), ex=JOB_TTL_S)
+        pipe.set(f"{_PREFIX}fund:{status['fund_id']}", job_id, ex=JOB_TTL_S)
+        pipe.execute()
+
+    def load_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        client = self._redis()
+        if client is None:
+            with self._lock:
+                status = self._status.get(job_id)
+                return dict(status) if status else None
+        raw = client.get(_PREFIX + job_id)
+        return json.loads(raw) if raw else None
+
+    def latest_job(self, fund_id: str) -> Optional[str]:
+        client = self._redis()
+        if client is None:
+            with self._lock:
+                return self._latest.get(fund_id)
+        return client.get(f"{_PREFIX}fund:{fund_id}")
+
+    def checkpoint(self, job_id: str, company_id: str, result: Dict[str, Any]) -> None:
+        client = self._redis()
+        if client is None:
+            with self._lock:
+                self._results.setdefault(job_id, {})[company_id] = result
+            return
+        key = f"{_PREFIX}{job_id}:results"
+        pipe = client.pipeline()
+        pipe.hset(key, company_id, json.dumps(result, default=str))
+        pipe.expire(key, JOB_TTL_S)
+        pipe.execute()
+
+    def checkpoints(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        client = self._redis()
+        if client is None:
+            with self._lock:
+                return dict(self._results.get(job_id, {}))
+        raw = client.hgetall(f"{_PREFIX}{job_id}:results") or {}
+        return {cid: json.loads(value) for cid, value in raw.items()}
+
+
+# Singleton — import this everywhere
+job_store = _JobStore()
+
+
+# ---------------------------------------------------------------------------
+# Valuation
+# ---------------------------------------------------------------------------
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None
+
+
+def _valuation_request(company: Dict[str, Any]):
+    """ValuationRequest from a companies row (AUTO method, dynamic WACC by company_id)."""
+    from app.services.valuation_engine_service import Stage, ValuationMethod, ValuationRequest
+
+    raw_stage = str(company.get("stage") or "").lower().strip().replace("-", "_").replace(" ", "_")
+    growth = _number(company.get("growth_rate"))
+    if growth is None:
+        pct = _number(company.get("revenue_growth_annual_pct"))
+        growth = pct / 100.0 if pct is not None else None
+    last_round = _number(company.get("current_valuation_usd") or company.get("last_valuation_usd"))
+    return ValuationRequest(
+        company_name=company.get("name") or "Unknown",
+        stage=Stage(_STAGES.get(raw_stage, "series_a")),
+        revenue=_number(company.get("current_arr_usd") or company.get("arr")),
+        growth_rate=growth,
+        last_round_valuation=last_round if last_round and last_round > 0 else None,
+        total_raised=_number(company.get("total_invested_usd") or company.get("total_funding_usd")),
+        method=ValuationMethod.AUTO,
+        business_model=company.get("business_model"),
+        industry=company.get("sector"),
+        category=company.get("category"),
+        company_id=company.get("id"),
+    )
+
+
+def _failed(company: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    logger.warning("[BULK_VALUATION] %s (%s) failed: %s", company.get("name"), company.get("id"), error)
+    return {"company_id": company.get("id"), "name": company.get("name"), "success": False, "error": str(error)}
+
+
+async def _value_companies(engine, companies: List[Dict[str, Any]], concurrency: int) -> List[Dict[str, Any]]:
+    """One calculate_valuation_batch call for a slice of the fund; one result row per company."""
+    out: Dict[int, Dict[str, Any]] = {}
+    requests, positions = [], []
+    for i, company in enumerate(companies):
+        try:
+            requests.append(_valuation_request(company))
+            positions.append(i)
+        except Exception as e:
+            out[i] = _failed(company, e)
+    try:
+        results = await engine.calculate_valuation_batch(requests, concurrency=concurrency) if requests else []
+    except Exception as e:
+        results = [e] * len(requests)
+    for i, result in zip(positions, results):
+        company = companies[i]
+        if isinstance(result, Exception):
+            out[i] = _failed(company, result)
+            continue
+        fair_value = _number(result.fair_value)
+        # Error results are failures, so a resumed run retries them
+        error = (
+            result.explanation if result.method_used == "error"
+            else None if fair_value is not None else "valuation returned no fair value"
+        )
+        out[i] = {
+            "company_id": company.get("id"),
+            "name": company.get("name"),
+            "success": error is None,
+            "fair_value": fair_value,
+            "method": result.method_used,
+            "confidence": _number(result.confidence),
+            "explanation": result.explanation,
+            **({"error": error} if error else {}),
+        }
+    return [out[i] for i in range(len(companies))]
+
+
+def _write_suggestions(fund_id: str, job_id: str, results: List[Dict[str, Any]]) -> int:
+    """One chunked bulk upsert of pending valuation suggestions. Returns rows written."""
+    rows = [
+        {
+            "fund_id": fund_id,
+            "company_id": r["company_id"],
+            "column_id": "valuation",
+            "suggested_value": {"value": r["fair_value"]},
+            "source_service": _SOURCE_SERVICE,
+            "reasoning": f"Bulk valuation: {r.get('method') or 'composite'} method",
+            "metadata": {"job_id": job_id, "method": r.get("method"), "confidence": r.get("confidence")},
+        }
+        for r in results
+        if r.get("success") and r.get("fair_value") and r.get("company_id")
+    ]
+    if not rows:
+        return 0
+    from app.core.database import get_supabase_service
+
+    sb = get_supabase_service().get_client()
+    if not sb:
+        logger.warning("[BULK_VALUATION] No Supabase client; %d suggestions not written", len(rows))
+        return 0
+    for i in range(0, len(rows), _UPSERT_CHUNK):
+        sb.table("pending_suggestions").upsert(
+            rows[i:i + _UPSERT_CHUNK], on_conflict="fund_id,company_id,column_id",
+        ).execute()
+    return len(rows)
+
+
+def _summary(status: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    succeeded = sum(1 for r in results.values() if r.get("success"))
+    status.update(completed=len(results), succeeded=succeeded, failed=len(results) - succeeded)
+    return status
+
+
+async def run_bulk_valuation(
+    job_id: str,
+    fund_id: str,
+    concurrency: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Value every company in the fund, resuming from the job's checkpoints.
+
+    Called by the Celery task; safe to call again with the same job_id after
+    a failure — companies that already succeeded are not recomputed.
+    """
+    from app.core.adapters import get_company_repo
+    from app.services.valuation_engine_service import ValuationEngineService
+
+    status = job_store.load_status(job_id) or {"job_id": job_id, "fund_id": fund_id, "created_at": time.time()}
+    repo = get_company_repo()
+    companies = [c for c in (repo.get_portfolio_companies(fund_id) if repo else []) if c.get("id")]
+    done = {cid: r for cid, r in job_store.checkpoints(job_id).items() if r.get("success")}
+    todo = [c for c in companies if c["id"] not in done]
+    results: Dict[str, Dict[str, Any]] = dict(done)
+    status.update(state="running", total=len(companies), resumed=len(done), error=None,
+                  attempts=int(status.get("attempts") or 0) + 1)
+    job_store.save_status(_summary(status, results))
+    logger.info("[BULK_VALUATION] job=%s fund=%s companies=%d resumed=%d",
+                job_id, fund_id, len(companies), len(done))
+
+    engine = ValuationEngineService()
+    workers = max(1, concurrency or BULK_VALUATION_CONCURRENCY)
+    size = max(1, BULK_VALUATION_BATCH)
+
+    try:
+        for start in range(0, len(todo), size):
+            for result in await _value_companies(engine, todo[start:start + size], workers):
+                job_store.checkpoint(job_id, result["company_id"], result)
+                results[result["company_id"]] = result
+            job_store.save_status(_summary(status, results))
+            if progress_callback:
+                progress_callback(dict(status))
+        status["suggestions_written"] = await asyncio.to_thread(
+            _write_suggestions, fund_id, job_id, list(results.values()),
+        )
+    except BaseException as e:
+        # Checkpoints survive; the next run picks up from here
+        status.update(state="interrupted" if isinstance(e, asyncio.CancelledError) else "failed",
+                      error=str(e) or type(e).__name__)
+        job_store.save_status(_summary(status, results))
+        raise
+    status.update(state="completed", finished_at=time.time())
+    job_store.save_status(_summary(status, results))
+    return status
+
+
+# ---------------------------------------------------------------------------
+# Enqueue / poll
+# ---------------------------------------------------------------------------
+
+def get_job_status(job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+    """Job-status record plus (optionally) the results checkpointed so far."""
+    status = job_store.load_status(job_id)
+    if status is None:
+        return None
+    if status.get("state") == "running" and time.time() - status.get("updated_at", 0) > STALE_AFTER_S:
+        status["stale"] = True
+    if include_results:
+        status["results"] = list(job_store.checkpoints(job_id).values())
+    return status
+
+
+def start_bulk_valuation(fund_id: str, resume: bool = True, concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """Enqueue a bulk valuation for the fund and return its status record.
+
+    With resume=True the fund's latest unfinished job is continued (same
+    job_id, checkpoints kept). A job that is still running with a fresh
+    heartbeat is returned as-is rather than started twice.
+    """
+    if resume:
+        latest = job_store.latest_job(fund_id)
+        status = job_store.load_status(latest) if latest else None
+        if status and status.get("state") in RESUMABLE:
+            fresh = time.time() - status.get("updated_at", 0) <= STALE_AFTER_S
+            if status["state"] in ("queued", "running") and fresh:
+                return get_job_status(latest, include_results=False)
+            return _enqueue(status, concurrency)
+    status = {"job_id": uuid.uuid4().hex, "fund_id": fund_id, "created_at": time.time(),
+              "total": None, "completed": 0, "succeeded": 0, "failed": 0}
+    return _enqueue(status, concurrency)
+
+
+def _enqueue(status: Dict[str, Any], concurrency: Optional[int]) -> Dict[str, Any]:
+    from app.tasks import run_bulk_valuation_job
+
+    status["state"] = "queued"
+    job_store.save_status(status)
+    task = run_bulk_valuation_job.delay(job_id=status["job_id"], fund_id=status["fund_id"], concurrency=concurrency)
+    status["task_id"] = task.id
+    job_store.save_status(status)
+    return dict(status)
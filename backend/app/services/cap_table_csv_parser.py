@@ -21,6 +21,7 @@ import io
 import logging
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
@@ -291,6 +292,7 @@ def _detect_columns(headers: List[str]) -> Dict[int, str]:
     return mapping
 
 
+@lru_cache(maxsize=4096)
 def _match_share_class(raw: str) -> Tuple[str, str]:
     """Match a raw share class string to (share_class, instrument_type)."""
     if not raw:
@@ -301,6 +303,7 @@ def _match_share_class(raw: str) -> Tuple[str, str]:
     return raw.lower().replace(" ", "_"), "equity"
 
 
+@lru_cache(maxsize=4096)
 def _match_stakeholder_type(raw: str) -> str:
     """Match a raw stakeholder type to canonical type."""
     if not raw:
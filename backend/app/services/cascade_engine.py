@@ -23,9 +23,14 @@ It also understands what the DRAFTING means:
 
 from __future__ import annotations
 
+import dataclasses
+import hashlib
 import logging
+import re
+import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from app.services.clause_parameter_registry import (
     ClauseParameter,
@@ -47,6 +52,11 @@ def _get_group_structure_type():
 
 logger = logging.getLogger(__name__)
 
+_NUMBER_RE = re.compile(r'[\d.]+')
+
+# Compiled graphs kept per ResolvedParameterSet content hash
+_GRAPH_CACHE_SIZE = 64
+
 
 # ---------------------------------------------------------------------------
 # Data structures
@@ -208,6 +218,139 @@ DRAFTING_INTERPRETATIONS = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Compiled graph cache
+# ---------------------------------------------------------------------------
+
+def params_fingerprint(params: ResolvedParameterSet) -> str:
+    """Content hash of everything build_from_clauses() reads.
+
+    Two ResolvedParameterSets with the same parameters and instruments build
+    the same graph, whichever request resolved them.
+    """
+    # Dataclass reprs cover every field; dict-order differences only cost a miss
+    h = hashlib.blake2b(digest_size=16)
+    for key in sorted(params.parameters):
+        h.update(repr((key, params.parameters[key])).encode())
+    for inst in params.instruments:
+        h.update(repr(inst).encode())
+    return h.hexdigest()
+
+
+@dataclass
+class _CompiledGraph:
+    """Immutable product of the 13 edge builders for one parameter set."""
+    edges: Tuple[CascadeEdge, ...]
+    adjacency: Dict[str, Tuple[CascadeEdge, ...]]
+    topo_order: Tuple[str, ...]
+    reachable: Dict[str, frozenset]
+
+
+def _index_edges(edges: Sequence[CascadeEdge]) -> Tuple[
+    Dict[str, Tuple[CascadeEdge, ...]], Tuple[str, ...], Dict[str, frozenset]
+]:
+    """Adjacency, topological order (cycles kept together) and reachability."""
+    adjacency: Dict[str, List[CascadeEdge]] = {}
+    for edge in edges:
+        adjacency.setdefault(edge.trigger_param, []).append(edge)
+    succ = {
+        node: list(dict.fromkeys(e.affected_param for e in out))
+        for node, out in adjacency.items()
+    }
+    nodes = list(dict.fromkeys(
+        [e.trigger_param for e in edges] + [e.affected_param for e in edges]
+    ))
+
+    # Tarjan SCC (iterative) — cross-default loops form one component;
+    # components come out in reverse topological order
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(succ.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(succ.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    # Reachability: sinks first, so every successor's set is ready
+    reachable: Dict[str, frozenset] = {}
+    for component in components:
+        members = set(component)
+        reach: Set[str] = set()
+        for node in component:
+            for child in succ.get(node, ()):
+                reach.add(child)
+                if child not in members:
+                    reach |= reachable[child]
+        if len(component) > 1:
+            reach |= members
+        frozen = frozenset(reach)
+        for node in component:
+            reachable[node] = frozen
+
+    topo_order = tuple(node for component in reversed(components) for node in component)
+    return (
+        {node: tuple(out) for node, out in adjacency.items()},
+        topo_order,
+        reachable,
+    )
+
+
+_graph_cache: "OrderedDict[str, _CompiledGraph]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def _cached_graph(fingerprint: str) -> Optional[_CompiledGraph]:
+    with _graph_cache_lock:
+        compiled = _graph_cache.get(fingerprint)
+        if compiled is not None:
+            _graph_cache.move_to_end(fingerprint)
+        return compiled
+
+
+def _store_graph(fingerprint: str, compiled: _CompiledGraph) -> None:
+    with _graph_cache_lock:
+        _graph_cache[fingerprint] = compiled
+        _graph_cache.move_to_end(fingerprint)
+        while len(_graph_cache) > _GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+
+
 # ---------------------------------------------------------------------------
 # Cascade Graph
 # ---------------------------------------------------------------------------
@@ -224,14 +367,39 @@ class CascadeGraph:
         self.nodes: Dict[str, ClauseParameter] = {}
         self._adjacency: Dict[str, List[CascadeEdge]] = {}
         self._build_params: Optional[ResolvedParameterSet] = None
+        self._topo_order: Tuple[str, ...] = ()
+        self._reachable: Dict[str, frozenset] = {}
+        # id(params) → (params, {aggregate: value}) for instrument scans
+        self._instrument_memo: Dict[int, Tuple[ResolvedParameterSet, Dict[str, float]]] = {}
 
     def build_from_clauses(self, params: ResolvedParameterSet) -> None:
-        """Build the dependency graph from resolved clause parameters."""
+        """Build the dependency graph from resolved clause parameters.
+
+        The 13 edge families are built once per distinct parameter set
+        (content hash) and shared; a cache hit only copies the edge lists.
+        """
         self.nodes = dict(params.parameters)
-        self.edges = []
-        self._adjacency = {}
         self._build_params = params  # Store for find_breakpoints
+        self._instrument_memo = {}
+
+        fingerprint = params_fingerprint(params)
+        compiled = _cached_graph(fingerprint)
+        if compiled is None:
+            compiled = self._compile_edges(params)
+            _store_graph(fingerprint, compiled)
+            logger.info(
+                f"Cascade graph built: {len(self.nodes)} nodes, "
+                f"{len(compiled.edges)} edges"
+            )
+
+        self.edges = list(compiled.edges)
+        self._adjacency = {k: list(v) for k, v in compiled.adjacency.items()}
+        self._topo_order = compiled.topo_order
+        self._reachable = compiled.reachable
 
+    def _compile_edges(self, params: ResolvedParameterSet) -> _CompiledGraph:
+        """Run every edge builder and index the result."""
+        self.edges = []
         self._build_anti_dilution_edges(params)
         self._build_conversion_trigger_edges(params)
         self._build_covenant_edges(params)
@@ -246,15 +414,28 @@ class CascadeGraph:
         self._build_warrant_edges(params)
         self._build_safe_conversion_edges(params)
 
-        # Build adjacency index
-        for edge in self.edges:
-            self._adjacency.setdefault(edge.trigger_param, []).append(edge)
-
-        logger.info(
-            f"Cascade graph built: {len(self.nodes)} nodes, "
-            f"{len(self.edges)} edges"
+        adjacency, topo_order, reachable = _index_edges(self.edges)
+        return _CompiledGraph(
+            edges=tuple(self.edges),
+            adjacency=adjacency,
+            topo_order=topo_order,
+            reachable=reachable,
         )
 
+    def _reindex(self) -> None:
+        """Rebuild adjacency / order / reachability after edges were added."""
+        adjacency, self._topo_order, self._reachable = _index_edges(self.edges)
+        self._adjacency = {k: list(v) for k, v in adjacency.items()}
+
+    @property
+    def topological_order(self) -> Tuple[str, ...]:
+        """Parameter keys in dependency order (cycle members adjacent)."""
+        return self._topo_order
+
+    def reachable_from(self, trigger: str) -> frozenset:
+        """Every parameter a trigger can ever touch, ignoring edge conditions."""
+        return self._reachable.get(trigger, frozenset())
+
     def simulate(
         self,
         trigger: str,
@@ -268,10 +449,10 @@ class CascadeGraph:
         visited: Set[str] = set()
         step_num = 0
 
-        queue: List[Tuple[str, Any, int]] = [(trigger, new_value, 0)]
+        queue = deque([(trigger, new_value, 0)])
 
         while queue:
-            current_trigger, current_value, depth = queue.pop(0)
+            current_trigger, current_value, depth = queue.popleft()
             if depth > max_depth or current_trigger in visited:
                 continue
             visited.add(current_trigger)
@@ -316,6 +497,64 @@ class CascadeGraph:
         self._compute_terminal_effects(result, current_params)
         return result
 
+    def simulate_batch(
+        self,
+        triggers: Iterable[Tuple[str, Any]],
+        current_params: ResolvedParameterSet,
+        financial_state: Optional[Any] = None,
+        max_depth: int = 20,
+    ) -> List[CascadeResult]:
+        """Fire many (trigger, value) pairs against this compiled graph.
+
+        Results come back in input order. Triggers with nothing downstream
+        skip the walk entirely, and repeated hashable pairs are simulated once.
+        """
+        results: List[CascadeResult] = []
+        seen: Dict[Tuple[str, Any], CascadeResult] = {}
+        for trigger, value in triggers:
+            try:
+                key: Optional[Tuple[str, Any]] = (trigger, value)
+                hash(key)
+            except TypeError:
+                key = None
+            if key is not None and key in seen:
+                cached = seen[key]
+                results.append(dataclasses.replace(
+                    cached,
+                    steps=list(cached.steps),
+                    cap_table_delta=dict(cached.cap_table_delta),
+                    waterfall_delta=dict(cached.waterfall_delta),
+                    cash_flow_delta=dict(cached.cash_flow_delta),
+                    governance_changes=list(cached.governance_changes),
+                    exposure_changes=dict(cached.exposure_changes),
+                ))
+                continue
+            if trigger not in self._adjacency:
+                result = CascadeResult(trigger=trigger, trigger_value=value, steps=[])
+            else:
+                result = self.simulate(
+                    trigger, value, current_params,
+                    financial_state=financial_state, max_depth=max_depth,
+                )
+            if key is not None:
+                seen[key] = result
+            results.append(result)
+        return results
+
+    def simulate_sweep(
+        self,
+        trigger: str,
+        values: Iterable[Any],
+        current_params: ResolvedParameterSet,
+        financial_state: Optional[Any] = None,
+        max_depth: int = 20,
+    ) -> List[CascadeResult]:
+        """One trigger at many values, e.g. a sweep of down-round prices."""
+        return self.simulate_batch(
+            ((trigger, v) for v in values), current_params,
+            financial_state=financial_state, max_depth=max_depth,
+        )
+
     def identify_constraints(self) -> List[Constraint]:
         """Walk the graph and surface all constraints on the company's actions."""
         constraints: List[Constraint] = []
@@ -426,18 +665,17 @@ class CascadeGraph:
             logger.warning("find_breakpoints called without params — results will be empty")
             sweep_params = ResolvedParameterSet(company_id="sweep")
 
+        # Nothing downstream of this variable — no behavior can change
+        if variable not in self._adjacency:
+            return breakpoints
+
         prev_cascade: Optional[CascadeResult] = None
         prev_value = range_min
 
-        for i in range(steps + 1):
-            value = range_min + (i * step_size)
-            # Simulate at this value using actual params
-            cascade = self.simulate(
-                trigger=variable,
-                new_value=value,
-                current_params=sweep_params,
-                max_depth=5,
-            )
+        values = [range_min + (i * step_size) for i in range(steps + 1)]
+        cascades = self.simulate_sweep(variable, values, sweep_params, max_depth=5)
+
+        for value, cascade in zip(values, cascades):
 
             if prev_cascade:
                 # Compare: did the number of steps change? Did new edges fire?
@@ -1086,10 +1324,8 @@ class CascadeGraph:
                     ),
                 ))
 
-        # Rebuild adjacency index with new edges
-        self._adjacency = {}
-        for edge in self.edges:
-            self._adjacency.setdefault(edge.trigger_param, []).append(edge)
+        # Rebuild adjacency / order / reachability with new edges
+        self._reindex()
 
         logger.info(
             f"Group cascade edges added: {len(self.edges)} total edges "
@@ -1150,8 +1386,7 @@ class CascadeGraph:
 
         if "raise_amount >=" in when or "raise_amount >" in when:
             # Qualified financing threshold
-            import re
-            m = re.search(r'[\d.]+', when)
+            m = _NUMBER_RE.search(when)
             if m and isinstance(trigger_value, (int, float)):
                 threshold = float(m.group())
                 return trigger_value >= threshold
@@ -1369,8 +1604,28 @@ class CascadeGraph:
 
         return current_conversion_price
 
+    def _instrument_aggregate(
+        self, params: ResolvedParameterSet, name: str, compute: Callable[[], float]
+    ) -> float:
+        """Memoize a per-params instrument scan across simulate() calls."""
+        entry = self._instrument_memo.get(id(params))
+        if entry is None or entry[0] is not params:
+            if len(self._instrument_memo) >= 8:
+                self._instrument_memo.clear()
+            entry = (params, {})
+            self._instrument_memo[id(params)] = entry
+        memo = entry[1]
+        if name not in memo:
+            memo[name] = compute()
+        return memo[name]
+
     def _get_total_shares_outstanding(self, params: ResolvedParameterSet) -> float:
         """Get total fully-diluted shares outstanding from instruments."""
+        return self._instrument_aggregate(
+            params, "total_shares", lambda: self._scan_total_shares(params)
+        )
+
+    def _scan_total_shares(self, params: ResolvedParameterSet) -> float:
         total = 0.0
         for inst in params.instruments:
             shares = inst.terms.get("shares", 0)
@@ -1396,11 +1651,13 @@ class CascadeGraph:
 
     def _estimate_shares_from_instruments(self, params: ResolvedParameterSet) -> float:
         """Estimate total shares from instrument values when explicit counts unavailable."""
-        total = 0.0
-        for inst in params.instruments:
-            if inst.principal_or_value > 0:
-                total += inst.principal_or_value
-        return total
+        return self._instrument_aggregate(
+            params, "instrument_value",
+            lambda: sum(
+                inst.principal_or_value for inst in params.instruments
+                if inst.principal_or_value > 0
+            ),
+        )
 
     def _get_new_round_money(
         self, params: ResolvedParameterSet, edge: CascadeEdge
@@ -0,0 +1,261 @@
+"""
+Map-reduce helpers for structured extraction of long documents.
+
+document_process_service._extract_document_structured_async switches to the
+chunked path when a document is longer than one prompt can hold:
+
+    from app.services.chunked_extraction import split_for_extraction, merge_partials
+
+    chunks = split_for_extraction(text, CHUNK_CHARS)          # section / page aligned
+    partials = [...]                                          # one raw JSON object per chunk
+    merged = merge_partials(partials, kind="legal")           # deterministic reduce
+
+- Splitting packs paragraph/page blocks ("\\n\\n"-separated, which is how
+  text_extraction joins pages) into chunks of at most ``max_chars``, and
+  closes a chunk early at a section heading (ARTICLE / Section / 4.1 Title /
+  Schedule / === TABLES ===) once it is at least half full.
+- Merging walks partials in chunk order: scalars keep the first non-empty
+  value, lists are concatenated and de-duplicated, dicts merge recursively.
+  Legal clauses are keyed by id and their hierarchy is rebuilt across chunks;
+  signal time_series entries are keyed by period (and line item), and
+  financial_metrics come from the latest period_date reported.
+- Chunk results are cached by a hash of the exact prompt (chunk text,
+  schema, memo context and hints), so re-processing a document only sends
+  the chunks that changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_CHARS = int(os.getenv("DOC_EXTRACT_CHUNK_CHARS", "40000"))
+CHUNK_CONCURRENCY = int(os.getenv("DOC_EXTRACT_CHUNK_CONCURRENCY", "6"))
+
+# Prepended to every chunk so the model doesn't invent document-wide facts.
+# Constant (no "part k of n") so unchanged chunks keep their cache key.
+CHUNK_PREAMBLE = (
+    "[EXCERPT of a longer document. Extract only what appears in this excerpt; "
+    "leave fields that are not covered here null or empty.]\n\n"
+)
+
+_CACHE_PREFIX = "docchunk:v1:"
+
+_SECTION_RE = re.compile(
+    r"\s*(?:"
+    r"(?:ARTICLE|Article|SECTION|Section|SCHEDULE|Schedule|EXHIBIT|Exhibit|ANNEX|Annex|APPENDIX|Appendix|PART|Part)"
+    r"\s+[\dIVXLC]+[A-Za-z]?\b"
+    r"|\d{1,2}(?:\.\d{1,3}){0,3}\.?\s+[A-Z][^\n]{0,100}(?:\n|$)"
+    r"|===\s"
+    r")"
+)
+
+
+# ---------------------------------------------------------------------------
+# Split
+# ---------------------------------------------------------------------------
+
+def _blocks(text: str, max_chars: int) -> List[str]:
+    """Paragraph/page blocks, each at most max_chars (long ones split on lines, then hard)."""
+    out: List[str] = []
+    for block in re.split(r"\n\s*\n|\f", text):
+        block = block.strip("\n")
+        if not block.strip():
+            continue
+        if len(block) <= max_chars:
+            out.append(block)
+            continue
+        piece = ""
+        for line in block.split("\n"):
+            while len(line) > max_chars:
+                if piece:
+                    out.append(piece)
+                    piece = ""
+                out.append(line[:max_chars])
+                line = line[max_chars:]
+            if piece and len(piece) + 1 + len(line) > max_chars:
+                out.append(piece)
+                piece = ""
+            piece = f"{piece}\n{line}" if piece else line
+        if piece:
+            out.append(piece)
+    return out
+
+
+def split_for_extraction(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Section- and page-aligned chunks of at most max_chars covering all of text."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in _blocks(text, max_chars):
+        at_section = bool(_SECTION_RE.match(block))
+        if current and (size + 2 + len(block) > max_chars or (at_section and size >= max_chars // 2)):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block) + (2 if size else 0)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Chunk cache
+# ---------------------------------------------------------------------------
+
+def chunk_cache_key(system_prompt: str, user_prompt: str) -> str:
+    h = hashlib.sha256()
+    h.update(system_prompt.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(user_prompt.encode("utf-8"))
+    return _CACHE_PREFIX + h.hexdigest()
+
+
+def cached_partials(keys: List[str]) -> Dict[int, Dict[str, Any]]:
+    """{chunk index: cached raw partial} for chunks extracted before."""
+    from app.services.text_extraction import cache_get
+
+    out: Dict[int, Dict[str, Any]] = {}
+    for i, key in enumerate(keys):
+        raw = cache_get(key)
+        if raw:
+            try:
+                out[i] = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+    return out
+
+
+def store_partials(items: List[Tuple[str, Dict[str, Any]]]) -> None:
+    from app.services.text_extraction import cache_set
+
+    for key, partial in items:
+        cache_set(key, json.dumps(partial, default=str))
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+def _empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _identity(value: Any) -> str:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _merge_lists(values: List[List[Any]]) -> List[Any]:
+    out: List[Any] = []
+    seen = set()
+    for items in values:
+        for item in items:
+            ident = _identity(item)
+            if ident not in seen:
+                seen.add(ident)
+                out.append(item)
+    return out
+
+
+def _merge_values(values: List[Any], key: Optional[str] = None) -> Any:
+    """First non-empty scalar; concatenated de-duplicated lists; recursive dicts."""
+    present = [v for v in values if not _empty(v)]
+    if not present:
+        return values[0] if values else None
+    if key == "summary" and all(isinstance(v, str) for v in present):
+        return "\n\n".join(_merge_lists([[v] for v in present]))
+    if all(isinstance(v, list) for v in present):
+        return _merge_lists(present)
+    if all(isinstance(v, dict) for v in present):
+        return _merge_dicts(present)
+    return present[0]
+
+
+def _merge_dicts(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    keys: List[str] = []
+    for part in parts:
+        keys.extend(k for k in part if k not in keys)
+    return {k: _merge_values([p[k] for p in parts if k in p], key=k) for k in keys}
+
+
+def _merge_clauses(parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Clauses keyed by id across chunks, hierarchy rebuilt from parent_id."""
+    by_id: Dict[str, Dict[str, Any]] = {}
+    order: List[str] = []
+    anonymous: List[Dict[str, Any]] = []
+    for part in parts:
+        for clause in part.get("clauses") or []:
+            if not isinstance(clause, dict):
+                continue
+            cid = str(clause.get("id") or "")
+            if not cid:
+                anonymous.append(clause)
+            elif cid not in by_id:
+                by_id[cid] = dict(clause)
+                order.append(cid)
+            else:
+                by_id[cid] = _merge_dicts([by_id[cid], clause])
+    for cid in order:
+        clause = by_id[cid]
+        parent = clause.get("parent_id")
+        if parent is None and "." in cid and cid.rsplit(".", 1)[0] in by_id:
+            # Parent clause lives in an earlier chunk the model couldn't see
+            parent = clause["parent_id"] = cid.rsplit(".", 1)[0]
+        if parent in by_id:
+            children = by_id[parent].setdefault("children", [])
+            if cid not in children:
+                children.append(cid)
+    return [by_id[cid] for cid in order] + anonymous
+
+
+def _merge_time_series(parts: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """Summary rows keyed by period, line items by (period, parent_category, subcategory)."""
+    rows: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    order: List[Tuple[str, ...]] = []
+    for part in parts:
+        for row in part.get("time_series") or []:
+            if not isinstance(row, dict) or not row.get("period"):
+                continue
+            key = (str(row["period"]), str(row.get("parent_category") or ""), str(row.get("subcategory") or ""))
+            if key not in rows:
+                rows[key] = []
+                order.append(key)
+            rows[key].append(row)
+    if not order:
+        return None
+    return [_merge_dicts(rows[key]) for key in sorted(order)]
+
+
+def merge_partials(partials: List[Dict[str, Any]], kind: str) -> Dict[str, Any]:
+    """Reduce per-chunk extractions (in chunk order) into one. kind: legal | signal | memo."""
+    parts = [p for p in partials if isinstance(p, dict)]
+    if not parts:
+        return {}
+    if kind == "signal":
+        # Metrics describe the latest period the document reports; other chunks only fill gaps
+        latest_first = sorted(
+            range(len(parts)),
+            key=lambda i: (str(parts[i].get("period_date") or ""), -i),
+            reverse=True,
+        )
+        merged = _merge_dicts(parts)
+        for key in ("financial_metrics", "pe_operating_metrics", "operational_metrics"):
+            ordered = [parts[i][key] for i in latest_first if isinstance(parts[i].get(key), dict)]
+            if ordered:
+                merged[key] = _merge_dicts(ordered)
+        dated = [str(p["period_date"]) for p in parts if isinstance(p.get("period_date"), str) and p["period_date"]]
+        merged["period_date"] = max(dated) if dated else None
+        time_series = _merge_time_series(parts)
+        if time_series is not None:
+            merged["time_series"] = time_series
+        return merged
+    merged = _merge_dicts(parts)
+    if kind == "legal":
+        merged["clauses"] = _merge_clauses(parts)
+    return merged
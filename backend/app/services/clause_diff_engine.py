@@ -157,6 +157,10 @@ class ClauseDiffEngine:
 
         all_keys = set(version_a.parameters.keys()) | set(version_b.parameters.keys())
 
+        # One compiled graph for every per-delta cascade (cached by content)
+        base_graph = CascadeGraph()
+        base_graph.build_from_clauses(version_a)
+
         for key in sorted(all_keys):
             param_a = version_a.parameters.get(key)
             param_b = version_b.parameters.get(key)
@@ -168,7 +172,7 @@ class ClauseDiffEngine:
             if delta:
                 # Run cascade for this individual change
                 delta.cascade_effects = self._run_delta_cascade(
-                    key, param_a, param_b, version_a
+                    key, param_a, param_b, version_a, graph=base_graph
                 )
                 # Compute impact
                 delta.impact = self._compute_delta_impact(
@@ -351,13 +355,15 @@ class ClauseDiffEngine:
         param_a: Optional[ClauseParameter],
         param_b: Optional[ClauseParameter],
         base_params: ResolvedParameterSet,
+        graph: Optional[CascadeGraph] = None,
     ) -> List[CascadeStep]:
         """Run cascade for a single parameter change."""
         if not param_b:
             return []
 
-        graph = CascadeGraph()
-        graph.build_from_clauses(base_params)
+        if graph is None:
+            graph = CascadeGraph()
+            graph.build_from_clauses(base_params)
 
         new_value = param_b.value if param_b else None
         if new_value is None:
@@ -650,25 +656,26 @@ class ClauseDiffEngine:
         graph = CascadeGraph()
         graph.build_from_clauses(version_b)
 
-        # Run cascade for EVERY delta and merge results
+        # Run cascade for EVERY delta (one batch) and merge results
         combined = CascadeResult(trigger="combined", trigger_value=None, steps=[])
         seen_params: set = set()
 
-        for delta in deltas:
-            if delta.new_value is not None:
-                key = f"{delta.param_type}:{delta.applies_to}"
-                result = graph.simulate(key, delta.new_value, version_a)
-                if result and result.steps:
-                    for step in result.steps:
-                        # Deduplicate: don't add the same param_affected twice
-                        if step.param_affected not in seen_params:
-                            combined.steps.append(step)
-                            seen_params.add(step.param_affected)
-                    # Merge terminal state dicts
-                    combined.cap_table_delta.update(result.cap_table_delta)
-                    combined.governance_changes.extend(result.governance_changes)
-                    combined.exposure_changes.update(result.exposure_changes)
-                    combined.cash_flow_delta.update(result.cash_flow_delta)
+        triggers = [
+            (f"{delta.param_type}:{delta.applies_to}", delta.new_value)
+            for delta in deltas if delta.new_value is not None
+        ]
+        for result in graph.simulate_batch(triggers, version_a):
+            if result and result.steps:
+                for step in result.steps:
+                    # Deduplicate: don't add the same param_affected twice
+                    if step.param_affected not in seen_params:
+                        combined.steps.append(step)
+                        seen_params.add(step.param_affected)
+                # Merge terminal state dicts
+                combined.cap_table_delta.update(result.cap_table_delta)
+                combined.governance_changes.extend(result.governance_changes)
+                combined.exposure_changes.update(result.exposure_changes)
+                combined.cash_flow_delta.update(result.cash_flow_delta)
 
         return combined if combined.steps else None
 
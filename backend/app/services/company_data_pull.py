@@ -8,38 +8,36 @@ Every service that needs company data should use pull_company_data().
 Each service takes what it needs from the result.
 """
 
+import asyncio
 import json
 import logging
-import time
 from collections import defaultdict
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.cache_bus import VersionedCache, cache_bus
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# In-process TTL cache — avoids redundant DB pulls within the same agent turn.
-# The agent loop calls pull_company_data on every iteration (once per tool call),
-# but the data doesn't change mid-turn.  60s TTL is safe: actuals are updated
-# by uploads, not in real-time.
+# Per-process cache of built CompanyData — the agent loop calls
+# pull_company_data on every tool call. Entries are evicted in every worker
+# when any process writes the company's actuals (core/cache_bus), so they can
+# live for hours; without a live Redis subscription they fall back to 60s.
 # ---------------------------------------------------------------------------
-_COMPANY_DATA_CACHE: Dict[str, Tuple[float, "CompanyData"]] = {}
-_CACHE_TTL_SECONDS: float = 60.0
+_COMPANY_DATA_CACHE = VersionedCache("company_data", scope="actuals")
 
 
 def _cache_get(company_id: str) -> Optional["CompanyData"]:
-    entry = _COMPANY_DATA_CACHE.get(company_id)
-    if entry and (time.monotonic() - entry[0]) < _CACHE_TTL_SECONDS:
-        return entry[1]
-    return None
+    return _COMPANY_DATA_CACHE.get(company_id)
 
 
-def _cache_set(company_id: str, data: "CompanyData") -> None:
-    _COMPANY_DATA_CACHE[company_id] = (time.monotonic(), data)
+def _cache_set(company_id: str, data: "CompanyData", token: Optional[int] = None) -> None:
+    _COMPANY_DATA_CACHE.set(company_id, data, token)
 
 
 def invalidate_company_cache(company_id: str) -> None:
-    """Call after actuals upload/mutation to force a fresh pull."""
-    _COMPANY_DATA_CACHE.pop(company_id, None)
+    """Call after actuals upload/mutation to force a fresh pull in every worker."""
+    cache_bus.invalidate(company_id, "actuals")
 
 
 # ---------------------------------------------------------------------------
@@ -482,51 +480,77 @@ def pull_company_data(company_id: str, fund_id: Optional[str] = None) -> Company
 
     This is the ONLY function that should query fpa_actuals for service
     consumption.  No limit — pulls everything so callers get full history.
-    Results are cached for 60 seconds to avoid redundant DB round-trips
-    within a single agent turn.
+    Rows come from the shared data-access layer (core/data_access), so the
+    query is coalesced with other readers of the same company.  Results are
+    cached until the company's actuals change (see invalidate_company_cache).
 
     fund_id is optional — when provided it is stored in metadata so callers
     have the full context without a separate lookup.
     """
+    token = _COMPANY_DATA_CACHE.token(company_id)
     cached = _cache_get(company_id)
     if cached is not None:
         logger.debug("[DATA_PULL] cache HIT for %s", company_id)
         return cached
 
-    from app.core.supabase_client import get_supabase_client
+    from app.core.data_access import fpa_data
 
-    sb = get_supabase_client()
-    empty = CompanyData(
-        company_id=company_id,
-        time_series={},
-        latest={},
-        periods=[],
-        metadata={"row_count": 0},
-    )
-    if not sb:
-        return empty
+    rows = fpa_data.actuals_sync(company_id)
+    company = None
+    if rows:
+        try:
+            company = fpa_data.company_sync(company_id)
+        except Exception:
+            pass
+    return _build_company_data(company_id, fund_id, rows, company, token)
+
+
+async def pull_company_data_async(company_id: str, fund_id: Optional[str] = None) -> CompanyData:
+    """Async twin of pull_company_data for code running on the event loop.
+
+    Concurrent pulls for the same company share one query, and pulls for
+    different companies in the same tick are batched (see core/data_access).
+    """
+    token = _COMPANY_DATA_CACHE.token(company_id)
+    cached = _cache_get(company_id)
+    if cached is not None:
+        logger.debug("[DATA_PULL] cache HIT for %s", company_id)
+        return cached
+
+    from app.core.data_access import fpa_data
 
-    rows = (
-        sb.table("fpa_actuals")
-        .select("category, subcategory, amount, period")
-        .eq("company_id", company_id)
-        .order("period", desc=False)
-        .execute()
-        .data
+    rows, company = await asyncio.gather(
+        fpa_data.actuals(company_id), fpa_data.company(company_id),
+        return_exceptions=True,
     )
+    if isinstance(rows, BaseException):
+        raise rows
+    if isinstance(company, BaseException):
+        company = None
+    return _build_company_data(company_id, fund_id, rows, company, token)
+
+
+def _build_company_data(
+    company_id: str,
+    fund_id: Optional[str],
+    rows: List[Dict[str, Any]],
+    company: Optional[Dict[str, Any]],
+    token: Optional[int] = None,
+) -> CompanyData:
+    """Shape fpa_actuals rows (ordered by period) into a cached CompanyData."""
     if not rows:
-        return empty
+        return CompanyData(
+            company_id=company_id,
+            time_series={},
+            latest={},
+            periods=[],
+            metadata={"row_count": 0},
+        )
 
-    # Fetch company name from companies table
+    # Company name — scoped to the fund when one was given
     _company_name = ""
-    try:
-        q = sb.table("companies").select("name").eq("id", company_id)
-        if fund_id:
-            q = q.eq("fund_id", fund_id)
-        _cname_row = q.maybe_single().execute()
-        _company_name = (_cname_row.data or {}).get("name", "") if _cname_row else ""
-    except Exception:
-        pass
+    if company and (not fund_id or company.get("fund_id") == fund_id):
+        _company_name = company.get("name") or ""
 
     # -- Build time_series: {category: {period: summed_amount}} --
     time_series: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
@@ -606,7 +630,7 @@ def pull_company_data(company_id: str, fund_id: Optional[str] = None) -> Company
         metadata=metadata,
         analytics=analytics,
     )
-    _cache_set(company_id, result)
+    _cache_set(company_id, result, token)
     return result
 
 
@@ -667,9 +691,10 @@ class FundCompanies:
         investments:   {company_id: {amount, ownership_pct, date, status}} — fund investment info.
         names:         {company_id: company_name} — display names.
         company_ids:   Ordered list of company UUIDs.
+        profiles:      {company_id: {revenue_model, sector}} — for KPI profile resolution.
     """
 
-    __slots__ = ("fund_id", "company_data", "investments", "names", "company_ids")
+    __slots__ = ("fund_id", "company_data", "investments", "names", "company_ids", "profiles")
 
     def __init__(
         self,
@@ -678,12 +703,14 @@ class FundCompanies:
         investments: Dict[str, Dict[str, Any]],
         names: Dict[str, str],
         company_ids: List[str],
+        profiles: Optional[Dict[str, Dict[str, Any]]] = None,
     ):
         self.fund_id = fund_id
         self.company_data = company_data
         self.investments = investments
         self.names = names
         self.company_ids = company_ids
+        self.profiles = profiles or {}
 
     def iter_companies(self):
         """Yield (company_id, name, CompanyData, investment_dict) for each company."""
@@ -727,6 +754,9 @@ class FundCompanies:
         return len(self.company_ids) == 0
 
 
+_FUND_PAGE_SIZE = 1000  # PostgREST max-rows default
+
+
 def pull_fund_companies(fund_id: str) -> FundCompanies:
     """Pull ALL companies in a fund with their full financials in a single batch.
 
@@ -754,7 +784,7 @@ def pull_fund_companies(fund_id: str) -> FundCompanies:
     try:
         pc_rows = (
             sb.table("companies")
-            .select("id, name, current_valuation_usd, last_valuation_usd, stage, sector, current_arr_usd")
+            .select("id, name, current_valuation_usd, last_valuation_usd, stage, sector, current_arr_usd, revenue_model")
             .eq("fund_id", fund_id)
             .execute()
             .data
@@ -770,6 +800,7 @@ def pull_fund_companies(fund_id: str) -> FundCompanies:
     company_ids: List[str] = []
     investments: Dict[str, Dict[str, Any]] = {}
     names: Dict[str, str] = {}
+    profiles: Dict[str, Dict[str, Any]] = {}
 
     for pc in pc_rows:
         cid = pc.get("id")
@@ -777,6 +808,7 @@ def pull_fund_companies(fund_id: str) -> FundCompanies:
             continue
         company_ids.append(cid)
         names[cid] = pc.get("name", "")
+        profiles[cid] = {"revenue_model": pc.get("revenue_model"), "sector": pc.get("sector")}
         # Investment data from company record
         inv_amount = pc.get("total_funding_usd") or pc.get("current_valuation_usd")
         investments[cid] = {
@@ -790,15 +822,26 @@ def pull_fund_companies(fund_id: str) -> FundCompanies:
         return empty
 
     # --- Step 2: Batch query fpa_actuals for ALL company_ids ---
+    # Paged on the primary key: a fund's actuals easily exceed PostgREST's
+    # max-rows, which would silently truncate a single select.
     try:
-        actuals_rows = (
-            sb.table("fpa_actuals")
-            .select("company_id, category, subcategory, amount, period")
-            .in_("company_id", company_ids)
-            .order("period", desc=False)
-            .execute()
-            .data
-        ) or []
+        actuals_rows = []
+        offset = 0
+        while True:
+            page = (
+                sb.table("fpa_actuals")
+                .select("id, company_id, category, subcategory, amount, period")
+                .in_("company_id", company_ids)
+                .order("id")
+                .range(offset, offset + _FUND_PAGE_SIZE - 1)
+                .execute()
+                .data
+            ) or []
+            actuals_rows.extend(page)
+            if len(page) < _FUND_PAGE_SIZE:
+                break
+            offset += _FUND_PAGE_SIZE
+        actuals_rows.sort(key=lambda r: str(r.get("period") or ""))
     except Exception as e:
         logger.warning("[FUND_PULL] fpa_actuals batch query failed: %s", e)
         actuals_rows = []
@@ -889,6 +932,7 @@ def pull_fund_companies(fund_id: str) -> FundCompanies:
         investments=investments,
         names=names,
         company_ids=company_ids,
+        profiles=profiles,
     )
 
 
@@ -0,0 +1,490 @@
+"""
+Process-local search / comparables index over the ``companies`` table.
+
+PortfolioService.search_companies_db ran ``ilike '%q%'`` scans (twice when the
+name didn't match), find_comparables scored every candidate with per-pair
+SequenceMatcher calls, and IntelligentGapFiller re-pulled every company with
+revenue on every valuation. This index loads the table once per process and
+keeps it current:
+
+    from app.services.company_index import company_index
+
+    if await company_index.ensure_fresh():
+        hits = company_index.search("strip", limit=10)       # [(row, match), ...]
+        comps = company_index.nearest(profile, k=10)         # [(row, score), ...]
+        stats = company_index.aggregate("market_multiples", compute)
+
+- Text: a trigram index over names (substring + fuzzy lookup) and BM25 over
+  name / sector / business model / description tokens.
+- Numbers: log ARR, log valuation and growth columns plus codes for stage /
+  sector / business model / geography, so comparables are scored for every
+  company in one vectorized pass (same weights as find_comparables; text
+  similarity is computed once per distinct sector / model, not per company).
+- Refresh: a full load on first use and every COMPANY_INDEX_FULL_REFRESH_S
+  (picks up deletes); in between, rows whose updated_at moved past the
+  watermark are merged every COMPANY_INDEX_REFRESH_S. Without an updated_at
+  column only the full reload runs.
+- aggregate() memoizes derived statistics until a refresh changes the rows.
+
+Rows are shared between callers — treat them as read-only.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.label_classifier import TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+REFRESH_S = float(os.getenv("COMPANY_INDEX_REFRESH_S", "60"))
+FULL_REFRESH_S = float(os.getenv("COMPANY_INDEX_FULL_REFRESH_S", "900"))
+
+# Union of the columns search_companies_db and the market-multiples pull select
+_COLUMNS = (
+    "id", "name", "sector", "stage", "description", "business_model", "hq_location",
+    "current_arr_usd", "current_valuation_usd", "last_valuation_usd", "growth_rate",
+    "employee_count", "founded_year", "burn_rate_monthly_usd", "runway_months",
+    "revenue", "valuation", "last_round_date", "funding_rounds",
+)
+_PAGE_SIZE = 1000
+_FUZZY_MIN = 0.45            # trigram Dice floor for fuzzy name matches
+_FUZZY_POOL = 50
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_FIELD_WEIGHTS = {"name": 3, "sector": 2, "business_model": 2, "description": 1}
+
+# find_comparables weights: sector, stage, revenue, business model, geography,
+# plus growth / valuation when the target has them
+_W_SECTOR, _W_STAGE, _W_ARR, _W_BM, _W_GEO = 3.0, 2.0, 2.0, 2.0, 1.0
+_W_GROWTH, _W_VALUATION = 1.0, 1.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _number(value: Any) -> float:
+    if hasattr(value, "value"):
+        value = value.value
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _log_positive(values: Iterable[Any]) -> np.ndarray:
+    """ln(x) for positive values, NaN otherwise — min/max ratios become exp(-|Δ|)."""
+    arr = np.array([_number(v) for v in values], dtype=float)
+    out = np.full(arr.shape, np.nan)
+    pos = arr > 0
+    out[pos] = np.log(arr[pos])
+    return out
+
+
+def _growth(values: Iterable[Any]) -> np.ndarray:
+    """Growth as a fraction (values above 5 are read as percentages), NaN if missing."""
+    out = []
+    for v in values:
+        if v is None or v == "":
+            out.append(np.nan)
+            continue
+        g = _number(v)
+        out.append(g / 100.0 if abs(g) > 5 else g)
+    return np.array(out, dtype=float)
+
+
+@lru_cache(maxsize=65536)
+def _text_ratio(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _geo_match(target: str, candidate: str) -> float:
+    return 1.0 if target in candidate or candidate in target else 0.2
+
+
+class _Columns:
+    """Comparable features for a list of company dicts, column-wise."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]]):
+        self.sector = [(r.get("sector") or "").lower() for r in rows]
+        self.stage = [(r.get("stage") or "").lower() for r in rows]
+        self.business_model = [(r.get("business_model") or "").lower() for r in rows]
+        self.geo = [(r.get("hq_location") or r.get("hq") or "").lower() for r in rows]
+        self.log_arr = _log_positive(
+            r.get("current_arr_usd") or r.get("arr") or r.get("revenue") for r in rows
+        )
+        self.log_valuation = _log_positive(
+            r.get("current_valuation_usd") or r.get("valuation") or r.get("last_valuation_usd") for r in rows
+        )
+        self.growth = _growth(r.get("growth_rate") for r in rows)
+        self._codes: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.sector)
+
+    def codes(self, field: str) -> Tuple[np.ndarray, List[str]]:
+        """(per-row code, unique values) — text similarity is computed per unique value."""
+        if field not in self._codes:
+            uniques: Dict[str, int] = {}
+            codes = np.array([uniques.setdefault(v, len(uniques)) for v in getattr(self, field)], dtype=np.int64)
+            self._codes[field] = (codes, list(uniques))
+        return self._codes[field]
+
+
+def _target_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    cols = _Columns([profile])
+    return {
+        "sector": cols.sector[0],
+        "stage": cols.stage[0],
+        "business_model": cols.business_model[0],
+        "geo": cols.geo[0],
+        "log_arr": cols.log_arr[0],
+        "log_valuation": cols.log_valuation[0],
+        "growth": cols.growth[0],
+    }
+
+
+def _text_similarity(target: str, cols: _Columns, field: str, fn: Callable[[str, str], float]) -> np.ndarray:
+    codes, uniques = cols.codes(field)
+    per_unique = np.array([fn(target, u) if (target and u) else 0.0 for u in uniques] or [0.0])
+    return per_unique[codes] if len(codes) else np.zeros(0)
+
+
+def _score(profile: Dict[str, Any], cols: _Columns) -> Tuple[np.ndarray, np.ndarray]:
+    """(similarity 0–10, max(sector, business-model) text similarity) per row."""
+    t = _target_profile(profile)
+    n = len(cols)
+    sim = np.zeros(n)
+    total = _W_SECTOR + _W_STAGE + _W_ARR + _W_BM + _W_GEO
+
+    sector_sim = _text_similarity(t["sector"], cols, "sector", _text_ratio)
+    bm_sim = _text_similarity(t["business_model"], cols, "business_model", _text_ratio)
+    sim += _W_SECTOR * sector_sim + _W_BM * bm_sim
+    sim += _W_STAGE * _text_similarity(t["stage"], cols, "stage", lambda a, b: 1.0 if a == b else 0.3)
+    sim += _W_GEO * _text_similarity(t["geo"], cols, "geo", _geo_match)
+
+    def ratio(target: float, column: np.ndarray) -> np.ndarray:
+        if math.isnan(target):
+            return np.zeros(n)
+        return np.nan_to_num(np.exp(-np.abs(column - target)), nan=0.0)
+
+    sim += _W_ARR * ratio(t["log_arr"], cols.log_arr)
+    if not math.isnan(t["log_valuation"]):
+        sim += _W_VALUATION * ratio(t["log_valuation"], cols.log_valuation)
+        total += _W_VALUATION
+    if not math.isnan(t["growth"]):
+        with np.errstate(invalid="ignore"):
+            g = np.nan_to_num(1.0 - np.minimum(1.0, np.abs(cols.growth - t["growth"])), nan=0.0)
+        sim += _W_GROWTH * g
+        total += _W_GROWTH
+    return np.round(sim / total * 10, 1), np.maximum(sector_sim, bm_sim)
+
+
+def score_comparables(profile: Dict[str, Any], candidates: Sequence[Dict[str, Any]]) -> List[float]:
+    """find_comparables similarity (0–10) of ad-hoc candidate dicts to ``profile``."""
+    if not candidates:
+        return []
+    return _score(profile, _Columns(candidates))[0].tolist()
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class _Snapshot:
+    """Immutable search structures over one version of the rows."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.names = [(r.get("name") or "").lower() for r in rows]
+        self.name_index = TrigramIndex(self.names)
+        self.sector_text = [(r.get("sector") or "").lower() for r in rows]
+        self.description_text = [(r.get("description") or "").lower() for r in rows]
+        self.columns = _Columns(rows)
+        self._build_bm25()
+
+    def _build_bm25(self) -> None:
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        lengths = np.zeros(len(self.rows))
+        for i, r in enumerate(self.rows):
+            tf: Counter = Counter()
+            for field, weight in _FIELD_WEIGHTS.items():
+                for tok in _tokens(str(r.get(field) or "")):
+                    tf[tok] += weight
+            lengths[i] = sum(tf.values())
+            for tok, n in tf.items():
+                self.postings[tok].append((i, float(n)))
+        self.avg_length = float(lengths.mean()) if len(lengths) else 0.0
+        self.lengths = lengths
+
+    def bm25(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        n = len(self.rows)
+        norm = self.avg_length or 1.0
+        for tok in set(_tokens(query)):
+            posting = self.postings.get(tok)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for i, tf in posting:
+                denom = tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * self.lengths[i] / norm)
+                scores[i] += idf * tf * (_BM25_K1 + 1) / denom
+        return scores
+
+
+class CompanyIndex:
+    """Process-wide companies snapshot with text and comparables lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._snapshot: Optional[_Snapshot] = None
+        self._aggregates: Dict[str, Any] = {}
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._watermark: Optional[str] = None
+        self._incremental = True
+        self.generation = 0
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.rows_merged = 0
+        self.searches = 0
+        self.nearest_queries = 0
+        self.aggregate_hits = 0
+        self.aggregate_misses = 0
+        self.load_errors = 0
+
+    # -- refresh -----------------------------------------------------------
+
+    async def ensure_fresh(self) -> bool:
+        """Load / refresh if due. False when no snapshot could be built."""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < REFRESH_S and now - self._loaded_at < FULL_REFRESH_S:
+            return True
+        from app.core.tool_executor import tool_executors
+
+        return await tool_executors.run("io", self.refresh)
+
+    def refresh(self, full: bool = False) -> bool:
+        """Blocking refresh (single-flight across threads)."""
+        with self._lock:
+            now = time.monotonic()
+            full = full or self._snapshot is None or now - self._loaded_at >= FULL_REFRESH_S
+            if not full and now - self._checked_at < REFRESH_S:
+                return True
+            try:
+                if full or not self._incremental:
+                    self._full_load()
+                else:
+                    self._incremental_load()
+            except Exception as e:
+                self.load_errors += 1
+                logger.warning("[company-index] refresh failed: %s", e)
+                # Keep serving the last snapshot; retry after REFRESH_S
+                self._checked_at = now
+            return self._snapshot is not None
+
+    def _client(self):
+        from app.core.supabase_client import get_supabase_client
+
+        sb = get_supabase_client()
+        if not sb:
+            raise RuntimeError("Supabase unavailable")
+        return sb
+
+    def _fetch(self, columns: Sequence[str], since: Optional[str] = None) -> List[Dict[str, Any]]:
+        sb = self._client()
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = sb.table("companies").select(", ".join(columns))
+            if since is not None:
+                query = query.gte("updated_at", since)
+            page = query.order("id").range(start, start + _PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < _PAGE_SIZE:
+                return rows
+            start += _PAGE_SIZE
+
+    def _full_load(self) -> None:
+        try:
+            rows = self._fetch(_COLUMNS + ("updated_at",))
+            self._incremental = True
+        except Exception as e:
+            # companies without updated_at — full reloads only
+            logger.info("[company-index] incremental refresh disabled: %s", e)
+            rows = self._fetch(_COLUMNS)
+            self._incremental = False
+        self._rows = {r["id"]: r for r in rows if r.get("id")}
+        self._watermark = max((r.get("updated_at") or "" for r in rows), default="") or None
+        self._rebuild()
+        self._loaded_at = self._checked_at = time.monotonic()
+        self.full_loads += 1
+        logger.info("[company-index] loaded %d companies (generation %d)", len(self._rows), self.generation)
+
+    def _incremental_load(self) -> None:
+        self._checked_at = time.monotonic()
+        if self._watermark is None:
+            return
+        fetched = self._fetch(_COLUMNS + ("updated_at",), since=self._watermark)
+        self.incremental_loads += 1
+        # gte re-reads rows stamped exactly at the watermark; only real changes rebuild
+        changed = [r for r in fetched if r.get("id") and self._rows.get(r["id"]) != r]
+        if not changed:
+            return
+        for r in changed:
+            self._rows[r["id"]] = r
+        self._watermark = max([self._watermark] + [r.get("updated_at") or "" for r in changed])
+        self.rows_merged += len(changed)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._snapshot = _Snapshot(sorted(self._rows.values(), key=lambda r: r["id"]))
+        self._aggregates = {}
+        self.generation += 1
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next ensure_fresh()."""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    # -- lookups -----------------------------------------------------------
+
+    def rows(self, where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        snap = self._snapshot
+        if snap is None:
+            return []
+        return [r for r in snap.rows if where is None or where(r)]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Dict[str, Any], str]]:
+        """Rows matching ``query`` as (row, match) with match in name / text / fuzzy.
+
+        Same tiers as the old ilike queries: name substrings first, then —
+        when fewer than three — sector / description substrings (BM25-ranked).
+        If neither matched, falls back to fuzzy name and token matches.
+        """
+        snap = self._snapshot
+        if snap is None:
+            return []
+        self.searches += 1
+        q = query.lower().strip()
+
+        def name_rank(i: int) -> tuple:
+            name = snap.names[i]
+            return (0 if name == q else 1 if name.startswith(q) else 2, len(name), name)
+
+        hits = [(i, "name") for i in sorted(snap.name_index.containing(q), key=name_rank)][:limit]
+        if len(hits) < 3:
+            seen = {i for i, _ in hits}
+            text = [i for i in range(len(snap.rows))
+                    if i not in seen and (q in snap.sector_text[i] or q in snap.description_text[i])]
+            relevance = snap.bm25(q)
+            text.sort(key=lambda i: -relevance.get(i, 0.0))
+            hits.extend((i, "text") for i in text[:limit - len(hits)])
+        if not hits and q:
+            hits = self._fuzzy(snap, q, limit)
+        return [(snap.rows[i], match) for i, match in hits]
+
+    @staticmethod
+    def _fuzzy(snap: _Snapshot, q: str, limit: int) -> List[Tuple[int, str]]:
+        grams = set(q[i:i + 3] for i in range(len(q) - 2))
+        scored: Dict[int, float] = {}
+        for i in snap.name_index.ranked(q, _FUZZY_POOL):
+            dice = 2.0 * len(grams & snap.name_index.grams[i]) / (len(grams) + len(snap.name_index.grams[i]))
+            if dice >= _FUZZY_MIN:
+                scored[i] = 1.0 + dice
+        for i, s in snap.bm25(q).items():
+            scored.setdefault(i, s / (s + 1.0))
+        ranked = sorted(scored, key=lambda i: -scored[i])[:limit]
+        return [(i, "fuzzy") for i in ranked]
+
+    def nearest(
+        self,
+        profile: Dict[str, Any],
+        k: int = 10,
+        exclude_names: Iterable[str] = (),
+        min_text_similarity: float = 0.0,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Top-k comparables for ``profile`` (sector, stage, arr / current_arr_usd,
+        business_model, hq / hq_location, growth_rate, valuation), scored 0–10.
+
+        ``min_text_similarity`` drops rows whose sector and business model are
+        both further than that from the target's (ignored when the target has
+        neither). Rows whose name, sector or description contains the
+        target's sector or business model always qualify — those are the
+        candidates the old ilike searches returned.
+        """
+        snap = self._snapshot
+        if snap is None or not snap.rows:
+            return []
+        self.nearest_queries += 1
+        scores, text_sim = _score(profile, snap.columns)
+        keep = np.ones(len(snap.rows), dtype=bool)
+        terms = [profile.get("sector"), profile.get("business_model")]
+        if min_text_similarity and any(terms):
+            keep &= (text_sim >= min_text_similarity) | self._mentions(snap, terms)
+        excluded = {n.lower().strip() for n in exclude_names if n}
+        if excluded:
+            keep &= np.array([name.strip() not in excluded for name in snap.names])
+        candidates = np.flatnonzero(keep)
+        if not len(candidates):
+            return []
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = sorted(top, key=lambda i: (-scores[i], snap.names[i]))
+        return [(snap.rows[i], float(scores[i])) for i in top]
+
+    @staticmethod
+    def _mentions(snap: _Snapshot, terms: Iterable[Any]) -> np.ndarray:
+        """Rows whose name, sector or description contains any of ``terms``."""
+        needles = [str(t).lower().strip() for t in terms if t and str(t).strip()]
+        return np.array([
+            any(t in snap.names[i] or t in snap.sector_text[i] or t in snap.description_text[i] for t in needles)
+            for i in range(len(snap.rows))
+        ], dtype=bool)
+
+    def aggregate(self, name: str, compute: Callable[[], Any]) -> Any:
+        """compute() once per snapshot generation (e.g. stage multiples)."""
+        key = (name, self.generation)
+        if key in self._aggregates:
+            self.aggregate_hits += 1
+            return self._aggregates[key]
+        self.aggregate_misses += 1
+        value = compute()
+        self._aggregates[key] = value
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "companies": len(snap.rows) if snap else 0,
+            "generation": self.generation,
+            "incremental": self._incremental,
+            "watermark": self._watermark,
+            "age_s": round(time.monotonic() - self._loaded_at, 1) if snap else None,
+            "full_loads": self.full_loads,
+            "incremental_loads": self.incremental_loads,
+            "rows_merged": self.rows_merged,
+            "load_errors": self.load_errors,
+            "searches": self.searches,
+            "nearest_queries": self.nearest_queries,
+            "aggregate_hits": self.aggregate_hits,
+            "aggregate_misses": self.aggregate_misses,
+            "text_ratio_cache": _text_ratio.cache_info()._asdict(),
+        }
+
+
+# Singleton — import this everywhere
+company_index = CompanyIndex()
@@ -10,17 +10,44 @@ Consolidation methods (IFRS/GAAP):
   - Full (>50% ownership): sum everything, eliminate IC, book minority interest
   - Equity method (20-50%): single line "share of associate profit"
   - None (<20%): not consolidated
+
+Performance:
+  - All consolidated entities' actuals come from one paged ``.in_()`` query.
+    Full history is pulled, so every period range of a group is served from
+    the same pull.
+  - Each entity's P&L is held as a line × period array. Group arrays are
+    aligned sums of those, and a period range is a column slice.
+  - Results are cached per (group, period range) in a VersionedCache under
+    the "actuals" scope. invalidate_company_cache() drops them in every
+    process.
+  - After an invalidation the re-pull is compared per entity by content
+    fingerprint. Only entities whose rows changed are re-aggregated, and only
+    IC transactions whose content or period span changed are re-eliminated.
 """
 
 from __future__ import annotations
 
+import bisect
 import logging
-from collections import defaultdict
+import os
+import threading
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from app.core.cache_bus import VersionedCache
+
 logger = logging.getLogger(__name__)
 
+_PAGE_SIZE = 1000      # PostgREST max-rows default
+_IN_CHUNK = 200        # entity ids per .in_() filter, keeps the URL short
+_MEMO_MAX = int(os.getenv("CONSOLIDATION_MEMO_MAX", "8192"))
+
+# company_id → _CompanyConsolidation; dropped by invalidate_company_cache()
+_RESULTS = VersionedCache("consolidation", scope="actuals", max_entries=256)
+
 
 # ---------------------------------------------------------------------------
 # Data structures
@@ -61,6 +88,73 @@ class ConsolidatedPnL:
     audit: List[str]
 
 
+@dataclass
+class _EntityActuals:
+    """One entity's actuals as a line × period grid (periods sorted "YYYY-MM")."""
+    fingerprint: int
+    keys: List[str]
+    periods: List[str]
+    amounts: np.ndarray      # float, len(keys) × len(periods)
+    present: np.ndarray      # bool, cells that had at least one actuals row
+
+
+@dataclass
+class _GroupActuals:
+    """A group's entity tree, per-entity grids and their aligned sum, all periods."""
+    full_entities: List[str]
+    equity_entities: List[str]
+    ownership: Dict[str, float]
+    entities: Dict[str, _EntityActuals]
+    keys: List[str]
+    periods: List[str]
+    combined: np.ndarray
+    present: np.ndarray
+    ic_transactions: List[Dict]
+    audit: List[str]
+
+
+@dataclass
+class _CompanyConsolidation:
+    groups: Dict[str, _GroupActuals] = field(default_factory=dict)
+    results: Dict[Tuple[str, str, str], ConsolidatedPnL] = field(default_factory=dict)
+
+
+class _ContentMemo:
+    """Bounded LRU for content-addressed pieces that outlive cache invalidation:
+    entity grids (checked against a row fingerprint) and per-transaction
+    elimination entries."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_MEMO = _ContentMemo(_MEMO_MAX)
+
+
+def _txn_fingerprint(txn: Dict) -> int:
+    return hash(repr(sorted(txn.items(), key=lambda kv: kv[0])))
+
+
 class ConsolidationEngine:
     """Consolidates P&L across a group of entities with IC elimination."""
 
@@ -80,19 +174,45 @@ class ConsolidationEngine:
         Steps:
         1. Resolve entity tree from group_structure_intelligence
         2. Classify entities: full consolidation vs equity method vs excluded
-        3. Pull P&L for each fully-consolidated entity via PnlBuilder
+        3. Pull actuals for all fully-consolidated entities in one batch
         4. Sum all entity P&Ls
         5. Fetch IC transactions and eliminate matching revenue/cost pairs
         6. Compute minority interest for <100% owned subsidiaries
         7. Return consolidated P&L with full audit trail
+
+        Steps 1-3 run once per group and cover every period; results are
+        cached per (group, period range) until the company's actuals are
+        invalidated. The returned object is shared — treat it as read-only.
         """
+        key = (parent_entity_id, period_start or "", period_end or "")
+        state = _RESULTS.get(self.company_id)
+        if state is not None and key in state.results:
+            return state.results[key]
+
+        token = _RESULTS.token(self.company_id)
+        group = state.groups.get(parent_entity_id) if state is not None else None
+        if group is None:
+            group = await self._load_group(parent_entity_id)
+            if group is None:
+                return self._empty_result([f"No entities found for parent {parent_entity_id}"])
+
+        result = self._consolidate_range(group, period_start, period_end)
+
+        if state is None:
+            state = _CompanyConsolidation()
+            _RESULTS.set(self.company_id, state, token)
+        state.groups[parent_entity_id] = group
+        state.results[key] = result
+        return result
+
+    async def _load_group(self, parent_entity_id: str) -> Optional[_GroupActuals]:
+        """Steps 1-3 for every period at once: tree, classification, actuals, IC flows."""
         audit: List[str] = []
 
         # 1. Resolve entity tree
         entities, relationships = await self._resolve_entity_tree(parent_entity_id)
         if not entities:
-            audit.append(f"No entities found for parent {parent_entity_id}")
-            return self._empty_result(audit)
+            return None
 
         # 2. Classify by consolidation method
         full_entities: List[str] = []
@@ -118,64 +238,137 @@ class ConsolidationEngine:
         audit.append(f"Full consolidation: {len(full_entities)} entities")
         audit.append(f"Equity method: {len(equity_entities)} entities")
 
-        # 3. Pull P&L for each fully-consolidated entity
-        entity_pnls: Dict[str, Dict[str, Dict[str, float]]] = {}
-        all_periods: set = set()
+        # 3. Pull every fully-consolidated entity's actuals in one batch
+        rows_by_entity = await self._pull_group_actuals(full_entities)
+        entity_grids: Dict[str, _EntityActuals] = {}
+        rebuilt = 0
+        for eid in full_entities:
+            grid, fresh = self._entity_grid(eid, rows_by_entity.get(eid, []))
+            entity_grids[eid] = grid
+            rebuilt += fresh
+        audit.append(
+            f"Actuals: {sum(len(r) for r in rows_by_entity.values())} rows in one batch, "
+            f"{rebuilt}/{len(full_entities)} entity P&Ls rebuilt"
+        )
 
+        # Align entity grids on the union of line keys and periods
+        key_index: Dict[str, int] = {}
+        for grid in entity_grids.values():
+            for k in grid.keys:
+                key_index.setdefault(k, len(key_index))
+        periods = sorted({p for grid in entity_grids.values() for p in grid.periods})
+        period_index = {p: i for i, p in enumerate(periods)}
+        combined = np.zeros((len(key_index), len(periods)))
+        present = np.zeros(combined.shape, dtype=bool)
         for eid in full_entities:
-            pnl, periods = await self._pull_entity_pnl(eid, period_start, period_end)
-            entity_pnls[eid] = pnl
-            all_periods.update(periods)
-            audit.append(f"Entity {eid}: {len(pnl)} line items, {len(periods)} periods")
+            grid = entity_grids[eid]
+            if not grid.keys:
+                continue
+            cells = np.ix_([key_index[k] for k in grid.keys], [period_index[p] for p in grid.periods])
+            combined[cells] += grid.amounts
+            present[cells] |= grid.present
+
+        ic_transactions = await self._fetch_ic_transactions(full_entities, None, None)
+
+        return _GroupActuals(
+            full_entities=full_entities,
+            equity_entities=equity_entities,
+            ownership=ownership_map,
+            entities=entity_grids,
+            keys=list(key_index),
+            periods=periods,
+            combined=combined,
+            present=present,
+            ic_transactions=ic_transactions,
+            audit=audit,
+        )
 
-        sorted_periods = sorted(all_periods)
+    def _consolidate_range(
+        self,
+        group: _GroupActuals,
+        period_start: Optional[str],
+        period_end: Optional[str],
+    ) -> ConsolidatedPnL:
+        """Steps 4-7 on a column slice of the group's aligned grids."""
+        audit = list(group.audit)
+
+        def bounds(periods: List[str]) -> Tuple[int, int]:
+            lo = bisect.bisect_left(periods, period_start) if period_start else 0
+            hi = bisect.bisect_right(periods, period_end) if period_end else len(periods)
+            return lo, hi
+
+        def as_dict(keys: List[str], periods: List[str], amounts: np.ndarray, present: np.ndarray):
+            out: Dict[str, Dict[str, float]] = {}
+            for r, k in enumerate(keys):
+                cols = np.flatnonzero(present[r])
+                if cols.size:
+                    values = amounts[r, cols].tolist()
+                    out[k] = {periods[c]: v for c, v in zip(cols.tolist(), values)}
+            return out
+
+        # 3. Per-entity P&Ls for the range
+        entity_pnls: Dict[str, Dict[str, Dict[str, float]]] = {}
+        entity_cols: Dict[str, Tuple[int, int]] = {}
+        for eid in group.full_entities:
+            grid = group.entities[eid]
+            lo, hi = entity_cols[eid] = bounds(grid.periods)
+            pnl = as_dict(grid.keys, grid.periods[lo:hi], grid.amounts[:, lo:hi], grid.present[:, lo:hi])
+            entity_pnls[eid] = pnl
+            n_periods = int(grid.present[:, lo:hi].any(axis=0).sum()) if grid.keys else 0
+            audit.append(f"Entity {eid}: {len(pnl)} line items, {n_periods} periods")
 
-        # 4. Sum all entity P&Ls
-        combined: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
-        for eid, pnl in entity_pnls.items():
-            for key, period_data in pnl.items():
-                for period, amount in period_data.items():
-                    combined[key][period] += amount
+        # 4. Sum all entity P&Ls (a slice of the aligned group sum)
+        lo, hi = bounds(group.periods)
+        periods = group.periods[lo:hi]
+        present = group.present[:, lo:hi]
+        combined = as_dict(group.keys, periods, group.combined[:, lo:hi], present)
+        sorted_periods = [periods[c] for c in np.flatnonzero(present.any(axis=0)).tolist()] if group.keys else []
 
-        # 5. Fetch IC transactions and eliminate
-        ic_transactions = await self._fetch_ic_transactions(
-            full_entities, period_start, period_end
-        )
-        eliminations = self._compute_eliminations(ic_transactions, combined)
+        # 5. IC eliminations, reused per transaction while its content and span are unchanged
+        eliminations: List[EliminationEntry] = []
+        span = tuple(sorted_periods)
+        for txn in group.ic_transactions:
+            memo_key = ("ic", self.company_id, _txn_fingerprint(txn), None if txn.get("periods") else span)
+            entries = _MEMO.get(memo_key)
+            if entries is None:
+                entries = self._compute_eliminations([txn], combined, all_periods=sorted_periods)
+                _MEMO.set(memo_key, entries)
+            eliminations.extend(entries)
         audit.append(f"IC eliminations: {len(eliminations)} entries")
 
         # Apply eliminations to get consolidated P&L
         consolidated: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
-        # Start with combined
         for key, period_data in combined.items():
-            for period, amount in period_data.items():
-                consolidated[key][period] = amount
-        # Subtract eliminations
+            consolidated[key].update(period_data)
         for elim in eliminations:
             key = f"{elim.category}:{elim.subcategory}" if elim.subcategory else elim.category
             consolidated[key][elim.period] -= elim.amount
 
         # 6. Minority interest
         minority_interest: Dict[str, Dict[str, float]] = {}
-        for eid in full_entities:
-            ownership = ownership_map.get(eid, 100.0)
-            if ownership < 100.0:
-                minority_pct = (100.0 - ownership) / 100.0
-                mi_by_period: Dict[str, float] = {}
-                for key, period_data in entity_pnls.get(eid, {}).items():
-                    for period, amount in period_data.items():
-                        mi_by_period[period] = mi_by_period.get(period, 0) + amount * minority_pct
-                if mi_by_period:
-                    minority_interest[eid] = mi_by_period
-                    audit.append(f"Minority interest for {eid}: {minority_pct:.0%} of net income")
+        for eid in group.full_entities:
+            ownership = group.ownership.get(eid, 100.0)
+            grid = group.entities[eid]
+            if ownership >= 100.0 or not grid.keys:
+                continue
+            minority_pct = (100.0 - ownership) / 100.0
+            e_lo, e_hi = entity_cols[eid]
+            share = grid.amounts[:, e_lo:e_hi] * minority_pct
+            total = np.zeros(share.shape[1])
+            for row in share:  # line by line, same summation order as the per-line loop
+                total += row
+            cols = np.flatnonzero(grid.present[:, e_lo:e_hi].any(axis=0)).tolist()
+            if cols:
+                minority_interest[eid] = {grid.periods[e_lo + c]: float(total[c]) for c in cols}
+                audit.append(f"Minority interest for {eid}: {minority_pct:.0%} of net income")
 
         return ConsolidatedPnL(
-            entity_pnls=dict(entity_pnls),
-            combined=dict(combined),
+            entity_pnls=entity_pnls,
+            combined=combined,
             eliminations=eliminations,
-            consolidated=dict(consolidated),
-            entities_consolidated=full_entities,
-            entities_equity_method=equity_entities,
+            consolidated={k: dict(v) for k, v in consolidated.items()},
+            entities_consolidated=group.full_entities,
+            entities_equity_method=group.equity_entities,
             minority_interest=minority_interest,
             periods=sorted_periods,
             audit=audit,
@@ -227,46 +420,80 @@ class ConsolidationEngine:
     # Per-entity P&L
     # ------------------------------------------------------------------
 
-    async def _pull_entity_pnl(
-        self,
-        entity_id: str,
-        period_start: Optional[str],
-        period_end: Optional[str],
-    ) -> Tuple[Dict[str, Dict[str, float]], List[str]]:
-        """Pull P&L actuals for a single entity."""
+    async def _pull_group_actuals(self, entity_ids: List[str]) -> Dict[str, List[Dict]]:
+        """All periods of actuals for ``entity_ids``: {entity_id: rows sorted by period}.
+
+        One ``.in_()`` filter per _IN_CHUNK entities, paged by id so groups
+        past PostgREST's max-rows aren't truncated.
+        """
         from app.core.supabase_client import get_supabase_client
 
         sb = get_supabase_client()
-        if not sb:
-            return {}, []
-
-        query = (
-            sb.table("fpa_actuals")
-            .select("period, category, subcategory, hierarchy_path, amount")
-            .eq("company_id", self.company_id)
-            .eq("entity_id", entity_id)
-        )
-        if period_start:
-            query = query.gte("period", f"{period_start}-01")
-        if period_end:
-            query = query.lte("period", f"{period_end}-01")
-
-        result = query.order("period").execute()
-        if not result.data:
-            return {}, []
-
-        actuals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
-        periods: set = set()
-
-        for row in result.data:
-            period = row["period"][:7]
+        if not sb or not entity_ids:
+            return {}
+
+        rows_by_entity: Dict[str, List[Dict]] = {eid: [] for eid in entity_ids}
+        for i in range(0, len(entity_ids), _IN_CHUNK):
+            chunk = entity_ids[i:i + _IN_CHUNK]
+            offset = 0
+            while True:
+                page = (
+                    sb.table("fpa_actuals")
+                    .select("id, entity_id, period, category, subcategory, amount")
+                    .eq("company_id", self.company_id)
+                    .in_("entity_id", chunk)
+                    .order("id")
+                    .range(offset, offset + _PAGE_SIZE - 1)
+                    .execute()
+                    .data
+                ) or []
+                for row in page:
+                    rows = rows_by_entity.get(row.get("entity_id"))
+                    if rows is not None and row.get("period"):
+                        rows.append(row)
+                if len(page) < _PAGE_SIZE:
+                    break
+                offset += _PAGE_SIZE
+
+        for rows in rows_by_entity.values():
+            rows.sort(key=lambda r: str(r["period"]))
+        return rows_by_entity
+
+    def _entity_grid(self, entity_id: str, rows: List[Dict]) -> Tuple[_EntityActuals, bool]:
+        """Line × period grid for one entity; reused when its rows are unchanged.
+
+        Returns (grid, rebuilt).
+        """
+        fingerprint = hash(tuple(
+            (r.get("id"), r["period"], r["category"], r.get("subcategory"), r["amount"]) for r in rows
+        ))
+        memo_key = ("pnl", self.company_id, entity_id)
+        cached = _MEMO.get(memo_key)
+        if cached is not None and cached.fingerprint == fingerprint:
+            return cached, False
+
+        keys: Dict[str, int] = {}
+        periods = sorted({row["period"][:7] for row in rows})
+        period_index = {p: i for i, p in enumerate(periods)}
+        key_idx: List[int] = []
+        period_idx: List[int] = []
+        amounts: List[float] = []
+        for row in rows:
             cat = row["category"]
             sub = row.get("subcategory")
             key = f"{cat}:{sub}" if sub else cat
-            actuals[key][period] += float(row["amount"])
-            periods.add(period)
-
-        return dict(actuals), sorted(periods)
+            key_idx.append(keys.setdefault(key, len(keys)))
+            period_idx.append(period_index[row["period"][:7]])
+            amounts.append(float(row["amount"]))
+
+        grid = np.zeros((len(keys), len(periods)))
+        present = np.zeros(grid.shape, dtype=bool)
+        if rows:
+            np.add.at(grid, (key_idx, period_idx), amounts)
+            present[key_idx, period_idx] = True
+        result = _EntityActuals(fingerprint, list(keys), periods, grid, present)
+        _MEMO.set(memo_key, result)
+        return result, True
 
     # ------------------------------------------------------------------
     # IC transaction fetching
@@ -317,12 +544,15 @@ class ConsolidationEngine:
         self,
         ic_transactions: List[Dict],
         combined_pnl: Dict[str, Dict[str, float]],
+        all_periods: Optional[List[str]] = None,
     ) -> List[EliminationEntry]:
         """
         For each IC transaction, eliminate matching revenue/cost pairs.
 
         IC revenue in entity A = IC cost in entity B.
-        Both sides get eliminated in consolidation.
+        Both sides get eliminated in consolidation. ``all_periods`` (the
+        periods of combined_pnl, when the caller already has them) is the
+        span for transactions without explicit periods.
         """
         eliminations: List[EliminationEntry] = []
 
@@ -344,10 +574,9 @@ class ConsolidationEngine:
             periods = txn.get("periods", [])
             if not periods:
                 # If no explicit periods, apply to all periods in combined P&L
-                all_periods = set()
-                for key_data in combined_pnl.values():
-                    all_periods.update(key_data.keys())
-                periods = sorted(all_periods)
+                if all_periods is None:
+                    all_periods = sorted({p for key_data in combined_pnl.values() for p in key_data})
+                periods = list(all_periods)
                 # Divide annual value by number of periods
                 if periods:
                     amount_per_period = amount / len(periods)
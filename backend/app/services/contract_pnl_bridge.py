@@ -212,6 +212,8 @@ def bridge_contract_to_pnl(
                 chunk,
                 on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
             ).execute()
+        from app.services.company_data_pull import invalidate_company_cache
+        invalidate_company_cache(company_id)
 
         logger.info(
             "[CONTRACT_PNL] Wrote %d fpa_actuals rows for doc %s (%s/%s, $%.0f/period)",
@@ -304,6 +306,9 @@ def bridge_contract_to_tp(
 
     try:
         sb.table("ic_transaction_suggestions").insert(suggestion).execute()
+        if company_id:
+            from app.services.company_data_pull import invalidate_company_cache
+            invalidate_company_cache(company_id)
         logger.info(
             "[CONTRACT_TP] Created IC transaction suggestion for doc %s (%s, $%s)",
             document_id, transaction_type, annual_value,
@@ -12,7 +12,7 @@ import os
 import re
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.abstractions.document_metadata import DocumentMetadataRepo
 from app.abstractions.storage import DocumentBlobStorage
@@ -21,6 +21,10 @@ logger = logging.getLogger(__name__)
 
 _UNLINKED = "00000000-0000-0000-0000-000000000000"
 
+# Document text per extraction prompt. Longer documents go through the
+# chunked (map-reduce) path in _extract_document_structured_async.
+_MAX_PROMPT_CHARS = 120_000
+
 # Startup check: pypdf required for PDF extraction
 def _check_pypdf() -> None:
     try:
@@ -34,17 +38,9 @@ def _check_pypdf() -> None:
 
 _check_pypdf()  # Run on module load
 
-# OCR availability flag
-_OCR_AVAILABLE = False
-try:
-    import pytesseract  # noqa: F401
-    from pdf2image import convert_from_path  # noqa: F401
-    _OCR_AVAILABLE = True
-except ImportError:
-    logger.info(
-        "pytesseract/pdf2image not installed; OCR fallback disabled. "
-        "Run: pip install pytesseract pdf2image  (and install Tesseract + Poppler system deps)"
-    )
+# OCR availability flag (single-pass PDF extraction and OCR pool live in text_extraction)
+from app.services.text_extraction import OCR_AVAILABLE as _OCR_AVAILABLE
+from app.services.text_extraction import cached_text, extract_pdf_text
 
 # ---------------------------------------------------------------------------
 # Legal document extraction schemas — clause-level with parent-child hierarchy
@@ -364,7 +360,7 @@ def _legal_extraction_prompt(text: str, document_type: str, schema_desc: str, **
         user_prompt += " Use this as guidance for erp_attribution.category and subcategory.\n"
 
     user_prompt += (
-        f"\nDocument text:\n---\n{text[:120000]}\n---\n\n"
+        f"\nDocument text:\n---\n{text[:_MAX_PROMPT_CHARS]}\n---\n\n"
         "Return only the JSON object, no markdown or explanation."
     )
     return system_prompt, user_prompt
@@ -570,75 +566,10 @@ def _iso_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _ocr_pdf(path: str) -> str:
-    """
-    OCR a PDF using pytesseract + pdf2image.
-    Converts each page to an image and runs Tesseract OCR.
-    Returns extracted text or empty string on failure.
-    """
-    if not _OCR_AVAILABLE:
-        logger.warning("OCR requested but pytesseract/pdf2image not installed")
-        return ""
-    try:
-        import pytesseract
-        from pdf2image import convert_from_path
-
-        logger.info("Running OCR on PDF: %s", path)
-        images = convert_from_path(path, dpi=300)
-        text_parts: list[str] = []
-        for i, img in enumerate(images):
-            try:
-                page_text = pytesseract.image_to_string(img, lang="eng")
-                if page_text and page_text.strip():
-                    text_parts.append(page_text.strip())
-            except Exception as e:
-                logger.debug("OCR failed on page %d: %s", i + 1, e)
-        result = "\n\n".join(text_parts).strip()
-        if result:
-            logger.info("OCR extracted %d chars from %d pages", len(result), len(images))
-        else:
-            logger.warning("OCR produced no text from %d pages", len(images))
-        return result
-    except Exception as e:
-        logger.exception("OCR failed for %s: %s", path, e)
-        return ""
-
-
-# Minimum chars to consider pypdf extraction successful (avoids header-only extracts)
-_MIN_TEXT_THRESHOLD = 50
-
-
-def _extract_pdf_tables(path: str) -> str:
-    """Extract tables from a PDF using pdfplumber. Returns pipe-delimited text or empty string."""
-    try:
-        import pdfplumber
-    except ImportError:
-        logger.debug("pdfplumber not installed; skipping PDF table extraction")
-        return ""
-    try:
-        table_parts: list[str] = []
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                for table in page.extract_tables():
-                    if not table:
-                        continue
-                    rows = []
-                    for row in table:
-                        cells = [str(cell).strip() if cell else "" for cell in row]
-                        if any(cells):
-                            rows.append(" | ".join(cells))
-                    if rows:
-                        table_parts.append("\n".join(rows))
-        return "\n\n".join(table_parts)
-    except Exception as e:
-        logger.debug("pdfplumber table extraction failed: %s", e)
-        return ""
-
-
 def _text_from_file(path: str, suffix: str) -> str:
     """
-    Extract plain text from a file. Supports PDF (pypdf with OCR fallback) and DOCX (python-docx).
-    For PDFs: tries pypdf first, falls back to OCR if text is empty or too short.
+    Extract plain text from a file. Supports PDF (single pass, per-page OCR fallback),
+    DOCX (python-docx) and spreadsheets. Results are cached by file content hash.
     Returns empty string for unsupported types or on error.
     """
     path_obj = Path(path)
@@ -647,41 +578,17 @@ def _text_from_file(path: str, suffix: str) -> str:
         return ""
 
     ext = (suffix or path_obj.suffix or "").lower().lstrip(".")
-    text_parts: list[str] = []
-
     try:
-        if ext in ("pdf",):
-            from pypdf import PdfReader
-            reader = PdfReader(path)
-            for page in reader.pages:
-                try:
-                    t = page.extract_text()
-                    if t:
-                        text_parts.append(t)
-                except Exception as e:
-                    logger.debug("pypdf page extract: %s", e)
-            text = "\n\n".join(text_parts).strip()
-
-            # Extract tables with pdfplumber for structured data
-            table_text = _extract_pdf_tables(path)
-            if table_text:
-                text = text + "\n\n=== TABLES ===\n" + table_text
-
-            # If we got enough text, use it
-            if len(text) >= _MIN_TEXT_THRESHOLD:
-                return text
+        return cached_text(path, ext, lambda: _extract_text(path, ext))
+    except Exception as e:
+        logger.exception("_text_from_file failed for %s: %s", path, e)
+        return ""
 
-            # Otherwise try OCR fallback
-            logger.info(
-                "pypdf extracted only %d chars (threshold %d), attempting OCR fallback",
-                len(text), _MIN_TEXT_THRESHOLD,
-            )
-            ocr_text = _ocr_pdf(path)
-            if ocr_text:
-                return ocr_text
 
-            # Return whatever pypdf got (may be empty)
-            return text
+def _extract_text(path: str, ext: str) -> str:
+    try:
+        if ext in ("pdf",):
+            return extract_pdf_text(path)
 
         if ext in ("docx", "doc"):
             try:
@@ -1074,7 +981,7 @@ def _signal_first_prompt(text: str, document_type: str, schema_desc: str, memo_c
         "",
         "Document text:",
         "---",
-        (text[:120000] if len(text) > 120000 else text),
+        text[:_MAX_PROMPT_CHARS],
         "---",
         "Return only the JSON object, no markdown or explanation.",
     ]
@@ -1273,7 +1180,7 @@ def _pe_signal_prompt(text: str, document_type: str, schema_desc: str, memo_cont
         "",
         "Document text:",
         "---",
-        (text[:120000] if len(text) > 120000 else text),
+        text[:_MAX_PROMPT_CHARS],
         "---",
         "Return only the JSON object, no markdown or explanation.",
     ]
@@ -1315,7 +1222,7 @@ def _memo_prompt(text: str, schema_desc: str) -> tuple:
     )
     user_prompt = (
         f"Extract and return a JSON object matching this schema:\n{schema_desc}\n\n"
-        f"Document text:\n---\n{text[:120000]}\n---\n\n"
+        f"Document text:\n---\n{text[:_MAX_PROMPT_CHARS]}\n---\n\n"
         "Return only the JSON object, no markdown or explanation."
     )
     return system_prompt, user_prompt
@@ -1453,7 +1360,7 @@ def _spreadsheet_prompt(text: str, document_type: str, schema_desc: str, memo_co
         "",
         "Spreadsheet data:",
         "---",
-        (text[:120000] if len(text) > 120000 else text),
+        text[:_MAX_PROMPT_CHARS],
         "---",
         "Return only the JSON object, no markdown or explanation.",
     ]
@@ -1487,40 +1394,25 @@ def _flat_prompt(text: str, document_type: str, schema_desc: str) -> tuple:
     user_prompt = (
         f"Document type: {document_type}\n\n"
         f"Extract and return a JSON object matching this schema:\n{schema_desc}\n\n"
-        f"Document text:\n---\n{text[:120000]}\n---\n\n"
+        f"Document text:\n---\n{text[:_MAX_PROMPT_CHARS]}\n---\n\n"
         "Return only the JSON object, no markdown or explanation."
     )
     return system_prompt, user_prompt
 
 
-async def _extract_document_structured_async(
+def _build_extraction_prompt(
     text: str,
+    doc_type: str,
     document_type: str,
     memo_context: Optional[str] = None,
     erp_category_hint: Optional[str] = None,
     erp_subcategory_hint: Optional[str] = None,
     fund_type: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Call model_router with a prompt and JSON schema to extract structured data from document text.
-    Branches by document_type and fund_type:
-    - legal doc types → legal clause extraction schema
-    - monthly_update/board_deck + PE/growth fund → PE signal prompt
-    - monthly_update/board_deck + VC fund → VC signal prompt
-    - investment_memo → memo schema
-    - else → flat
-    Returns a dict suitable for extracted_data (normalized so financial_metrics and period_date exist where applicable).
-    """
-    from app.services.model_router import ModelRouter, ModelCapability
-
-    # Create a fresh router instance — NOT the singleton.
-    # This function runs inside asyncio.run() in a worker thread, which creates
-    # a new event loop. The singleton's async clients (AsyncAnthropic, aiohttp)
-    # are bound to the main event loop and will deadlock here. A fresh instance
-    # initializes its clients on this thread's loop.
-    router = ModelRouter()
-    doc_type = (document_type or "other").strip().lower()
+) -> Tuple[str, str, Dict[str, Any], str]:
+    """(system_prompt, user_prompt, empty result, merge kind) for one document or chunk.
 
+    Merge kind is "legal", "memo" or "signal" — see chunked_extraction.merge_partials.
+    """
     if doc_type in LEGAL_DOC_TYPES:
         # Legal document — clause extraction with parent-child hierarchy
         legal_schema = _get_legal_schema(doc_type)
@@ -1530,28 +1422,56 @@ async def _extract_document_structured_async(
             erp_category_hint=erp_category_hint,
             erp_subcategory_hint=erp_subcategory_hint,
         )
-        empty = _empty_legal_extraction()
-    elif doc_type == "investment_memo":
+        return system_prompt, user_prompt, _empty_legal_extraction(), "legal"
+    if doc_type == "investment_memo":
         schema_desc = json.dumps(INVESTMENT_MEMO_SCHEMA, indent=2)
         system_prompt, user_prompt = _memo_prompt(text, schema_desc)
-        empty = _empty_memo_extraction()
-    elif doc_type == "financial_statement":
+        return system_prompt, user_prompt, _empty_memo_extraction(), "memo"
+    schema_desc = json.dumps(COMPANY_UPDATE_SIGNAL_SCHEMA, indent=2)
+    if doc_type == "financial_statement":
         # Spreadsheet data (CSV/XLSX) — use spreadsheet-specific prompt that handles
         # tabular management accounts, P&Ls, etc. Same signal schema, different prompt.
-        schema_desc = json.dumps(COMPANY_UPDATE_SIGNAL_SCHEMA, indent=2)
         system_prompt, user_prompt = _spreadsheet_prompt(text, document_type, schema_desc, memo_context)
-        empty = _empty_signal_extraction()
     elif fund_type in ("private_equity", "growth"):
         # PE / growth fund → PE-specific prompt focused on EBITDA, leverage, covenants
-        schema_desc = json.dumps(COMPANY_UPDATE_SIGNAL_SCHEMA, indent=2)
         system_prompt, user_prompt = _pe_signal_prompt(text, document_type, schema_desc, memo_context)
-        empty = _empty_signal_extraction()
         logger.info("[DOC_EXTRACT] Using PE prompt for fund_type=%s, doc_type=%s", fund_type, doc_type)
     else:
         # VC / default — signal-first extraction
-        schema_desc = json.dumps(COMPANY_UPDATE_SIGNAL_SCHEMA, indent=2)
         system_prompt, user_prompt = _signal_first_prompt(text, document_type, schema_desc, memo_context)
-        empty = _empty_signal_extraction()
+    return system_prompt, user_prompt, _empty_signal_extraction(), "signal"
+
+
+async def _extract_document_structured_async(
+    text: str,
+    document_type: str,
+    memo_context: Optional[str] = None,
+    erp_category_hint: Optional[str] = None,
+    erp_subcategory_hint: Optional[str] = None,
+    fund_type: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Call model_router with a prompt and JSON schema to extract structured data from document text.
+    Branches by document_type and fund_type:
+    - legal doc types → legal clause extraction schema
+    - monthly_update/board_deck + PE/growth fund → PE signal prompt
+    - monthly_update/board_deck + VC fund → VC signal prompt
+    - investment_memo → memo schema
+    - else → flat
+    Documents longer than one prompt are extracted chunk by chunk and merged
+    (_extract_chunked_async) instead of being truncated.
+    Returns a dict suitable for extracted_data (normalized so financial_metrics and period_date exist where applicable).
+    """
+    from app.services.model_router import ModelRouter, ModelCapability
+
+    # Create a fresh router instance — NOT the singleton.
+    # This function runs inside asyncio.run() in a worker thread, which creates
+    # a new event loop. The singleton's async clients (AsyncAnthropic, aiohttp)
+    # are bound to the main event loop and will deadlock here. A fresh instance
+    # initializes its clients on this thread's loop.
+    router = ModelRouter()
+    doc_type = (document_type or "other").strip().lower()
+    prompt_args = (doc_type, document_type, memo_context, erp_category_hint, erp_subcategory_hint, fund_type)
 
     # Both legal and portfolio docs were hitting max_tokens and producing
     # truncated JSON that failed to parse.  Give all doc types enough room.
@@ -1562,6 +1482,11 @@ async def _extract_document_structured_async(
     # the caller_context routing so we guarantee Sonnet/GPT-5.2 first.
     legal_preferred = ["gpt-5.2", "claude-sonnet-4-6", "gemini-2.5-pro"] if doc_type in LEGAL_DOC_TYPES else None
 
+    if len(text or "") > _MAX_PROMPT_CHARS:
+        return await _extract_chunked_async(router, text, prompt_args, max_tok, legal_preferred)
+
+    system_prompt, user_prompt, empty, _kind = _build_extraction_prompt(text, *prompt_args)
+
     try:
         result = await router.get_completion(
             prompt=user_prompt,
@@ -1590,19 +1515,102 @@ async def _extract_document_structured_async(
 
         parsed = _extract_json_object(raw)
         if isinstance(parsed, dict):
-            # Legal docs return their own shape — skip financial normalization
-            if doc_type in LEGAL_DOC_TYPES:
-                return _normalize_legal_extraction(parsed)
-            return _normalize_extraction(parsed, document_type=document_type)
+            return _normalize_structured(parsed, doc_type, document_type)
         return empty
     except Exception as e:
         logger.exception("extract_document_structured failed: %s", e)
-        if doc_type in LEGAL_DOC_TYPES:
-            out = _empty_legal_extraction()
-        elif doc_type == "investment_memo":
-            out = _empty_memo_extraction()
-        else:
-            out = _empty_signal_extraction()
+        out = _empty_for(doc_type)
+        out["_extraction_error"] = str(e)
+        return out
+
+
+def _empty_for(doc_type: str) -> Dict[str, Any]:
+    if doc_type in LEGAL_DOC_TYPES:
+        return _empty_legal_extraction()
+    if doc_type == "investment_memo":
+        return _empty_memo_extraction()
+    return _empty_signal_extraction()
+
+
+def _normalize_structured(parsed: Dict[str, Any], doc_type: str, document_type: str) -> Dict[str, Any]:
+    # Legal docs return their own shape — skip financial normalization
+    if doc_type in LEGAL_DOC_TYPES:
+        return _normalize_legal_extraction(parsed)
+    return _normalize_extraction(parsed, document_type=document_type)
+
+
+async def _extract_chunked_async(
+    router: Any,
+    text: str,
+    prompt_args: tuple,
+    max_tok: int,
+    preferred_models: Optional[List[str]],
+) -> Dict[str, Any]:
+    """Map-reduce extraction for documents longer than _MAX_PROMPT_CHARS.
+
+    Section/page-aligned chunks are extracted concurrently through
+    ParallelDocProcessor; chunks whose exact prompt was extracted before are
+    served from the chunk cache. Raw partials are merged in chunk order and
+    normalized once, so nothing past the first 120k characters is dropped.
+    """
+    from app.services.chunked_extraction import (
+        CHUNK_CHARS,
+        CHUNK_CONCURRENCY,
+        CHUNK_PREAMBLE,
+        cached_partials,
+        chunk_cache_key,
+        merge_partials,
+        split_for_extraction,
+        store_partials,
+    )
+    from app.services.parallel_doc_processor import ParallelDocProcessor
+
+    doc_type, document_type = prompt_args[0], prompt_args[1]
+    chunks = split_for_extraction(text, CHUNK_CHARS)
+    prompts = []
+    empty, kind = _empty_for(doc_type), "signal"
+    for chunk in chunks:
+        system_prompt, user_prompt, empty, kind = _build_extraction_prompt(CHUNK_PREAMBLE + chunk, *prompt_args)
+        prompts.append((system_prompt, user_prompt))
+    keys = [chunk_cache_key(sp, up) for sp, up in prompts]
+
+    try:
+        partials: Dict[int, Dict[str, Any]] = await asyncio.to_thread(cached_partials, keys)
+        misses = [i for i in range(len(chunks)) if i not in partials]
+        logger.info(
+            "[DOC_EXTRACT] Chunked extraction: %d chars → %d chunks (%d cached)",
+            len(text), len(chunks), len(partials),
+        )
+        if misses:
+            processor = ParallelDocProcessor(router, max_concurrent=CHUNK_CONCURRENCY)
+            fresh = await processor.extract_chunks(
+                [prompts[i] for i in misses],
+                max_tokens=max_tok,
+                preferred_models=preferred_models,
+                caller_context="document_process_service.extract_structured",
+            )
+            stored = []
+            for i, partial in zip(misses, fresh):
+                if partial is not None:
+                    partials[i] = partial
+                    stored.append((keys[i], partial))
+            if stored:
+                await asyncio.to_thread(store_partials, stored)
+
+        if not partials:
+            empty["_extraction_error"] = f"All {len(chunks)} chunks failed to extract"
+            return empty
+        merged = merge_partials([partials[i] for i in sorted(partials)], kind)
+        out = _normalize_structured(merged, doc_type, document_type)
+        out["_chunks"] = {
+            "total": len(chunks),
+            "cached": len(chunks) - len(misses),
+            "failed": len(chunks) - len(partials),
+        }
+        return out
+    except Exception as e:
+        logger.exception("extract_document_structured (chunked) failed: %s", e)
+        out = _empty_for(doc_type)
         out["_extraction_error"] = str(e)
         return out
 
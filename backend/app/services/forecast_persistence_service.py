@@ -343,6 +343,8 @@ class ForecastPersistenceService:
                 on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
             ).execute()
 
+        from app.services.company_data_pull import invalidate_company_cache
+        invalidate_company_cache(company_id)
         self._log_audit(company_id, forecast_id, "applied_to_grid", {"rows": len(rows)})
         return len(rows)
 
@@ -1,11 +1,44 @@
 """
 Formula evaluator for spreadsheet-style formulas.
 Provides cell/named-range context and evaluation used by financial_tools and financial_api.
+
+Formulas are parsed once into closures (cached per formula text) and every
+formula cell is a node in a dependency graph. Changing a cell only marks its
+downstream cells dirty; the next read recomputes just those, in topological
+order:
+
+    ev = FormulaEvaluator()
+    ev.set_cell_value("A1", 0.05)                  # driver
+    ev.set_cell_value("B2", 100)
+    ev.set_cell_value("C2", "=B2*(1+$A$1)")
+    ev.set_cell_value("D2", "=SUM(B2:C2)")
+    ev.get_value("D2")                              # 205.0
+    ev.set_cell_value("A1", 0.10)                   # dirties C2, D2 only
+    ev.get_value("D2")                              # 210.0
+
+Ranges (A1:C3) and named ranges evaluate to NumPy arrays, so range
+functions (SUM, NPV, IRR, VLOOKUP/INDEX/MATCH...) and array arithmetic such
+as SUM(B2:B13*C2:C13) run vectorized. Errors surface as spreadsheet error
+codes (#DIV/0!, #VALUE!, #REF!, #NAME?, #N/A, #NUM!, #CIRC!) and propagate
+through dependents like they do in Excel.
 """
 
-import re
+import functools
+import logging
 import math
-from typing import Any, Dict, List
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 # Built-in function names exposed for /functions API (financial_tools uses NPV, IRR, etc. via financial_calc)
 FUNCTION_NAMES = [
@@ -20,44 +53,1428 @@ FUNCTION_NAMES = [
     "PI", "E", "RAND", "RANDBETWEEN", "SIGN", "MOD", "FACT", "GCD", "LCM",
 ]
 
+# Recomputed on every recalculation, like Excel's volatile functions
+VOLATILE_FUNCTIONS = frozenset({"TODAY", "NOW", "RAND", "RANDBETWEEN"})
+
+# Ranges up to this many cells get one graph edge per cell; larger ones are
+# kept as bounds and matched against changed cells on recalculation.
+_RANGE_EXPAND_LIMIT = 10_000
+
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+Key = Union[Tuple[int, int], str]  # (col, row) for cells, upper-case str for names
+
+
+class FormulaError(Exception):
+    """A spreadsheet error value (#DIV/0!, #VALUE!, ...)."""
+
+    def __init__(self, code: str, message: str = ""):
+        super().__init__(message or code)
+        self.code = code
+
+    def __repr__(self) -> str:
+        return f"FormulaError({self.code!r})"
+
+
+class _Bounds(NamedTuple):
+    c0: int
+    r0: int
+    c1: int
+    r1: int
+
+    @property
+    def area(self) -> int:
+        return (self.c1 - self.c0 + 1) * (self.r1 - self.r0 + 1)
+
+    def contains(self, key: Tuple[int, int]) -> bool:
+        return self.c0 <= key[0] <= self.c1 and self.r0 <= key[1] <= self.r1
+
+    def keys(self) -> Iterable[Tuple[int, int]]:
+        for r in range(self.r0, self.r1 + 1):
+            for c in range(self.c0, self.c1 + 1):
+                yield (c, r)
+
+
+# ---------------------------------------------------------------------------
+# References
+# ---------------------------------------------------------------------------
+
+_CELL_RE = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+
+def _col_number(letters: str) -> int:
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def _col_letters(n: int) -> str:
+    out = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        out = chr(65 + rem) + out
+    return out
+
+
+@functools.lru_cache(maxsize=65536)
+def _cell_key(ref: str) -> Optional[Tuple[int, int]]:
+    """'B12' / '$B$12' → (2, 12); None if ``ref`` is not an A1 reference."""
+    m = _CELL_RE.match(ref.strip())
+    if not m or int(m.group(2)) == 0:
+        return None
+    return (_col_number(m.group(1)), int(m.group(2)))
+
+
+def _cell_ref(key: Tuple[int, int]) -> str:
+    return f"{_col_letters(key[0])}{key[1]}"
+
+
+def _bounds(a: str, b: str) -> _Bounds:
+    ka, kb = _cell_key(a), _cell_key(b)
+    if ka is None or kb is None:
+        raise FormulaError("#REF!", f"Bad range {a}:{b}")
+    return _Bounds(min(ka[0], kb[0]), min(ka[1], kb[1]), max(ka[0], kb[0]), max(ka[1], kb[1]))
+
+
+def _parse_range(ref: str) -> Optional[_Bounds]:
+    if not isinstance(ref, str) or ref.count(":") != 1:
+        return None
+    a, b = ref.split(":")
+    if _cell_key(a) is None or _cell_key(b) is None:
+        return None
+    return _bounds(a, b)
+
+
+# ---------------------------------------------------------------------------
+# Value coercion
+# ---------------------------------------------------------------------------
+
+_nan_reads = threading.local()
+
+
+@contextmanager
+def track_nan_reads():
+    """Collect the NaN masks of float arrays _num reads as 0 on this thread.
+
+    In a range NaN is a blank cell; callers that vectorise over values which
+    are never blank (world-model scenario columns) use the masks to find
+    slots where a mid-formula error (x/0 → NaN) was read as 0.
+    """
+    previous = getattr(_nan_reads, "masks", None)
+    _nan_reads.masks = masks = []
+    try:
+        yield masks
+    finally:
+        _nan_reads.masks = previous
+
+
+def _num(v: Any) -> Any:
+    """Coerce to a float (or float array) for arithmetic."""
+    if isinstance(v, np.ndarray):
+        if v.dtype.kind == "f":
+            masks = getattr(_nan_reads, "masks", None)
+            if masks is not None:
+                masks.append(np.isnan(v))
+            return np.nan_to_num(v, nan=0.0)
+        if v.dtype.kind in "iub":
+            return v.astype(float)
+        return np.vectorize(_num, otypes=[float])(v) if v.size else v.astype(float)
+    if v is None:
+        return 0.0
+    if isinstance(v, (bool, np.bool_)):
+        return float(v)
+    if isinstance(v, (int, float, np.number)):
+        return float(v)
+    if isinstance(v, str):
+        s = v.strip().replace(",", "")
+        if not s:
+            return 0.0
+        try:
+            return float(s[:-1]) / 100.0 if s.endswith("%") else float(s)
+        except ValueError:
+            raise FormulaError("#VALUE!", f"Expected a number, got {v!r}")
+    if isinstance(v, FormulaError):
+        raise v
+    raise FormulaError("#VALUE!", f"Expected a number, got {type(v).__name__}")
+
+
+def _scalar(v: Any) -> Any:
+    """Collapse a 1-element array to its value."""
+    if isinstance(v, np.ndarray):
+        if v.size != 1:
+            raise FormulaError("#VALUE!", "Expected a single value, got a range")
+        v = v.flat[0]
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _fnum(v: Any) -> float:
+    return float(_num(_scalar(v)))
+
+
+def _text(v: Any) -> str:
+    v = _scalar(v)
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float):
+        if math.isnan(v):
+            return ""
+        return str(int(v)) if v.is_integer() else repr(v)
+    return str(v)
+
+
+def _truthy(v: Any) -> Any:
+    if isinstance(v, np.ndarray):
+        return _num(v) != 0
+    v = _scalar(v)
+    if isinstance(v, str):
+        upper = v.strip().upper()
+        if upper in ("TRUE", "FALSE"):
+            return upper == "TRUE"
+        raise FormulaError("#VALUE!", f"Expected a logical value, got {v!r}")
+    return bool(_num(v))
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)) and not (
+        isinstance(v, (float, np.floating)) and math.isnan(v)
+    )
+
+
+def _numbers(args: Iterable[Any]) -> np.ndarray:
+    """Numeric values across scalars and ranges, skipping blanks and text in ranges."""
+    parts: List[np.ndarray] = []
+    loose: List[float] = []
+    for a in args:
+        if isinstance(a, np.ndarray):
+            if a.dtype.kind == "f":
+                flat = a.ravel()
+                parts.append(flat[~np.isnan(flat)])
+            elif a.dtype.kind in "iu":
+                parts.append(a.ravel().astype(float))
+            else:
+                parts.append(np.array([float(x) for x in a.flat if _is_number(x)], dtype=float))
+        elif isinstance(a, FormulaError):
+            raise a
+        elif a is None:
+            continue
+        else:
+            loose.append(float(_num(a)))
+    if loose:
+        parts.append(np.array(loose, dtype=float))
+    if not parts:
+        return np.empty(0)
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def _flat(args: Iterable[Any]) -> List[Any]:
+    out: List[Any] = []
+    for a in args:
+        if isinstance(a, np.ndarray):
+            out.extend(x for x in a.flat if x is not None and not (isinstance(x, float) and math.isnan(x)))
+        else:
+            out.append(a)
+    return out
+
+
+def _as_2d(v: Any) -> np.ndarray:
+    if isinstance(v, np.ndarray):
+        return v if v.ndim == 2 else v.reshape(-1, 1)
+    return np.array([[v]], dtype=object)
+
+
+def _vector(v: Any) -> np.ndarray:
+    t = _as_2d(v)
+    if t.shape[0] != 1 and t.shape[1] != 1:
+        raise FormulaError("#N/A", "Lookup range must be a single row or column")
+    return t.ravel()
+
+
+def _elementwise(fn: Callable[[Any], Any], domain: Optional[Callable[[Any], Any]] = None) -> Callable[[Any], Any]:
+    """Lift a NumPy ufunc to a spreadsheet function over scalars or ranges."""
+    def call(x: Any) -> Any:
+        x = _num(x)
+        if domain is not None and not isinstance(x, np.ndarray) and not domain(x):
+            raise FormulaError("#NUM!", f"{x} is outside the function's domain")
+        with np.errstate(all="ignore"):
+            out = fn(x)
+        return out if isinstance(out, np.ndarray) else float(out)
+    return call
+
+
+def _to_python(v: Any) -> Any:
+    """Convert an internal value to a JSON-friendly Python value."""
+    if isinstance(v, FormulaError):
+        return v.code
+    if isinstance(v, np.ndarray):
+        if v.size == 1:
+            return _to_python(v.flat[0])
+        if v.ndim == 1:
+            return [_to_python(x) for x in v]
+        if v.shape[1] == 1:
+            return [_to_python(x) for x in v[:, 0]]
+        return [[_to_python(x) for x in row] for row in v]
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and (math.isnan(v) or math.isinf(v)):
+        return None
+    return v
+
+
+# ---------------------------------------------------------------------------
+# Operators
+# ---------------------------------------------------------------------------
+
+def _div(a: Any, b: Any) -> Any:
+    a, b = _num(a), _num(b)
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(b == 0, np.nan, a / np.where(b == 0, 1.0, b))
+    if b == 0:
+        raise FormulaError("#DIV/0!", "Division by zero")
+    return a / b
+
+
+def _pow(a: Any, b: Any) -> Any:
+    a, b = _num(a), _num(b)
+    with np.errstate(all="ignore"):
+        out = np.power(a, b)
+    if not isinstance(out, np.ndarray):
+        if math.isnan(out) or math.isinf(out):
+            raise FormulaError("#NUM!", f"{a}^{b} is not a real number")
+        return float(out)
+    return out
+
+
+def _compare_key(v: Any) -> Tuple[int, Any]:
+    """Excel ordering: numbers < text < logicals; text compares case-insensitively."""
+    v = _scalar(v)
+    if v is None:
+        return (0, 0.0)
+    if isinstance(v, bool):
+        return (2, v)
+    if isinstance(v, str):
+        return (1, v.lower())
+    return (0, float(v))
+
+
+def _has_logical(v: Any) -> bool:
+    if isinstance(v, np.ndarray):
+        return v.dtype.kind == "b" or (
+            v.dtype.kind == "O" and any(isinstance(x, (bool, np.bool_)) for x in v.flat)
+        )
+    return isinstance(v, (bool, np.bool_))
+
+
+def _comparison(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], Any]:
+    def compare(a: Any, b: Any) -> Any:
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            # Logicals rank above every number, so they can't take the numeric path
+            if not (_has_logical(a) or _has_logical(b)):
+                try:
+                    return op(_num(a), _num(b))
+                except FormulaError:
+                    pass
+            fa, fb = np.broadcast_arrays(_as_2d(a), _as_2d(b))
+            return np.vectorize(lambda x, y: op(_compare_key(x), _compare_key(y)), otypes=[bool])(fa, fb)
+        return op(_compare_key(a), _compare_key(b))
+    return compare
+
+
+_BINOPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": lambda a, b: _num(a) + _num(b),
+    "-": lambda a, b: _num(a) - _num(b),
+    "*": lambda a, b: _num(a) * _num(b),
+    "/": _div,
+    "^": _pow,
+    "&": lambda a, b: _text(a) + _text(b),
+    "=": _comparison(lambda a, b: a == b),
+    "<>": _comparison(lambda a, b: a != b),
+    "<": _comparison(lambda a, b: a < b),
+    ">": _comparison(lambda a, b: a > b),
+    "<=": _comparison(lambda a, b: a <= b),
+    ">=": _comparison(lambda a, b: a >= b),
+}
+
+
+# ---------------------------------------------------------------------------
+# Functions
+# ---------------------------------------------------------------------------
+
+def _sum(*args: Any) -> float:
+    return float(_numbers(args).sum())
+
+
+def _average(*args: Any) -> float:
+    vals = _numbers(args)
+    if not vals.size:
+        raise FormulaError("#DIV/0!", "AVERAGE of no numbers")
+    return float(vals.mean())
+
+
+def _min(*args: Any) -> float:
+    vals = _numbers(args)
+    return float(vals.min()) if vals.size else 0.0
+
+
+def _max(*args: Any) -> float:
+    vals = _numbers(args)
+    return float(vals.max()) if vals.size else 0.0
+
+
+def _count(*args: Any) -> float:
+    return float(sum(
+        int(_numbers([a]).size) if isinstance(a, np.ndarray) else int(_is_number(a))
+        for a in args
+    ))
+
+
+def _dispersion(ddof: int, sqrt: bool) -> Callable[..., float]:
+    def fn(*args: Any) -> float:
+        vals = _numbers(args)
+        if vals.size <= ddof:
+            raise FormulaError("#DIV/0!", "Not enough values")
+        var = float(vals.var(ddof=ddof))
+        return math.sqrt(var) if sqrt else var
+    return fn
+
+
+def _median(*args: Any) -> float:
+    vals = _numbers(args)
+    if not vals.size:
+        raise FormulaError("#NUM!", "MEDIAN of no numbers")
+    return float(np.median(vals))
+
+
+def _mode(*args: Any) -> float:
+    vals = _numbers(args)
+    uniq, first, counts = np.unique(vals, return_index=True, return_counts=True)
+    if not counts.size or counts.max() < 2:
+        raise FormulaError("#N/A", "No repeated value")
+    best = counts == counts.max()
+    # Excel returns the repeated value that appears first
+    return float(uniq[best][np.argmin(first[best])])
+
+
+def _round(x: Any, digits: Any = 0) -> Any:
+    x, scale = _num(x), 10.0 ** int(_fnum(digits))
+    out = np.sign(x) * np.floor(np.abs(x) * scale + 0.5) / scale
+    return out if isinstance(out, np.ndarray) else float(out)
+
+
+def _log(x: Any, base: Any = 10) -> Any:
+    x, b = _num(x), _fnum(base)
+    if b <= 0 or b == 1 or (not isinstance(x, np.ndarray) and x <= 0):
+        raise FormulaError("#NUM!", "LOG of a non-positive number")
+    with np.errstate(all="ignore"):
+        out = np.log(x) / math.log(b)
+    return out if isinstance(out, np.ndarray) else float(out)
+
+
+def _mod(a: Any, b: Any) -> Any:
+    a, b = _num(a), _num(b)
+    if not isinstance(b, np.ndarray) and b == 0:
+        raise FormulaError("#DIV/0!", "MOD by zero")
+    out = np.mod(a, b)
+    return out if isinstance(out, np.ndarray) else float(out)
+
+
+def _fact(n: Any) -> float:
+    n = int(_fnum(n))
+    if n < 0:
+        raise FormulaError("#NUM!", "FACT of a negative number")
+    return float(math.factorial(n))
+
+
+def _gcd(*args: Any) -> float:
+    return float(functools.reduce(math.gcd, (int(v) for v in _numbers(args)), 0))
+
+
+def _lcm(*args: Any) -> float:
+    return float(functools.reduce(lambda a, b: a * b // math.gcd(a, b) if a and b else 0,
+                                  (int(v) for v in _numbers(args)), 1))
+
+
+def _randbetween(lo: Any, hi: Any) -> float:
+    lo_i, hi_i = math.ceil(_fnum(lo)), math.floor(_fnum(hi))
+    if lo_i > hi_i:
+        raise FormulaError("#NUM!", "RANDBETWEEN bottom > top")
+    return float(random.randint(lo_i, hi_i))
+
+
+# -- financial -----------------------------------------------------------
+
+def _npv(rate: Any, *values: Any) -> float:
+    r = _fnum(rate)
+    cf = _numbers(values)
+    if r == -1:
+        raise FormulaError("#DIV/0!", "NPV rate of -100%")
+    return float(np.sum(cf / (1.0 + r) ** np.arange(1, cf.size + 1)))
+
+
+def _irr(values: Any, guess: Any = 0.1) -> float:
+    cf = _numbers([values])
+    if cf.size < 2 or not (cf.min() < 0 < cf.max()):
+        raise FormulaError("#NUM!", "IRR needs both positive and negative cash flows")
+    t = np.arange(cf.size)
+
+    def npv(r: float) -> float:
+        return float(np.sum(cf / (1.0 + r) ** t))
+
+    r = _fnum(guess)
+    for _ in range(50):
+        if r <= -1:
+            break
+        disc = (1.0 + r) ** t
+        f = float(np.sum(cf / disc))
+        df = float(np.sum(-t * cf / (disc * (1.0 + r))))
+        if df == 0:
+            break
+        step = f / df
+        r -= step
+        if abs(step) < 1e-10:
+            return r
+    # Newton wandered off; bracket a sign change and bisect
+    grid = np.concatenate([np.linspace(-0.99, 1.0, 200), np.geomspace(1.01, 1e3, 200)])
+    vals = np.array([npv(g) for g in grid])
+    sign = np.nonzero(np.sign(vals[:-1]) * np.sign(vals[1:]) <= 0)[0]
+    if not sign.size:
+        raise FormulaError("#NUM!", "IRR did not converge")
+    lo, hi = grid[sign[0]], grid[sign[0] + 1]
+    f_lo = npv(lo)
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        f_mid = npv(mid)
+        if abs(f_mid) < 1e-10 or hi - lo < 1e-12:
+            return float(mid)
+        if np.sign(f_mid) == np.sign(f_lo):
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+    return float((lo + hi) / 2)
+
+
+def _annuity_factor(r: float, n: float, when: float) -> Tuple[float, float]:
+    """(1+r)^n and the annuity multiplier (1 + r·type)·((1+r)^n − 1)/r."""
+    growth = (1.0 + r) ** n
+    return growth, (1.0 + r * when) * (growth - 1.0) / r
+
+
+def _pv(rate: Any, nper: Any, pmt: Any, fv: Any = 0, when: Any = 0) -> float:
+    r, n, p, f, w = (_fnum(x) for x in (rate, nper, pmt, fv, when))
+    if r == 0:
+        return -(f + p * n)
+    growth, annuity = _annuity_factor(r, n, w)
+    return -(f + p * annuity) / growth
+
+
+def _fv(rate: Any, nper: Any, pmt: Any, pv: Any = 0, when: Any = 0) -> float:
+    r, n, p, v, w = (_fnum(x) for x in (rate, nper, pmt, pv, when))
+    if r == 0:
+        return -(v + p * n)
+    growth, annuity = _annuity_factor(r, n, w)
+    return -(v * growth + p * annuity)
+
+
+def _pmt(rate: Any, nper: Any, pv: Any, fv: Any = 0, when: Any = 0) -> float:
+    r, n, v, f, w = (_fnum(x) for x in (rate, nper, pv, fv, when))
+    if n == 0:
+        raise FormulaError("#NUM!", "PMT with zero periods")
+    if r == 0:
+        return -(v + f) / n
+    growth, annuity = _annuity_factor(r, n, w)
+    return -(v * growth + f) / annuity
+
+
+def _nper(rate: Any, pmt: Any, pv: Any, fv: Any = 0, when: Any = 0) -> float:
+    r, p, v, f, w = (_fnum(x) for x in (rate, pmt, pv, fv, when))
+    if r == 0:
+        if p == 0:
+            raise FormulaError("#NUM!", "NPER with zero rate and payment")
+        return -(v + f) / p
+    z = p * (1.0 + r * w) / r
+    ratio = (z - f) / (v + z) if v + z else float("nan")
+    if not ratio > 0:
+        raise FormulaError("#NUM!", "NPER has no solution")
+    return math.log(ratio) / math.log(1.0 + r)
+
+
+def _rate(nper: Any, pmt: Any, pv: Any, fv: Any = 0, when: Any = 0, guess: Any = 0.1) -> float:
+    n, p, v, f, w, r = (_fnum(x) for x in (nper, pmt, pv, fv, when, guess))
+
+    def balance(rate: float) -> float:
+        if abs(rate) < 1e-12:
+            return v + p * n + f
+        growth, annuity = _annuity_factor(rate, n, w)
+        return v * growth + p * annuity + f
+
+    for _ in range(100):
+        f0 = balance(r)
+        h = 1e-7 * max(1.0, abs(r))
+        d = (balance(r + h) - f0) / h
+        if d == 0 or not math.isfinite(d):
+            break
+        step = f0 / d
+        r -= step
+        if r <= -1:
+            break
+        if abs(step) < 1e-10:
+            return r
+    raise FormulaError("#NUM!", "RATE did not converge")
+
+
+def _sln(cost: Any, salvage: Any, life: Any) -> float:
+    life_f = _fnum(life)
+    if life_f == 0:
+        raise FormulaError("#DIV/0!", "SLN with zero life")
+    return (_fnum(cost) - _fnum(salvage)) / life_f
+
+
+def _db(cost: Any, salvage: Any, life: Any, period: Any, month: Any = 12) -> float:
+    c, s, n, per, m = _fnum(cost), _fnum(salvage), _fnum(life), int(_fnum(period)), _fnum(month)
+    if c <= 0 or n <= 0 or per < 1 or per > n + 1:
+        raise FormulaError("#NUM!", "Invalid DB arguments")
+    rate = round(1.0 - (s / c) ** (1.0 / n), 3)
+    total = 0.0
+    dep = c * rate * m / 12.0
+    for p in range(1, per + 1):
+        if p == 1:
+            dep = c * rate * m / 12.0
+        elif p == int(n) + 1:
+            dep = (c - total) * rate * (12.0 - m) / 12.0
+        else:
+            dep = (c - total) * rate
+        total += dep
+    return dep
+
+
+def _ddb(cost: Any, salvage: Any, life: Any, period: Any, factor: Any = 2) -> float:
+    c, s, n, per, fac = _fnum(cost), _fnum(salvage), _fnum(life), int(_fnum(period)), _fnum(factor)
+    if n <= 0 or per < 1 or per > n:
+        raise FormulaError("#NUM!", "Invalid DDB arguments")
+    book, dep = c, 0.0
+    for _ in range(per):
+        dep = min(book * fac / n, max(book - s, 0.0))
+        book -= dep
+    return dep
+
+
+def _effect(nominal: Any, npery: Any) -> float:
+    r, k = _fnum(nominal), int(_fnum(npery))
+    if r <= 0 or k < 1:
+        raise FormulaError("#NUM!", "Invalid EFFECT arguments")
+    return (1.0 + r / k) ** k - 1.0
+
+
+def _nominal(effect: Any, npery: Any) -> float:
+    r, k = _fnum(effect), int(_fnum(npery))
+    if r <= 0 or k < 1:
+        raise FormulaError("#NUM!", "Invalid NOMINAL arguments")
+    return k * ((1.0 + r) ** (1.0 / k) - 1.0)
+
+
+# -- text ----------------------------------------------------------------
+
+def _find(needle: Any, haystack: Any, start: Any = 1, fold: bool = False) -> float:
+    n, h = _text(needle), _text(haystack)
+    if fold:
+        n, h = n.lower(), h.lower()
+    idx = h.find(n, max(int(_fnum(start)) - 1, 0))
+    if idx < 0:
+        raise FormulaError("#VALUE!", f"{needle!r} not found")
+    return float(idx + 1)
+
+
+def _mid(text: Any, start: Any, count: Any) -> str:
+    s, i, n = _text(text), int(_fnum(start)), int(_fnum(count))
+    if i < 1 or n < 0:
+        raise FormulaError("#VALUE!", "Invalid MID arguments")
+    return s[i - 1:i - 1 + n]
+
+
+# -- dates (Excel serial numbers: days since 1899-12-30) ------------------
+
+def _to_date(v: Any) -> date:
+    v = _scalar(v)
+    if isinstance(v, str):
+        try:
+            return datetime.fromisoformat(v.strip()).date()
+        except ValueError:
+            pass
+    return _EXCEL_EPOCH + timedelta(days=int(math.floor(_fnum(v))))
+
+
+def _serial(d: date) -> float:
+    return float((d - _EXCEL_EPOCH).days)
+
+
+def _date(year: Any, month: Any, day: Any) -> float:
+    y, m, d = int(_fnum(year)), int(_fnum(month)), int(_fnum(day))
+    y += (m - 1) // 12
+    m = (m - 1) % 12 + 1
+    try:
+        return _serial(date(y, m, 1) + timedelta(days=d - 1))
+    except (ValueError, OverflowError):
+        raise FormulaError("#NUM!", "Invalid date")
+
+
+def _now() -> float:
+    now = datetime.now()
+    seconds = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+    return _serial(now.date()) + seconds / 86400.0
+
+
+def _weekday(serial: Any, kind: Any = 1) -> float:
+    wd = _to_date(serial).weekday()  # Monday = 0
+    k = int(_fnum(kind))
+    if k == 1:
+        return float((wd + 1) % 7 + 1)
+    if k == 2:
+        return float(wd + 1)
+    if k == 3:
+        return float(wd)
+    raise FormulaError("#NUM!", "WEEKDAY return type must be 1, 2 or 3")
+
+
+def _days(end: Any, start: Any) -> float:
+    return _serial(_to_date(end)) - _serial(_to_date(start))
+
+
+# -- lookup --------------------------------------------------------------
+
+def _lookup_key(v: Any) -> Any:
+    v = v.item() if isinstance(v, np.generic) else v
+    if isinstance(v, str):
+        return v.strip().lower()
+    if isinstance(v, bool):
+        return v
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return v
+
+
+def _match_positions(needles: Any, vec: np.ndarray, match_type: int) -> Any:
+    """0-based positions of ``needles`` in ``vec`` (scalar or array of needles)."""
+    is_array = isinstance(needles, np.ndarray)
+    items = list(needles.flat) if is_array else [_scalar(needles)]
+
+    if match_type == 0:
+        index: Dict[Any, int] = {}
+        for i, v in enumerate(vec):
+            index.setdefault(_lookup_key(v), i)
+        pos = [index.get(_lookup_key(x), -1) for x in items]
+    else:
+        numeric = vec.dtype.kind == "f" or all(_is_number(v) for v in vec)
+        if numeric and all(_is_number(x) for x in items):
+            keys = vec.astype(float)
+            q = np.array(items, dtype=float)
+            if match_type > 0:
+                pos = (np.searchsorted(keys, q, side="right") - 1).tolist()
+            else:
+                # Descending: smallest value >= needle
+                pos = (np.searchsorted(-keys, -q, side="right") - 1).tolist()
+        else:
+            pos = []
+            for x in items:
+                kx, best = _compare_key(x), -1
+                for i, v in enumerate(vec):
+                    kv = _compare_key(v)
+                    if (kv <= kx) if match_type > 0 else (kv >= kx):
+                        best = i
+                    else:
+                        break
+                pos.append(best)
+
+    if any(p < 0 for p in pos):
+        raise FormulaError("#N/A", "Lookup value not found")
+    return np.array(pos).reshape(needles.shape) if is_array else pos[0]
+
+
+def _match(value: Any, lookup: Any, match_type: Any = 1) -> Any:
+    pos = _match_positions(value, _vector(lookup), int(np.sign(_fnum(match_type))))
+    return pos + 1.0
+
+
+def _table_lookup(value: Any, table: Any, index: Any, approximate: Any, by_column: bool) -> Any:
+    t = _as_2d(table)
+    if not by_column:
+        t = t.T
+    i = int(_fnum(index))
+    if i < 1 or i > t.shape[1]:
+        raise FormulaError("#REF!", f"Index {i} is outside the table")
+    pos = _match_positions(value, t[:, 0], 1 if _truthy(approximate) else 0)
+    return t[pos, i - 1]
+
+
+def _vlookup(value: Any, table: Any, col: Any, approximate: Any = True) -> Any:
+    return _table_lookup(value, table, col, approximate, by_column=True)
+
+
+def _hlookup(value: Any, table: Any, row: Any, approximate: Any = True) -> Any:
+    return _table_lookup(value, table, row, approximate, by_column=False)
+
+
+def _index(array: Any, row: Any, col: Any = None) -> Any:
+    t = _as_2d(array)
+    if col is None and t.shape[0] == 1:
+        row, col = 1, row
+    rows, cols = _num(row), _num(col) if col is not None else 1.0
+    try:
+        r = slice(None) if np.all(rows == 0) else np.asarray(rows, dtype=int) - 1
+        c = slice(None) if np.all(cols == 0) else np.asarray(cols, dtype=int) - 1
+        if (isinstance(r, np.ndarray) and np.any(r < 0)) or (isinstance(c, np.ndarray) and np.any(c < 0)):
+            raise IndexError
+        return t[r, c]
+    except IndexError:
+        raise FormulaError("#REF!", "INDEX is outside the range")
+
+
+def _lookup(value: Any, lookup: Any, result: Any = None) -> Any:
+    vec = _vector(lookup)
+    out = _vector(result) if result is not None else vec
+    pos = _match_positions(value, vec, 1)
+    if np.any(np.asarray(pos) >= out.size):
+        raise FormulaError("#N/A", "Result vector is shorter than lookup vector")
+    return out[pos]
+
+
+def _choose(index: Any, *options: Any) -> Any:
+    i = int(_fnum(index))
+    if i < 1 or i > len(options):
+        raise FormulaError("#VALUE!", f"CHOOSE index {i} out of range")
+    return options[i - 1]
+
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    # Financial
+    "NPV": _npv, "IRR": _irr, "PV": _pv, "FV": _fv, "PMT": _pmt, "RATE": _rate, "NPER": _nper,
+    "SLN": _sln, "DB": _db, "DDB": _ddb, "EFFECT": _effect, "NOMINAL": _nominal,
+    # Math
+    "SUM": _sum, "AVERAGE": _average, "MIN": _min, "MAX": _max, "COUNT": _count, "ROUND": _round,
+    "SQRT": _elementwise(np.sqrt, lambda x: x >= 0), "POWER": _pow, "ABS": _elementwise(np.abs),
+    "LOG": _log, "LN": _elementwise(np.log, lambda x: x > 0), "EXP": _elementwise(np.exp),
+    # Statistical
+    "MEDIAN": _median, "MODE": _mode,
+    "STDEV": _dispersion(1, True), "STDEVP": _dispersion(0, True),
+    "VAR": _dispersion(1, False), "VARP": _dispersion(0, False),
+    # Trigonometric
+    "SIN": _elementwise(np.sin), "COS": _elementwise(np.cos), "TAN": _elementwise(np.tan),
+    "ASIN": _elementwise(np.arcsin, lambda x: -1 <= x <= 1),
+    "ACOS": _elementwise(np.arccos, lambda x: -1 <= x <= 1),
+    "ATAN": _elementwise(np.arctan),
+    "ATAN2": lambda x, y: float(np.arctan2(_fnum(y), _fnum(x))),
+    "RADIANS": _elementwise(np.radians), "DEGREES": _elementwise(np.degrees),
+    # Logical (IF / IFERROR / ISNA / ISERROR are compiled lazily)
+    "AND": lambda *args: all(bool(np.all(_truthy(a))) for a in _flat(args)),
+    "OR": lambda *args: any(bool(np.any(_truthy(a))) for a in _flat(args)),
+    "NOT": lambda x: np.logical_not(_truthy(x)) if isinstance(x, np.ndarray) else not _truthy(x),
+    "TRUE": lambda: True, "FALSE": lambda: False,
+    # Text
+    "CONCATENATE": lambda *args: "".join(_text(a) for a in _flat(args)),
+    "LEN": lambda s: float(len(_text(s))),
+    "LEFT": lambda s, n=1: _text(s)[:max(int(_fnum(n)), 0)],
+    "RIGHT": lambda s, n=1: _text(s)[-int(_fnum(n)):] if int(_fnum(n)) > 0 else "",
+    "MID": _mid,
+    "UPPER": lambda s: _text(s).upper(), "LOWER": lambda s: _text(s).lower(),
+    "TRIM": lambda s: " ".join(_text(s).split()),
+    "FIND": _find,
+    "SEARCH": lambda needle, haystack, start=1: _find(needle, haystack, start, fold=True),
+    # Date
+    "TODAY": lambda: _serial(date.today()), "NOW": _now, "DATE": _date,
+    "TIME": lambda h, m, s: ((_fnum(h) * 3600 + _fnum(m) * 60 + _fnum(s)) / 86400.0) % 1.0,
+    "YEAR": lambda d: float(_to_date(d).year), "MONTH": lambda d: float(_to_date(d).month),
+    "DAY": lambda d: float(_to_date(d).day), "WEEKDAY": _weekday, "DAYS": _days,
+    # Lookup
+    "VLOOKUP": _vlookup, "HLOOKUP": _hlookup, "INDEX": _index, "MATCH": _match,
+    "CHOOSE": _choose, "LOOKUP": _lookup,
+    # Other
+    "PI": lambda: math.pi, "E": lambda: math.e, "RAND": random.random, "RANDBETWEEN": _randbetween,
+    "SIGN": _elementwise(np.sign), "MOD": _mod, "FACT": _fact, "GCD": _gcd, "LCM": _lcm,
+}
+
+# Evaluated by the compiler so untaken branches / errors are never raised
+_LAZY_FUNCTIONS = frozenset({"IF", "IFERROR", "ISNA", "ISERROR"})
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer / parser / compiler
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<range>\$?[A-Za-z]{1,3}\$?\d+:\$?[A-Za-z]{1,3}\$?\d+)(?![\w(])
+  | (?P<cell>\$?[A-Za-z]{1,3}\$?\d+)(?![\w(])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:[^"]|"")*"|'(?:[^']|'')*')
+  | (?P<func>[A-Za-z_][\w.]*)(?=\s*\()
+  | (?P<name>[A-Za-z_][\w.]*)
+  | (?P<op><=|>=|<>|[-+*/^&%=<>])
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<comma>[,;])
+""", re.VERBOSE)
+
+_COMPARISON_OPS = ("=", "<>", "<", ">", "<=", ">=")
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise FormulaError("#ERROR!", f"Unexpected character {text[pos]!r} at position {pos}")
+        pos = m.end()
+        if m.lastgroup != "ws":
+            tokens.append((m.lastgroup, m.group(m.lastgroup)))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser with Excel operator precedence.
+
+    Produces tuple AST nodes and records every cell, range, name and function
+    it reads.
+    """
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.i = 0
+        self.cells: Set[Tuple[int, int]] = set()
+        self.ranges: Set[_Bounds] = set()
+        self.names: Set[str] = set()
+        self.functions: Set[str] = set()
+        self.volatile = False
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None)
+
+    def take(self) -> Tuple[str, str]:
+        tok = self.peek()
+        if tok[0] is None:
+            raise FormulaError("#ERROR!", "Unexpected end of formula")
+        self.i += 1
+        return tok  # type: ignore[return-value]
+
+    def expect(self, kind: str) -> None:
+        if self.take()[0] != kind:
+            raise FormulaError("#ERROR!", f"Expected {kind}")
+
+    def parse(self) -> tuple:
+        node = self.comparison()
+        if self.i != len(self.tokens):
+            raise FormulaError("#ERROR!", f"Unexpected token {self.tokens[self.i][1]!r}")
+        return node
+
+    def _binary(self, ops: Tuple[str, ...], operand: Callable[[], tuple]) -> tuple:
+        node = operand()
+        while self.peek()[0] == "op" and self.peek()[1] in ops:
+            op = self.take()[1]
+            node = ("bin", op, node, operand())
+        return node
+
+    def comparison(self) -> tuple:
+        return self._binary(_COMPARISON_OPS, self.concat)
+
+    def concat(self) -> tuple:
+        return self._binary(("&",), self.additive)
+
+    def additive(self) -> tuple:
+        return self._binary(("+", "-"), self.multiplicative)
+
+    def multiplicative(self) -> tuple:
+        return self._binary(("*", "/"), self.power)
+
+    def power(self) -> tuple:
+        return self._binary(("^",), self.unary)
+
+    def unary(self) -> tuple:
+        kind, value = self.peek()
+        if kind == "op" and value in ("-", "+"):
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if value == "-" else ("pos", operand)
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("pct", node)
+        return node
+
+    def primary(self) -> tuple:
+        kind, value = self.take()
+        if kind == "number":
+            return ("lit", float(value))
+        if kind == "string":
+            quote = value[0]
+            return ("lit", value[1:-1].replace(quote * 2, quote))
+        if kind == "cell":
+            key = _cell_key(value)
+            if key is None:
+                raise FormulaError("#REF!", f"Bad reference {value}")
+            self.cells.add(key)
+            return ("cell", key)
+        if kind == "range":
+            bounds = _bounds(*value.split(":"))
+            self.ranges.add(bounds)
+            return ("range", bounds)
+        if kind == "name":
+            upper = value.upper()
+            if upper in ("TRUE", "FALSE"):
+                return ("lit", upper == "TRUE")
+            self.names.add(upper)
+            return ("name", upper)
+        if kind == "func":
+            return self.call(value.upper())
+        if kind == "lparen":
+            node = self.comparison()
+            self.expect("rparen")
+            return node
+        raise FormulaError("#ERROR!", f"Unexpected token {value!r}")
+
+    def call(self, name: str) -> tuple:
+        if name in VOLATILE_FUNCTIONS:
+            self.volatile = True
+        self.functions.add(name)
+        self.expect("lparen")
+        args: List[tuple] = []
+        if self.peek()[0] == "rparen":
+            self.take()
+            return ("call", name, tuple(args))
+        while True:
+            # Empty argument, e.g. VLOOKUP(x, t, 2, )
+            if self.peek()[0] in ("comma", "rparen"):
+                args.append(("lit", None))
+            else:
+                args.append(self.comparison())
+            kind, _ = self.take()
+            if kind == "rparen":
+                return ("call", name, tuple(args))
+            if kind != "comma":
+                raise FormulaError("#ERROR!", f"Expected ',' or ')' in {name}()")
+
+
+Compiled = Callable[["FormulaEvaluator"], Any]
+
+
+def _lazy_call(name: str, args: List[Compiled]) -> Compiled:
+    if name == "IF":
+        if not 1 <= len(args) <= 3:
+            raise FormulaError("#ERROR!", "IF takes 1 to 3 arguments")
+        cond = args[0]
+        then = args[1] if len(args) > 1 else (lambda ctx: True)
+        other = args[2] if len(args) > 2 else (lambda ctx: False)
+
+        def if_(ctx: "FormulaEvaluator") -> Any:
+            test = _truthy(cond(ctx))
+            if isinstance(test, np.ndarray):
+                return np.where(test, then(ctx), other(ctx))
+            return then(ctx) if test else other(ctx)
+        return if_
+
+    if len(args) < 1:
+        raise FormulaError("#ERROR!", f"{name} needs an argument")
+    value = args[0]
+    fallback = args[1] if len(args) > 1 else (lambda ctx: 0.0)
+
+    def probe(ctx: "FormulaEvaluator") -> Tuple[Any, Optional[FormulaError]]:
+        try:
+            return value(ctx), None
+        except FormulaError as e:
+            return None, e
+        except (ZeroDivisionError, ValueError, TypeError, OverflowError, IndexError) as e:
+            return None, FormulaError("#VALUE!", str(e))
+
+    if name == "IFERROR":
+        def iferror(ctx: "FormulaEvaluator") -> Any:
+            result, err = probe(ctx)
+            return fallback(ctx) if err is not None else result
+        return iferror
+    if name == "ISNA":
+        return lambda ctx: (lambda err: err is not None and err.code == "#N/A")(probe(ctx)[1])
+    return lambda ctx: probe(ctx)[1] is not None  # ISERROR
+
+
+def _compile_node(node: tuple) -> Compiled:
+    kind = node[0]
+    if kind == "lit":
+        value = node[1]
+        return lambda ctx: value
+    if kind == "cell":
+        key = node[1]
+        return lambda ctx: ctx._cell(key)
+    if kind == "range":
+        bounds = node[1]
+        return lambda ctx: ctx._range(bounds)
+    if kind == "name":
+        name = node[1]
+        return lambda ctx: ctx._name(name)
+    if kind == "neg":
+        inner = _compile_node(node[1])
+        return lambda ctx: -_num(inner(ctx))
+    if kind == "pos":
+        return _compile_node(node[1])
+    if kind == "pct":
+        inner = _compile_node(node[1])
+        return lambda ctx: _num(inner(ctx)) / 100.0
+    if kind == "bin":
+        op = _BINOPS[node[1]]
+        left, right = _compile_node(node[2]), _compile_node(node[3])
+        return lambda ctx: op(left(ctx), right(ctx))
+    if kind == "call":
+        name = node[1]
+        args = [_compile_node(a) for a in node[2]]
+        if name in _LAZY_FUNCTIONS:
+            return _lazy_call(name, args)
+        return lambda ctx: ctx._call(name, [a(ctx) for a in args])
+    raise FormulaError("#ERROR!", f"Unknown node {kind}")
+
+
+@dataclass(frozen=True)
+class CompiledFormula:
+    """A parsed formula: an evaluation closure plus everything it reads."""
+    source: str
+    fn: Compiled
+    cells: FrozenSet[Tuple[int, int]]
+    ranges: Tuple[_Bounds, ...]
+    names: FrozenSet[str]
+    functions: FrozenSet[str]
+    volatile: bool
+
+
+def _strip_formula(formula: str) -> str:
+    s = formula.strip()
+    return s[1:].strip() if s.startswith("=") else s
+
+
+@functools.lru_cache(maxsize=8192)
+def _compile_text(text: str) -> CompiledFormula:
+    parser = _Parser(text)
+    fn = _compile_node(parser.parse())
+    return CompiledFormula(
+        source=text,
+        fn=fn,
+        cells=frozenset(parser.cells),
+        ranges=tuple(sorted(parser.ranges)),
+        names=frozenset(parser.names),
+        functions=frozenset(parser.functions),
+        volatile=parser.volatile,
+    )
+
+
+def compile_formula(formula: str) -> CompiledFormula:
+    """Parse and compile a formula (cached per formula text). Raises FormulaError."""
+    text = _strip_formula(formula)
+    if not text:
+        raise FormulaError("#ERROR!", "Empty formula")
+    return _compile_text(text)
+
+
+# ---------------------------------------------------------------------------
+# Evaluator / dependency graph
+# ---------------------------------------------------------------------------
 
 class FormulaEvaluator:
-    """Minimal evaluator: stores cell/range context and evaluates simple expressions."""
+    """Spreadsheet of constant and formula cells with incremental recalculation.
+
+    Cells are A1 references; any other key passed to set_cell_value is stored
+    as a name (scalar), and set_named_range accepts a list of values or an A1
+    range such as "B2:Y2". Formula cells are recomputed lazily: changes mark
+    their downstream cells dirty and the next read (or recalculate()) runs
+    only those, precedents first.
+    """
 
     def __init__(self):
-        self._cell_values: Dict[str, Any] = {}
-        self._named_ranges: Dict[str, List[Any]] = {}
-        self.functions = {name: None for name in FUNCTION_NAMES}
+        self._values: Dict[Tuple[int, int], Any] = {}
+        self._formulas: Dict[Tuple[int, int], CompiledFormula] = {}
+        self._names: Dict[str, Any] = {}
+        self._dependents: Dict[Key, Set[Key]] = {}
+        self._precedents: Dict[Key, Set[Key]] = {}
+        self._range_deps: Dict[Key, Tuple[_Bounds, ...]] = {}
+        self._volatile: Set[Tuple[int, int]] = set()
+        self._dirty: Set[Key] = set()
+        self.functions: Dict[str, Callable[..., Any]] = dict(FUNCTIONS)
+        self.last_recalc: Dict[str, Any] = {}
+
+    # -- inputs --------------------------------------------------------------
 
     def set_cell_value(self, cell_ref: str, value: Any) -> None:
-        self._cell_values[cell_ref.upper()] = value
+        """Set a constant, or a formula if ``value`` is a string starting with '='."""
+        key = _cell_key(cell_ref)
+        if key is None:
+            self._set_name(cell_ref, value)
+            return
 
-    def set_named_range(self, name: str, values: List[Any]) -> None:
-        self._named_ranges[name] = values
+        self._unlink(key)
+        self._formulas.pop(key, None)
+        self._volatile.discard(key)
+        self._values.pop(key, None)
 
-    def evaluate(self, formula: str) -> Any:
-        """Evaluate formula string. Supports cell refs, named ranges, and simple math."""
-        if not formula or not isinstance(formula, str):
-            return 0
-        s = formula.strip()
-        if s.startswith("="):
-            s = s[1:].strip()
-        if not s:
-            return 0
-        # Resolve cell refs (e.g. A1, B2)
-        for ref, val in self._cell_values.items():
-            s = re.sub(rf"\b{re.escape(ref)}\b", str(val), s, flags=re.IGNORECASE)
-        # Resolve named ranges as first element or sum (simplified)
-        for name, values in self._named_ranges.items():
-            repl = str(values[0]) if values else "0"
-            s = re.sub(rf"\b{re.escape(name)}\b", repl, s, flags=re.IGNORECASE)
-        # Safe eval: numbers and basic math only
+        if isinstance(value, str) and value.strip().startswith("=") and len(value.strip()) > 1:
+            try:
+                compiled = compile_formula(value)
+            except FormulaError as e:
+                self._values[key] = e
+            else:
+                self._formulas[key] = compiled
+                self._link(key, compiled.cells, compiled.ranges, compiled.names)
+                if compiled.volatile:
+                    self._volatile.add(key)
+        elif value is not None:
+            self._values[key] = self._constant(value)
+        self._mark_dirty(key)
+
+    def set_formula(self, cell_ref: str, formula: str) -> None:
+        self.set_cell_value(cell_ref, formula if formula.strip().startswith("=") else f"={formula}")
+
+    def set_cells(self, cells: Dict[str, Any]) -> None:
+        """Set many cells; dependents are recomputed once on the next read."""
+        for ref, value in cells.items():
+            self.set_cell_value(ref, value)
+
+    def set_named_range(self, name: str, values: Any) -> None:
+        self._set_name(name, values)
+
+    def register_function(self, name: str, fn: Callable[..., Any]) -> None:
+        self.functions[name.upper()] = fn
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _set_name(self, name: str, value: Any) -> None:
+        key = name.strip().upper()
+        self._unlink(key)
+        bounds = _parse_range(value) if isinstance(value, str) else None
+        if bounds is not None:
+            self._names[key] = bounds
+            self._link(key, (), (bounds,), ())
+        elif isinstance(value, (list, tuple, np.ndarray)):
+            arr = np.asarray(value)
+            if arr.dtype.kind not in "fiub":
+                arr = arr.astype(object)
+            self._names[key] = arr.reshape(-1, 1) if arr.ndim == 1 else arr
+        else:
+            self._names[key] = self._constant(value)
+        self._mark_dirty(key)
+
+    @staticmethod
+    def _constant(value: Any) -> Any:
+        if isinstance(value, str):
+            s = value.strip()
+            if s.upper() in ("TRUE", "FALSE"):
+                return s.upper() == "TRUE"
+            try:
+                return float(s.replace(",", ""))
+            except ValueError:
+                return value
+        if isinstance(value, (list, tuple)):
+            arr = np.asarray(value)
+            return arr if arr.dtype.kind in "fiub" else arr.astype(object)
+        if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+            return float(value)
+        return value
+
+    # -- graph ---------------------------------------------------------------
+
+    def _link(self, node: Key, cells: Iterable[Tuple[int, int]], ranges: Iterable[_Bounds], names: Iterable[str]) -> None:
+        direct: Set[Key] = set(cells) | set(names)
+        large: List[_Bounds] = []
+        for b in ranges:
+            if b.area <= _RANGE_EXPAND_LIMIT:
+                direct.update(b.keys())
+            else:
+                large.append(b)
+        for p in direct:
+            self._dependents.setdefault(p, set()).add(node)
+        self._precedents[node] = direct
+        if large:
+            self._range_deps[node] = tuple(large)
+
+    def _unlink(self, node: Key) -> None:
+        for p in self._precedents.pop(node, ()):
+            deps = self._dependents.get(p)
+            if deps is not None:
+                deps.discard(node)
+                if not deps:
+                    del self._dependents[p]
+        self._range_deps.pop(node, None)
+
+    def _dependents_of(self, node: Key) -> Iterable[Key]:
+        deps = self._dependents.get(node, ())
+        if not self._range_deps or not isinstance(node, tuple):
+            return deps
+        extra = [n for n, bounds in self._range_deps.items() if any(b.contains(node) for b in bounds)]
+        return list(deps) + extra if extra else deps
+
+    def _mark_dirty(self, *roots: Key) -> None:
+        stack = [r for r in roots if r not in self._dirty]
+        self._dirty.update(stack)
+        while stack:
+            for dep in self._dependents_of(stack.pop()):
+                if dep not in self._dirty:
+                    self._dirty.add(dep)
+                    stack.append(dep)
+
+    def dependents(self, cell_ref: str) -> List[str]:
+        """Every cell that (transitively) reads ``cell_ref``."""
+        start: Key = _cell_key(cell_ref) or cell_ref.strip().upper()
+        seen: Set[Key] = set()
+        stack = [start]
+        while stack:
+            for dep in self._dependents_of(stack.pop()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return sorted(_cell_ref(k) for k in seen if isinstance(k, tuple))
+
+    # -- recalculation -------------------------------------------------------
+
+    def recalculate(self) -> Dict[str, Any]:
+        """Recompute dirty formula cells in topological order.
+
+        Returns {cell_ref: value} for every formula cell that was recomputed.
+        Cells on a reference cycle evaluate to #CIRC!.
+        """
+        if not self._dirty:
+            return {}
+        started = time.perf_counter()
+        if self._volatile:
+            self._mark_dirty(*self._volatile)
+        dirty, self._dirty = self._dirty, set()
+
+        indegree = dict.fromkeys(dirty, 0)
+        edges: Dict[Key, List[Key]] = {}
+        for node in dirty:
+            out = [d for d in self._dependents_of(node) if d in indegree]
+            if out:
+                edges[node] = out
+                for d in out:
+                    indegree[d] += 1
+
+        ready = deque(n for n, deg in indegree.items() if deg == 0)
+        recomputed: Dict[Tuple[int, int], Any] = {}
+        while ready:
+            node = ready.popleft()
+            compiled = self._formulas.get(node) if isinstance(node, tuple) else None
+            if compiled is not None:
+                recomputed[node] = self._values[node] = self._run(compiled)
+            for d in edges.get(node, ()):
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    ready.append(d)
+
+        cyclic = [n for n, deg in indegree.items() if deg > 0 and n in self._formulas]
+        for node in cyclic:
+            recomputed[node] = self._values[node] = FormulaError("#CIRC!", "Circular reference")
+        if cyclic:
+            logger.debug("[FORMULA] circular references: %s", [_cell_ref(n) for n in cyclic[:10]])
+
+        self.last_recalc = {
+            "dirty": len(dirty),
+            "evaluated": len(recomputed),
+            "circular": len(cyclic),
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        return {_cell_ref(k): _to_python(v) for k, v in recomputed.items()}
+
+    def _run(self, compiled: CompiledFormula) -> Any:
+        try:
+            value = compiled.fn(self)
+        except FormulaError as e:
+            return e
+        except ZeroDivisionError as e:
+            return FormulaError("#DIV/0!", str(e))
+        except (ValueError, TypeError, OverflowError, IndexError, KeyError) as e:
+            return FormulaError("#VALUE!", str(e))
+        if isinstance(value, np.ndarray) and value.size == 1:
+            value = value.flat[0]
+        return value.item() if isinstance(value, np.generic) else value
+
+    # -- reads (called from compiled formulas) -------------------------------
+
+    def _cell(self, key: Tuple[int, int]) -> Any:
+        value = self._values.get(key)
+        if value is None:
+            return 0.0
+        if isinstance(value, FormulaError):
+            raise value
+        return value
+
+    def _range(self, b: _Bounds) -> np.ndarray:
+        values = self._values
+        rows = [[values.get((c, r)) for c in range(b.c0, b.c1 + 1)] for r in range(b.r0, b.r1 + 1)]
+        try:
+            return np.array(rows, dtype=float)  # None → nan (blank)
+        except (TypeError, ValueError):
+            pass
+        arr = np.empty((len(rows), len(rows[0])), dtype=object)
+        for i, row in enumerate(rows):
+            for j, v in enumerate(row):
+                if isinstance(v, FormulaError):
+                    raise v
+                arr[i, j] = v
+        return arr
+
+    def _name(self, name: str) -> Any:
+        if name not in self._names:
+            raise FormulaError("#NAME?", f"Unknown name {name}")
+        value = self._names[name]
+        if isinstance(value, _Bounds):
+            return self._range(value)
+        if isinstance(value, FormulaError):
+            raise value
+        return value
+
+    def _call(self, name: str, args: List[Any]) -> Any:
+        fn = self.functions.get(name)
+        if fn is None:
+            raise FormulaError("#NAME?", f"Unknown function {name}")
         try:
-            allowed = {"abs": abs, "round": round, "min": min, "max": max, "sum": sum, "pow": pow}
-            allowed.update({k: getattr(math, k) for k in ["sqrt", "log", "log10", "exp", "sin", "cos", "tan"] if hasattr(math, k)})
-            return eval(s, {"__builtins__": {}}, allowed)
-        except Exception:
+            return fn(*args)
+        except TypeError as e:
+            raise FormulaError("#VALUE!", f"{name}: {e}")
+
+    # -- public reads --------------------------------------------------------
+
+    def get_value(self, cell_ref: str) -> Any:
+        if self._dirty:
+            self.recalculate()
+        key = _cell_key(cell_ref)
+        if key is None:
+            value = self._names.get(cell_ref.strip().upper())
+            return _to_python(self._range(value) if isinstance(value, _Bounds) else value)
+        return _to_python(self._values.get(key))
+
+    def get_range(self, range_ref: str) -> List[List[Any]]:
+        bounds = _parse_range(range_ref)
+        if bounds is None:
+            raise FormulaError("#REF!", f"Bad range {range_ref}")
+        if self._dirty:
+            self.recalculate()
+        return [[_to_python(self._values.get((c, r))) for c in range(bounds.c0, bounds.c1 + 1)]
+                for r in range(bounds.r0, bounds.r1 + 1)]
+
+    def evaluate(self, formula: str, strict: bool = False) -> Any:
+        """Evaluate formula string against the current cells and names.
+
+        Errors come back as spreadsheet error codes ("#DIV/0!", ...) unless
+        ``strict`` is set, in which case FormulaError is raised.
+        """
+        if not formula or not isinstance(formula, str) or not _strip_formula(formula):
             return 0
+        if self._dirty:
+            self.recalculate()
+        try:
+            value = self._run(compile_formula(formula))
+        except FormulaError as e:
+            value = e
+        if isinstance(value, FormulaError):
+            if strict:
+                raise value
+            logger.debug("[FORMULA] %s → %s (%s)", formula, value.code, value)
+        return _to_python(value)
 
 
 formula_evaluator = FormulaEvaluator()
@@ -295,6 +295,8 @@ class FPAExecutor:
                 row["fork_period"] = fork_period
             result = sb.table("scenario_branches").insert(row).execute()
             if result.data:
+                from app.services.scenario_branch_service import invalidate_branch_cache
+                invalidate_branch_cache(company_id)
                 return result.data[0].get("id")
         except Exception as e:
             logger.warning("Failed to persist scenario branch: %s", e)
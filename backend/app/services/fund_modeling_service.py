@@ -23,6 +23,15 @@ from app.services.company_health_scorer import (
     _solve_irr,
 )
 from app.services.data_validator import ensure_numeric
+from app.services.portfolio_monte_carlo import (
+    DEFAULT_DRAWS,
+    DEFAULT_MACRO_CORRELATION,
+    DEFAULT_SECTOR_CORRELATION,
+    CompanyPosition,
+    ProceedsCurve,
+    scenario_weights,
+    simulate_portfolio,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -741,23 +750,9 @@ class FundModelingService:
     # ------------------------------------------------------------------
     # Phase 3: Fund Return Scenario Engine
     # ------------------------------------------------------------------
-    async def model_fund_scenarios(
-        self,
-        fund_id: str,
-        company_scenarios: Optional[Dict[str, str]] = None,
-    ) -> Dict[str, Any]:
-        """Model fund-level returns under different per-company outcome combinations.
-
-        Args:
-            fund_id: Fund ID
-            company_scenarios: Optional map of company_id → scenario name
-                (e.g. {"abc": "base", "def": "bridge"}).
-                If None, generates standard portfolio scenarios automatically.
-
-        Returns:
-            Multiple portfolio-level scenario results with fund MOIC/IRR/DPI,
-            return attribution, and marginal impact per company.
-        """
+    def _load_scenario_inputs(self, fund_id: str) -> Optional[Dict[str, Any]]:
+        """Companies, fund size, health analytics and per-company scenario cap
+        tables (generate_scenario_cap_tables) for a fund; None if no companies."""
         from app.services.valuation_engine_service import valuation_engine_service
 
         # Fetch all companies in one query
@@ -771,7 +766,7 @@ class FundModelingService:
         fund_size = ensure_numeric(fund.get("fund_size_usd"), 0)
 
         if not companies:
-            return {"error": "No companies in portfolio", "scenarios": []}
+            return None
 
         # Run health scorer on all companies
         portfolio_analysis = self.health_scorer.analyze_portfolio(
@@ -822,6 +817,43 @@ class FundModelingService:
             except Exception as e:
                 logger.warning(f"Scenario gen failed for {c.get('name')}: {e}")
 
+        return {
+            "companies": companies,
+            "fund_size": fund_size,
+            "analytics": analytics_map,
+            "returns": returns_map,
+            "scenario_data": company_scenario_data,
+        }
+
+    async def model_fund_scenarios(
+        self,
+        fund_id: str,
+        company_scenarios: Optional[Dict[str, str]] = None,
+        simulation_draws: int = 0,
+    ) -> Dict[str, Any]:
+        """Model fund-level returns under different per-company outcome combinations.
+
+        Args:
+            fund_id: Fund ID
+            company_scenarios: Optional map of company_id → scenario name
+                (e.g. {"abc": "base", "def": "bridge"}).
+                If None, generates standard portfolio scenarios automatically.
+            simulation_draws: If > 0, also attach the correlated Monte Carlo
+                return distribution ("simulation", see simulate_fund_returns).
+
+        Returns:
+            Multiple portfolio-level scenario results with fund MOIC/IRR/DPI,
+            return attribution, and marginal impact per company.
+        """
+        inputs = self._load_scenario_inputs(fund_id)
+        if inputs is None:
+            return {"error": "No companies in portfolio", "scenarios": []}
+        companies = inputs["companies"]
+        fund_size = inputs["fund_size"]
+        analytics_map = inputs["analytics"]
+        returns_map = inputs["returns"]
+        company_scenario_data = inputs["scenario_data"]
+
         # --- Build portfolio scenario combinations ---
         def _pick_scenario(cid: str, scenario_name: str) -> Dict[str, Any]:
             """Pick a specific scenario for a company, or fall back to base."""
@@ -1024,10 +1056,15 @@ class FundModelingService:
                 **result_custom,
             })
 
+        simulation = None
+        if simulation_draws > 0:
+            simulation = await self._simulate_returns(inputs, draws=simulation_draws)
+
         return {
             "fund_id": fund_id,
             "fund_size": fund_size,
             "portfolio_scenarios": portfolio_scenarios,
+            "simulation": simulation,
             "company_scenario_data": {
                 cid: {
                     "company_name": sd.get("company_name"),
@@ -1047,6 +1084,95 @@ class FundModelingService:
             },
         }
 
+    async def simulate_fund_returns(
+        self,
+        fund_id: str,
+        draws: int = DEFAULT_DRAWS,
+        seed: Optional[int] = None,
+        macro_correlation: float = DEFAULT_MACRO_CORRELATION,
+        sector_correlation: float = DEFAULT_SECTOR_CORRELATION,
+    ) -> Dict[str, Any]:
+        """Fund MOIC / IRR / DPI distribution from correlated portfolio draws.
+
+        Each company's outcome is sampled over its generate_scenario_cap_tables
+        scenarios and mapped through that scenario's waterfall; returns
+        percentiles, probability of returning the fund and per-company
+        marginal contribution (see portfolio_monte_carlo).
+        """
+        inputs = self._load_scenario_inputs(fund_id)
+        if inputs is None:
+            return {"error": "No companies in portfolio", "fund_id": fund_id}
+        result = await self._simulate_returns(
+            inputs, draws=draws, seed=seed,
+            macro_correlation=macro_correlation, sector_correlation=sector_correlation,
+        )
+        return {"fund_id": fund_id, **result}
+
+    async def _simulate_returns(
+        self,
+        inputs: Dict[str, Any],
+        draws: int = DEFAULT_DRAWS,
+        seed: Optional[int] = None,
+        macro_correlation: float = DEFAULT_MACRO_CORRELATION,
+        sector_correlation: float = DEFAULT_SECTOR_CORRELATION,
+    ) -> Dict[str, Any]:
+        from app.core.tool_executor import tool_executors
+
+        positions = self._build_positions(inputs)
+        return await tool_executors.run(
+            "cpu", simulate_portfolio, positions, inputs["fund_size"], draws, seed,
+            macro_correlation, sector_correlation,
+        )
+
+    @staticmethod
+    def _build_positions(inputs: Dict[str, Any]) -> List[CompanyPosition]:
+        """Per-company proceeds curves + scenario weights, built once per run."""
+        now = datetime.now()
+        positions: List[CompanyPosition] = []
+        for c in inputs["companies"]:
+            cid = str(c.get("id", ""))
+            invested = ensure_numeric(c.get("investment_amount"), 0)
+            scenarios = inputs["scenario_data"].get(cid, {}).get("scenarios", [])
+            if invested <= 0 or not scenarios:
+                continue
+            names, curves = [], []
+            for sc in scenarios:
+                curve = ProceedsCurve.from_scenario(sc)
+                if curve is not None:
+                    names.append(sc.get("name", "base"))
+                    curves.append(curve)
+            if not curves:
+                continue
+
+            a = inputs["analytics"].get(cid)
+            inv_date = c.get("investment_date") or c.get("created_at")
+            years_ago = 2.0
+            if isinstance(inv_date, str):
+                try:
+                    dt = datetime.fromisoformat(inv_date.replace("Z", "+00:00")).replace(tzinfo=None)
+                    years_ago = max((now - dt).days / 365.25, 0.0)
+                except (ValueError, TypeError):
+                    pass
+            valuation = ensure_numeric(c.get("valuation") or c.get("current_valuation_usd"), 0)
+            positions.append(CompanyPosition(
+                company_id=cid,
+                company_name=c.get("name", ""),
+                invested=invested,
+                # $100M reference valuation for unvalued companies, as elsewhere in this
+                # service (the scenario combos' $500M fallback exit is 5x of it)
+                valuation=valuation if valuation > 0 else 100_000_000,
+                invested_years_ago=years_ago,
+                scenario_names=names,
+                curves=curves,
+                weights=scenario_weights(
+                    names,
+                    a.valuation_direction if a else None,
+                    a.estimated_runway_months if a else None,
+                ),
+                sector=c.get("sector") or "unknown",
+            ))
+        return positions
+
     # ------------------------------------------------------------------
     # Phase 4b: Scenario Tree → Fund Impact Evaluation
     # ------------------------------------------------------------------
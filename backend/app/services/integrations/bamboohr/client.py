@@ -4,16 +4,15 @@ Async client for the BambooHR API v1.  Handles employee directory lookups,
 custom report generation, and incremental change detection.
 
 API docs: https://documentation.bamboohr.com/reference
-Rate limit: keep requests under 1/sec to avoid throttling.
+Rate limit: keep requests under 1/sec to avoid throttling — enforced per
+subdomain by the shared connector transport's "bamboohr" bucket.
 """
 
-import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from app.services.integrations.bamboohr.auth import build_auth_header, build_base_url
+from app.services.integrations.transport import connector_transport
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +35,6 @@ DEFAULT_COMP_FIELDS = [
     "payPer",
 ]
 
-# Rate-limit delay between consecutive requests (seconds)
-_RATE_LIMIT_DELAY = 1.1
-
 
 class BambooHRClient:
     """Async client for BambooHR REST API v1."""
@@ -47,7 +43,6 @@ class BambooHRClient:
         self.base_url = build_base_url(subdomain)
         self.auth_header = build_auth_header(api_key)
         self.subdomain = subdomain
-        self._last_request_at: float = 0
 
     # ── Internal helpers ──────────────────────────────────────────
 
@@ -57,31 +52,22 @@ class BambooHRClient:
             "Accept": "application/json",
         }
 
-    async def _throttle(self) -> None:
-        """Ensure at least _RATE_LIMIT_DELAY seconds between requests."""
-        now = asyncio.get_event_loop().time()
-        elapsed = now - self._last_request_at
-        if elapsed < _RATE_LIMIT_DELAY:
-            await asyncio.sleep(_RATE_LIMIT_DELAY - elapsed)
-        self._last_request_at = asyncio.get_event_loop().time()
-
     async def _get(
         self, path: str, params: Optional[Dict] = None
     ) -> Optional[Dict[str, Any]]:
         """Make a throttled GET request to the BambooHR API."""
-        await self._throttle()
         url = f"{self.base_url}/{path}"
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.get(
-                    url, headers=self._headers(), params=params
-                )
+            response = await connector_transport.request(
+                "bamboohr", "GET", url,
+                tenant=self.subdomain, headers=self._headers(), params=params,
+            )
 
             if response.status_code == 401:
                 logger.error("BambooHR API 401 — API key expired or invalid")
                 return None
             if response.status_code == 429:
-                logger.warning("BambooHR API rate limited (429)")
+                logger.warning("BambooHR API rate limited (429) after retries")
                 return None
             if response.status_code != 200:
                 logger.error(
@@ -103,22 +89,21 @@ class BambooHRClient:
         params: Optional[Dict] = None,
     ) -> Optional[Dict[str, Any]]:
         """Make a throttled POST request to the BambooHR API."""
-        await self._throttle()
         url = f"{self.base_url}/{path}"
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.post(
-                    url,
-                    headers={**self._headers(), "Content-Type": "application/json"},
-                    json=json_body,
-                    params=params,
-                )
+            response = await connector_transport.request(
+                "bamboohr", "POST", url,
+                tenant=self.subdomain,
+                headers={**self._headers(), "Content-Type": "application/json"},
+                json=json_body,
+                params=params,
+            )
 
             if response.status_code == 401:
                 logger.error("BambooHR API 401 — API key expired or invalid")
                 return None
             if response.status_code == 429:
-                logger.warning("BambooHR API rate limited (429)")
+                logger.warning("BambooHR API rate limited (429) after retries")
                 return None
             if response.status_code != 200:
                 logger.error(
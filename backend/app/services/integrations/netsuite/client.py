@@ -6,12 +6,13 @@ more flexible than the standard REST record API for reporting.
 API base: https://{account_id}.suitetalk.api.netsuite.com/services/rest
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
-
-import httpx
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.services.integrations.netsuite.auth import build_tba_authorization_header
+from app.services.integrations.transport import WINDOW_MONTHS, connector_transport, date_windows
 
 logger = logging.getLogger(__name__)
 
@@ -41,14 +42,22 @@ class NetSuiteClient:
     def _uses_tba(self) -> bool:
         return bool(self.consumer_key and self.token_key)
 
-    def _headers(self, url: str, method: str = "GET") -> Dict[str, str]:
+    def _headers(self) -> Dict[str, str]:
         headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
             "Prefer": "transient",
         }
-        if self._uses_tba:
-            headers["Authorization"] = build_tba_authorization_header(
+        if not self._uses_tba and self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        return headers
+
+    def _signer(self, url: str, method: str = "GET"):
+        """Per-attempt TBA signature — each nonce may only be used once."""
+        if not self._uses_tba:
+            return None
+        return lambda: {
+            "Authorization": build_tba_authorization_header(
                 self.account_id,
                 self.consumer_key,
                 self.consumer_secret,
@@ -56,26 +65,26 @@ class NetSuiteClient:
                 self.token_secret,
                 method,
                 url,
-            )
-        elif self.access_token:
-            headers["Authorization"] = f"Bearer {self.access_token}"
-        return headers
+            ),
+        }
 
     async def _get(self, path: str, params: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
         url = f"{self.base_url}/{path}"
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.get(
-                    url,
-                    headers=self._headers(url, "GET"),
-                    params=params,
-                )
+            response = await connector_transport.request(
+                "netsuite", "GET", url,
+                tenant=self.account_id,
+                headers=self._headers(),
+                sign=self._signer(url, "GET"),
+                params=params,
+                timeout=60,
+            )
 
             if response.status_code == 401:
                 logger.error("NetSuite API 401 — auth failed")
                 return None
             if response.status_code == 429:
-                logger.warning("NetSuite API rate limited")
+                logger.warning("NetSuite API rate limited after retries")
                 return None
             if response.status_code != 200:
                 logger.error("NetSuite API %d: %s", response.status_code, response.text[:500])
@@ -98,26 +107,40 @@ class NetSuiteClient:
 
         POST /services/rest/query/v1/suiteql
         Body: {"q": "SELECT ..."}
+
+        Pages fetched before an error are returned; callers that must not
+        use a partial result go through _suiteql and check its flag.
         """
+        items, _complete = await self._suiteql(query, limit, offset)
+        return items
+
+    async def _suiteql(
+        self,
+        query: str,
+        limit: int = 1000,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """(rows, complete) — complete is False if any page failed after retries."""
         url = f"{self.base_url}/query/v1/suiteql"
         all_items: List[Dict[str, Any]] = []
         current_offset = offset
 
         while True:
             try:
-                async with httpx.AsyncClient(timeout=120) as client:
-                    response = await client.post(
-                        url,
-                        headers={
-                            **self._headers(url, "POST"),
-                            "Prefer": f"transient, resultOffset={current_offset}, resultLimit={limit}",
-                        },
-                        json={"q": query},
-                    )
+                response = await connector_transport.request(
+                    "netsuite", "POST", url,
+                    tenant=self.account_id,
+                    headers={
+                        **self._headers(),
+                        "Prefer": f"transient, resultOffset={current_offset}, resultLimit={limit}",
+                    },
+                    sign=self._signer(url, "POST"),
+                    json={"q": query},
+                )
 
                 if response.status_code not in (200, 204):
                     logger.error("SuiteQL error %d: %s", response.status_code, response.text[:500])
-                    break
+                    return all_items, False
 
                 if response.status_code == 204:
                     break
@@ -137,9 +160,9 @@ class NetSuiteClient:
 
             except Exception as e:
                 logger.error("SuiteQL execution failed: %s", e)
-                break
+                return all_items, False
 
-        return all_items
+        return all_items, True
 
     # ── Financial Data Queries ────────────────────────────────────
 
@@ -156,9 +179,12 @@ class NetSuiteClient:
             to_date: YYYY-MM-DD
             subsidiary_id: Optional subsidiary filter (for multi-entity)
         """
-        sub_filter = f"AND tl.subsidiary = {subsidiary_id}" if subsidiary_id else ""
+        return await self.execute_suiteql(self._profit_and_loss_query(from_date, to_date, subsidiary_id))
 
-        query = f"""
+    @staticmethod
+    def _profit_and_loss_query(from_date: str, to_date: str, subsidiary_id: Optional[str]) -> str:
+        sub_filter = f"AND tl.subsidiary = {subsidiary_id}" if subsidiary_id else ""
+        return f"""
             SELECT
                 a.acctnumber AS account_code,
                 a.acctname AS account_name,
@@ -176,7 +202,30 @@ class NetSuiteClient:
             GROUP BY a.acctnumber, a.acctname, a.accttype, TO_CHAR(t.trandate, 'YYYY-MM')
             ORDER BY TO_CHAR(t.trandate, 'YYYY-MM'), a.acctnumber
         """
-        return await self.execute_suiteql(query)
+
+    async def get_profit_and_loss_windows(
+        self,
+        from_date: date,
+        to_date: date,
+        subsidiary_id: Optional[str] = None,
+        window_months: int = WINDOW_MONTHS,
+    ) -> List[Tuple[date, date, Optional[List[Dict[str, Any]]]]]:
+        """Multi-year P&L as concurrent SuiteQL windows.
+
+        Rows are grouped by month, so non-overlapping windows return exactly
+        the rows of one big query — but each window pages independently and
+        runs in parallel up to the account's concurrency limit.
+
+        Returns (window_start, window_end, rows-or-None) in date order; None
+        when any page of the window failed, so callers can report the gap
+        instead of syncing part of it.
+        """
+        windows = date_windows(from_date, to_date, window_months)
+        results = await asyncio.gather(*(
+            self._suiteql(self._profit_and_loss_query(lo.isoformat(), hi.isoformat(), subsidiary_id))
+            for lo, hi in windows
+        ))
+        return [(lo, hi, rows if complete else None) for (lo, hi), (rows, complete) in zip(windows, results)]
 
     async def get_balance_sheet(
         self,
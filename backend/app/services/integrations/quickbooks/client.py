@@ -7,10 +7,12 @@ API base: https://quickbooks.api.intuit.com/v3/company/{realmId}
 Sandbox:  https://sandbox-quickbooks.api.intuit.com/v3/company/{realmId}
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
 
-import httpx
+from app.services.integrations.transport import WINDOW_MONTHS, connector_transport, date_windows
 
 logger = logging.getLogger(__name__)
 
@@ -45,14 +47,16 @@ class QuickBooksClient:
         """Make a GET request to the QBO API."""
         url = f"{self.base_url}/{path}"
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.get(url, headers=self._headers(), params=params)
+            response = await connector_transport.request(
+                "quickbooks", "GET", url,
+                tenant=self.realm_id, headers=self._headers(), params=params,
+            )
 
             if response.status_code == 401:
                 logger.error("QBO API 401 — token expired or invalid")
                 return None
             if response.status_code == 429:
-                logger.warning("QBO API rate limited (429)")
+                logger.warning("QBO API rate limited (429) after retries")
                 return None
             if response.status_code != 200:
                 logger.error("QBO API error %d: %s", response.status_code, response.text[:500])
@@ -85,6 +89,27 @@ class QuickBooksClient:
             "minorversion": "65",
         })
 
+    async def get_profit_and_loss_windows(
+        self,
+        start_date: date,
+        end_date: date,
+        window_months: int = WINDOW_MONTHS,
+    ) -> List[Tuple[date, date, Optional[Dict[str, Any]]]]:
+        """Fetch a multi-year monthly P&L as concurrent windowed reports.
+
+        One report over several years is slow to generate and a single 429
+        or timeout loses all of it; windows are fetched in parallel (within
+        the realm's rate limit) and a failed window costs only its months.
+
+        Returns (window_start, window_end, report-or-None) in date order.
+        """
+        windows = date_windows(start_date, end_date, window_months)
+        reports = await asyncio.gather(*(
+            self.get_profit_and_loss(lo.isoformat(), hi.isoformat())
+            for lo, hi in windows
+        ))
+        return [(lo, hi, report) for (lo, hi), report in zip(windows, reports)]
+
     async def get_balance_sheet(
         self,
         as_of_date: str,
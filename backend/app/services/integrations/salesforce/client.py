@@ -12,6 +12,8 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from app.services.integrations.transport import connector_transport
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -44,14 +46,19 @@ class SalesforceClient:
         Handles 401 (token expired), 429 (rate limited), and timeouts.
         """
         try:
-            async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-                response = await client.get(url, headers=self._headers(), params=params)
+            response = await connector_transport.request(
+                "salesforce", "GET", url,
+                tenant=self.instance_url,
+                headers=self._headers(),
+                params=params,
+                timeout=REQUEST_TIMEOUT,
+            )
 
             if response.status_code == 401:
                 logger.error("Salesforce API 401 — token expired or invalid")
                 return None
             if response.status_code == 429:
-                logger.warning("Salesforce API rate limited (429)")
+                logger.warning("Salesforce API rate limited (429) after retries")
                 return None
             if response.status_code != 200:
                 logger.error(
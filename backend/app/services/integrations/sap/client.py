@@ -4,75 +4,32 @@ Two client classes:
 - SAPS4Client: OData APIs on S/4HANA Cloud (OAuth bearer token)
 - SAPB1Client: Service Layer v2 on Business One (B1SESSION cookies)
 
-Both handle OData pagination (nextLink / $skiptoken), 60-second timeouts,
-error responses, and 429 rate limiting with Retry-After backoff.
+Both handle OData pagination (nextLink / $skiptoken), 60-second timeouts and
+error responses. Pooling, rate limiting and 429 / 5xx retries with
+Retry-After backoff come from the shared connector transport.
+
+The batched sync fetches (SAPS4Client.get_trial_balances,
+SAPB1Client.get_journal_entries_windows) return None for a period/window
+that failed part-way, so a sync can report the gap instead of writing a
+partial ledger.
 """
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import httpx
+from app.services.integrations.transport import connector_transport, date_windows
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Shared pagination / retry helpers
+# Shared pagination helpers
 # ---------------------------------------------------------------------------
 
 _DEFAULT_TIMEOUT = 60  # seconds
-_MAX_RETRIES = 3
 _MAX_PAGES = 100  # safety cap on pagination loops
-
-
-async def _retry_with_backoff(
-    client: httpx.AsyncClient,
-    method: str,
-    url: str,
-    **kwargs,
-) -> httpx.Response:
-    """Execute an HTTP request with retry logic for 429 / 5xx errors."""
-    last_exc: Optional[Exception] = None
-
-    for attempt in range(_MAX_RETRIES):
-        try:
-            response = await client.request(method, url, **kwargs)
-
-            if response.status_code == 429:
-                retry_after = int(response.headers.get("Retry-After", 5))
-                logger.warning(
-                    "SAP API 429 rate limited, retrying after %ds (attempt %d/%d)",
-                    retry_after, attempt + 1, _MAX_RETRIES,
-                )
-                await asyncio.sleep(retry_after)
-                continue
-
-            if response.status_code >= 500 and attempt < _MAX_RETRIES - 1:
-                wait = 2 ** attempt
-                logger.warning(
-                    "SAP API %d server error, retrying in %ds (attempt %d/%d)",
-                    response.status_code, wait, attempt + 1, _MAX_RETRIES,
-                )
-                await asyncio.sleep(wait)
-                continue
-
-            return response
-
-        except (httpx.TimeoutException, httpx.ConnectError) as e:
-            last_exc = e
-            if attempt < _MAX_RETRIES - 1:
-                wait = 2 ** attempt
-                logger.warning(
-                    "SAP API connection error, retrying in %ds: %s", wait, e,
-                )
-                await asyncio.sleep(wait)
-                continue
-            raise
-
-    # Should not reach here, but just in case
-    if last_exc:
-        raise last_exc
-    raise RuntimeError("Exhausted retries without response")
+_B1_PAGE_SIZE = 500  # Service Layer defaults to 20 rows per page
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -106,55 +63,63 @@ class SAPS4Client:
         in the response body as ``@odata.nextLink`` (or ``d.__next`` for
         older OData v2 responses).  We do NOT use $top/$skip.
         """
+        results, _complete = await self._odata_fetch(url, params)
+        return results
+
+    async def _odata_fetch(
+        self, url: str, params: Optional[Dict] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """(records, complete) — complete is False if a page failed or the page cap hit."""
         results: List[Dict[str, Any]] = []
         page = 0
 
-        async with httpx.AsyncClient(timeout=_DEFAULT_TIMEOUT) as client:
-            next_url: Optional[str] = url
-
-            while next_url and page < _MAX_PAGES:
-                response = await _retry_with_backoff(
-                    client, "GET", next_url,
-                    headers=self._headers(),
-                    params=params if page == 0 else None,  # params only on first call
+        next_url: Optional[str] = url
+
+        while next_url and page < _MAX_PAGES:
+            response = await connector_transport.request(
+                "sap_s4", "GET", next_url,
+                tenant=self.base_url,
+                headers=self._headers(),
+                params=params if page == 0 else None,  # params only on first call
+                timeout=_DEFAULT_TIMEOUT,
+            )
+
+            if response.status_code == 401:
+                logger.error("S/4 OData 401 — token expired or invalid")
+                return results, False
+            if response.status_code != 200:
+                logger.error(
+                    "S/4 OData error %d: %s",
+                    response.status_code, response.text[:500],
                 )
-
-                if response.status_code == 401:
-                    logger.error("S/4 OData 401 — token expired or invalid")
-                    break
-                if response.status_code != 200:
-                    logger.error(
-                        "S/4 OData error %d: %s",
-                        response.status_code, response.text[:500],
-                    )
-                    break
-
-                data = response.json()
-
-                # OData v4 structure: {"value": [...], "@odata.nextLink": "..."}
-                if "value" in data:
-                    results.extend(data["value"])
-                    next_url = data.get("@odata.nextLink")
-                # OData v2 structure: {"d": {"results": [...], "__next": "..."}}
-                elif "d" in data:
-                    d = data["d"]
-                    if isinstance(d, dict) and "results" in d:
-                        results.extend(d["results"])
-                        next_url = d.get("__next")
-                    elif isinstance(d, list):
-                        results.extend(d)
-                        next_url = None
-                    else:
-                        # Single entity
-                        results.append(d)
-                        next_url = None
+                return results, False
+
+            data = response.json()
+
+            # OData v4 structure: {"value": [...], "@odata.nextLink": "..."}
+            if "value" in data:
+                results.extend(data["value"])
+                next_url = data.get("@odata.nextLink")
+            # OData v2 structure: {"d": {"results": [...], "__next": "..."}}
+            elif "d" in data:
+                d = data["d"]
+                if isinstance(d, dict) and "results" in d:
+                    results.extend(d["results"])
+                    next_url = d.get("__next")
+                elif isinstance(d, list):
+                    results.extend(d)
+                    next_url = None
                 else:
-                    break
+                    # Single entity
+                    results.append(d)
+                    next_url = None
+            else:
+                break
 
-                page += 1
+            page += 1
 
         logger.info("S/4 OData fetched %d records in %d pages from %s", len(results), page, url)
-        return results
+        return results, not next_url
 
     # ── Trial Balance ─────────────────────────────────────────────
 
@@ -175,6 +140,30 @@ class SAPS4Client:
             CreditAmountInCoCodeCrcy, EndingBalanceAmtInCoCodeCrcy,
             ProfitCenter, CostCenter
         """
+        return await self._odata_get_all(*self._trial_balance_request(company_code, fiscal_year, fiscal_period))
+
+    async def get_trial_balances(
+        self,
+        company_code: str,
+        periods: Sequence[Tuple[int, int]],
+    ) -> List[Tuple[int, int, Optional[List[Dict]]]]:
+        """Trial balances for many (fiscal_year, fiscal_period) pairs, fetched concurrently.
+
+        Returns (fiscal_year, fiscal_period, rows-or-None) in input order;
+        None when the period's fetch failed after the transport's retries.
+        """
+        results = await asyncio.gather(*(
+            self._odata_fetch(*self._trial_balance_request(company_code, year, period))
+            for year, period in periods
+        ))
+        return [
+            (year, period, rows if complete else None)
+            for (year, period), (rows, complete) in zip(periods, results)
+        ]
+
+    def _trial_balance_request(
+        self, company_code: str, fiscal_year: int, fiscal_period: int,
+    ) -> Tuple[str, Dict[str, str]]:
         url = f"{self.base_url}/sap/opu/odata/sap/C_TRIALBALANCE_CDS/C_TRIALBALANCE"
         period_str = str(fiscal_period).zfill(3)
         params = {
@@ -185,7 +174,7 @@ class SAPS4Client:
             ),
             "$format": "json",
         }
-        return await self._odata_get_all(url, params)
+        return url, params
 
     # ── Chart of Accounts ─────────────────────────────────────────
 
@@ -286,6 +275,10 @@ class SAPB1Client:
             cookies["ROUTEID"] = self.route_id
         return cookies
 
+    def _cookie_header(self) -> str:
+        # Sent as a header: the pooled client is shared and keeps no cookie jar
+        return "; ".join(f"{k}={v}" for k, v in self._cookies().items())
+
     def _headers(self) -> Dict[str, str]:
         return {
             "Accept": "application/json",
@@ -300,56 +293,65 @@ class SAPB1Client:
         B1 Service Layer v2 uses OData v4-style pagination with
         ``@odata.nextLink`` containing a ``$skiptoken`` parameter.
         """
+        results, _complete = await self._sl_fetch(path, params)
+        return results
+
+    async def _sl_fetch(
+        self, path: str, params: Optional[Dict] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """(records, complete) — complete is False if a page failed or the page cap hit."""
         results: List[Dict[str, Any]] = []
         url: Optional[str] = f"{self.server_url}{path}"
         page = 0
 
-        async with httpx.AsyncClient(
-            timeout=_DEFAULT_TIMEOUT, verify=False,
-        ) as client:
-            while url and page < _MAX_PAGES:
-                response = await _retry_with_backoff(
-                    client, "GET", url,
-                    headers=self._headers(),
-                    cookies=self._cookies(),
-                    params=params if page == 0 else None,
+        while url and page < _MAX_PAGES:
+            response = await connector_transport.request(
+                "sap_b1", "GET", url,
+                tenant=self.server_url,
+                headers={
+                    **self._headers(),
+                    "Cookie": self._cookie_header(),
+                    "Prefer": f"odata.maxpagesize={_B1_PAGE_SIZE}",
+                },
+                params=params if page == 0 else None,
+                timeout=_DEFAULT_TIMEOUT,
+            )
+
+            if response.status_code == 401:
+                logger.error("B1 Service Layer 401 — session expired")
+                return results, False
+            if response.status_code != 200:
+                logger.error(
+                    "B1 Service Layer error %d: %s",
+                    response.status_code, response.text[:500],
                 )
+                return results, False
+
+            data = response.json()
 
-                if response.status_code == 401:
-                    logger.error("B1 Service Layer 401 — session expired")
-                    break
-                if response.status_code != 200:
-                    logger.error(
-                        "B1 Service Layer error %d: %s",
-                        response.status_code, response.text[:500],
-                    )
-                    break
-
-                data = response.json()
-
-                if "value" in data:
-                    results.extend(data["value"])
-                    next_link = data.get("@odata.nextLink", data.get("odata.nextLink"))
-                    if next_link:
-                        # nextLink can be relative or absolute
-                        if next_link.startswith("http"):
-                            url = next_link
-                        else:
-                            url = f"{self.server_url}{next_link}"
+            if "value" in data:
+                results.extend(data["value"])
+                next_link = data.get("@odata.nextLink", data.get("odata.nextLink"))
+                if next_link:
+                    # nextLink can be relative or absolute
+                    if next_link.startswith("http"):
+                        url = next_link
                     else:
-                        url = None
+                        url = f"{self.server_url}{next_link}"
                 else:
-                    # Single entity or unexpected format
-                    if isinstance(data, list):
-                        results.extend(data)
-                    elif isinstance(data, dict):
-                        results.append(data)
                     url = None
+            else:
+                # Single entity or unexpected format
+                if isinstance(data, list):
+                    results.extend(data)
+                elif isinstance(data, dict):
+                    results.append(data)
+                url = None
 
-                page += 1
+            page += 1
 
         logger.info("B1 SL fetched %d records in %d pages from %s", len(results), page, path)
-        return results
+        return results, not url
 
     # ── Journal Entries ───────────────────────────────────────────
 
@@ -368,7 +370,26 @@ class SAPB1Client:
             from_date: Start date, "YYYY-MM-DD".
             to_date: End date, "YYYY-MM-DD".
         """
-        params = {
+        return await self._sl_get_all("/b1s/v2/JournalEntries", self._journal_entry_params(from_date, to_date))
+
+    async def get_journal_entries_windows(
+        self, from_date: date, to_date: date,
+    ) -> List[Tuple[date, date, Optional[List[Dict]]]]:
+        """Journal entries over a long range as concurrent date windows.
+
+        Returns (window_start, window_end, entries-or-None) in date order;
+        None when the window's fetch failed after the transport's retries.
+        """
+        windows = date_windows(from_date, to_date)
+        results = await asyncio.gather(*(
+            self._sl_fetch("/b1s/v2/JournalEntries", self._journal_entry_params(lo.isoformat(), hi.isoformat()))
+            for lo, hi in windows
+        ))
+        return [(lo, hi, rows if complete else None) for (lo, hi), (rows, complete) in zip(windows, results)]
+
+    @staticmethod
+    def _journal_entry_params(from_date: str, to_date: str) -> Dict[str, str]:
+        return {
             "$filter": (
                 f"ReferenceDate ge '{from_date}' "
                 f"and ReferenceDate le '{to_date}'"
@@ -378,7 +399,6 @@ class SAPB1Client:
                 "JournalEntryLines"
             ),
         }
-        return await self._sl_get_all("/b1s/v2/JournalEntries", params)
 
     # ── Chart of Accounts ─────────────────────────────────────────
 
@@ -0,0 +1,419 @@
+"""
+Shared HTTP transport for the ERP / HR / CRM connectors.
+
+Each connector client used to open a fresh httpx.AsyncClient per request
+(new TCP + TLS handshake every call) and give up on the first 429 by
+returning None, so a multi-year backfill was both slow and silently short.
+Every client now goes through one transport:
+
+    from app.services.integrations.transport import connector_transport
+
+    response = await connector_transport.request(
+        "quickbooks", "GET", url,
+        tenant=realm_id, headers=headers, params=params,
+    )
+
+- One pooled, keep-alive AsyncClient per provider (per event loop, so Celery
+  tasks that run ``asyncio.run`` per job don't reuse a dead loop's sockets).
+  Shared clients never store cookies; session cookies go in headers.
+- A token bucket per (provider, tenant) — the unit the vendors meter —
+  shared by every client instance in the process. Rates / bursts default to
+  PROVIDER_LIMITS and can be overridden with
+  ``CONNECTOR_LIMIT_<PROVIDER>=rate[:burst[:concurrency]]``.
+- A semaphore per (provider, tenant) caps in-flight requests.
+- 429 / 5xx / connect errors / timeouts are retried with full-jitter
+  exponential backoff. A Retry-After header pauses the whole bucket, so
+  concurrent requests for that tenant back off together instead of each
+  earning their own 429.
+- When retries run out the last response is returned (clients keep their own
+  status handling); transport errors are re-raised.
+
+``date_windows`` splits a backfill range into windows that callers fetch
+concurrently with ``asyncio.gather`` — the bucket and semaphore keep the
+fan-out inside each vendor's limits.
+
+stats() reports requests, retries, throttled waits and pool state per provider.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from email.utils import parsedate_to_datetime
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = int(os.getenv("CONNECTOR_MAX_RETRIES", "4"))
+BACKOFF_BASE_S = float(os.getenv("CONNECTOR_BACKOFF_BASE_S", "0.5"))
+BACKOFF_MAX_S = float(os.getenv("CONNECTOR_BACKOFF_MAX_S", "30"))
+MAX_RETRY_AFTER_S = float(os.getenv("CONNECTOR_MAX_RETRY_AFTER_S", "120"))
+WINDOW_MONTHS = int(os.getenv("CONNECTOR_WINDOW_MONTHS", "12"))
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+# ---------------------------------------------------------------------------
+# Provider limits
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    rate: float            # sustained requests / second per tenant
+    burst: int             # bucket capacity
+    concurrency: int       # in-flight requests per tenant
+    timeout: float = 60.0
+    max_connections: int = 20
+    verify: bool = True
+
+
+PROVIDER_LIMITS: Dict[str, ProviderLimits] = {
+    # 500 req/min and 10 concurrent per realm
+    "quickbooks": ProviderLimits(rate=8.0, burst=10, concurrency=10),
+    # Default account concurrency governance is 5; SuiteQL pages can be slow
+    "netsuite": ProviderLimits(rate=5.0, burst=5, concurrency=5, timeout=120.0),
+    "sap_s4": ProviderLimits(rate=10.0, burst=10, concurrency=8),
+    # Business One Service Layer is usually on-prem with a self-signed cert
+    "sap_b1": ProviderLimits(rate=10.0, burst=10, concurrency=4, verify=False),
+    "workday": ProviderLimits(rate=10.0, burst=10, concurrency=5),
+    "salesforce": ProviderLimits(rate=20.0, burst=20, concurrency=10),
+    # Undocumented limit; stay under 1 req/s per subdomain
+    "bamboohr": ProviderLimits(rate=0.9, burst=1, concurrency=1),
+}
+
+_DEFAULT_LIMITS = ProviderLimits(rate=5.0, burst=5, concurrency=4)
+
+
+def _limits_for(provider: str) -> ProviderLimits:
+    limits = PROVIDER_LIMITS.get(provider, _DEFAULT_LIMITS)
+    override = os.getenv(f"CONNECTOR_LIMIT_{provider.upper()}")
+    if not override:
+        return limits
+    try:
+        parts = override.split(":")
+        rate = float(parts[0])
+        burst = int(parts[1]) if len(parts) > 1 and parts[1] else limits.burst
+        concurrency = int(parts[2]) if len(parts) > 2 and parts[2] else limits.concurrency
+    except (ValueError, IndexError):
+        logger.warning("[connector-transport] bad CONNECTOR_LIMIT_%s=%r", provider.upper(), override)
+        return limits
+    return ProviderLimits(
+        rate=rate, burst=max(burst, 1), concurrency=max(concurrency, 1),
+        timeout=limits.timeout, max_connections=limits.max_connections, verify=limits.verify,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Token bucket
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out wait times instead of blocking.
+
+    ``reserve()`` takes a token (going negative if necessary) and returns how
+    long the caller must sleep before using it, so waiters queue fairly in
+    arrival order. ``pause(s)`` holds every reservation until s from now and
+    empties the bucket, so nothing bursts the moment a Retry-After expires.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = max(now, self._updated)
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if self._updated > now:
+                wait += self._updated - now
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._updated = max(self._updated, until)
+                self._tokens = min(self._tokens, 0.0)
+
+
+# ---------------------------------------------------------------------------
+# Transport
+# ---------------------------------------------------------------------------
+
+def _no_cookies() -> CookieJar:
+    # Shared clients serve many tenants — never persist a Set-Cookie between them.
+    # A bare jar (not httpx.Cookies) so the client keeps this policy instead of copying.
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=()))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_S)
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** attempt)))
+
+
+class _ProviderStats:
+    __slots__ = ("requests", "retries", "rate_limited", "server_errors",
+                 "transport_errors", "exhausted", "throttled_s")
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.transport_errors = 0
+        self.exhausted = 0
+        self.throttled_s = 0.0
+
+
+class ConnectorTransport:
+    """Pooled clients, rate limits and retries shared by all connector clients."""
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._semaphores: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._limits: Dict[str, ProviderLimits] = {}
+        self._stats: Dict[str, _ProviderStats] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    # -- state -------------------------------------------------------------
+
+    def limits(self, provider: str) -> ProviderLimits:
+        limits = self._limits.get(provider)
+        if limits is None:
+            limits = self._limits[provider] = _limits_for(provider)
+        return limits
+
+    def _check_fork(self) -> None:
+        # Sockets and loops don't survive a fork (Celery prefork workers)
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._clients.clear()
+                    self._semaphores.clear()
+                    self._pid = os.getpid()
+
+    def _client(self, provider: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        key = (provider, id(loop))
+        entry = self._clients.get(key)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            return entry[1]
+        limits = self.limits(provider)
+        client = httpx.AsyncClient(
+            timeout=limits.timeout,
+            verify=limits.verify,
+            cookies=_no_cookies(),
+            limits=httpx.Limits(
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_connections,
+            ),
+        )
+        with self._lock:
+            # Drop state tied to loops that have gone away (asyncio.run per Celery task)
+            dead = {id(l) for l, _ in self._clients.values() if l.is_closed()}
+            if entry is not None:
+                dead.add(id(loop))  # same id, new loop
+            self._clients = {k: v for k, v in self._clients.items() if k[1] not in dead}
+            self._semaphores = {k: v for k, v in self._semaphores.items() if k[2] not in dead}
+            self._clients[key] = (loop, client)
+        return client
+
+    def _semaphore(self, provider: str, tenant: str) -> asyncio.Semaphore:
+        key = (provider, tenant, id(asyncio.get_running_loop()))
+        sem = self._semaphores.get(key)
+        if sem is None:
+            with self._lock:
+                sem = self._semaphores.get(key)
+                if sem is None:
+                    sem = self._semaphores[key] = asyncio.Semaphore(self.limits(provider).concurrency)
+        return sem
+
+    def _bucket(self, provider: str, tenant: str) -> TokenBucket:
+        key = (provider, tenant)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    limits = self.limits(provider)
+                    bucket = self._buckets[key] = TokenBucket(limits.rate, limits.burst)
+        return bucket
+
+    def _stat(self, provider: str) -> _ProviderStats:
+        stat = self._stats.get(provider)
+        if stat is None:
+            stat = self._stats.setdefault(provider, _ProviderStats())
+        return stat
+
+    # -- requests ----------------------------------------------------------
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        *,
+        tenant: str = "",
+        retries: Optional[int] = None,
+        sign: Optional[Callable[[], Dict[str, str]]] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send one request through the provider's pool, bucket and retry policy.
+
+        ``kwargs`` go to ``httpx.AsyncClient.request`` (headers, params, json,
+        timeout, ...). ``sign`` is called before every attempt and its headers
+        are merged in — for per-request signatures (OAuth 1.0 nonces) that
+        must not be replayed. Returns the final response, whatever its status.
+        """
+        base_headers = kwargs.pop("headers", None) or {}
+        self._check_fork()
+        max_retries = MAX_RETRIES if retries is None else retries
+        bucket = self._bucket(provider, tenant)
+        stat = self._stat(provider)
+        semaphore = self._semaphore(provider, tenant)
+
+        attempt = 0
+        while True:
+            wait = bucket.reserve()
+            if wait > 0:
+                stat.throttled_s += wait
+                await asyncio.sleep(wait)
+            stat.requests += 1
+            kwargs["headers"] = {**base_headers, **sign()} if sign else base_headers
+            try:
+                async with semaphore:
+                    response = await self._client(provider).request(method, url, **kwargs)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                stat.transport_errors += 1
+                if attempt >= max_retries:
+                    stat.exhausted += 1
+                    raise
+                delay = _backoff(attempt)
+                logger.warning(
+                    "[connector-transport] %s %s failed (%s), retry %d/%d in %.1fs",
+                    provider, method, type(e).__name__, attempt + 1, max_retries, delay,
+                )
+            else:
+                status = response.status_code
+                if status not in _RETRY_STATUSES:
+                    return response
+                if status == 429:
+                    stat.rate_limited += 1
+                else:
+                    stat.server_errors += 1
+                if attempt >= max_retries:
+                    stat.exhausted += 1
+                    logger.warning(
+                        "[connector-transport] %s %s still %d after %d retries",
+                        provider, method, status, max_retries,
+                    )
+                    return response
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    bucket.pause(retry_after)
+                    delay = 0.0  # the bucket reservation carries the wait
+                else:
+                    delay = _backoff(attempt)
+                    if status == 429:
+                        bucket.pause(delay)
+                        delay = 0.0
+                logger.warning(
+                    "[connector-transport] %s %s got %d, retry %d/%d (retry-after=%s)",
+                    provider, method, status, attempt + 1, max_retries, retry_after,
+                )
+            attempt += 1
+            stat.retries += 1
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close this loop's clients (app shutdown)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            mine = [k for k, (l, _) in self._clients.items() if l is loop]
+            clients = [self._clients.pop(k)[1] for k in mine]
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug("[connector-transport] close failed: %s", e)
+
+    # -- observability -----------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        providers: Dict[str, Any] = {}
+        for provider, stat in list(self._stats.items()):
+            limits = self.limits(provider)
+            providers[provider] = {
+                "rate_per_s": limits.rate,
+                "burst": limits.burst,
+                "concurrency": limits.concurrency,
+                "tenants": sum(1 for p, _ in list(self._buckets) if p == provider),
+                "pooled_clients": sum(1 for p, _ in list(self._clients) if p == provider),
+                "requests": stat.requests,
+                "retries": stat.retries,
+                "rate_limited": stat.rate_limited,
+                "server_errors": stat.server_errors,
+                "transport_errors": stat.transport_errors,
+                "retries_exhausted": stat.exhausted,
+                "throttled_s": round(stat.throttled_s, 3),
+            }
+        return {"max_retries": MAX_RETRIES, "providers": providers}
+
+
+# ---------------------------------------------------------------------------
+# Backfill windows
+# ---------------------------------------------------------------------------
+
+def date_windows(start: date, end: date, months: int = WINDOW_MONTHS) -> List[Tuple[date, date]]:
+    """Split [start, end] into consecutive, non-overlapping windows of ``months``.
+
+    Windows after the first start on the 1st of a month, so monthly report
+    columns never straddle two windows.
+    """
+    if end < start:
+        return []
+    months = max(months, 1)
+    windows: List[Tuple[date, date]] = []
+    lo = start
+    while lo <= end:
+        y, m = divmod(lo.month - 1 + months, 12)
+        hi = date(lo.year + y, m + 1, 1) - timedelta(days=1)
+        windows.append((lo, min(hi, end)))
+        lo = hi + timedelta(days=1)
+    return windows
+
+
+# Singleton — import this everywhere
+connector_transport = ConnectorTransport()
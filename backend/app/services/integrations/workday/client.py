@@ -13,7 +13,7 @@ RAAS reports return all data in a single response (no pagination).
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
+from app.services.integrations.transport import connector_transport
 
 logger = logging.getLogger(__name__)
 
@@ -40,18 +40,18 @@ class WorkdayClient:
     ) -> Optional[Dict[str, Any]]:
         """Make a GET request and return parsed JSON."""
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.get(
-                    url,
-                    headers=self._headers(),
-                    params=params,
-                )
+            response = await connector_transport.request(
+                "workday", "GET", url,
+                tenant=f"{self.host}/{self.tenant}",
+                headers=self._headers(),
+                params=params,
+            )
 
             if response.status_code == 401:
                 logger.error("Workday API 401 -- token expired or invalid")
                 return None
             if response.status_code == 429:
-                logger.warning("Workday API rate limited (429)")
+                logger.warning("Workday API rate limited (429) after retries")
                 return None
             if response.status_code != 200:
                 logger.error(
@@ -4389,185 +4389,183 @@ class IntelligentGapFiller:
         """
         Get trailing and forward revenue multiples from our database
         Calculate growth-adjusted multiples accounting for cost of capital
+
+        Computed from the shared company index and memoized there until the
+        companies table changes, rather than re-queried per valuation.
         """
         try:
-            from app.core.database import supabase_service
-            
-            # Check if Supabase client is initialized
-            if not supabase_service.client:
-                logger.warning("Supabase client not initialized - using default market multiples")
+            from app.services.company_index import company_index
+
+            if not await company_index.ensure_fresh():
+                logger.warning("Company index unavailable - using default market multiples")
                 return self._get_default_market_multiples()
-            
-            try:
-                # Query companies with revenue and valuation data
-                if not supabase_service.client:
-                    logger.warning("Supabase client not available - using default market multiples")
-                    return self._get_default_market_multiples()
-                    
-                result = supabase_service.client.table('companies').select(
-                    'name', 'revenue', 'valuation', 'growth_rate', 'stage', 
-                    'last_round_date', 'funding_rounds', 'sector'
-                ).not_.is_('revenue', None).not_.is_('valuation', None).execute()
-                
-                if not result.data:
-                    logger.warning("No companies found in database - using default market multiples")
-                    return self._get_default_market_multiples()
-                    
-            except Exception as e:
-                logger.error(f"Supabase query failed: {e}")
+
+            multiples_analysis = company_index.aggregate("market_multiples", self._compute_market_multiples)
+            if multiples_analysis is None:
+                logger.warning("No companies found in database - using default market multiples")
                 return self._get_default_market_multiples()
+
+            self.growth_adjusted_multiples_cache = multiples_analysis
+            return multiples_analysis
+
+        except Exception as e:
+            logger.error(f"Failed to get market multiples: {e}")
+            return self._get_default_market_multiples()
+
+    def _compute_market_multiples(self) -> Optional[Dict[str, Any]]:
+        """Per-stage multiples over indexed companies with revenue and valuation (None if there are none)."""
+        from app.services.company_index import company_index
+
+        companies = company_index.rows(
+            lambda c: c.get('revenue') is not None and c.get('valuation') is not None
+        )
+        if not companies:
+            return None
+        logger.info(f"Found {len(companies)} companies with revenue/valuation data")
+        
+        # Separate by whether they have growth rates
+        with_growth = [c for c in companies if c.get('growth_rate') is not None]
+        without_growth = [c for c in companies if c.get('growth_rate') is None]
+        
+        logger.info(f"{len(with_growth)} companies have growth rates, {len(without_growth)} don't")
+        
+        # Calculate multiples by stage
+        multiples_analysis = {}
+        
+        for stage in ['Seed', 'Series A', 'Series B', 'Series C', 'Series D', 'Growth']:
+            stage_companies = [c for c in companies if c.get('stage') == stage]
             
-            companies = result.data
-            logger.info(f"Found {len(companies)} companies with revenue/valuation data")
-            
-            # Separate by whether they have growth rates
-            with_growth = [c for c in companies if c.get('growth_rate') is not None]
-            without_growth = [c for c in companies if c.get('growth_rate') is None]
-            
-            logger.info(f"{len(with_growth)} companies have growth rates, {len(without_growth)} don't")
+            if not stage_companies:
+                continue
             
-            # Calculate multiples by stage
-            multiples_analysis = {}
+            stage_multiples = []
             
-            for stage in ['Seed', 'Series A', 'Series B', 'Series C', 'Series D', 'Growth']:
-                stage_companies = [c for c in companies if c.get('stage') == stage]
+            for company in stage_companies:
+                revenue = company.get('revenue')
+                valuation = company.get('valuation', 0)
+                growth = company.get('growth_rate')
                 
-                if not stage_companies:
-                    continue
-                
-                stage_multiples = []
+                # Use inferred revenue if actual revenue is missing
+                if not revenue or revenue <= 0:
+                    inferred_revenue = company.get('inferred_revenue')
+                    if inferred_revenue and inferred_revenue > 0:
+                        revenue = inferred_revenue
+                    else:
+                        # If still no revenue, skip
+                        continue
                 
-                for company in stage_companies:
-                    revenue = company.get('revenue')
-                    valuation = company.get('valuation', 0)
-                    growth = company.get('growth_rate')
-                    
-                    # Use inferred revenue if actual revenue is missing
-                    if not revenue or revenue <= 0:
-                        inferred_revenue = company.get('inferred_revenue')
-                        if inferred_revenue and inferred_revenue > 0:
-                            revenue = inferred_revenue
-                        else:
-                            # If still no revenue, skip
-                            continue
-                    
-                    # Use inferred growth if actual growth is missing
+                # Use inferred growth if actual growth is missing
+                if growth is None:
+                    growth = company.get('inferred_growth_rate')
                     if growth is None:
-                        growth = company.get('inferred_growth_rate')
-                        if growth is None:
-                            # Infer from investors using multiplier method
-                            growth = self._infer_growth_from_investors(company.get('funding_rounds', []), company)
-                    
-                    # Trailing revenue multiple (valuation / current revenue)
-                    trailing_multiple = valuation / revenue
-                    
-                    # VALIDATION: Revenue multiples should be reasonable (0.5x-50x typical)
-                    if trailing_multiple < 0.5 or trailing_multiple > 100:
-                        logger.warning(f"[REVENUE_MULTIPLE] Suspicious trailing multiple: {trailing_multiple:.1f}x (valuation=${valuation/1e6:.1f}M, revenue=${revenue/1e6:.1f}M)")
-                        # If clearly wrong, skip this data point
-                        if trailing_multiple > 1000 or trailing_multiple < 0.1:
-                            logger.error(f"[REVENUE_MULTIPLE] Rejecting impossible multiple: {trailing_multiple:.1f}x")
-                            continue
-                    
-                    # Forward revenue multiple (valuation / next year revenue)
-                    if growth is not None:
-                        forward_revenue = revenue * (1 + growth)
-                        forward_multiple = valuation / forward_revenue if forward_revenue > 0 else trailing_multiple
-                    else:
-                        # Infer growth from investor quality if not available
-                        inferred_growth = self._infer_growth_from_investors(company.get('funding_rounds', []), company)
-                        forward_revenue = revenue * (1 + inferred_growth)
-                        forward_multiple = valuation / forward_revenue if forward_revenue > 0 else trailing_multiple
-                        growth = inferred_growth
-                    
-                    # VALIDATION: Forward multiple should also be reasonable
-                    if forward_multiple < 0.5 or forward_multiple > 100:
-                        logger.warning(f"[REVENUE_MULTIPLE] Suspicious forward multiple: {forward_multiple:.1f}x")
-                        if forward_multiple > 1000 or forward_multiple < 0.1:
-                            forward_multiple = trailing_multiple
-                    
-                    # Growth-adjusted multiple (accounting for cost of capital)
-                    # Public market cost of capital ~8-10% now (higher than 2021)
-                    cost_of_capital = 0.10
-                    
-                    # Rule of 40 score (growth + profit margin)
-                    # Assume -20% margins for growth stage
-                    profit_margin = -0.20 if stage in ['Seed', 'Series A'] else -0.10
-                    rule_of_40 = (growth * 100) + (profit_margin * 100)
-                    
-                    # Growth-adjusted multiple formula:
-                    # Base multiple = 2x for 0% growth
-                    # Add 0.1x for each 1% of growth above cost of capital
-                    growth_premium = max(0, growth - cost_of_capital)
-                    growth_adjusted_multiple = 2 + (growth_premium * 10)
-                    
-                    # Compare actual to theoretical
-                    multiple_premium = trailing_multiple / growth_adjusted_multiple if growth_adjusted_multiple > 0 else 1.0
-                    
-                    stage_multiples.append({
-                        'company': company.get('name'),
-                        'trailing': trailing_multiple,
-                        'forward': forward_multiple,
-                        'growth_rate': growth,
-                        'growth_adjusted': growth_adjusted_multiple,
-                        'premium_to_fair': multiple_premium,
-                        'rule_of_40': rule_of_40
-                    })
+                        # Infer from investors using multiplier method
+                        growth = self._infer_growth_from_investors(company.get('funding_rounds', []), company)
                 
-                if stage_multiples:
-                    # Sort for percentile calculations
-                    trailing_sorted = sorted([m['trailing'] for m in stage_multiples])
-                    forward_sorted = sorted([m['forward'] for m in stage_multiples])
-                    growth_adj_sorted = sorted([m['growth_adjusted'] for m in stage_multiples])
-                    
-                    # Calculate statistics
-                    multiples_analysis[stage] = {
-                        'count': len(stage_multiples),
-                        'trailing': {
-                            'p25': trailing_sorted[int(len(trailing_sorted) * 0.25)],
-                            'p50': trailing_sorted[int(len(trailing_sorted) * 0.50)],
-                            'p75': trailing_sorted[int(len(trailing_sorted) * 0.75)],
-                            'mean': sum(trailing_sorted) / len(trailing_sorted)
-                        },
-                        'forward': {
-                            'p25': forward_sorted[int(len(forward_sorted) * 0.25)],
-                            'p50': forward_sorted[int(len(forward_sorted) * 0.50)],
-                            'p75': forward_sorted[int(len(forward_sorted) * 0.75)],
-                            'mean': sum(forward_sorted) / len(forward_sorted)
-                        },
-                        'growth_adjusted': {
-                            'p50': growth_adj_sorted[int(len(growth_adj_sorted) * 0.50)],
-                            'mean': sum(growth_adj_sorted) / len(growth_adj_sorted)
-                        },
-                        'avg_growth_rate': sum(m['growth_rate'] for m in stage_multiples) / len(stage_multiples),
-                        'avg_rule_of_40': sum(m['rule_of_40'] for m in stage_multiples) / len(stage_multiples),
-                        'revenue_weighted_growth': self._calculate_revenue_weighted_growth(stage_multiples)
-                    }
-            
-            # Add market context
-            multiples_analysis['market_context'] = {
-                'cost_of_capital': 0.10,  # 10% in current market
-                'public_comps': {
-                    'high_growth_saas': 8.0,  # Down from 15x in 2021
-                    'mid_growth_saas': 5.0,   # Down from 10x
-                    'low_growth_saas': 3.0    # Down from 6x
-                },
-                'vintage_adjustments': {
-                    '2021': 0.5,   # 50% discount from peak (4 years old)
-                    '2022': 0.65,  # 35% discount (3 years old)
-                    '2023': 0.8,   # 20% discount (2 years old)
-                    '2024': 0.95,  # 5% discount (1 year old)
-                    '2025': 1.0    # Current market (Sep 2025)
-                },
-                'cambridge_associates_benchmarks': self._get_cambridge_benchmarks()
-            }
-            
-            self.growth_adjusted_multiples_cache = multiples_analysis
-            return multiples_analysis
+                # Trailing revenue multiple (valuation / current revenue)
+                trailing_multiple = valuation / revenue
+                
+                # VALIDATION: Revenue multiples should be reasonable (0.5x-50x typical)
+                if trailing_multiple < 0.5 or trailing_multiple > 100:
+                    logger.warning(f"[REVENUE_MULTIPLE] Suspicious trailing multiple: {trailing_multiple:.1f}x (valuation=${valuation/1e6:.1f}M, revenue=${revenue/1e6:.1f}M)")
+                    # If clearly wrong, skip this data point
+                    if trailing_multiple > 1000 or trailing_multiple < 0.1:
+                        logger.error(f"[REVENUE_MULTIPLE] Rejecting impossible multiple: {trailing_multiple:.1f}x")
+                        continue
+                
+                # Forward revenue multiple (valuation / next year revenue)
+                if growth is not None:
+                    forward_revenue = revenue * (1 + growth)
+                    forward_multiple = valuation / forward_revenue if forward_revenue > 0 else trailing_multiple
+                else:
+                    # Infer growth from investor quality if not available
+                    inferred_growth = self._infer_growth_from_investors(company.get('funding_rounds', []), company)
+                    forward_revenue = revenue * (1 + inferred_growth)
+                    forward_multiple = valuation / forward_revenue if forward_revenue > 0 else trailing_multiple
+                    growth = inferred_growth
+                
+                # VALIDATION: Forward multiple should also be reasonable
+                if forward_multiple < 0.5 or forward_multiple > 100:
+                    logger.warning(f"[REVENUE_MULTIPLE] Suspicious forward multiple: {forward_multiple:.1f}x")
+                    if forward_multiple > 1000 or forward_multiple < 0.1:
+                        forward_multiple = trailing_multiple
+                
+                # Growth-adjusted multiple (accounting for cost of capital)
+                # Public market cost of capital ~8-10% now (higher than 2021)
+                cost_of_capital = 0.10
+                
+                # Rule of 40 score (growth + profit margin)
+                # Assume -20% margins for growth stage
+                profit_margin = -0.20 if stage in ['Seed', 'Series A'] else -0.10
+                rule_of_40 = (growth * 100) + (profit_margin * 100)
+                
+                # Growth-adjusted multiple formula:
+                # Base multiple = 2x for 0% growth
+                # Add 0.1x for each 1% of growth above cost of capital
+                growth_premium = max(0, growth - cost_of_capital)
+                growth_adjusted_multiple = 2 + (growth_premium * 10)
+                
+                # Compare actual to theoretical
+                multiple_premium = trailing_multiple / growth_adjusted_multiple if growth_adjusted_multiple > 0 else 1.0
+                
+                stage_multiples.append({
+                    'company': company.get('name'),
+                    'trailing': trailing_multiple,
+                    'forward': forward_multiple,
+                    'growth_rate': growth,
+                    'growth_adjusted': growth_adjusted_multiple,
+                    'premium_to_fair': multiple_premium,
+                    'rule_of_40': rule_of_40
+                })
             
-        except Exception as e:
-            logger.error(f"Failed to get market multiples: {e}")
-            return self._get_default_market_multiples()
+            if stage_multiples:
+                # Sort for percentile calculations
+                trailing_sorted = sorted([m['trailing'] for m in stage_multiples])
+                forward_sorted = sorted([m['forward'] for m in stage_multiples])
+                growth_adj_sorted = sorted([m['growth_adjusted'] for m in stage_multiples])
+                
+                # Calculate statistics
+                multiples_analysis[stage] = {
+                    'count': len(stage_multiples),
+                    'trailing': {
+                        'p25': trailing_sorted[int(len(trailing_sorted) * 0.25)],
+                        'p50': trailing_sorted[int(len(trailing_sorted) * 0.50)],
+                        'p75': trailing_sorted[int(len(trailing_sorted) * 0.75)],
+                        'mean': sum(trailing_sorted) / len(trailing_sorted)
+                    },
+                    'forward': {
+                        'p25': forward_sorted[int(len(forward_sorted) * 0.25)],
+                        'p50': forward_sorted[int(len(forward_sorted) * 0.50)],
+                        'p75': forward_sorted[int(len(forward_sorted) * 0.75)],
+                        'mean': sum(forward_sorted) / len(forward_sorted)
+                    },
+                    'growth_adjusted': {
+                        'p50': growth_adj_sorted[int(len(growth_adj_sorted) * 0.50)],
+                        'mean': sum(growth_adj_sorted) / len(growth_adj_sorted)
+                    },
+                    'avg_growth_rate': sum(m['growth_rate'] for m in stage_multiples) / len(stage_multiples),
+                    'avg_rule_of_40': sum(m['rule_of_40'] for m in stage_multiples) / len(stage_multiples),
+                    'revenue_weighted_growth': self._calculate_revenue_weighted_growth(stage_multiples)
+                }
+        
+        # Add market context
+        multiples_analysis['market_context'] = {
+            'cost_of_capital': 0.10,  # 10% in current market
+            'public_comps': {
+                'high_growth_saas': 8.0,  # Down from 15x in 2021
+                'mid_growth_saas': 5.0,   # Down from 10x
+                'low_growth_saas': 3.0    # Down from 6x
+            },
+            'vintage_adjustments': {
+                '2021': 0.5,   # 50% discount from peak (4 years old)
+                '2022': 0.65,  # 35% discount (3 years old)
+                '2023': 0.8,   # 20% discount (2 years old)
+                '2024': 0.95,  # 5% discount (1 year old)
+                '2025': 1.0    # Current market (Sep 2025)
+            },
+            'cambridge_associates_benchmarks': self._get_cambridge_benchmarks()
+        }
+        
+        return multiples_analysis
     
     def _get_default_market_multiples(self) -> Dict[str, Any]:
         """Default multiples based on current market conditions"""
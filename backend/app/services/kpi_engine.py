@@ -2,6 +2,16 @@
 
 Pulls actuals from fpa_actuals, reads the company's business_model/sector,
 and computes the right KPI profile with full period-over-period tracking.
+
+Fund-wide dashboards use the batch path instead of one compute() per company:
+
+    fund = pull_fund_companies(fund_id)            # one batched pull
+    kpis = KPIEngine().compute_fund(fund)          # (companies × KPIs × periods)
+    kpis.snapshot(company_id)                      # same KPISnapshot as compute()
+    kpis.matrix("gross_margin")                    # companies × periods array
+
+Every KPIDef carries a ``vector`` form of its formula that evaluates all
+companies and periods at once over aligned actuals arrays (NaN = missing).
 """
 
 from __future__ import annotations
@@ -9,7 +19,12 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.services.company_data_pull import FundCompanies
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +86,7 @@ class KPIDef:
     requires: List[str]  # actuals categories needed
     compute: Callable  # (actuals_by_cat: dict[str, dict[str, float]]) -> Optional[float]
     higher_is_better: bool = True
+    vector: Optional[Callable] = None  # (_Frame) -> companies × periods array, same formula as compute
 
 
 def _safe_div(a: Optional[float], b: Optional[float]) -> Optional[float]:
@@ -83,6 +99,42 @@ def _get(actuals: Dict[str, Dict[str, float]], cat: str, period: str) -> Optiona
     return actuals.get(cat, {}).get(period)
 
 
+# Array counterparts for KPIDef.vector — NaN plays the role of None.
+
+def _known(x: np.ndarray) -> np.ndarray:
+    return ~np.isnan(x)
+
+
+def _truthy(x: np.ndarray) -> np.ndarray:
+    """``if x`` — present and non-zero."""
+    return _known(x) & (x != 0)
+
+
+def _nz(x: np.ndarray) -> np.ndarray:
+    """``x or 0``."""
+    return np.where(np.isnan(x), 0.0, x)
+
+
+def _or1(x: np.ndarray) -> np.ndarray:
+    """``x or 1``."""
+    return np.where(_truthy(x), x, 1.0)
+
+
+def _when(mask: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """``x if mask else None``."""
+    return np.where(mask, x, np.nan)
+
+
+def _vdiv(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """_safe_div over arrays."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(_known(a) & _truthy(b), a / np.where(_truthy(b), b, 1.0), np.nan)
+
+
+def _burn(f: "_Frame") -> np.ndarray:
+    return _nz(f.cur("cogs")) + _nz(f.cur("opex_total")) - _nz(f.cur("revenue"))
+
+
 # ---------------------------------------------------------------------------
 # Universal KPIs — computed for any business type
 # ---------------------------------------------------------------------------
@@ -100,6 +152,10 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             (_get(a, "revenue", p) or 0) - (_get(a, "revenue", pp) or 0),
             _get(a, "revenue", pp) or 0,
         ) if pp else None,
+        vector=lambda f: _when(
+            f.has_prev,
+            _vdiv(_nz(f.cur("revenue")) - _nz(f.prev("revenue")), _nz(f.prev("revenue"))),
+        ),
     ),
     KPIDef(
         key="gross_margin",
@@ -113,6 +169,7 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             (_get(a, "revenue", p) or 0) - (_get(a, "cogs", p) or 0),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(_nz(f.cur("revenue")) - _nz(f.cur("cogs")), f.cur("revenue")),
     ),
     KPIDef(
         key="ebitda_margin",
@@ -126,6 +183,7 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             _get(a, "ebitda", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("ebitda"), f.cur("revenue")),
     ),
     KPIDef(
         key="opex_ratio",
@@ -139,6 +197,7 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             _get(a, "opex_total", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("opex_total"), f.cur("revenue")),
     ),
     KPIDef(
         key="net_burn",
@@ -151,6 +210,7 @@ UNIVERSAL_KPIS: List[KPIDef] = [
         compute=lambda a, p, pp: (
             (_get(a, "cogs", p) or 0) + (_get(a, "opex_total", p) or 0) - (_get(a, "revenue", p) or 0)
         ) if (_get(a, "cogs", p) is not None or _get(a, "opex_total", p) is not None) else None,
+        vector=lambda f: _when(_known(f.cur("cogs")) | _known(f.cur("opex_total")), _burn(f)),
     ),
     KPIDef(
         key="runway_months",
@@ -169,6 +229,10 @@ UNIVERSAL_KPIS: List[KPIDef] = [
                 and ((_get(a, "cogs", p) or 0) + (_get(a, "opex_total", p) or 0) - (_get(a, "revenue", p) or 0)) > 0)
             else None
         ),
+        vector=lambda f: _when(
+            _known(f.cur("cash_balance")) & (_burn(f) > 0),
+            _vdiv(f.cur("cash_balance"), np.maximum(_burn(f), 0.01)),
+        ),
     ),
     KPIDef(
         key="cost_per_head",
@@ -182,6 +246,10 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             (_get(a, "cogs", p) or 0) + (_get(a, "opex_total", p) or 0),
             _get(a, "headcount", p),
         ) if (_get(a, "cogs", p) is not None or _get(a, "opex_total", p) is not None) else None,
+        vector=lambda f: _when(
+            _known(f.cur("cogs")) | _known(f.cur("opex_total")),
+            _vdiv(_nz(f.cur("cogs")) + _nz(f.cur("opex_total")), f.cur("headcount")),
+        ),
     ),
     KPIDef(
         key="revenue_per_head",
@@ -195,6 +263,7 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             _get(a, "revenue", p),
             _get(a, "headcount", p),
         ),
+        vector=lambda f: _vdiv(f.cur("revenue"), f.cur("headcount")),
     ),
     KPIDef(
         key="headcount_growth",
@@ -208,6 +277,10 @@ UNIVERSAL_KPIS: List[KPIDef] = [
             (_get(a, "headcount", p) or 0) - (_get(a, "headcount", pp) or 0),
             _get(a, "headcount", pp),
         ) if pp else None,
+        vector=lambda f: _when(
+            f.has_prev,
+            _vdiv(_nz(f.cur("headcount")) - _nz(f.prev("headcount")), f.prev("headcount")),
+        ),
     ),
     KPIDef(
         key="cash_balance",
@@ -218,6 +291,7 @@ UNIVERSAL_KPIS: List[KPIDef] = [
         requires=["cash_balance"],
         higher_is_better=True,
         compute=lambda a, p, pp: _get(a, "cash_balance", p),
+        vector=lambda f: f.cur("cash_balance"),
     ),
 ]
 
@@ -239,6 +313,7 @@ SAAS_KPIS: List[KPIDef] = [
             (_get(a, "arr", p) or 0) - (_get(a, "arr", pp) or 0),
             _get(a, "arr", pp),
         ) if pp else None,
+        vector=lambda f: _when(f.has_prev, _vdiv(_nz(f.cur("arr")) - _nz(f.prev("arr")), f.prev("arr"))),
     ),
     KPIDef(
         key="arr",
@@ -249,6 +324,7 @@ SAAS_KPIS: List[KPIDef] = [
         requires=["arr"],
         higher_is_better=True,
         compute=lambda a, p, pp: _get(a, "arr", p),
+        vector=lambda f: f.cur("arr"),
     ),
     KPIDef(
         key="mrr",
@@ -259,6 +335,7 @@ SAAS_KPIS: List[KPIDef] = [
         requires=["mrr"],
         higher_is_better=True,
         compute=lambda a, p, pp: _get(a, "mrr", p),
+        vector=lambda f: f.cur("mrr"),
     ),
     KPIDef(
         key="burn_multiple",
@@ -276,6 +353,10 @@ SAAS_KPIS: List[KPIDef] = [
             if pp and ((_get(a, "arr", p) or 0) - (_get(a, "arr", pp) or 0)) > 0
             else None
         ),
+        vector=lambda f: _when(
+            f.has_prev & (_nz(f.cur("arr")) - _nz(f.prev("arr")) > 0),
+            _vdiv(_burn(f), _nz(f.cur("arr")) - _nz(f.prev("arr"))),
+        ),
     ),
     KPIDef(
         key="rule_of_40",
@@ -295,6 +376,11 @@ SAAS_KPIS: List[KPIDef] = [
             )
             if pp else None
         ),
+        vector=lambda f: _when(
+            f.has_prev,
+            _nz(_vdiv(_nz(f.cur("revenue")) - _nz(f.prev("revenue")), f.prev("revenue")))
+            + _nz(_vdiv(f.cur("ebitda"), f.cur("revenue"))),
+        ),
     ),
     KPIDef(
         key="nrr_approx",
@@ -308,6 +394,7 @@ SAAS_KPIS: List[KPIDef] = [
             _get(a, "arr", p),
             _get(a, "arr", pp),
         ) if pp else None,
+        vector=lambda f: _when(f.has_prev, _vdiv(f.cur("arr"), f.prev("arr"))),
     ),
     KPIDef(
         key="revenue_per_customer",
@@ -321,6 +408,7 @@ SAAS_KPIS: List[KPIDef] = [
             _get(a, "revenue", p),
             _get(a, "customers", p),
         ),
+        vector=lambda f: _vdiv(f.cur("revenue"), f.cur("customers")),
     ),
 ]
 
@@ -344,6 +432,15 @@ SERVICES_KPIS: List[KPIDef] = [
                 ),
             )
         ) if _get(a, "headcount", p) else None,
+        vector=lambda f: _when(
+            _truthy(f.cur("headcount")),
+            _vdiv(
+                f.cur("revenue"),
+                _nz(f.cur("headcount")) * _or1(
+                    _vdiv(_nz(f.cur("cogs")) + _nz(f.cur("opex_total")), f.cur("headcount"))
+                ),
+            ),
+        ),
     ),
     KPIDef(
         key="revenue_per_employee",
@@ -357,6 +454,7 @@ SERVICES_KPIS: List[KPIDef] = [
             _get(a, "revenue", p),
             _get(a, "headcount", p),
         ),
+        vector=lambda f: _vdiv(f.cur("revenue"), f.cur("headcount")),
     ),
     KPIDef(
         key="gross_profit_per_head",
@@ -370,6 +468,7 @@ SERVICES_KPIS: List[KPIDef] = [
             (_get(a, "revenue", p) or 0) - (_get(a, "cogs", p) or 0),
             _get(a, "headcount", p),
         ),
+        vector=lambda f: _vdiv(_nz(f.cur("revenue")) - _nz(f.cur("cogs")), f.cur("headcount")),
     ),
     KPIDef(
         key="employee_cost_ratio",
@@ -383,6 +482,7 @@ SERVICES_KPIS: List[KPIDef] = [
             _get(a, "cogs", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("cogs"), f.cur("revenue")),
     ),
 ]
 
@@ -399,6 +499,7 @@ ECOMMERCE_KPIS: List[KPIDef] = [
             _get(a, "revenue", p),
             _get(a, "customers", p),
         ),
+        vector=lambda f: _vdiv(f.cur("revenue"), f.cur("customers")),
     ),
     KPIDef(
         key="customer_growth",
@@ -412,6 +513,10 @@ ECOMMERCE_KPIS: List[KPIDef] = [
             (_get(a, "customers", p) or 0) - (_get(a, "customers", pp) or 0),
             _get(a, "customers", pp),
         ) if pp else None,
+        vector=lambda f: _when(
+            f.has_prev,
+            _vdiv(_nz(f.cur("customers")) - _nz(f.prev("customers")), f.prev("customers")),
+        ),
     ),
     KPIDef(
         key="cogs_ratio",
@@ -425,6 +530,7 @@ ECOMMERCE_KPIS: List[KPIDef] = [
             _get(a, "cogs", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("cogs"), f.cur("revenue")),
     ),
 ]
 
@@ -441,6 +547,7 @@ MANUFACTURING_KPIS: List[KPIDef] = [
             _get(a, "cogs", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("cogs"), f.cur("revenue")),
     ),
     KPIDef(
         key="gross_profit",
@@ -454,6 +561,7 @@ MANUFACTURING_KPIS: List[KPIDef] = [
             (_get(a, "revenue", p) or 0) - (_get(a, "cogs", p) or 0)
             if _get(a, "revenue", p) is not None else None
         ),
+        vector=lambda f: _when(_known(f.cur("revenue")), _nz(f.cur("revenue")) - _nz(f.cur("cogs"))),
     ),
     KPIDef(
         key="opex_per_unit_revenue",
@@ -467,6 +575,7 @@ MANUFACTURING_KPIS: List[KPIDef] = [
             _get(a, "opex_total", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("opex_total"), f.cur("revenue")),
     ),
     KPIDef(
         key="output_per_head",
@@ -480,6 +589,7 @@ MANUFACTURING_KPIS: List[KPIDef] = [
             _get(a, "revenue", p),
             _get(a, "headcount", p),
         ),
+        vector=lambda f: _vdiv(f.cur("revenue"), f.cur("headcount")),
     ),
 ]
 
@@ -501,6 +611,10 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             (_get(a, "total_debt", p) or 0) - (_get(a, "cash_balance", p) or 0),
             _get(a, "ebitda", p) * 12 if _get(a, "ebitda", p) else None,
         ),
+        vector=lambda f: _vdiv(
+            _nz(f.cur("total_debt")) - _nz(f.cur("cash_balance")),
+            _when(_truthy(f.cur("ebitda")), f.cur("ebitda") * 12),
+        ),
     ),
     KPIDef(
         key="interest_coverage",
@@ -514,6 +628,7 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             _get(a, "ebitda", p),
             _get(a, "interest_expense", p),
         ),
+        vector=lambda f: _vdiv(f.cur("ebitda"), f.cur("interest_expense")),
     ),
     KPIDef(
         key="dscr",
@@ -527,6 +642,7 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             (_get(a, "ebitda", p) or 0) - (_get(a, "capex", p) or 0),
             _get(a, "debt_service", p),
         ),
+        vector=lambda f: _vdiv(_nz(f.cur("ebitda")) - _nz(f.cur("capex")), f.cur("debt_service")),
     ),
     KPIDef(
         key="fcf_conversion",
@@ -540,6 +656,7 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             _get(a, "fcf", p),
             _get(a, "ebitda", p),
         ),
+        vector=lambda f: _vdiv(f.cur("fcf"), f.cur("ebitda")),
     ),
     KPIDef(
         key="capex_ratio",
@@ -553,6 +670,7 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             _get(a, "capex", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("capex"), f.cur("revenue")),
     ),
     KPIDef(
         key="nwc_days",
@@ -567,6 +685,10 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             if _get(a, "revenue", p) and _get(a, "working_capital", p) is not None
             else None
         ),
+        vector=lambda f: _when(
+            _truthy(f.cur("revenue")) & _known(f.cur("working_capital")),
+            _vdiv(f.cur("working_capital"), f.cur("revenue")) * 30,
+        ),
     ),
     KPIDef(
         key="operating_margin",
@@ -580,6 +702,7 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             _get(a, "operating_income", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("operating_income"), f.cur("revenue")),
     ),
     KPIDef(
         key="net_margin",
@@ -593,6 +716,7 @@ PE_OPERATING_KPIS: List[KPIDef] = [
             _get(a, "net_income", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("net_income"), f.cur("revenue")),
     ),
 ]
 
@@ -614,6 +738,7 @@ INSURANCE_KPIS: List[KPIDef] = [
             _get(a, "cogs", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("cogs"), f.cur("revenue")),
     ),
     KPIDef(
         key="combined_ratio",
@@ -627,6 +752,7 @@ INSURANCE_KPIS: List[KPIDef] = [
             (_get(a, "cogs", p) or 0) + (_get(a, "opex_total", p) or 0),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(_nz(f.cur("cogs")) + _nz(f.cur("opex_total")), f.cur("revenue")),
     ),
     KPIDef(
         key="revenue_per_policy",
@@ -640,6 +766,7 @@ INSURANCE_KPIS: List[KPIDef] = [
             _get(a, "revenue", p),
             _get(a, "customers", p),
         ),
+        vector=lambda f: _vdiv(f.cur("revenue"), f.cur("customers")),
     ),
     KPIDef(
         key="expense_ratio",
@@ -653,6 +780,7 @@ INSURANCE_KPIS: List[KPIDef] = [
             _get(a, "opex_total", p),
             _get(a, "revenue", p),
         ),
+        vector=lambda f: _vdiv(f.cur("opex_total"), f.cur("revenue")),
     ),
 ]
 
@@ -786,6 +914,163 @@ def _compute_trend(series: List[KPIValue], higher_is_better: bool) -> Tuple[Opti
     return trend, improving, declining
 
 
+# ---------------------------------------------------------------------------
+# Fund-wide batch — aligned arrays
+# ---------------------------------------------------------------------------
+
+class _Frame:
+    """Aligned actuals handed to KPIDef.vector.
+
+    ``cur(cat)`` / ``prev(cat)`` are companies × periods arrays (NaN where a
+    company has no value). ``prev`` follows _prev_period: each company's
+    previous period with any actuals, not the previous column of the shared
+    axis. ``has_prev`` is False where that period doesn't exist.
+    """
+
+    def __init__(self, values: np.ndarray, categories: Sequence[str], prev_idx: np.ndarray):
+        self._values = values  # companies × categories × periods
+        self._index = {cat: i for i, cat in enumerate(categories)}
+        self.has_prev = prev_idx >= 0
+        self._prev_idx = np.where(self.has_prev, prev_idx, 0)
+        self._absent = np.full((values.shape[0], values.shape[2]), np.nan)
+        self._prev: Dict[int, np.ndarray] = {}
+
+    def cur(self, cat: str) -> np.ndarray:
+        i = self._index.get(cat)
+        return self._absent if i is None else self._values[:, i, :]
+
+    def prev(self, cat: str) -> np.ndarray:
+        i = self._index.get(cat)
+        if i is None:
+            return self._absent
+        if i not in self._prev:
+            shifted = np.take_along_axis(self._values[:, i, :], self._prev_idx, axis=1)
+            self._prev[i] = np.where(self.has_prev, shifted, np.nan)
+        return self._prev[i]
+
+
+def _last_valid(valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per position along the last axis: index of the latest valid entry at or
+    before it, and strictly before it (-1 = none)."""
+    idx = np.where(valid, np.arange(valid.shape[-1]), -1)
+    upto = np.maximum.accumulate(idx, axis=-1) if valid.shape[-1] else idx
+    before = np.full_like(upto, -1)
+    before[..., 1:] = upto[..., :-1]
+    return upto, before
+
+
+def _take(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """values[..., idx] along the last axis, NaN where idx < 0."""
+    picked = np.take_along_axis(values, np.maximum(idx, 0), axis=-1)
+    return np.where(idx >= 0, picked, np.nan)
+
+
+def _opt(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+@dataclass
+class FundKPIs:
+    """Every KPI for every company in a fund, as (companies × KPIs × periods) arrays.
+
+    ``values[c, k, p]`` is ``kpis[k]`` for ``company_ids[c]`` in ``periods[p]``;
+    NaN outside the company's trailing window or where the KPI doesn't apply.
+    ``kpis`` is the union of all companies' profiles — ``order`` lists, per
+    company, the KPIs compute() would return, in its order.
+    """
+    fund_id: str
+    as_of: Optional[str]
+    company_ids: List[str]
+    periods: List[str]
+    kpis: List[KPIDef]
+    values: np.ndarray
+    window: np.ndarray          # companies × periods — display periods
+    current_idx: np.ndarray     # companies × KPIs — period of the latest value (-1 = none)
+    pop_change: np.ndarray
+    pop_change_pct: np.ndarray
+    improving: np.ndarray
+    declining: np.ndarray
+    business_types: Dict[str, str]
+    order: Dict[str, List[int]]
+    missing: Dict[str, List[str]]
+    empty: Dict[str, str] = field(default_factory=dict)  # company_id -> reason it has no KPIs
+
+    def matrix(self, key: str) -> np.ndarray:
+        """companies × periods values of KPI ``key`` (NaN where it doesn't apply)."""
+        out = np.full((len(self.company_ids), len(self.periods)), np.nan)
+        for c, cid in enumerate(self.company_ids):
+            for k in self.order.get(cid, ()):
+                if self.kpis[k].key == key:
+                    out[c] = self.values[c, k]
+        return out
+
+    def current(self, key: str) -> np.ndarray:
+        """Latest value of KPI ``key`` per company (NaN where none)."""
+        m = self.matrix(key)
+        if not m.shape[1]:
+            return np.full(len(self.company_ids), np.nan)
+        upto, _ = _last_valid(~np.isnan(m))
+        return _take(m, upto[:, -1:])[:, 0]
+
+    def snapshot(self, company_id: str) -> KPISnapshot:
+        """The KPISnapshot KPIEngine.compute() returns for this company."""
+        business_type = self.business_types.get(company_id, "universal")
+        if company_id in self.empty or company_id not in self.order:
+            return KPISnapshot(
+                company_id=company_id,
+                business_type=business_type,
+                as_of=self.as_of or "unknown",
+                periods_available=0,
+                missing_data=[self.empty.get(company_id, "No actuals data found")],
+            )
+        c = self.company_ids.index(company_id)
+        cols = np.flatnonzero(self.window[c])
+        position = {int(j): i for i, j in enumerate(cols)}
+        results: List[KPIResult] = []
+        for k in self.order[company_id]:
+            kpi_def = self.kpis[k]
+            series = []
+            for j in cols:
+                value = _opt(self.values[c, k, j])
+                series.append(KPIValue(
+                    value=value,
+                    period=self.periods[j],
+                    formatted=_format_value(value, kpi_def.format_type),
+                ))
+            cur = int(self.current_idx[c, k])
+            n_valid = sum(1 for v in series if v.value is not None)
+            improving = int(self.improving[c, k])
+            declining = int(self.declining[c, k])
+            trend = None
+            if n_valid >= 2:
+                trend = "improving" if improving > declining else "declining" if declining > improving else "stable"
+            results.append(KPIResult(
+                key=kpi_def.key,
+                label=kpi_def.label,
+                description=kpi_def.description,
+                category=kpi_def.category,
+                format_type=kpi_def.format_type,
+                current=series[position[cur]] if cur >= 0 else None,
+                series=series,
+                pop_change=_opt(self.pop_change[c, k]),
+                pop_change_pct=_opt(self.pop_change_pct[c, k]),
+                trend=trend,
+                periods_improving=improving if trend else 0,
+                periods_declining=declining if trend else 0,
+            ))
+        return KPISnapshot(
+            company_id=company_id,
+            business_type=business_type,
+            as_of=self.periods[cols[-1]],
+            periods_available=len(cols),
+            kpis=results,
+            missing_data=self.missing.get(company_id, []),
+        )
+
+    def snapshots(self) -> Dict[str, KPISnapshot]:
+        return {cid: self.snapshot(cid) for cid in self.company_ids}
+
+
 # ---------------------------------------------------------------------------
 # Engine
 # ---------------------------------------------------------------------------
@@ -904,6 +1189,181 @@ class KPIEngine:
             missing_data=sorted(set(missing)),
         )
 
+    def compute_fund(
+        self,
+        fund: "FundCompanies",
+        as_of: Optional[str] = None,
+        periods: int = 12,
+    ) -> FundKPIs:
+        """compute() for every company in a pull_fund_companies() result at once.
+
+        Actuals are aligned into a (companies × categories × periods) array
+        and each KPIDef.vector is evaluated for all companies and periods in
+        one expression; deltas and trends are array reductions. No queries
+        beyond the fund's fund_type (cached) — profiles come from the pull.
+        """
+        fund_type = self._get_fund_type(fund.fund_id)
+        company_ids = list(fund.company_ids)
+
+        # 1. Profiles — one resolution per distinct (business_model, sector)
+        resolved: Dict[Tuple[Optional[str], Optional[str]], Tuple[str, List[KPIDef]]] = {}
+        profiles: Dict[str, Tuple[str, List[KPIDef]]] = {}
+        for cid in company_ids:
+            meta = fund.profiles.get(cid)
+            if meta is None:
+                business_model, sector, _ = self._get_company_type(cid)
+            else:
+                business_model, sector = meta.get("revenue_model"), meta.get("sector")
+            key = (business_model, sector)
+            if key not in resolved:
+                resolved[key] = _resolve_profile(business_model, sector, fund_type)
+            profiles[cid] = resolved[key]
+
+        kpis: List[KPIDef] = []
+        kpi_index: Dict[int, int] = {}
+        for _, extra in resolved.values():
+            for kpi_def in UNIVERSAL_KPIS + extra:
+                if id(kpi_def) not in kpi_index:
+                    kpi_index[id(kpi_def)] = len(kpis)
+                    kpis.append(kpi_def)
+
+        # 2. Align actuals: shared period axis (<= as_of), top-level categories
+        series_by_company: List[Dict[str, Dict[str, float]]] = []
+        all_periods: set = set()
+        categories: Dict[str, int] = {}
+        for cid in company_ids:
+            cd = fund.company_data.get(cid)
+            ts = cd.time_series if cd is not None else {}
+            series_by_company.append(ts)
+            for cat, cat_data in ts.items():
+                all_periods.update(cat_data.keys())
+                if ":" not in cat:
+                    categories.setdefault(cat, len(categories))
+        axis = sorted(p for p in all_periods if not as_of or p <= as_of)
+        col = {p: j for j, p in enumerate(axis)}
+
+        n_c, n_p = len(company_ids), len(axis)
+        values = np.full((n_c, len(categories), n_p), np.nan)
+        has = np.zeros((n_c, n_p), dtype=bool)
+        for c, ts in enumerate(series_by_company):
+            for cat, cat_data in ts.items():
+                i = categories.get(cat)
+                for period, amount in cat_data.items():
+                    j = col.get(period)
+                    if j is None:
+                        continue
+                    has[c, j] = True
+                    if i is not None:
+                        values[c, i, j] = amount
+
+        # 3. Per-company previous period and trailing window (sorted_periods[-periods:])
+        _, prev_idx = _last_valid(has)
+        rank = np.cumsum(has, axis=1) - 1
+        count = has.sum(axis=1)
+        start = np.maximum(count - periods, 0) if periods > 0 else np.minimum(-periods, count)
+        window = has & (rank >= start[:, None])
+
+        # 4. Applicable KPIs per company, in compute() order
+        order: Dict[str, List[int]] = {}
+        missing: Dict[str, List[str]] = {}
+        empty: Dict[str, str] = {}
+        applicable = np.zeros((n_c, len(kpis)), dtype=bool)
+        for c, cid in enumerate(company_ids):
+            ts = series_by_company[c]
+            if not ts:
+                empty[cid] = "No actuals data found"
+                continue
+            if not count[c]:
+                empty[cid] = "No periods in range"
+                continue
+            available = set(ts.keys())
+            reqs_missing: List[str] = []
+            order[cid] = []
+            for kpi_def in UNIVERSAL_KPIS + profiles[cid][1]:
+                gaps = [r for r in kpi_def.requires if r not in available]
+                if gaps:
+                    reqs_missing.extend(gaps)
+                    continue
+                k = kpi_index[id(kpi_def)]
+                order[cid].append(k)
+                applicable[c, k] = True
+            missing[cid] = sorted(set(reqs_missing))
+
+        # 5. Evaluate every KPI for every company / period
+        frame = _Frame(values, list(categories), prev_idx)
+        out = np.full((n_c, len(kpis), n_p), np.nan)
+        for k, kpi_def in enumerate(kpis):
+            rows = applicable[:, k]
+            if not rows.any():
+                continue
+            if kpi_def.vector is not None:
+                computed = kpi_def.vector(frame)
+            else:
+                computed = self._compute_scalar(kpi_def, series_by_company, axis, has, rows)
+            out[:, k] = np.where(window & rows[:, None], computed, np.nan)
+
+        # 6. Current value, period-over-period change and trend counts
+        valid = ~np.isnan(out)
+        upto, before = _last_valid(valid)
+        if n_p:
+            current_idx = upto[..., -1]
+            prior_idx = np.take_along_axis(before, np.maximum(current_idx, 0)[..., None], axis=-1)[..., 0]
+            prior_idx = np.where(current_idx >= 0, prior_idx, -1)
+            current = _take(out, current_idx[..., None])[..., 0]
+            prior = _take(out, prior_idx[..., None])[..., 0]
+        else:
+            current_idx = np.full((n_c, len(kpis)), -1)
+            current = prior = np.full((n_c, len(kpis)), np.nan)
+        pop_change = current - prior
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pop_change_pct = np.where((prior != 0) & ~np.isnan(prior), pop_change / np.abs(prior), np.nan)
+
+        diff = out - _take(out, before)
+        higher = np.array([kpi_def.higher_is_better for kpi_def in kpis], dtype=bool)[None, :, None]
+        with np.errstate(invalid="ignore"):
+            up, down = diff > 0, diff < 0
+        improving = np.where(higher, up, down).sum(axis=-1)
+        declining = np.where(higher, down, up).sum(axis=-1)
+
+        return FundKPIs(
+            fund_id=fund.fund_id,
+            as_of=as_of,
+            company_ids=company_ids,
+            periods=axis,
+            kpis=kpis,
+            values=out,
+            window=window,
+            current_idx=current_idx,
+            pop_change=pop_change,
+            pop_change_pct=pop_change_pct,
+            improving=improving,
+            declining=declining,
+            business_types={cid: profiles[cid][0] for cid in company_ids},
+            order=order,
+            missing=missing,
+            empty=empty,
+        )
+
+    @staticmethod
+    def _compute_scalar(
+        kpi_def: KPIDef,
+        series_by_company: List[Dict[str, Dict[str, float]]],
+        axis: List[str],
+        has: np.ndarray,
+        rows: np.ndarray,
+    ) -> np.ndarray:
+        """Per-period compute() loop for KPIDefs without a vector form."""
+        out = np.full(has.shape, np.nan)
+        for c in np.flatnonzero(rows):
+            cols = np.flatnonzero(has[c])
+            prev = None
+            for j in cols:
+                value = kpi_def.compute(series_by_company[c], axis[j], prev)
+                if value is not None:
+                    out[c, j] = value
+                prev = axis[j]
+        return out
+
     # ------------------------------------------------------------------
     # Data access
     # ------------------------------------------------------------------
@@ -911,37 +1371,25 @@ class KPIEngine:
     def _get_company_type(self, company_id: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """Fetch business_model, sector, and fund_type for a company."""
         try:
-            from app.core.supabase_client import get_supabase_client
-
-            sb = get_supabase_client()
-            if not sb:
-                return None, None, None
-            result = (
-                sb.table("companies")
-                .select("revenue_model, sector, fund_id")
-                .eq("id", company_id)
-                .limit(1)
-                .execute()
-            )
-            if result.data:
-                row = result.data[0]
-                fund_type = None
-                fund_id = row.get("fund_id")
-                if fund_id:
-                    fund_result = (
-                        sb.table("funds")
-                        .select("fund_type")
-                        .eq("id", fund_id)
-                        .limit(1)
-                        .execute()
-                    )
-                    if fund_result.data:
-                        fund_type = fund_result.data[0].get("fund_type")
-                return row.get("revenue_model"), row.get("sector"), fund_type
+            from app.core.data_access import fpa_data
+
+            profile = fpa_data.company_profile_sync(company_id)
+            return profile["revenue_model"], profile["sector"], profile["fund_type"]
         except Exception as e:
             logger.warning(f"[KPI] Failed to fetch company type: {e}")
         return None, None, None
 
+    def _get_fund_type(self, fund_id: Optional[str]) -> Optional[str]:
+        if not fund_id:
+            return None
+        try:
+            from app.core.data_access import fpa_data
+
+            return (fpa_data.fund_sync(fund_id) or {}).get("fund_type")
+        except Exception as e:
+            logger.warning(f"[KPI] Failed to fetch fund type: {e}")
+        return None
+
     def _fetch_actuals(self, company_id: str) -> Dict[str, Dict[str, float]]:
         """Fetch all actuals as {category: {period: amount}}."""
         try:
@@ -996,3 +1444,43 @@ def snapshot_to_dict(snap: KPISnapshot) -> Dict[str, Any]:
         "kpis": kpis,
         "missing_data": snap.missing_data,
     }
+
+
+def fund_kpis_to_dict(
+    fund_kpis: FundKPIs,
+    names: Optional[Dict[str, str]] = None,
+    include_series: bool = False,
+) -> Dict[str, Any]:
+    """Fund-wide KPIs for agent consumption: per-company snapshots plus the
+    cross-company distribution (p25 / median / p75) of each KPI's current value."""
+    names = names or {}
+    companies = {}
+    for cid in fund_kpis.company_ids:
+        snap = snapshot_to_dict(fund_kpis.snapshot(cid))
+        if not include_series:
+            for kpi in snap["kpis"]:
+                kpi.pop("series", None)
+        snap["name"] = names.get(cid, "")
+        companies[cid] = snap
+
+    benchmarks: Dict[str, Dict[str, Any]] = {}
+    for key in dict.fromkeys(k.key for k in fund_kpis.kpis):
+        current = fund_kpis.current(key)
+        current = current[~np.isnan(current)]
+        if not len(current):
+            continue
+        p25, p50, p75 = np.percentile(current, [25, 50, 75])
+        benchmarks[key] = {
+            "companies": int(len(current)),
+            "p25": round(float(p25), 4),
+            "median": round(float(p50), 4),
+            "p75": round(float(p75), 4),
+        }
+
+    return {
+        "fund_id": fund_kpis.fund_id,
+        "as_of": fund_kpis.as_of,
+        "company_count": len(fund_kpis.company_ids),
+        "companies": companies,
+        "benchmarks": benchmarks,
+    }
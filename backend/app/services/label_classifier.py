@@ -0,0 +1,451 @@
+"""
+Shared account-label classifier for CSV / ERP uploads.
+
+Every uploaded row label used to be scored with difflib against every
+category synonym, then re-scanned for a subcategory and (for balance
+sheets) an ERP account key — millions of SequenceMatcher calls for a
+5,000-line chart of accounts. This module precompiles those taxonomies
+into character-trigram inverted indexes once per process:
+
+    from app.services.label_classifier import label_classifier
+
+    label_classifier.match_category("Cost of sales")        # ("cogs", 1.0)
+    label_classifier.subcategory("AWS hosting", "saas")       # ("cogs", "hosting")
+    label_classifier.erp_account("accounts receivable")       # "bs_receivables"
+
+    labels = CompanyLabelMap(company_id, "saas").load()      # learned per company
+    labels.match_category("Cost of sales")
+    labels.save()                                            # persist new mappings
+
+Results are identical to the original linear scans:
+  - Containment ("synonym in label" / "label in synonym") is exact: a
+    string can only contain an entry whose trigrams it already has.
+  - Fuzzy scoring ranks synonyms by shared trigrams, scores the top-k with
+    SequenceMatcher, then skips the rest whose length / character-count
+    upper bound can't beat the best score so far.
+
+Results are memoized per (label, business_model); CompanyLabelMap stores
+them in fpa_label_mappings keyed by ``taxonomy_version``, so a re-upload of
+the same chart of accounts classifies from one read.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOP_K = 8                      # synonyms scored exactly before bound pruning
+_MEMO_SIZE = 65536              # memoized labels per lookup kind
+_CONTAINMENT_SCORE = 0.85       # boost when one string contains the other
+_SAVE_CHUNK = 500
+
+# Fuzzy category synonyms for upload row labels (P&L + balance sheet)
+CATEGORY_SYNONYMS: Dict[str, List[str]] = {
+    "revenue": ["revenue", "sales", "income", "turnover", "top line", "gross revenue"],
+    "cogs": ["cost of goods sold", "cost of sales", "direct costs", "cogs", "cost of revenue"],
+    "opex_rd": ["research and development", "r&d", "engineering", "product development", "technology"],
+    "opex_sm": ["sales and marketing", "s&m", "marketing", "commercial", "advertising"],
+    "opex_ga": ["general and administrative", "g&a", "admin", "overhead", "payroll",
+                "salaries", "wages", "compensation", "personnel", "staff costs",
+                "finance legal", "office", "rent", "occupancy", "establishment costs",
+                "premises", "insurance"],
+    "opex_total": ["operating expenses", "opex", "total expenses", "overheads", "indirect costs"],
+    "ebitda": ["ebitda", "operating income", "operating profit"],
+    "gross_profit": ["gross profit", "gross margin"],
+    "net_income": ["net income", "net profit", "net loss", "profit after tax", "pat",
+                   "earnings after tax", "bottom line"],
+    "depreciation": ["depreciation", "amortization", "d&a", "deprec"],
+    "interest_expense": ["interest expense", "finance costs", "debt service"],
+    "tax": ["tax", "income tax", "corporation tax", "provision for tax"],
+    "other_income": ["other income", "non operating income", "interest income", "sundry income"],
+    "ebt": ["profit before tax", "pbt", "earnings before tax", "ebt"],
+    "cash_balance": ["cash balance", "cash in bank", "bank balance", "cash"],
+    "burn_rate": ["burn rate", "monthly burn", "net burn"],
+    "headcount": ["headcount", "employees", "fte", "head count"],
+    "customers": ["customers", "clients"],
+    "arr": ["arr", "annual recurring revenue"],
+    "mrr": ["mrr", "monthly recurring revenue"],
+    # Balance Sheet fuzzy synonyms
+    "bs_cash": ["cash", "cash and cash equivalents", "bank", "bank accounts", "petty cash"],
+    "bs_receivables": ["accounts receivable", "trade debtors", "debtors", "trade receivables"],
+    "bs_inventory": ["inventory", "stock", "stock on hand", "raw materials", "finished goods"],
+    "bs_ppe": ["property plant and equipment", "fixed assets", "pp&e"],
+    "bs_intangibles": ["intangible assets", "goodwill", "patents", "software"],
+    "bs_payables": ["accounts payable", "trade creditors", "creditors", "trade payables"],
+    "bs_accrued_expenses": ["accrued expenses", "accrued liabilities", "accruals"],
+    "bs_deferred_revenue": ["deferred revenue", "unearned revenue", "contract liabilities"],
+    "bs_lt_debt": ["long term debt", "term loans", "bonds payable", "notes payable"],
+    "bs_convertible_notes": ["convertible notes", "convertible debt", "safe", "safe notes"],
+    "bs_lease_liabilities": ["lease liabilities", "finance lease", "operating lease liability"],
+    "bs_share_capital": ["share capital", "common stock", "ordinary shares", "issued capital"],
+    "bs_apic": ["additional paid in capital", "share premium", "capital surplus"],
+    "bs_retained_earnings": ["retained earnings", "accumulated profits", "retained profits"],
+    "bs_treasury_stock": ["treasury stock", "treasury shares", "own shares"],
+    "bs_minority_interest": ["minority interest", "non controlling interest"],
+}
+
+
+def _trigrams(text: str) -> frozenset:
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class TrigramIndex:
+    """Character-trigram inverted index over an ordered list of strings.
+
+    Entry order is preserved so callers can reproduce "first match wins"
+    scans. Strings shorter than three characters have no trigrams and are
+    checked directly.
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        self.texts: List[str] = list(texts)
+        self.grams: List[frozenset] = [_trigrams(t) for t in self.texts]
+        self._postings: Dict[str, List[int]] = {}
+        self._short: List[int] = []
+        for i, grams in enumerate(self.grams):
+            if not grams:
+                self._short.append(i)
+            for g in grams:
+                self._postings.setdefault(g, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _hits(self, grams: Iterable[str]) -> Counter:
+        hits: Counter = Counter()
+        for g in grams:
+            hits.update(self._postings.get(g, ()))
+        return hits
+
+    def contained_in(self, text: str) -> List[int]:
+        """Entries that are substrings of ``text``, in entry order."""
+        hits = self._hits(_trigrams(text))
+        found = [i for i, n in hits.items() if n == len(self.grams[i]) and self.texts[i] in text]
+        found.extend(i for i in self._short if self.texts[i] in text)
+        return sorted(found)
+
+    def containing(self, text: str) -> List[int]:
+        """Entries that contain ``text`` as a substring, in entry order."""
+        grams = _trigrams(text)
+        if not grams:
+            return [i for i, t in enumerate(self.texts) if text in t]
+        candidates = None
+        for g in grams:
+            posting = self._postings.get(g)
+            if not posting:
+                return []
+            candidates = set(posting) if candidates is None else candidates.intersection(posting)
+            if not candidates:
+                return []
+        return sorted(i for i in candidates if text in self.texts[i])
+
+    def ranked(self, text: str, k: int) -> List[int]:
+        """Top-k entries by trigram Dice similarity to ``text``."""
+        grams = _trigrams(text)
+        if not grams:
+            return []
+        hits = self._hits(grams)
+        size = len(grams)
+        return sorted(hits, key=lambda i: -2.0 * hits[i] / (size + len(self.grams[i])))[:k]
+
+
+class LabelClassifier:
+    """Process-wide, lazily built indexes + memoized lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._synonym_index: Optional[TrigramIndex] = None
+        self._synonym_categories: List[str] = []
+        self._synonym_counts: List[Counter] = []
+        self._subcategory_indexes: Dict[str, Tuple[TrigramIndex, List[Tuple[str, str]]]] = {}
+        self._keyword_index: Optional[Tuple[TrigramIndex, List[Tuple[str, str]]]] = None
+        self._erp_index: Optional[Tuple[TrigramIndex, List[str]]] = None
+        self._version: Optional[str] = None
+        # lru_cache per instance so clear() drops everything at once
+        self.best_category = lru_cache(maxsize=_MEMO_SIZE)(self._best_category)
+        self.subcategory = lru_cache(maxsize=_MEMO_SIZE)(self._subcategory)
+        self.erp_account = lru_cache(maxsize=_MEMO_SIZE)(self._erp_account)
+
+    # -- public ------------------------------------------------------------
+
+    def match_category(self, label: str, threshold: float = 0.65) -> Optional[tuple]:
+        """Fuzzy match a row label to a category. Returns (category, score) or None."""
+        category, score = self.best_category(label.lower().strip())
+        if category and score >= threshold:
+            return (category, round(score, 2))
+        return None
+
+    @property
+    def taxonomy_version(self) -> str:
+        """Hash of every taxonomy the lookups read — persisted mappings key on it."""
+        if self._version is None:
+            from app.services.actuals_ingestion import (
+                BUSINESS_MODEL_TAXONOMY,
+                SUBCATEGORY_KEYWORDS,
+                SUBCATEGORY_TAXONOMY,
+            )
+            payload = json.dumps(
+                [CATEGORY_SYNONYMS, SUBCATEGORY_TAXONOMY, BUSINESS_MODEL_TAXONOMY,
+                 [[list(k), v] for k, v in SUBCATEGORY_KEYWORDS.items()]],
+                sort_keys=True,
+            )
+            self._version = hashlib.sha1(payload.encode()).hexdigest()[:12]
+        return self._version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._synonym_index = None
+            self._subcategory_indexes.clear()
+            self._keyword_index = None
+            self._erp_index = None
+            self._version = None
+        for memo in (self.best_category, self.subcategory, self.erp_account):
+            memo.cache_clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "synonyms": len(self._synonym_index) if self._synonym_index else 0,
+            "subcategory_models": sorted(self._subcategory_indexes),
+            "memo": {
+                name: memo.cache_info()._asdict()
+                for name, memo in (
+                    ("category", self.best_category),
+                    ("subcategory", self.subcategory),
+                    ("erp_account", self.erp_account),
+                )
+            },
+        }
+
+    # -- category synonyms -------------------------------------------------
+
+    def _synonyms(self) -> TrigramIndex:
+        if self._synonym_index is None:
+            with self._lock:
+                if self._synonym_index is None:
+                    texts, categories = [], []
+                    for category, synonyms in CATEGORY_SYNONYMS.items():
+                        for synonym in synonyms:
+                            texts.append(synonym)
+                            categories.append(category)
+                    self._synonym_categories = categories
+                    self._synonym_counts = [Counter(t) for t in texts]
+                    self._synonym_index = TrigramIndex(texts)
+        return self._synonym_index
+
+    def _best_category(self, label: str) -> Tuple[Optional[str], float]:
+        """Best (category, score) over all synonyms — same result as scoring each
+        with SequenceMatcher (first synonym wins ties)."""
+        index = self._synonyms()
+        texts = index.texts
+        best_score, best_i = 0.0, len(texts)
+
+        def consider(i: int, score: float) -> None:
+            nonlocal best_score, best_i
+            if score > best_score or (score == best_score and i < best_i):
+                best_score, best_i = score, i
+
+        contained = set(index.contained_in(label)) | set(index.containing(label))
+        exact = contained | set(index.ranked(label, _TOP_K))
+        for i in sorted(exact):
+            score = SequenceMatcher(None, label, texts[i]).ratio()
+            if i in contained:
+                score = max(score, _CONTAINMENT_SCORE)
+            consider(i, score)
+
+        # Everything else scores ratio() alone; skip what can't beat the best
+        n = len(label)
+        label_counts: Optional[Counter] = None
+        for i, synonym in enumerate(texts):
+            if i in exact:
+                continue
+            total = n + len(synonym)
+            if not total:
+                continue
+            bound = 2.0 * min(n, len(synonym)) / total
+            if bound < best_score or (bound == best_score and i > best_i):
+                continue
+            if label_counts is None:
+                label_counts = Counter(label)
+            bound = 2.0 * sum((label_counts & self._synonym_counts[i]).values()) / total
+            if bound < best_score or (bound == best_score and i > best_i):
+                continue
+            consider(i, SequenceMatcher(None, label, synonym).ratio())
+
+        if best_score <= 0.0:
+            return None, 0.0
+        return self._synonym_categories[best_i], best_score
+
+    # -- subcategory taxonomy ------------------------------------------------
+
+    def _taxonomy(self, business_model: str) -> Tuple[TrigramIndex, List[Tuple[str, str]]]:
+        key = business_model.lower()
+        entry = self._subcategory_indexes.get(key)
+        if entry is None:
+            from app.services.actuals_ingestion import get_taxonomy_for_model
+
+            pairs = [(cat, sub) for cat, subs in get_taxonomy_for_model(key).items() for sub in subs]
+            entry = (TrigramIndex(sub for _, sub in pairs), pairs)
+            self._subcategory_indexes[key] = entry
+        return entry
+
+    def _keywords(self) -> Tuple[TrigramIndex, List[Tuple[str, str]]]:
+        if self._keyword_index is None:
+            from app.services.actuals_ingestion import SUBCATEGORY_KEYWORDS
+
+            pairs = [target for target, keywords in SUBCATEGORY_KEYWORDS.items() for _ in keywords]
+            texts = [kw for keywords in SUBCATEGORY_KEYWORDS.values() for kw in keywords]
+            self._keyword_index = (TrigramIndex(texts), pairs)
+        return self._keyword_index
+
+    def _subcategory(self, label: str, business_model: str = "saas") -> Tuple[str, str]:
+        """(category, subcategory) for a line-item label, ("", "") if none."""
+        normalized = label.lower().strip().replace("-", "_").replace(" ", "_")
+
+        # Direct subcategory match — first taxonomy entry either way round
+        index, pairs = self._taxonomy(business_model)
+        hits = index.contained_in(normalized) + index.containing(normalized)
+        if hits:
+            return pairs[min(hits)]
+
+        # Keyword fallback — first (category, subcategory) with any keyword hit
+        index, pairs = self._keywords()
+        hits = index.contained_in(normalized)
+        if hits:
+            return pairs[hits[0]]
+        return ("", "")
+
+    # -- ERP balance-sheet accounts ------------------------------------------
+
+    def _erp(self) -> Tuple[TrigramIndex, List[str]]:
+        if self._erp_index is None:
+            from app.services.balance_sheet_builder import ERP_ACCOUNT_MAP
+
+            self._erp_index = (TrigramIndex(ERP_ACCOUNT_MAP), list(ERP_ACCOUNT_MAP.values()))
+        return self._erp_index
+
+    def _erp_account(self, normalized: str) -> Optional[str]:
+        """Category of the longest ERP_ACCOUNT_MAP key inside ``normalized``."""
+        index, categories = self._erp()
+        best, best_len = None, 0
+        for i in index.contained_in(normalized):
+            if len(index.texts[i]) > best_len:
+                best, best_len = categories[i], len(index.texts[i])
+        return best
+
+
+# Singleton — import this everywhere
+label_classifier = LabelClassifier()
+
+
+# ---------------------------------------------------------------------------
+# Per-company learned mappings
+# ---------------------------------------------------------------------------
+
+class CompanyLabelMap:
+    """Label classifications a company has already seen, backed by fpa_label_mappings.
+
+    Lookups hit the loaded map first and fall back to ``label_classifier``;
+    new results are queued and written by ``save()``. Rows written under an
+    older taxonomy version are ignored, so editing a synonym list never serves a
+    stale mapping. Storage errors are logged and never fail an upload.
+    """
+
+    def __init__(self, company_id: Optional[str], business_model: str = "saas"):
+        self.company_id = company_id
+        self.business_model = (business_model or "saas").lower()
+        self.version = label_classifier.taxonomy_version
+        self._categories: Dict[str, Tuple[Optional[str], float]] = {}
+        self._subcategories: Dict[str, Tuple[str, str]] = {}
+        self._new: List[Dict[str, Any]] = []
+        self.loaded = 0
+
+    def load(self) -> "CompanyLabelMap":
+        if not self.company_id:
+            return self
+        from app.core.supabase_client import get_supabase_client
+
+        sb = get_supabase_client()
+        if not sb:
+            return self
+        try:
+            rows = (
+                sb.table("fpa_label_mappings")
+                .select("kind, label, business_model, category, subcategory, score")
+                .eq("company_id", self.company_id)
+                .eq("taxonomy_version", self.version)
+                .execute()
+                .data
+            ) or []
+        except Exception as e:
+            logger.warning("[label-map] load failed for %s: %s", self.company_id, e)
+            return self
+        for row in rows:
+            if row["kind"] == "category":
+                self._categories[row["label"]] = (row.get("category"), float(row.get("score") or 0.0))
+            elif row.get("business_model") == self.business_model:
+                self._subcategories[row["label"]] = (row.get("category") or "", row.get("subcategory") or "")
+        self.loaded = len(rows)
+        return self
+
+    def match_category(self, label: str, threshold: float = 0.65) -> Optional[tuple]:
+        key = label.lower().strip()
+        hit = self._categories.get(key)
+        if hit is None:
+            hit = label_classifier.best_category(key)
+            self._categories[key] = hit
+            self._queue("category", key, "", hit[0], "", hit[1])
+        category, score = hit
+        if category and score >= threshold:
+            return (category, round(score, 2))
+        return None
+
+    def subcategory(self, label: str) -> Tuple[str, str]:
+        hit = self._subcategories.get(label)
+        if hit is None:
+            hit = label_classifier.subcategory(label, self.business_model)
+            self._subcategories[label] = hit
+            self._queue("subcategory", label, self.business_model, hit[0], hit[1], None)
+        return hit
+
+    def _queue(self, kind: str, label: str, business_model: str,
+               category: Optional[str], subcategory: str, score: Optional[float]) -> None:
+        if self.company_id:
+            self._new.append({
+                "company_id": self.company_id,
+                "kind": kind,
+                "label": label,
+                "business_model": business_model,
+                "category": category,
+                "subcategory": subcategory,
+                "score": score,
+                "taxonomy_version": self.version,
+                "updated_at": datetime.utcnow().isoformat(),
+            })
+
+    def save(self) -> int:
+        """Upsert mappings learned since load(); returns rows written."""
+        if not self._new:
+            return 0
+        from app.core.supabase_client import get_supabase_client
+
+        sb = get_supabase_client()
+        if not sb:
+            return 0
+        rows, self._new = self._new, []
+        try:
+            for i in range(0, len(rows), _SAVE_CHUNK):
+                sb.table("fpa_label_mappings").upsert(
+                    rows[i:i + _SAVE_CHUNK],
+                    on_conflict="company_id,kind,business_model,label",
+                ).execute()
+        except Exception as e:
+            logger.warning("[label-map] save failed for %s: %s", self.company_id, e)
+            return 0
+        return len(rows)
@@ -25,7 +25,9 @@ Growth driver types per subcategory:
 import logging
 import math
 from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from app.services.actuals_ingestion import SUBCOMPONENT_TAXONOMY
 
@@ -119,6 +121,22 @@ SUBCATEGORY_PAYMENT_TIMING = {
     "insurance":             {"dpo": 0},    # prepaid quarterly
 }
 
+# Default split of a salary subcategory into its subcomponents
+_COMP_DEFAULTS = {
+    "base_pay": 0.62, "bonus": 0.10, "benefits": 0.15,
+    "equity_comp": 0.08, "payroll_tax": 0.05,
+}
+
+# Default one-way shock grid for runway_sensitivity (fractional change)
+DEFAULT_SENSITIVITY_SHOCKS = (-0.20, 0.20)
+
+# Metrics recorded per path by LiquidityManagementService.build_liquidity_paths
+PATH_METRICS = (
+    "revenue", "cogs", "gross_profit", "total_opex", "ebitda",
+    "net_income", "operating_cash_flow", "free_cash_flow",
+    "net_cash_flow", "cash_balance", "runway_months",
+)
+
 
 class LiquidityManagementService:
     """Advanced granular cash flow planning with subcategory-level modeling."""
@@ -149,19 +167,8 @@ class LiquidityManagementService:
             scenario_overrides: Override any driver or assumption
             events: Discrete liquidity events list
         """
-        from app.services.company_data_pull import pull_company_data
-
-        cd = pull_company_data(company_id)
-        overrides = scenario_overrides or {}
-
-        # Merge events from overrides and explicit param
-        all_events = list(events or [])
-        all_events.extend(overrides.pop("events", []))
-
-        # Build the seed data
-        seed = cd.to_forecast_seed()
-        seed.update(overrides)
-        seed["events"] = all_events
+        cd, seed = self._load_seed(company_id, scenario_overrides, events)
+        all_events = seed["events"]
 
         # Pull subcategory actuals for anchoring
         subcategory_actuals = self._pull_subcategory_actuals(company_id)
@@ -169,11 +176,7 @@ class LiquidityManagementService:
 
         # Resolve start period
         if not start_period:
-            today = date.today()
-            m = today.month + 1
-            y = today.year + (1 if m > 12 else 0)
-            m = m if m <= 12 else m - 12
-            start_period = f"{y}-{m:02d}"
+            start_period = self._default_start_period()
 
         # Build monthly rows
         monthly = self._build_monthly_model(
@@ -197,33 +200,129 @@ class LiquidityManagementService:
             "events_applied": len(all_events),
         }
 
+    def build_liquidity_paths(
+        self,
+        company_id: str,
+        path_overrides: Dict[str, Any],
+        months: int = 24,
+        start_period: Optional[str] = None,
+        scenario_overrides: Optional[Dict[str, Any]] = None,
+        events: Optional[List[Dict[str, Any]]] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the monthly model for many scenario paths in one pass.
+
+        Same math as build_liquidity_model(), but company data and subcategory
+        actuals are pulled once and the monthly recurrence runs as NumPy array
+        ops over every path at once — N paths cost about one model build.
+
+        Args:
+            company_id: Company to model
+            path_overrides: Per-path driver values, each a 1-D array with one
+                value per path. Supported keys: growth_rate, gross_margin,
+                churn_rate, nrr, plus "opex_adjustments": {override_key: array}.
+            months: Forecast horizon (default 24)
+            start_period: "YYYY-MM" start (defaults to next month)
+            scenario_overrides: Scalar overrides shared by every path
+            events: Discrete liquidity events list (shared by every path)
+            inputs: Result of load_path_inputs() — pass it when building
+                several batches for the same company (e.g. chunked Monte
+                Carlo) so data is pulled once; start_period, overrides and
+                events are then taken from it.
+
+        Returns:
+            {"company_id", "start_period", "months", "n_paths", "periods",
+             "metrics": {metric: ndarray of shape (n_paths, months)}}
+        """
+        if inputs is None:
+            inputs = self.load_path_inputs(
+                company_id, scenario_overrides, events, start_period,
+            )
+
+        periods, metrics = self._build_monthly_paths(
+            inputs["seed"], inputs["cd"], inputs["subcategory_actuals"],
+            inputs["subcategory_proportions"], months, inputs["start_period"],
+            path_overrides,
+        )
+
+        n_paths = next(iter(metrics.values())).shape[0] if metrics else 0
+        return {
+            "company_id": company_id,
+            "start_period": inputs["start_period"],
+            "months": months,
+            "n_paths": n_paths,
+            "periods": periods,
+            "metrics": metrics,
+        }
+
+    def load_path_inputs(
+        self,
+        company_id: str,
+        scenario_overrides: Optional[Dict[str, Any]] = None,
+        events: Optional[List[Dict[str, Any]]] = None,
+        start_period: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Pull everything build_liquidity_paths() needs, once."""
+        cd, seed = self._load_seed(company_id, scenario_overrides, events)
+        return {
+            "cd": cd,
+            "seed": seed,
+            "subcategory_actuals": self._pull_subcategory_actuals(company_id),
+            "subcategory_proportions": seed.get("_subcategory_proportions", {}),
+            "start_period": start_period or self._default_start_period(),
+        }
+
+    def _load_seed(
+        self,
+        company_id: str,
+        scenario_overrides: Optional[Dict[str, Any]],
+        events: Optional[List[Dict[str, Any]]],
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Pull company data once and merge overrides + events into the seed."""
+        from app.services.company_data_pull import pull_company_data
+
+        cd = pull_company_data(company_id)
+        overrides = dict(scenario_overrides or {})
+
+        # Merge events from overrides and explicit param
+        all_events = list(events or [])
+        all_events.extend(overrides.pop("events", []))
+
+        # Build the seed data
+        seed = cd.to_forecast_seed()
+        seed.update(overrides)
+        seed["events"] = all_events
+        return cd, seed
+
+    @staticmethod
+    def _default_start_period() -> str:
+        """Next calendar month as "YYYY-MM"."""
+        today = date.today()
+        m = today.month + 1
+        y = today.year + (1 if m > 12 else 0)
+        m = m if m <= 12 else m - 12
+        return f"{y}-{m:02d}"
+
     # ------------------------------------------------------------------
     # Core monthly model
     # ------------------------------------------------------------------
 
-    def _build_monthly_model(
-        self,
-        seed: Dict[str, Any],
-        cd: Any,  # CompanyData
-        subcategory_actuals: Dict[str, Dict[str, List[float]]],
-        subcategory_proportions: Dict[str, Dict[str, float]],
-        months: int,
-        start_period: str,
-    ) -> List[Dict[str, Any]]:
-        """Build month-by-month P&L with full subcategory decomposition."""
-
-        # ── Revenue inputs ────────────────────────────────────────────
-        # _revenue_trajectory: pre-computed monthly revenue from ModelSpecExecutor
-        # (custom curves like logistic, gompertz, S-curve). When present, these
-        # override the simple growth-rate model entirely.
-        _revenue_trajectory_raw = seed.get("_revenue_trajectory")
+    @staticmethod
+    def _revenue_trajectory_index(seed: Dict[str, Any]) -> Dict[str, float]:
+        """Index a pre-computed _revenue_trajectory (ModelSpec curves) by period."""
         _revenue_trajectory: Dict[str, float] = {}
-        if _revenue_trajectory_raw:
-            for entry in _revenue_trajectory_raw:
-                p = entry.get("period", "")
-                r = entry.get("revenue", 0)
-                if p and r:
-                    _revenue_trajectory[p] = float(r)
+        for entry in seed.get("_revenue_trajectory") or []:
+            p = entry.get("period", "")
+            r = entry.get("revenue", 0)
+            if p and r:
+                _revenue_trajectory[p] = float(r)
+        return _revenue_trajectory
+
+    @staticmethod
+    def _starting_monthly_revenue(seed: Dict[str, Any], cd: Any) -> Tuple[float, float]:
+        """Resolve (first-forecast-month revenue, seed base revenue)."""
+        base_revenue = seed.get("revenue") or seed.get("arr") or 0
 
         # Derive starting monthly revenue from the historical trend, not just the last point.
         # This extrapolates where revenue *should* be at the start of the forecast based
@@ -251,7 +350,6 @@ class LiquidityManagementService:
 
         if not monthly_revenue:
             # Fallback to seed value; revenue from to_forecast_seed is monthly so use directly
-            base_revenue = seed.get("revenue") or seed.get("arr") or 0
             # Only divide by 12 when caller explicitly passes annual ARR (no _monthly_revenue tag)
             if seed.get("_monthly_revenue") is not None:
                 monthly_revenue = float(seed["_monthly_revenue"])
@@ -260,6 +358,26 @@ class LiquidityManagementService:
             else:
                 monthly_revenue = float(base_revenue)
 
+        return monthly_revenue, base_revenue
+
+    def _build_monthly_model(
+        self,
+        seed: Dict[str, Any],
+        cd: Any,  # CompanyData
+        subcategory_actuals: Dict[str, Dict[str, List[float]]],
+        subcategory_proportions: Dict[str, Dict[str, float]],
+        months: int,
+        start_period: str,
+    ) -> List[Dict[str, Any]]:
+        """Build month-by-month P&L with full subcategory decomposition."""
+
+        # ── Revenue inputs ────────────────────────────────────────────
+        # _revenue_trajectory: pre-computed monthly revenue from ModelSpecExecutor
+        # (custom curves like logistic, gompertz, S-curve). When present, these
+        # override the simple growth-rate model entirely.
+        _revenue_trajectory = self._revenue_trajectory_index(seed)
+        monthly_revenue, base_revenue = self._starting_monthly_revenue(seed, cd)
+
         growth_rate = seed.get("growth_rate", 0.30)
         growth_rate = max(-0.5, min(growth_rate, 3.0))
         monthly_growth = (1 + growth_rate) ** (1 / 12) - 1
@@ -619,6 +737,10 @@ class LiquidityManagementService:
         total = 0.0
 
         for subcat, base_amount in bases.items():
+            # _base_revenue / _base_headcount / _subcomp_* are reference
+            # values for the drivers, not spend lines
+            if subcat.startswith("_"):
+                continue
             if base_amount <= 0:
                 breakdown[subcat] = 0.0
                 continue
@@ -714,10 +836,6 @@ class LiquidityManagementService:
                 else:
                     # Use default proportions for salary subcategories
                     if driver == "headcount":
-                        _COMP_DEFAULTS = {
-                            "base_pay": 0.62, "bonus": 0.10, "benefits": 0.15,
-                            "equity_comp": 0.08, "payroll_tax": 0.05,
-                        }
                         for comp_name in subcomponents:
                             pct = _COMP_DEFAULTS.get(comp_name, 1.0 / len(subcomponents))
                             breakdown[f"{subcat}/{comp_name}"] = round(amount * pct, 2)
@@ -905,6 +1023,414 @@ class LiquidityManagementService:
 
         return detail, wc_delta
 
+    # ------------------------------------------------------------------
+    # Batched path model (vectorised over scenario paths)
+    # ------------------------------------------------------------------
+
+    def _build_monthly_paths(
+        self,
+        seed: Dict[str, Any],
+        cd: Any,  # CompanyData
+        subcategory_actuals: Dict[str, Dict[str, List[float]]],
+        subcategory_proportions: Dict[str, Dict[str, float]],
+        months: int,
+        start_period: str,
+        path_overrides: Dict[str, Any],
+    ) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """
+        Array twin of _build_monthly_model().
+
+        Every path-varying quantity is a float array of shape (n_paths,);
+        everything else stays scalar and broadcasts. Branches that depend on
+        a path-varying value become np.where so each path follows exactly
+        the branch the scalar model would take for it.
+
+        Returns (periods, {metric: ndarray (n_paths, months)}).
+        """
+        path_opex = dict(path_overrides.get("opex_adjustments") or {})
+        path_drivers = {k: v for k, v in path_overrides.items() if k != "opex_adjustments"}
+        lengths = {len(np.atleast_1d(v)) for v in [*path_drivers.values(), *path_opex.values()]}
+        if len(lengths) > 1:
+            raise ValueError(f"path_overrides arrays differ in length: {sorted(lengths)}")
+        n = lengths.pop() if lengths else 1
+
+        def _vec(value: Any) -> np.ndarray:
+            return np.broadcast_to(np.asarray(value, dtype=float), (n,)).copy()
+
+        # ── Revenue inputs ────────────────────────────────────────────
+        _revenue_trajectory = self._revenue_trajectory_index(seed)
+        monthly_revenue, base_revenue = self._starting_monthly_revenue(seed, cd)
+
+        growth_rate = np.clip(_vec(path_drivers.get("growth_rate", seed.get("growth_rate", 0.30))), -0.5, 3.0)
+        monthly_growth = (1 + growth_rate) ** (1 / 12) - 1
+
+        gross_margin = _vec(path_drivers.get("gross_margin", seed.get("gross_margin", 0.65)))
+
+        # ── Customer-level model inputs ───────────────────────────────
+        churn_rate = path_drivers.get("churn_rate", seed.get("churn_rate"))
+        nrr = path_drivers.get("nrr", seed.get("nrr"))
+        acv = seed.get("acv_override")
+        new_cust_growth = seed.get("new_customer_growth_rate")
+        pricing_pct = seed.get("pricing_pct_change")
+        sales_cycle = seed.get("sales_cycle_months", 0)
+        use_customer_model = any(v is not None for v in [churn_rate, nrr, new_cust_growth, acv])
+        customer_revenue = bool(use_customer_model and acv and acv > 0)
+
+        if customer_revenue:
+            existing_customers = _vec(base_revenue / acv)
+        else:
+            existing_customers = _vec(seed.get("_detected_customer_count", 0) or 0)
+        new_customer_pipeline: List[np.ndarray] = []
+
+        monthly_acv = acv / 12 if customer_revenue else 0.0
+        churn_vec = np.clip(_vec(churn_rate), 0, 0.20) if churn_rate is not None else None
+        nrr_vec = _vec(nrr) if nrr is not None else _vec(1.0)
+        retention_mult = np.where(nrr_vec == 0, 1.0, nrr_vec) ** (1 / 12)
+        pipeline_growth = max(0, min(new_cust_growth, 0.15)) if new_cust_growth is not None else None
+        pricing_mult = 1 + (pricing_pct or 0)
+
+        # ── Headcount inputs ──────────────────────────────────────────
+        headcount = seed.get("headcount") or 0
+        hiring_monthly = seed.get("hiring_plan_monthly", 0)
+
+        # ── Capital structure inputs ──────────────────────────────────
+        cash_balance = _vec(seed.get("cash_balance") or 0)
+        outstanding_debt = seed.get("outstanding_debt", 0)
+        debt_service = seed.get("debt_service_monthly", 0)
+        interest_rate_annual = seed.get("interest_rate", 0)
+        tax_rate = seed.get("tax_rate", 0)
+        capex_abs = seed.get("capex_override")
+
+        # ── Working capital defaults ──────────────────────────────────
+        dso = seed.get("dso", 45)
+        dpo = seed.get("dpo", 30)
+        dio = seed.get("dio", 0)
+
+        cac = seed.get("cac_override")
+
+        events_by_period: Dict[str, List[Dict[str, Any]]] = {}
+        for evt in seed.get("events", []):
+            events_by_period.setdefault(evt.get("period", ""), []).append(evt)
+
+        opex_adjustments = {**seed.get("opex_adjustments", {}), **path_opex}
+
+        # ── Subcategory bases ─────────────────────────────────────────
+        subcat_bases = self._resolve_subcategory_bases(
+            subcategory_actuals, subcategory_proportions, seed,
+        )
+        # COGS decomposed from proportions is anchored on revenue × (1 - GM),
+        # so a per-path gross margin gives per-path COGS bases.
+        if (
+            "gross_margin" in path_drivers
+            and not subcategory_actuals.get("cogs")
+            and subcategory_proportions.get("cogs")
+        ):
+            cogs_parent = (seed.get("revenue", 0) or 0) * (1 - gross_margin)
+            cogs_bases: Dict[str, Any] = {
+                subcat: np.where(cogs_parent > 0, cogs_parent * pct, 0.0)
+                for subcat, pct in subcategory_proportions["cogs"].items()
+            }
+            cogs_bases["_base_revenue"] = seed.get("revenue", 0) or 0
+            cogs_bases["_base_headcount"] = seed.get("headcount", 0) or 0
+            cogs_bases["_base_customers"] = seed.get("_detected_customer_count", 0) or 0
+            subcat_bases["cogs"] = cogs_bases
+
+        wc_state: Dict[str, Any] = {
+            "prev_ar": 0.0, "prev_ap": 0.0, "prev_inv": 0.0, "prev_prepaid": 0.0,
+        }
+
+        metrics = {m: np.empty((n, months)) for m in PATH_METRICS}
+        periods: List[str] = []
+        y, m = int(start_period[:4]), int(start_period[5:7])
+
+        for i in range(months):
+            period_y = y + (m + i - 1) // 12
+            period_m = (m + i - 1) % 12 + 1
+            period = f"{period_y}-{period_m:02d}"
+            periods.append(period)
+
+            # ── Revenue ───────────────────────────────────────────────
+            growth_revenue = monthly_revenue * (1 + monthly_growth) ** i
+            if _revenue_trajectory and period in _revenue_trajectory:
+                revenue = _vec(_revenue_trajectory[period])
+            elif customer_revenue:
+                if churn_vec is not None:
+                    existing_customers = existing_customers * (1 - churn_vec)
+                existing_rev = existing_customers * monthly_acv * retention_mult
+                recognized: Any = 0.0
+                if pipeline_growth is not None:
+                    new_customer_pipeline.append(existing_customers * pipeline_growth)
+                    if len(new_customer_pipeline) > sales_cycle:
+                        recognized = new_customer_pipeline[-(sales_cycle + 1)]
+                        existing_customers = existing_customers + recognized
+                else:
+                    new_customer_pipeline.append(np.zeros(n))
+                revenue = (existing_rev + recognized * monthly_acv) * pricing_mult
+                # Fallback to growth model
+                revenue = np.where(revenue <= 0, growth_revenue, revenue)
+            else:
+                revenue = growth_revenue
+
+            # ── COGS ──────────────────────────────────────────────────
+            cogs_total, cogs_breakdown = self._compute_subcategory_spend_paths(
+                "cogs", subcat_bases.get("cogs", {}), i, revenue, headcount,
+                existing_customers, None, np.zeros(n), opex_adjustments, n,
+            )
+            # Paths with no COGS subcategory spend fall back to gross margin
+            cogs_from_subcats = cogs_total > 0
+            cogs_total = np.where(cogs_from_subcats, cogs_total, revenue * (1 - gross_margin))
+            gross_profit = revenue - cogs_total
+
+            # ── New customers this period ─────────────────────────────
+            if new_customer_pipeline:
+                new_custs = new_customer_pipeline[-1]
+            elif new_cust_growth:
+                new_custs = np.where(existing_customers > 0, existing_customers * new_cust_growth, 0.0)
+            else:
+                new_custs = np.zeros(n)
+
+            # ── OpEx ──────────────────────────────────────────────────
+            rd_total, rd_breakdown = self._compute_subcategory_spend_paths(
+                "opex_rd", subcat_bases.get("opex_rd", {}), i, revenue, headcount,
+                existing_customers, None, new_custs, opex_adjustments, n,
+            )
+            sm_total, sm_breakdown = self._compute_subcategory_spend_paths(
+                "opex_sm", subcat_bases.get("opex_sm", {}), i, revenue, headcount,
+                existing_customers, cac, new_custs, opex_adjustments, n,
+            )
+            ga_total, ga_breakdown = self._compute_subcategory_spend_paths(
+                "opex_ga", subcat_bases.get("opex_ga", {}), i, revenue, headcount,
+                existing_customers, None, new_custs, opex_adjustments, n,
+            )
+
+            if hiring_monthly:
+                headcount += hiring_monthly
+
+            total_opex = rd_total + sm_total + ga_total
+            ebitda = gross_profit - total_opex
+
+            # ── Below EBITDA ──────────────────────────────────────────
+            if capex_abs is not None:
+                capex = _vec(capex_abs)
+            else:
+                capex = np.where(revenue > 0, revenue * 0.03, 0.0)
+
+            interest_payment = outstanding_debt * (interest_rate_annual / 12)
+            total_debt_payment = debt_service + interest_payment
+            if debt_service > 0:
+                outstanding_debt = max(0, outstanding_debt - debt_service)
+
+            pre_tax_income = ebitda - capex - total_debt_payment
+            if tax_rate:
+                tax_expense = np.where(pre_tax_income > 0, np.maximum(0, pre_tax_income * tax_rate), 0.0)
+            else:
+                tax_expense = 0.0
+            net_income = pre_tax_income - tax_expense
+
+            depreciation = np.where(capex > 0, capex * 0.2 / 12, 0.0)
+
+            wc_delta = self._compute_working_capital_paths(
+                revenue, cogs_total, total_opex, cogs_from_subcats,
+                cogs_breakdown, rd_breakdown, sm_breakdown, ga_breakdown,
+                dso, dpo, dio, wc_state,
+            )
+
+            operating_cash_flow = net_income + depreciation - wc_delta
+            investing_cash_flow = -capex
+            financing_cash_flow = -total_debt_payment
+
+            # ── Liquidity events (shared by every path) ───────────────
+            for evt in events_by_period.get(period, []):
+                evt_type = evt.get("type", "")
+                evt_amount = float(evt.get("amount", 0))
+                if evt_type == "funding":
+                    financing_cash_flow += evt_amount
+                elif evt_type == "debt_drawdown":
+                    financing_cash_flow += evt_amount
+                    outstanding_debt += evt_amount
+                elif evt_type == "debt_repayment":
+                    financing_cash_flow -= abs(evt_amount)
+                    outstanding_debt = max(0, outstanding_debt - abs(evt_amount))
+                elif evt_type in ("one_time_cost", "one_time_revenue"):
+                    operating_cash_flow = operating_cash_flow + evt_amount
+                elif evt_type == "asset_purchase":
+                    investing_cash_flow = investing_cash_flow - abs(evt_amount)
+                elif evt_type == "asset_sale":
+                    investing_cash_flow = investing_cash_flow + evt_amount
+
+            net_cash_flow = operating_cash_flow + investing_cash_flow + financing_cash_flow
+            cash_balance = cash_balance + net_cash_flow
+
+            burning = net_cash_flow < 0
+            runway_months = np.where(
+                burning, cash_balance / np.where(burning, -net_cash_flow, 1.0), 999.0,
+            )
+
+            # Same rounding as the row dicts of _build_monthly_model
+            metrics["revenue"][:, i] = np.round(revenue, 2)
+            metrics["cogs"][:, i] = np.round(cogs_total, 2)
+            metrics["gross_profit"][:, i] = np.round(gross_profit, 2)
+            metrics["total_opex"][:, i] = np.round(total_opex, 2)
+            metrics["ebitda"][:, i] = np.round(ebitda, 2)
+            metrics["net_income"][:, i] = np.round(net_income, 2)
+            metrics["operating_cash_flow"][:, i] = np.round(operating_cash_flow, 2)
+            metrics["free_cash_flow"][:, i] = np.round(operating_cash_flow + investing_cash_flow, 2)
+            metrics["net_cash_flow"][:, i] = np.round(net_cash_flow, 2)
+            metrics["cash_balance"][:, i] = np.round(cash_balance, 2)
+            metrics["runway_months"][:, i] = np.round(np.maximum(0, runway_months), 1)
+
+        return periods, metrics
+
+    def _compute_subcategory_spend_paths(
+        self,
+        parent: str,
+        bases: Dict[str, Any],
+        month_idx: int,
+        revenue: np.ndarray,
+        headcount: float,
+        customers: np.ndarray,
+        cac: Optional[float],
+        new_customers: np.ndarray,
+        opex_adjustments: Dict[str, Any],
+        n: int,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Array twin of _compute_subcategory_spend() — same drivers, per path."""
+        total = np.zeros(n)
+        breakdown: Dict[str, np.ndarray] = {}
+        if not bases:
+            return total, breakdown
+
+        driver_config = SUBCATEGORY_GROWTH_DRIVERS.get(parent, {})
+
+        for subcat, base_amount in bases.items():
+            if subcat.startswith("_"):
+                continue
+            base = np.asarray(base_amount, dtype=float)
+
+            config = driver_config.get(subcat, {"driver": "linear", "monthly_growth": 0.005})
+            driver = config["driver"]
+
+            if driver == "headcount":
+                amount = base * (1 + 0.003) ** month_idx
+
+            elif driver == "usage":
+                elasticity = config.get("elasticity", 0.6)
+                scales_with = config.get("scales_with", "revenue")
+                fallback = base * (1 + 0.005) ** month_idx
+
+                if scales_with == "revenue":
+                    base_rev = bases.get("_base_revenue", 0)
+                    ratio = np.where(revenue > 0, revenue, 1.0) / base_rev if base_rev > 0 else 1.0
+                    amount = np.where(revenue > 0, base * (ratio ** elasticity), fallback)
+                elif scales_with == "headcount" and headcount > 0:
+                    base_hc = bases.get("_base_headcount", headcount)
+                    ratio = headcount / base_hc if base_hc > 0 else 1.0
+                    amount = base * (ratio ** elasticity)
+                elif scales_with == "customers":
+                    base_cust = bases.get("_base_customers", 0)
+                    ratio = np.where(customers > 0, customers, 1.0) / base_cust if base_cust > 0 else 1.0
+                    amount = np.where(customers > 0, base * (ratio ** elasticity), fallback)
+                else:
+                    amount = fallback
+
+            elif driver == "stepped":
+                step_interval = config.get("step_interval_months", 12)
+                step_pct = config.get("step_pct", 0.10)
+                amount = base * (1 + step_pct) ** (month_idx // step_interval)
+
+            elif driver == "cac_driven":
+                fallback = base * (1 + 0.008) ** month_idx
+                if cac is not None:
+                    amount = np.where(new_customers > 0, new_customers * cac, fallback)
+                else:
+                    amount = fallback
+
+            elif driver == "revenue_pct":
+                amount = revenue * config.get("pct", 0.029)
+
+            else:  # linear
+                amount = base * (1 + config.get("monthly_growth", 0.005)) ** month_idx
+
+            override_key = self._subcat_to_override_key(parent, subcat)
+            if override_key and override_key in opex_adjustments:
+                amount = amount * (1 + np.asarray(opex_adjustments[override_key], dtype=float))
+
+            # Non-positive bases contribute nothing, as in the scalar model
+            amount = np.where(base > 0, np.maximum(0, amount), 0.0) + np.zeros(n)
+            breakdown[subcat] = amount
+            total += amount
+
+            subcomponents = SUBCOMPONENT_TAXONOMY.get(subcat)
+            if subcomponents:
+                subcomp_actuals = bases.get(f"_subcomp_{subcat}", {})
+                if subcomp_actuals:
+                    actual_total = sum(subcomp_actuals.values())
+                    if actual_total > 0:
+                        for comp_name, comp_actual in subcomp_actuals.items():
+                            breakdown[f"{subcat}/{comp_name}"] = amount * (comp_actual / actual_total)
+                elif driver == "headcount":
+                    for comp_name in subcomponents:
+                        pct = _COMP_DEFAULTS.get(comp_name, 1.0 / len(subcomponents))
+                        breakdown[f"{subcat}/{comp_name}"] = np.round(amount * pct, 2)
+
+        return total, breakdown
+
+    def _compute_working_capital_paths(
+        self,
+        revenue: np.ndarray,
+        cogs_total: np.ndarray,
+        opex_total: np.ndarray,
+        cogs_from_subcats: np.ndarray,
+        cogs_breakdown: Dict[str, np.ndarray],
+        rd_breakdown: Dict[str, np.ndarray],
+        sm_breakdown: Dict[str, np.ndarray],
+        ga_breakdown: Dict[str, np.ndarray],
+        dso: float,
+        dpo: float,
+        dio: float,
+        wc_state: Dict[str, Any],
+    ) -> np.ndarray:
+        """Array twin of _compute_working_capital(); returns the per-path WC delta."""
+        ar = (revenue / 30) * dso if dso > 0 else 0.0
+
+        ap = np.zeros_like(revenue)
+        for breakdown in (cogs_breakdown, rd_breakdown, sm_breakdown, ga_breakdown):
+            for subcat, amount in breakdown.items():
+                subcat_dpo = SUBCATEGORY_PAYMENT_TIMING.get(subcat, {}).get("dpo", dpo)
+                ap = ap + (amount / 30) * subcat_dpo
+
+        # Paths whose COGS fell back to gross margin carry no COGS lines; with
+        # no expense lines at all the scalar model uses the aggregate DPO.
+        has_expense_lines = bool(rd_breakdown or sm_breakdown or ga_breakdown) | (
+            bool(cogs_breakdown) & cogs_from_subcats
+        )
+        spend = cogs_total + opex_total
+        ap = np.where(
+            has_expense_lines, ap, np.where(spend > 0, (spend / 30) * dpo, 0.0),
+        )
+
+        inv = (cogs_total / 30) * dio if dio > 0 else 0.0
+
+        prepaid: Any = 0.0
+        for subcat in ("tools_licenses", "insurance"):
+            for breakdown in (rd_breakdown, ga_breakdown):
+                if subcat in breakdown:
+                    prepaid = prepaid + breakdown[subcat] * 0.5
+
+        wc_delta = (
+            (ar - wc_state["prev_ar"])
+            + (inv - wc_state["prev_inv"])
+            + (prepaid - wc_state["prev_prepaid"])
+            - (ap - wc_state["prev_ap"])
+        )
+
+        wc_state["prev_ar"] = ar
+        wc_state["prev_ap"] = ap
+        wc_state["prev_inv"] = inv
+        wc_state["prev_prepaid"] = prepaid
+
+        return wc_delta
+
     # ------------------------------------------------------------------
     # Subcategory data resolution
     # ------------------------------------------------------------------
@@ -990,25 +1516,15 @@ class LiquidityManagementService:
         are stored under the parent category with their full path as the key.
         """
         try:
-            from app.core.supabase_client import get_supabase_client
-            sb = get_supabase_client()
-            if not sb:
-                return {}
-
-            rows = (
-                sb.table("fpa_actuals")
-                .select("category, subcategory, hierarchy_path, amount, period")
-                .eq("company_id", company_id)
-                .neq("subcategory", "")
-                .order("period", desc=False)
-                .execute()
-                .data
-            ) or []
+            from app.core.data_access import fpa_data
+
+            # Shared (coalesced, cached) rows — ordered by period
+            rows = fpa_data.actuals_sync(company_id)
 
             result: Dict[str, Dict[str, List[float]]] = {}
             for row in rows:
                 cat = row.get("category", "")
-                sub = row.get("subcategory", "")
+                sub = row.get("subcategory") or ""
                 hierarchy = row.get("hierarchy_path", "")
                 amount = row.get("amount")
                 if not cat or not sub or amount is None:
@@ -1285,62 +1801,177 @@ class LiquidityManagementService:
         self,
         company_id: str,
         months: int = 24,
+        shocks: Optional[Sequence[float]] = None,
+        two_way: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """
-        Show how runway changes when individual cost lines change by ±20%.
+        Show how runway changes when individual cost lines change.
+
+        Company data and actuals are pulled once and the base model is built
+        once. Every (subcategory, shock) pair — and every cell of the two-way
+        tables — is then one path of a single build_liquidity_paths() pass:
+        the perturbation only moves that line's spend, and the kernel carries
+        it through COGS/OpEx, tax, working capital and the cash balance.
+
+        Args:
+            company_id: Company to model
+            months: Forecast horizon (default 24)
+            shocks: Fractional changes to test per line, e.g.
+                (-0.5, -0.2, -0.1, -0.05, 0.05, 0.1, 0.2, 0.5). ±20% is always
+                included so the legacy cut/increase fields stay populated.
+            two_way: Two-way runway tables over the shock grid — an int N
+                (pairs among the N lines with the largest month-1 spend) or
+                a list of ["opex_rd/cloud", "opex_sm/paid_acquisition"] pairs.
 
         Returns a ranked list of which subcategories have the most
-        impact on runway when cut or increased.
+        impact on runway when cut or increased, plus a tornado ranking.
         """
-        base = self.build_liquidity_model(company_id, months=months)
-        base_runway = base["summary"].get("ending_runway_months", 0)
+        inputs = self.load_path_inputs(company_id)
+        monthly = self._build_monthly_model(
+            inputs["seed"], inputs["cd"], inputs["subcategory_actuals"],
+            inputs["subcategory_proportions"], months, inputs["start_period"],
+        )
+        base = self._compute_summary(monthly, inputs["seed"])
+        base_runway = base.get("ending_runway_months", 0)
+        base_cash = base.get("ending_cash", 0)
 
-        sensitivities = []
+        grid = sorted({round(float(x), 6) for x in (shocks or ())} | set(DEFAULT_SENSITIVITY_SHOCKS))
+        grid = [x for x in grid if x != 0]
 
-        # Test each subcategory
+        # Lines to test: (category label, override key, month-1 spend)
+        lines: List[Tuple[str, str, float]] = []
+        first_subcats = monthly[0].get("subcategories", {}) if monthly else {}
         for parent in ("opex_rd", "opex_sm", "opex_ga", "cogs"):
-            subcats = base["monthly"][0].get("subcategories", {}).get(parent, {})
-            for subcat in subcats:
-                if subcat.startswith("_"):
+            for subcat, spend in first_subcats.get(parent, {}).items():
+                # Subcomponents ("salaries/base_pay") have no override of their own
+                if subcat.startswith("_") or "/" in subcat:
                     continue
-
                 override_key = self._subcat_to_override_key(parent, subcat)
-                if not override_key:
-                    continue
-
-                # Cut by 20%
-                cut_result = self.build_liquidity_model(
-                    company_id, months=months,
-                    scenario_overrides={"opex_adjustments": {override_key: -0.20}},
-                )
-                cut_runway = cut_result["summary"].get("ending_runway_months", 0)
+                if override_key:
+                    lines.append((f"{parent}/{subcat}", override_key, spend))
+
+        # One-way paths: line-major, shock-minor
+        adjustments: Dict[str, List[float]] = {key: [] for _, key, _ in lines}
+        for _, key, _ in lines:
+            for shock in grid:
+                for other in adjustments:
+                    adjustments[other].append(shock if other == key else 0.0)
+
+        # Two-way paths, appended after the one-way block
+        pairs = self._sensitivity_pairs(two_way, lines)
+        for key_a, key_b in pairs:
+            for shock_a in grid:
+                for shock_b in grid:
+                    for other in adjustments:
+                        adjustments[other].append(
+                            shock_a if other == key_a else shock_b if other == key_b else 0.0
+                        )
+
+        runway = cash = np.empty((0,))
+        if lines:
+            paths = self.build_liquidity_paths(
+                company_id,
+                path_overrides={"opex_adjustments": {k: np.asarray(v) for k, v in adjustments.items()}},
+                months=months,
+                inputs=inputs,
+            )
+            runway = np.round(paths["metrics"]["runway_months"][:, -1], 1)
+            cash = np.round(paths["metrics"]["cash_balance"][:, -1], 2)
 
-                # Increase by 20%
-                inc_result = self.build_liquidity_model(
-                    company_id, months=months,
-                    scenario_overrides={"opex_adjustments": {override_key: 0.20}},
-                )
-                inc_runway = inc_result["summary"].get("ending_runway_months", 0)
-
-                sensitivities.append({
-                    "category": f"{parent}/{subcat}",
-                    "base_runway": base_runway,
-                    "cut_20pct_runway": cut_runway,
-                    "increase_20pct_runway": inc_runway,
-                    "runway_impact_if_cut": round(cut_runway - base_runway, 1),
-                    "runway_impact_if_increased": round(inc_runway - base_runway, 1),
-                    "monthly_spend": round(subcats[subcat], 2),
-                })
+        g = len(grid)
+        sensitivities = []
+        for li, (category, _, spend) in enumerate(lines):
+            row_runway = runway[li * g:(li + 1) * g]
+            row_cash = cash[li * g:(li + 1) * g]
+            by_shock = dict(zip(grid, row_runway.tolist()))
+            cut_runway = by_shock[-0.20]
+            inc_runway = by_shock[0.20]
+            sensitivities.append({
+                "category": category,
+                "base_runway": base_runway,
+                "cut_20pct_runway": cut_runway,
+                "increase_20pct_runway": inc_runway,
+                "runway_impact_if_cut": round(cut_runway - base_runway, 1),
+                "runway_impact_if_increased": round(inc_runway - base_runway, 1),
+                "monthly_spend": round(spend, 2),
+                "grid": [
+                    {
+                        "shock": shock,
+                        "runway_months": r,
+                        "runway_impact": round(r - base_runway, 1),
+                        "ending_cash": c,
+                    }
+                    for shock, r, c in zip(grid, row_runway.tolist(), row_cash.tolist())
+                ],
+            })
 
         # Sort by absolute impact of cutting
         sensitivities.sort(key=lambda x: -x["runway_impact_if_cut"])
 
+        # Tornado: runway at the extremes of the grid, widest swing first
+        tornado = sorted(
+            (
+                {
+                    "category": row["category"],
+                    "low_shock": grid[0],
+                    "high_shock": grid[-1],
+                    "runway_at_low": row["grid"][0]["runway_months"],
+                    "runway_at_high": row["grid"][-1]["runway_months"],
+                    "swing": round(abs(row["grid"][0]["runway_months"] - row["grid"][-1]["runway_months"]), 1),
+                }
+                for row in sensitivities
+            ),
+            key=lambda x: -x["swing"],
+        )
+
+        two_way_tables = []
+        offset = len(lines) * g
+        labels = {key: category for category, key, _ in lines}
+        for pi, (key_a, key_b) in enumerate(pairs):
+            block = runway[offset + pi * g * g: offset + (pi + 1) * g * g].reshape(g, g)
+            two_way_tables.append({
+                "row_category": labels[key_a],
+                "col_category": labels[key_b],
+                "shocks": grid,
+                "runway_months": block.tolist(),
+            })
+
         return {
             "company_id": company_id,
             "base_runway_months": base_runway,
+            "base_ending_cash": base_cash,
+            "shocks": grid,
             "sensitivities": sensitivities,
+            "tornado": tornado,
+            "two_way": two_way_tables,
         }
 
+    @staticmethod
+    def _sensitivity_pairs(
+        two_way: Optional[Any],
+        lines: List[Tuple[str, str, float]],
+    ) -> List[Tuple[str, str]]:
+        """Resolve runway_sensitivity's two_way argument to override-key pairs."""
+        if not two_way or not lines:
+            return []
+        keys = {category: key for category, key, _ in lines}
+        if isinstance(two_way, int):
+            # Top-N by month-1 spend — the swing ranking isn't known until
+            # the paths are built, and spend is its first-order driver
+            top = [key for _, key, _ in sorted(lines, key=lambda l: -abs(l[2]))[:two_way]]
+            return [(a, b) for i, a in enumerate(top) for b in top[i + 1:]]
+        pairs = []
+        for pair in two_way:
+            if len(pair) != 2:
+                raise ValueError(f"two_way pairs need exactly two categories: {pair!r}")
+            a, b = keys.get(pair[0]), keys.get(pair[1])
+            if a is None or b is None:
+                missing = [c for c in pair if c not in keys]
+                raise ValueError(f"Unknown sensitivity categories: {missing}")
+            if a != b:
+                pairs.append((a, b))
+        return pairs
+
     # ------------------------------------------------------------------
     # Aggregation helpers (quarterly / annual rollup)
     # ------------------------------------------------------------------
@@ -99,6 +99,9 @@ class RequestBudget:
         self.iterations: List[IterationCost] = []
         self.external_calls: int = 0
         self.external_cost: float = 0.0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.cache_cost_saved: float = 0.0
 
     @property
     def remaining_cost(self) -> float:
@@ -131,6 +134,14 @@ class RequestBudget:
             "cost": cost,
         })
 
+    def record_cache(self, hit: bool, cost_saved: float = 0.0):
+        """Record an LLM response-cache lookup (hits cost nothing)."""
+        if hit:
+            self.cache_hits += 1
+            self.cache_cost_saved += cost_saved
+        else:
+            self.cache_misses += 1
+
     def warn_if_expensive(self, caller: str) -> Optional[str]:
         """Return warning string if budget is >60% consumed."""
         pct = self.total_cost / self.max_cost if self.max_cost > 0 else 0
@@ -149,6 +160,9 @@ class RequestBudget:
             "iterations": len(self.iterations),
             "external_calls": self.external_calls,
             "external_cost": round(self.external_cost, 4),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_cost_saved": round(self.cache_cost_saved, 4),
         }
 
 
@@ -529,8 +543,7 @@ class ModelRouter:
             "llama2-70b": 10,
         }
         self.default_max_concurrent = 3
-        self.request_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
-        self.cache_ttl = 300  # 5 minutes cache TTL
+        self.cache_ttl = 300  # 5 minutes TTL for sampled (non-deterministic) responses
         self.queue_processors: Dict[str, asyncio.Task] = {}
         
         # Load API keys from settings
@@ -907,7 +920,8 @@ class ModelRouter:
         max_retries: int = 3,
         fallback_enabled: bool = True,
         json_mode: bool = False,
-        caller_context: Optional[str] = None
+        caller_context: Optional[str] = None,
+        cache: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Get completion with automatic fallback
@@ -923,10 +937,71 @@ class ModelRouter:
             fallback_enabled: Whether to fallback to other models on failure
             json_mode: Whether to request JSON format output
             caller_context: Optional context about which skill/operation is calling (for error logging)
+            cache: Serve/store this call through the shared response cache.
+                None = default policy: plain-text calls are cached for
+                cache_ttl, json_mode calls are not. LLM_CACHE_DETERMINISTIC=1
+                also caches every temperature-0 call for LLM_CACHE_TTL.
         
         Returns:
             Dict with response, model used, cost, and latency
         """
+
+        if not self._should_cache(json_mode, temperature, cache):
+            return await self._get_completion_uncached(
+                prompt, system_prompt, capability, max_tokens, temperature,
+                preferred_models, max_retries, fallback_enabled, json_mode, caller_context,
+            )
+
+        from app.core.llm_cache import CACHE_DETERMINISTIC, DETERMINISTIC_TTL, llm_cache
+
+        cache_key = llm_cache.key(
+            prompt, system_prompt, max_tokens, temperature, json_mode,
+            capability.value, preferred_models,
+        )
+        deterministic = cache is True or (temperature == 0 and CACHE_DETERMINISTIC)
+        result, source = await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._get_completion_uncached(
+                prompt, system_prompt, capability, max_tokens, temperature,
+                preferred_models, max_retries, fallback_enabled, json_mode, caller_context,
+            ),
+            ttl=DETERMINISTIC_TTL if deterministic else self.cache_ttl,
+        )
+        if source == "miss":
+            if self._active_budget:
+                self._active_budget.record_cache(hit=False)
+            return result
+
+        saved = float(result.get("cost") or 0.0)
+        if self._active_budget:
+            self._active_budget.record_cache(hit=True, cost_saved=saved)
+        logger.debug(f"[MODEL_ROUTER] Cache hit ({source}) | {caller_context or 'unknown'} | saved ${saved:.4f}")
+        return {**result, "cost": 0.0, "latency": 0.0, "cached": True, "cache_source": source, "cost_saved": saved}
+
+    @staticmethod
+    def _should_cache(json_mode: bool, temperature: float, cache: Optional[bool]) -> bool:
+        if cache is not None:
+            return cache
+        from app.core.llm_cache import CACHE_DETERMINISTIC
+        if temperature == 0 and CACHE_DETERMINISTIC:
+            return True
+        # Structured output is only cached when the caller opts in
+        return not json_mode
+
+    async def _get_completion_uncached(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        capability: ModelCapability,
+        max_tokens: int,
+        temperature: float,
+        preferred_models: Optional[List[str]],
+        max_retries: int,
+        fallback_enabled: bool,
+        json_mode: bool,
+        caller_context: Optional[str],
+    ) -> Dict[str, Any]:
+        """Provider call loop behind get_completion (no response cache)."""
         
         # Budget check — if a budget is active and exhausted, fail fast
         if self._active_budget and self._active_budget.exhausted:
@@ -943,14 +1018,6 @@ class ModelRouter:
 
         logger.debug(f"[MODEL_ROUTER] get_completion{context_info} | {total_length:,} chars | cap={capability.value} | preferred={preferred_models} | json={json_mode}")
         
-        # Check cache first (only for non-json_mode requests to avoid stale structured data)
-        if not json_mode:
-            cache_key = self._get_request_cache_key(prompt, system_prompt, "any", max_tokens, temperature)
-            cached = self._get_cached_response(cache_key)
-            if cached:
-                logger.debug(f"[MODEL_ROUTER] Cache hit{context_info}")
-                return cached
-        
         # Lazy initialization of clients in async context
         await self._init_clients_if_needed()
         
@@ -1067,11 +1134,6 @@ class ModelRouter:
                             "output_tokens": output_tokens,
                         }
 
-                        # Cache result (only for non-json_mode to avoid stale structured data)
-                        if not json_mode:
-                            cache_key = self._get_request_cache_key(prompt, system_prompt, model_name, max_tokens, temperature)
-                            self._cache_response(cache_key, result)
-
                         return result
                     
                     except asyncio.TimeoutError:
@@ -1783,32 +1845,6 @@ class ModelRouter:
 
         return result
     
-    def _get_request_cache_key(self, prompt: str, system_prompt: Optional[str], model_name: str, max_tokens: int, temperature: float) -> str:
-        """Generate cache key for request"""
-        cache_data = f"{model_name}:{prompt}:{system_prompt or ''}:{max_tokens}:{temperature}"
-        return hashlib.md5(cache_data.encode()).hexdigest()
-    
-    def _get_cached_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached response if available and not expired"""
-        if cache_key in self.request_cache:
-            response, timestamp = self.request_cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                logger.debug("[MODEL_ROUTER] Cache hit")
-                return response
-            else:
-                # Expired, remove from cache
-                del self.request_cache[cache_key]
-        return None
-    
-    def _cache_response(self, cache_key: str, response: Dict[str, Any]):
-        """Cache response"""
-        self.request_cache[cache_key] = (response, time.time())
-        # Limit cache size (keep last 100 entries)
-        if len(self.request_cache) > 100:
-            # Remove oldest entry
-            oldest_key = min(self.request_cache.keys(), key=lambda k: self.request_cache[k][1])
-            del self.request_cache[oldest_key]
-    
     async def _apply_rate_limit(self, model_name: str):
         """Apply rate limiting delay if needed"""
         if model_name in self.last_request_time:
@@ -9,14 +9,19 @@ uses conservative distribution defaults.
 Usage:
     engine = MonteCarloEngine()
     result = engine.simulate(company_id, iterations=1000)
+
+simulate() runs all iterations as one vectorised batch by default (actuals
+pulled once, drivers sampled as arrays); pass vectorized=False for the
+original one-build-per-iteration loop.
 """
 
 from __future__ import annotations
 
 import logging
 import math
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -55,6 +60,8 @@ class MonteCarloResult:
     driver_sensitivity: List[Dict[str, Any]] = field(default_factory=list)
     # Periods metadata
     periods: List[str] = field(default_factory=list)
+    # Adaptive runs only: stop reason + relative standard errors
+    convergence: Optional[Dict[str, Any]] = None
 
 
 # Default distribution specs — only used when we can't derive from actuals
@@ -93,6 +100,17 @@ _MC_DRIVERS = [
 ]
 
 
+# Per-month metrics tracked across iterations
+_TRACKED_METRICS = [
+    "revenue", "ebitda", "cash_balance", "runway_months",
+    "free_cash_flow", "total_opex",
+]
+
+# Adaptive stop: each tracked quantile's standard error within 4% of its
+# 5–95% spread — a few hundred paths for typical company models
+DEFAULT_TOLERANCE = 0.04
+
+
 class MonteCarloEngine:
 
     def simulate(
@@ -102,29 +120,170 @@ class MonteCarloEngine:
         months: int = 24,
         driver_overrides: Optional[Dict[str, DistSpec]] = None,
         branch_id: Optional[str] = None,
+        vectorized: bool = True,
+        seed: Optional[int] = None,
     ) -> MonteCarloResult:
         """Run Monte Carlo simulation over the cash flow model.
 
         For each iteration:
         1. Sample driver values from distributions (derived from actuals)
         2. Apply to company_data
-        3. Run build_monthly_cash_flow_model()
+        3. Run the liquidity model
         4. Extract metrics per month
 
+        With vectorized=True (default) all iterations are sampled up front
+        and run through LiquidityManagementService.build_liquidity_paths()
+        in a single pass — actuals are pulled once and the monthly recurrence
+        is evaluated as array ops over every path. vectorized=False keeps the
+        original one-model-build-per-iteration loop (useful for parity checks).
+
         Returns percentile bands, VaR, runway distribution, driver sensitivity.
         """
-        from app.services.company_data_pull import pull_company_data
+        prepared = self._prepare(company_id, driver_overrides, branch_id)
+        if prepared is None:
+            return MonteCarloResult(iterations=0, months=months)
+        base_data, dist_specs = prepared
+
+        rng = np.random.default_rng(seed=seed)
+
+        if vectorized:
+            trajectories, driver_samples, periods = self._run_paths(
+                company_id, base_data, dist_specs, iterations, months, rng,
+            )
+        else:
+            trajectories, driver_samples, periods = self._run_iterations(
+                company_id, base_data, dist_specs, iterations, months, rng,
+            )
+
+        return _summarize_trajectories(trajectories, driver_samples, months, periods)
+
+    def simulate_adaptive(
+        self,
+        company_id: str,
+        months: int = 24,
+        tolerance: float = DEFAULT_TOLERANCE,
+        chunk_size: int = 200,
+        min_iterations: int = 200,
+        max_iterations: int = 5000,
+        time_budget_s: Optional[float] = None,
+        driver_overrides: Optional[Dict[str, DistSpec]] = None,
+        branch_id: Optional[str] = None,
+        seed: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> MonteCarloResult:
+        """Run Monte Carlo in chunks until the tracked quantiles are stable.
+
+        After each chunk the standard error of p5/p50/p95 final cash, median
+        runway and var_cash_12m is estimated from order statistics and scaled
+        by that metric's 5–95% spread. The run stops once every scaled error
+        is within ``tolerance`` (after at least ``min_iterations``), at
+        ``max_iterations``, or when ``time_budget_s`` is spent — whichever
+        comes first.
+
+        ``on_progress`` is called after every chunk with the partial fan
+        chart (cash/revenue/runway percentile bands) and convergence state,
+        so callers can stream a preview while the run continues.
+
+        Returns the same MonteCarloResult as simulate(); ``convergence``
+        records the stopping reason and final standard errors.
+        """
         from app.services.liquidity_management_service import LiquidityManagementService
-        from app.services.scenario_branch_service import ScenarioBranchService
 
-        lms = LiquidityManagementService()
+        prepared = self._prepare(company_id, driver_overrides, branch_id)
+        if prepared is None:
+            return MonteCarloResult(iterations=0, months=months)
+        base_data, dist_specs = prepared
+
+        rng = np.random.default_rng(seed=seed)
+        started = time.monotonic()
+        chunk_size = max(10, int(chunk_size))
+        max_iterations = max(chunk_size, int(max_iterations))
+
+        # Data is pulled once; every chunk reuses the same model inputs
+        inputs = LiquidityManagementService().load_path_inputs(
+            company_id, {**base_data, "seasonality_factors": "none"},
+        )
+
+        chunks: Dict[str, List[np.ndarray]] = {m: [] for m in _TRACKED_METRICS}
+        sample_chunks: Dict[str, List[np.ndarray]] = {}
+        periods: List[str] = []
+        n_done = 0
+        errors: Dict[str, float] = {}
+        stop_reason = "max_iterations"
+
+        while n_done < max_iterations:
+            n_chunk = min(chunk_size, max_iterations - n_done)
+            trajectories, driver_samples, periods = self._run_paths(
+                company_id, base_data, dist_specs, n_chunk, months, rng,
+                inputs=inputs,
+            )
+            if not trajectories:
+                break
+            for m in _TRACKED_METRICS:
+                chunks[m].append(trajectories[m])
+            for d, v in driver_samples.items():
+                sample_chunks.setdefault(d, []).append(v)
+            n_done += n_chunk
+
+            all_traj = {m: np.concatenate(chunks[m]) for m in _TRACKED_METRICS}
+            errors = _tracked_quantile_errors(all_traj, months)
+            converged = n_done >= min_iterations and all(
+                e <= tolerance for e in errors.values()
+            )
+            out_of_time = (
+                time_budget_s is not None
+                and time.monotonic() - started >= time_budget_s
+            )
+
+            if on_progress:
+                try:
+                    on_progress(_progress_snapshot(
+                        all_traj, months, periods, n_done, errors, tolerance, converged,
+                    ))
+                except Exception as e:
+                    logger.debug("MC progress callback failed: %s", e)
+
+            if converged:
+                stop_reason = "converged"
+                break
+            if out_of_time:
+                stop_reason = "time_budget"
+                break
+
+        if n_done == 0:
+            return MonteCarloResult(iterations=0, months=months)
+
+        result = _summarize_trajectories(
+            {m: np.concatenate(chunks[m]) for m in _TRACKED_METRICS},
+            {d: np.concatenate(v) for d, v in sample_chunks.items()},
+            months,
+            periods,
+        )
+        result.convergence = {
+            "converged": stop_reason == "converged",
+            "stop_reason": stop_reason,
+            "tolerance": tolerance,
+            "relative_standard_errors": {k: round(v, 5) for k, v in errors.items()},
+            "elapsed_s": round(time.monotonic() - started, 3),
+        }
+        return result
+
+    def _prepare(
+        self,
+        company_id: str,
+        driver_overrides: Optional[Dict[str, DistSpec]],
+        branch_id: Optional[str],
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, DistSpec]]]:
+        """Pull actuals once, merge branch assumptions, derive distributions."""
+        from app.services.company_data_pull import pull_company_data
+        from app.services.scenario_branch_service import ScenarioBranchService
 
         # Get base company data from actuals (full time series)
         cd = pull_company_data(company_id)
         base_data = cd.to_forecast_seed()
         if not base_data.get("revenue") and not base_data.get("burn_rate"):
             logger.warning("MC: no actuals for %s", company_id)
-            return MonteCarloResult(iterations=0, months=months)
+            return None
 
         # If branch specified, merge branch assumptions
         if branch_id:
@@ -135,24 +294,92 @@ class MonteCarloEngine:
                 base_data = sbs._apply_overrides({**base_data}, merged)
 
         # Build distribution specs from actual data where possible
-        dist_specs = _build_distributions(cd, base_data, driver_overrides)
+        return base_data, _build_distributions(cd, base_data, driver_overrides)
+
+    def _run_paths(
+        self,
+        company_id: str,
+        base_data: Dict[str, Any],
+        dist_specs: Dict[str, DistSpec],
+        iterations: int,
+        months: int,
+        rng: np.random.Generator,
+        inputs: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], List[str]]:
+        """Sample every driver for all iterations at once and run one batched build.
+
+        Each driver is drawn once per path and held for the whole horizon
+        (the same per-iteration semantics as _run_iterations), so the
+        (iterations × months) driver matrix is a broadcast of one column.
+        """
+        from app.services.liquidity_management_service import LiquidityManagementService
+
+        driver_samples: Dict[str, np.ndarray] = {}
+        path_overrides: Dict[str, np.ndarray] = {}
+        for driver_id in _MC_DRIVERS:
+            spec = dist_specs.get(driver_id)
+            if not spec:
+                continue
+
+            base_val = base_data.get(driver_id) or base_data.get(
+                _DRIVER_TO_DATA_KEY.get(driver_id, driver_id)
+            )
+            if base_val is None:
+                continue
+
+            samples = _sample_from_dist_batch(rng, spec, float(base_val), iterations)
+            data_key = _DRIVER_TO_DATA_KEY.get(driver_id, driver_id)
+            driver_samples[driver_id] = samples
+            if data_key in _PATH_DRIVER_KEYS:
+                path_overrides[data_key] = samples
+
+        # Disable seasonality for MC (already captured in base)
+        scenario = {**base_data, "seasonality_factors": "none"}
+
+        try:
+            paths = LiquidityManagementService().build_liquidity_paths(
+                company_id=company_id,
+                path_overrides=path_overrides,
+                months=months,
+                scenario_overrides=scenario,
+                inputs=inputs,
+            )
+        except Exception as e:
+            logger.warning("MC: batched liquidity build failed for %s: %s", company_id, e)
+            return {}, {}, []
+
+        metrics = paths["metrics"]
+        n_paths = paths["n_paths"]
+        trajectories = {
+            m: np.broadcast_to(metrics[m], (iterations, months)) if n_paths == 1 else metrics[m]
+            for m in _TRACKED_METRICS
+        }
+        return trajectories, driver_samples, paths["periods"]
+
+    def _run_iterations(
+        self,
+        company_id: str,
+        base_data: Dict[str, Any],
+        dist_specs: Dict[str, DistSpec],
+        iterations: int,
+        months: int,
+        rng: np.random.Generator,
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], List[str]]:
+        """Original per-iteration loop: one full liquidity model build per sample."""
+        from app.services.liquidity_management_service import LiquidityManagementService
+
+        lms = LiquidityManagementService()
 
-        # Storage for all iterations
-        metrics_to_track = [
-            "revenue", "ebitda", "cash_balance", "runway_months",
-            "free_cash_flow", "total_opex",
-        ]
         all_trajectories: Dict[str, List[List[float]]] = {
-            m: [] for m in metrics_to_track
+            m: [] for m in _TRACKED_METRICS
         }
         driver_samples: Dict[str, List[float]] = {d: [] for d in _MC_DRIVERS}
-        final_cash_values: List[float] = []
-
-        rng = np.random.default_rng(seed=None)
+        periods: List[str] = []
 
         for _ in range(iterations):
             # Sample driver values
             sampled_data = {**base_data}
+            sampled_now: Dict[str, float] = {}
             for driver_id in _MC_DRIVERS:
                 spec = dist_specs.get(driver_id)
                 if not spec:
@@ -167,7 +394,7 @@ class MonteCarloEngine:
                 sampled_val = _sample_from_dist(rng, spec, float(base_val))
                 data_key = _DRIVER_TO_DATA_KEY.get(driver_id, driver_id)
                 sampled_data[data_key] = sampled_val
-                driver_samples[driver_id].append(sampled_val)
+                sampled_now[driver_id] = sampled_val
 
             # Disable seasonality for MC (already captured in base)
             sampled_data["seasonality_factors"] = "none"
@@ -186,89 +413,99 @@ class MonteCarloEngine:
             if not forecast:
                 continue
 
+            # Only keep samples for iterations that produced a forecast so
+            # driver samples stay aligned with final cash values
+            for driver_id, val in sampled_now.items():
+                driver_samples[driver_id].append(val)
+
             # Extract metric trajectories
-            for metric in metrics_to_track:
+            for metric in _TRACKED_METRICS:
                 trajectory = [m.get(metric, 0) or 0 for m in forecast]
                 all_trajectories[metric].append(trajectory)
 
-            final_cash = forecast[-1].get("cash_balance", 0) or 0
-            final_cash_values.append(final_cash)
+            if not periods:
+                periods = [m.get("period", "") for m in forecast]
 
-        actual_iterations = len(all_trajectories["revenue"])
-        if actual_iterations == 0:
-            return MonteCarloResult(iterations=0, months=months)
+        if not all_trajectories["revenue"]:
+            return {}, {}, []
+
+        trajectories = {m: np.array(v, dtype=float) for m, v in all_trajectories.items()}
+        samples = {d: np.array(v, dtype=float) for d, v in driver_samples.items() if v}
+        return trajectories, samples, periods
+
+
+def _summarize_trajectories(
+    trajectories: Dict[str, np.ndarray],
+    driver_samples: Dict[str, np.ndarray],
+    months: int,
+    periods: List[str],
+) -> MonteCarloResult:
+    """Reduce (iterations × months) metric arrays to percentile bands and risk stats."""
+    if not trajectories or trajectories["revenue"].shape[0] == 0:
+        return MonteCarloResult(iterations=0, months=months)
 
-        # Compute percentiles
-        percentile_levels = [5, 25, 50, 75, 95]
-        trajectory_percentiles: Dict[str, Dict[str, List[float]]] = {}
-
-        for metric in metrics_to_track:
-            arr = np.array(all_trajectories[metric])
-            pcts: Dict[str, List[float]] = {}
-            for p in percentile_levels:
-                pcts[f"p{p}"] = np.percentile(arr, p, axis=0).tolist()
-            trajectory_percentiles[metric] = pcts
-
-        # Final distribution stats
-        final_distribution: Dict[str, Dict[str, float]] = {}
-        for metric in metrics_to_track:
-            arr = np.array(all_trajectories[metric])
-            finals = arr[:, -1]
-            final_distribution[metric] = {
-                "mean": float(np.mean(finals)),
-                "median": float(np.median(finals)),
-                "std": float(np.std(finals)),
-                "p5": float(np.percentile(finals, 5)),
-                "p25": float(np.percentile(finals, 25)),
-                "p75": float(np.percentile(finals, 75)),
-                "p95": float(np.percentile(finals, 95)),
-            }
-
-        # VaR: cash at p5 at 12 months (or final if < 12)
-        cash_arr = np.array(all_trajectories["cash_balance"])
-        var_month = min(11, months - 1)
-        var_cash_12m = float(np.percentile(cash_arr[:, var_month], 5))
-
-        # Runway distribution
-        runway_arr = np.array(all_trajectories["runway_months"])
-        runway_finals = runway_arr[:, -1]
-        runway_distribution = {
-            "median": float(np.median(runway_finals)),
-            "p5": float(np.percentile(runway_finals, 5)),
-            "p25": float(np.percentile(runway_finals, 25)),
-            "p75": float(np.percentile(runway_finals, 75)),
-            "p95": float(np.percentile(runway_finals, 95)),
+    actual_iterations = int(trajectories["revenue"].shape[0])
+
+    # Compute percentiles
+    percentile_levels = [5, 25, 50, 75, 95]
+    trajectory_percentiles: Dict[str, Dict[str, List[float]]] = {}
+
+    for metric in _TRACKED_METRICS:
+        arr = trajectories[metric]
+        bands = np.percentile(arr, percentile_levels, axis=0)
+        trajectory_percentiles[metric] = {
+            f"p{p}": bands[k].tolist() for k, p in enumerate(percentile_levels)
         }
 
-        # Break-even probability: % of iterations where final EBITDA > 0
-        ebitda_arr = np.array(all_trajectories["ebitda"])
-        ebitda_finals = ebitda_arr[:, -1]
-        break_even_probability = float(np.mean(ebitda_finals > 0))
+    # Final distribution stats
+    final_distribution: Dict[str, Dict[str, float]] = {}
+    for metric in _TRACKED_METRICS:
+        finals = trajectories[metric][:, -1]
+        final_distribution[metric] = {
+            "mean": float(np.mean(finals)),
+            "median": float(np.median(finals)),
+            "std": float(np.std(finals)),
+            "p5": float(np.percentile(finals, 5)),
+            "p25": float(np.percentile(finals, 25)),
+            "p75": float(np.percentile(finals, 75)),
+            "p95": float(np.percentile(finals, 95)),
+        }
 
-        # Driver sensitivity: correlation of each driver to final cash
-        driver_sensitivity = _compute_driver_sensitivity(
-            driver_samples, final_cash_values,
-        )
+    # VaR: cash at p5 at 12 months (or final if < 12)
+    cash_arr = trajectories["cash_balance"]
+    var_month = min(11, months - 1)
+    var_cash_12m = float(np.percentile(cash_arr[:, var_month], 5))
 
-        # Extract period labels from a sample forecast
-        periods = []
-        try:
-            sample = cfp.build_monthly_cash_flow_model(base_data, months=months)
-            periods = [m.get("period", "") for m in sample]
-        except Exception:
-            pass
-
-        return MonteCarloResult(
-            iterations=actual_iterations,
-            months=months,
-            trajectory_percentiles=trajectory_percentiles,
-            final_distribution=final_distribution,
-            var_cash_12m=var_cash_12m,
-            runway_distribution=runway_distribution,
-            break_even_probability=break_even_probability,
-            driver_sensitivity=driver_sensitivity,
-            periods=periods,
-        )
+    # Runway distribution
+    runway_finals = trajectories["runway_months"][:, -1]
+    runway_distribution = {
+        "median": float(np.median(runway_finals)),
+        "p5": float(np.percentile(runway_finals, 5)),
+        "p25": float(np.percentile(runway_finals, 25)),
+        "p75": float(np.percentile(runway_finals, 75)),
+        "p95": float(np.percentile(runway_finals, 95)),
+    }
+
+    # Break-even probability: % of iterations where final EBITDA > 0
+    ebitda_finals = trajectories["ebitda"][:, -1]
+    break_even_probability = float(np.mean(ebitda_finals > 0))
+
+    # Driver sensitivity: correlation of each driver to final cash
+    driver_sensitivity = _compute_driver_sensitivity(
+        driver_samples, cash_arr[:, -1],
+    )
+
+    return MonteCarloResult(
+        iterations=actual_iterations,
+        months=months,
+        trajectory_percentiles=trajectory_percentiles,
+        final_distribution=final_distribution,
+        var_cash_12m=var_cash_12m,
+        runway_distribution=runway_distribution,
+        break_even_probability=break_even_probability,
+        driver_sensitivity=driver_sensitivity,
+        periods=periods,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -337,6 +574,11 @@ def _build_distributions(
     return specs
 
 
+# Seed keys the liquidity model actually reads per path. The remaining
+# sampled drivers (burn_rate, headcount_change, cac) are not inputs to the
+# monthly recurrence, so they only feed driver sensitivity.
+_PATH_DRIVER_KEYS = {"growth_rate", "gross_margin", "churn_rate", "nrr"}
+
 _DRIVER_TO_ACTUALS_CATEGORY = {
     "revenue_growth": "revenue",  # will compute growth rate from series
     "gross_margin": None,  # derived, not direct actuals
@@ -373,9 +615,36 @@ def _sample_from_dist(rng: np.random.Generator, spec: DistSpec, base: float) ->
     return float(val)
 
 
+def _sample_from_dist_batch(
+    rng: np.random.Generator, spec: DistSpec, base: float, size: int,
+) -> np.ndarray:
+    """Vectorised _sample_from_dist: draw `size` values in one call."""
+    if spec.dist_type == "normal":
+        vals = rng.normal(base, abs(base * spec.sigma) if base != 0 else spec.sigma, size)
+    elif spec.dist_type == "lognormal":
+        if base <= 0:
+            base = 1.0
+        vals = rng.lognormal(math.log(base), spec.sigma, size)
+    elif spec.dist_type == "beta":
+        vals = rng.beta(spec.alpha, spec.beta_param, size)
+    elif spec.dist_type == "uniform":
+        low = spec.clip_low if spec.clip_low is not None else base * 0.5
+        high = spec.clip_high if spec.clip_high is not None else base * 1.5
+        vals = rng.uniform(low, high, size)
+    else:
+        vals = np.full(size, base, dtype=float)
+
+    if spec.clip_low is not None:
+        vals = np.maximum(vals, spec.clip_low)
+    if spec.clip_high is not None:
+        vals = np.minimum(vals, spec.clip_high)
+
+    return vals.astype(float)
+
+
 def _compute_driver_sensitivity(
-    driver_samples: Dict[str, List[float]],
-    final_cash: List[float],
+    driver_samples: Dict[str, Any],
+    final_cash: Any,
 ) -> List[Dict[str, Any]]:
     """Rank drivers by their correlation to final cash balance."""
     if len(final_cash) < 10:
@@ -410,6 +679,96 @@ def _compute_driver_sensitivity(
     return results
 
 
+# ---------------------------------------------------------------------------
+# Convergence tracking (adaptive mode)
+# ---------------------------------------------------------------------------
+
+# z for the 95% order-statistic interval around a sample quantile
+_QUANTILE_Z = 1.96
+
+# Absolute floor (metric units) for the spread a standard error is scaled by,
+# so a degenerate distribution (every path capped / identical) counts as stable
+_ERROR_FLOOR = {
+    "cash_p5": 1_000.0,
+    "cash_p50": 1_000.0,
+    "cash_p95": 1_000.0,
+    "runway_p50": 0.1,
+    "var_cash_12m": 1_000.0,
+}
+
+
+def _quantile_standard_error(values: np.ndarray, q: float) -> Tuple[float, float]:
+    """Distribution-free (quantile, standard error) from order statistics.
+
+    The rank of the q-quantile in n draws is Binomial(n, q); the values at
+    ranks nq ± z·sqrt(nq(1-q)) bound a 95% interval, whose half-width / z
+    is the standard error. No density estimate needed.
+    """
+    x = np.sort(values)
+    n = len(x)
+    qv = float(np.percentile(x, q * 100))
+    if n < 2:
+        return qv, float("inf")
+    half = _QUANTILE_Z * math.sqrt(n * q * (1 - q))
+    lo = int(max(0, math.floor(n * q - half)))
+    hi = int(min(n - 1, math.ceil(n * q + half)))
+    return qv, float(x[hi] - x[lo]) / (2 * _QUANTILE_Z)
+
+
+def _tracked_quantile_errors(
+    trajectories: Dict[str, np.ndarray],
+    months: int,
+) -> Dict[str, float]:
+    """Relative standard error of each quantity the adaptive run must stabilise."""
+    final_cash = trajectories["cash_balance"][:, -1]
+    tracked = {
+        "cash_p5": (final_cash, 0.05),
+        "cash_p50": (final_cash, 0.50),
+        "cash_p95": (final_cash, 0.95),
+        "runway_p50": (trajectories["runway_months"][:, -1], 0.50),
+        "var_cash_12m": (trajectories["cash_balance"][:, min(11, months - 1)], 0.05),
+    }
+    errors: Dict[str, float] = {}
+    for key, (values, q) in tracked.items():
+        _, se = _quantile_standard_error(values, q)
+        # Scale by the 5–95% spread, not the quantile: p5 cash often sits near
+        # zero, where any error is "large" relative to the value itself
+        p5, p95 = np.percentile(values, [5, 95])
+        scale = max(float(p95 - p5), _ERROR_FLOOR[key])
+        errors[key] = se / scale
+    return errors
+
+
+def _progress_snapshot(
+    trajectories: Dict[str, np.ndarray],
+    months: int,
+    periods: List[str],
+    iterations: int,
+    errors: Dict[str, float],
+    tolerance: float,
+    converged: bool,
+) -> Dict[str, Any]:
+    """Partial fan chart + convergence state emitted after each chunk."""
+    levels = [5, 25, 50, 75, 95]
+    fan_chart: Dict[str, Dict[str, List[float]]] = {}
+    for metric in ("cash_balance", "revenue", "runway_months"):
+        bands = np.percentile(trajectories[metric], levels, axis=0)
+        fan_chart[metric] = {
+            f"p{p}": [round(float(v), 2) for v in bands[k]] for k, p in enumerate(levels)
+        }
+    var_month = min(11, months - 1)
+    return {
+        "iterations": iterations,
+        "periods": periods,
+        "fan_chart": fan_chart,
+        "var_cash_12m": float(np.percentile(trajectories["cash_balance"][:, var_month], 5)),
+        "runway_p50": float(np.median(trajectories["runway_months"][:, -1])),
+        "relative_standard_errors": {k: round(v, 5) for k, v in errors.items()},
+        "tolerance": tolerance,
+        "converged": converged,
+    }
+
+
 def result_to_dict(result: MonteCarloResult) -> Dict[str, Any]:
     """Convert MC result to JSON-serializable dict for API response."""
     return {
@@ -422,4 +781,5 @@ def result_to_dict(result: MonteCarloResult) -> Dict[str, Any]:
         "runway_distribution": result.runway_distribution,
         "break_even_probability": result.break_even_probability,
         "driver_sensitivity": result.driver_sensitivity,
+        "convergence": result.convergence,
     }
@@ -1,17 +1,18 @@
 """
 Parallel multi-provider document processor for concurrent VDR ingestion.
 
-Two modes:
+Three modes:
   1. ingest_batch  — full structured extraction from N documents, fanned across providers.
   2. targeted_search — ask one question across N documents concurrently (boolean/text/numeric).
+  3. extract_chunks — map step for one long document: one prepared prompt per chunk.
 
-Both stream progress events so the frontend can render live status.
+The first two stream progress events so the frontend can render live status.
 """
 
 import asyncio
 import json
 import logging
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -260,6 +261,8 @@ class ParallelDocProcessor:
                 json_mode=True,
                 preferred_models=preferred_models,
                 caller_context=f"parallel_doc_processor.extract:{doc_id}",
+                # Same document + prompt → same answer; share it across runs and workers
+                cache=True,
             )
             raw = (result.get("response") or "").strip()
             if not raw:
@@ -281,6 +284,59 @@ class ParallelDocProcessor:
             logger.exception(f"[PARALLEL_DOC] Extract failed for {doc_id}: {e}")
             return {"doc_id": doc_id, "error": str(e)}
 
+    # ------------------------------------------------------------------
+    # Mode 3: Chunked extraction of one long document
+    # ------------------------------------------------------------------
+
+    async def extract_chunks(
+        self,
+        prompts: List[Tuple[str, str]],
+        max_tokens: int,
+        preferred_models: Optional[List[str]] = None,
+        caller_context: str = "parallel_doc_processor.chunk",
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Run one (system_prompt, user_prompt) per chunk concurrently.
+
+        Chunks are spread round-robin across providers unless preferred_models
+        pins them (legal docs). Returns the parsed JSON object of each chunk in
+        chunk order — None where the call failed, timed out or didn't parse.
+        The caller normalizes after merging, so clause hierarchy and metrics
+        that span chunks are not dropped per chunk.
+        """
+        from app.services.document_process_service import _extract_json_object
+
+        available = self.router.get_available_providers() or ["anthropic"]
+
+        async def _one(index: int, system_prompt: str, user_prompt: str) -> Optional[Dict[str, Any]]:
+            models = preferred_models
+            if models is None:
+                model_info = self.router.get_model_for_provider(available[index % len(available)])
+                models = [model_info["name"]] if model_info else None
+            async with self._semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        self.router.get_completion(
+                            prompt=user_prompt,
+                            system_prompt=system_prompt,
+                            capability=self._ModelCapability.STRUCTURED,
+                            max_tokens=max_tokens,
+                            temperature=0.2,
+                            json_mode=True,
+                            preferred_models=models,
+                            caller_context=f"{caller_context}:{index}",
+                            cache=True,
+                        ),
+                        timeout=self._task_timeout,
+                    )
+                    raw = (result.get("response") or "").strip()
+                    parsed = _extract_json_object(raw) if raw else None
+                    return parsed if isinstance(parsed, dict) else None
+                except Exception as e:
+                    logger.warning(f"[PARALLEL_DOC] Chunk {index} extract failed: {e}")
+                    return None
+
+        return list(await asyncio.gather(*(_one(i, sp, up) for i, (sp, up) in enumerate(prompts))))
+
     # ------------------------------------------------------------------
     # Mode 2: Targeted search across documents
     # ------------------------------------------------------------------
@@ -477,6 +533,7 @@ class ParallelDocProcessor:
                 json_mode=True,
                 preferred_models=preferred_models,
                 caller_context=f"parallel_doc_processor.search:{doc_id}",
+                cache=True,
             )
             raw = (result.get("response") or "").strip()
             if not raw:
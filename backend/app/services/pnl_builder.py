@@ -284,51 +284,17 @@ class PnlBuilder:
             source_multipliers: {source: factor} to scale amounts (e.g. 0.8 = 20% reduction)
             terminated_sources: {source: "YYYY-MM"} to zero out after that period
         """
-        from app.core.supabase_client import get_supabase_client
-
-        sb = get_supabase_client()
-        if not sb:
-            logger.warning("Supabase client unavailable — cannot fetch actuals")
-            return {}, []
-
-        # Always include hierarchy_path for correct key resolution.
-        # Include source when contract filtering is active.
+        # Contract filters need the source column on each row.
         has_contract_filters = excluded_sources or source_multipliers or terminated_sources
-        select_cols = "period, category, subcategory, hierarchy_path, amount, source" if has_contract_filters else "period, category, subcategory, hierarchy_path, amount"
 
-        query = sb.table("fpa_actuals").select(select_cols)
         if self.company_id:
-            query = query.eq("company_id", self.company_id)
+            data = self._company_actuals_rows(start, end, entity_id)
         elif self.fund_id:
-            query = query.eq("fund_id", self.fund_id)
+            data = self._fund_actuals_rows(start, end, entity_id, has_contract_filters)
         else:
             return {}, []
-        if entity_id:
-            query = query.eq("entity_id", entity_id)
-        if start:
-            query = query.gte("period", f"{start}-01")
-        if end:
-            query = query.lte("period", f"{end}-01")
-
-        result = query.order("period").execute()
-
-        # Auto-detect: if date-windowed query returned nothing but data exists,
-        # retry without date filter so uploaded actuals are always discovered.
-        if not result.data and (start or end):
-            logger.info(
-                "No actuals in window %s–%s for %s — retrying without date filter",
-                start, end, self.company_id or self.fund_id,
-            )
-            q2 = sb.table("fpa_actuals").select(select_cols)
-            if self.company_id:
-                q2 = q2.eq("company_id", self.company_id)
-            elif self.fund_id:
-                q2 = q2.eq("fund_id", self.fund_id)
-            if entity_id:
-                q2 = q2.eq("entity_id", entity_id)
-            result = q2.order("period").execute()
 
-        if not result.data:
+        if not data:
             return {}, []
 
         actuals: Dict[str, Dict[str, float]] = {}
@@ -338,7 +304,7 @@ class PnlBuilder:
         multipliers = source_multipliers or {}
         terminated = terminated_sources or {}
 
-        for row in result.data:
+        for row in data:
             period = _normalize_period(row.get("period", ""))
             if not period:
                 logger.warning("Skipping actuals row with unparseable period: %r", row.get("period"))
@@ -374,6 +340,76 @@ class PnlBuilder:
         periods = sorted(periods_set)
         return actuals, periods
 
+    def _company_actuals_rows(
+        self,
+        start: Optional[str],
+        end: Optional[str],
+        entity_id: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Company rows from the shared (coalesced, cached) data-access layer."""
+        from app.core.data_access import fpa_data
+
+        rows = fpa_data.actuals_sync(self.company_id)
+        if entity_id:
+            rows = [r for r in rows if r.get("entity_id") == entity_id]
+        if not (start or end):
+            return rows
+
+        lo = f"{start}-01" if start else None
+        hi = f"{end}-01" if end else None
+        windowed = [
+            r for r in rows
+            if (lo is None or r["period"] >= lo) and (hi is None or r["period"] <= hi)
+        ]
+        # Auto-detect: if the date window is empty but data exists, fall
+        # back to the full history so uploaded actuals are always discovered.
+        if not windowed and rows:
+            logger.info(
+                "No actuals in window %s–%s for %s — retrying without date filter",
+                start, end, self.company_id,
+            )
+            return rows
+        return windowed
+
+    def _fund_actuals_rows(
+        self,
+        start: Optional[str],
+        end: Optional[str],
+        entity_id: Optional[str],
+        has_contract_filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Fund-wide rows straight from fpa_actuals (not cached per company)."""
+        from app.core.supabase_client import get_supabase_client
+
+        sb = get_supabase_client()
+        if not sb:
+            logger.warning("Supabase client unavailable — cannot fetch actuals")
+            return []
+
+        # Always include hierarchy_path for correct key resolution.
+        select_cols = "period, category, subcategory, hierarchy_path, amount, source" if has_contract_filters else "period, category, subcategory, hierarchy_path, amount"
+
+        def _query(windowed: bool):
+            q = sb.table("fpa_actuals").select(select_cols).eq("fund_id", self.fund_id)
+            if entity_id:
+                q = q.eq("entity_id", entity_id)
+            if windowed and start:
+                q = q.gte("period", f"{start}-01")
+            if windowed and end:
+                q = q.lte("period", f"{end}-01")
+            return q.order("period").execute().data
+
+        data = _query(True)
+        # Auto-detect: if date-windowed query returned nothing but data exists,
+        # retry without date filter so uploaded actuals are always discovered.
+        if not data and (start or end):
+            logger.info(
+                "No actuals in window %s–%s for %s — retrying without date filter",
+                start, end, self.fund_id,
+            )
+            data = _query(False)
+        return data or []
+
     # ------------------------------------------------------------------
     # Step 2: Derive ratios from the latest actual period
     # ------------------------------------------------------------------
@@ -0,0 +1,281 @@
+"""
+Correlated portfolio Monte Carlo over per-company exit waterfalls.
+
+FundModelingService.model_fund_scenarios scores a handful of hand-built
+outcome combinations. For LP reporting we want the full distribution of
+fund returns, so this module samples tens of thousands of portfolio
+outcomes at once:
+
+    from app.services.portfolio_monte_carlo import CompanyPosition, simulate_portfolio
+
+    result = simulate_portfolio(positions, fund_size=260e6, draws=20_000, seed=7)
+    result["fund_moic"]["p50"], result["prob_return_fund"]
+
+Model, per draw and company:
+  1. A next-round scenario (base / growth_decay / bridge / outperform) is
+     drawn from the company's scenario weights.
+  2. A latent z = √ρm·macro + √ρs·sector + √(1-ρm-ρs)·ε drives the outcome:
+     the company is written off when Φ(z) < the scenario's failure rate,
+     otherwise exits at valuation × scenario multiple × exp(σ·z).
+  3. Our proceeds come from interpolating the scenario's compiled
+     waterfall (ProceedsCurve) — exact, since payouts are piecewise linear
+     in the exit value.
+  4. Exit timing (scenario holding period ± 1y) gives per-draw fund IRR.
+
+Everything is a (draws × companies) array op; 20k draws × 100 companies
+runs in about a second.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.special import ndtr
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DRAWS = 20_000
+MAX_DRAWS = 200_000
+DEFAULT_MACRO_CORRELATION = 0.20   # share of outcome variance from the shared macro factor
+DEFAULT_SECTOR_CORRELATION = 0.15  # ... and from the company's sector factor
+DEFAULT_EXIT_VOLATILITY = 1.0      # σ of log exit value around the scenario median
+
+# Exit outcome per next-round scenario (names match generate_scenario_cap_tables)
+SCENARIO_EXIT_PROFILES: Dict[str, Dict[str, float]] = {
+    "outperform":   {"exit_multiple": 6.0, "failure_rate": 0.05, "holding_years": 4.0},
+    "base":         {"exit_multiple": 3.0, "failure_rate": 0.15, "holding_years": 5.0},
+    "growth_decay": {"exit_multiple": 1.2, "failure_rate": 0.30, "holding_years": 6.0},
+    "bridge":       {"exit_multiple": 0.6, "failure_rate": 0.45, "holding_years": 6.5},
+}
+
+# Scenario weights by CompanyAnalytics.valuation_direction
+SCENARIO_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "up_round_likely": {"outperform": 0.35, "base": 0.45, "growth_decay": 0.15, "bridge": 0.05},
+    "flat":            {"outperform": 0.20, "base": 0.45, "growth_decay": 0.25, "bridge": 0.10},
+    "down_round_risk": {"outperform": 0.05, "base": 0.30, "growth_decay": 0.40, "bridge": 0.25},
+}
+SHORT_RUNWAY_MONTHS = 9.0
+_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+@dataclass
+class ProceedsCurve:
+    """Our proceeds as a piecewise-linear function of the exit value."""
+    exit_values: np.ndarray
+    proceeds: np.ndarray
+    tail_slope: float = 0.0
+
+    @classmethod
+    def from_scenario(cls, scenario: Dict[str, Any]) -> Optional["ProceedsCurve"]:
+        """Use the scenario's compiled curve, else its waterfall_at_exits grid."""
+        curve = scenario.get("proceeds_curve")
+        if curve and curve.get("exit_values"):
+            return cls(
+                np.asarray(curve["exit_values"], dtype=float),
+                np.asarray(curve["our_proceeds"], dtype=float),
+                float(curve.get("tail_slope") or 0.0),
+            )
+        points = sorted(
+            (float(wf.get("exit_value") or 0), float(wf.get("our_proceeds") or 0))
+            for wf in scenario.get("waterfall_at_exits") or []
+        )
+        if not points:
+            return None
+        x = np.array([0.0] + [p[0] for p in points])
+        y = np.array([0.0] + [p[1] for p in points])
+        tail = (y[-1] - y[-2]) / (x[-1] - x[-2]) if len(x) > 1 and x[-1] > x[-2] else 0.0
+        return cls(x, y, float(max(tail, 0.0)))
+
+    def __call__(self, exits: np.ndarray) -> np.ndarray:
+        out = np.interp(exits, self.exit_values, self.proceeds)
+        beyond = exits > self.exit_values[-1]
+        if self.tail_slope and beyond.any():
+            out[beyond] += (exits[beyond] - self.exit_values[-1]) * self.tail_slope
+        return out
+
+
+@dataclass
+class CompanyPosition:
+    """One portfolio company: our cheque, its scenarios and their curves."""
+    company_id: str
+    company_name: str
+    invested: float
+    valuation: float
+    invested_years_ago: float
+    scenario_names: List[str]
+    curves: List[ProceedsCurve]
+    weights: np.ndarray
+    sector: str = "unknown"
+    profiles: List[Dict[str, float]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.profiles:
+            self.profiles = [
+                SCENARIO_EXIT_PROFILES.get(name, SCENARIO_EXIT_PROFILES["base"])
+                for name in self.scenario_names
+            ]
+
+
+def scenario_weights(
+    scenario_names: Sequence[str],
+    valuation_direction: Optional[str] = None,
+    runway_months: Optional[float] = None,
+) -> np.ndarray:
+    """Probability of each next-round scenario from the health-scorer signals."""
+    table = SCENARIO_WEIGHTS.get(valuation_direction or "flat", SCENARIO_WEIGHTS["flat"])
+    w = np.array([table.get(name, 0.1) for name in scenario_names], dtype=float)
+    if runway_months is not None and 0 < runway_months < SHORT_RUNWAY_MONTHS:
+        w += np.array([0.2 if name == "bridge" else 0.0 for name in scenario_names])
+    total = w.sum()
+    return w / total if total > 0 else np.full(len(w), 1.0 / max(len(w), 1))
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    qs = np.percentile(values, _PERCENTILES)
+    out = {f"p{p}": round(float(q), 4) for p, q in zip(_PERCENTILES, qs)}
+    out["mean"] = round(float(values.mean()), 4)
+    return out
+
+
+def _fund_irr(
+    proceeds: np.ndarray,
+    exit_years: np.ndarray,
+    invested: np.ndarray,
+    invested_years: np.ndarray,
+    iterations: int = 48,
+) -> np.ndarray:
+    """Per-draw IRR by vectorized bisection on log1p(r) ∈ [log 0.01, log 11].
+
+    proceeds / exit_years: (draws, companies); invested / invested_years:
+    (companies,), times in years from the fund's first cheque.
+    """
+    draws = proceeds.shape[0]
+    lo = np.full(draws, math.log(0.01))
+    hi = np.full(draws, math.log(11.0))
+
+    def npv(g: np.ndarray) -> np.ndarray:
+        inflow = (proceeds * np.exp(-exit_years * g[:, None])).sum(axis=1)
+        outflow = np.exp(-np.outer(g, invested_years)) @ invested
+        return inflow - outflow
+
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        positive = npv(mid) > 0
+        lo = np.where(positive, mid, lo)
+        hi = np.where(positive, hi, mid)
+    irr = np.expm1(0.5 * (lo + hi))
+    irr[proceeds.sum(axis=1) <= 0] = -1.0
+    return irr
+
+
+def simulate_portfolio(
+    positions: Sequence[CompanyPosition],
+    fund_size: float,
+    draws: int = DEFAULT_DRAWS,
+    seed: Optional[int] = None,
+    macro_correlation: float = DEFAULT_MACRO_CORRELATION,
+    sector_correlation: float = DEFAULT_SECTOR_CORRELATION,
+    exit_volatility: float = DEFAULT_EXIT_VOLATILITY,
+) -> Dict[str, Any]:
+    """Sample ``draws`` correlated portfolio outcomes and summarize fund returns."""
+    start = time.perf_counter()
+    positions = [p for p in positions if p.invested > 0 and p.curves]
+    if not positions:
+        return {"error": "No invested companies with scenario waterfalls", "draws": 0}
+    draws = int(min(max(draws, 100), MAX_DRAWS))
+    rho_m = min(max(macro_correlation, 0.0), 0.95)
+    rho_s = min(max(sector_correlation, 0.0), 0.95 - rho_m)
+    rng = np.random.default_rng(seed)
+    n = len(positions)
+
+    # Latent outcome driver: macro + sector + idiosyncratic
+    sectors = sorted({p.sector for p in positions})
+    sector_idx = np.array([sectors.index(p.sector) for p in positions])
+    macro = rng.standard_normal((draws, 1))
+    sector = rng.standard_normal((draws, len(sectors)))[:, sector_idx]
+    z = (math.sqrt(rho_m) * macro + math.sqrt(rho_s) * sector
+         + math.sqrt(1.0 - rho_m - rho_s) * rng.standard_normal((draws, n)))
+    u = ndtr(z)
+    pick = rng.random((draws, n))
+    jitter = rng.uniform(-1.0, 1.0, (draws, n))
+
+    proceeds = np.zeros((draws, n))
+    exit_years = np.zeros((draws, n))
+    invested = np.array([p.invested for p in positions])
+    first_cheque = max(p.invested_years_ago for p in positions)
+    invested_years = first_cheque - np.array([p.invested_years_ago for p in positions])
+
+    for i, pos in enumerate(positions):
+        cdf = np.cumsum(pos.weights)
+        scenario = np.minimum(np.searchsorted(cdf, pick[:, i] * cdf[-1], side="right"), len(cdf) - 1)
+        for s, (curve, profile) in enumerate(zip(pos.curves, pos.profiles)):
+            rows = np.nonzero(scenario == s)[0]
+            if not rows.size:
+                continue
+            failed = u[rows, i] < profile["failure_rate"]
+            exits = pos.valuation * profile["exit_multiple"] * np.exp(exit_volatility * z[rows, i])
+            exits[failed] = 0.0
+            proceeds[rows, i] = curve(exits)
+            exit_years[rows, i] = first_cheque + np.maximum(profile["holding_years"] + jitter[rows, i], 1.0)
+
+    total_invested = float(invested.sum())
+    total = proceeds.sum(axis=1)
+    moic = total / total_invested
+    dpi = total / fund_size if fund_size > 0 else moic
+    irr = _fund_irr(proceeds, exit_years, invested, invested_years)
+    hurdle = fund_size if fund_size > 0 else total_invested
+
+    expected_total = float(total.mean())
+    contributions = []
+    for i, pos in enumerate(positions):
+        col = proceeds[:, i]
+        invested_without = total_invested - pos.invested
+        moic_without = (expected_total - float(col.mean())) / invested_without if invested_without > 0 else 0.0
+        contributions.append({
+            "company_id": pos.company_id,
+            "company_name": pos.company_name,
+            "invested": round(pos.invested, 0),
+            "expected_proceeds": round(float(col.mean()), 0),
+            "pct_of_expected_proceeds": round(float(col.mean()) / expected_total * 100, 1) if expected_total > 0 else 0.0,
+            "expected_moic": round(float(col.mean()) / pos.invested, 2),
+            "p90_proceeds": round(float(np.percentile(col, 90)), 0),
+            "prob_loss": round(float((col < pos.invested).mean()), 4),
+            "marginal_moic_impact": round(float(moic.mean()) - moic_without, 3),
+            "prob_return_fund_without": round(float(((total - col) >= hurdle).mean()), 4),
+        })
+    contributions.sort(key=lambda c: c["expected_proceeds"], reverse=True)
+
+    # Range stops at p99 so one outlier doesn't flatten the chart; the tail
+    # is clipped into the last bin so probabilities still sum to 1
+    upper = float(np.percentile(moic, 99)) or 1.0
+    counts, edges = np.histogram(np.clip(moic, 0.0, upper), bins=40, range=(0.0, upper))
+    elapsed = (time.perf_counter() - start) * 1000
+    logger.info("[PORTFOLIO_MC] %d draws × %d companies in %.0fms", draws, n, elapsed)
+
+    return {
+        "draws": draws,
+        "seed": seed,
+        "companies": n,
+        "total_invested": round(total_invested, 0),
+        "fund_size": fund_size,
+        "assumptions": {
+            "macro_correlation": rho_m,
+            "sector_correlation": rho_s,
+            "exit_volatility": exit_volatility,
+            "scenario_profiles": SCENARIO_EXIT_PROFILES,
+        },
+        "fund_moic": _percentiles(moic),
+        "fund_irr": _percentiles(irr),
+        "fund_dpi": _percentiles(dpi),
+        "prob_return_fund": round(float((total >= hurdle).mean()), 4),
+        "prob_loss": round(float((moic < 1.0).mean()), 4),
+        "company_contributions": contributions,
+        "moic_histogram": {
+            "bin_edges": edges.round(4).tolist(),
+            "probabilities": (counts / draws).round(5).tolist(),
+        },
+        "elapsed_ms": round(elapsed, 1),
+    }
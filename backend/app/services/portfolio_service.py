@@ -19,6 +19,35 @@ def _get_client():
         return None
 
 
+_SEARCH_COLUMNS = (
+    "id, name, sector, stage, description, current_arr_usd, "
+    "current_valuation_usd, last_valuation_usd, "
+    "growth_rate, employee_count, hq_location, founded_year, "
+    "burn_rate_monthly_usd, runway_months, business_model"
+)
+
+
+def _format_search_hit(c: Dict[str, Any]) -> Dict[str, Any]:
+    """companies row → the shape search_companies_db returns to agents."""
+    return {
+        "company_id": c.get("id"),
+        "name": c.get("name", ""),
+        "sector": c.get("sector", ""),
+        "stage": c.get("stage", ""),
+        "description": c.get("description", ""),
+        "arr": c.get("current_arr_usd"),
+        "valuation": c.get("current_valuation_usd") or c.get("last_valuation_usd"),
+        "total_funding": c.get("total_funding_usd"),
+        "growth_rate": c.get("growth_rate"),
+        "employee_count": c.get("employee_count"),
+        "hq": c.get("hq_location", ""),
+        "founded": c.get("founded_year"),
+        "burn_rate": c.get("burn_rate_monthly_usd"),
+        "runway_months": c.get("runway_months"),
+        "business_model": c.get("business_model", ""),
+    }
+
+
 class PortfolioService:
     """Portfolio service with real Supabase queries and graceful fallbacks."""
 
@@ -257,62 +286,49 @@ class PortfolioService:
     async def search_companies_db(self, query: str, limit: int = 10) -> Dict[str, Any]:
         """Fuzzy search the rich companies table (1k+ companies).
 
-        Searches name, sector, description via ilike for broad matching.
+        Matches name first, then sector / description, then fuzzy name —
+        served from the in-process company index (services/company_index),
+        with the ilike queries as a fallback when the index can't load.
         Returns top matches with key fields for the agent to use.
         """
         client = self._client()
         if not client:
             return {"companies": [], "error": "Supabase unavailable"}
         try:
-            # Try exact ilike on name first
-            result = client.table("companies").select(
-                "id, name, sector, stage, description, current_arr_usd, "
-                "current_valuation_usd, last_valuation_usd, "
-                "growth_rate, employee_count, hq_location, founded_year, "
-                "burn_rate_monthly_usd, runway_months, business_model"
-            ).ilike("name", f"%{query}%").limit(limit).execute()
-
-            companies = result.data or []
-
-            # If not enough, broaden to sector + description
-            if len(companies) < 3:
-                broader = client.table("companies").select(
-                    "id, name, sector, stage, description, current_arr_usd, "
-                    "current_valuation_usd, last_valuation_usd, "
-                    "growth_rate, employee_count, hq_location, founded_year, "
-                    "burn_rate_monthly_usd, runway_months, business_model"
-                ).or_(
-                    f"sector.ilike.%{query}%,description.ilike.%{query}%"
-                ).limit(limit).execute()
-                existing_ids = {c.get("id") for c in companies}
-                for c in (broader.data or []):
-                    if c.get("id") not in existing_ids:
-                        companies.append(c)
-
-            formatted = []
-            for c in companies[:limit]:
-                formatted.append({
-                    "company_id": c.get("id"),
-                    "name": c.get("name", ""),
-                    "sector": c.get("sector", ""),
-                    "stage": c.get("stage", ""),
-                    "description": c.get("description", ""),
-                    "arr": c.get("current_arr_usd"),
-                    "valuation": c.get("current_valuation_usd") or c.get("last_valuation_usd"),
-                    "total_funding": c.get("total_funding_usd"),
-                    "growth_rate": c.get("growth_rate"),
-                    "employee_count": c.get("employee_count"),
-                    "hq": c.get("hq_location", ""),
-                    "founded": c.get("founded_year"),
-                    "burn_rate": c.get("burn_rate_monthly_usd"),
-                    "runway_months": c.get("runway_months"),
-                    "business_model": c.get("business_model", ""),
-                })
+            from app.services.company_index import company_index
+
+            if await company_index.ensure_fresh():
+                formatted = [
+                    {**_format_search_hit(c), "match": match}
+                    for c, match in company_index.search(query, limit=limit)
+                ]
+            else:
+                formatted = [_format_search_hit(c) for c in self._search_companies_query(client, query, limit)]
             return {"companies": formatted, "count": len(formatted), "query": query}
         except Exception as e:
             logger.error(f"PortfolioService.search_companies_db failed: {e}")
             return {"companies": [], "error": str(e)}
 
+    @staticmethod
+    def _search_companies_query(client, query: str, limit: int) -> List[Dict[str, Any]]:
+        # Try exact ilike on name first
+        result = client.table("companies").select(_SEARCH_COLUMNS).ilike(
+            "name", f"%{query}%"
+        ).limit(limit).execute()
+
+        companies = result.data or []
+
+        # If not enough, broaden to sector + description
+        if len(companies) < 3:
+            broader = client.table("companies").select(_SEARCH_COLUMNS).or_(
+                f"sector.ilike.%{query}%,description.ilike.%{query}%"
+            ).limit(limit).execute()
+            existing_ids = {c.get("id") for c in companies}
+            for c in (broader.data or []):
+                if c.get("id") not in existing_ids:
+                    companies.append(c)
+        return companies[:limit]
+
     async def get_portfolio_company_names(self, fund_id: Optional[str] = None) -> Set[str]:
         """Return a set of lowercased company names already in the DB.
 
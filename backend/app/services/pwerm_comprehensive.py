@@ -1,11 +1,20 @@
 """
 Comprehensive PWERM Implementation with Full Exit Scenario Matrix
 Combines funding path history with exit probabilities
+
+The template matrix is built once per process and shared, as read-only
+parallel arrays (ScenarioMatrix). ``calculate_valuation`` values one company
+with a full scenario breakdown; ``calculate_valuations_batch`` values a whole
+portfolio column at once with NumPy broadcasting:
+
+    pwerm = ComprehensivePWERM()
+    rows = pwerm.calculate_valuations_batch(companies, discount_rate=0.25, dlom=0.30)
 """
 
+import functools
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -34,6 +43,101 @@ class ComprehensivePWERMScenario:
         return (self.exit_value_range[0] + self.exit_value_range[1]) / 2
 
 
+@dataclass(frozen=True)
+class ScenarioMatrix:
+    """The template scenario matrix as read-only parallel arrays, one slot per scenario.
+
+    Shared by every ComprehensivePWERM instance — never mutate it; use
+    ``materialize`` to get scenario objects a caller may modify.
+    """
+    scenario_types: Tuple[str, ...]
+    funding_paths: Tuple[str, ...]
+    exit_descriptions: Tuple[str, ...]
+    exit_low: np.ndarray
+    exit_high: np.ndarray
+    exit_value: np.ndarray
+    probability: np.ndarray
+    time_to_exit: np.ndarray
+    path_rounds: np.ndarray      # funding_path.count(',') + 1
+    path_unique: np.ndarray      # len(set(funding_path.split(',')))
+    is_ipo: np.ndarray
+    is_liquidation: np.ndarray
+    is_acquisition: np.ndarray
+    is_pe_buyout: np.ndarray
+    type_names: Tuple[str, ...]  # distinct scenario types, first-seen order
+    type_onehot: np.ndarray      # (scenarios, types)
+
+    @classmethod
+    def from_scenarios(cls, scenarios: Sequence[ComprehensivePWERMScenario]) -> "ScenarioMatrix":
+        types = tuple(sc.scenario_type for sc in scenarios)
+        paths = tuple(sc.funding_path for sc in scenarios)
+        type_names = tuple(dict.fromkeys(types))
+        onehot = np.zeros((len(scenarios), len(type_names)))
+        onehot[np.arange(len(scenarios)), [type_names.index(t) for t in types]] = 1.0
+
+        def _array(values, dtype=float):
+            arr = np.asarray(values, dtype=dtype)
+            arr.setflags(write=False)
+            return arr
+
+        onehot.setflags(write=False)
+        return cls(
+            scenario_types=types,
+            funding_paths=paths,
+            exit_descriptions=tuple(sc.exit_description for sc in scenarios),
+            exit_low=_array([sc.exit_value_range[0] for sc in scenarios]),
+            exit_high=_array([sc.exit_value_range[1] for sc in scenarios]),
+            exit_value=_array([sc.exit_value for sc in scenarios]),
+            probability=_array([sc.probability for sc in scenarios]),
+            time_to_exit=_array([sc.time_to_exit for sc in scenarios]),
+            path_rounds=_array([p.count(',') + 1 for p in paths], int),
+            path_unique=_array([len(set(p.split(','))) for p in paths], int),
+            is_ipo=_array(['IPO' in t for t in types], bool),
+            is_liquidation=_array([t == 'Liquidation' for t in types], bool),
+            is_acquisition=_array(['Acquisition' in t for t in types], bool),
+            is_pe_buyout=_array([t == 'PE Buyout' for t in types], bool),
+            type_names=type_names,
+            type_onehot=onehot,
+        )
+
+    def __len__(self) -> int:
+        return len(self.scenario_types)
+
+    def path_mask(self, rounds: np.ndarray, unique: np.ndarray) -> np.ndarray:
+        """(companies, scenarios) mask of scenarios reachable from each funding path.
+
+        Same rule as ``ComprehensivePWERM._filter_scenarios_by_path``: within two
+        rounds, and the current path no more than two rounds longer.
+        """
+        rounds = np.asarray(rounds)[:, None]
+        unique = np.asarray(unique)[:, None]
+        return (np.abs(self.path_rounds[None, :] - rounds) <= 2) & (unique <= self.path_unique[None, :] + 2)
+
+    def materialize(self, indices: Optional[Sequence[int]] = None) -> List[ComprehensivePWERMScenario]:
+        """Fresh scenario objects for ``indices`` (default: all), in matrix order."""
+        if indices is None:
+            indices = range(len(self))
+        return [
+            ComprehensivePWERMScenario(
+                scenario_type=self.scenario_types[i],
+                funding_path=self.funding_paths[i],
+                exit_value_range=(float(self.exit_low[i]), float(self.exit_high[i])),
+                exit_description=self.exit_descriptions[i],
+                probability=float(self.probability[i]),
+                time_to_exit=float(self.time_to_exit[i]),
+            )
+            for i in indices
+        ]
+
+
+@functools.lru_cache(maxsize=1)
+def scenario_matrix() -> ScenarioMatrix:
+    """The process-wide template matrix (built on first use)."""
+    matrix = ScenarioMatrix.from_scenarios(ComprehensivePWERM._build_full_scenario_matrix())
+    logger.info("PWERM scenario matrix built: %d scenarios", len(matrix))
+    return matrix
+
+
 class ComprehensivePWERM:
     """
     Full PWERM implementation with 300+ scenarios based on funding path
@@ -91,9 +195,30 @@ class ComprehensivePWERM:
         }
     }
     
+    # Median valuations per stage that the template scenarios are scaled against
+    STAGE_BASE_VALUATIONS = {
+        'pre_seed': 5_000_000,       # $5M pre-seed
+        'pre-seed': 5_000_000,       # $5M pre-seed (alternate spelling)
+        'seed': 20_000_000,          # $20M seed
+        'series_a': 50_000_000,      # $50M Series A
+        'series_b': 150_000_000,     # $150M Series B
+        'series_c': 400_000_000,     # $400M Series C
+        'series_d': 800_000_000,     # $800M Series D
+        'series_e': 1_500_000_000,   # $1.5B Series E
+        'series_f': 3_000_000_000,   # $3B Series F
+        'growth': 250_000_000,       # $250M growth stage
+        'late': 1_000_000_000,       # $1B late stage
+        'unknown': 100_000_000,      # $100M default
+    }
+
     def __init__(self):
-        """Initialize with full scenario matrix"""
-        self.scenarios = self._build_full_scenario_matrix()
+        """Attach the shared scenario matrix (built once per process)"""
+        self.matrix = scenario_matrix()
+
+    @property
+    def scenarios(self) -> List[ComprehensivePWERMScenario]:
+        """Fresh copies of every template scenario."""
+        return self.matrix.materialize()
     
     def _parse_funding_path(self, company_data: Dict) -> str:
         """
@@ -154,7 +279,8 @@ class ComprehensivePWERM:
         
         return path
     
-    def _build_full_scenario_matrix(self) -> List[ComprehensivePWERMScenario]:
+    @classmethod
+    def _build_full_scenario_matrix(cls) -> List[ComprehensivePWERMScenario]:
         """
         Build complete scenario matrix with base dollar amounts.
         These are for a typical $100M Series A company and will be scaled.
@@ -181,7 +307,7 @@ class ComprehensivePWERM:
         for value_range in liquidation_ranges:
             for path in liquidation_paths:
                 # Get probability from benchmark data
-                base_prob = self.EXIT_PROBABILITIES.get('Liquidation', {}).get(path, 0.20)
+                base_prob = cls.EXIT_PROBABILITIES.get('Liquidation', {}).get(path, 0.20)
                 # Adjust slightly based on exit value (lower values more likely)
                 value_adjustment = 1.0 + (45 - value_range[1]) / 100  # Higher prob for lower values
                 adjusted_prob = base_prob * value_adjustment / len(liquidation_ranges)
@@ -209,7 +335,7 @@ class ComprehensivePWERM:
         for value_range in acquihire_ranges:
             for path in acquihire_paths:
                 # Get base probability from benchmark data
-                base_prob = self.EXIT_PROBABILITIES.get('Acquihire', {}).get(path, 0.10)
+                base_prob = cls.EXIT_PROBABILITIES.get('Acquihire', {}).get(path, 0.10)
                 # Distribute across value ranges, slightly favoring lower values  
                 value_adjustment = 1.0 + (30 - value_range[1]) / 50
                 adjusted_prob = base_prob * value_adjustment / len(acquihire_ranges)
@@ -232,7 +358,7 @@ class ComprehensivePWERM:
         for value_range in acquisition_ranges:
             for path in ["Pre-seed,seed and A", "Pre-seed,seed,A,B", "Pre-seed,seed,A,B,C"]:
                 # Get base probability from benchmark data
-                base_prob = self.EXIT_PROBABILITIES.get('Strategic Acquisition', {}).get(path, 0.15)
+                base_prob = cls.EXIT_PROBABILITIES.get('Strategic Acquisition', {}).get(path, 0.15)
                 # Distribute across value ranges, peak around mid-range
                 value_adjustment = 1.0 - abs(value_range[0] - 250) / 500
                 value_adjustment = max(0.5, value_adjustment)  # Ensure minimum adjustment
@@ -280,7 +406,7 @@ class ComprehensivePWERM:
             for value_range in ipo_config['ranges']:
                 for path in ipo_config['paths']:
                     # Get base probability from benchmark data
-                    base_prob = self.EXIT_PROBABILITIES.get('IPO', {}).get(path, 0.05)
+                    base_prob = cls.EXIT_PROBABILITIES.get('IPO', {}).get(path, 0.05)
                     # Distribute across IPO tiers and value ranges
                     # Higher tier IPOs (larger multiples) are less likely
                     tier_index = ipo_scenarios.index(ipo_config)
@@ -304,7 +430,7 @@ class ComprehensivePWERM:
         for value_range in rollup_ranges:
             for path in ["Pre-seed,seed,A,B", "Pre-seed,seed,A,B,C"]:
                 # Get base probability from benchmark data
-                base_prob = self.EXIT_PROBABILITIES.get('Roll-up', {}).get(path, 0.03)
+                base_prob = cls.EXIT_PROBABILITIES.get('Roll-up', {}).get(path, 0.03)
                 # Distribute across value ranges
                 adjusted_prob = base_prob / len(rollup_ranges)
                 
@@ -324,7 +450,7 @@ class ComprehensivePWERM:
         for value_range in pe_ranges:
             for path in ["Pre-seed,seed,A,B,C", "Pre-seed,seed,A,B,C,D"]:
                 # Get base probability from benchmark data
-                base_prob = self.EXIT_PROBABILITIES.get('PE Buyout', {}).get(path, 0.08)
+                base_prob = cls.EXIT_PROBABILITIES.get('PE Buyout', {}).get(path, 0.08)
                 # Distribute across value ranges
                 adjusted_prob = base_prob / len(pe_ranges)
                 
@@ -419,26 +545,107 @@ class ComprehensivePWERM:
             'methodology': 'Comprehensive PWERM with funding path analysis'
         }
     
+    def calculate_valuations_batch(
+        self,
+        companies: Sequence[Dict],
+        discount_rate: Union[float, Sequence[float]] = 0.25,
+        dlom: Union[float, Sequence[float]] = 0.30,
+        scale: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Value many companies at once against the shared scenario matrix.
+
+        Same numbers as ``calculate_valuation`` (path filter, scaling,
+        probability adjustment, PV, DLOM) computed as (companies x scenarios)
+        arrays. ``discount_rate`` / ``dlom`` may be scalars or one per company.
+        ``scale=False`` keeps the $100M template exit values, as
+        ValuationEngineService's PWERM does.
+
+        Returns one summary dict per company (no per-scenario objects).
+        """
+        n = len(companies)
+        if n == 0:
+            return []
+        m = self.matrix
+
+        # Per-company inputs — funding paths repeat a lot across a portfolio
+        paths = [self._parse_funding_path(c) for c in companies]
+        shapes = {p: self._path_shape(p) for p in set(paths)}
+        rounds = np.array([shapes[p][0] for p in paths])
+        unique = np.array([shapes[p][1] for p in paths])
+        mults = np.array([self._probability_multipliers(c) for c in companies])
+        scale_factors = (
+            np.array([float(self._scale_factor(c)[0]) for c in companies]) if scale else np.ones(n)
+        )
+        rate = np.broadcast_to(np.asarray(discount_rate, dtype=float), (n,))
+        dlom_arr = np.broadcast_to(np.asarray(dlom, dtype=float), (n,))
+
+        mask = m.path_mask(rounds, unique)
+
+        # Probability adjustment + renormalisation over each company's relevant set
+        prob = np.where(mask, m.probability[None, :], 0.0)
+        prob = prob * np.where(m.is_ipo[None, :], mults[:, 0:1], 1.0)
+        prob = prob * np.where(m.is_liquidation[None, :], mults[:, 1:2], 1.0)
+        prob = prob * np.where(m.is_acquisition[None, :], mults[:, 2:3], 1.0)
+        prob = prob * np.where(m.is_pe_buyout[None, :], mults[:, 3:4], 1.0)
+        totals = prob.sum(axis=1, keepdims=True)
+        prob = np.divide(prob, totals, out=np.zeros_like(prob), where=totals > 0)
+
+        # Scaled midpoint exit values, discounted to present value
+        if scale:
+            exit_values = (m.exit_low[None, :] * scale_factors[:, None]
+                           + m.exit_high[None, :] * scale_factors[:, None]) / 2
+        else:
+            exit_values = np.broadcast_to(m.exit_value[None, :], (n, len(m)))
+        present_values = exit_values / (1 + rate[:, None]) ** m.time_to_exit[None, :]
+
+        weighted = prob * present_values
+        total_value = weighted.sum(axis=1)
+        fair_value = total_value * (1 - dlom_arr)
+        group_prob = prob @ m.type_onehot
+        group_value = weighted @ m.type_onehot
+        counts = mask.sum(axis=1)
+
+        results = []
+        for i in range(n):
+            groups = {
+                name: {
+                    'total_probability': float(group_prob[i, t]),
+                    'weighted_value': float(group_value[i, t]),
+                }
+                for t, name in enumerate(m.type_names)
+                if group_prob[i, t] > 0
+            }
+            results.append({
+                'valuation': float(fair_value[i]),
+                'fair_value': float(fair_value[i]),
+                'pre_dlom_value': float(total_value[i]),
+                'expected_return': float(total_value[i]),
+                'dlom_applied': float(dlom_arr[i]),
+                'discount_rate': float(rate[i]),
+                'funding_path': paths[i],
+                'scale_factor': float(scale_factors[i]),
+                'scenario_count': int(counts[i]),
+                'scenario_groups': groups,
+                'methodology': 'Comprehensive PWERM with funding path analysis',
+            })
+        return results
+
     def _filter_scenarios_by_path(self, funding_path: str) -> List[ComprehensivePWERMScenario]:
         """
-        Filter scenarios to those relevant for the company's funding path
+        Filter scenarios to those relevant for the company's funding path.
+        Returns fresh copies — callers may adjust them freely.
         """
-        relevant_scenarios = []
-        
-        # Count funding rounds
+        rounds, unique = self._path_shape(funding_path)
+        mask = self.matrix.path_mask(np.array([rounds]), np.array([unique]))[0]
+        return self.matrix.materialize(np.flatnonzero(mask))
+
+    @staticmethod
+    def _path_shape(funding_path: str) -> Tuple[int, int]:
+        """(round count, distinct rounds) — all the path filter looks at."""
         rounds_count = funding_path.count(',') + 1 if funding_path != "Pre-seed only" else 1
-        
-        for scenario in self.scenarios:
-            scenario_rounds = scenario.funding_path.count(',') + 1
-            
-            # Include scenarios with similar or next stage funding paths
-            if abs(scenario_rounds - rounds_count) <= 2:
-                # Check if the path is a logical progression
-                if self._is_logical_progression(funding_path, scenario.funding_path):
-                    relevant_scenarios.append(scenario)
-        
-        return relevant_scenarios
-    
+        return rounds_count, len(set(funding_path.split(',')))
+
     def _is_logical_progression(self, current_path: str, scenario_path: str) -> bool:
         """
         Check if scenario path is a logical progression from current path
@@ -460,29 +667,17 @@ class ComprehensivePWERM:
         Adjust scenario probabilities based on company-specific factors
         """
         adjusted = scenarios.copy()
-        
-        # Factors that affect probabilities
-        growth_rate = company_data.get('growth_rate', 1.0)
-        burn_rate = company_data.get('burn_rate', 0)
-        runway = company_data.get('runway_months', 12)
-        revenue = company_data.get('revenue', 0)
+        ipo_mult, liquidation_mult, acquisition_mult, pe_mult = self._probability_multipliers(company_data)
         
         for scenario in adjusted:
-            # High growth increases IPO probability
-            if 'IPO' in scenario.scenario_type and growth_rate > 2.0:
-                scenario.probability *= 1.5
-            
-            # Low runway increases liquidation probability
-            if scenario.scenario_type == 'Liquidation' and runway < 6:
-                scenario.probability *= 2.0
-            
-            # Strong revenue increases acquisition probability
-            if 'Acquisition' in scenario.scenario_type and revenue > 10_000_000:
-                scenario.probability *= 1.3
-            
-            # Adjust for market conditions (could be dynamic)
+            if 'IPO' in scenario.scenario_type:
+                scenario.probability *= ipo_mult
+            if scenario.scenario_type == 'Liquidation':
+                scenario.probability *= liquidation_mult
+            if 'Acquisition' in scenario.scenario_type:
+                scenario.probability *= acquisition_mult
             if scenario.scenario_type == 'PE Buyout':
-                scenario.probability *= 1.2  # PE is active in current market
+                scenario.probability *= pe_mult
         
         # Renormalize probabilities
         total_prob = sum(s.probability for s in adjusted)
@@ -491,14 +686,25 @@ class ComprehensivePWERM:
         
         return adjusted
     
-    def _scale_scenarios_to_company(
-        self,
-        scenarios: List[ComprehensivePWERMScenario],
-        company_data: Dict
-    ) -> List[ComprehensivePWERMScenario]:
+    def _probability_multipliers(self, company_data: Dict) -> Tuple[float, float, float, float]:
         """
-        Scale scenario exit values based on company's actual valuation.
-        This transforms the hardcoded template values into company-specific ranges.
+        Company-specific probability multipliers for (IPO, Liquidation,
+        Acquisition, PE Buyout) scenarios
+        """
+        growth_rate = self._ensure_numeric(company_data.get('growth_rate', 1.0), 1.0)
+        runway = self._ensure_numeric(company_data.get('runway_months', 12), 12)
+        revenue = self._ensure_numeric(company_data.get('revenue', 0), 0)
+        return (
+            1.5 if growth_rate > 2.0 else 1.0,        # High growth increases IPO probability
+            2.0 if runway < 6 else 1.0,               # Low runway increases liquidation probability
+            1.3 if revenue > 10_000_000 else 1.0,     # Strong revenue increases acquisition probability
+            1.2,                                      # PE is active in current market (could be dynamic)
+        )
+
+    def _scale_factor(self, company_data: Dict) -> Tuple[float, str, float, float]:
+        """
+        (scale factor, stage, current valuation, stage base) mapping the $100M
+        template onto the company's actual valuation
         """
         # Extract company's current valuation
         current_val = (
@@ -517,28 +723,19 @@ class ComprehensivePWERM:
         if isinstance(stage, str):
             stage = stage.lower().replace(' ', '_')
         
-        # Define base valuations that the hardcoded scenarios assume
-        # These are the median valuations for each stage
-        stage_bases = {
-            'pre_seed': 5_000_000,       # $5M pre-seed
-            'pre-seed': 5_000_000,       # $5M pre-seed (alternate spelling)
-            'seed': 20_000_000,          # $20M seed
-            'series_a': 50_000_000,      # $50M Series A
-            'series_b': 150_000_000,     # $150M Series B
-            'series_c': 400_000_000,     # $400M Series C
-            'series_d': 800_000_000,     # $800M Series D
-            'series_e': 1_500_000_000,   # $1.5B Series E
-            'series_f': 3_000_000_000,   # $3B Series F
-            'growth': 250_000_000,       # $250M growth stage
-            'late': 1_000_000_000,       # $1B late stage
-            'unknown': 100_000_000,      # $100M default
-        }
-        
-        # Get the base valuation for this stage
-        stage_base = stage_bases.get(stage, 100_000_000)
-        
-        # Calculate the scaling factor
-        scale_factor = current_val / stage_base
+        stage_base = self.STAGE_BASE_VALUATIONS.get(stage, 100_000_000)
+        return current_val / stage_base, stage, current_val, stage_base
+
+    def _scale_scenarios_to_company(
+        self,
+        scenarios: List[ComprehensivePWERMScenario],
+        company_data: Dict
+    ) -> List[ComprehensivePWERMScenario]:
+        """
+        Scale scenario exit values based on company's actual valuation.
+        This transforms the hardcoded template values into company-specific ranges.
+        """
+        scale_factor, stage, current_val, stage_base = self._scale_factor(company_data)
         
         logger.info(f"Scaling PWERM scenarios: current_val=${current_val:,.0f}, stage={stage}, base=${stage_base:,.0f}, scale={scale_factor:.2f}x")
         
@@ -584,7 +781,7 @@ class ComprehensivePWERM:
         """
         if value is None:
             return default
-        if isinstance(value, (int, float)):
+        if isinstance(value, (int, float, Decimal, np.number)):
             return float(value)
         if isinstance(value, dict) and 'value' in value:
             return float(value['value'])
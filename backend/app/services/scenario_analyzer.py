@@ -13,6 +13,7 @@ import json
 
 from app.core.database import supabase_service
 from app.services.world_model_builder import WorldModelBuilder
+from app.services.world_model_engine import world_model_engine
 from app.services.pwerm_comprehensive import ComprehensivePWERM
 
 logger = logging.getLogger(__name__)
@@ -120,32 +121,27 @@ class ScenarioAnalyzer:
         # Get world model
         model_data = await self.model_builder.get_model(model_id)
         factors = model_data.get("factors", [])
-        factor_map = {f["id"]: f for f in factors}
         
-        # Apply factor overrides
+        # Apply factor overrides and recompute the formula factors they feed
         factor_overrides = scenario.get("factor_overrides", {})
+        compiled = world_model_engine.compile(model_id, model_data)
+        base_values = compiled.results()
+        overrides = {fid: value for fid, value in factor_overrides.items() if fid in base_values}
+        run = compiled.run_scenarios([overrides]) if overrides else {"factors": {}}
+        scenario_values = {fid: column[0] for fid, column in run["factors"].items()}
         scenario_factors = {}
         
         for factor in factors:
             factor_id = factor["id"]
-            if factor_id in factor_overrides:
-                # Use override value
-                scenario_factors[factor_id] = {
-                    "factor_id": factor_id,
-                    "factor_name": factor["factor_name"],
-                    "base_value": factor.get("current_value"),
-                    "scenario_value": factor_overrides[factor_id],
-                    "change": self._calculate_change(factor.get("current_value"), factor_overrides[factor_id])
-                }
-            else:
-                # Use base value
-                scenario_factors[factor_id] = {
-                    "factor_id": factor_id,
-                    "factor_name": factor["factor_name"],
-                    "base_value": factor.get("current_value"),
-                    "scenario_value": factor.get("current_value"),
-                    "change": 0
-                }
+            base_value = base_values.get(factor_id, factor.get("current_value"))
+            scenario_value = scenario_values.get(factor_id, base_value)
+            scenario_factors[factor_id] = {
+                "factor_id": factor_id,
+                "factor_name": factor["factor_name"],
+                "base_value": base_value,
+                "scenario_value": scenario_value,
+                "change": self._calculate_change(base_value, scenario_value)
+            }
         
         # Calculate model outputs (e.g., valuation, NAV)
         model_outputs = await self._calculate_model_outputs(
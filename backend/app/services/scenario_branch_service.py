@@ -12,33 +12,30 @@ Handles:
 """
 
 import logging
-import time
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+from app.core.cache_bus import VersionedCache, cache_bus
 
 logger = logging.getLogger(__name__)
 
-# Module-level cache: branch trees don't change between agent tool calls.
-# Key: company_id → (monotonic_time, {branch_id: branch_dict})
-_BRANCH_TREE_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
-_BRANCH_CACHE_TTL: float = 60.0
+# Module-level cache: company_id → {branch_id: branch_dict}. Evicted in every
+# worker when any process writes the company's branches (core/cache_bus).
+_BRANCH_TREE_CACHE = VersionedCache("branch_tree", scope="branches")
 
 
 def _get_cached_branch_tree(company_id: str) -> Optional[Dict[str, Any]]:
-    entry = _BRANCH_TREE_CACHE.get(company_id)
-    if entry and (time.monotonic() - entry[0]) < _BRANCH_CACHE_TTL:
-        return entry[1]
-    return None
+    return _BRANCH_TREE_CACHE.get(company_id)
 
 
-def _set_branch_tree_cache(company_id: str, by_id: Dict[str, Any]) -> None:
-    _BRANCH_TREE_CACHE[company_id] = (time.monotonic(), by_id)
+def _set_branch_tree_cache(company_id: str, by_id: Dict[str, Any], token: Optional[int] = None) -> None:
+    _BRANCH_TREE_CACHE.set(company_id, by_id, token)
 
 
-def invalidate_branch_cache(company_id: str) -> None:
-    """Call after creating/updating/deleting a branch."""
-    _BRANCH_TREE_CACHE.pop(company_id, None)
+def invalidate_branch_cache(company_id: Optional[str]) -> None:
+    """Call after creating/updating/deleting a branch — evicts in every worker."""
+    cache_bus.invalidate(company_id, "branches")
 
 
 @dataclass
@@ -159,7 +156,7 @@ class ScenarioBranchService:
         Walk from branch_id up to root via parent_branch_id.
         Returns list ordered root-first: [root, ..., parent, self].
         Loads all branches for the company in one query to avoid N+1.
-        Results are cached for 60s — branch trees don't change mid-turn.
+        Trees are cached until a branch of the company is written.
         """
         if not sb:
             from app.core.supabase_client import get_supabase_client
@@ -169,7 +166,7 @@ class ScenarioBranchService:
 
         # Check if we have a cached tree that contains this branch
         # We need the company_id first — check all cached trees
-        for cid, (_, by_id) in list(_BRANCH_TREE_CACHE.items()):
+        for cid, by_id in _BRANCH_TREE_CACHE.items():
             if branch_id in by_id:
                 by_id_cached = _get_cached_branch_tree(cid)
                 if by_id_cached is not None:
@@ -183,11 +180,13 @@ class ScenarioBranchService:
             branch_row = result.data[0]
             company_id = branch_row["company_id"]
 
+            token = _BRANCH_TREE_CACHE.token(company_id)
             by_id = _get_cached_branch_tree(company_id)
-            if by_id is None:
+            if by_id is None or branch_id not in by_id:
+                # A cached tree without this branch predates its insert
                 all_result = sb.table("scenario_branches").select("*").eq("company_id", company_id).execute()
                 by_id = {b["id"]: b for b in (all_result.data or [])}
-                _set_branch_tree_cache(company_id, by_id)
+                _set_branch_tree_cache(company_id, by_id, token)
                 logger.debug("[BRANCH_CACHE] loaded %d branches for %s", len(by_id), company_id)
 
         chain = []
@@ -619,6 +618,7 @@ class ScenarioBranchService:
         for bid in reversed(to_delete):
             sb.table("scenario_branches").delete().eq("id", bid).execute()
 
+        invalidate_branch_cache(company_id)
         return to_delete
 
     # ------------------------------------------------------------------
@@ -6,13 +6,24 @@ cartesian product of paths, pruned by probability.
 
 At each node: revenue projections (via RevenueProjectionService), valuation,
 ownership (dilution from predicted rounds), and fund-level DPI/TVPI.
+
+Large portfolios: the product grows as N^companies, so past
+MAX_ENUMERATED_COMBINATIONS only the most probable combinations become
+nodes. Fund NAV / TVPI is additive across independently evolving
+companies, so the full fund distribution (tree.distribution) is the
+convolution of each company's outcomes — exact expected value and
+sensitivity for 100+ companies without enumerating anything.
 """
 
+import heapq
 import logging
+import math
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from itertools import product
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +106,101 @@ class ScenarioTree:
     companies: List[str] = field(default_factory=list)
     expected_value: Optional[FundSnapshot] = None
     sensitivity: Dict[str, float] = field(default_factory=dict)
+    mode: str = "enumerate"                       # or "distribution" (paths = top-k only)
+    distribution: Optional["FundDistribution"] = None
+
+
+@dataclass
+class CompanyOutcomes:
+    """One company projected along each of its growth paths (year 0 = today)."""
+    paths: List[GrowthPath]
+    snapshots: List[List[CompanySnapshot]]   # [path][year]
+    revenue: np.ndarray                      # (paths, years + 1)
+    valuation: np.ndarray
+    nav: np.ndarray                          # valuation × our ownership
+    sector: str = ""
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Path probabilities normalized to sum to 1 (uniform if all zero)."""
+        p = np.array([max(gp.probability, 0.0) for gp in self.paths], dtype=float)
+        total = p.sum()
+        return p / total if total > 0 else np.full(len(p), 1.0 / len(p))
+
+
+@dataclass
+class FundDistribution:
+    """Fund NAV distribution at the horizon over every path combination.
+
+    ``nav_pmf[i]`` is the probability that fund NAV ≈ ``nav_grid[i]``; the
+    grid is a FUND_DISTRIBUTION_BINS lattice (mass split between adjacent
+    points, so the mean is exact).
+    """
+    companies: List[str]
+    outcomes: List[CompanyOutcomes]
+    nav_grid: np.ndarray
+    nav_pmf: np.ndarray
+    num_combinations: int
+    fund_size: float
+    total_invested: float
+    distributions: float = 0.0
+
+    def expected_nav(self, year: int = -1) -> float:
+        return float(sum(o.weights @ o.nav[:, year] for o in self.outcomes))
+
+    def expected_company(self, year: int = -1) -> Dict[str, Dict[str, float]]:
+        return {
+            cname: {
+                "revenue": float(o.weights @ o.revenue[:, year]),
+                "valuation": float(o.weights @ o.valuation[:, year]),
+            }
+            for cname, o in zip(self.companies, self.outcomes)
+        }
+
+    def tvpi(self, nav: Any) -> Any:
+        if not self.total_invested:
+            return nav * 0.0
+        return (nav + self.distributions) / self.total_invested
+
+    def snapshot(self, year: int = -1) -> FundSnapshot:
+        nav = self.expected_nav(year)
+        return FundSnapshot(
+            nav=nav,
+            dpi=self.distributions / self.fund_size if self.fund_size else 0,
+            tvpi=float(self.tvpi(nav)),
+            rvpi=nav / self.total_invested if self.total_invested else 0,
+            total_invested=self.total_invested,
+            total_value=nav,
+            total_distributed=self.distributions,
+        )
+
+    def nav_percentile(self, q: float) -> float:
+        cdf = np.cumsum(self.nav_pmf)
+        i = int(np.searchsorted(cdf, q / 100.0 * cdf[-1]))
+        return float(self.nav_grid[min(i, len(self.nav_grid) - 1)])
+
+    def tvpi_percentiles(self, qs: Iterable[float] = (5, 25, 50, 75, 95)) -> Dict[str, float]:
+        return {f"p{q:g}": float(self.tvpi(self.nav_percentile(q))) for q in qs}
+
+    def probability_tvpi_at_least(self, multiple: float) -> float:
+        if not self.total_invested:
+            return 0.0
+        return float(self.nav_pmf[self.tvpi(self.nav_grid) >= multiple - 1e-12].sum())
+
+    def sensitivity(self) -> Dict[str, float]:
+        """Share of the best-to-worst fund swing owed to each company's path choice."""
+        spreads = [float(np.ptp(o.nav[:, -1])) for o in self.outcomes]
+        total = sum(spreads)
+        return {c: (s / total if total > 0 else 0.0) for c, s in zip(self.companies, spreads)}
+
+    def histogram(self, bins: int = 40) -> Dict[str, Any]:
+        values = self.tvpi(self.nav_grid) if self.total_invested else self.nav_grid
+        counts, edges = np.histogram(values, bins=bins, weights=self.nav_pmf)
+        return {
+            "bin_edges": edges.tolist(),
+            "probabilities": counts.tolist(),
+            "metric": "tvpi" if self.total_invested else "nav",
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -136,6 +242,95 @@ SECTOR_HEAT = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Fund outcome distribution
+# ---------------------------------------------------------------------------
+
+# Above this many path combinations build_tree(mode="auto") stops enumerating
+MAX_ENUMERATED_COMBINATIONS = 729      # 3 paths × 6 companies
+DEFAULT_TOP_K_PATHS = 25
+FUND_DISTRIBUTION_BINS = 1024
+
+
+def convolve_fund_distribution(
+    companies: List[str],
+    outcomes: List[CompanyOutcomes],
+    fund_context: Dict,
+    num_combinations: int,
+    bins: int = FUND_DISTRIBUTION_BINS,
+) -> FundDistribution:
+    """Fund NAV distribution at the horizon = convolution of per-company NAVs."""
+    final = [o.nav[:, -1] for o in outcomes]
+    lows = [float(v.min()) for v in final]
+    span = sum(float(v.max()) - lo for v, lo in zip(final, lows))
+    width = span / (bins - 1) if span > 0 else 1.0
+
+    pmf = np.ones(1)
+    for values, low, o in zip(final, lows, outcomes):
+        offset = (values - low) / width
+        lower = np.floor(offset).astype(int)
+        frac = offset - lower
+        mass = np.zeros(int(lower.max()) + 2)
+        np.add.at(mass, lower, o.weights * (1.0 - frac))
+        np.add.at(mass, lower + 1, o.weights * frac)
+        pmf = np.convolve(pmf, mass)
+
+    return FundDistribution(
+        companies=companies,
+        outcomes=outcomes,
+        nav_grid=sum(lows) + width * np.arange(len(pmf)),
+        nav_pmf=pmf,
+        num_combinations=num_combinations,
+        fund_size=fund_context.get("fund_size", 260_000_000),
+        total_invested=fund_context.get("total_invested", 0),
+        distributions=fund_context.get("distributions", 0),
+    )
+
+
+def _enumerate_combinations(
+    outcomes: List[CompanyOutcomes], min_probability: float,
+) -> List[Tuple[float, Tuple[int, ...]]]:
+    """Every combination of path indices at or above ``min_probability``."""
+    combos = []
+    for choice in product(*(range(len(o.paths)) for o in outcomes)):
+        prob = math.prod(o.paths[j].probability for o, j in zip(outcomes, choice))
+        if prob >= min_probability:
+            combos.append((prob, choice))
+    return combos
+
+
+def _most_probable_combinations(
+    outcomes: List[CompanyOutcomes], k: int,
+) -> List[Tuple[float, Tuple[int, ...]]]:
+    """The k most probable combinations, best first, without enumerating.
+
+    Best-first search over per-company path ranks: each popped combination
+    pushes the combinations that demote one company to its next path.
+    """
+    orders = [sorted(range(len(o.paths)), key=lambda j, o=o: -o.paths[j].probability) for o in outcomes]
+    logp = [
+        [math.log(o.paths[j].probability) if o.paths[j].probability > 0 else -1e9 for j in order]
+        for o, order in zip(outcomes, orders)
+    ]
+    start = (0,) * len(outcomes)
+    heap = [(-sum(lp[0] for lp in logp), start)]
+    seen = {start}
+    combos: List[Tuple[float, Tuple[int, ...]]] = []
+    while heap and len(combos) < k:
+        neg_score, ranks = heapq.heappop(heap)
+        choice = tuple(order[r] for order, r in zip(orders, ranks))
+        combos.append((math.prod(o.paths[j].probability for o, j in zip(outcomes, choice)), choice))
+        for i, r in enumerate(ranks):
+            if r + 1 >= len(orders[i]):
+                continue
+            nxt = ranks[:i] + (r + 1,) + ranks[i + 1:]
+            if nxt in seen:
+                continue
+            seen.add(nxt)
+            heapq.heappush(heap, (neg_score + logp[i][r] - logp[i][r + 1], nxt))
+    return combos
+
+
 # ---------------------------------------------------------------------------
 # Service
 # ---------------------------------------------------------------------------
@@ -149,6 +344,8 @@ class ScenarioTreeService:
         base_company_data: Dict[str, Dict],
         fund_context: Dict,
         years: int = 5,
+        mode: str = "auto",
+        top_k: int = DEFAULT_TOP_K_PATHS,
     ) -> ScenarioTree:
         """
         Build a branching tree from per-company growth paths.
@@ -159,14 +356,17 @@ class ScenarioTreeService:
                                                sector, investor_quality, ...}}
             fund_context: {fund_size, total_invested, current_dpi}
             years: projection horizon
+            mode: "enumerate" materializes every combination (pruned below 1%),
+                  "distribution" materializes only the ``top_k`` most probable;
+                  "auto" enumerates up to MAX_ENUMERATED_COMBINATIONS.
+
+        Companies evolve independently, so each company's paths are projected
+        once and the fund outcome distribution is convolved from the
+        per-company outcomes (tree.distribution) — expected value and
+        sensitivity come from that, not from the materialized paths.
         """
         company_names = sorted(company_paths.keys())
         fund_size = fund_context.get("fund_size", 260_000_000)
-        total_invested = fund_context.get("total_invested", 0)
-
-        # Enumerate every combination of paths across companies
-        path_lists = [company_paths[c] for c in company_names]
-        combos = list(product(*path_lists))
 
         # Root node (year 0 — current state)
         root_snapshots: Dict[str, CompanySnapshot] = {}
@@ -196,90 +396,132 @@ class ScenarioTreeService:
             label="Current State",
             fund_metrics=root_fund,
         )
+        result = ScenarioTree(root=root, fund_size=fund_size, companies=company_names)
+
+        if not company_names or any(not company_paths[c] for c in company_names):
+            result.expected_value = self.evaluate_expected_value(result)
+            return result
+
+        horizon = min(years, max(
+            len(gp.yearly_growth_rates) for c in company_names for gp in company_paths[c]
+        ))
+        outcomes = [
+            self._project_company_paths(
+                company_paths[cname], root_snapshots[cname], base_company_data.get(cname, {}), horizon,
+            )
+            for cname in company_names
+        ]
+        num_combinations = math.prod(len(o.paths) for o in outcomes)
+
+        if mode == "auto":
+            mode = "enumerate" if num_combinations <= MAX_ENUMERATED_COMBINATIONS else "distribution"
+        if mode == "enumerate":
+            combos = _enumerate_combinations(outcomes, min_probability=0.01)
+        elif mode == "distribution":
+            combos = _most_probable_combinations(outcomes, top_k)
+        else:
+            raise ValueError(f"Unknown scenario tree mode: {mode!r}")
 
-        all_paths: List[ScenarioPath] = []
-
-        for combo in combos:
-            combo_prob = 1.0
-            for gp in combo:
-                combo_prob *= gp.probability
-
-            # Skip extremely low-probability combos
-            if combo_prob < 0.01:
-                continue
+        for combo_prob, choice in combos:
+            result.paths.append(self._materialize_path(
+                root, company_names, outcomes, choice, combo_prob, fund_context, years,
+            ))
 
-            combo_label_parts = [gp.label for gp in combo]
-
-            # Walk year-by-year for this combination
-            parent_node = root
-            path_nodes = [root]
-            current_snapshots = dict(root_snapshots)
-
-            max_years = min(years, max(len(gp.yearly_growth_rates) for gp in combo))
-
-            for yr in range(1, max_years + 1):
-                year_snapshots: Dict[str, CompanySnapshot] = {}
-
-                for idx, cname in enumerate(company_names):
-                    gp = combo[idx]
-                    prev = current_snapshots[cname]
-                    cd = base_company_data.get(cname, {})
-
-                    # Growth rate for this year (pad with last rate if path is shorter)
-                    if yr - 1 < len(gp.yearly_growth_rates):
-                        growth_rate = gp.yearly_growth_rates[yr - 1]
-                    else:
-                        growth_rate = gp.yearly_growth_rates[-1] if gp.yearly_growth_rates else 0.0
-
-                    snap = self._project_company_snapshot(
-                        prev_snapshot=prev,
-                        growth_rate=growth_rate,
-                        year=yr,
-                        company_data=cd,
-                    )
-                    year_snapshots[cname] = snap
-
-                fund_snap = self._compute_fund_snapshot(year_snapshots, fund_context)
-                yr_label = ", ".join(
-                    f"{cname} {combo[i].yearly_growth_rates[yr-1]*100 if yr-1 < len(combo[i].yearly_growth_rates) else 0:.0f}%"
-                    for i, cname in enumerate(company_names)
-                    if yr - 1 < len(combo[i].yearly_growth_rates)
-                )
+        result.mode = mode
+        result.distribution = convolve_fund_distribution(
+            company_names, outcomes, fund_context, num_combinations,
+        )
+        result.expected_value = self.evaluate_expected_value(result)
+        result.sensitivity = self.sensitivity_by_company(result)
+        return result
 
-                node = ScenarioNode(
-                    node_id=str(uuid.uuid4())[:8],
+    def _project_company_paths(
+        self,
+        paths: List[GrowthPath],
+        root_snapshot: CompanySnapshot,
+        company_data: Dict,
+        horizon: int,
+    ) -> CompanyOutcomes:
+        """Project one company along each of its growth paths, year 0..horizon."""
+        trajectories: List[List[CompanySnapshot]] = []
+        for gp in paths:
+            prev = root_snapshot
+            trajectory = [root_snapshot]
+            for yr in range(1, horizon + 1):
+                # Growth rate for this year (pad with last rate if path is shorter)
+                if yr - 1 < len(gp.yearly_growth_rates):
+                    growth_rate = gp.yearly_growth_rates[yr - 1]
+                else:
+                    growth_rate = gp.yearly_growth_rates[-1] if gp.yearly_growth_rates else 0.0
+                prev = self._project_company_snapshot(
+                    prev_snapshot=prev,
+                    growth_rate=growth_rate,
                     year=yr,
-                    companies=year_snapshots,
-                    children=[],
-                    probability=combo_prob,
-                    label=f"Year {yr}: {yr_label}",
-                    fund_metrics=fund_snap,
+                    company_data=company_data,
                 )
+                trajectory.append(prev)
+            trajectories.append(trajectory)
+
+        valuation = np.array([[s.valuation for s in t] for t in trajectories], dtype=float)
+        ownership = np.array([[s.ownership_pct for s in t] for t in trajectories], dtype=float)
+        return CompanyOutcomes(
+            paths=paths,
+            snapshots=trajectories,
+            revenue=np.array([[s.revenue for s in t] for t in trajectories], dtype=float),
+            valuation=valuation,
+            nav=valuation * ownership,
+            sector=company_data.get("sector", "saas"),
+        )
 
-                parent_node.children.append(node)
-                path_nodes.append(node)
-                parent_node = node
-                current_snapshots = year_snapshots
-
-            path = ScenarioPath(
-                path_id=str(uuid.uuid4())[:8],
-                labels=combo_label_parts,
-                nodes=path_nodes,
-                cumulative_probability=combo_prob,
-                final_fund=path_nodes[-1].fund_metrics,
-                scenario_types=[gp.scenario_type for gp in combo],
+    def _materialize_path(
+        self,
+        root: ScenarioNode,
+        company_names: List[str],
+        outcomes: List["CompanyOutcomes"],
+        choice: Tuple[int, ...],
+        combo_prob: float,
+        fund_context: Dict,
+        years: int,
+    ) -> ScenarioPath:
+        """Chain one combination's yearly nodes under ``root``."""
+        combo = [o.paths[j] for o, j in zip(outcomes, choice)]
+        parent_node = root
+        path_nodes = [root]
+        max_years = min(years, max(len(gp.yearly_growth_rates) for gp in combo))
+
+        for yr in range(1, max_years + 1):
+            # Fresh snapshot objects per node — macro shocks mutate them in place
+            year_snapshots = {
+                cname: replace(o.snapshots[j][yr])
+                for cname, o, j in zip(company_names, outcomes, choice)
+            }
+            fund_snap = self._compute_fund_snapshot(year_snapshots, fund_context)
+            yr_label = ", ".join(
+                f"{cname} {combo[i].yearly_growth_rates[yr-1]*100:.0f}%"
+                for i, cname in enumerate(company_names)
+                if yr - 1 < len(combo[i].yearly_growth_rates)
             )
-            all_paths.append(path)
-
-        result = ScenarioTree(
-            root=root,
-            paths=all_paths,
-            fund_size=fund_size,
-            companies=company_names,
+            node = ScenarioNode(
+                node_id=str(uuid.uuid4())[:8],
+                year=yr,
+                companies=year_snapshots,
+                children=[],
+                probability=combo_prob,
+                label=f"Year {yr}: {yr_label}",
+                fund_metrics=fund_snap,
+            )
+            parent_node.children.append(node)
+            path_nodes.append(node)
+            parent_node = node
+
+        return ScenarioPath(
+            path_id=str(uuid.uuid4())[:8],
+            labels=[gp.label for gp in combo],
+            nodes=path_nodes,
+            cumulative_probability=combo_prob,
+            final_fund=path_nodes[-1].fund_metrics,
+            scenario_types=[gp.scenario_type for gp in combo],
         )
-        result.expected_value = self.evaluate_expected_value(result)
-        result.sensitivity = self.sensitivity_by_company(result)
-        return result
 
     # ------------------------------------------------------------------
     # Projection helpers
@@ -514,7 +756,13 @@ class ScenarioTreeService:
         return tree.paths
 
     def evaluate_expected_value(self, tree: ScenarioTree) -> FundSnapshot:
-        """Probability-weighted average across all leaf nodes."""
+        """Probability-weighted average across all leaf nodes.
+
+        Uses the full fund distribution when the tree has one, so the answer
+        doesn't depend on which paths were materialized.
+        """
+        if tree.distribution is not None:
+            return tree.distribution.snapshot()
         total_prob = sum(p.cumulative_probability for p in tree.paths)
         if total_prob == 0:
             return FundSnapshot(nav=0, dpi=0, tvpi=0, total_invested=0, total_value=0)
@@ -543,6 +791,8 @@ class ScenarioTreeService:
 
     def sensitivity_by_company(self, tree: ScenarioTree) -> Dict[str, float]:
         """Which company's growth path has the biggest swing on fund DPI."""
+        if tree.distribution is not None:
+            return tree.distribution.sensitivity()
         if not tree.paths:
             return {}
 
@@ -667,6 +917,7 @@ class ScenarioTreeService:
 
         expected = self.evaluate_expected_value(tree)
         sensitivity = self.sensitivity_by_company(tree)
+        dist = tree.distribution
 
         return {
             "type": "scenario_tree",
@@ -679,9 +930,30 @@ class ScenarioTreeService:
                 "sensitivity": sensitivity,
                 "companies": tree.companies,
                 "fund_size": tree.fund_size,
+                "mode": tree.mode,
+                "num_combinations": dist.num_combinations if dist else len(tree.paths),
+                "tvpi_percentiles": dist.tvpi_percentiles() if dist else {},
             },
         }
 
+    def fund_distribution_chart(self, tree: ScenarioTree) -> Optional[Dict[str, Any]]:
+        """Histogram of fund TVPI (NAV if nothing invested) over all combinations."""
+        dist = tree.distribution
+        if dist is None:
+            return None
+        return {
+            "type": "histogram",
+            "data": {
+                **dist.histogram(),
+                "percentiles": dist.tvpi_percentiles(),
+                "expected_tvpi": dist.snapshot().tvpi,
+                "prob_tvpi_above_1x": dist.probability_tvpi_at_least(1.0),
+                "prob_tvpi_above_3x": dist.probability_tvpi_at_least(3.0),
+                "num_combinations": dist.num_combinations,
+            },
+            "value_format": "multiple",
+        }
+
     def paths_to_line_chart_data(self, tree: ScenarioTree, metric: str = "revenue") -> Dict[str, Any]:
         """Serialize paths as multi-line chart data (one line per path)."""
         series = []
@@ -802,6 +1074,15 @@ class ScenarioTreeService:
 
     def snapshot_at_year(self, tree: ScenarioTree, year: int) -> Dict[str, Any]:
         """Probability-weighted portfolio state at a specific year."""
+        dist = tree.distribution
+        if dist is not None and 0 <= year < dist.outcomes[0].nav.shape[1]:
+            fund = dist.snapshot(year)
+            companies = dist.expected_company(year)
+            return {
+                "year": year, "expected_nav": fund.nav, "expected_dpi": fund.dpi, "expected_tvpi": fund.tvpi,
+                "company_expected_revenue": {cn: v["revenue"] for cn, v in companies.items()},
+                "company_expected_valuation": {cn: v["valuation"] for cn, v in companies.items()},
+            }
         w_nav, w_dpi, w_tvpi = 0.0, 0.0, 0.0
         co_rev: Dict[str, list] = {}
         co_val: Dict[str, list] = {}
@@ -882,6 +1163,19 @@ class ScenarioTreeService:
                 leaf_invested = leaf.fund_metrics.total_invested if leaf.fund_metrics else (tree.expected_value.total_invested if tree.expected_value else 0)
                 leaf.fund_metrics = self._compute_fund_snapshot(leaf.companies, {"fund_size": tree.fund_size, "total_invested": leaf_invested})
                 path.final_fund = leaf.fund_metrics
+        if tree.distribution is not None:
+            dist = tree.distribution
+            for o in dist.outcomes:
+                if affected_sectors and o.sector not in affected_sectors: continue
+                o.valuation[:, start_year:] *= (1 + prof["val"] * magnitude)
+                o.revenue[:, start_year:] *= (1 + prof["gr"] * magnitude)
+                o.nav[:, start_year:] *= (1 + prof["val"] * magnitude)
+            tree.distribution = convolve_fund_distribution(
+                dist.companies, dist.outcomes,
+                {"fund_size": dist.fund_size, "total_invested": dist.total_invested,
+                 "distributions": dist.distributions},
+                dist.num_combinations,
+            )
         tree.expected_value = self.evaluate_expected_value(tree)
         tree.sensitivity = self.sensitivity_by_company(tree)
         return tree
@@ -969,9 +1263,12 @@ class ScenarioTreeService:
                     for cn, imp in sorted((tree.sensitivity or {}).items(), key=lambda x: -abs(x[1]))
                 ],
             },
+            "fund_distribution": self.fund_distribution_chart(tree),
             "summary": {
                 "expected_nav": ev.nav, "expected_dpi": ev.dpi, "expected_tvpi": ev.tvpi,
                 "num_paths": len(tree.paths), "companies": tree.companies, "fund_size": tree.fund_size,
+                "num_combinations": tree.distribution.num_combinations if tree.distribution else len(tree.paths),
+                "tvpi_percentiles": tree.distribution.tvpi_percentiles() if tree.distribution else {},
             },
         }
 
@@ -986,10 +1283,23 @@ class ScenarioTreeService:
         best_path = max(tree.paths, key=lambda p: p.final_fund.tvpi if p.final_fund else 0) if tree.paths else None
         worst_path = min(tree.paths, key=lambda p: p.final_fund.tvpi if p.final_fund else 0) if tree.paths else None
 
+        dist = tree.distribution
+        if tree.mode == "distribution" and dist is not None:
+            n = dist.num_combinations
+            count = f"{n:,}" if n < 10**12 else f"{float(n):.1e}"
+            scope = (f"Analyzed {count} scenario combinations across {len(tree.companies)} "
+                     f"companies (showing the {len(tree.paths)} most probable).")
+        else:
+            scope = f"Analyzed {len(tree.paths)} scenario paths across {len(tree.companies)} companies."
         summary_lines = [
-            f"Analyzed {len(tree.paths)} scenario paths across {len(tree.companies)} companies.",
+            scope,
             f"Expected TVPI: {expected.tvpi:.2f}x | Expected NAV: ${expected.nav/1e6:.1f}M",
         ]
+        if dist is not None and dist.total_invested:
+            pct = dist.tvpi_percentiles((10, 50, 90))
+            summary_lines.append(
+                f"TVPI range: {pct['p10']:.2f}x (P10) / {pct['p50']:.2f}x (P50) / {pct['p90']:.2f}x (P90)"
+            )
         if best_path and best_path.final_fund:
             summary_lines.append(
                 f"Best case ({' + '.join(best_path.labels)}): {best_path.final_fund.tvpi:.2f}x TVPI "
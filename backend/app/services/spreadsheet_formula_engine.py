@@ -1,17 +1,66 @@
 """
 Spreadsheet Formula Engine Service
+
+Request-scoped wrapper over FormulaEvaluator: loads a payload of cell values
+/ named ranges, evaluates formulas against it and recalculates models when
+drivers change.
 """
 
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.formula_evaluator import FormulaError, FormulaEvaluator, compile_formula
+
+logger = logging.getLogger(__name__)
+
+
 class SpreadsheetFormulaEngine:
-    """Stub implementation for spreadsheet formula engine"""
-    
+    """Formula calculation backed by the compiled, dependency-tracking evaluator."""
+
     def __init__(self):
-        pass
-    
-    def calculate(self, formula: str, data: dict):
-        """Calculate formula result"""
-        return 0
-    
-    def validate_formula(self, formula: str):
-        """Validate formula syntax"""
-        return True
\ No newline at end of file
+        self.evaluator = FormulaEvaluator()
+
+    @staticmethod
+    def load(data: Optional[Dict[str, Any]] = None, context: Optional[Dict[str, Any]] = None) -> FormulaEvaluator:
+        """Build an evaluator from cell refs / names → values (or "=formula" strings)."""
+        evaluator = FormulaEvaluator()
+        for source in (context or {}, data or {}):
+            for ref, value in source.items():
+                if isinstance(value, (list, tuple)):
+                    evaluator.set_named_range(ref, value)
+                elif isinstance(value, (int, float, str, bool)) or value is None:
+                    evaluator.set_cell_value(ref, value)
+        return evaluator
+
+    async def calculate(self, formula: str, data: Optional[Dict[str, Any]] = None,
+                        context: Optional[Dict[str, Any]] = None) -> Any:
+        """Calculate formula result. Raises FormulaError on spreadsheet errors."""
+        return self.load(data, context).evaluate(formula, strict=True)
+
+    def recalculate(self, cells: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate a model, apply ``changes`` and return only the cells that moved.
+
+        The model is kept on ``self.evaluator`` so later calls with an empty
+        ``cells`` apply further changes incrementally.
+        """
+        if cells:
+            self.evaluator = self.load(cells)
+            self.evaluator.recalculate()
+        self.evaluator.set_cells(changes)
+        updated = self.evaluator.recalculate()
+        updated.update({ref: self.evaluator.get_value(ref) for ref in changes})
+        return updated
+
+    def validate_formula(self, formula: str) -> Tuple[bool, Optional[str]]:
+        """Validate formula syntax: (is_valid, error message)."""
+        if not isinstance(formula, str) or not formula.strip().startswith("=") or len(formula.strip()) < 2:
+            return False, "Formula must start with '='"
+        try:
+            compile_formula(formula)
+        except FormulaError as e:
+            return False, str(e)
+        return True, None
+
+    @staticmethod
+    def supported_functions() -> List[str]:
+        return sorted(FormulaEvaluator().functions)
@@ -29,6 +29,11 @@ from app.services.cascade_engine import (
     Breakpoint,
     CascadeGraph,
 )
+from app.services.waterfall_engine import (
+    CompiledWaterfall,
+    WaterfallClaim,
+    compile_waterfall,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +178,11 @@ DEFAULT_DRAG_ALONG_THRESHOLD = 0.75     # 75% of preferred
 DEFAULT_PREFERRED_VOTE_THRESHOLD = 0.50  # simple majority of preferred
 DEFAULT_BOARD_SIZE = 3
 
+COMMON_HOLDERS = ("common", "founders", "option_pool")
+
+# Real debt is repaid ahead of every equity class
+DEBT_SENIORITY = 1_000
+
 
 # ---------------------------------------------------------------------------
 # Stakeholder Interaction Map
@@ -189,6 +199,7 @@ class StakeholderInteractionMap:
         self.params: Optional[ResolvedParameterSet] = None
         self._total_preference_stack: float = 0.0
         self._total_shares: float = 0.0
+        self._waterfall: Optional[CompiledWaterfall] = None
         self._drag_along_threshold: float = DEFAULT_DRAG_ALONG_THRESHOLD
         self._preferred_vote_threshold: float = DEFAULT_PREFERRED_VOTE_THRESHOLD
 
@@ -230,6 +241,8 @@ class StakeholderInteractionMap:
                     if pos.total_invested > 0:
                         pos.ownership_pct = pos.total_invested / total_invested
 
+        self._waterfall = self._compile_waterfall()
+
         for pos in self.positions.values():
             pos.breakeven_exit = self._compute_breakeven(pos)
             pos.optimal_exit_range = self._compute_optimal_range(pos)
@@ -264,17 +277,25 @@ class StakeholderInteractionMap:
 
         matrix = AlignmentMatrix(positions=dict(self.positions))
 
-        # Step 1: Compute economics at every exit point
+        # Step 1: Compute economics at every exit point — one vectorized
+        # evaluation of the compiled waterfall for all points (and +$1M)
         step = (exit_range[1] - exit_range[0]) / num_points
         exit_values = [exit_range[0] + step * i for i in range(num_points + 1)]
         # Always include the preference stack value
         exit_values.append(self._total_preference_stack)
-        exit_values = sorted(set(exit_values))
-
-        for exit_val in exit_values:
-            if exit_val <= 0:
-                continue
-            analysis = self._analyze_at_exit(exit_val)
+        exit_values = [v for v in sorted(set(exit_values)) if v > 0]
+
+        waterfall = self._waterfall or self._compile_waterfall()
+        payouts = waterfall.evaluate(exit_values)
+        marginals = waterfall.marginal(exit_values, delta=1_000_000)
+        names = waterfall.names
+
+        for j, exit_val in enumerate(exit_values):
+            analysis = self._analyze_at_exit(
+                exit_val,
+                proceeds=dict(zip(names, payouts[:, j].tolist())),
+                marginal_dollar=dict(zip(names, marginals[:, j].tolist())),
+            )
             matrix.exit_analyses.append(analysis)
 
         # Step 2: Find inflection points
@@ -579,42 +600,21 @@ class StakeholderInteractionMap:
         """
         Minimum exit value for this stakeholder to get their money back.
 
-        For preferred: need enough to cover all senior preferences + theirs.
+        For preferred/creditors: exact exit from the compiled waterfall at
+        which proceeds reach the amount invested (or the debt balance).
         For common/founders: need enough to cover entire preference stack.
-        For creditors: debt repaid first, so breakeven = debt balance.
         """
-        if pos.is_creditor and not pos.total_invested:
-            return pos.debt_principal
-
-        if pos.name in ("common", "founders", "option_pool"):
+        if pos.name in COMMON_HOLDERS:
             # Common only gets paid after entire preference stack
             return self._total_preference_stack
 
-        # Preferred: need to cover all preferences senior to them + theirs
-        senior_prefs = 0.0
-        own_pref = pos.liquidation_preference_total + pos.accrued_dividends
-        found_self = False
-
-        # Walk preferences in seniority order (later rounds = more senior)
-        sorted_positions = sorted(
-            self.positions.values(),
-            key=lambda p: p.liquidation_multiple * p.total_invested,
-            reverse=True,
-        )
-
-        for other in sorted_positions:
-            if other.name == pos.name:
-                found_self = True
-                continue
-            if other.is_creditor:
-                senior_prefs += other.debt_principal
-            elif other.name not in ("common", "founders", "option_pool"):
-                if not found_self:
-                    senior_prefs += (
-                        other.liquidation_preference_total + other.accrued_dividends
-                    )
-
-        return senior_prefs + own_pref
+        target = pos.total_invested or pos.debt_principal
+        waterfall = self._waterfall or self._compile_waterfall()
+        if target <= 0 or pos.name not in waterfall.index:
+            return 0.0
+        breakeven = waterfall.exit_for_payout(pos.name, target)
+        # 0 = no breakeven (claim can never return cost basis)
+        return breakeven if breakeven != float("inf") else 0.0
 
     def _compute_optimal_range(
         self, pos: StakeholderPosition
@@ -662,12 +662,21 @@ class StakeholderInteractionMap:
     # Analysis: per-exit economics
     # ------------------------------------------------------------------
 
-    def _analyze_at_exit(self, exit_value: float) -> ExitAnalysis:
-        """Compute per-stakeholder economics at a single exit value."""
+    def _analyze_at_exit(
+        self,
+        exit_value: float,
+        proceeds: Optional[Dict[str, float]] = None,
+        marginal_dollar: Optional[Dict[str, float]] = None,
+    ) -> ExitAnalysis:
+        """Compute per-stakeholder economics at a single exit value.
+
+        ``proceeds`` / ``marginal_dollar`` may be passed in precomputed
+        (alignment_analysis evaluates every exit point in one call).
+        """
         analysis = ExitAnalysis(exit_value=exit_value)
 
-        # Run simplified waterfall
-        proceeds = self._run_waterfall(exit_value)
+        if proceeds is None:
+            proceeds = self._run_waterfall(exit_value)
         analysis.proceeds = proceeds
 
         # Return multiples
@@ -679,12 +688,14 @@ class StakeholderInteractionMap:
                 analysis.return_multiple[name] = 0.0
 
         # Marginal dollar — how much they get per additional $1M
-        marginal_exit = exit_value + 1_000_000
-        marginal_proceeds = self._run_waterfall(marginal_exit)
+        if marginal_dollar is None:
+            marginal_proceeds = self._run_waterfall(exit_value + 1_000_000)
+            marginal_dollar = {
+                name: marginal_proceeds.get(name, 0) - proceeds.get(name, 0)
+                for name in self.positions
+            }
         for name in self.positions:
-            analysis.marginal_dollar[name] = (
-                marginal_proceeds.get(name, 0) - proceeds.get(name, 0)
-            )
+            analysis.marginal_dollar[name] = marginal_dollar.get(name, 0.0)
 
         # Would they sell at this price?
         for name, pos in self.positions.items():
@@ -715,138 +726,72 @@ class StakeholderInteractionMap:
         return analysis
 
     def _run_waterfall(self, exit_value: float) -> Dict[str, float]:
+        """Per-stakeholder proceeds at one exit value (compiled waterfall)."""
+        waterfall = self._waterfall or self._compile_waterfall()
+        return waterfall.payouts_at(exit_value)
+
+    def _compile_waterfall(self) -> CompiledWaterfall:
         """
-        Simplified waterfall for alignment analysis.
+        Compile positions into exact payout curves.
 
         Order:
           1. Debt repayment (senior to equity)
           2. Liquidation preferences (LIFO — last in, first out)
-          3. Participation (if applicable)
+          3. Participation (if applicable, up to its cap)
           4. Remainder to common (pro-rata all equity)
 
-        For each preferred holder with non-participating preference:
-          They choose max(preference, pro-rata as-converted).
+        Non-participating preferred takes max(preference, as-converted).
+        SAFEs and convertible notes are NOT senior debt — they convert and
+        share as equity.
         """
-        remaining = exit_value
-        proceeds: Dict[str, float] = {name: 0.0 for name in self.positions}
-
-        # Phase 1: Senior debt repayment (real debt only, NOT SAFEs/convertibles)
-        for name, pos in self.positions.items():
-            if pos.is_creditor and pos.debt_principal > 0:
-                # SAFEs and convertible notes are NOT senior debt — they convert
-                is_safe_or_note = any(
-                    "safe" in inst.lower() or "convertible" in inst.lower()
-                    for inst in pos.instruments
-                )
-                if is_safe_or_note:
-                    continue  # SAFEs/notes convert, they don't get debt seniority
-                payment = min(remaining, pos.debt_principal)
-                proceeds[name] += payment
-                remaining -= payment
-                if remaining <= 0:
-                    return proceeds
-
-        # Phase 2: SAFE/convertible note conversion
-        # SAFEs and convertible notes convert to equity at this point
-        converted_to_equity: list = []
+        use_shares = self._total_shares > 0
+        weights = {
+            name: (pos.shares if use_shares else pos.ownership_pct)
+            for name, pos in self.positions.items()
+        }
+        weights = {name: max(w, 0.0) for name, w in weights.items()}
+        if not any(weights.values()):
+            # Last resort: common holders split the residual equally
+            for name in self.positions:
+                if name in COMMON_HOLDERS:
+                    weights[name] = 1.0
+
+        claims: List[WaterfallClaim] = []
         for name, pos in self.positions.items():
-            if pos.is_creditor and pos.debt_principal > 0:
-                is_safe_or_note = any(
-                    "safe" in inst.lower() or "convertible" in inst.lower()
-                    for inst in pos.instruments
-                )
-                if is_safe_or_note:
-                    # Convert to equity: they participate pro-rata as equity
-                    # Their ownership_pct will be used in the common distribution
-                    pos.is_creditor = False  # Now equity for waterfall purposes
-                    converted_to_equity.append(pos)
-
-        # Phase 3: Liquidation preferences (LIFO — last in, first out)
-        # Sort by round seniority (later rounds are senior, not bigger rounds)
-        preferred = [
-            (n, p) for n, p in self.positions.items()
-            if p.liquidation_preference_total > 0
-            and n not in ("common", "founders", "option_pool")
-            and not p.is_creditor
-        ]
-        # Sort by seniority: use instrument names to infer round order
-        # Series C > Series B > Series A > Seed (standard LIFO)
-        preferred.sort(key=lambda x: self._infer_seniority(x[0], x[1]), reverse=True)
-
-        for name, pos in preferred:
-            pref_claim = pos.liquidation_preference_total + pos.accrued_dividends
-            payment = min(remaining, pref_claim)
-            proceeds[name] += payment
-            remaining = max(0, remaining - payment)
-            if remaining <= 0:
-                return proceeds
-
-        # Phase 4: Participation + common distribution
-        if remaining > 0:
-            participating = [
-                (n, p) for n, p in preferred
-                if p.participation_rights
-            ]
+            is_safe_or_note = any(
+                "safe" in inst.lower() or "convertible" in inst.lower()
+                for inst in pos.instruments
+            )
+            if pos.is_creditor and pos.debt_principal > 0 and not is_safe_or_note:
+                claims.append(WaterfallClaim(
+                    name=name,
+                    preference=pos.debt_principal,
+                    seniority=DEBT_SENIORITY,
+                ))
+                continue
 
-            for name, pos in participating:
-                if self._total_shares > 0 and pos.shares > 0:
-                    share_pct = pos.shares / self._total_shares
-                    participation = remaining * share_pct
-
-                    # Apply cap
-                    if pos.participation_cap:
-                        max_total = pos.total_invested * pos.participation_cap
-                        current = proceeds[name]
-                        participation = min(participation, max_total - current)
-                        participation = max(0, participation)
-
-                    proceeds[name] += participation
-                    remaining = max(0, remaining - participation)
-
-            # Non-participating preferred: check if conversion is better
-            for name, pos in preferred:
-                if not pos.participation_rights and pos.ownership_pct > 0:
-                    conversion_value = exit_value * pos.ownership_pct
-                    if conversion_value > proceeds[name]:
-                        # Convert — give back preference, take pro-rata
-                        diff = conversion_value - proceeds[name]
-                        proceeds[name] = conversion_value
-                        remaining = max(0, remaining - diff)
-
-            # Remainder to common/founders — pro-rata by ownership, not equal split
-            common_positions = [
-                (n, p) for n, p in self.positions.items()
-                if n in ("common", "founders", "option_pool")
-            ]
-            if common_positions and remaining > 0:
-                # Pro-rata by ownership percentage
-                total_common_ownership = sum(
-                    p.ownership_pct for _, p in common_positions
-                )
-                if total_common_ownership > 0:
-                    for name, pos in common_positions:
-                        share = remaining * (pos.ownership_pct / total_common_ownership)
-                        proceeds[name] += share
-                else:
-                    # Fallback: by shares
-                    total_common_shares = sum(
-                        p.shares for _, p in common_positions if p.shares > 0
-                    )
-                    if total_common_shares > 0:
-                        for name, pos in common_positions:
-                            share = remaining * (pos.shares / total_common_shares)
-                            proceeds[name] += share
-                    else:
-                        # Last resort: equal split (shouldn't happen with ownership fix)
-                        per_common = remaining / len(common_positions)
-                        for name, _ in common_positions:
-                            proceeds[name] += per_common
+            is_preferred = (
+                pos.liquidation_preference_total > 0
+                and name not in COMMON_HOLDERS
+                and (not pos.is_creditor or is_safe_or_note)
+            )
+            if not is_preferred:
+                claims.append(WaterfallClaim(name=name, shares=weights[name]))
+                continue
 
-        # Restore mutated is_creditor flags so future waterfall runs are clean
-        for pos in converted_to_equity:
-            pos.is_creditor = True
+            cap = None
+            if pos.participation_rights and pos.participation_cap:
+                cap = pos.total_invested * pos.participation_cap
+            claims.append(WaterfallClaim(
+                name=name,
+                shares=weights[name],
+                preference=pos.liquidation_preference_total + pos.accrued_dividends,
+                seniority=self._infer_seniority(name, pos),
+                participating=pos.participation_rights,
+                participation_cap=cap,
+            ))
 
-        return proceeds
+        return compile_waterfall(claims)
 
     def _infer_seniority(self, name: str, pos: StakeholderPosition) -> int:
         """Infer round seniority from stakeholder name and instruments.
@@ -917,41 +862,35 @@ class StakeholderInteractionMap:
                     clause_sources=pos.source_clauses[:3],
                 ))
 
-        # 3. Participation caps
-        for name, pos in self.positions.items():
-            if pos.participation_rights and pos.participation_cap:
-                cap_exit = pos.total_invested * pos.participation_cap
-                if cap_exit > 0:
-                    points.append(InflectionPoint(
-                        exit_value=cap_exit,
-                        description=f"{name} participation cap reached ({pos.participation_cap}x)",
-                        stakeholders_affected=[name, "common", "founders"],
-                        before=f"{name} receives preference + pro-rata participation",
-                        after=f"{name} capped, converts to common — more to other holders",
-                        clause_sources=pos.source_clauses[:3],
-                    ))
-
-        # 4. Conversion beats preference (non-participating)
-        for name, pos in self.positions.items():
-            if (not pos.participation_rights
-                    and pos.ownership_pct > 0
-                    and pos.liquidation_preference_total > 0):
-                # Conversion value = exit * ownership_pct
-                # Preference value = liq_pref_total
-                # They're equal when: exit * ownership = liq_pref
-                conversion_point = pos.liquidation_preference_total / pos.ownership_pct
-                if conversion_point > 0:
-                    points.append(InflectionPoint(
-                        exit_value=conversion_point,
-                        description=(
-                            f"{name} conversion beats preference "
-                            f"(above ${conversion_point/1e6:.1f}M)"
-                        ),
-                        stakeholders_affected=[name],
-                        before=f"{name} takes preference ({pos.liquidation_multiple}x)",
-                        after=f"{name} converts to common ({pos.ownership_pct*100:.1f}% pro-rata)",
-                        clause_sources=pos.source_clauses[:3],
-                    ))
+        # 3-4. Participation caps and conversions — exact exit values
+        waterfall = self._waterfall or self._compile_waterfall()
+        for bp in waterfall.breakpoints:
+            name = bp["holders"][0]
+            pos = self.positions.get(name)
+            if pos is None:
+                continue
+            if bp["event"] == "participation cap reached":
+                points.append(InflectionPoint(
+                    exit_value=bp["exit_value"],
+                    description=f"{name} participation cap reached ({pos.participation_cap}x)",
+                    stakeholders_affected=[name, "common", "founders"],
+                    before=f"{name} receives preference + pro-rata participation",
+                    after=f"{name} capped — more to other holders until it converts",
+                    clause_sources=pos.source_clauses[:3],
+                ))
+            elif bp["event"] == "converts to common":
+                conversion_point = bp["exit_value"]
+                points.append(InflectionPoint(
+                    exit_value=conversion_point,
+                    description=(
+                        f"{name} conversion beats preference "
+                        f"(above ${conversion_point/1e6:.1f}M)"
+                    ),
+                    stakeholders_affected=[name],
+                    before=f"{name} takes preference ({pos.liquidation_multiple}x)",
+                    after=f"{name} converts to common ({pos.ownership_pct*100:.1f}% pro-rata)",
+                    clause_sources=pos.source_clauses[:3],
+                ))
 
         # 5. Sell-vs-hold flips — where someone switches from hold to sell
         prev_analysis = None
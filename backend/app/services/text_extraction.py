@@ -0,0 +1,283 @@
+"""
+Text extraction for uploaded documents: single-pass PDF parsing with per-page
+OCR, and a content-hash cache in front of every extractor.
+
+    from app.services.text_extraction import cached_text, extract_pdf_text
+
+    text = cached_text(path, "pdf", lambda: extract_pdf_text(path))
+
+- PDFs are opened once with pdfplumber; each page yields both its text and
+  its tables (previously pypdf and pdfplumber each parsed the whole file).
+  Without pdfplumber, pypdf supplies the text and tables are skipped.
+- OCR is decided per page: pages whose text layer has fewer than
+  OCR_PAGE_MIN_CHARS characters are OCR'd, the rest keep their text.
+- OCR pages fan out to a pool of OCR_WORKERS. Each job rasterizes only its
+  own page (pdf2image first_page/last_page), so at most OCR_WORKERS page
+  images exist at once instead of the whole document at 300 dpi.
+  pdftoppm and Tesseract run as subprocesses, so pool threads OCR in
+  parallel without pickling images or forking from daemonic Celery workers.
+- Extracted text is cached under sha256(file bytes) in Redis (zlib, 30 days)
+  with a process-local LRU fallback, so re-uploads and the same data-room
+  file attached to several companies skip extraction. Empty results are
+  not cached.
+
+stats() reports cache hits / misses, OCR'd pages and pool size.
+"""
+
+import base64
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_PAGE_MIN_CHARS = int(os.getenv("OCR_PAGE_MIN_CHARS", "20"))
+TEXT_CACHE_TTL = int(os.getenv("DOC_TEXT_CACHE_TTL", str(30 * 24 * 3600)))
+TEXT_CACHE_LOCAL_MAX = int(os.getenv("DOC_TEXT_CACHE_LOCAL_MAX", "64"))
+
+# Bump when extraction output changes so stale cached text is not served
+_CACHE_VERSION = "v1"
+_CACHE_PREFIX = "doctext:"
+_HASH_CHUNK = 1 << 20
+
+OCR_AVAILABLE = False
+try:
+    import pytesseract
+    from pdf2image import convert_from_path
+    OCR_AVAILABLE = True
+except ImportError:
+    logger.info(
+        "pytesseract/pdf2image not installed; OCR fallback disabled. "
+        "Run: pip install pytesseract pdf2image  (and install Tesseract + Poppler system deps)"
+    )
+
+
+# ---------------------------------------------------------------------------
+# OCR pool
+# ---------------------------------------------------------------------------
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+_stats = {"cache_hits": 0, "cache_misses": 0, "cache_errors": 0, "pdf_pages": 0, "ocr_pages": 0, "ocr_seconds": 0.0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str, n: float = 1) -> None:
+    with _stats_lock:
+        _stats[key] += n
+
+
+def _ocr_pool() -> ThreadPoolExecutor:
+    """Lazily created OCR pool; recreated in a forked child (threads don't survive fork)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # Each Tesseract process should use one core; parallelism comes from the pool
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+            _pool = ThreadPoolExecutor(max_workers=max(1, OCR_WORKERS), thread_name_prefix="ocr")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _ocr_page(path: str, page_number: int) -> str:
+    """Rasterize one page (1-based) and OCR it. Returns "" on failure."""
+    started = time.perf_counter()
+    images = []
+    try:
+        images = convert_from_path(path, dpi=OCR_DPI, first_page=page_number, last_page=page_number)
+        return "\n".join(
+            t.strip() for t in (pytesseract.image_to_string(img, lang="eng") for img in images) if t and t.strip()
+        )
+    except Exception as e:
+        logger.debug("OCR failed on page %d: %s", page_number, e)
+        return ""
+    finally:
+        for img in images:
+            img.close()
+        _count("ocr_pages")
+        _count("ocr_seconds", time.perf_counter() - started)
+
+
+def _ocr_pages(path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """OCR the given 1-based pages in parallel; {page_number: text}."""
+    if not page_numbers or not OCR_AVAILABLE:
+        return {}
+    pool = _ocr_pool()
+    futures = {n: pool.submit(_ocr_page, path, n) for n in page_numbers}
+    return {n: f.result() for n, f in futures.items()}
+
+
+# ---------------------------------------------------------------------------
+# PDF
+# ---------------------------------------------------------------------------
+
+def _table_text(table: List[List[Optional[str]]]) -> str:
+    rows = []
+    for row in table or []:
+        cells = [str(cell).strip() if cell else "" for cell in row]
+        if any(cells):
+            rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def _parse_pdf(path: str):
+    """One pass over the PDF → (page_texts, table_texts)."""
+    page_texts: List[str] = []
+    table_texts: List[str] = []
+    try:
+        import pdfplumber
+    except ImportError:
+        pdfplumber = None
+        logger.debug("pdfplumber not installed; PDF text via pypdf, no table extraction")
+
+    if pdfplumber is not None:
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                text = ""
+                try:
+                    text = page.extract_text() or ""
+                    for table in page.extract_tables():
+                        rendered = _table_text(table)
+                        if rendered:
+                            table_texts.append(rendered)
+                except Exception as e:
+                    logger.debug("pdfplumber page %d extract: %s", page.page_number, e)
+                finally:
+                    # Drop this page's parsed layout objects before moving on
+                    page.flush_cache()
+                page_texts.append(text)
+        return page_texts, table_texts
+
+    from pypdf import PdfReader
+    for page in PdfReader(path).pages:
+        try:
+            page_texts.append(page.extract_text() or "")
+        except Exception as e:
+            logger.debug("pypdf page extract: %s", e)
+            page_texts.append("")
+    return page_texts, table_texts
+
+
+def extract_pdf_text(path: str) -> str:
+    """Text of every page (OCR for pages without a usable text layer), then a TABLES section."""
+    page_texts, table_texts = _parse_pdf(path)
+    _count("pdf_pages", len(page_texts))
+    sparse = [i + 1 for i, t in enumerate(page_texts) if len(t.strip()) < OCR_PAGE_MIN_CHARS]
+    if sparse:
+        if OCR_AVAILABLE:
+            logger.info("OCR on %d of %d pages of %s", len(sparse), len(page_texts), path)
+            for page_number, ocr_text in _ocr_pages(path, sparse).items():
+                if len(ocr_text) > len(page_texts[page_number - 1].strip()):
+                    page_texts[page_number - 1] = ocr_text
+        else:
+            logger.warning("%d pages need OCR but pytesseract/pdf2image not installed", len(sparse))
+
+    text = "\n\n".join(t.strip() for t in page_texts if t and t.strip()).strip()
+    if table_texts:
+        text = text + "\n\n=== TABLES ===\n" + "\n\n".join(table_texts)
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Content-hash cache
+# ---------------------------------------------------------------------------
+
+_local: "OrderedDict[str, str]" = OrderedDict()
+_local_lock = threading.Lock()
+_key_locks: Dict[str, threading.Lock] = {}
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_get(key: str) -> Optional[str]:
+    """Cached text for key (local LRU, then Redis), or None."""
+    with _local_lock:
+        if key in _local:
+            _local.move_to_end(key)
+            return _local[key]
+    from app.core.redis_client import get_sync_redis
+
+    try:
+        client = get_sync_redis()
+        raw = client.get(key) if client is not None else None
+    except Exception as e:
+        _count("cache_errors")
+        logger.debug("doc text cache get failed: %s", e)
+        return None
+    if raw is None:
+        return None
+    text = zlib.decompress(base64.b64decode(raw)).decode("utf-8")
+    _local_put(key, text)
+    return text
+
+
+def cache_set(key: str, text: str) -> None:
+    """Store text under key locally and, when configured, in Redis for TEXT_CACHE_TTL."""
+    _local_put(key, text)
+    from app.core.redis_client import get_sync_redis
+
+    try:
+        client = get_sync_redis()
+        if client is not None:
+            client.set(key, base64.b64encode(zlib.compress(text.encode("utf-8"), 6)).decode("ascii"), ex=TEXT_CACHE_TTL)
+    except Exception as e:
+        _count("cache_errors")
+        logger.debug("doc text cache set failed: %s", e)
+
+
+def _local_put(key: str, text: str) -> None:
+    with _local_lock:
+        _local[key] = text
+        _local.move_to_end(key)
+        while len(_local) > TEXT_CACHE_LOCAL_MAX:
+            _local.popitem(last=False)
+
+
+def cached_text(path: str, ext: str, extract: Callable[[], str]) -> str:
+    """extract() once per distinct file content; concurrent callers for the same file wait for the first."""
+    # Text extracted without OCR must not be served once OCR becomes available
+    key = f"{_CACHE_PREFIX}{_CACHE_VERSION}:{'ocr' if OCR_AVAILABLE else 'text'}:{ext}:{file_digest(path)}"
+    text = cache_get(key)
+    if text is not None:
+        _count("cache_hits")
+        return text
+    with _local_lock:
+        lock = _key_locks.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            text = cache_get(key)
+            if text is not None:
+                _count("cache_hits")
+                return text
+            _count("cache_misses")
+            text = extract()
+            if text and text.strip():
+                cache_set(key, text)
+            return text
+    finally:
+        with _local_lock:
+            if not lock.locked():
+                _key_locks.pop(key, None)
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        out = dict(_stats)
+    out.update(ocr_available=OCR_AVAILABLE, ocr_workers=OCR_WORKERS, local_entries=len(_local))
+    return out
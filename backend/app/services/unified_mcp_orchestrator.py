@@ -5,11 +5,12 @@ Combines MCP tools (Tavily, Firecrawl) with 36+ skills for comprehensive analysi
 
 import asyncio
 import aiohttp
+import contextvars
 import importlib
 import logging
 import json
 from copy import deepcopy
-from typing import Dict, List, Any, Optional, AsyncGenerator, Union, Tuple
+from typing import Dict, List, Any, Optional, AsyncGenerator, Union, Tuple, Awaitable, Callable
 from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum
@@ -27,6 +28,7 @@ NON_CRITICAL_IMPORT_ERRORS: Dict[str, Exception] = {}
 
 # All LLM calls go through ModelRouter - no direct imports
 from app.core.config import settings
+from app.core.tool_executor import tool_executors
 
 # --- Critical imports (orchestrator cannot function without these) ---
 try:
@@ -156,10 +158,11 @@ except Exception as exc:  # pragma: no cover - defensive import guard
     ConfigLoader = None  # type: ignore[assignment]
 
 try:
-    from app.services.company_data_pull import pull_company_data, pull_fund_companies, CompanyData, FundCompanies
+    from app.services.company_data_pull import pull_company_data, pull_company_data_async, pull_fund_companies, CompanyData, FundCompanies
 except Exception as exc:  # pragma: no cover - defensive import guard
     NON_CRITICAL_IMPORT_ERRORS["company_data_pull"] = exc
     pull_company_data = None  # type: ignore[assignment]
+    pull_company_data_async = None  # type: ignore[assignment]
     pull_fund_companies = None  # type: ignore[assignment]
     CompanyData = None  # type: ignore[assignment]
     FundCompanies = None  # type: ignore[assignment]
@@ -678,6 +681,36 @@ GRID_TRIGGER_MAP: Dict[str, List[str]] = {
 # a compact description for the LLM router, a cost tier, and a timeout.
 # ---------------------------------------------------------------------------
 
+# Pool that blocking calls made via _offload() go to while a tool runs.
+# Set by _execute_tool_raw from AgentTool.execution.
+_TOOL_EXECUTION: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "tool_execution", default="io",
+)
+
+
+class _StreamChannel:
+    """Intermediate events (doc progress, Monte Carlo previews) for one agent loop."""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self.signal = asyncio.Event()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        self.signal.set()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        events, self.events = self.events, []
+        return events
+
+
+# Channel of the agent loop whose ACT task is running; set inside that task
+# so concurrent sessions on the singleton orchestrator never share events.
+_STREAM_CHANNEL: contextvars.ContextVar[Optional[_StreamChannel]] = contextvars.ContextVar(
+    "stream_channel", default=None,
+)
+
+
 @dataclass
 class AgentTool:
     name: str
@@ -686,6 +719,7 @@ class AgentTool:
     input_schema: dict      # JSON-serializable hint for LLM
     cost_tier: str = "free" # "free" (no LLM) | "cheap" | "expensive"
     timeout_ms: int = 30_000
+    execution: str = "loop" # "loop" (async-native) | "cpu" | "io" — pool for _offload() calls
 
 
 @dataclass
@@ -757,6 +791,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "method": "str?"},
         cost_tier="cheap",
         timeout_ms=60_000,
+        execution="io",
     ),
     AgentTool(
         name="run_scenario",
@@ -765,6 +800,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"scenario_description": "str", "affected_companies": "list[str]?", "branch_id": "str?", "company_id": "str?"},
         cost_tier="cheap",
         timeout_ms=45_000,
+        execution="io",
     ),
     AgentTool(
         name="generate_chart",
@@ -785,6 +821,7 @@ AGENT_TOOLS: list[AgentTool] = [
         description="Suggest a cell edit on the portfolio grid (accept/reject flow).",
         handler="_tool_suggest_edit",
         input_schema={"company": "str", "column": "str", "value": "any", "reasoning": "str"},
+        execution="io",
     ),
     AgentTool(
         name="bulk_write_grid",
@@ -794,12 +831,14 @@ AGENT_TOOLS: list[AgentTool] = [
             "cells": "list[{company_id: str, category: str, period: str, amount: float}]",
             "source": "str? (default: agent_write)",
         },
+        execution="io",
     ),
     AgentTool(
         name="suggest_action",
         description="Suggest an action item, warning, or insight. Persisted to DB for accept/reject.",
         handler="_tool_suggest_action",
         input_schema={"type": "str", "title": "str", "description": "str", "priority": "str?", "company_id": "str?"},
+        execution="io",
     ),
     # REMOVED: duplicate write_to_memo — canonical definition is at line ~1396
     # with richer schema (section_title, text, chart_type, chart_data, table).
@@ -890,6 +929,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company": "str?", "fund_id": "str?", "amount": "float?"},
         cost_tier="expensive",
         timeout_ms=60_000,
+        execution="io",
     ),
     AgentTool(
         name="run_round_modeling",
@@ -898,6 +938,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company": "str", "round_size": "float?", "pre_money": "float?", "round_name": "str?"},
         cost_tier="expensive",
         timeout_ms=60_000,
+        execution="io",
     ),
     AgentTool(
         name="run_exit_modeling",
@@ -1091,6 +1132,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company": "str", "years": "int?", "growth_overrides": "list[float]?"},
         cost_tier="cheap",
         timeout_ms=30_000,
+        execution="cpu",
     ),
 
     AgentTool(
@@ -1132,6 +1174,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company": "str", "years": "int?"},
         cost_tier="cheap",
         timeout_ms=30_000,
+        execution="cpu",
     ),
 
     # --- Portfolio Operations ---
@@ -1303,6 +1346,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"fund_id": "str?"},
         cost_tier="cheap",
         timeout_ms=45_000,
+        execution="io",
     ),
     AgentTool(
         name="search_companies_db",
@@ -1319,6 +1363,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str?", "company_name": "str?"},
         cost_tier="free",
         timeout_ms=15_000,
+        execution="io",
     ),
 
     # ------------------------------------------------------------------
@@ -1347,6 +1392,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"title": "str", "description": "str?", "priority": "str?", "company": "str?", "due": "str?"},
         cost_tier="free",
         timeout_ms=5_000,
+        execution="io",
     ),
     AgentTool(
         name="sync_crm",
@@ -1576,6 +1622,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "fund_id": "str?", "start": "str?", "end": "str?", "months": "int?", "view": "str?", "budget_id": "str?", "forecast_id": "str?"},
         cost_tier="free",  # pure DB read — must be visible in reply mode for "show me the P&L"
         timeout_ms=30_000,
+        execution="cpu",
     ),
     AgentTool(
         name="fpa_balance_sheet",
@@ -1584,6 +1631,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "fund_id": "str?", "start": "str?", "end": "str?"},
         cost_tier="free",  # pure DB read — must be visible in reply mode for "show me the balance sheet"
         timeout_ms=30_000,
+        execution="cpu",
     ),
     AgentTool(
         name="fpa_variance",
@@ -1618,6 +1666,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "months": "int?", "monthly_overrides": "dict?"},
         cost_tier="free",  # computed from actuals — must be visible in reply for "show me cash flow"
         timeout_ms=30_000,
+        execution="cpu",
     ),
     AgentTool(
         name="fpa_scenario_create",
@@ -1634,6 +1683,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="cheap",
         timeout_ms=15_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_scenario_tree",
@@ -1655,6 +1705,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="cheap",
         timeout_ms=15_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_scenario_compare",
@@ -1663,6 +1714,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "branch_ids": "list[str]", "forecast_months": "int?"},
         cost_tier="cheap",
         timeout_ms=45_000,
+        execution="cpu",
     ),
     AgentTool(
         name="fpa_regression",
@@ -1679,6 +1731,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "fiscal_year": "int?"},
         cost_tier="free",
         timeout_ms=10_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_budget_lines",
@@ -1687,6 +1740,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"budget_id": "str"},
         cost_tier="free",
         timeout_ms=10_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_actuals",
@@ -1703,6 +1757,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "name": "str", "fiscal_year": "int", "fund_id": "str?", "status": "str?"},
         cost_tier="cheap",
         timeout_ms=15_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_cell_edit",
@@ -1711,6 +1766,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "category": "str", "period": "str", "amount": "float", "subcategory": "str?", "fund_id": "str?"},
         cost_tier="cheap",
         timeout_ms=10_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_upload_actuals",
@@ -1719,6 +1775,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "time_series": "list[dict]", "fund_id": "str?"},
         cost_tier="cheap",
         timeout_ms=30_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_upload_budget",
@@ -1727,6 +1784,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"budget_id": "str", "lines": "list[dict]"},
         cost_tier="cheap",
         timeout_ms=30_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_scenario_delete",
@@ -1751,12 +1809,13 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str", "months": "int?"},
         cost_tier="cheap",
         timeout_ms=60_000,
+        execution="io",
     ),
     AgentTool(
         name="fpa_kpi_dashboard",
-        description="Compute KPIs for a company: adapts to business type (SaaS, services, ecommerce, manufacturing). Returns time series + trends.",
+        description="Compute KPIs for a company: adapts to business type (SaaS, services, ecommerce, manufacturing). Returns time series + trends. fund_wide=true computes every portfolio company at once with cross-company benchmarks.",
         handler="_tool_fpa_kpi_dashboard",
-        input_schema={"company_id": "str", "as_of": "str?", "periods": "int?"},
+        input_schema={"company_id": "str", "as_of": "str?", "periods": "int?", "fund_wide": "bool?"},
         cost_tier="free",  # DB compute from actuals — must be visible in reply mode for KPI questions
         timeout_ms=30_000,
     ),
@@ -2101,6 +2160,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"company_id": "str?", "fund_id": "str?"},
         cost_tier="cheap",
         timeout_ms=30_000,
+        execution="io",
     ),
 
     # ------------------------------------------------------------------
@@ -2141,13 +2201,15 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="cheap",
         timeout_ms=45_000,
+        execution="cpu",
     ),
     AgentTool(
         name="fpa_monte_carlo",
         description=(
             "Monte Carlo simulation over the cash flow model. Samples driver distributions "
-            "(from actuals variance) across 1000 iterations. Returns percentile bands, "
-            "VaR, runway distribution, break-even probability, and driver sensitivity ranking."
+            "(from actuals variance) until percentiles converge (iterations = max cap). "
+            "Returns percentile bands, VaR, runway distribution, break-even probability, "
+            "and driver sensitivity ranking."
         ),
         handler="_tool_fpa_monte_carlo",
         input_schema={
@@ -2155,9 +2217,12 @@ AGENT_TOOLS: list[AgentTool] = [
             "iterations": "int?",
             "months": "int?",
             "branch_id": "str?",
+            "tolerance": "float?",
+            "adaptive": "bool?",
         },
         cost_tier="expensive",
         timeout_ms=60_000,
+        execution="cpu",
     ),
     # ------------------------------------------------------------------
     # Contract ↔ P&L attribution & scenario tools
@@ -2202,6 +2267,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="cheap",
         timeout_ms=45_000,
+        execution="io",
     ),
 
     # ------------------------------------------------------------------
@@ -2299,6 +2365,7 @@ AGENT_TOOLS: list[AgentTool] = [
             "edits": "list[{location: str, old_value: any, new_value: any, explanation: str, source: str, confidence: float?, impact: str?}]",
         },
         cost_tier="free",
+        execution="io",
     ),
 
     # ------------------------------------------------------------------
@@ -2336,6 +2403,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="free",
         timeout_ms=15_000,
+        execution="io",
     ),
     AgentTool(
         name="adjust_drivers",
@@ -2348,6 +2416,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="free",
         timeout_ms=20_000,
+        execution="io",
     ),
     AgentTool(
         name="funding_injection",
@@ -2363,6 +2432,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="free",
         timeout_ms=15_000,
+        execution="io",
     ),
     AgentTool(
         name="update_chart",
@@ -2439,6 +2509,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="cheap",
         timeout_ms=60_000,
+        execution="cpu",
     ),
     AgentTool(
         name="liquidity_scenarios",
@@ -2452,14 +2523,16 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="cheap",
         timeout_ms=90_000,
+        execution="cpu",
     ),
     AgentTool(
         name="liquidity_sensitivity",
-        description="Runway sensitivity analysis: shows how runway changes when individual OpEx/COGS subcategories shift ±20%. Returns ranked impact list.",
+        description="Runway sensitivity analysis: shows how runway changes when individual OpEx/COGS subcategories shift (±20% by default, or any shock grid like [-0.5,-0.2,-0.1,0.1,0.2,0.5]). Returns ranked impact list, tornado ranking and optional two-way tables (two_way: top-N int or list of category pairs).",
         handler="_tool_liquidity_sensitivity",
-        input_schema={"company_id": "str", "months": "int?"},
+        input_schema={"company_id": "str", "months": "int?", "shocks": "list?", "two_way": "int|list?"},
         cost_tier="cheap",
         timeout_ms=90_000,
+        execution="cpu",
     ),
     # ── Auto-Budget ───────────────────────────────────────────────────
     AgentTool(
@@ -2500,6 +2573,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="free",
         timeout_ms=10_000,
+        execution="io",
     ),
     AgentTool(
         name="cancel_task",
@@ -2511,6 +2585,7 @@ AGENT_TOOLS: list[AgentTool] = [
         },
         cost_tier="free",
         timeout_ms=5_000,
+        execution="io",
     ),
     AgentTool(
         name="list_tasks",
@@ -2519,6 +2594,7 @@ AGENT_TOOLS: list[AgentTool] = [
         input_schema={"status": "str?"},  # filter: active | paused | done | all
         cost_tier="free",
         timeout_ms=5_000,
+        execution="io",
     ),
 ]
 
@@ -4129,6 +4205,12 @@ _COMPARISON_METRICS = [
     "total_opex", "free_cash_flow", "burn_rate",
 ]
 
+# find_comparables: DB candidates need a sector or business model at least this
+# close (SequenceMatcher ratio) to the target's, or must mention the target's
+# sector / business model as the old ilike search did. Override per call with
+# inputs["min_text_similarity"].
+_COMPARABLES_MIN_TEXT_SIMILARITY = 0.6
+
 
 def _build_base_comparison(
     before_result: dict,
@@ -4309,11 +4391,6 @@ class UnifiedMCPOrchestrator:
             logger.warning(f"[ORCHESTRATOR_INIT] ⚠️ Failed to initialize ParallelDocProcessor: {e}")
             self.parallel_doc_processor = None
 
-        # Queue for streaming intermediate events from long-running tools
-        # (e.g. doc_processing_progress during multi-doc ingestion).
-        # The conversational loop drains this after each tool execution.
-        self._streaming_event_queue: list[Dict[str, Any]] = []
-
         # Error handler for retry + circuit breaker
         self.error_handler = global_error_handler
 
@@ -7071,7 +7148,7 @@ class UnifiedMCPOrchestrator:
             "bulk-valuation": {
                 "category": SkillCategory.ANALYSIS,
                 "handler": self._execute_bulk_valuation,
-                "description": "Run valuation engine across all portfolio companies in parallel"
+                "description": "Value all portfolio companies as a resumable background job (pass job_id to poll progress)"
             },
             "multi-enrich": {
                 "category": SkillCategory.DATA_GATHERING,
@@ -7342,7 +7419,7 @@ JUST THE JSON:"""
                         _already_loaded = bool(self.shared_data.get("company_fpa_data"))
                     if pull_company_data and not _already_loaded:
                         try:
-                            _cd = pull_company_data(_task_cid)
+                            _cd = await pull_company_data_async(_task_cid)
                             if _cd and _cd.periods:
                                 async with self.shared_data_lock:
                                     self.shared_data["company_fpa_data"] = {
@@ -7520,7 +7597,7 @@ JUST THE JSON:"""
                 # Pre-pull company data for tools that need it (skip if already cached)
                 if pull_company_data and not _already_loaded:
                     try:
-                        _cd = pull_company_data(_cid)
+                        _cd = await pull_company_data_async(_cid)
                         if _cd and _cd.periods:
                             async with self.shared_data_lock:
                                 self.shared_data["company_fpa_data"] = {
@@ -7565,7 +7642,7 @@ JUST THE JSON:"""
                     _already_loaded = bool(self.shared_data.get("company_fpa_data"))
                 if pull_company_data and not _already_loaded:
                     try:
-                        _cd = pull_company_data(_cid)
+                        _cd = await pull_company_data_async(_cid)
                         if _cd and _cd.periods:
                             async with self.shared_data_lock:
                                 self.shared_data["company_fpa_data"] = {
@@ -8396,7 +8473,7 @@ Return JSON with these fields (use null if unknown):
                             if supabase_url and supabase_key:
                                 from supabase import create_client
                                 sb = create_client(supabase_url, supabase_key)
-                                sb.table("pending_suggestions").upsert({
+                                await self._offload(sb.table("pending_suggestions").upsert({
                                     "fund_id": fund_id,
                                     "company_id": row_id,
                                     "column_id": col_id,
@@ -8404,7 +8481,7 @@ Return JSON with these fields (use null if unknown):
                                     "source_service": f"agent.enrich_portfolio.{source}",
                                     "reasoning": f"Inferred from {source} (confidence: {conf:.0%})",
                                     "metadata": {"tool": "enrich_portfolio", "confidence": conf, "source": source},
-                                }, on_conflict="fund_id,company_id,column_id").execute()
+                                }, on_conflict="fund_id,company_id,column_id").execute)
                                 suggestion_count += 1
                         except Exception as e:
                             logger.warning(f"[ENRICH] Failed to persist suggestion for {ec['name']}.{field}: {e}")
@@ -8908,6 +8985,69 @@ Answer using specific company names and numbers from the portfolio grid above.""
         return ops.get(op, lambda a, b: False)(value, threshold)
     # ── end chip workflow helpers ───────────────────────────────
 
+    async def _offload(self, fn, *args, **kwargs):
+        """Run a blocking call off the event loop.
+
+        Goes to the pool declared by the executing tool's AgentTool.execution
+        ("cpu" for NumPy/model builds, "io" for supabase-py and other
+        blocking clients), so the loop only streams and coordinates.
+        """
+        return await tool_executors.run(_TOOL_EXECUTION.get(), fn, *args, **kwargs)
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Queue depth and saturation of the tool executor pools."""
+        return tool_executors.stats()
+
+    def _push_stream_event(self, event: Dict[str, Any]) -> None:
+        """Queue an intermediate event for the agent loop running this tool.
+
+        Must run on the event loop thread inside the tool's task; from a
+        worker thread use loop.call_soon_threadsafe(self._stream_pusher(), event)
+        with the pusher captured on the loop. Dropped when nothing streams.
+        """
+        channel = _STREAM_CHANNEL.get()
+        if channel is not None:
+            channel.push(event)
+
+    @staticmethod
+    def _stream_pusher() -> Callable[[Dict[str, Any]], None]:
+        """The current loop's push function, for handing to worker threads."""
+        channel = _STREAM_CHANNEL.get()
+        return channel.push if channel is not None else (lambda event: None)
+
+    @staticmethod
+    def _start_streaming_task(channel: _StreamChannel, coro: Awaitable[Any]) -> "asyncio.Task":
+        """Run ``coro`` as a task whose stream events go to ``channel``."""
+        async def _run() -> Any:
+            _STREAM_CHANNEL.set(channel)
+            return await coro
+        return asyncio.ensure_future(_run())
+
+    async def _stream_events_until_done(
+        self, task: "asyncio.Future", channel: _StreamChannel,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield ``channel`` events as they arrive until ``task`` finishes.
+
+        Whatever is still queued when the task completes is left for the
+        regular post-tool drain, so event order is preserved. If the consumer
+        goes away first, the task is cancelled rather than left running.
+        """
+        try:
+            while not task.done():
+                channel.signal.clear()
+                if channel.events:
+                    for event in channel.drain():
+                        yield event
+                    continue
+                signal_wait = asyncio.ensure_future(channel.signal.wait())
+                try:
+                    await asyncio.wait({task, signal_wait}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    signal_wait.cancel()
+        finally:
+            if not task.done():
+                task.cancel()
+
     async def _execute_tool_raw(self, tool_name: str, tool_input: dict, max_retries: int = 2) -> dict:
         """Low-level tool dispatch — NO prerequisite resolution (avoids recursion).
 
@@ -8922,6 +9062,23 @@ Answer using specific company names and numbers from the portfolio grid above.""
         if not handler:
             return {"error": f"Handler not found: {tool_def.handler}"}
 
+        # Route the handler's blocking calls (via _offload) to the pool the
+        # tool declares; the handler itself stays on the loop for locks and
+        # shared_data. wait_for copies this context into the handler task.
+        execution_token = _TOOL_EXECUTION.set(
+            tool_def.execution if tool_def.execution != "loop" else "io"
+        )
+        try:
+            return await self._run_handler_with_retries(
+                tool_name, tool_def, handler, tool_input, max_retries,
+            )
+        finally:
+            _TOOL_EXECUTION.reset(execution_token)
+
+    async def _run_handler_with_retries(
+        self, tool_name: str, tool_def: "AgentTool", handler, tool_input: dict, max_retries: int,
+    ) -> dict:
+        """Run a tool handler with timeout + retry (rate limits back off)."""
         last_error = None
         for attempt in range(max_retries + 1):
             try:
@@ -9107,7 +9264,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
             if pull_company_data is None:
                 return {"summary": "pull_company_data not available.", "data": {}}
 
-            cd = pull_company_data(company_id)
+            cd = await pull_company_data_async(company_id)
             if cd.metadata.get("row_count", 0) == 0:
                 return {"summary": f"No financial data found for company {company_id}.", "data": {}}
 
@@ -9429,7 +9586,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 }
 
             # Collect all results from the async generator, pushing progress
-            # events to _streaming_event_queue for the conversational loop to
+            # events to the agent loop's stream channel for it to
             # drain and yield to the frontend.
             all_results = []
             all_events = []
@@ -9439,7 +9596,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
             ):
                 all_events.append(event)
                 # Push progress/per-doc events so frontend gets live updates
-                self._streaming_event_queue.append(event)
+                self._push_stream_event(event)
                 if event.get("type") == "doc_extracted":
                     all_results.append({
                         "doc_id": event["doc_id"],
@@ -9496,7 +9653,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 answer_type=answer_type,
             ):
                 # Push all events for live frontend streaming
-                self._streaming_event_queue.append(event)
+                self._push_stream_event(event)
                 if event.get("type") == "doc_search_result":
                     answers.append({
                         "doc_id": event["doc_id"],
@@ -9658,7 +9815,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                         from supabase import create_client
                         sb = create_client(supabase_url, supabase_key)
                         method_used = val_result.get("method", inputs.get("method", "auto"))
-                        sb.table("pending_suggestions").upsert({
+                        await self._offload(sb.table("pending_suggestions").upsert({
                             "fund_id": fund_id,
                             "company_id": company_id,
                             "column_id": "valuation",
@@ -9666,7 +9823,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                             "source_service": f"valuation_engine.{method_used}",
                             "reasoning": f"Valuation via {method_used}: {val_result.get('summary', '')}",
                             "metadata": {"tool": "run_valuation", "method": method_used},
-                        }, on_conflict="fund_id,company_id,column_id").execute()
+                        }, on_conflict="fund_id,company_id,column_id").execute)
                 except Exception as e:
                     logger.warning(f"[TOOL] Failed to persist valuation suggestion: {e}")
 
@@ -9778,7 +9935,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
 
                         svc = ScenarioBranchService()
                         sb = get_supabase_client()
-                        branch_row = sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute()
+                        branch_row = await self._offload(sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute)
                         if branch_row.data:
                             existing = branch_row.data[0].get("assumptions", {})
                             if isinstance(existing, str):
@@ -9790,11 +9947,13 @@ Answer using specific company names and numbers from the portfolio grid above.""
                                     existing[k].update(v)
                                 else:
                                     existing[k] = v
-                            sb.table("scenario_branches").update(
+                            await self._offload(sb.table("scenario_branches").update(
                                 {"assumptions": _json.dumps(existing)}
-                            ).eq("id", branch_id).execute()
+                            ).eq("id", branch_id).execute)
 
                             company_id = inputs.get("company_id") or self.shared_data.get("company_id")
+                            from app.services.scenario_branch_service import invalidate_branch_cache
+                            invalidate_branch_cache(company_id)
                             if company_id:
                                 after = svc.execute_branch(branch_id, company_id)
                                 if "error" not in after and after.get("forecast"):
@@ -10083,6 +10242,8 @@ Answer using specific company names and numbers from the portfolio grid above.""
             "assumptions": _json.dumps(assumptions),
         }
         result = sb.table("scenario_branches").insert(row).execute()
+        from app.services.scenario_branch_service import invalidate_branch_cache
+        invalidate_branch_cache(company_id)
         if not result.data:
             raise RuntimeError("Failed to create scenario branch")
         new_id = result.data[0]["id"]
@@ -10131,7 +10292,9 @@ Answer using specific company names and numbers from the portfolio grid above.""
                     "name": f"Adjust {driver_def.label}",
                     "assumptions": _json.dumps(new_assumptions),
                 }
-                result = sb.table("scenario_branches").insert(row).execute()
+                result = await self._offload(sb.table("scenario_branches").insert(row).execute)
+                from app.services.scenario_branch_service import invalidate_branch_cache
+                invalidate_branch_cache(company_id)
                 if not result.data:
                     return {"error": "Failed to create scenario branch"}
                 branch_id = result.data[0]["id"]
@@ -10144,7 +10307,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 return before
 
             # 2. Update the branch assumptions in DB
-            branch_row = sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute()
+            branch_row = await self._offload(sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute)
             if not branch_row.data:
                 return {"error": f"Branch {branch_id} not found"}
 
@@ -10164,9 +10327,11 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 else:
                     existing[k] = v
 
-            sb.table("scenario_branches").update(
+            await self._offload(sb.table("scenario_branches").update(
                 {"assumptions": _json.dumps(existing)}
-            ).eq("id", branch_id).execute()
+            ).eq("id", branch_id).execute)
+            from app.services.scenario_branch_service import invalidate_branch_cache
+            invalidate_branch_cache(company_id)
 
             # 3. Execute branch AFTER the change
             after = svc.execute_branch(branch_id, company_id)
@@ -10320,7 +10485,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 return before
 
             # 2. Merge into existing assumptions
-            branch_row = sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute()
+            branch_row = await self._offload(sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute)
             if not branch_row.data:
                 return {"error": f"Branch {branch_id} not found"}
 
@@ -10337,9 +10502,11 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 else:
                     existing[k] = v
 
-            sb.table("scenario_branches").update(
+            await self._offload(sb.table("scenario_branches").update(
                 {"assumptions": _json.dumps(existing)}
-            ).eq("id", branch_id).execute()
+            ).eq("id", branch_id).execute)
+            from app.services.scenario_branch_service import invalidate_branch_cache
+            invalidate_branch_cache(company_id)
 
             # 3. Execute AFTER
             after = svc.execute_branch(branch_id, company_id)
@@ -10451,7 +10618,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 return before
 
             # 2. Update branch assumptions
-            branch_row = sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute()
+            branch_row = await self._offload(sb.table("scenario_branches").select("assumptions").eq("id", branch_id).execute)
             if not branch_row.data:
                 return {"error": f"Branch {branch_id} not found"}
 
@@ -10465,9 +10632,11 @@ Answer using specific company names and numbers from the portfolio grid above.""
             for k, v in assumptions.items():
                 existing[k] = v
 
-            sb.table("scenario_branches").update(
+            await self._offload(sb.table("scenario_branches").update(
                 {"assumptions": _json.dumps(existing)}
-            ).eq("id", branch_id).execute()
+            ).eq("id", branch_id).execute)
+            from app.services.scenario_branch_service import invalidate_branch_cache
+            invalidate_branch_cache(company_id)
 
             # 3. Execute AFTER
             after = svc.execute_branch(branch_id, company_id)
@@ -10548,7 +10717,8 @@ Answer using specific company names and numbers from the portfolio grid above.""
             months = inputs.get("months", inputs.get("years", 5) * 12)
 
             svc = LiquidityManagementService()
-            result = svc.build_liquidity_model(
+            result = await self._offload(
+                svc.build_liquidity_model,
                 company_id=company_id,
                 months=months,
                 scenario_overrides=inputs.get("growth_overrides"),
@@ -10770,7 +10940,8 @@ Answer using specific company names and numbers from the portfolio grid above.""
             months = inputs.get("months", inputs.get("years", 5) * 12)
 
             svc = LiquidityManagementService()
-            result = svc.build_scenario_comparison(
+            result = await self._offload(
+                svc.build_scenario_comparison,
                 company_id=company_id,
                 months=months,
             )
@@ -11954,7 +12125,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 # Direct lookup by ID
                 client = ps._client()
                 if client:
-                    resp = client.table("companies").select("*").eq("id", company_id).limit(1).execute()
+                    resp = await self._offload(client.table("companies").select("*").eq("id", company_id).limit(1).execute)
                     if resp.data:
                         company = resp.data[0]
                     else:
@@ -12015,7 +12186,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 if supabase_url and supabase_key:
                     from supabase import create_client
                     sb = create_client(supabase_url, supabase_key)
-                    sb.table("pending_suggestions").upsert({
+                    await self._offload(sb.table("pending_suggestions").upsert({
                         "fund_id": fund_id,
                         "company_id": company_id,
                         "column_id": column_id,
@@ -12023,7 +12194,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                         "source_service": "agent.suggest_edit",
                         "reasoning": reasoning,
                         "metadata": {"tool": "suggest_grid_edit"},
-                    }, on_conflict="fund_id,company_id,column_id").execute()
+                    }, on_conflict="fund_id,company_id,column_id").execute)
             except Exception as e:
                 logger.warning(f"[TOOL] Failed to persist suggestion: {e}")
 
@@ -12062,7 +12233,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                 if supabase_url and supabase_key:
                     from supabase import create_client
                     sb = create_client(supabase_url, supabase_key)
-                    sb.table("pending_suggestions").upsert({
+                    await self._offload(sb.table("pending_suggestions").upsert({
                         "fund_id": fund_id,
                         "company_id": company_id or "portfolio",
                         "column_id": f"_action_{suggestion_type}",
@@ -12070,7 +12241,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                         "source_service": "agent.suggest_action",
                         "reasoning": inputs.get("description", ""),
                         "metadata": {"tool": "suggest_action", "priority": inputs.get("priority", "medium")},
-                    }, on_conflict="fund_id,company_id,column_id").execute()
+                    }, on_conflict="fund_id,company_id,column_id").execute)
             except Exception as e:
                 logger.warning(f"[TOOL] Failed to persist action suggestion: {e}")
 
@@ -12338,7 +12509,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                     from supabase import create_client
                     sb = create_client(supabase_url, supabase_key)
                     for cmd in grid_commands:
-                        sb.table("pending_suggestions").upsert({
+                        await self._offload(sb.table("pending_suggestions").upsert({
                             "fund_id": fund_id,
                             "company_id": cmd["rowId"],
                             "column_id": cmd["columnId"],
@@ -12352,7 +12523,7 @@ Answer using specific company names and numbers from the portfolio grid above.""
                                 "confidence": cmd["confidence"],
                                 "impact": cmd["impact"],
                             },
-                        }, on_conflict="fund_id,company_id,column_id").execute()
+                        }, on_conflict="fund_id,company_id,column_id").execute)
             except Exception as e:
                 logger.warning(f"[TOOL] Failed to persist proposed edits: {e}")
 
@@ -13360,7 +13531,8 @@ Return JSON with ONLY these fields (use null if unknown):
 
             months = inputs.get("months", 24)
             builder = PnlBuilder(company_id, fund_id=fund_id)
-            result = builder.build(
+            result = await self._offload(
+                builder.build,
                 start=inputs.get("start"),
                 end=inputs.get("end"),
                 forecast_months=months,
@@ -13401,7 +13573,8 @@ Return JSON with ONLY these fields (use null if unknown):
                 return {"error": "company_id is required — no valid UUID found in inputs or session context"}
 
             builder = BalanceSheetBuilder(company_id)
-            result = builder.build(
+            result = await self._offload(
+                builder.build,
                 start=inputs.get("start"),
                 end=inputs.get("end"),
             )
@@ -13937,7 +14110,8 @@ Return JSON with ONLY these fields (use null if unknown):
             months = inputs.get("months", 24)
 
             svc = LiquidityManagementService()
-            liq_result = svc.build_liquidity_model(
+            liq_result = await self._offload(
+                svc.build_liquidity_model,
                 company_id=company_id,
                 months=months,
                 start_period=inputs.get("start_period"),
@@ -14014,7 +14188,8 @@ Return JSON with ONLY these fields (use null if unknown):
                 return {"error": "company_id is required"}
 
             svc = LiquidityManagementService()
-            result = svc.build_liquidity_model(
+            result = await self._offload(
+                svc.build_liquidity_model,
                 company_id=company_id,
                 months=inputs.get("months", 24),
                 start_period=inputs.get("start_period"),
@@ -14073,7 +14248,8 @@ Return JSON with ONLY these fields (use null if unknown):
                 return {"error": "company_id is required"}
 
             svc = LiquidityManagementService()
-            result = svc.build_scenario_comparison(
+            result = await self._offload(
+                svc.build_scenario_comparison,
                 company_id=company_id,
                 months=inputs.get("months", 24),
                 start_period=inputs.get("start_period"),
@@ -14128,9 +14304,12 @@ Return JSON with ONLY these fields (use null if unknown):
                 return {"error": "company_id is required"}
 
             svc = LiquidityManagementService()
-            result = svc.runway_sensitivity(
+            result = await self._offload(
+                svc.runway_sensitivity,
                 company_id=company_id,
                 months=inputs.get("months", 24),
+                shocks=inputs.get("shocks"),
+                two_way=inputs.get("two_way"),
             )
 
             async with self.shared_data_lock:
@@ -14204,7 +14383,7 @@ Return JSON with ONLY these fields (use null if unknown):
             }
             if user_id:
                 row["user_id"] = user_id
-            sb.table("agent_tasks").insert(row).execute()
+            await self._offload(sb.table("agent_tasks").insert(row).execute)
         except Exception as e:
             logger.warning(f"[schedule_task] Supabase insert failed: {e}")
             return {"error": f"Failed to persist task: {e}"}
@@ -14260,7 +14439,7 @@ Return JSON with ONLY these fields (use null if unknown):
 
         try:
             sb = get_supabase()
-            sb.table("agent_tasks").update({"status": new_status}).eq("id", task_id).execute()
+            await self._offload(sb.table("agent_tasks").update({"status": new_status}).eq("id", task_id).execute)
         except Exception as e:
             return {"error": f"DB update failed: {e}"}
 
@@ -14298,7 +14477,7 @@ Return JSON with ONLY these fields (use null if unknown):
             ).eq("fund_id", fund_id)
             if status_filter and status_filter != "all":
                 q = q.eq("status", status_filter)
-            result = q.order("created_at", desc=True).execute()
+            result = await self._offload(q.order("created_at", desc=True).execute)
             return {"tasks": result.data or []}
         except Exception as e:
             return {"error": str(e)}
@@ -14396,7 +14575,9 @@ Return JSON with ONLY these fields (use null if unknown):
             if inputs.get("fork_period"):
                 row["fork_period"] = inputs["fork_period"]
 
-            result = sb.table("scenario_branches").insert(row).execute()
+            result = await self._offload(sb.table("scenario_branches").insert(row).execute)
+            from app.services.scenario_branch_service import invalidate_branch_cache
+            invalidate_branch_cache(company_id)
             branch = result.data[0] if result.data else {}
             branch_id = branch.get("id")
 
@@ -14450,7 +14631,7 @@ Return JSON with ONLY these fields (use null if unknown):
                 return {"error": "Database unavailable"}
 
             # Read existing assumptions
-            existing = sb.table("scenario_branches").select("assumptions, name").eq("id", branch_id).execute()
+            existing = await self._offload(sb.table("scenario_branches").select("assumptions, name").eq("id", branch_id).execute)
             if not existing.data:
                 return {"error": f"Branch {branch_id} not found"}
 
@@ -14471,9 +14652,11 @@ Return JSON with ONLY these fields (use null if unknown):
                     current[k] = v
 
             # Persist updated assumptions
-            sb.table("scenario_branches").update(
+            await self._offload(sb.table("scenario_branches").update(
                 {"assumptions": current}
-            ).eq("id", branch_id).execute()
+            ).eq("id", branch_id).execute)
+            from app.services.scenario_branch_service import invalidate_branch_cache
+            invalidate_branch_cache(company_id)
 
             # Re-execute forecast with cascaded drivers
             svc = ScenarioBranchService()
@@ -14541,7 +14724,8 @@ Return JSON with ONLY these fields (use null if unknown):
 
             forecast_months = inputs.get("forecast_months", 24)
             svc = ScenarioBranchService()
-            result = svc.execute_comparison(
+            result = await self._offload(
+                svc.execute_comparison,
                 company_id=company_id,
                 branch_ids=branch_ids,
                 forecast_months=forecast_months,
@@ -14636,7 +14820,7 @@ Return JSON with ONLY these fields (use null if unknown):
             if fiscal_year:
                 query = query.eq("fiscal_year", fiscal_year)
 
-            result = query.execute()
+            result = await self._offload(query.execute)
             return {"budgets": result.data or [], "count": len(result.data or [])}
         except Exception as e:
             logger.warning(f"[TOOL] fpa_budget_list failed: {e}")
@@ -14655,7 +14839,7 @@ Return JSON with ONLY these fields (use null if unknown):
             if not sb:
                 return {"error": "Database unavailable"}
 
-            result = sb.table("budget_lines").select("*").eq("budget_id", budget_id).execute()
+            result = await self._offload(sb.table("budget_lines").select("*").eq("budget_id", budget_id).execute)
             return {"lines": result.data or [], "count": len(result.data or [])}
         except Exception as e:
             logger.warning(f"[TOOL] fpa_budget_lines failed: {e}")
@@ -14691,13 +14875,13 @@ Return JSON with ONLY these fields (use null if unknown):
             if not sb:
                 return {"error": "Database unavailable"}
 
-            result = sb.table("budgets").insert({
+            result = await self._offload(sb.table("budgets").insert({
                 "company_id": company_id,
                 "fund_id": inputs.get("fund_id"),
                 "name": name,
                 "fiscal_year": fiscal_year,
                 "status": inputs.get("status", "draft"),
-            }).execute()
+            }).execute)
 
             if not result.data:
                 return {"error": "Failed to create budget"}
@@ -14730,7 +14914,7 @@ Return JSON with ONLY these fields (use null if unknown):
             if not sb:
                 return {"error": "Database unavailable"}
 
-            sb.table("fpa_actuals").upsert(
+            await self._offload(sb.table("fpa_actuals").upsert(
                 {
                     "company_id": company_id,
                     "fund_id": inputs.get("fund_id"),
@@ -14742,7 +14926,9 @@ Return JSON with ONLY these fields (use null if unknown):
                     "source": "agent_edit",
                 },
                 on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
-            ).execute()
+            ).execute)
+            from app.services.company_data_pull import invalidate_company_cache
+            invalidate_company_cache(company_id)
 
             return {"success": True, "category": category, "period": period, "amount": amount}
         except Exception as e:
@@ -14770,14 +14956,14 @@ Return JSON with ONLY these fields (use null if unknown):
 
             # Create upload job record (mirrors document processing state pattern)
             if sb:
-                job_row = sb.table("fpa_upload_jobs").insert({
+                job_row = await self._offload(sb.table("fpa_upload_jobs").insert({
                     "company_id": company_id,
                     "fund_id": inputs.get("fund_id"),
                     "source": "agent_tool",
                     "status": "pending",
                     "step": "validating",
                     "message": f"Received {len(time_series)} time series entries",
-                }).execute()
+                }).execute)
                 job_id = job_row.data[0]["id"] if job_row.data else None
 
             def _update_job(updates: dict):
@@ -14788,14 +14974,15 @@ Return JSON with ONLY these fields (use null if unknown):
                 except Exception as ue:
                     logger.warning(f"[TOOL] fpa_upload_actuals job update failed: {ue}")
 
-            _update_job({
+            await self._offload(_update_job, {
                 "status": "processing",
                 "started_at": datetime.utcnow().isoformat(),
                 "step": "extracting_amounts",
                 "message": f"Processing {len(time_series)} entries",
             })
 
-            count = ingest_time_series(
+            count = await self._offload(
+                ingest_time_series,
                 time_series=time_series,
                 company_id=company_id,
                 fund_id=inputs.get("fund_id"),
@@ -14812,7 +14999,7 @@ Return JSON with ONLY these fields (use null if unknown):
                 and e.get(k) is not None
             ))
 
-            _update_job({
+            await self._offload(_update_job, {
                 "status": "completed",
                 "step": "completed",
                 "message": f"Ingested {count} rows across {len(periods)} periods",
@@ -14831,12 +15018,12 @@ Return JSON with ONLY these fields (use null if unknown):
                     from app.core.supabase_client import get_supabase_client as get_supabase_client
                     sb = get_supabase_client()
                     if sb:
-                        sb.table("fpa_upload_jobs").update({
+                        await self._offload(sb.table("fpa_upload_jobs").update({
                             "status": "failed",
                             "step": "failed",
                             "error": str(e),
                             "completed_at": datetime.utcnow().isoformat(),
-                        }).eq("id", job_id).execute()
+                        }).eq("id", job_id).execute)
                 except Exception:
                     pass
             return {"error": str(e), "job_id": job_id}
@@ -14855,15 +15042,15 @@ Return JSON with ONLY these fields (use null if unknown):
             if not sb:
                 return {"error": "Database unavailable"}
 
-            budget = sb.table("budgets").select("id").eq("id", budget_id).execute()
+            budget = await self._offload(sb.table("budgets").select("id").eq("id", budget_id).execute)
             if not budget.data:
                 return {"error": f"Budget {budget_id} not found"}
 
             rows = [{"budget_id": budget_id, **line} for line in lines]
-            result = sb.table("budget_lines").upsert(
+            result = await self._offload(sb.table("budget_lines").upsert(
                 rows,
                 on_conflict="budget_id,category",
-            ).execute()
+            ).execute)
 
             return {"success": True, "lines_upserted": len(result.data or [])}
         except Exception as e:
@@ -14928,13 +15115,13 @@ Return JSON with ONLY these fields (use null if unknown):
             if not sb:
                 return {"error": "Database unavailable"}
 
-            conn_result = (
+            conn_result = await self._offload(
                 sb.table("xero_connections")
                 .select("id, user_id")
                 .eq("company_id", company_id)
                 .order("created_at", desc=True)
                 .limit(1)
-                .execute()
+                .execute
             )
             if not conn_result.data:
                 return {"error": f"No Xero connection found for company {company_id}"}
@@ -14956,7 +15143,20 @@ Return JSON with ONLY these fields (use null if unknown):
     async def _tool_fpa_kpi_dashboard(self, inputs: dict) -> dict:
         """Compute business-type-aware KPIs with time series and trends."""
         try:
-            from app.services.kpi_engine import KPIEngine, snapshot_to_dict
+            from app.services.kpi_engine import KPIEngine, fund_kpis_to_dict, snapshot_to_dict
+
+            if inputs.get("fund_wide"):
+                fc = self._get_fund_companies()
+                if fc.empty:
+                    return {"error": "No portfolio companies found. Ensure fund context is available."}
+                fund_kpis = KPIEngine().compute_fund(
+                    fc,
+                    as_of=inputs.get("as_of"),
+                    periods=inputs.get("periods", 12),
+                )
+                result = fund_kpis_to_dict(fund_kpis, names=fc.names)
+                self.shared_data["fund_kpis"] = result
+                return result
 
             company_id = self._resolve_company_id(inputs)
             if not company_id:
@@ -15190,7 +15390,8 @@ Return JSON with ONLY these fields (use null if unknown):
                         branch_id=branch_id,
                         company_data=self.shared_data.get("company_data"),
                     )
-                    driver_impact_result = svc.trace_strategic_impact(
+                    driver_impact_result = await self._offload(
+                        svc.trace_strategic_impact,
                         state=state,
                         trigger=trigger_driver,
                         delta=delta,
@@ -15252,7 +15453,7 @@ Return JSON with ONLY these fields (use null if unknown):
                 or None
             )
             builder = PnlBuilder(company_id, fund_id=fund_id)
-            result = builder.build(forecast_months=0, view="waterfall")
+            result = await self._offload(builder.build, forecast_months=0, view="waterfall")
 
             # Extract key metrics from the last actual period
             rows = result.get("rows", [])
@@ -15298,7 +15499,7 @@ Return JSON with ONLY these fields (use null if unknown):
             from app.services.balance_sheet_builder import BalanceSheetBuilder
 
             builder = BalanceSheetBuilder(company_id)
-            result = builder.build()
+            result = await self._offload(builder.build)
 
             totals = result.get("totals", {})
             periods = result.get("periods", [])
@@ -15656,8 +15857,9 @@ Return JSON with ONLY these fields (use null if unknown):
                 params = ResolvedParameterSet(company_id=company_id)
 
             engine = CascadeGraph()
-            engine.build_from_clauses(params)
-            result = engine.simulate(
+            await self._offload(engine.build_from_clauses, params)
+            result = await self._offload(
+                engine.simulate,
                 trigger=trigger,
                 new_value=new_value,
                 current_params=params,
@@ -15774,21 +15976,58 @@ Return JSON with ONLY these fields (use null if unknown):
         return domains
 
     async def _tool_fpa_monte_carlo(self, inputs: dict) -> dict:
-        """Monte Carlo simulation over the cash flow model."""
+        """Monte Carlo simulation over the cash flow model.
+
+        Default is convergence-driven: runs in chunks until p5/p50/p95 cash,
+        median runway and VaR are stable within ``tolerance``, streaming the
+        partial fan chart as progress events after every chunk. An explicit
+        ``iterations`` with ``adaptive=false`` runs the fixed-count batch.
+        """
         try:
-            from app.services.monte_carlo_engine import MonteCarloEngine, result_to_dict
+            from app.services.monte_carlo_engine import DEFAULT_TOLERANCE, MonteCarloEngine, result_to_dict
 
             company_id = self._resolve_company_id(inputs)
             if not company_id:
                 return {"error": "company_id is required — no valid UUID found in inputs or session context"}
 
             engine = MonteCarloEngine()
-            result = engine.simulate(
-                company_id=company_id,
-                iterations=inputs.get("iterations", 1000),
-                months=inputs.get("months", 24),
-                branch_id=inputs.get("branch_id"),
-            )
+            months = inputs.get("months", 24)
+            if inputs.get("adaptive", True):
+                loop = asyncio.get_running_loop()
+                push = self._stream_pusher()
+
+                def _on_progress(snapshot: dict) -> None:
+                    loop.call_soon_threadsafe(push, {
+                        "type": "progress",
+                        "stage": "monte_carlo",
+                        "message": (
+                            f"Monte Carlo: {snapshot['iterations']} paths"
+                            + (" — converged" if snapshot["converged"] else "")
+                        ),
+                        "company_id": company_id,
+                        "monte_carlo": snapshot,
+                    })
+
+                # Stop with a partial result before the tool timeout hits
+                timeout_s = AGENT_TOOL_MAP["fpa_monte_carlo"].timeout_ms / 1000
+                result = await self._offload(
+                    engine.simulate_adaptive,
+                    company_id=company_id,
+                    months=months,
+                    tolerance=float(inputs.get("tolerance", DEFAULT_TOLERANCE)),
+                    max_iterations=int(inputs.get("iterations") or 1000),
+                    time_budget_s=timeout_s * 0.75,
+                    branch_id=inputs.get("branch_id"),
+                    on_progress=_on_progress,
+                )
+            else:
+                result = await self._offload(
+                    engine.simulate,
+                    company_id=company_id,
+                    iterations=inputs.get("iterations", 1000),
+                    months=months,
+                    branch_id=inputs.get("branch_id"),
+                )
 
             if result.iterations == 0:
                 return {"error": "No actuals data. Upload financials first."}
@@ -16683,15 +16922,19 @@ Return JSON with ONLY these fields (use null if unknown):
 
             if fund_id:
                 # Pull all companies in the fund — no name resolution needed
-                rows = client.from_("portfolio_companies") \
-                    .select("company_id") \
-                    .eq("fund_id", fund_id).execute().data or []
+                rows = (await self._offload(
+                    client.from_("portfolio_companies")
+                    .select("company_id")
+                    .eq("fund_id", fund_id).execute
+                )).data or []
                 company_ids = [r["company_id"] for r in rows if r.get("company_id")]
                 if not company_ids:
                     # Fallback: check companies table directly
-                    rows = client.from_("companies") \
-                        .select("id, name") \
-                        .eq("fund_id", fund_id).execute().data or []
+                    rows = (await self._offload(
+                        client.from_("companies")
+                        .select("id, name")
+                        .eq("fund_id", fund_id).execute
+                    )).data or []
                     company_ids = [r["id"] for r in rows if r.get("id")]
             else:
                 company_id = self._resolve_company_id(inputs)
@@ -16814,7 +17057,8 @@ Return JSON with ONLY these fields (use null if unknown):
                     "reports": reports,
                 }
 
-            overviews = [_overview_for_company(cid) for cid in company_ids]
+            # Each overview is six blocking queries plus a P&L pull — off the loop
+            overviews = [await self._offload(_overview_for_company, cid) for cid in company_ids]
 
             if len(overviews) == 1:
                 return overviews[0]
@@ -18998,6 +19242,8 @@ Rules:
         When a QueryClassification is provided, its intent and suggested_chain
         guide the REASON step so the agent can produce clear, actionable plans.
         """
+        # Progress events pushed by this loop's tools (never another session's)
+        _stream = _StreamChannel()
 
         # ── Reply iteration cap: reply mode gets a mini loop (max 2 iters) ──
         _resp_mode_entry = classification.response_mode if classification else "reply"
@@ -19958,13 +20204,25 @@ JSON — pick one:
                 }
 
             # --- ACT (Python service call(s), no LLM) ---
+            # Run as a task so progress events pushed by long tools (e.g.
+            # Monte Carlo partial fan charts) stream while they execute.
             if len(iter_steps) > 1:
                 # Parallel execution via asyncio.gather
-                iter_results = await self._execute_tools_parallel(iter_steps, plan=session_plan)
+                _act_task = self._start_streaming_task(
+                    _stream, self._execute_tools_parallel(iter_steps, plan=session_plan)
+                )
+                async for _streamed in self._stream_events_until_done(_act_task, _stream):
+                    yield _streamed
+                iter_results = _act_task.result()
             else:
                 # Single tool — direct call (preserves existing behaviour)
                 single_step = iter_steps[0]
-                result = await self._execute_tool(single_step.tool, single_step.inputs)
+                _act_task = self._start_streaming_task(
+                    _stream, self._execute_tool(single_step.tool, single_step.inputs)
+                )
+                async for _streamed in self._stream_events_until_done(_act_task, _stream):
+                    yield _streamed
+                result = _act_task.result()
                 if session_plan:
                     if "error" in result:
                         session_plan.mark_failed(single_step.id, result.get("error", ""))
@@ -19977,10 +20235,8 @@ JSON — pick one:
             _total_tool_calls += len(iter_results)
 
             # --- Drain any intermediate streaming events (e.g. doc progress) ---
-            if self._streaming_event_queue:
-                for _streamed in self._streaming_event_queue:
-                    yield _streamed
-                self._streaming_event_queue.clear()
+            for _streamed in _stream.drain():
+                yield _streamed
 
             # --- Stream tool_end for each completed tool ---
             _tool_elapsed_ms = int((_time_mod.monotonic() - _tool_start_ts) * 1000)
@@ -20744,7 +21000,7 @@ ABSOLUTE RULES:
                                     (self.shared_data.get("fund_context") or {}).get("fund_id")
                     if _resolved_cid and pull_company_data and not self.shared_data.get('company_fpa_data'):
                         try:
-                            _cd = pull_company_data(_resolved_cid, fund_id=_pull_fund_id)
+                            _cd = await pull_company_data_async(_resolved_cid, fund_id=_pull_fund_id)
                             if _cd and _cd.periods:
                                 self.shared_data['company_fpa_data'] = {
                                     'latest': _cd.latest,
@@ -37008,7 +37264,7 @@ Return a JSON with this structure:
             query = supabase_service.client.table("companies").select("*")
             if fund_id:
                 query = query.eq("fund_id", fund_id)
-            result = query.execute()
+            result = await self._offload(query.execute)
             portfolio_companies = result.data or []
 
             # Filter to requested company if specified
@@ -37153,9 +37409,9 @@ Return a JSON with this structure:
             # Find company in portfolio
             if company_name:
                 company_name_lower = company_name.lower().strip().lstrip("@")
-                result = supabase_service.client.table("companies").select(
+                result = await self._offload(supabase_service.client.table("companies").select(
                     "*"
-                ).execute()
+                ).execute)
                 matches = [
                     pc for pc in (result.data or [])
                     if company_name_lower in (pc.get("name", "") or "").lower()
@@ -37723,10 +37979,13 @@ Return a JSON with this structure:
             # Batch upsert in 500-row chunks
             for i in range(0, len(rows), 500):
                 chunk = rows[i:i + 500]
-                sb.table("fpa_actuals").upsert(
+                await self._offload(sb.table("fpa_actuals").upsert(
                     chunk,
                     on_conflict="company_id,period,category,subcategory,hierarchy_path,source",
-                ).execute()
+                ).execute)
+            from app.services.company_data_pull import invalidate_company_cache
+            for cid in set(r["company_id"] for r in rows):
+                invalidate_company_cache(cid)
 
             # Build grid_commands for frontend
             grid_commands = []
@@ -42914,27 +43173,35 @@ Return your analysis with inline citations for ALL factual claims.
         target_arr = float(target_arr or 0)
         target_geo = target_data.get("hq_location") or target_data.get("hq") or ""
 
-        # DB search for similar companies
+        target_profile = {
+            "sector": target_sector,
+            "stage": target_stage,
+            "arr": target_arr,
+            "business_model": target_bm,
+            "hq": target_geo,
+            "growth_rate": target_data.get("growth_rate"),
+            "valuation": target_data.get("valuation") or target_data.get("current_valuation_usd"),
+        }
+
+        # Nearest neighbours over the whole companies table (in-process index)
         db_comps = []
         try:
-            from app.services.portfolio_service import portfolio_service
-            # Search by sector
-            if target_sector:
-                resp = await portfolio_service.search_companies_db(target_sector, limit=max_results * 2)
-                db_comps.extend(resp.get("companies", []))
-            # Search by business model
-            if target_bm:
-                resp = await portfolio_service.search_companies_db(target_bm, limit=max_results)
-                seen_ids = {c.get("company_id") for c in db_comps}
-                for c in resp.get("companies", []):
-                    if c.get("company_id") not in seen_ids:
-                        db_comps.append(c)
+            from app.services.company_index import company_index
+            from app.services.portfolio_service import _format_search_hit
+
+            if (target_sector or target_bm) and await company_index.ensure_fresh():
+                for row, _ in company_index.nearest(
+                    target_profile,
+                    k=max_results * 2,
+                    exclude_names=[target_company],
+                    min_text_similarity=float(
+                        inputs.get("min_text_similarity", _COMPARABLES_MIN_TEXT_SIMILARITY)
+                    ),
+                ):
+                    db_comps.append(_format_search_hit(row))
         except Exception as e:
             logger.warning(f"[FIND_COMPARABLES] DB search failed: {e}")
 
-        # Remove the target itself
-        db_comps = [c for c in db_comps if (c.get("name") or "").lower().strip() != target_company.lower()]
-
         # Web search for additional comps
         web_comps = []
         if len(db_comps) < max_results and hasattr(self, '_execute_web_search'):
@@ -43006,48 +43273,11 @@ Return your analysis with inline citations for ALL factual claims.
             enriched = [e for e in enriched if not e.get("error")]
             db_comps.extend(enriched)
 
-        # Similarity scoring
-        for c in db_comps:
-            sim = 0.0
-            total_weight = 0.0
-
-            # Sector match (weight 3)
-            c_sector = (c.get("sector") or "").lower()
-            if target_sector and c_sector:
-                from difflib import SequenceMatcher
-                sim += 3 * SequenceMatcher(None, target_sector.lower(), c_sector).ratio()
-            total_weight += 3
-
-            # Stage match (weight 2)
-            c_stage = (c.get("stage") or "").lower()
-            if target_stage and c_stage:
-                sim += 2 * (1.0 if target_stage.lower() == c_stage else 0.3)
-            total_weight += 2
-
-            # Revenue range (weight 2) — within 5x
-            c_arr = c.get("arr") or 0
-            if hasattr(c_arr, "value"):
-                c_arr = c_arr.value
-            c_arr = float(c_arr or 0)
-            if target_arr > 0 and c_arr > 0:
-                ratio = min(target_arr, c_arr) / max(target_arr, c_arr)
-                sim += 2 * ratio
-            total_weight += 2
-
-            # Business model (weight 2)
-            c_bm = (c.get("business_model") or "").lower()
-            if target_bm and c_bm:
-                from difflib import SequenceMatcher
-                sim += 2 * SequenceMatcher(None, target_bm.lower(), c_bm).ratio()
-            total_weight += 2
-
-            # Geography (weight 1)
-            c_geo = (c.get("hq") or c.get("hq_location") or "").lower()
-            if target_geo and c_geo:
-                sim += 1 * (1.0 if target_geo.lower() in c_geo or c_geo in target_geo.lower() else 0.2)
-            total_weight += 1
-
-            c["similarity_score"] = round(sim / total_weight * 10, 1) if total_weight > 0 else 0
+        # Similarity scoring (DB + web-enriched comps on the same scale)
+        from app.services.company_index import score_comparables
+
+        for c, score in zip(db_comps, score_comparables(target_profile, db_comps)):
+            c["similarity_score"] = score
 
         db_comps.sort(key=lambda x: x.get("similarity_score", 0), reverse=True)
         final = db_comps[:max_results]
@@ -43533,7 +43763,7 @@ Return your analysis with inline citations for ALL factual claims.
                 if supabase_url and supabase_key:
                     from supabase import create_client
                     sb = create_client(supabase_url, supabase_key)
-                    sb.table("pending_suggestions").upsert({
+                    await self._offload(sb.table("pending_suggestions").upsert({
                         "fund_id": fund_id,
                         "company_id": company_id,
                         "column_id": "_todo",
@@ -43541,7 +43771,7 @@ Return your analysis with inline citations for ALL factual claims.
                         "source_service": "agent.emit_todo",
                         "reasoning": inputs.get("description", ""),
                         "metadata": {"tool": "emit_todo", "priority": todo["priority"]},
-                    }, on_conflict="fund_id,company_id,column_id").execute()
+                    }, on_conflict="fund_id,company_id,column_id").execute)
             except Exception as e:
                 logger.warning(f"[TOOL] Failed to persist todo: {e}")
 
@@ -43895,70 +44125,31 @@ Return your analysis with inline citations for ALL factual claims.
         return base_queries[:self._calculate_search_depth(gaps)]
 
     async def _execute_bulk_valuation(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        """Run valuation engine across all portfolio companies in parallel."""
-        fund_id = inputs.get('fund_id')
-        if not fund_id:
-            return {"error": "fund_id required for bulk valuation"}
-
-        try:
-            from app.services.portfolio_service import PortfolioService
-            ps = PortfolioService()
-            portfolio = ps.get_portfolio(fund_id)
-            companies = portfolio.get('companies', []) if portfolio else []
-            if not companies:
-                return {"error": "No companies found in portfolio", "fund_id": fund_id}
-
-            async def value_one(company: Dict) -> Dict:
-                try:
-                    result = await self._execute_valuation({
-                        'company_name': company.get('name', ''),
-                        'company': company.get('name', ''),
-                        'revenue': company.get('current_arr_usd') or company.get('arr') or 0,
-                        'arr': company.get('current_arr_usd') or company.get('arr') or 0,
-                        'sector': company.get('sector', ''),
-                        'stage': company.get('funnel_status', ''),
-                        'growth_rate': company.get('revenue_growth_annual_pct', 0),
-                        'fund_id': fund_id,
-                        'company_id': company.get('id'),
-                    })
-                    return {"company_id": company.get('id'), "name": company.get('name'), "result": result, "success": True}
-                except Exception as e:
-                    return {"company_id": company.get('id'), "name": company.get('name'), "error": str(e), "success": False}
-
-            # Limit concurrency to 5
-            semaphore = asyncio.Semaphore(5)
-            async def limited(company: Dict) -> Dict:
-                async with semaphore:
-                    return await value_one(company)
-
-            tasks = [limited(c) for c in companies]
-            results = await asyncio.gather(*tasks)
-
-            succeeded = [r for r in results if r.get('success')]
-            failed = [r for r in results if not r.get('success')]
+        """Start (or resume) the fund's bulk-valuation job, or poll it when job_id is given.
 
-            # Write successful valuations as pending_suggestions
-            for r in succeeded:
-                val = r.get('result', {})
-                valuation = val.get('valuation') or val.get('fair_value') or val.get('estimated_valuation')
-                if valuation and r.get('company_id'):
-                    try:
-                        await self._add_pending_suggestion_to_db(
-                            fund_id=fund_id,
-                            company_id=r['company_id'],
-                            column_id='valuation',
-                            suggested_value=valuation,
-                            source_service='valuation_engine.bulk',
-                            reasoning=f"Bulk valuation: {val.get('method', 'composite')} method"
-                        )
-                    except Exception as e:
-                        logger.warning(f"[BULK_VALUATION] Failed to write suggestion for {r.get('name')}: {e}")
+        Valuation runs on the Celery worker (app.services.bulk_valuation_job),
+        checkpointed per company, so large funds don't hit the tool timeout and
+        a failure doesn't throw away finished companies.
+        """
+        from app.services.bulk_valuation_job import get_job_status, start_bulk_valuation
 
+        job_id = inputs.get('job_id')
+        fund_id = inputs.get('fund_id')
+        try:
+            if job_id:
+                status = await asyncio.to_thread(get_job_status, job_id)
+                return status or {"error": f"Bulk valuation job {job_id} not found"}
+            if not fund_id:
+                return {"error": "fund_id required for bulk valuation"}
+            status = await asyncio.to_thread(
+                start_bulk_valuation, fund_id, inputs.get('resume', True), inputs.get('concurrency'),
+            )
             return {
-                "total": len(results),
-                "succeeded": len(succeeded),
-                "failed": len(failed),
-                "results": results,
+                **status,
+                "message": (
+                    f"Bulk valuation {status.get('state')}; poll bulk-valuation with "
+                    f"job_id={status['job_id']} or GET /api/portfolio/{fund_id}/analysis/bulk-valuation/{status['job_id']}"
+                ),
             }
         except Exception as e:
             logger.error(f"[BULK_VALUATION] Error: {e}")
@@ -45292,11 +45483,12 @@ Return your analysis with inline citations for ALL factual claims.
 
             # Build before P&L (no contract changes)
             builder_before = PnlBuilder(company_id)
-            actuals_before, periods = builder_before._pull_actuals(None, None)
+            actuals_before, periods = await self._offload(builder_before._pull_actuals, None, None)
 
             # Build after P&L (with contract changes)
             builder_after = PnlBuilder(company_id)
-            actuals_after, _ = builder_after._pull_actuals(
+            actuals_after, _ = await self._offload(
+                builder_after._pull_actuals,
                 None, None,
                 excluded_sources=pnl_params.get("excluded_sources"),
                 source_multipliers=pnl_params.get("source_multipliers"),
@@ -45343,6 +45535,8 @@ Return your analysis with inline citations for ALL factual claims.
                             sb.table("scenario_branches").update(
                                 {"assumptions": current}
                             ).eq("id", branch_id).execute()
+                            from app.services.scenario_branch_service import invalidate_branch_cache
+                            invalidate_branch_cache(company_id)
                             branch_result = {"branch_id": branch_id, "updated": True}
                     else:
                         # Create new scenario branch
@@ -45352,6 +45546,8 @@ Return your analysis with inline citations for ALL factual claims.
                             "assumptions": {"contract_changes": changes},
                         }
                         insert_result = sb.table("scenario_branches").insert(new_branch).execute()
+                        from app.services.scenario_branch_service import invalidate_branch_cache
+                        invalidate_branch_cache(company_id)
                         if insert_result.data:
                             branch_result = {
                                 "branch_id": insert_result.data[0]["id"],
@@ -893,6 +893,104 @@ class ValuationEngineService:
         # Convert any numpy types to native Python types
         return self._sanitize_valuation_result(result)
     
+    async def calculate_pwerm_batch(self, requests: List[ValuationRequest]) -> List[ValuationResult]:
+        """
+        PWERM for many companies at once (portfolio columns, fund refreshes).
+
+        Same fair values as ``_calculate_pwerm`` per request, computed in one
+        vectorized pass over the shared scenario matrix. Results carry no
+        per-scenario breakdown; run ``calculate_valuation`` for that.
+        """
+        results: List[Optional[ValuationResult]] = [None] * len(requests)
+        batch: List[int] = []
+        for i, request in enumerate(requests):
+            if request.stage in self.stage_parameters:
+                batch.append(i)
+            else:
+                results[i] = self._sanitize_valuation_result(ValuationResult(
+                    method_used="error",
+                    fair_value=0,
+                    explanation=f"Valuation failed: no PWERM parameters for stage {request.stage}",
+                    confidence=0,
+                ))
+        if not batch:
+            return results
+
+        params = [self.stage_parameters[requests[i].stage] for i in batch]
+        # Dynamic WACC only feeds the reported assumptions, as in _calculate_pwerm
+        dynamic_rates = await asyncio.gather(*(
+            self._get_dynamic_discount_rate(requests[i]) for i in batch
+        ))
+        values = self.comprehensive_pwerm.calculate_valuations_batch(
+            [self._convert_request_to_company_data(requests[i]) for i in batch],
+            discount_rate=[p['discount_rate'] for p in params],
+            dlom=[p['dlom'] for p in params],
+            scale=False,
+        )
+
+        for i, p, dynamic_rate, value in zip(batch, params, dynamic_rates, values):
+            request = requests[i]
+            fair_value = value['fair_value']
+            dlom = p['dlom']
+            count = value['scenario_count']
+            results[i] = ValuationResult(
+                method_used="PWERM",
+                fair_value=fair_value,
+                common_stock_value=(
+                    fair_value / request.common_shares_outstanding
+                    if request.common_shares_outstanding else None
+                ),
+                dlom_discount=dlom,
+                assumptions={
+                    'discount_rate': dynamic_rate or p['discount_rate'],
+                    'dlom': dlom,
+                    'scenarios_count': count,
+                },
+                confidence=0.75,
+                explanation=f"PWERM analysis with {count} scenarios, {dlom*100:.0f}% DLOM discount applied",
+            )
+        return results
+
+    async def calculate_valuation_batch(
+        self, requests: List[ValuationRequest], concurrency: int = 8,
+    ) -> List[ValuationResult]:
+        """
+        calculate_valuation for many companies, in request order.
+
+        Requests that resolve to PWERM (explicitly or via AUTO) share one
+        calculate_pwerm_batch pass; the rest run individually, ``concurrency``
+        at a time.
+        """
+        results: List[Optional[ValuationResult]] = [None] * len(requests)
+        pwerm: List[int] = []
+        for i, request in enumerate(requests):
+            method = self._select_method(request) if request.method == ValuationMethod.AUTO else request.method
+            if method == ValuationMethod.PWERM:
+                pwerm.append(i)
+
+        if pwerm:
+            try:
+                values = await self.calculate_pwerm_batch([requests[i] for i in pwerm])
+            except Exception as e:
+                logger.error(f"Batch PWERM failed for {len(pwerm)} companies: {e}")
+                values = [self._sanitize_valuation_result(ValuationResult(
+                    method_used="error",
+                    fair_value=0,
+                    explanation=f"Valuation failed: {str(e)}",
+                    confidence=0,
+                ))] * len(pwerm)
+            for i, value in zip(pwerm, values):
+                results[i] = value
+
+        gate = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(i: int) -> None:
+            async with gate:
+                results[i] = await self.calculate_valuation(requests[i])
+
+        await asyncio.gather(*(one(i) for i, r in enumerate(results) if r is None))
+        return results
+
     async def _calculate_dcf(self, request: ValuationRequest) -> ValuationResult:
         """
         Discounted Cash Flow Method
@@ -1131,23 +1229,12 @@ class ValuationEngineService:
         # Convert ValuationRequest to company_data format
         company_data = self._convert_request_to_company_data(request)
         
-        # Calculate valuation using comprehensive PWERM
-        pwerm_result = self.comprehensive_pwerm.calculate_valuation(
-            company_data=company_data,
-            discount_rate=0.25,  # Standard VC discount rate
-            dlom=0.30  # Standard DLOM for private companies
-        )
-        
-        # Convert comprehensive scenarios to PWERM scenarios
-        # Get all scenarios from the comprehensive PWERM - we need to call the internal method
-        # to get the full distribution, not just the grouped/top scenarios
-        
-        # Parse funding path and get all relevant scenarios
-        funding_path = pwerm_result.get('funding_path', 'Pre-seed only')
+        # Parse funding path and get all relevant scenarios (fresh copies of
+        # the shared matrix, so adjusting them below is safe)
+        funding_path = self.comprehensive_pwerm._parse_funding_path(company_data)
         all_relevant_scenarios = self.comprehensive_pwerm._filter_scenarios_by_path(funding_path)
         
         # Adjust probabilities based on company data
-        company_data = self._convert_request_to_company_data(request)
         adjusted_scenarios = self.comprehensive_pwerm._adjust_probabilities(all_relevant_scenarios, company_data)
         
         # Calculate present values for all scenarios
@@ -1719,6 +1806,32 @@ class ValuationEngineService:
         
         return distributions
     
+    def _scenario_waterfall(self, scenario: PWERMScenario, amount: float):
+        """Compile a scenario's simplified exit cap table (us / other preferred / common).
+
+        IPO: everyone converts — pure ownership split.
+        M&A: we hold a 1x non-participating preference on our check; the rest
+        of final_liq_pref sits senior to us and converts at the scenario's
+        conversion point.
+        """
+        from app.services.waterfall_engine import WaterfallClaim, compile_waterfall
+
+        own = min(max(scenario.final_ownership, 0.0), 1.0)
+        if scenario.exit_type and "IPO" in scenario.exit_type:
+            return compile_waterfall([
+                WaterfallClaim("us", shares=own),
+                WaterfallClaim("others", shares=1.0 - own),
+            ])
+
+        other_pref = max(scenario.final_liq_pref - amount, 0.0)
+        conversion_point = scenario.breakpoints.get('conversion_point', scenario.final_liq_pref * 1.5)
+        other_shares = min(other_pref / conversion_point, 1.0 - own) if conversion_point > 0 else 0.0
+        return compile_waterfall([
+            WaterfallClaim("us", shares=own, preference=amount, seniority=0),
+            WaterfallClaim("other_preferred", shares=other_shares, preference=other_pref, seniority=1),
+            WaterfallClaim("common", shares=max(1.0 - own - other_shares, 0.0)),
+        ])
+
     def generate_return_curves(self, scenarios: List[PWERMScenario], our_investment: Dict[str, float]) -> None:
         """
         Generate return curves for each scenario across a range of exit values.
@@ -1728,36 +1841,20 @@ class ValuationEngineService:
         
         # Exit value range from $10M to $10B (log scale)
         exit_values = np.logspace(7, 10, 100)  # 100 points from 10M to 10B
+        amount = our_investment.get('amount', 0) or 0
         
         for scenario in scenarios:
-            returns = []
-            
-            for exit_value in exit_values:
-                if scenario.exit_type and "IPO" in scenario.exit_type:
-                    # IPO: Simple ownership-based return (all convert to common)
-                    our_proceeds = exit_value * scenario.final_ownership
-                else:
-                    # M&A: Need to calculate waterfall
-                    # Simplified waterfall calculation
-                    if exit_value <= scenario.final_liq_pref:
-                        # Below liquidation preference - we might get nothing
-                        our_proceeds = 0  # Simplified - would need full waterfall
-                    elif exit_value <= scenario.breakpoints.get('conversion_point', scenario.final_liq_pref * 1.5):
-                        # Between liq pref and conversion - liquidation preference applies
-                        remaining = exit_value - scenario.final_liq_pref
-                        our_proceeds = remaining * scenario.final_ownership
-                    else:
-                        # Above conversion - everyone converts to common
-                        our_proceeds = exit_value * scenario.final_ownership
-                
-                # Calculate return multiple
-                return_multiple = our_proceeds / our_investment['amount'] if our_investment['amount'] > 0 else 0
-                returns.append(return_multiple)
+            # One vectorized evaluation of the compiled waterfall per scenario
+            waterfall = self._scenario_waterfall(scenario, amount)
+            our_proceeds = waterfall.evaluate(exit_values)[waterfall.index["us"]]
+            returns = (our_proceeds / amount).tolist() if amount > 0 else [0.0] * len(exit_values)
+            breakeven = waterfall.exit_for_payout("us", amount) if amount > 0 else 0.0
             
             # Store return curve
             scenario.return_curve = {
                 'exit_values': exit_values.tolist(),
                 'return_multiples': returns,
+                'breakeven_exit': breakeven if np.isfinite(breakeven) else None,
                 'color': self._get_scenario_color(scenario),
                 'opacity': min(scenario.probability * 3, 0.9)  # Higher probability = more opaque
             }
@@ -2252,9 +2349,10 @@ class ValuationEngineService:
         """Generate scenario-branching cap tables with full waterfall integration.
 
         For each company, models 4 future scenarios for the next round,
-        then runs AdvancedCapTable.calculate_liquidation_waterfall() at
-        various exit values to show exactly what we get paid — including
-        liquidation preferences, participation rights, and seniority.
+        then compiles each scenario's waterfall (waterfall_engine) and
+        evaluates it at various exit values to show exactly what we get
+        paid — including liquidation preferences, participation rights,
+        and seniority.
 
         Args:
             company_data: Company dict with funding_rounds, stage, valuation, etc.
@@ -2265,12 +2363,10 @@ class ValuationEngineService:
             Dict with scenario branches, each containing waterfall at key exit values,
             return curves, breakpoints, and Sankey data.
         """
-        from app.services.advanced_cap_table import CapTableCalculator
         from app.services.pre_post_cap_table import PrePostCapTable
         from app.services.data_validator import ensure_numeric
 
         cap_table_service = PrePostCapTable()
-        waterfall_calc = CapTableCalculator()
 
         # --- Extract company info ---
         stage = str(company_data.get("stage", "Series A"))
@@ -2473,45 +2569,42 @@ class ValuationEngineService:
                 prefs_senior_to_us = new_round_pref
                 prefs_junior_to_us = total_pref_stack - new_round_pref - our_preference_amount
 
-            # Run waterfall at each exit value
+            # Compile the scenario's cap table once, then evaluate every exit
+            # value in one vectorized call (waterfall_engine)
+            waterfall = self._compile_scenario_waterfall(
+                waterfall_rounds=waterfall_rounds,
+                current_cap=current_cap,
+                total_dilution=total_dilution,
+                new_round_dilution=dilution,
+                our_amount=our_amount,
+                our_round=our_round,
+                our_seniority=our_seniority,
+                our_ownership_post=our_ownership_post,
+            )
+            breakdown = waterfall.breakdown(exit_values)
+            us = waterfall.index["us"]
+            totals = breakdown["total"]
+            pref_paid_at = breakdown["preference"].sum(axis=0)
+            distributed_at = totals.sum(axis=0)
+
             waterfall_at_exits = []
             return_curve_exits = []
             return_curve_moics = []
             return_curve_proceeds = []
 
-            for ev in exit_values:
-                try:
-                    wf = waterfall_calc.calculate_liquidation_waterfall(
-                        exit_value=ev,
-                        cap_table=current_cap,
-                        funding_rounds=waterfall_rounds,
-                    )
-                except Exception as e:
-                    logger.warning(f"Waterfall calc failed for exit={ev}: {e}")
-                    wf = {"distributions": [], "summary": {}}
-
-                pref_paid = sum(
-                    d.get("amount", 0) for d in wf.get("distributions", [])
-                    if d.get("type") == "liquidation_preference"
-                )
-                common_dist = sum(
-                    d.get("amount", 0) for d in wf.get("distributions", [])
-                    if d.get("type") == "common_distribution"
-                )
-
-                # Calculate our proceeds with full waterfall logic
-                our_proceeds = 0.0
-                our_proceeds_source = "none"  # Track where our money comes from
-                if our_ownership_post > 0:
-                    if ev > total_pref_stack:
-                        # Preferences fully satisfied — we participate in common
-                        our_proceeds = (ev - total_pref_stack) * our_ownership_post
-                        our_proceeds_source = "common_participation"
-                    elif our_amount > 0 and ev <= total_pref_stack:
-                        # Preference waterfall — we get our pro-rata of preferences
-                        our_pref_share = our_amount / total_pref_stack if total_pref_stack > 0 else 0
-                        our_proceeds = ev * our_pref_share
-                        our_proceeds_source = "preference_pro_rata"
+            for j, ev in enumerate(exit_values):
+                pref_paid = float(pref_paid_at[j])
+                total_distributed = float(distributed_at[j])
+                common_dist = total_distributed - pref_paid
+
+                # Our proceeds straight off the compiled waterfall
+                our_proceeds = float(totals[us, j])
+                if breakdown["participation"][us, j] > 0:
+                    our_proceeds_source = "common_participation"
+                elif breakdown["preference"][us, j] > 0:
+                    our_proceeds_source = "preference_pro_rata"
+                else:
+                    our_proceeds_source = "none"  # Track where our money comes from
 
                 our_moic = our_proceeds / our_amount if our_amount > 0 else 0
                 our_profit = our_proceeds - our_amount
@@ -2539,21 +2632,21 @@ class ValuationEngineService:
                     "pref_consumed": round(pref_paid, 0),
                     "pref_pct_of_exit": round(pref_pct_of_exit, 1),
                     "common_gets": round(common_dist, 0),
-                    "total_distributed": round(wf.get("total_distributed", 0), 0),
+                    "total_distributed": round(total_distributed, 0),
                 })
 
                 return_curve_exits.append(ev)
                 return_curve_moics.append(round(our_moic, 3))
                 return_curve_proceeds.append(round(our_proceeds, 0))
 
-            # Calculate breakpoints
+            # Calculate breakpoints — exact exits, 0 if never reached
             breakeven_exit = 0
             three_x_exit = 0
-            for w in waterfall_at_exits:
-                if w["our_moic"] >= 1.0 and breakeven_exit == 0:
-                    breakeven_exit = w["exit_value"]
-                if w["our_moic"] >= 3.0 and three_x_exit == 0:
-                    three_x_exit = w["exit_value"]
+            if our_amount > 0:
+                be = waterfall.exit_for_payout("us", our_amount)
+                tx = waterfall.exit_for_payout("us", our_amount * 3)
+                breakeven_exit = round(be, 0) if be != float("inf") else 0
+                three_x_exit = round(tx, 0) if tx != float("inf") else 0
 
             scenario_results.append({
                 "name": sc["name"],
@@ -2585,6 +2678,12 @@ class ValuationEngineService:
                     "total_rounds_in_stack": len(waterfall_rounds),
                 },
                 "waterfall_at_exits": waterfall_at_exits,
+                # Exact piecewise-linear proceeds curve (knots + slope past the last)
+                "proceeds_curve": {
+                    "exit_values": waterfall.knots.tolist(),
+                    "our_proceeds": waterfall.payouts[us].tolist(),
+                    "tail_slope": float(waterfall.slopes[us, -1]),
+                },
                 "return_curve": {
                     "exit_values": return_curve_exits,
                     "our_moic": return_curve_moics,
@@ -2609,6 +2708,74 @@ class ValuationEngineService:
             "scenarios": scenario_results,
         }
 
+    @staticmethod
+    def _compile_scenario_waterfall(
+        waterfall_rounds: List[Dict[str, Any]],
+        current_cap: Dict[str, float],
+        total_dilution: float,
+        new_round_dilution: float,
+        our_amount: float,
+        our_round: str,
+        our_seniority: int,
+        our_ownership_post: float,
+    ):
+        """Compile one scenario's post-round cap table into a waterfall.
+
+        Shares are ownership fractions: our post-scenario stake, the new
+        round's dilution, existing investors' stake (current_cap) split
+        pro-rata by round amount, and common (founders/pool) as the rest.
+        Seniorities are doubled so an unmatched "us" can sit strictly
+        between the existing rounds and the new one.
+        """
+        from app.services.waterfall_engine import WaterfallClaim, compile_waterfall
+
+        existing_investor_pct = sum(
+            v for k, v in current_cap.items()
+            if not any(t in k.lower() for t in ("founder", "option", "esop", "employee", "common"))
+        ) / 100 * (1 - total_dilution)
+        existing_investor_pct = max(existing_investor_pct - our_ownership_post, 0.0)
+
+        existing = waterfall_rounds[:-1]
+        new_round = waterfall_rounds[-1]
+        our_round_lower = (our_round or "").lower()
+
+        def _own_pref(wr: Dict[str, Any]) -> float:
+            amount = float(wr.get("amount") or 0)
+            if our_seniority and wr.get("seniority") == our_seniority and our_round_lower in str(wr.get("round", "")).lower():
+                amount = max(amount - our_amount, 0.0)
+            return amount
+
+        existing_amounts = [_own_pref(wr) for wr in existing]
+        total_existing = sum(existing_amounts)
+
+        claims = []
+        for i, (wr, amount) in enumerate(zip(existing, existing_amounts)):
+            shares = existing_investor_pct * amount / total_existing if total_existing > 0 else 0.0
+            claims.append(WaterfallClaim(
+                name=f"round_{i}",
+                shares=shares,
+                preference=amount * float(wr.get("liquidation_multiple", 1.0)),
+                seniority=2 * int(wr.get("seniority", 0)),
+                participating=bool(wr.get("participating")),
+            ))
+        claims.append(WaterfallClaim(
+            name="new_round",
+            shares=new_round_dilution,
+            preference=float(new_round.get("amount") or 0) * float(new_round.get("liquidation_multiple", 1.0)),
+            seniority=2 * int(new_round.get("seniority", len(waterfall_rounds))),
+            participating=bool(new_round.get("participating")),
+        ))
+        # 1x non-participating on our check; unmatched = just junior to the new round
+        claims.append(WaterfallClaim(
+            name="us",
+            shares=our_ownership_post,
+            preference=our_amount,
+            seniority=2 * our_seniority if our_seniority else 2 * int(new_round.get("seniority", 0)) - 1,
+        ))
+        allocated = sum(c.shares for c in claims)
+        claims.append(WaterfallClaim(name="common", shares=max(1.0 - allocated, 0.0)))
+        return compile_waterfall(claims)
+
     # ------------------------------------------------------------------
     # Phase 4: Multi-Round Ownership Trees with Preference Deep Dive
     # ------------------------------------------------------------------
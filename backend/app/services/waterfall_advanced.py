@@ -217,16 +217,22 @@ class AdvancedWaterfallCalculator:
     - No pay-to-play provisions
     """
     
-    def __init__(self, investors: List[LiquidationTerms]):
+    def __init__(
+        self,
+        investors: List[LiquidationTerms],
+        common_shares_outstanding: Decimal = Decimal('10000000'),
+    ):
         """
         Initialize with investor terms
         
         Args:
             investors: List of investor liquidation terms (ordered by seniority)
+            common_shares_outstanding: Common shares sharing residual proceeds
         """
         self.investors = sorted(investors, 
                                key=lambda x: self._stage_seniority(x.stage), 
                                reverse=True)  # Most senior first
+        self.common_shares_outstanding = common_shares_outstanding
         
     def _stage_seniority(self, stage: InvestorStage) -> int:
         """Return seniority level (higher = more senior)"""
@@ -261,6 +267,7 @@ class AdvancedWaterfallCalculator:
             Distribution analysis with breakpoints
         """
         
+        self.common_shares_outstanding = common_shares_outstanding
         if exit_type == ExitType.IPO:
             return self._calculate_ipo_distribution(exit_value, common_shares_outstanding)
         elif exit_type in [ExitType.STRATEGIC_MA, ExitType.PE_BUYOUT, ExitType.ROLL_UP]:
@@ -477,60 +484,51 @@ class AdvancedWaterfallCalculator:
             'note': 'Investors pushed for >1X or participating terms'
         }
     
+    def _preference_amount(self, investor: LiquidationTerms) -> Decimal:
+        """Liquidation preference including cumulative dividends."""
+        liq_pref = investor.investment_amount * investor.liquidation_multiple
+        if investor.cumulative_dividend_rate:
+            # Assume 3 years for simplicity
+            liq_pref += investor.investment_amount * investor.cumulative_dividend_rate * Decimal('3')
+        return liq_pref
+
+    def compile(self):
+        """Compile current terms into exact payout curves (waterfall_engine).
+
+        No pari passu — each stage is its own seniority tier. Non-participating
+        preferred converts to common when that pays more; capped participating
+        stops at its cap and converts above it.
+        """
+        from app.services.waterfall_engine import WaterfallClaim, compile_waterfall
+
+        claims = [
+            WaterfallClaim(
+                name=inv.investor_name,
+                shares=float(inv.shares_owned),
+                preference=float(self._preference_amount(inv)),
+                seniority=self._stage_seniority(inv.stage),
+                participating=inv.participating,
+                participation_cap=(
+                    float(inv.investment_amount * inv.participation_cap)
+                    if inv.participating and inv.participation_cap else None
+                ),
+            )
+            for inv in self.investors
+        ]
+        claims.append(WaterfallClaim(
+            name='Common Shareholders',
+            shares=float(self.common_shares_outstanding),
+        ))
+        return compile_waterfall(claims)
+
     def _distribute_proceeds(self, proceeds: Decimal) -> Dict[str, float]:
         """
         Distribute proceeds through standard waterfall
         No pari passu - strict seniority by round
         """
-        remaining = proceeds
-        distributions = {}
-        
-        # Step 1: Pay liquidation preferences (no pari passu - by seniority)
-        for investor in self.investors:
-            liq_pref = investor.investment_amount * investor.liquidation_multiple
-            
-            # Apply cumulative dividends if any
-            if investor.cumulative_dividend_rate:
-                # Assume 3 years for simplicity
-                dividend = investor.investment_amount * investor.cumulative_dividend_rate * Decimal('3')
-                liq_pref += dividend
-            
-            if remaining >= liq_pref:
-                distributions[investor.investor_name] = float(liq_pref)
-                remaining -= liq_pref
-            else:
-                distributions[investor.investor_name] = float(remaining)
-                remaining = Decimal('0')
-                break
-        
-        # Step 2: Participation (if any) and common distribution
-        if remaining > Decimal('0'):
-            # Calculate participating shares
-            participating_investors = [inv for inv in self.investors if inv.participating]
-            
-            # Total shares for distribution
-            total_shares = sum(inv.shares_owned for inv in self.investors)
-            
-            for investor in self.investors:
-                if investor.participating:
-                    # Participating preferred gets pro-rata share
-                    share_pct = investor.shares_owned / total_shares if total_shares > 0 else Decimal('0')
-                    participation = remaining * share_pct
-                    
-                    # Apply participation cap if exists
-                    if investor.participation_cap:
-                        max_total = investor.investment_amount * investor.participation_cap
-                        current_total = Decimal(str(distributions.get(investor.investor_name, 0)))
-                        participation = min(participation, max_total - current_total)
-                    
-                    distributions[investor.investor_name] = distributions.get(investor.investor_name, 0) + float(participation)
-            
-            # Remaining to common
-            total_distributed = sum(distributions.values())
-            common_proceeds = float(proceeds) - total_distributed
-            if common_proceeds > 0:
-                distributions['Common Shareholders'] = common_proceeds
-        
+        distributions = self.compile().payouts_at(float(proceeds))
+        if distributions.get('Common Shareholders', 0) <= 0:
+            distributions.pop('Common Shareholders', None)
         return distributions
     
     def _calculate_standard_waterfall(self, exit_value: Decimal) -> Dict[str, Any]:
@@ -596,32 +594,24 @@ class AdvancedWaterfallCalculator:
     
     def _identify_breakpoints(self) -> List[Dict[str, Any]]:
         """Identify key value breakpoints in waterfall"""
+        waterfall = self.compile()
         breakpoints = []
         
-        # Calculate total liquidation preferences
-        total_liq_prefs = sum(
-            inv.investment_amount * inv.liquidation_multiple 
-            for inv in self.investors
-        )
-        
-        # Breakpoint 1: All liquidation preferences covered
-        breakpoints.append({
-            'value': float(total_liq_prefs),
-            'description': 'All liquidation preferences satisfied',
-            'impact': 'Common shareholders begin receiving proceeds'
-        })
-        
-        # Breakpoint 2: Participation caps reached (if any)
-        for investor in self.investors:
-            if investor.participating and investor.participation_cap:
-                cap_value = investor.investment_amount * investor.participation_cap
-                breakpoints.append({
-                    'value': float(total_liq_prefs + cap_value),
-                    'description': f'{investor.investor_name} participation cap reached',
-                    'impact': f'No further participation for {investor.investor_name}'
-                })
-        
-        # Breakpoint 3: IPO ratchet trigger points
+        # Exact breakpoints: preference tiers covered, caps binding, conversions
+        impacts = {
+            'preferences covered': 'Next junior class begins receiving proceeds',
+            'participation cap reached': 'No further participation',
+            'converts to common': 'Converting beats taking the preference',
+        }
+        for bp in waterfall.breakpoints:
+            holders = ', '.join(bp['holders'])
+            breakpoints.append({
+                'value': bp['exit_value'],
+                'description': f"{holders} {bp['event']}",
+                'impact': impacts.get(bp['event'], ''),
+            })
+        
+        # IPO ratchet trigger points
         for investor in self.investors:
             if investor.has_ipo_ratchet:
                 min_return = investor.investment_amount * (Decimal('1') + investor.ipo_ratchet_return)
@@ -631,13 +621,14 @@ class AdvancedWaterfallCalculator:
                     'impact': f'Below this, {investor.investor_name} gets {float(investor.ipo_ratchet_return)*100:.0f}% guaranteed'
                 })
         
-        # Breakpoint 4: Common gets meaningful value (>$10M)
-        common_threshold = total_liq_prefs + Decimal('10000000')
-        breakpoints.append({
-            'value': float(common_threshold),
-            'description': 'Common shareholders receive >$10M',
-            'impact': 'Meaningful returns for founders and employees'
-        })
+        # Common gets meaningful value (>$10M)
+        common_threshold = waterfall.exit_for_payout('Common Shareholders', 10_000_000)
+        if common_threshold != float('inf'):
+            breakpoints.append({
+                'value': common_threshold,
+                'description': 'Common shareholders receive >$10M',
+                'impact': 'Meaningful returns for founders and employees'
+            })
         
         # Sort by value
         breakpoints.sort(key=lambda x: x['value'])
@@ -0,0 +1,311 @@
+"""
+Compiled liquidation waterfall.
+
+A cap table's payout to every holder is a continuous, piecewise-linear,
+non-decreasing function of the exit value. This module compiles a set of
+claims into the exact breakpoints of those functions once, then evaluates
+payouts, marginal dollars and breakeven exits for any number of exit
+values with a handful of NumPy ops — no per-exit re-walk of the stack.
+
+    from app.services.waterfall_engine import WaterfallClaim, compile_waterfall
+
+    wf = compile_waterfall([
+        WaterfallClaim("Series B", shares=3e6, preference=30e6, seniority=2),
+        WaterfallClaim("Series A", shares=2e6, preference=10e6, seniority=1,
+                       participating=True, participation_cap=30e6),
+        WaterfallClaim("Common", shares=5e6),
+    ])
+    payouts = wf.evaluate(np.linspace(0, 500e6, 5000))   # (holders, exits)
+    wf.exit_for_payout("Series A", 10e6)                  # breakeven exit
+
+Model:
+  1. Below the total preference stack, preferences are paid by seniority
+     (higher first); holders sharing a seniority split pro-rata to claim.
+  2. Above it, every share gets the same common price p and each holder
+     takes the better of its options at that price:
+       common / no preference      s·p
+       participating (uncapped)    pref + s·p
+       participating (capped C)    max(min(pref + s·p, C), s·p)
+       non-participating           max(pref, s·p)
+     Total proceeds f(p) is piecewise linear in p with kinks where caps
+     bind or a holder converts; inverting it gives the exit-value knots.
+
+Debt is a claim with no shares at the highest seniority.
+"""
+
+import functools
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+_EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class WaterfallClaim:
+    """One holder's economic position in the capital structure."""
+    name: str
+    shares: float = 0.0                       # as-converted shares (or ownership fraction)
+    preference: float = 0.0                   # total preference claim in $
+    seniority: int = 0                        # higher = paid first; equal = pari passu
+    participating: bool = False
+    participation_cap: Optional[float] = None  # total $ cap (preference + participation)
+
+
+class CompiledWaterfall:
+    """Exact piecewise-linear payout functions for a fixed set of claims.
+
+    knots:        (K,) exit values where any payout changes slope
+    payouts:      (H, K) payout of each holder at each knot
+    slopes:       (H, K) payout slope right of each knot (last = tail slope)
+    price_knots:  (K,) common price per share at each knot
+    """
+
+    def __init__(
+        self,
+        claims: Tuple[WaterfallClaim, ...],
+        knots: np.ndarray,
+        payouts: np.ndarray,
+        price_knots: np.ndarray,
+        tail_slopes: np.ndarray,
+        tail_price_slope: float,
+        breakpoints: List[Dict[str, Any]],
+    ):
+        self.claims = claims
+        self.names: List[str] = [c.name for c in claims]
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.knots = knots
+        self.payouts = payouts
+        self.price_knots = price_knots
+        self.breakpoints = breakpoints
+
+        widths = np.diff(knots)
+        self.slopes = np.empty_like(payouts)
+        if widths.size:
+            self.slopes[:, :-1] = np.diff(payouts, axis=1) / widths
+        self.slopes[:, -1] = tail_slopes
+
+        self.price_slopes = np.empty_like(price_knots)
+        if widths.size:
+            self.price_slopes[:-1] = np.diff(price_knots) / widths
+        self.price_slopes[-1] = tail_price_slope
+
+        self._pref = np.array([c.preference for c in claims], dtype=float)
+        # Price above which a holder has given up its preference for common
+        self._convert_at = np.array([_conversion_price(c) for c in claims], dtype=float)
+
+    # -- evaluation --------------------------------------------------------
+
+    def _locate(self, exit_values: ArrayLike) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        x = np.maximum(np.atleast_1d(np.asarray(exit_values, dtype=float)), 0.0)
+        seg = np.clip(np.searchsorted(self.knots, x, side="right") - 1, 0, len(self.knots) - 1)
+        return x, seg, x - self.knots[seg]
+
+    def evaluate(self, exit_values: ArrayLike) -> np.ndarray:
+        """Payouts, shape (holders, exits)."""
+        _, seg, dx = self._locate(exit_values)
+        return self.payouts[:, seg] + self.slopes[:, seg] * dx
+
+    def payouts_at(self, exit_value: float) -> Dict[str, float]:
+        col = self.evaluate(exit_value)[:, 0]
+        return {name: float(v) for name, v in zip(self.names, col)}
+
+    def marginal(self, exit_values: ArrayLike, delta: Optional[float] = None) -> np.ndarray:
+        """Marginal payout per holder, shape (holders, exits).
+
+        delta=None gives the exact slope ($ per $1 of exit value, right
+        derivative); a delta gives the payout gained from exit → exit + delta.
+        """
+        if delta is None:
+            _, seg, _ = self._locate(exit_values)
+            return self.slopes[:, seg]
+        x = np.atleast_1d(np.asarray(exit_values, dtype=float))
+        return self.evaluate(x + delta) - self.evaluate(x)
+
+    def price_per_share(self, exit_values: ArrayLike) -> np.ndarray:
+        _, seg, dx = self._locate(exit_values)
+        return self.price_knots[seg] + self.price_slopes[seg] * dx
+
+    def breakdown(self, exit_values: ArrayLike) -> Dict[str, np.ndarray]:
+        """Split payouts into preference vs. as-converted / participation."""
+        total = self.evaluate(exit_values)
+        price = self.price_per_share(exit_values)
+        converted = price[None, :] > self._convert_at[:, None] + _EPS
+        preference = np.where(converted, 0.0, np.minimum(total, self._pref[:, None]))
+        return {
+            "total": total,
+            "preference": preference,
+            "participation": total - preference,
+            "converted": converted,
+            "price_per_share": price,
+        }
+
+    # -- inversion ---------------------------------------------------------
+
+    def exit_for_payout(self, name: str, target: float) -> float:
+        """Smallest exit value at which ``name`` receives at least ``target``.
+
+        Returns inf if the holder's payout never reaches it.
+        """
+        h = self.index[name]
+        y = self.payouts[h]
+        if target <= 0:
+            return 0.0
+        # Relative: knot payouts carry float noise of a few ulps of the target
+        hit = np.nonzero(y >= target - _EPS * max(1.0, target))[0]
+        if hit.size:
+            k = int(hit[0])
+            if k == 0:
+                return float(self.knots[0])
+            slope = self.slopes[h, k - 1]
+            return float(self.knots[k - 1] + (target - y[k - 1]) / slope) if slope > 0 else float(self.knots[k])
+        tail = self.slopes[h, -1]
+        if tail <= 0:
+            return float("inf")
+        return float(self.knots[-1] + (target - y[-1]) / tail)
+
+    def exits_for_multiples(self, invested: Dict[str, float], multiples: Sequence[float] = (1.0,)) -> Dict[str, List[float]]:
+        """Exit values at which each holder reaches each return multiple."""
+        return {
+            name: [self.exit_for_payout(name, amount * m) for m in multiples]
+            for name, amount in invested.items()
+            if name in self.index and amount > 0
+        }
+
+    @property
+    def total_preference(self) -> float:
+        return float(self._pref.sum())
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+def _cap(claim: WaterfallClaim) -> Optional[float]:
+    if not claim.participating or claim.participation_cap is None:
+        return None
+    return max(float(claim.participation_cap), claim.preference)
+
+
+def _conversion_price(claim: WaterfallClaim) -> float:
+    """Common price at which the holder is better off as common."""
+    if claim.shares <= 0 or claim.preference <= 0:
+        return 0.0 if claim.preference <= 0 else np.inf
+    if claim.participating:
+        cap = _cap(claim)
+        return np.inf if cap is None else cap / claim.shares
+    return claim.preference / claim.shares
+
+
+def _payouts_at_price(claims: Sequence[WaterfallClaim], p: float) -> np.ndarray:
+    out = np.empty(len(claims))
+    for i, c in enumerate(claims):
+        as_common = c.shares * p
+        if c.preference <= 0:
+            out[i] = as_common
+        elif c.participating:
+            cap = _cap(c)
+            with_pref = c.preference + as_common
+            out[i] = with_pref if cap is None else max(min(with_pref, cap), as_common)
+        else:
+            out[i] = max(c.preference, as_common)
+    return out
+
+
+def _kink_events(c: WaterfallClaim, p: float) -> List[str]:
+    """Events for holder ``c`` at common price ``p`` (cap binds / converts)."""
+    if c.shares <= 0 or c.preference <= 0:
+        return []
+    tol = _EPS * max(1.0, p)
+    cap = _cap(c)
+    events = []
+    if c.participating and cap is not None and abs(p - (cap - c.preference) / c.shares) <= tol:
+        events.append("participation cap reached")
+    if abs(p - _conversion_price(c)) <= tol:
+        events.append("converts to common")
+    return events
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(claims: Tuple[WaterfallClaim, ...]) -> CompiledWaterfall:
+    n = len(claims)
+    knots: List[float] = [0.0]
+    rows: List[np.ndarray] = [np.zeros(n)]
+    prices: List[float] = [0.0]
+    breakpoints: List[Dict[str, Any]] = []
+
+    # Phase 1 — preference stack, senior tiers first
+    prefs = np.array([max(c.preference, 0.0) for c in claims])
+    paid = np.zeros(n)
+    cumulative = 0.0
+    for tier in sorted({c.seniority for c in claims}, reverse=True):
+        members = [i for i, c in enumerate(claims) if c.seniority == tier and prefs[i] > 0]
+        if not members:
+            continue
+        paid[members] = prefs[members]
+        cumulative += float(prefs[members].sum())
+        knots.append(cumulative)
+        rows.append(paid.copy())
+        prices.append(0.0)
+        breakpoints.append({
+            "exit_value": cumulative,
+            "event": "preferences covered",
+            "holders": [claims[i].name for i in members],
+        })
+
+    # Phase 2 — common price sweeps upward through every kink
+    kinks = set()
+    for c in claims:
+        if c.shares <= 0 or c.preference <= 0:
+            continue
+        if c.participating:
+            cap = _cap(c)
+            if cap is not None:
+                kinks.add((cap - c.preference) / c.shares)
+                kinks.add(cap / c.shares)
+        else:
+            kinks.add(c.preference / c.shares)
+
+    for p in sorted(k for k in kinks if k > 0):
+        row = _payouts_at_price(claims, p)
+        w = float(row.sum())
+        if w <= knots[-1] + _EPS:
+            # Flat segment of f(p): same exit value, identical payouts
+            continue
+        knots.append(w)
+        rows.append(row)
+        prices.append(p)
+        for c in claims:
+            for event in _kink_events(c, p):
+                breakpoints.append({"exit_value": w, "event": event, "holders": [c.name]})
+
+    # Past the last kink every holder is linear in p with slope = its shares
+    shares = np.array([max(c.shares, 0.0) for c in claims])
+    total_shares = float(shares.sum())
+    if total_shares > 0:
+        tail = shares / total_shares
+        tail_price = 1.0 / total_shares
+    else:
+        tail = np.zeros(n)
+        tail_price = 0.0
+
+    return CompiledWaterfall(
+        claims=claims,
+        knots=np.array(knots),
+        payouts=np.vstack(rows).T,
+        price_knots=np.array(prices),
+        tail_slopes=tail,
+        tail_price_slope=tail_price,
+        breakpoints=breakpoints,
+    )
+
+
+def compile_waterfall(claims: Sequence[WaterfallClaim]) -> CompiledWaterfall:
+    """Compile claims into exact payout curves (cached per claim set)."""
+    return _compile(tuple(claims))
@@ -573,48 +573,35 @@ class WorldModelBuilder:
             "relationships": relationships
         }
     
-    async def execute_model(self, model_id: str) -> Dict[str, Any]:
+    async def execute_model(
+        self,
+        model_id: str,
+        scenarios: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Execute a world model - calculate all factors based on formulas and dependencies
+
+        Factors run through the compiled DAG in world_model_engine: formulas
+        are evaluated in topological order and cyclic ones come back as
+        #CIRC!. ``scenarios`` is an optional list of {factor id or name: value}
+        overrides, evaluated together as vectors; their per-scenario values
+        for every affected factor are returned under "scenarios".
         """
+        from app.services.world_model_engine import world_model_engine
+
         model_data = await self.get_model(model_id)
-        factors = model_data.get("factors", [])
-        
-        # Build dependency graph
-        factor_map = {f["id"]: f for f in factors}
-        calculated = {}
-        
-        def calculate_factor(factor_id: str) -> Any:
-            if factor_id in calculated:
-                return calculated[factor_id]
-            
-            factor = factor_map[factor_id]
-            
-            # If has formula, evaluate it
-            if factor.get("formula"):
-                # TODO: Implement formula evaluator
-                # For now, return current value
-                calculated[factor_id] = factor.get("current_value")
-                return calculated[factor_id]
-            
-            # If has dependencies, calculate them first
-            if factor.get("dependencies"):
-                dep_values = [calculate_factor(dep_id) for dep_id in factor["dependencies"]]
-                # TODO: Use formula with dependency values
-                calculated[factor_id] = factor.get("current_value")
-                return calculated[factor_id]
-            
-            # Otherwise return current value
-            calculated[factor_id] = factor.get("current_value")
-            return calculated[factor_id]
-        
-        # Calculate all factors
-        results = {}
-        for factor in factors:
-            results[factor["id"]] = calculate_factor(factor["id"])
-        
-        return {
+        compiled = world_model_engine.compile(model_id, model_data)
+
+        result = {
             "model_id": model_id,
-            "results": results,
+            "results": compiled.results(),
+            "errors": compiled.errors(),
+            "cycles": compiled.cycle_ids,
+            "version": compiled.version,
             "calculated_at": datetime.now().isoformat()
         }
+        if scenarios:
+            from app.core.tool_executor import tool_executors
+
+            result["scenarios"] = await tool_executors.run("cpu", compiled.run_scenarios, scenarios)
+        return result
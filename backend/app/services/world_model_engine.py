@@ -0,0 +1,631 @@
+"""
+Compiled execution engine for world models.
+
+WorldModelBuilder.execute_model used to walk factor dependencies recursively
+and return each factor's stored current_value; formulas were never run. This
+module compiles a model's factors into a DAG once per model version and runs it:
+
+    from app.services.world_model_engine import world_model_engine
+
+    compiled = world_model_engine.compile(model_id, model_data)  # get_model() payload
+    compiled.results()                             # {factor_id: value}
+    compiled.update({"growth_rate": 0.8})          # recomputes dependents only
+    compiled.run_scenarios([{"growth_rate": g} for g in grid])
+
+- Formulas use formula_evaluator's spreadsheet syntax and are compiled once
+  (compile_formula caches per text). They reference other factors by name,
+  e.g. ``revenue * multiple``. A name resolves to a factor on the same entity
+  first, then to a model-wide unique name. Names shaped like cell addresses
+  (FY2024, Q1, ARR2025) resolve to the factor of that name. ``Acme_Corp.revenue`` qualifies a
+  name by entity. Ids in a factor's ``dependencies`` add ordering edges
+  without being read.
+- Factors are ordered with Kahn's algorithm. Formula factors on or downstream
+  of a cycle evaluate to #CIRC!. Factors without a formula keep current_value.
+- run_scenarios binds each overridden factor to a NumPy vector with one slot
+  per scenario. It evaluates only the overrides' downstream subgraph, once
+  per factor. Formulas that aggregate (SUM, NPV, ...) or trap errors
+  (IFERROR) fall back to a per-scenario loop for that factor. Slots the vector
+  pass leaves non-finite (x/0, SQRT(-1)) are re-run as scalars, so every slot
+  matches a single-scenario run.
+- Compiled models are cached per model_id and versioned by a fingerprint of
+  the structure: factor ids, names, formulas, dependencies and entity names.
+  Editing a current_value keeps the version. compile() diffs the new values
+  against the cached ones and recomputes only their dependents.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.formula_evaluator import (
+    FUNCTIONS,
+    CompiledFormula,
+    FormulaError,
+    FormulaEvaluator,
+    _cell_ref,
+    _num,
+    _to_python,
+    compile_formula,
+    track_nan_reads,
+)
+
+logger = logging.getLogger(__name__)
+
+WORLD_MODEL_CACHE_SIZE = int(os.getenv("WORLD_MODEL_CACHE_SIZE", "128"))
+
+# Functions that map a scenario vector slot-by-slot (MIN / MAX via the
+# _BATCH_FUNCTIONS below). Anything else (SUM, NPV, VLOOKUP, ...) would
+# aggregate across scenarios, and IFERROR / ISERROR wouldn't see per-slot
+# errors — those formulas run once per scenario.
+_ELEMENTWISE_FUNCTIONS = frozenset({
+    "IF", "NOT", "TRUE", "FALSE", "PI", "E", "MIN", "MAX",
+    "ABS", "SIGN", "SQRT", "POWER", "EXP", "LN", "LOG", "ROUND", "MOD",
+    "SIN", "COS", "TAN", "ASIN", "ACOS", "ATAN", "RADIANS", "DEGREES",
+})
+
+_CIRC = FormulaError("#CIRC!", "Circular reference between factors")
+
+
+def _ident(text: Any) -> str:
+    """Factor / entity name as a formula identifier: 'Burn Rate' → BURN_RATE."""
+    ident = re.sub(r"\W+", "_", str(text or "")).strip("_").upper()
+    return f"_{ident}" if ident[:1].isdigit() else ident
+
+
+def fingerprint(factors: Sequence[Dict[str, Any]], entities: Sequence[Dict[str, Any]]) -> str:
+    """Structural version of a model; current_value edits don't change it."""
+    shape = (
+        sorted(
+            (str(f.get("id")), str(f.get("entity_id")), f.get("factor_name") or "",
+             f.get("formula") or "", [str(d) for d in f.get("dependencies") or []])
+            for f in factors
+        ),
+        sorted((str(e.get("id")), e.get("entity_name") or "") for e in entities),
+    )
+    return hashlib.sha1(json.dumps(shape, default=str).encode()).hexdigest()[:16]
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return False
+    if isinstance(a, FormulaError) or isinstance(b, FormulaError):
+        return isinstance(a, FormulaError) and isinstance(b, FormulaError) and a.code == b.code
+    try:
+        return bool(a == b) and type(a) is type(b)
+    except Exception:
+        return False
+
+
+def _pack(values: List[Any]) -> np.ndarray:
+    """Per-scenario values as a float vector, or an object vector if any aren't numbers."""
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype=float)
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+def _slotwise(name: str, ufunc: np.ufunc):
+    """MIN / MAX of factor values per scenario slot instead of across slots."""
+    scalar = FUNCTIONS[name]
+
+    def call(*args: Any) -> Any:
+        if not any(isinstance(a, np.ndarray) for a in args):
+            return scalar(*args)
+        if any(a is None or (isinstance(a, np.ndarray) and a.ndim != 1) for a in args):
+            # Blanks are skipped and ranges flattened per scenario — leave those to the slot loop
+            raise FormulaError("#VALUE!", f"{name} needs one value per scenario")
+        return ufunc.reduce(np.broadcast_arrays(*(_num(a) for a in args)))
+    return call
+
+
+_BATCH_FUNCTIONS = {"MIN": _slotwise("MIN", np.minimum), "MAX": _slotwise("MAX", np.maximum)}
+
+
+def _column(value: Any, n: int) -> List[Any]:
+    if not isinstance(value, np.ndarray):
+        return [_to_python(value)] * n
+    if value.dtype.kind == "f":
+        out = value.tolist()
+        return out if np.isfinite(value).all() else [v if math.isfinite(v) else None for v in out]
+    if value.dtype.kind == "b":
+        return value.tolist()
+    return [_to_python(v) for v in value]
+
+
+class _Context:
+    """What compiled formulas call back into: factor reads by name."""
+
+    __slots__ = ("values", "scope", "slot", "columns")
+
+    def __init__(self, values: List[Any], columns: Optional[Set[int]] = None):
+        self.values = values
+        self.scope: Dict[str, int] = {}
+        self.slot: Optional[int] = None
+        self.columns: Set[int] = columns if columns is not None else set()
+
+    def _name(self, name: str) -> Any:
+        i = self.scope.get(name)
+        if i is None:
+            raise FormulaError("#NAME?", f"Unknown or ambiguous factor {name}")
+        value = self.values[i]
+        if self.slot is not None and i in self.columns:
+            value = value[self.slot]
+            if isinstance(value, np.generic):
+                value = value.item()
+        if isinstance(value, FormulaError):
+            raise value
+        return value
+
+    def _cell(self, key: Tuple[int, int]) -> Any:
+        # FY2024 / Q1 / ARR2025 tokenize as A1 cells; read the factor of that name
+        name = _cell_ref(key)
+        if name in self.scope:
+            return self._name(name)
+        raise FormulaError("#REF!", f"World model formulas reference factors by name; no factor {name}")
+
+    def _range(self, bounds: Any) -> Any:
+        raise FormulaError("#REF!", "World model formulas reference factors by name, not ranges")
+
+    def _call(self, name: str, args: List[Any]) -> Any:
+        fn = _BATCH_FUNCTIONS.get(name) if self.columns and self.slot is None else None
+        fn = fn or FUNCTIONS.get(name)
+        if fn is None:
+            raise FormulaError("#NAME?", f"Unknown function {name}")
+        try:
+            return fn(*args)
+        except TypeError as e:
+            raise FormulaError("#VALUE!", f"{name}: {e}")
+
+
+def _run(compiled: CompiledFormula, ctx: _Context) -> Any:
+    try:
+        value = compiled.fn(ctx)
+    except FormulaError as e:
+        return e
+    except ZeroDivisionError as e:
+        return FormulaError("#DIV/0!", str(e))
+    except (ValueError, TypeError, OverflowError, IndexError, KeyError) as e:
+        return FormulaError("#VALUE!", str(e))
+    if isinstance(value, np.ndarray) and value.size == 1:
+        value = value.flat[0]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# ---------------------------------------------------------------------------
+# Compiled model
+# ---------------------------------------------------------------------------
+
+class CompiledWorldModel:
+    """One world model's factor DAG, its current values and scenario runs.
+
+    Factors are stored in topological order (cyclic ones last). Methods are
+    thread-safe; values returned are plain Python.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        factors: Sequence[Dict[str, Any]],
+        entities: Sequence[Dict[str, Any]] = (),
+        version: Optional[str] = None,
+    ):
+        started = time.perf_counter()
+        self.model_id = model_id
+        self.version = version or fingerprint(factors, entities)
+        self._lock = threading.RLock()
+
+        entity_names = {str(e.get("id")): _ident(e.get("entity_name")) for e in entities}
+        rows = [f for f in factors if f.get("id") is not None]
+        ids = [str(f["id"]) for f in rows]
+        by_id = {fid: i for i, fid in enumerate(ids)}
+        names = [_ident(f.get("factor_name")) for f in rows]
+        owners = [str(f.get("entity_id")) for f in rows]
+
+        # name → factor, used both for formula scopes and for resolve()
+        local: Dict[Tuple[str, str], int] = {}
+        qualified: Dict[str, int] = {}
+        bare: Dict[str, List[int]] = {}
+        for i, name in enumerate(names):
+            local.setdefault((owners[i], name), i)
+            if owners[i] in entity_names:
+                qualified.setdefault(f"{entity_names[owners[i]]}.{name}", i)
+            bare.setdefault(name, []).append(i)
+        unique = {name: idx[0] for name, idx in bare.items() if len(idx) == 1}
+
+        compiled: List[Optional[CompiledFormula]] = []
+        scopes: List[Dict[str, int]] = []
+        precedents: List[Set[int]] = []
+        errors: Dict[int, FormulaError] = {}
+        for i, f in enumerate(rows):
+            formula = f.get("formula")
+            scope: Dict[str, int] = {}
+            edges: Set[int] = set()
+            cf = None
+            if isinstance(formula, str) and formula.strip().lstrip("="):
+                try:
+                    cf = compile_formula(formula)
+                except FormulaError as e:
+                    errors[i] = e
+                else:
+                    refs = list(cf.names) + [_cell_ref(key) for key in cf.cells]
+                    for ref in refs:
+                        j = local.get((owners[i], ref), qualified.get(ref, unique.get(ref)))
+                        if j is not None:
+                            scope[ref] = j
+                            edges.add(j)
+            for dep in f.get("dependencies") or []:
+                j = by_id.get(str(dep))
+                if j is None:
+                    j = qualified.get(_ident(dep), unique.get(_ident(dep)))
+                if j is not None:
+                    edges.add(j)
+            compiled.append(cf)
+            scopes.append(scope)
+            precedents.append(edges)
+
+        # Kahn's algorithm; whatever never reaches indegree 0 is on or behind a cycle
+        dependents: List[List[int]] = [[] for _ in rows]
+        indegree = [len(p) for p in precedents]
+        for i, p in enumerate(precedents):
+            for j in p:
+                dependents[j].append(i)
+        ready = deque(i for i, d in enumerate(indegree) if d == 0)
+        order: List[int] = []
+        while ready:
+            i = ready.popleft()
+            order.append(i)
+            for d in dependents[i]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    ready.append(d)
+        stuck = [i for i, d in enumerate(indegree) if d > 0]
+        order.extend(stuck)
+        pos = {old: new for new, old in enumerate(order)}
+
+        self.ids: List[str] = [ids[i] for i in order]
+        self.names: List[str] = [names[i] for i in order]
+        self._index = {fid: pos[i] for fid, i in by_id.items()}
+        self._formulas = [compiled[i] for i in order]
+        self._scopes = [{ref: pos[j] for ref, j in scopes[i].items()} for i in order]
+        self._precedents = [{pos[j] for j in precedents[i]} for i in order]
+        self._dependents = [sorted(pos[j] for j in dependents[i]) for i in order]
+        self._vector_safe = [
+            cf is not None and cf.functions <= _ELEMENTWISE_FUNCTIONS for cf in self._formulas
+        ]
+        self._cyclic = {pos[i] for i in stuck if compiled[i] is not None}
+        self._parse_errors = {pos[i]: e for i, e in errors.items()}
+        self._keys: Dict[str, int] = {}
+        for key, i in qualified.items():
+            self._keys[key] = pos[i]
+        for key, i in unique.items():
+            self._keys.setdefault(key, pos[i])
+        self._keys.update(self._index)
+
+        self._inputs: List[Any] = [rows[i].get("current_value") for i in order]
+        self._values: List[Any] = [FormulaEvaluator._constant(v) for v in self._inputs]
+        self._pins: Dict[int, Any] = {}
+        self.last_run: Dict[str, Any] = {}
+
+        self._recompute(range(len(self.ids)))
+        self.compile_ms = round((time.perf_counter() - started) * 1000, 3)
+        if stuck:
+            logger.warning("[WORLD_MODEL] %s: %d factors on a dependency cycle", model_id, len(self._cyclic))
+
+    # -- lookup --------------------------------------------------------------
+
+    def resolve(self, key: str) -> int:
+        """Position of a factor by id, unique name or Entity.name; ValueError otherwise."""
+        i = self._index.get(str(key))
+        if i is None:
+            i = self._keys.get(_ident(key)) if "." not in str(key) else self._keys.get(
+                ".".join(_ident(part) for part in str(key).split(".", 1))
+            )
+        if i is None:
+            raise ValueError(f"Unknown or ambiguous factor {key!r} in world model {self.model_id}")
+        return i
+
+    @property
+    def cycle_ids(self) -> List[str]:
+        return [self.ids[i] for i in sorted(self._cyclic)]
+
+    # -- evaluation ----------------------------------------------------------
+
+    def _downstream(self, roots: Set[int]) -> List[int]:
+        seen = set(roots)
+        stack = list(roots)
+        while stack:
+            for d in self._dependents[stack.pop()]:
+                if d not in seen:
+                    seen.add(d)
+                    stack.append(d)
+        return sorted(seen)
+
+    def _computed(self, i: int) -> bool:
+        return self._formulas[i] is not None and i not in self._pins
+
+    def _evaluate(self, i: int, ctx: _Context) -> Any:
+        if i in self._cyclic:
+            return _CIRC
+        ctx.scope = self._scopes[i]
+        ctx.slot = None
+        return _run(self._formulas[i], ctx)
+
+    def _recompute(self, positions: Any, changed: Optional[Set[int]] = None) -> Dict[int, Any]:
+        """Re-run formula factors in ``positions`` (topological order).
+
+        With ``changed``, a factor is only re-run when one of its precedents
+        changed, and it joins ``changed`` only if its value moved.
+        """
+        ctx = _Context(self._values)
+        out: Dict[int, Any] = {}
+        for i in positions:
+            if i in self._parse_errors:
+                self._values[i] = out[i] = self._parse_errors[i]
+                continue
+            if not self._computed(i):
+                continue
+            if changed is not None and not (self._precedents[i] & changed):
+                continue
+            value = self._evaluate(i, ctx)
+            if changed is not None:
+                if _same(value, self._values[i]):
+                    continue
+                changed.add(i)
+            self._values[i] = out[i] = value
+        return out
+
+    def _output(self, i: int) -> Any:
+        if self._formulas[i] is None and i not in self._parse_errors:
+            return self._inputs[i]
+        return _to_python(self._values[i])
+
+    def results(self) -> Dict[str, Any]:
+        """{factor_id: value}; formula errors come back as their code (#DIV/0!, #CIRC!, ...)."""
+        with self._lock:
+            return {fid: self._output(i) for i, fid in enumerate(self.ids)}
+
+    def errors(self) -> Dict[str, str]:
+        with self._lock:
+            return {
+                self.ids[i]: f"{v.code} {v}".strip()
+                for i, v in enumerate(self._values) if isinstance(v, FormulaError)
+            }
+
+    def update(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Set factor values and recompute only what depends on them.
+
+        Constant factors take the new input; formula factors are pinned to
+        the value until reset(). Returns {factor_id: new value} for every
+        factor whose value changed.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            roots: Set[int] = set()
+            for key, value in changes.items():
+                i = self.resolve(key)
+                if self._formulas[i] is None:
+                    self._inputs[i] = value
+                else:
+                    self._pins[i] = value
+                self._values[i] = FormulaEvaluator._constant(value)
+                roots.add(i)
+            return self._propagate(roots, started)
+
+    def reset(self) -> Dict[str, Any]:
+        """Drop update() pins on formula factors and recompute them."""
+        with self._lock:
+            started = time.perf_counter()
+            roots = set(self._pins)
+            self._pins.clear()
+            ctx = _Context(self._values)
+            for i in roots:
+                self._values[i] = self._evaluate(i, ctx)
+            return self._propagate(roots, started)
+
+    def sync(self, factors: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply current_value edits from freshly loaded factor rows."""
+        with self._lock:
+            changes = {}
+            for f in factors:
+                i = self._index.get(str(f.get("id")))
+                if i is not None and self._formulas[i] is None and not _same(f.get("current_value"), self._inputs[i]):
+                    changes[self.ids[i]] = f.get("current_value")
+            return self.update(changes) if changes else {}
+
+    def _propagate(self, roots: Set[int], started: float) -> Dict[str, Any]:
+        changed = set(roots)
+        affected = self._downstream(roots)
+        recomputed = self._recompute(affected, changed)
+        self.last_run = {
+            "mode": "incremental",
+            "affected": len(affected),
+            "evaluated": len(recomputed),
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        return {self.ids[i]: self._output(i) for i in sorted(changed)}
+
+    # -- scenario sweeps -----------------------------------------------------
+
+    def run_scenarios(self, scenarios: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Evaluate many override sets at once without touching current values.
+
+        ``scenarios`` is a list of {factor id / name: value}. Returns
+        {"count", "factors": {factor_id: [value per scenario]}, "evaluated", "ms"}
+        where ``factors`` holds every factor an override can reach; the rest
+        equal results().
+        """
+        n = len(scenarios)
+        if not n:
+            return {"count": 0, "factors": {}, "evaluated": 0, "ms": 0.0}
+        with self._lock:
+            started = time.perf_counter()
+            positions: Dict[str, int] = {}
+            overrides: Dict[int, Tuple[List[int], List[Any]]] = {}
+            for s, scenario in enumerate(scenarios):
+                for key, value in (scenario or {}).items():
+                    i = positions.get(key)
+                    if i is None:
+                        i = positions[key] = self.resolve(key)
+                    slots, values = overrides.setdefault(i, ([], []))
+                    slots.append(s)
+                    values.append(value if type(value) is float else FormulaEvaluator._constant(value))
+
+            values = list(self._values)
+            columns: Set[int] = set()
+            ctx = _Context(values, columns)
+            changed: Set[int] = set()
+            affected = self._downstream(set(overrides))
+            evaluated = 0
+            for i in affected:
+                value = values[i]
+                if i in self._parse_errors:
+                    value = self._parse_errors[i]
+                elif self._computed(i) and self._precedents[i] & changed:
+                    value = self._evaluate_batch(i, ctx, n)
+                    evaluated += 1
+                if i in overrides:
+                    slots, pinned = overrides[i]
+                    column = value.tolist() if isinstance(value, np.ndarray) else [value] * n
+                    for s, v in zip(slots, pinned):
+                        column[s] = v
+                    value = _pack(column)
+                values[i] = value
+                changed.add(i)
+                if isinstance(value, np.ndarray) and value.shape == (n,):
+                    columns.add(i)
+
+            result = {
+                "count": n,
+                "factors": {self.ids[i]: _column(values[i], n) for i in affected},
+                "evaluated": evaluated,
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            self.last_run = {"mode": "scenarios", "scenarios": n, "affected": len(affected),
+                             "evaluated": evaluated, "ms": result["ms"]}
+            return result
+
+    def _evaluate_batch(self, i: int, ctx: _Context, n: int) -> Any:
+        if i in self._cyclic:
+            return _CIRC
+        if self._vector_safe[i]:
+            # Columns are never blank, so a NaN read mid-formula is an error
+            # (x/0) that arithmetic coerced to 0 — redo those slots one by one
+            with track_nan_reads() as nan_reads:
+                value = self._evaluate(i, ctx)
+            erred = np.zeros(n, dtype=bool)
+            for mask in nan_reads:
+                erred |= mask if mask.shape == (n,) else bool(mask.any())
+            if not isinstance(value, np.ndarray):
+                if not isinstance(value, FormulaError) and not erred.any():
+                    return value
+            elif value.shape == (n,):
+                if value.dtype.kind == "f":
+                    erred |= ~np.isfinite(value)
+                bad = np.flatnonzero(erred)
+                if not bad.size:
+                    return value
+                column = value.tolist()
+                for s in bad:
+                    column[s] = self._evaluate_slot(i, ctx, int(s))
+                return _pack(column)
+        return _pack([self._evaluate_slot(i, ctx, s) for s in range(n)])
+
+    def _evaluate_slot(self, i: int, ctx: _Context, slot: int) -> Any:
+        ctx.scope = self._scopes[i]
+        ctx.slot = slot
+        try:
+            return _run(self._formulas[i], ctx)
+        finally:
+            ctx.slot = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "factors": len(self.ids),
+            "formulas": sum(cf is not None for cf in self._formulas),
+            "vectorised": sum(self._vector_safe),
+            "cyclic": len(self._cyclic),
+            "pinned": len(self._pins),
+            "compile_ms": self.compile_ms,
+            "last_run": dict(self.last_run),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class WorldModelEngine:
+    """LRU of compiled models keyed by model_id, checked against the model version."""
+
+    def __init__(self, max_models: int = WORLD_MODEL_CACHE_SIZE):
+        self.max_models = max_models
+        self._models: "OrderedDict[str, CompiledWorldModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.compiles = 0
+        self.value_syncs = 0
+
+    def compile(self, model_id: str, model_data: Dict[str, Any]) -> CompiledWorldModel:
+        """Compiled model for a get_model() payload, reusing the cached one when
+        the structure is unchanged (current_value edits are applied incrementally)."""
+        factors = model_data.get("factors") or []
+        entities = model_data.get("entities") or []
+        version = fingerprint(factors, entities)
+        with self._lock:
+            cached = self._models.get(model_id)
+            if cached is not None and cached.version == version:
+                self._models.move_to_end(model_id)
+                self.hits += 1
+            else:
+                cached = None
+        if cached is not None:
+            if cached.sync(factors):
+                self.value_syncs += 1
+            return cached
+
+        compiled = CompiledWorldModel(model_id, factors, entities, version)
+        with self._lock:
+            self.compiles += 1
+            self._models[model_id] = compiled
+            self._models.move_to_end(model_id)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        logger.debug("[WORLD_MODEL] compiled %s v%s: %d factors in %.1fms",
+                     model_id, version, len(compiled.ids), compiled.compile_ms)
+        return compiled
+
+    def evict(self, model_id: Optional[str] = None) -> None:
+        with self._lock:
+            if model_id is None:
+                self._models.clear()
+            else:
+                self._models.pop(model_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = list(self._models.items())
+        lookups = self.hits + self.compiles
+        return {
+            "models": len(models),
+            "max_models": self.max_models,
+            "hits": self.hits,
+            "compiles": self.compiles,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "value_syncs": self.value_syncs,
+            "recent": {mid: m.stats() for mid, m in models[-5:]},
+        }
+
+
+# Singleton — import this everywhere
+world_model_engine = WorldModelEngine()
@@ -809,6 +809,8 @@ async def sync_xero_data(
     except Exception as bs_err:
         logger.warning("Xero BS sync failed (non-fatal): %s", bs_err)
 
+    from app.services.company_data_pull import invalidate_company_cache
+    invalidate_company_cache(company_id)
     update_sync_status(connection_id, "idle")
 
     all_rows = rows + bs_rows
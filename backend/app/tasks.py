@@ -246,6 +246,54 @@ def run_company_history_analysis(
         return {"status": "error", "error": str(e)}
 
 
+@celery_app.task(
+    bind=True,
+    base=CallbackTask,
+    name="app.tasks.analysis.run_bulk_valuation",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    autoretry_for=(RateLimitError,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    retry_kwargs={"max_retries": 5},
+)
+def run_bulk_valuation_job(
+    self,
+    job_id: str,
+    fund_id: str,
+    concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Value every portfolio company of a fund, checkpointing per company.
+
+    acks_late + reject_on_worker_lost: a worker crash redelivers the task
+    with the same job_id, which resumes from the last checkpoint.
+    """
+    import asyncio
+    from app.services.bulk_valuation_job import run_bulk_valuation
+
+    def progress_cb(progress: Dict[str, Any]) -> None:
+        self.update_state(state="PROGRESS", meta=progress)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        status = loop.run_until_complete(
+            run_bulk_valuation(job_id, fund_id, concurrency=concurrency, progress_callback=progress_cb)
+        )
+        return {"status": "success", "result": status}
+    except RateLimitError:
+        raise
+    except Exception as e:
+        err_str = str(e).lower()
+        if "429" in str(e) or "rate limit" in err_str or "too many requests" in err_str:
+            raise RateLimitError("valuation", retry_after=60) from e
+        logger.exception("Bulk valuation %s failed: %s", job_id, e)
+        return {"status": "error", "job_id": job_id, "error": str(e)}
+    finally:
+        loop.close()
+
+
 @celery_app.task(bind=True, name="app.tasks.periodic.cleanup")
 def cleanup_old_data(self):
     """Periodic task to cleanup old data"""
@@ -0,0 +1,88 @@
+"""
+Offline benchmark fixtures: a seeded in-memory Supabase client per scale,
+installed as the process-wide client, plus the end-of-session report.
+
+    pytest tests/benchmarks                          # default scales
+    BENCH_SCALES=all pytest tests/benchmarks         # 1 / 50 / 500 companies
+    BENCH_UPDATE_BASELINE=1 pytest tests/benchmarks  # record new baselines
+    pytest -m "not benchmark"                        # skip them
+"""
+
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import pytest
+
+from . import harness
+from .fake_supabase import InMemorySupabase
+from .synthetic import build_dataset
+
+_RESULTS = []
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: engine performance benchmark (offline, seeded data)")
+
+
+@pytest.fixture(scope="session")
+def install_fake_supabase():
+    """Point get_supabase_client() at the in-memory client for the session."""
+    from app.core.database import get_supabase_service
+
+    service = get_supabase_service()
+    saved = (service.client, service._initialized)
+
+    def install(db: InMemorySupabase) -> None:
+        service.client = db
+        service._initialized = True
+
+    yield install
+    service.client, service._initialized = saved
+    harness.reset_caches()
+
+
+@pytest.fixture(scope="session")
+def datasets():
+    cache = {}
+
+    def get(scale):
+        if scale.name not in cache:
+            cache[scale.name] = build_dataset(scale)
+        return cache[scale.name]
+
+    return get
+
+
+@pytest.fixture
+def fake_db(request, datasets, install_fake_supabase):
+    """(dataset, client) for the test's ``scale`` parameter, installed globally."""
+    dataset = datasets(request.param)
+    db = InMemorySupabase(dataset.tables)
+    install_fake_supabase(db)
+    return dataset, db
+
+
+@pytest.fixture(scope="session")
+def bench_results():
+    return _RESULTS
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _RESULTS:
+        return
+    harness.save_results(_RESULTS)
+    if harness.UPDATE_BASELINE:
+        harness.save_baselines(_RESULTS)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _RESULTS:
+        return
+    # sessionfinish has already merged this run when updating
+    baselines = {} if harness.UPDATE_BASELINE else harness.load_baselines()
+    terminalreporter.section("engine benchmarks")
+    for line in harness.format_table(_RESULTS, baselines):
+        terminalreporter.write_line(line)
+    if harness.UPDATE_BASELINE:
+        terminalreporter.write_line(f"baselines updated: {harness.BASELINE_PATH}")
@@ -0,0 +1,247 @@
+"""
+Benchmark workloads — one per latency-critical engine.
+
+Each workload takes a SyntheticDataset and runs the engine the way the API
+does for a portfolio: once per company, capped at ``max_companies`` so the
+slow engines stay affordable at fund-500. Cascade and cap-table workloads
+build their inputs in-memory (no DB reads) from the company index.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from .synthetic import SyntheticDataset
+
+
+@dataclass(frozen=True)
+class EngineBenchmark:
+    name: str
+    run: Callable[[SyntheticDataset, List[str]], Any]
+    max_companies: Optional[int] = None
+    uses_db: bool = True
+
+    def companies(self, dataset: SyntheticDataset) -> List[str]:
+        ids = dataset.company_ids
+        return ids if self.max_companies is None else ids[: self.max_companies]
+
+
+# ---------------------------------------------------------------------------
+# DB-backed engines
+# ---------------------------------------------------------------------------
+
+def _monte_carlo(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.monte_carlo_engine import MonteCarloEngine
+
+    engine = MonteCarloEngine()
+    return [
+        engine.simulate(cid, iterations=1000, months=24, branch_id=dataset.child_branch[cid], seed=7)
+        for cid in company_ids
+    ]
+
+
+def _liquidity(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.liquidity_management_service import LiquidityManagementService
+
+    service = LiquidityManagementService()
+    return [service.build_liquidity_model(cid, months=24) for cid in company_ids]
+
+
+def _cash_flow(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.cash_flow_planning_service import CashFlowPlanningService
+    from app.services.company_data_pull import pull_company_data
+
+    service = CashFlowPlanningService()
+    return [
+        service.build_monthly_cash_flow_model(pull_company_data(cid).to_forecast_seed(), months=24)
+        for cid in company_ids
+    ]
+
+
+def _kpi(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.kpi_engine import KPIEngine
+
+    engine = KPIEngine()
+    return [engine.compute(cid, periods=12) for cid in company_ids]
+
+
+def _kpi_fund(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.company_data_pull import pull_fund_companies
+    from app.services.kpi_engine import KPIEngine
+
+    return KPIEngine().compute_fund(pull_fund_companies(dataset.fund_id), periods=12)
+
+
+def _consolidation(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    import asyncio
+
+    from app.services.consolidation_engine import ConsolidationEngine
+
+    engine = ConsolidationEngine(dataset.group_company_id)
+    ranges = ((None, None), ("2025-07", None), ("2025-10", "2025-12"), (None, "2025-03"))
+
+    async def run() -> Any:
+        return [await engine.consolidate_pnl(dataset.group_root_entity, *r) for r in ranges]
+
+    return asyncio.run(run())
+
+
+def _regression(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.advanced_regression_service import AdvancedRegressionService
+
+    service = AdvancedRegressionService()
+    out = []
+    for cid in company_ids:
+        y = dataset.revenue[cid]
+        if len(y) < 3:
+            continue
+        x = [float(i) for i in range(len(y))]
+        out.append(service.auto_select_best_model(x, y, forecast_periods=12))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# In-memory engines
+# ---------------------------------------------------------------------------
+
+def _clause_set(index: int):
+    from app.services.clause_parameter_registry import (
+        ClauseParameter,
+        InstrumentSummary,
+        ResolvedParameterSet,
+    )
+
+    def param(param_type: str, value: Any, applies_to: str, instrument: str = "equity") -> ClauseParameter:
+        return ClauseParameter(param_type, value, applies_to, instrument, "doc", "1.1", "S1", "", "sha")
+
+    params = ResolvedParameterSet(company_id=f"bench-{index}")
+    for i in range(5 + index % 20):
+        series = f"series_{i}"
+        params.parameters[f"anti_dilution_method:{series}"] = param(
+            "anti_dilution_method", "full_ratchet" if i % 3 == 0 else "broad_weighted_average", series,
+        )
+        params.parameters[f"conversion_price:{series}"] = param("conversion_price", 1.0 + 0.1 * i, series)
+        params.parameters[f"qualified_financing_threshold:safe_{i}"] = param(
+            "qualified_financing_threshold", 1e6 * (i + 1), f"safe_{i}", "safe",
+        )
+        params.parameters[f"cross_default:lender_{i}"] = param("cross_default", True, f"lender_{i}", "debt")
+        params.instruments.append(InstrumentSummary(f"inst_{i}", "equity", series, 1e6 * (i + 1), {"shares": 1e6}))
+    return params
+
+
+def _cascade(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.cascade_engine import CascadeGraph
+
+    out = []
+    for index, _ in enumerate(company_ids):
+        params = _clause_set(index)
+        graph = CascadeGraph()
+        graph.build_from_clauses(params)
+        out.append(graph.simulate("financing_amount:new_round", 5e6, params, max_depth=5))
+        out.append(graph.find_breakpoints("financing_amount:new_round", 0, 5e7, steps=100, current_params=params))
+    return out
+
+
+def _cap_table(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.advanced_cap_table import (
+        CapTableCalculator,
+        ShareClass,
+        ShareEntry,
+        ShareholderRights,
+    )
+
+    series = (ShareClass.PREFERRED_A, ShareClass.PREFERRED_B, ShareClass.PREFERRED_C,
+              ShareClass.PREFERRED_D, ShareClass.PREFERRED_E)
+    out = []
+    for index, _ in enumerate(company_ids):
+        calc = CapTableCalculator()
+        when = datetime(2020, 1, 1)
+        calc.add_shareholder(ShareEntry("f1", "Founder 1", ShareClass.COMMON, Decimal("4000000"), Decimal("0.001"), when))
+        calc.add_shareholder(ShareEntry("f2", "Founder 2", ShareClass.COMMON, Decimal("3000000"), Decimal("0.001"), when))
+        calc.add_shareholder(ShareEntry("pool", "Option Pool", ShareClass.OPTIONS, Decimal("1500000"), Decimal("0.5"), when))
+        for r, share_class in enumerate(series[: 2 + index % 4]):
+            rights = ShareholderRights(
+                liquidation_preference=1.0 + 0.5 * (r % 2),
+                participation_rights=r % 2 == 1,
+                participation_cap=3.0 if r % 2 == 1 else None,
+            )
+            calc.add_shareholder(ShareEntry(
+                f"inv{r}", f"Investor {r}", share_class,
+                Decimal(1_000_000 + 250_000 * r), Decimal(str(1.5 * (r + 1))),
+                datetime(2021 + r, 1, 1), rights=rights,
+            ))
+        calc.calculate_ownership()
+        for exit_value in (5e6, 25e6, 100e6, 500e6):
+            out.append(calc.calculate_liquidation_waterfall(exit_value, {}))
+        out.append(calc.calculate_waterfall_breakpoints(Decimal("100000000")))
+    return out
+
+
+def _world_model(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.world_model_engine import CompiledWorldModel
+
+    entities = [{"id": "fund", "entity_name": "Fund"}]
+    factors: List[Dict[str, Any]] = []
+    for index, cid in enumerate(company_ids):
+        entities.append({"id": cid, "entity_name": f"Co {index}"})
+        revenue = dataset.revenue[cid][-1] if dataset.revenue.get(cid) else 1e6
+        for name, value, formula in (
+            ("revenue", revenue, None),
+            ("growth_rate", 0.2 + (index % 20) / 20, None),
+            ("burn_rate", 50_000.0 * (1 + index % 7), None),
+            ("multiple", None, "IF(growth_rate > 1, 15, IF(growth_rate > 0.5, 10, 7))"),
+            ("valuation", None, "revenue * 12 * multiple * (1 + growth_rate)"),
+            ("runway", None, "IFERROR(revenue / burn_rate, 0)"),
+            ("nav", None, "MIN(valuation, 1e9) * 0.1"),
+        ):
+            factors.append({"id": f"{cid}:{name}", "entity_id": cid, "factor_name": name,
+                            "current_value": value, "formula": formula})
+    factors.append({"id": "fund:total_nav", "entity_id": "fund", "factor_name": "total_nav",
+                    "formula": "+".join(f"CO_{i}.nav" for i in range(len(company_ids)))})
+
+    model = CompiledWorldModel(dataset.fund_id, factors, entities)
+    sweep = [
+        {f"{cid}:growth_rate": (s % 40) / 20 for cid in company_ids[s % 5::5]}
+        for s in range(1000)
+    ]
+    return model.results(), model.update({f"{company_ids[0]}:revenue": 2e6}), model.run_scenarios(sweep)
+
+
+def _pwerm(dataset: SyntheticDataset, company_ids: List[str]) -> Any:
+    from app.services.pwerm_comprehensive import ComprehensivePWERM
+
+    round_types = ("pre-seed", "seed", "series a", "series b", "series c", "series d", "series e")
+    stages = ("pre_seed", "seed", "series_a", "series_b", "series_c", "growth", "late")
+    companies = []
+    for index, cid in enumerate(company_ids):
+        depth = 1 + index % len(round_types)
+        revenue = dataset.revenue[cid][-1] * 12 if dataset.revenue.get(cid) else 1e6
+        companies.append({
+            "funding_rounds": [{"round_type": rt, "date": f"{2015 + r}-01-01"}
+                               for r, rt in enumerate(round_types[:depth])],
+            "stage": stages[depth - 1],
+            "valuation": revenue * (8 + index % 12),
+            "revenue": revenue,
+            "growth_rate": 0.5 + (index % 6) / 2,
+            "runway_months": 3 + index % 24,
+        })
+    pwerm = ComprehensivePWERM()
+    return pwerm.calculate_valuations_batch(companies), pwerm.calculate_valuation(companies[0])
+
+
+ENGINES: Dict[str, EngineBenchmark] = {
+    b.name: b for b in (
+        EngineBenchmark("monte_carlo", _monte_carlo, max_companies=10),
+        EngineBenchmark("liquidity", _liquidity, max_companies=50),
+        EngineBenchmark("cash_flow", _cash_flow),
+        EngineBenchmark("kpi", _kpi),
+        EngineBenchmark("kpi_fund", _kpi_fund),
+        EngineBenchmark("consolidation", _consolidation),
+        EngineBenchmark("regression", _regression, max_companies=100),
+        EngineBenchmark("cascade", _cascade, max_companies=50, uses_db=False),
+        EngineBenchmark("cap_table", _cap_table, max_companies=25, uses_db=False),
+        EngineBenchmark("world_model", _world_model, uses_db=False),
+        EngineBenchmark("pwerm", _pwerm, uses_db=False),
+    )
+}
@@ -0,0 +1,261 @@
+"""
+In-memory stand-in for the supabase-py client used by the benchmarks.
+
+Implements the slice of the PostgREST query builder the engines use
+(select / eq / in_ / range / order / single ...) over plain lists of dicts,
+and counts every ``execute()`` per (table, operation) so a benchmark can
+report how many round-trips an engine would have made:
+
+    db = InMemorySupabase({"companies": [{"id": "...", "name": "Acme"}]})
+    db.table("companies").select("id, name").eq("id", "...").execute().data
+    db.calls            # Counter({("companies", "select"): 1})
+"""
+
+import copy
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class InMemorySupabase:
+    """Tables are lists of row dicts; rows returned by select are copies."""
+
+    def __init__(self, tables: Optional[Dict[str, Iterable[Dict[str, Any]]]] = None):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {
+            name: list(rows) for name, rows in (tables or {}).items()
+        }
+        self.calls: Counter = Counter()
+        self.rows_returned = 0
+        self._lock = threading.Lock()
+        # (table, column) → value → rows; keeps the stand-in's own cost out
+        # of the measured time at fund scale
+        self._indexes: Dict[tuple, Dict[Any, List[Dict[str, Any]]]] = {}
+        # (table, filters, order) → matched + sorted rows, so paging through
+        # an ordered select doesn't re-filter and re-sort on every page
+        self._sorted: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    def table(self, name: str) -> "_Query":
+        return _Query(self, name)
+
+    from_ = table
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.rows_returned = 0
+
+    def _index(self, table: str, col: str) -> Dict[Any, List[Dict[str, Any]]]:
+        index = self._indexes.get((table, col))
+        if index is None:
+            index = {}
+            for row in self.tables.get(table, []):
+                index.setdefault(row.get(col), []).append(row)
+            self._indexes[(table, col)] = index
+        return index
+
+    def _drop_indexes(self, table: str) -> None:
+        for key in [k for k in self._indexes if k[0] == table]:
+            del self._indexes[key]
+        for key in [k for k in self._sorted if k[0] == table]:
+            del self._sorted[key]
+
+    def _record(self, table: str, op: str, rows: int) -> None:
+        with self._lock:
+            self.calls[(table, op)] += 1
+            self.rows_returned += rows
+
+
+def _projection(columns: str) -> Optional[List[str]]:
+    cols = [c.strip() for c in columns.split(",") if c.strip()]
+    if not cols or "*" in cols:
+        return None
+    return [c.split(":")[-1].strip() for c in cols]
+
+
+class _Query:
+    def __init__(self, db: InMemorySupabase, table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._spec: List[tuple] = []              # hashable description of _filters
+        self._lookup: Optional[tuple] = None     # (column, values) served by an index
+        self._order: List[tuple] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._single = False
+        self._maybe_single = False
+        self._payload: Any = None
+
+    # -- operations --------------------------------------------------------
+
+    def select(self, columns: str = "*", count: Optional[str] = None, **_: Any) -> "_Query":
+        self._columns = _projection(columns)
+        self._count = count
+        return self
+
+    def insert(self, payload: Any, **_: Any) -> "_Query":
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload: Any, **_: Any) -> "_Query":
+        self._op, self._payload = "upsert", payload
+        return self
+
+    def update(self, payload: Dict[str, Any], **_: Any) -> "_Query":
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self, **_: Any) -> "_Query":
+        self._op = "delete"
+        return self
+
+    # -- filters -----------------------------------------------------------
+
+    def _where(self, predicate: Callable[[Dict[str, Any]], bool], *spec: Any) -> "_Query":
+        self._filters.append(predicate)
+        self._spec.append(spec)
+        return self
+
+    def eq(self, col: str, value: Any) -> "_Query":
+        if self._lookup is None:
+            self._lookup = (col, [value])
+        return self._where(lambda r: r.get(col) == value, "eq", col, value)
+
+    def neq(self, col: str, value: Any) -> "_Query":
+        return self._where(lambda r: r.get(col) != value, "neq", col, value)
+
+    def in_(self, col: str, values: Iterable[Any]) -> "_Query":
+        allowed = set(values)
+        if self._lookup is None:
+            self._lookup = (col, list(allowed))
+        return self._where(lambda r: r.get(col) in allowed, "in", col, frozenset(allowed))
+
+    def gt(self, col: str, value: Any) -> "_Query":
+        return self._where(lambda r: r.get(col) is not None and r[col] > value, "gt", col, value)
+
+    def gte(self, col: str, value: Any) -> "_Query":
+        return self._where(lambda r: r.get(col) is not None and r[col] >= value, "gte", col, value)
+
+    def lt(self, col: str, value: Any) -> "_Query":
+        return self._where(lambda r: r.get(col) is not None and r[col] < value, "lt", col, value)
+
+    def lte(self, col: str, value: Any) -> "_Query":
+        return self._where(lambda r: r.get(col) is not None and r[col] <= value, "lte", col, value)
+
+    def is_(self, col: str, value: Any) -> "_Query":
+        target = None if value in (None, "null") else value
+        return self._where(lambda r: r.get(col) is target or r.get(col) == target, "is", col, target)
+
+    def ilike(self, col: str, pattern: str) -> "_Query":
+        needle = pattern.strip("%").lower()
+        return self._where(lambda r: needle in str(r.get(col) or "").lower(), "ilike", col, needle)
+
+    # -- shaping -----------------------------------------------------------
+
+    def order(self, col: str, desc: bool = False, **_: Any) -> "_Query":
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, n: int) -> "_Query":
+        self._limit = n
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> "_Query":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "_Query":
+        self._maybe_single = True
+        return self
+
+    # -- execution ---------------------------------------------------------
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return all(f(row) for f in self._filters)
+
+    def execute(self) -> FakeResponse:
+        rows = self._db.tables.setdefault(self._table, [])
+        if self._op == "select":
+            result = self._select(rows)
+        else:
+            result = self._write(rows)
+            self._db._drop_indexes(self._table)
+        n = len(result) if isinstance(result, list) else int(result is not None)
+        self._db._record(self._table, self._op, n)
+        return FakeResponse(result, count=n if self._count else None)
+
+    def _candidates(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self._lookup is None:
+            return rows
+        col, values = self._lookup
+        index = self._db._index(self._table, col)
+        if len(values) == 1:
+            return index.get(values[0], [])
+        return [r for v in values for r in index.get(v, [])]
+
+    def _sorted_matches(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        matched = [r for r in rows if self._matches(r)]
+        for col, desc in reversed(self._order):
+            matched.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+        return matched
+
+    def _select(self, rows: List[Dict[str, Any]]) -> Any:
+        matched = None
+        if self._order and (self._offset or self._limit is not None):
+            key = (self._table, tuple(self._spec), tuple(self._order))
+            try:
+                matched = self._db._sorted.get(key)
+            except TypeError:  # unhashable filter value — don't cache
+                key = None
+            if matched is None:
+                matched = self._sorted_matches(self._candidates(rows))
+                if key is not None:
+                    self._db._sorted[key] = matched
+        else:
+            matched = self._sorted_matches(self._candidates(rows))
+        if self._limit is not None:
+            matched = matched[self._offset:self._offset + self._limit]
+        elif self._offset:
+            matched = matched[self._offset:]
+        if self._columns is None:
+            out = [dict(r) for r in matched]
+        else:
+            out = [{c: r.get(c) for c in self._columns} for r in matched]
+        if self._single or self._maybe_single:
+            return out[0] if out else None
+        return out
+
+    def _write(self, rows: List[Dict[str, Any]]) -> Any:
+        if self._op in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            new_rows = [copy.deepcopy(r) for r in payload]
+            if self._op == "upsert":
+                ids = {r.get("id") for r in new_rows if r.get("id") is not None}
+                rows[:] = [r for r in rows if r.get("id") not in ids]
+            rows.extend(new_rows)
+            return new_rows
+        matched = [r for r in rows if self._matches(r)]
+        if self._op == "update":
+            for r in matched:
+                r.update(self._payload)
+        else:
+            keep = [r for r in rows if not self._matches(r)]
+            rows[:] = keep
+        return [dict(r) for r in matched]
@@ -0,0 +1,176 @@
+"""
+Measurement + baseline comparison for the engine benchmarks.
+
+Each workload runs cold (every process-level cache dropped first):
+  - wall time: median of BENCH_REPEATS runs without tracing overhead
+  - peak memory: one extra run under tracemalloc
+  - DB calls: ``execute()`` count on the in-memory client for one run
+
+Baselines live in baselines.json next to this file, keyed "engine@scale".
+BENCH_UPDATE_BASELINE=1 rewrites the entries that ran. DB-call increases
+always fail (they are deterministic); time / memory regressions beyond
+BENCH_TOLERANCE are reported, and fail only with BENCH_ENFORCE=1 since
+they depend on the machine.
+"""
+
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+RESULTS_PATH = Path(__file__).parent / "results" / "latest.json"
+
+REPEATS = int(os.getenv("BENCH_REPEATS", "3"))
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.25"))
+UPDATE_BASELINE = os.getenv("BENCH_UPDATE_BASELINE", "0").lower() in ("1", "true", "yes")
+ENFORCE = os.getenv("BENCH_ENFORCE", "0").lower() in ("1", "true", "yes")
+# Differences below these are noise, whatever the ratio
+_MIN_WALL_MS = 5.0
+_MIN_PEAK_KIB = 256.0
+
+
+@dataclass
+class BenchResult:
+    engine: str
+    scale: str
+    wall_ms: float
+    peak_kib: float
+    db_calls: int
+    db_rows: int
+    repeats: int
+    db_calls_by_table: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.engine}@{self.scale}"
+
+    def baseline_entry(self) -> Dict[str, Any]:
+        return {
+            "wall_ms": round(self.wall_ms, 2),
+            "peak_kib": round(self.peak_kib, 1),
+            "db_calls": self.db_calls,
+        }
+
+
+def reset_caches() -> None:
+    """Drop every process-level cache an engine run can warm."""
+    from app.core.data_access import fpa_data
+    from app.services import (
+        cascade_engine,
+        company_data_pull,
+        consolidation_engine,
+        scenario_branch_service,
+        waterfall_engine,
+    )
+
+    fpa_data.invalidate()
+    company_data_pull._COMPANY_DATA_CACHE.evict()
+    consolidation_engine._RESULTS.evict()
+    consolidation_engine._MEMO.clear()
+    scenario_branch_service._BRANCH_TREE_CACHE.evict()
+    with cascade_engine._graph_cache_lock:
+        cascade_engine._graph_cache.clear()
+    waterfall_engine._compile.cache_clear()
+
+
+def measure(engine: str, scale: str, workload: Callable[[], Any], db, repeats: int = REPEATS) -> BenchResult:
+    """Time ``workload`` cold, then trace one more cold run for peak memory."""
+    times: List[float] = []
+    calls_by_table: Dict[str, int] = {}
+    db_calls = db_rows = 0
+    for i in range(max(repeats, 1)):
+        reset_caches()
+        db.reset_counts()
+        gc.collect()
+        start = time.perf_counter()
+        workload()
+        times.append((time.perf_counter() - start) * 1000.0)
+        if i == 0:
+            db_calls, db_rows = db.total_calls, db.rows_returned
+            for (table, op), n in sorted(db.calls.items()):
+                calls_by_table[f"{table}.{op}"] = n
+
+    reset_caches()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        workload()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        engine=engine,
+        scale=scale,
+        wall_ms=statistics.median(times),
+        peak_kib=peak / 1024.0,
+        db_calls=db_calls,
+        db_rows=db_rows,
+        repeats=len(times),
+        db_calls_by_table=calls_by_table,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def load_baselines(path: Path = BASELINE_PATH) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with path.open() as f:
+        return json.load(f)
+
+
+def save_baselines(results: List[BenchResult], path: Path = BASELINE_PATH) -> None:
+    """Merge the entries that ran into the baseline file."""
+    baselines = load_baselines(path)
+    for r in results:
+        baselines[r.key] = r.baseline_entry()
+    with path.open("w") as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write("\n")
+
+
+def save_results(results: List[BenchResult], path: Path = RESULTS_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        json.dump([asdict(r) for r in results], f, indent=2)
+        f.write("\n")
+
+
+def compare(result: BenchResult, baseline: Optional[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Split regressions into hard (DB calls) and soft (time / memory)."""
+    report: Dict[str, List[str]] = {"hard": [], "soft": []}
+    if not baseline:
+        return report
+    base_calls = baseline.get("db_calls")
+    if base_calls is not None and result.db_calls > base_calls:
+        report["hard"].append(f"db_calls {base_calls} → {result.db_calls}")
+    base_wall = baseline.get("wall_ms")
+    if base_wall and result.wall_ms > base_wall * (1 + TOLERANCE) and result.wall_ms - base_wall > _MIN_WALL_MS:
+        report["soft"].append(f"wall_ms {base_wall:.1f} → {result.wall_ms:.1f}")
+    base_peak = baseline.get("peak_kib")
+    if base_peak and result.peak_kib > base_peak * (1 + TOLERANCE) and result.peak_kib - base_peak > _MIN_PEAK_KIB:
+        report["soft"].append(f"peak_kib {base_peak:.0f} → {result.peak_kib:.0f}")
+    return report
+
+
+def format_table(results: List[BenchResult], baselines: Dict[str, Dict[str, Any]]) -> List[str]:
+    header = f"{'benchmark':<28}{'wall ms':>10}{'vs base':>9}{'peak KiB':>11}{'db calls':>10}{'db rows':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        base = baselines.get(r.key) or {}
+        delta = ""
+        if base.get("wall_ms"):
+            delta = f"{(r.wall_ms / base['wall_ms'] - 1) * 100:+.0f}%"
+        lines.append(
+            f"{r.key:<28}{r.wall_ms:>10.1f}{delta:>9}{r.peak_kib:>11.0f}{r.db_calls:>10}{r.db_rows:>10}"
+        )
+    return lines
@@ -0,0 +1,406 @@
+"""
+Reference implementations for the parity tests.
+
+Compact ports of what the optimised engines replaced — the per-exit cap
+table walk, the regex/eval formula evaluator, the per-entity consolidation
+loop, the linear-scan label matchers, the ilike company search and the
+per-value cascade breakpoint sweep — plus a per-exit solve of the
+waterfall model documented in waterfall_engine. They are deliberately the
+slow, obvious versions; test_parity.py checks the engines against them:
+
+    from .reference import legacy_match_category
+    assert label_classifier.match_category(label) == legacy_match_category(label)
+"""
+
+import math
+import re
+from collections import defaultdict
+from decimal import Decimal
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# ---------------------------------------------------------------------------
+# Cap table / waterfall
+# ---------------------------------------------------------------------------
+
+def legacy_exit_waterfall(entries: Sequence[Any], distributable: Decimal, option_exercise_rate: float) -> List[float]:
+    """Per-entry totals from the old CapTableCalculator.calculate_exit_waterfall.
+
+    Preferences in entry order, then the remainder pro-rata over common and
+    participating shares. Only meaningful where that agrees with the current
+    model: every preference covered, no caps, no conversion.
+    """
+    from app.services.advanced_cap_table import ShareClass
+
+    totals: List[float] = []
+    remaining = distributable
+    for entry in entries:
+        if entry.share_class != ShareClass.COMMON:
+            pref = entry.num_shares * entry.price_per_share * Decimal(str(entry.rights.liquidation_preference))
+            if remaining < pref:
+                totals.append(float(remaining))
+                remaining = Decimal("0")
+                break
+            totals.append(float(pref))
+            remaining -= pref
+
+    if remaining > 0:
+        def effective(entry) -> Decimal:
+            if entry.share_class == ShareClass.OPTIONS:
+                return entry.num_shares * Decimal(str(option_exercise_rate))
+            return entry.num_shares
+
+        sharing = [
+            (i, entry) for i, entry in enumerate(entries)
+            if entry.share_class == ShareClass.COMMON or entry.rights.participation_rights
+        ]
+        total_shares = sum(effective(entry) for _, entry in sharing)
+        for i, entry in sharing:
+            share = float(effective(entry) / total_shares * remaining)
+            if i < len(totals):
+                totals[i] += share
+            else:
+                totals.append(share)
+    return totals
+
+
+def _payout_at_price(claim: Any, price: float) -> float:
+    as_common = claim.shares * price
+    if claim.preference <= 0:
+        return as_common
+    if claim.participating:
+        with_pref = claim.preference + as_common
+        if claim.participation_cap is None:
+            return with_pref
+        cap = max(claim.participation_cap, claim.preference)
+        return max(min(with_pref, cap), as_common)
+    return max(claim.preference, as_common)
+
+
+def solve_waterfall(claims: Sequence[Any], exit_value: float) -> List[float]:
+    """Payouts at one exit value, solved directly from the model's definition.
+
+    Below the preference stack: seniority tiers, pro-rata to claim within a
+    tier. Above it: bisect for the common price at which holder payouts add
+    up to the exit value.
+    """
+    prefs = [max(c.preference, 0.0) for c in claims]
+    if exit_value <= sum(prefs):
+        out = [0.0] * len(claims)
+        remaining = exit_value
+        for tier in sorted({c.seniority for c in claims}, reverse=True):
+            members = [i for i, c in enumerate(claims) if c.seniority == tier and prefs[i] > 0]
+            owed = sum(prefs[i] for i in members)
+            if not members or remaining <= 0:
+                continue
+            paid = min(owed, remaining)
+            for i in members:
+                out[i] = paid * prefs[i] / owed
+            remaining -= paid
+        return out
+
+    def total(price: float) -> float:
+        return sum(_payout_at_price(c, price) for c in claims)
+
+    lo, hi = 0.0, 1.0
+    while total(hi) < exit_value:
+        hi *= 2
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if total(mid) < exit_value:
+            lo = mid
+        else:
+            hi = mid
+    return [_payout_at_price(c, hi) for c in claims]
+
+
+# ---------------------------------------------------------------------------
+# Formula evaluator
+# ---------------------------------------------------------------------------
+
+class LegacyFormulaEvaluator:
+    """The old substitute-and-eval evaluator (cell refs and basic math only)."""
+
+    def __init__(self):
+        self._cell_values: Dict[str, Any] = {}
+
+    def set_cell_value(self, cell_ref: str, value: Any) -> None:
+        self._cell_values[cell_ref.upper()] = value
+
+    def evaluate(self, formula: str) -> Any:
+        s = formula.strip()
+        if s.startswith("="):
+            s = s[1:].strip()
+        if not s:
+            return 0
+        for ref, val in self._cell_values.items():
+            s = re.sub(rf"\b{re.escape(ref)}\b", str(val), s, flags=re.IGNORECASE)
+        try:
+            allowed = {"abs": abs, "round": round, "min": min, "max": max, "sum": sum, "pow": pow}
+            return eval(s, {"__builtins__": {}}, allowed)
+        except Exception:
+            return 0
+
+
+# ---------------------------------------------------------------------------
+# Consolidation
+# ---------------------------------------------------------------------------
+
+_IC_COST_CATEGORY = {
+    "management_fee": "opex_ga",
+    "royalty": "cogs",
+    "ip_license": "cogs",
+    "services": "opex_ga",
+    "cost_recharge": "opex_ga",
+    "financing": "opex_ga",
+    "goods": "cogs",
+}
+
+
+def _infer_consolidation(ownership_pct: float) -> str:
+    if ownership_pct > 50:
+        return "full"
+    if ownership_pct >= 20:
+        return "equity_method"
+    return "none"
+
+
+def legacy_consolidate_pnl(
+    db: Any,
+    company_id: str,
+    parent_entity_id: str,
+    period_start: Optional[str] = None,
+    period_end: Optional[str] = None,
+) -> Dict[str, Any]:
+    """The old ConsolidationEngine.consolidate_pnl: one fpa_actuals query per entity.
+
+    Returns the ConsolidatedPnL fields as plain dicts, eliminations as
+    (source, target, category, subcategory, period, amount) tuples.
+    """
+    entities = db.table("company_entities").select("*").eq("company_id", company_id).execute().data or []
+    full: List[str] = []
+    equity: List[str] = []
+    ownership: Dict[str, float] = {}
+    for entity in entities:
+        if not entity.get("parent_entity_id"):
+            continue
+        pct = entity.get("ownership_pct", 100.0)
+        ownership[entity["id"]] = pct
+        method = entity.get("consolidation_method") or _infer_consolidation(pct)
+        if method == "full":
+            full.append(entity["id"])
+        elif method == "equity_method":
+            equity.append(entity["id"])
+    if parent_entity_id not in full:
+        full.insert(0, parent_entity_id)
+        ownership[parent_entity_id] = 100.0
+
+    entity_pnls: Dict[str, Dict[str, Dict[str, float]]] = {}
+    periods: set = set()
+    for eid in full:
+        query = (
+            db.table("fpa_actuals")
+            .select("period, category, subcategory, hierarchy_path, amount")
+            .eq("company_id", company_id)
+            .eq("entity_id", eid)
+        )
+        if period_start:
+            query = query.gte("period", f"{period_start}-01")
+        if period_end:
+            query = query.lte("period", f"{period_end}-01")
+        pnl: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for row in query.order("period").execute().data or []:
+            sub = row.get("subcategory")
+            key = f"{row['category']}:{sub}" if sub else row["category"]
+            pnl[key][row["period"][:7]] += float(row["amount"])
+            periods.add(row["period"][:7])
+        entity_pnls[eid] = {key: dict(by_period) for key, by_period in pnl.items()}
+
+    combined: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for pnl in entity_pnls.values():
+        for key, by_period in pnl.items():
+            for period, amount in by_period.items():
+                combined[key][period] += amount
+
+    members = set(full)
+    eliminations: List[Tuple[str, str, str, Optional[str], str, float]] = []
+    txns = db.table("ic_transaction_suggestions").select("*").eq("company_id", company_id).execute().data or []
+    for txn in txns:
+        src = txn.get("from_entity_id") or txn.get("source_entity_id")
+        dst = txn.get("to_entity_id") or txn.get("target_entity_id")
+        amount = txn.get("amount") or txn.get("annual_value", 0)
+        if src not in members or dst not in members or not amount:
+            continue
+        txn_periods = txn.get("periods") or sorted({p for by_period in combined.values() for p in by_period})
+        if not txn_periods:
+            continue
+        per_period = float(amount) / len(txn_periods)
+        category = txn.get("category", "revenue")
+        cost_category = _IC_COST_CATEGORY.get(txn.get("transaction_type", ""), category)
+        subcategory = txn.get("subcategory")
+        for period in txn_periods:
+            eliminations.append((src, dst, category, subcategory, period, per_period))
+            eliminations.append((dst, src, cost_category, subcategory, period, per_period))
+
+    consolidated: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for key, by_period in combined.items():
+        consolidated[key].update(by_period)
+    for _, _, category, subcategory, period, amount in eliminations:
+        consolidated[f"{category}:{subcategory}" if subcategory else category][period] -= amount
+
+    minority: Dict[str, Dict[str, float]] = {}
+    for eid in full:
+        pct = ownership.get(eid, 100.0)
+        if pct < 100.0:
+            by_period: Dict[str, float] = {}
+            for values in entity_pnls.get(eid, {}).values():
+                for period, amount in values.items():
+                    by_period[period] = by_period.get(period, 0) + amount * (100.0 - pct) / 100.0
+            if by_period:
+                minority[eid] = by_period
+
+    return {
+        "entity_pnls": entity_pnls,
+        "combined": {key: dict(v) for key, v in combined.items()},
+        "consolidated": {key: dict(v) for key, v in consolidated.items()},
+        "eliminations": eliminations,
+        "entities_consolidated": full,
+        "entities_equity_method": equity,
+        "minority_interest": minority,
+        "periods": sorted(periods),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Label classification
+# ---------------------------------------------------------------------------
+
+def legacy_match_category(label: str, threshold: float = 0.65) -> Optional[tuple]:
+    """SequenceMatcher against every synonym, containment boosted to 0.85."""
+    from app.services.label_classifier import CATEGORY_SYNONYMS
+
+    label_lower = label.lower().strip()
+    best_score, best_category = 0.0, None
+    for category, synonyms in CATEGORY_SYNONYMS.items():
+        for synonym in synonyms:
+            score = SequenceMatcher(None, label_lower, synonym).ratio()
+            if label_lower in synonym or synonym in label_lower:
+                score = max(score, 0.85)
+            if score > best_score:
+                best_score, best_category = score, category
+    if best_score >= threshold and best_category:
+        return (best_category, round(best_score, 2))
+    return None
+
+
+def legacy_subcategory(label: str, business_model: str = "saas") -> Tuple[str, str]:
+    """First taxonomy subcategory either way round, then the keyword table."""
+    from app.services.actuals_ingestion import SUBCATEGORY_KEYWORDS, get_taxonomy_for_model
+
+    normalized = label.lower().strip().replace("-", "_").replace(" ", "_")
+    for cat, subs in get_taxonomy_for_model(business_model).items():
+        for sub in subs:
+            if sub in normalized or normalized in sub:
+                return (cat, sub)
+    for (cat, sub), keywords in SUBCATEGORY_KEYWORDS.items():
+        if any(kw in normalized for kw in keywords):
+            return (cat, sub)
+    return ("", "")
+
+
+def legacy_match_erp_account(account_name: str) -> Optional[str]:
+    """Exact ERP_ACCOUNT_MAP key, else the longest key contained in the name."""
+    from app.services.balance_sheet_builder import ERP_ACCOUNT_MAP
+
+    normalized = account_name.strip().lower()
+    for prefix in ("total ", "net ", "less: ", "less "):
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix):]
+    if normalized in ERP_ACCOUNT_MAP:
+        return ERP_ACCOUNT_MAP[normalized]
+    best, best_len = None, 0
+    for key, category in ERP_ACCOUNT_MAP.items():
+        if key in normalized and len(key) > best_len:
+            best, best_len = category, len(key)
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Company search
+# ---------------------------------------------------------------------------
+
+def legacy_search_companies(rows: Sequence[Dict[str, Any]], query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """The old search_companies_db: name ilike, broadened to sector / description under 3 hits."""
+    q = query.lower()
+    hits = [r for r in rows if q in (r.get("name") or "").lower()][:limit]
+    if len(hits) < 3:
+        ids = {r["id"] for r in hits}
+        hits += [
+            r for r in rows
+            if r["id"] not in ids and (q in (r.get("sector") or "").lower() or q in (r.get("description") or "").lower())
+        ][:limit]
+    return hits[:limit]
+
+
+def legacy_comparable_candidates(
+    rows: Sequence[Dict[str, Any]], company: str, sector: str, business_model: str, max_results: int,
+) -> List[Dict[str, Any]]:
+    """DB candidates the old find_comparables scored: sector and business-model searches."""
+    out = legacy_search_companies(rows, sector, max_results * 2) if sector else []
+    if business_model:
+        ids = {r["id"] for r in out}
+        out += [r for r in legacy_search_companies(rows, business_model, max_results) if r["id"] not in ids]
+    return [r for r in out if (r.get("name") or "").lower().strip() != company.lower()]
+
+
+# ---------------------------------------------------------------------------
+# Cascade
+# ---------------------------------------------------------------------------
+
+def legacy_find_breakpoints(
+    graph: Any, variable: str, range_min: float, range_max: float, steps: int, current_params: Any,
+) -> List[Any]:
+    """The old CascadeGraph.find_breakpoints: one simulate() per sweep value."""
+    from app.services.cascade_engine import Breakpoint
+
+    breakpoints = []
+    step_size = (range_max - range_min) / steps
+    prev = None
+    for i in range(steps + 1):
+        value = range_min + i * step_size
+        cascade = graph.simulate(variable, value, current_params, max_depth=5)
+        if prev is not None:
+            prev_steps = {s.param_affected for s in prev.steps}
+            curr_steps = {s.param_affected for s in cascade.steps}
+            new_triggers = curr_steps - prev_steps
+            if new_triggers or prev_steps - curr_steps:
+                fired = [s for s in cascade.steps if s.param_affected in new_triggers]
+                breakpoints.append(Breakpoint(
+                    variable=variable,
+                    value=value,
+                    description="; ".join(s.description for s in fired) or f"Behavior change at {variable}={value}",
+                    clauses_involved=[s.source_clause.source_clause_id for s in fired],
+                    stakeholder_impact={},
+                    before_behavior=f"{len(prev.steps)} cascade steps",
+                    after_behavior=f"{len(cascade.steps)} cascade steps",
+                ))
+        prev = cascade
+    return breakpoints
+
+
+def close(a: Any, b: Any, path: str = "", rel: float = 1e-12, abs_: float = 1e-6) -> None:
+    """Assert nested dicts / lists of numbers match within tolerance."""
+    if isinstance(a, dict):
+        assert isinstance(b, dict) and set(a) == set(b), (path, sorted(set(a) ^ set(b or {}))[:5])
+        for key in a:
+            close(a[key], b[key], f"{path}/{key}", rel, abs_)
+    elif isinstance(a, (list, tuple)):
+        assert isinstance(b, (list, tuple)) and len(a) == len(b), (path, a, b)
+        for i, (x, y) in enumerate(zip(a, b)):
+            close(x, y, f"{path}[{i}]", rel, abs_)
+    elif isinstance(a, float) or isinstance(b, float):
+        assert isinstance(a, (int, float)) and isinstance(b, (int, float)), (path, a, b)
+        assert a == b or math.isclose(a, b, rel_tol=rel, abs_tol=abs_), (path, a, b)
+    else:
+        assert a == b, (path, a, b)
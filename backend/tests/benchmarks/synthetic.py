@@ -0,0 +1,247 @@
+"""
+Deterministic synthetic portfolios for the engine benchmarks.
+
+build_dataset(scale) seeds ``funds``, ``companies``, ``fpa_actuals`` and
+``scenario_branches`` rows shaped like production (ISO-date periods,
+parent + subcategory rows, cash_balance / headcount snapshots, one root
+branch and one child branch with assumption overrides per company). It
+also seeds one holding group for consolidation: ``company_entities`` (a root
+plus a subsidiary per company, up to _GROUP_SUBSIDIARIES), their last 12
+months of entity-level ``fpa_actuals`` and ``ic_transaction_suggestions``.
+Same scale → same rows, so DB-call counts are stable across runs.
+"""
+
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+
+_NS = uuid.UUID("6f0c5a52-6b8e-4c1e-9d0e-2f6a1b7c9e10")
+
+# Subcategory split of each opex line (share of the parent amount)
+_SUBCATEGORIES = {
+    "opex_rd": {"engineering_salaries": 0.7, "tools_software": 0.2, "contractors": 0.1},
+    "opex_sm": {"marketing_programs": 0.45, "sales_salaries": 0.55},
+    "opex_ga": {"finance_legal": 0.4, "office_rent": 0.35, "insurance": 0.25},
+}
+_REVENUE_MODELS = ("saas", "marketplace", "transactional", "services")
+_SECTORS = ("fintech", "healthtech", "devtools", "climate", "consumer")
+_GROUP_SUBSIDIARIES = 40
+_GROUP_OWNERSHIP = (100.0, 100.0, 80.0, 60.0, 35.0)
+
+
+@dataclass(frozen=True)
+class Scale:
+    name: str
+    companies: int
+    months: int
+
+
+SCALES: Dict[str, Scale] = {
+    s.name: s for s in (
+        Scale("single-12m", 1, 12),
+        Scale("single-36m", 1, 36),
+        Scale("single-120m", 1, 120),
+        Scale("fund-50", 50, 36),
+        Scale("fund-500", 500, 24),
+    )
+}
+# Default run stays under a minute; BENCH_SCALES=all (or a comma list) for the rest
+DEFAULT_SCALES = ("single-12m", "single-120m", "fund-50")
+
+
+def selected_scales() -> List[Scale]:
+    raw = os.getenv("BENCH_SCALES", "").strip()
+    if raw == "all":
+        return list(SCALES.values())
+    names = [n.strip() for n in raw.split(",") if n.strip()] or list(DEFAULT_SCALES)
+    unknown = [n for n in names if n not in SCALES]
+    if unknown:
+        raise ValueError(f"Unknown BENCH_SCALES {unknown}; choose from {sorted(SCALES)}")
+    return [SCALES[n] for n in names]
+
+
+@dataclass
+class SyntheticDataset:
+    scale: Scale
+    tables: Dict[str, List[Dict[str, Any]]]
+    company_ids: List[str]
+    fund_id: str
+    child_branch: Dict[str, str] = field(default_factory=dict)   # company_id → branch id
+    revenue: Dict[str, List[float]] = field(default_factory=dict)
+    group_company_id: str = ""
+    group_root_entity: str = ""
+
+    @property
+    def row_count(self) -> int:
+        return sum(len(rows) for rows in self.tables.values())
+
+
+def _id(*parts: Any) -> str:
+    return str(uuid.uuid5(_NS, ":".join(str(p) for p in parts)))
+
+
+def _periods(months: int, end_year: int = 2025, end_month: int = 12) -> List[str]:
+    out = []
+    y, m = end_year, end_month
+    for _ in range(months):
+        out.append(f"{y:04d}-{m:02d}-01")
+        m -= 1
+        if m == 0:
+            y, m = y - 1, 12
+    return out[::-1]
+
+
+def build_dataset(scale: Scale, seed: int = 42) -> SyntheticDataset:
+    fund_id = _id("fund", scale.name)
+    periods = _periods(scale.months)
+    actuals: List[Dict[str, Any]] = []
+    companies: List[Dict[str, Any]] = []
+    branches: List[Dict[str, Any]] = []
+    dataset = SyntheticDataset(
+        scale=scale,
+        tables={},
+        company_ids=[],
+        fund_id=fund_id,
+    )
+
+    for i in range(scale.companies):
+        rng = np.random.default_rng(seed + i)
+        cid = _id("company", scale.name, i)
+        dataset.company_ids.append(cid)
+        companies.append({
+            "id": cid,
+            "name": f"Synthetic Co {i:03d}",
+            "fund_id": fund_id,
+            "revenue_model": _REVENUE_MODELS[i % len(_REVENUE_MODELS)],
+            "sector": _SECTORS[i % len(_SECTORS)],
+            "stage": ("seed", "series_a", "series_b", "series_c")[i % 4],
+            "current_arr_usd": None,
+            "current_valuation_usd": float(rng.uniform(10e6, 400e6)),
+        })
+
+        start_revenue = float(rng.uniform(50e3, 2e6))
+        growth = rng.normal(float(rng.uniform(0.01, 0.08)), 0.02, scale.months)
+        revenue = start_revenue * np.cumprod(1.0 + growth)
+        gross_margin = float(rng.uniform(0.55, 0.85))
+        cash = float(rng.uniform(5e6, 60e6))
+        headcount = float(rng.integers(8, 120))
+        dataset.revenue[cid] = revenue.round(2).tolist()
+
+        for period, rev in zip(periods, revenue):
+            cogs = rev * (1.0 - gross_margin)
+            opex = {
+                "opex_rd": rev * float(rng.uniform(0.35, 0.6)),
+                "opex_sm": rev * float(rng.uniform(0.25, 0.5)),
+                "opex_ga": rev * float(rng.uniform(0.1, 0.2)),
+            }
+            opex_total = sum(opex.values())
+            ebitda = rev - cogs - opex_total
+            cash += ebitda
+            headcount += float(rng.integers(0, 3))
+            values = {
+                "revenue": rev,
+                "cogs": cogs,
+                **opex,
+                "opex_total": opex_total,
+                "gross_profit": rev - cogs,
+                "ebitda": ebitda,
+                "cash_balance": cash,
+                "headcount": headcount,
+            }
+            for category, amount in values.items():
+                actuals.append(_actual_row(cid, period, category, "", amount))
+            for parent, split in _SUBCATEGORIES.items():
+                for sub, share in split.items():
+                    actuals.append(_actual_row(cid, period, parent, sub, opex[parent] * share))
+
+        root_id = _id("branch", cid, "base")
+        child_id = _id("branch", cid, "downside")
+        dataset.child_branch[cid] = child_id
+        branches.append({
+            "id": root_id,
+            "company_id": cid,
+            "parent_branch_id": None,
+            "name": "Base",
+            "assumptions": {},
+            "created_at": "2025-01-01T00:00:00Z",
+        })
+        branches.append({
+            "id": child_id,
+            "company_id": cid,
+            "parent_branch_id": root_id,
+            "name": "Downside",
+            "assumptions": {
+                "revenue_growth_override": round(float(rng.uniform(0.0, 0.03)), 4),
+                "burn_rate_pct_change": 0.1,
+            },
+            "created_at": "2025-02-01T00:00:00Z",
+        })
+
+    entities, ic_transactions = _build_group(dataset, periods[-12:], actuals)
+    dataset.tables = {
+        "funds": [{"id": fund_id, "name": f"Synthetic Fund {scale.name}", "fund_type": "venture"}],
+        "companies": companies,
+        "fpa_actuals": actuals,
+        "scenario_branches": branches,
+        "company_entities": entities,
+        "ic_transaction_suggestions": ic_transactions,
+    }
+    return dataset
+
+
+def _build_group(dataset: SyntheticDataset, periods: List[str], actuals: List[Dict[str, Any]]):
+    """A holding group whose subsidiaries mirror the first companies' revenue."""
+    group_id = _id("group", dataset.scale.name)
+    root = _id("entity", group_id, "root")
+    dataset.group_company_id, dataset.group_root_entity = group_id, root
+    entities = [{"id": root, "company_id": group_id, "name": "HoldCo", "parent_entity_id": None}]
+    ic_transactions: List[Dict[str, Any]] = []
+    members = [(root, dataset.company_ids[0])]
+    for j, cid in enumerate(dataset.company_ids[:_GROUP_SUBSIDIARIES]):
+        eid = _id("entity", group_id, j)
+        entities.append({
+            "id": eid,
+            "company_id": group_id,
+            "name": f"OpCo {j:02d}",
+            "parent_entity_id": root,
+            "ownership_pct": _GROUP_OWNERSHIP[j % len(_GROUP_OWNERSHIP)],
+        })
+        members.append((eid, cid))
+        if j % 4 == 0:
+            ic_transactions.append({
+                "id": _id("ic", group_id, j),
+                "company_id": group_id,
+                "from_entity_id": root,
+                "to_entity_id": eid,
+                "transaction_type": "management_fee" if j % 8 == 0 else "royalty",
+                "annual_value": 120_000.0 * (1 + j % 5),
+                **({"periods": [p[:7] for p in periods[-3:]]} if j % 8 == 4 else {}),
+            })
+
+    for eid, cid in members:
+        revenue = dataset.revenue[cid][-len(periods):]
+        for period, rev in zip(periods[-len(revenue):], revenue):
+            for category, share in (("revenue", 1.0), ("cogs", 0.3), ("opex_rd", 0.4), ("opex_sm", 0.3), ("opex_ga", 0.15)):
+                row = _actual_row(group_id, period, category, "", rev * share)
+                row["id"] = _id("entity-actual", eid, period, category)
+                row["entity_id"] = eid
+                actuals.append(row)
+    return entities, ic_transactions
+
+
+def _actual_row(cid: str, period: str, category: str, subcategory: str, amount: float) -> Dict[str, Any]:
+    path = f"{category}/{subcategory}" if subcategory else category
+    return {
+        "id": _id("actual", cid, period, path),
+        "company_id": cid,
+        "period": period,
+        "category": category,
+        "subcategory": subcategory,
+        "hierarchy_path": path,
+        "amount": round(float(amount), 2),
+        "source": "benchmark",
+        "entity_id": None,
+    }
@@ -0,0 +1,60 @@
+"""
+run_bulk_valuation end to end against the in-memory Supabase client:
+companies are read through the company repo, valued in batches,
+checkpointed, and written to pending_suggestions in chunks.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from .fake_supabase import InMemorySupabase
+
+
+def _companies(fund_id, n):
+    stages = ["seed", "series_a", "Series B", "growth", "late"]
+    return [{
+        "id": f"co-{i}",
+        "fund_id": fund_id,
+        "name": f"Company {i}",
+        "stage": stages[i % len(stages)],
+        "current_arr_usd": 2e6 * (i + 1),
+        "revenue_growth_annual_pct": 80,
+        "current_valuation_usd": 5e7 * (i + 1),
+        "total_invested_usd": 1e7,
+        "sector": "software",
+    } for i in range(n)]
+
+
+def test_run_bulk_valuation_writes_suggestions(install_fake_supabase, monkeypatch):
+    pytest.importorskip("yfinance")
+    from app.core.adapters import reset_adapters
+    from app.services import bulk_valuation_job as job
+
+    monkeypatch.setattr(job, "BULK_VALUATION_BATCH", 2)
+    monkeypatch.setattr(job, "_UPSERT_CHUNK", 2)
+    fund_id = "fund-bulk"
+    db = InMemorySupabase({"companies": _companies(fund_id, 5), "pending_suggestions": []})
+    install_fake_supabase(db)
+    reset_adapters()
+    try:
+        job_id = uuid.uuid4().hex
+        status = asyncio.run(job.run_bulk_valuation(job_id, fund_id, concurrency=2))
+
+        assert status["state"] == "completed", status.get("error")
+        assert (status["total"], status["succeeded"], status["failed"]) == (5, 5, 0)
+        assert status["suggestions_written"] == 5
+        rows = db.table("pending_suggestions").select("*").execute().data
+        assert sorted(r["company_id"] for r in rows) == [f"co-{i}" for i in range(5)]
+        assert all(r["fund_id"] == fund_id and r["metadata"]["job_id"] == job_id for r in rows)
+        assert all(r["suggested_value"]["value"] > 0 for r in rows)
+        assert db.calls[("pending_suggestions", "upsert")] == 3
+
+        # A re-run of the same job resumes from the checkpoints
+        status = asyncio.run(job.run_bulk_valuation(job_id, fund_id, concurrency=2))
+        assert status["state"] == "completed"
+        assert status["resumed"] == 5
+        assert len(job.get_job_status(job_id)["results"]) == 5
+    finally:
+        reset_adapters()
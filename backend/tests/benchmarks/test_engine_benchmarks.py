@@ -0,0 +1,54 @@
+"""
+Wall time, peak memory and DB round-trips per engine × scale.
+
+DB-call counts may not grow past the recorded baseline; time and memory
+regressions are reported in the session summary (enforced with
+BENCH_ENFORCE=1). See harness.py for the knobs.
+"""
+
+import warnings
+
+import pytest
+
+from . import harness
+from .engines import ENGINES
+from .synthetic import selected_scales
+
+pytestmark = pytest.mark.benchmark
+
+_SCALES = selected_scales()
+_BASELINES = harness.load_baselines()
+
+
+@pytest.mark.parametrize("engine", list(ENGINES), ids=list(ENGINES))
+@pytest.mark.parametrize("fake_db", _SCALES, ids=[s.name for s in _SCALES], indirect=True)
+def test_engine_benchmark(engine, fake_db, bench_results):
+    dataset, db = fake_db
+    bench = ENGINES[engine]
+    company_ids = bench.companies(dataset)
+
+    result = harness.measure(engine, dataset.scale.name, lambda: bench.run(dataset, company_ids), db)
+    bench_results.append(result)
+
+    if not bench.uses_db:
+        assert result.db_calls == 0, f"{engine} should not touch the database: {result.db_calls_by_table}"
+    if harness.UPDATE_BASELINE:
+        return
+
+    report = harness.compare(result, _BASELINES.get(result.key))
+    assert not report["hard"], f"{result.key} regressed: {report['hard']} ({result.db_calls_by_table})"
+    if report["soft"]:
+        message = f"{result.key} slower than baseline: {report['soft']}"
+        if harness.ENFORCE:
+            pytest.fail(message)
+        warnings.warn(message)
+
+
+def test_fake_client_counts_round_trips():
+    from .fake_supabase import InMemorySupabase
+
+    db = InMemorySupabase({"companies": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]})
+    rows = db.table("companies").select("id").in_("id", ["b"]).execute().data
+    assert rows == [{"id": "b"}]
+    assert db.table("companies").select("*").eq("id", "a").single().execute().data["name"] == "A"
+    assert db.calls[("companies", "select")] == 2
@@ -0,0 +1,46 @@
+-- Migration: fpa_label_mappings table
+-- Per-company memo of actuals row-label classifications (category fuzzy match
+-- and subcategory). Rows are keyed by taxonomy_version so a change to the
+-- synonym / taxonomy tables invalidates them without a cleanup job.
+
+create table fpa_label_mappings (
+  id uuid primary key default gen_random_uuid(),
+  company_id uuid not null references companies(id) on delete cascade,
+  kind text not null check (kind in ('category', 'subcategory')),
+  label text not null,
+  business_model text not null default '',
+  category text,
+  subcategory text default '',
+  score double precision,
+  taxonomy_version text not null,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now()
+);
+
+create unique index idx_fpa_label_mappings_dedup
+  on fpa_label_mappings(company_id, kind, business_model, label);
+create index idx_fpa_label_mappings_version
+  on fpa_label_mappings(company_id, taxonomy_version);
+
+alter table fpa_label_mappings enable row level security;
+
+create policy "Users can view label mappings" on fpa_label_mappings for select to authenticated
+  using (exists (
+    select 1 from companies c
+    where c.id = fpa_label_mappings.company_id
+      and c.organization_id = user_org_id()
+  ));
+
+create policy "Users can insert label mappings" on fpa_label_mappings for insert to authenticated
+  with check (exists (
+    select 1 from companies c
+    where c.id = fpa_label_mappings.company_id
+      and c.organization_id = user_org_id()
+  ));
+
+create policy "Users can update label mappings" on fpa_label_mappings for update to authenticated
+  using (exists (
+    select 1 from companies c
+    where c.id = fpa_label_mappings.company_id
+      and c.organization_id = user_org_id()
+  ));